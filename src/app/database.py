@@ -3,21 +3,41 @@
 from logging import DEBUG
 from pathlib import Path
 from typing import Any, Optional
+from urllib.parse import quote_plus
 
 from sqlalchemy import create_engine, text
 from sqlalchemy.engine.base import Engine
+from sqlalchemy.ext.asyncio import (
+    AsyncEngine,
+    AsyncSession,
+    async_sessionmaker,
+    create_async_engine,
+)
 from sqlalchemy.orm import Session, sessionmaker
 
 from configuration import configuration
 from log import get_logger
 from models.config import PostgreSQLDatabaseConfiguration, SQLiteDatabaseConfiguration
 from models.database.base import Base
+from utils.postgres_ssl import ssl_argument
+from utils.read_replicas import (
+    ReplicaRouter,
+    replica_configurations,
+    replica_router,
+    route_async_read,
+)
+from utils.shards import Shards, shard_configurations, shards_of
 
 logger = get_logger(__name__)
 
 # pylint: disable=invalid-name
 engine: Optional[Engine] = None
 session_local: Optional[sessionmaker] = None
+async_engine: Optional[AsyncEngine] = None
+async_session_local: Optional[async_sessionmaker[AsyncSession]] = None
+async_replica_router: Optional[ReplicaRouter[AsyncEngine]] = None
+shard_engines: list[Engine] = []
+async_shards: Optional[Shards[AsyncEngine]] = None
 
 
 def get_engine() -> Engine:
@@ -40,13 +60,20 @@ def get_engine() -> Engine:
 def create_tables() -> None:
     """Create tables.
 
-    Create all ORM tables defined on Base.metadata using the currently initialized engine.
+    Create all ORM tables defined on Base.metadata using the currently initialized engine,
+    and in all shards of the database. Indexes missing in already existing tables are
+    created as well.
 
     Raises:
         RuntimeError: If the global database engine is not initialized (call
         initialize_database() first).
     """
-    Base.metadata.create_all(get_engine())
+    for db_engine in [get_engine(), *shard_engines]:
+        Base.metadata.create_all(db_engine)
+        # create_all skips existing tables together with their indexes
+        for table in Base.metadata.sorted_tables:
+            for index in table.indexes:
+                index.create(db_engine, checkfirst=True)
 
 
 def get_session() -> Session:
@@ -68,6 +95,93 @@ def get_session() -> Session:
     return session_local()
 
 
+def get_async_session(
+    user_id: Optional[str] = None, read_only: bool = False
+) -> AsyncSession:
+    """Get an asynchronous database session. Raises an error if not initialized.
+
+    Provide a new ORM AsyncSession bound to the configured async engine. The
+    session is meant to be used as an async context manager by request
+    handlers, so they do not block the event loop on database I/O.
+
+    When the database is sharded, sessions accessing conversations of a user
+    are bound to the shard of the user. Otherwise sessions of read-only
+    operations on data of a user are bound to a read replica when replicas
+    are configured, unless the replicas lag too much or the user wrote to the
+    database recently.
+
+    Parameters:
+    ----------
+        user_id (Optional[str]): User whose conversations are accessed by the
+        session. None for sessions bound to the primary database.
+        read_only (bool): Whether the session only reads.
+
+    Returns:
+        AsyncSession: A SQLAlchemy ORM AsyncSession bound to the initialized
+        async engine.
+
+    Raises:
+        RuntimeError: If the database has not been initialized; call
+        initialize_database() first.
+    """
+    if async_session_local is None:
+        raise RuntimeError(
+            "Async database session not initialized. Call initialize_database() first."
+        )
+    if user_id is not None and async_shards is not None:
+        return async_session_local(bind=async_shards.for_user(user_id))
+    if user_id is not None and read_only:
+        replica = route_async_read(async_replica_router, user_id)
+        if replica is not None:
+            return async_session_local(bind=replica)
+    return async_session_local()
+
+
+def get_async_sessions(
+    user_id: Optional[str] = None, read_only: bool = False
+) -> list[AsyncSession]:
+    """Get asynchronous sessions of all databases storing conversations.
+
+    Used to find conversations whose owner is not known, and to list
+    conversations of all users. Without shards, a single session is returned,
+    bound like sessions returned by `get_async_session`.
+
+    Parameters:
+    ----------
+        user_id (Optional[str]): User accessing the conversations, whose shard
+        comes first, as the user usually accesses their own conversations.
+        read_only (bool): Whether the sessions only read.
+
+    Returns:
+        list[AsyncSession]: One session per shard, or one session when the
+        database is not sharded.
+
+    Raises:
+        RuntimeError: If the database has not been initialized; call
+        initialize_database() first.
+    """
+    if async_session_local is None or async_shards is None:
+        return [get_async_session(user_id, read_only)]
+    return [
+        async_session_local(bind=shard) for shard in async_shards.user_first(user_id)
+    ]
+
+
+async def dispose_async_engine() -> None:
+    """Close connections pooled by the asynchronous database engines.
+
+    Does nothing when the database has not been initialized.
+    """
+    if async_engine is not None:
+        await async_engine.dispose()
+    if async_replica_router is not None:
+        for replica in async_replica_router.replicas:
+            await replica.dispose()
+    if async_shards is not None:
+        for shard in async_shards:
+            await shard.dispose()
+
+
 def _create_sqlite_engine(config: SQLiteDatabaseConfiguration, **kwargs: Any) -> Engine:
     """Create SQLite database engine.
 
@@ -163,6 +277,91 @@ def _create_postgres_engine(
     return postgres_engine
 
 
+def _create_async_sqlite_engine(
+    config: SQLiteDatabaseConfiguration, **kwargs: Any
+) -> AsyncEngine:
+    """Create asynchronous SQLite database engine using aiosqlite.
+
+    Parameters:
+    ----------
+        config (SQLiteDatabaseConfiguration): Configuration containing
+        `db_path` for the SQLite file.
+        **kwargs: Additional keyword arguments forwarded to SQLAlchemy's
+        create_async_engine.
+
+    Returns:
+    -------
+        AsyncEngine: A SQLAlchemy AsyncEngine bound to the specified SQLite
+        database file.
+
+    Raises:
+    ------
+        RuntimeError: If engine creation fails.
+    """
+    try:
+        # SQLite allows one writer at a time; waiting for the pooled connection
+        # is cheaper than backing off on a locked database
+        return create_async_engine(
+            f"sqlite+aiosqlite:///{config.db_path}",
+            pool_size=1,
+            max_overflow=0,
+            **kwargs,
+        )
+    except Exception as e:
+        logger.exception("Failed to create async SQLite engine")
+        raise RuntimeError(f"Async SQLite engine creation failed: {e}") from e
+
+
+def _create_async_postgres_engine(
+    config: PostgreSQLDatabaseConfiguration, **kwargs: Any
+) -> AsyncEngine:
+    """Create asynchronous PostgreSQL database engine using asyncpg.
+
+    The schema is not created here, the synchronous engine created by
+    `_create_postgres_engine` takes care of it. The `gss_encmode` option is
+    not supported by asyncpg and is ignored.
+
+    Parameters:
+    ----------
+        config (PostgreSQLDatabaseConfiguration): Connection, pool and
+        database settings.
+        **kwargs: Additional keyword arguments forwarded to SQLAlchemy's
+        create_async_engine.
+
+    Returns:
+    -------
+        AsyncEngine: A SQLAlchemy AsyncEngine connected to the configured
+        PostgreSQL database.
+
+    Raises:
+    ------
+        RuntimeError: If engine creation fails.
+    """
+    password = quote_plus(config.password.get_secret_value())
+    postgres_url = (
+        f"postgresql+asyncpg://{quote_plus(config.user)}:{password}"
+        f"@{config.host}:{config.port}/{config.db}"
+    )
+
+    connect_args: dict[str, Any] = {"ssl": ssl_argument(config)}
+    if config.namespace is not None and config.namespace != "public":
+        connect_args["server_settings"] = {"search_path": config.namespace}
+
+    try:
+        return create_async_engine(
+            postgres_url,
+            connect_args=connect_args,
+            pool_size=config.pool.max_size,
+            max_overflow=0,
+            pool_timeout=config.pool.acquire_timeout,
+            pool_recycle=config.pool.max_lifetime,
+            **kwargs,
+        )
+    except Exception as e:
+        logger.exception("Failed to create async PostgreSQL engine")
+        raise RuntimeError(f"Async PostgreSQL engine creation failed: {e}") from e
+
+
 def initialize_database() -> None:
     """Initialize the database engine.
 
@@ -171,14 +370,20 @@ def initialize_database() -> None:
 
     Reads configuration.database_configuration to determine the database type
     (SQLite or PostgreSQL), creates and assigns a module-level `engine`, and
-    initializes `session_local` as a sessionmaker bound to that engine. The
-    engine is configured to echo SQL when the logger is at DEBUG level and to
-    use connection pre-ping. May raise RuntimeError if engine creation or
-    required schema creation fails.
+    initializes `session_local` as a sessionmaker bound to that engine. An
+    asynchronous `async_engine` (aiosqlite or asyncpg) and `async_session_local`
+    are created for the same database and used by request handlers, together
+    with engines of the PostgreSQL shards or read replicas, if any. The engines
+    are configured to echo SQL when the logger is at DEBUG level and to use
+    connection pre-ping. May raise RuntimeError if engine creation or required
+    schema creation fails.
     """
     db_config = configuration.database_configuration
 
-    global engine, session_local  # pylint: disable=global-statement
+    # pylint: disable-next=global-statement
+    global engine, session_local, async_engine, async_session_local
+    global async_replica_router  # pylint: disable=global-statement
+    global shard_engines, async_shards  # pylint: disable=global-statement
 
     # Debug print all SQL statements if our logger is at-least DEBUG level
     echo = bool(logger.isEnabledFor(DEBUG))
@@ -198,6 +403,12 @@ def initialize_database() -> None:
                     f"Expected SQLiteDatabaseConfiguration, got {type(sqlite_config)}"
                 )
             engine = _create_sqlite_engine(sqlite_config, **create_engine_kwargs)
+            async_engine = _create_async_sqlite_engine(
+                sqlite_config, **create_engine_kwargs
+            )
+            async_replica_router = None
+            shard_engines = []
+            async_shards = None
         case "postgres":
             logger.info("Initialize PostgreSQL database")
             postgres_config = db_config.config
@@ -207,5 +418,33 @@ def initialize_database() -> None:
                     f"Expected PostgreSQLDatabaseConfiguration, got {type(postgres_config)}"
                 )
             engine = _create_postgres_engine(postgres_config, **create_engine_kwargs)
+            async_engine = _create_async_postgres_engine(
+                postgres_config, **create_engine_kwargs
+            )
+            shards = shard_configurations(postgres_config)
+            shard_engines = [
+                _create_postgres_engine(shard, **create_engine_kwargs)
+                for shard in shards
+            ]
+            async_shards = shards_of(
+                postgres_config,
+                [
+                    _create_async_postgres_engine(shard, **create_engine_kwargs)
+                    for shard in shards
+                ],
+            )
+            # conversations of sharded databases are read from their shards
+            async_replica_router = replica_router(
+                postgres_config,
+                [
+                    _create_async_postgres_engine(replica, **create_engine_kwargs)
+                    for replica in replica_configurations(postgres_config)
+                    if not shards
+                ],
+            )
 
     session_local = sessionmaker(autocommit=False, autoflush=False, bind=engine)
+    # loaded rows stay usable after commit, handlers return them to callers
+    async_session_local = async_sessionmaker(
+        async_engine, autoflush=False, expire_on_commit=False
+    )
@@ -1,22 +1,24 @@
 """Handler for REST API calls to manage conversation history using Conversations API."""
 
-from typing import Any
+from typing import Annotated, Any
 
-from fastapi import APIRouter, Depends, HTTPException, Request
+from fastapi import APIRouter, Depends, HTTPException, Query, Request
 from ogx_api import ConversationNotFoundError, InvalidParameterError
 from ogx_client import (
     APIConnectionError,
     APIStatusError,
 )
+from sqlalchemy import Row
 from sqlalchemy.exc import SQLAlchemyError
 
-from app.database import get_session
+from app.database import get_async_session, get_async_sessions
 from authentication import get_auth_dependency
 from authorization.middleware import authorize
 from client import AsyncOgxClientHolder
 from configuration import configuration
+from constants import CONVERSATIONS_PAGE_DEFAULT_LIMIT
 from log import get_logger
-from models.api.requests import ConversationUpdateRequest
+from models.api.requests import ConversationUpdateRequest, UserConversationsPageParams
 from models.api.responses.constants import UNAUTHORIZED_OPENAPI_EXAMPLES
 from models.api.responses.error import (
     BadRequestResponse,
@@ -37,6 +39,7 @@ from models.config import Action
 from models.database.conversations import (
     UserConversation,
 )
+from utils.conversation_metadata_cache import conversation_metadata_cache
 from utils.conversations import (
     build_conversation_turns_from_items,
     get_all_conversation_items,
@@ -44,11 +47,14 @@ from utils.conversations import (
 from utils.endpoints import (
     can_access_conversation,
     check_configuration_loaded,
+    conversations_list_statement,
     delete_conversation,
     retrieve_conversation,
     retrieve_conversation_turns,
     validate_and_retrieve_conversation,
 )
+from utils.pagination import decode_conversation_cursor, encode_conversation_cursor
+from utils.read_replicas import record_user_write
 from utils.suid import (
     check_suid,
     normalize_conversation_id,
@@ -114,6 +120,28 @@ conversation_update_responses: dict[int | str, dict[str, Any]] = {
 }
 
 
+def _conversation_details(row: Row) -> ConversationDetails:
+    """Convert a row selected by conversations_list_statement to API model.
+
+    Args:
+        row: Row with the conversation columns.
+
+    Returns:
+        ConversationDetails: Conversation summary with metadata.
+    """
+    return ConversationDetails(
+        conversation_id=row.id,
+        created_at=row.created_at.isoformat() if row.created_at else None,
+        last_message_at=(
+            row.last_message_at.isoformat() if row.last_message_at else None
+        ),
+        message_count=row.message_count,
+        last_used_model=row.last_used_model,
+        last_used_provider=row.last_used_provider,
+        topic_summary=row.topic_summary,
+    )
+
+
 @router.get(
     "/conversations",
     responses=conversations_list_responses,
@@ -123,56 +151,70 @@ conversation_update_responses: dict[int | str, dict[str, Any]] = {
 async def get_conversations_list_endpoint_handler(
     request: Request,
     auth: Any = Depends(get_auth_dependency()),
+    page: Annotated[
+        UserConversationsPageParams, Query()
+    ] = UserConversationsPageParams(),
 ) -> ConversationsListResponse:
-    """Handle request to retrieve all conversations for the authenticated user."""
+    """Handle request to retrieve all conversations for the authenticated user.
+
+    All conversations are returned, most recently used first, unless the
+    "limit" or "before" query parameters are specified. Then one page of
+    conversations is returned together with "next_cursor" to be passed as
+    "before" to get the next page. Conversations of all users are always
+    returned by pages, of the default size unless "limit" is specified.
+    """
     check_configuration_loaded(configuration)
 
     user_id = auth[0]
 
     logger.info("Retrieving conversations for user %s", user_id)
 
-    with get_session() as session:
-        try:
-            query = session.query(UserConversation)
+    list_others = Action.LIST_OTHERS_CONVERSATIONS in request.state.authorized_actions
+    limit = page.limit
+    if list_others and limit is None:
+        # conversations of all users can be too numerous to be returned at once
+        limit = CONVERSATIONS_PAGE_DEFAULT_LIMIT
+    statement = conversations_list_statement(
+        None if list_others else user_id,
+        decode_conversation_cursor(page.before) if page.before else None,
+        # one more conversation tells whether there is a next page
+        limit + 1 if limit else None,
+    )
 
-            filtered_query = (
-                query
-                if Action.LIST_OTHERS_CONVERSATIONS in request.state.authorized_actions
-                else query.filter_by(user_id=user_id)
+    # conversations of all users are spread across shards of the database
+    sessions = (
+        get_async_sessions(user_id, read_only=True)
+        if list_others
+        else [get_async_session(user_id, read_only=True)]
+    )
+    try:
+        rows: list[Row] = []
+        for session in sessions:
+            async with session:
+                rows.extend((await session.execute(statement)).all())
+        if len(sessions) > 1:
+            # every shard has returned the first page of its conversations
+            rows.sort(key=lambda row: (row.last_message_at, row.id), reverse=True)
+
+        next_cursor = None
+        if limit and len(rows) > limit:
+            rows = rows[:limit]
+            next_cursor = encode_conversation_cursor(
+                rows[-1].last_message_at, rows[-1].id
             )
+        # Return conversation summaries with metadata
+        conversations = [_conversation_details(row) for row in rows]
 
-            user_conversations = filtered_query.all()
-
-            # Return conversation summaries with metadata
-            conversations = [
-                ConversationDetails(
-                    conversation_id=conv.id,
-                    created_at=conv.created_at.isoformat() if conv.created_at else None,
-                    last_message_at=(
-                        conv.last_message_at.isoformat()
-                        if conv.last_message_at
-                        else None
-                    ),
-                    message_count=conv.message_count,
-                    last_used_model=conv.last_used_model,
-                    last_used_provider=conv.last_used_provider,
-                    topic_summary=conv.topic_summary,
-                )
-                for conv in user_conversations
-            ]
-
-            logger.info(
-                "Found %d conversations for user %s", len(conversations), user_id
-            )
+        logger.info("Found %d conversations for user %s", len(conversations), user_id)
 
-            return ConversationsListResponse(conversations=conversations)
+        return ConversationsListResponse(
+            conversations=conversations, next_cursor=next_cursor
+        )
 
-        except SQLAlchemyError as e:
-            logger.exception(
-                "Error retrieving conversations for user %s: %s", user_id, e
-            )
-            response = InternalServerErrorResponse.database_error()
-            raise HTTPException(**response.model_dump()) from e
+    except SQLAlchemyError as e:
+        logger.exception("Error retrieving conversations for user %s: %s", user_id, e)
+        response = InternalServerErrorResponse.database_error()
+        raise HTTPException(**response.model_dump()) from e
 
 
 @router.get(
@@ -223,12 +265,13 @@ async def get_conversation_endpoint_handler(  # pylint: disable=too-many-locals,
     )
 
     user_id = auth[0]
-    conversation = validate_and_retrieve_conversation(
+    conversation = await validate_and_retrieve_conversation(
         normalized_conv_id=normalized_conv_id,
         user_id=user_id,
         others_allowed=(
             Action.READ_OTHERS_CONVERSATIONS in request.state.authorized_actions
         ),
+        read_only=True,
     )
     logger.info(
         "Retrieving conversation %s using Conversations API", normalized_conv_id
@@ -245,7 +288,9 @@ async def get_conversation_endpoint_handler(  # pylint: disable=too-many-locals,
         )
 
         # Retrieve turns metadata from database (can be empty for legacy conversations)
-        db_turns = retrieve_conversation_turns(normalized_conv_id)
+        db_turns = await retrieve_conversation_turns(
+            normalized_conv_id, conversation.user_id, read_only=True
+        )
 
         # Use Conversations API to retrieve conversation items
         items = await get_all_conversation_items(client, llama_stack_conv_id)
@@ -330,7 +375,7 @@ async def delete_conversation_endpoint_handler(
 
     # Check if user has access to delete this conversation
     user_id = auth[0]
-    if not can_access_conversation(
+    if not await can_access_conversation(
         normalized_conv_id,
         user_id,
         others_allowed=(
@@ -351,7 +396,7 @@ async def delete_conversation_endpoint_handler(
 
     # If reached this, user is authorized to delete this conversation
     try:
-        local_deleted = delete_conversation(normalized_conv_id)
+        local_deleted = await delete_conversation(normalized_conv_id)
         if not local_deleted:
             logger.info(
                 "Conversation %s not found locally when deleting.",
@@ -441,7 +486,7 @@ async def update_conversation_endpoint_handler(
     normalized_conv_id = normalize_conversation_id(conversation_id)
 
     user_id = auth[0]
-    if not can_access_conversation(
+    if not await can_access_conversation(
         normalized_conv_id,
         user_id,
         others_allowed=(
@@ -460,7 +505,7 @@ async def update_conversation_endpoint_handler(
 
     # If reached this, user is authorized to update this conversation
     try:
-        conversation = retrieve_conversation(normalized_conv_id)
+        conversation = await retrieve_conversation(normalized_conv_id, user_id)
         if conversation is None:
             response = NotFoundResponse(
                 resource="conversation", resource_id=normalized_conv_id
@@ -502,13 +547,13 @@ async def update_conversation_endpoint_handler(
         )
 
         # Also update in local database
-        with get_session() as session:
-            db_conversation = (
-                session.query(UserConversation).filter_by(id=normalized_conv_id).first()
-            )
+        async with get_async_session(conversation.user_id) as session:
+            db_conversation = await session.get(UserConversation, normalized_conv_id)
             if db_conversation:
                 db_conversation.topic_summary = update_request.topic_summary
-                session.commit()
+                await session.commit()
+                conversation_metadata_cache.invalidate(normalized_conv_id)
+                record_user_write(db_conversation.user_id)
                 logger.info(
                     "Successfully updated topic summary in local database for conversation %s",
                     normalized_conv_id,
@@ -1,15 +1,20 @@
 """Handler for REST API calls to manage conversation history."""
 
-from typing import Any
+from typing import Annotated, Any
 
-from fastapi import APIRouter, Depends, HTTPException, Request
+from fastapi import APIRouter, Depends, HTTPException, Query, Request
 
 from authentication import get_auth_dependency
 from authorization.middleware import authorize
 from cache.cache_entry import CacheEntry
 from configuration import configuration
+from constants import CONVERSATIONS_PAGE_DEFAULT_LIMIT
 from log import get_logger
-from models.api.requests import ConversationUpdateRequest
+from models.api.requests import (
+    ConversationPageParams,
+    ConversationsListPageParams,
+    ConversationUpdateRequest,
+)
 from models.api.responses.constants import UNAUTHORIZED_OPENAPI_EXAMPLES
 from models.api.responses.error import (
     BadRequestResponse,
@@ -88,8 +93,17 @@ conversation_update_responses: dict[int | str, dict[str, Any]] = {
 async def get_conversations_list_endpoint_handler(
     request: Request,  # pylint: disable=unused-argument
     auth: Any = Depends(get_auth_dependency()),
+    page: Annotated[
+        ConversationsListPageParams, Query()
+    ] = ConversationsListPageParams(),
 ) -> ConversationsListResponseV2:
-    """Handle request to retrieve all conversations for the authenticated user."""
+    """Handle request to retrieve conversations for the authenticated user.
+
+    All conversations are returned, most recent first, unless the "limit" or
+    "before" query parameters are specified. Then one page of conversations
+    is returned together with "next_cursor" to be passed as "before" to get
+    the next page.
+    """
     check_configuration_loaded(configuration)
 
     user_id = auth[0]
@@ -103,10 +117,28 @@ async def get_conversations_list_endpoint_handler(
         response = InternalServerErrorResponse.cache_unavailable()
         raise HTTPException(**response.model_dump())
 
-    conversations = configuration.conversation_cache.list(user_id, skip_userid_check)
-    logger.info("Conversations for user %s: %s", user_id, len(conversations))
+    if page.limit is None and page.before is None:
+        conversations = await configuration.async_conversation_cache.list(
+            user_id, skip_userid_check
+        )
+        logger.info("Conversations for user %s: %s", user_id, len(conversations))
+        return ConversationsListResponseV2(conversations=conversations)
 
-    return ConversationsListResponseV2(conversations=conversations)
+    conversations_page = await configuration.async_conversation_cache.list_page(
+        user_id,
+        page.before,
+        page.limit or CONVERSATIONS_PAGE_DEFAULT_LIMIT,
+        skip_userid_check,
+    )
+    logger.info(
+        "Conversations for user %s on page: %s",
+        user_id,
+        len(conversations_page.conversations),
+    )
+    return ConversationsListResponseV2(
+        conversations=conversations_page.conversations,
+        next_cursor=conversations_page.next_cursor,
+    )
 
 
 @router.get(
@@ -118,8 +150,15 @@ async def get_conversation_endpoint_handler(
     request: Request,  # pylint: disable=unused-argument
     conversation_id: str,
     auth: Any = Depends(get_auth_dependency()),
+    page: Annotated[ConversationPageParams, Query()] = ConversationPageParams(),
 ) -> ConversationResponse:
-    """Handle request to retrieve a conversation identified by its ID."""
+    """Handle request to retrieve a conversation identified by its ID.
+
+    The whole chat history is returned, oldest turn first, unless the "limit"
+    or "after" query parameters are specified. Then one page of the history
+    is returned together with "next_cursor" to be passed as "after" to get
+    the next page.
+    """
     check_configuration_loaded(configuration)
     check_valid_conversation_id(conversation_id)
 
@@ -133,18 +172,32 @@ async def get_conversation_endpoint_handler(
         response = InternalServerErrorResponse.cache_unavailable()
         raise HTTPException(**response.model_dump())
 
-    check_conversation_existence(user_id, conversation_id)
+    await check_conversation_existence(user_id, conversation_id, skip_userid_check)
 
-    conversation = configuration.conversation_cache.get(
-        user_id, conversation_id, skip_userid_check
-    )
+    next_cursor = None
+    if page.limit is None and page.after is None:
+        conversation = await configuration.async_conversation_cache.get(
+            user_id, conversation_id, skip_userid_check
+        )
+    else:
+        history_page = await configuration.async_conversation_cache.get_page(
+            user_id,
+            conversation_id,
+            page.after,
+            page.limit or CONVERSATIONS_PAGE_DEFAULT_LIMIT,
+            skip_userid_check,
+        )
+        conversation = history_page.entries
+        next_cursor = history_page.next_cursor
     # Each entry in conversation is a single turn
     chat_history: list[ConversationTurn] = [
         build_conversation_turn_from_cache_entry(entry) for entry in conversation
     ]
 
     return ConversationResponse(
-        conversation_id=conversation_id, chat_history=chat_history
+        conversation_id=conversation_id,
+        chat_history=chat_history,
+        next_cursor=next_cursor,
     )
 
 
@@ -172,7 +225,7 @@ async def delete_conversation_endpoint_handler(
         raise HTTPException(**response.model_dump())
 
     logger.info("Deleting conversation %s for user %s", conversation_id, user_id)
-    deleted = configuration.conversation_cache.delete(
+    deleted = await configuration.async_conversation_cache.delete(
         user_id, conversation_id, skip_userid_check
     )
     return ConversationDeleteResponse(deleted=deleted, conversation_id=conversation_id)
@@ -203,10 +256,10 @@ async def update_conversation_endpoint_handler(
         response = InternalServerErrorResponse.cache_unavailable()
         raise HTTPException(**response.model_dump())
 
-    check_conversation_existence(user_id, conversation_id)
+    await check_conversation_existence(user_id, conversation_id, skip_userid_check)
 
     # Update the topic summary in the cache
-    configuration.conversation_cache.set_topic_summary(
+    await configuration.async_conversation_cache.set_topic_summary(
         user_id, conversation_id, update_request.topic_summary, skip_userid_check
     )
 
@@ -233,14 +286,20 @@ def check_valid_conversation_id(conversation_id: str) -> None:
         raise HTTPException(**response.model_dump())
 
 
-def check_conversation_existence(user_id: str, conversation_id: str) -> None:
-    """Check if conversation exists."""
+async def check_conversation_existence(
+    user_id: str, conversation_id: str, skip_userid_check: bool
+) -> None:
+    """Check if conversation exists.
+
+    The conversation is looked up by its key, so the check does not depend
+    on the number of user's conversations.
+    """
     # checked already, but we need to make pyright happy
     if configuration.conversation_cache_configuration.type is None:
         return
-    conversations = configuration.conversation_cache.list(user_id, False)
-    conversation_ids = [conv.conversation_id for conv in conversations]
-    if conversation_id not in conversation_ids:
+    if not await configuration.async_conversation_cache.exists(
+        user_id, conversation_id, skip_userid_check
+    ):
         logger.error("No conversation found for conversation ID %s", conversation_id)
         response = NotFoundResponse(
             resource="conversation", resource_id=conversation_id
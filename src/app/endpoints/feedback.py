@@ -125,7 +125,7 @@ async def feedback_endpoint_handler(
 
     # Validate conversation exists and belongs to the user
     conversation_id = feedback_request.conversation_id
-    conversation = retrieve_conversation(conversation_id)
+    conversation = await retrieve_conversation(conversation_id, user_id, read_only=True)
     if conversation is None:
         response = NotFoundResponse(
             resource="conversation", resource_id=conversation_id
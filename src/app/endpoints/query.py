@@ -1,5 +1,6 @@
 """Handler for REST API call to provide answer to query using Response API."""
 
+import asyncio
 import datetime
 from typing import Annotated, Any
 
@@ -46,14 +47,17 @@ from utils.otel_tracing import (
     anonymize_value,
     set_span_attributes,
 )
+from utils.persistence_pipeline import TurnRecord, get_persistence_pipeline
 from utils.query import (
     consume_query_tokens,
     prepare_input,
+    release_query_tokens,
+    reserve_query_tokens,
     store_query_results,
     validate_attachments_metadata,
     validate_model_provider_override,
 )
-from utils.quota_utils import check_tokens_available, get_available_quotas
+from utils.quota_utils import get_available_quotas
 from utils.responses import (
     deduplicate_referenced_documents,
     maybe_get_topic_summary,
@@ -170,9 +174,6 @@ async def _handle_query_with_tracing(
     # Check MCP Auth
     await check_mcp_auth(configuration, mcp_headers, token, request.headers)
 
-    # Check token availability
-    check_tokens_available(configuration.quota_limiters, user_id)
-
     # Enforce RBAC: optionally disallow overriding model/provider in requests
     validate_model_provider_override(
         query_request.model, query_request.provider, request.state.authorized_actions
@@ -195,7 +196,7 @@ async def _handle_query_with_tracing(
             "Conversation ID specified in query: %s", query_request.conversation_id
         )
         normalized_conv_id = normalize_conversation_id(query_request.conversation_id)
-        user_conversation = validate_and_retrieve_conversation(
+        user_conversation = await validate_and_retrieve_conversation(
             normalized_conv_id=normalized_conv_id,
             user_id=user_id,
             others_allowed=Action.READ_OTHERS_CONVERSATIONS
@@ -208,129 +209,179 @@ async def _handle_query_with_tracing(
     # context, to avoid false positives from retrieved document content.
     endpoint_path = ENDPOINT_PATH_QUERY
     moderation_input = prepare_input(query_request)
-    moderation_result = await run_shield_moderation(
-        client, moderation_input, endpoint_path, query_request.shield_ids
-    )
-
-    # Build RAG context from Inline RAG sources
-    inline_rag_context = await build_rag_context(
-        client,
-        moderation_result.decision,
-        query_request.query,
-        query_request.vector_store_ids,
-        query_request.solr,
-    )
-
-    # Prepare API request parameters
-    responses_params = await prepare_responses_params(
-        client,
-        query_request,
-        user_conversation,
-        token,
-        mcp_headers,
-        stream=False,
-        store=True,
-        request_headers=request.headers,
-        inline_rag_context=inline_rag_context.context_text,
-    )
 
-    # Compact the conversation if it is approaching the context window limit.
-    # When compaction is active, params carry explicit input and the
-    # conversation parameter is dropped (lightspeed-stack owns the context).
-    compaction = await apply_compaction_blocking(
-        client,
-        responses_params,
-        configuration.inference,
-        configuration.compaction,
-        cache=configured_conversation_cache(),
-        user_id=user_id,
-        skip_user_id_check=_skip_userid_check,
+    # Reserve tokens for the query input, or check token availability
+    quota_reservations = await asyncio.to_thread(
+        reserve_query_tokens, user_id, moderation_input
     )
-    responses_params = compaction.params
-
-    # Handle Azure token refresh if needed
-    if (
-        responses_params.model.startswith("azure")
-        and AzureEntraIDManager().is_entra_id_configured
-        and AzureEntraIDManager().is_token_expired
-        and AzureEntraIDManager().refresh_token()
-    ):
-        client = await AsyncOgxClientHolder().update_azure_token()
-
-    # Extract image attachments for multimodal support
-    image_attachments = [
-        a
-        for a in (query_request.attachments or [])
-        if a.content_type in IMAGE_CONTENT_TYPES
-    ] or None
-
-    # Retrieve response using Responses API
-    turn_summary = await retrieve_agent_response(
-        client,
-        responses_params,
-        moderation_result,
-        endpoint_path,
-        compaction.original_input if compaction.compacted else None,
-        shield_ids=query_request.shield_ids,
-        no_tools=bool(query_request.no_tools),
-        image_attachments=image_attachments,
-    )
-
-    if moderation_result.decision == "passed":
-        # Combine inline RAG results (BYOK + Solr) with tool-based RAG results for the transcript
-        rag_chunks = inline_rag_context.rag_chunks
-        tool_rag_chunks = turn_summary.rag_chunks
-        logger.info("RAG as a tool retrieved %d chunks", len(tool_rag_chunks))
-        turn_summary.rag_chunks = rag_chunks + tool_rag_chunks
-
-        # Add tool-based RAG documents and chunks
-        rag_documents = inline_rag_context.referenced_documents
-        tool_rag_documents = turn_summary.referenced_documents
-        turn_summary.referenced_documents = deduplicate_referenced_documents(
-            rag_documents + tool_rag_documents
+    # reserved tokens are returned when the query fails before they are settled
+    quota_settled = False
+    try:
+        moderation_result = await run_shield_moderation(
+            client, moderation_input, endpoint_path, query_request.shield_ids
         )
 
-    # Get topic summary for new conversation
-    should_generate = not user_conversation and bool(
-        query_request.generate_topic_summary
-    )
-    topic_summary = await maybe_get_topic_summary(
-        generate_topic_summary=should_generate,
-        input_text=query_request.query,
-        client=client,
-        model_id=responses_params.model,
-    )
-
-    logger.info("Consuming tokens")
-    consume_query_tokens(
-        user_id=user_id,
-        model_id=responses_params.model,
-        token_usage=turn_summary.token_usage,
-    )
+        # Build RAG context from Inline RAG sources
+        inline_rag_context = await build_rag_context(
+            client,
+            moderation_result.decision,
+            query_request.query,
+            query_request.vector_store_ids,
+            query_request.solr,
+        )
 
-    logger.info("Getting available quotas")
-    available_quotas = get_available_quotas(
-        quota_limiters=configuration.quota_limiters, user_id=user_id
-    )
+        # Prepare API request parameters
+        responses_params = await prepare_responses_params(
+            client,
+            query_request,
+            user_conversation,
+            token,
+            mcp_headers,
+            stream=False,
+            store=True,
+            request_headers=request.headers,
+            inline_rag_context=inline_rag_context.context_text,
+        )
 
-    completed_at = datetime.datetime.now(datetime.UTC).strftime("%Y-%m-%dT%H:%M:%SZ")
-    conversation_id = normalize_conversation_id(responses_params.conversation)
+        # Compact the conversation if it is approaching the context window limit.
+        # When compaction is active, params carry explicit input and the
+        # conversation parameter is dropped (lightspeed-stack owns the context).
+        compaction = await apply_compaction_blocking(
+            client,
+            responses_params,
+            configuration.inference,
+            configuration.compaction,
+            cache=configured_conversation_cache(),
+            user_id=user_id,
+            skip_user_id_check=_skip_userid_check,
+        )
+        responses_params = compaction.params
+
+        # Handle Azure token refresh if needed
+        if (
+            responses_params.model.startswith("azure")
+            and AzureEntraIDManager().is_entra_id_configured
+            and AzureEntraIDManager().is_token_expired
+            and AzureEntraIDManager().refresh_token()
+        ):
+            client = await AsyncOgxClientHolder().update_azure_token()
+
+        # Extract image attachments for multimodal support
+        image_attachments = [
+            a
+            for a in (query_request.attachments or [])
+            if a.content_type in IMAGE_CONTENT_TYPES
+        ] or None
+
+        # Retrieve response using Responses API
+        turn_summary = await retrieve_agent_response(
+            client,
+            responses_params,
+            moderation_result,
+            endpoint_path,
+            compaction.original_input if compaction.compacted else None,
+            shield_ids=query_request.shield_ids,
+            no_tools=bool(query_request.no_tools),
+            image_attachments=image_attachments,
+        )
 
-    logger.info("Storing query results")
-    store_query_results(
-        user_id=user_id,
-        conversation_id=conversation_id,
-        model=responses_params.model,
-        started_at=started_at,
-        completed_at=completed_at,
-        summary=turn_summary,
-        query=query_request.query,
-        attachments=query_request.attachments,
-        skip_userid_check=_skip_userid_check,
-        topic_summary=topic_summary,
-    )
-    # Emit turn persisted event immediately after storing
-    add_span_event(root_span, SpanEvents.TURN_PERSISTED)
+        if moderation_result.decision == "passed":
+            # Combine inline RAG results (BYOK + Solr) with tool-based RAG results for the transcript
+            rag_chunks = inline_rag_context.rag_chunks
+            tool_rag_chunks = turn_summary.rag_chunks
+            logger.info("RAG as a tool retrieved %d chunks", len(tool_rag_chunks))
+            turn_summary.rag_chunks = rag_chunks + tool_rag_chunks
+
+            # Add tool-based RAG documents and chunks
+            rag_documents = inline_rag_context.referenced_documents
+            tool_rag_documents = turn_summary.referenced_documents
+            turn_summary.referenced_documents = deduplicate_referenced_documents(
+                rag_documents + tool_rag_documents
+            )
+
+        # Get topic summary for new conversation
+        should_generate = not user_conversation and bool(
+            query_request.generate_topic_summary
+        )
+        conversation_id = normalize_conversation_id(responses_params.conversation)
+
+        pipeline = get_persistence_pipeline()
+        if pipeline is not None:
+            # the turn is consumed by the pipeline, quotas are reported before that
+            available_quotas = await asyncio.to_thread(
+                get_available_quotas,
+                quota_limiters=configuration.quota_limiters,
+                user_id=user_id,
+            )
+            completed_at = datetime.datetime.now(datetime.UTC).strftime(
+                "%Y-%m-%dT%H:%M:%SZ"
+            )
+            logger.info("Queuing query results to be stored")
+            record = TurnRecord(
+                user_id=user_id,
+                conversation_id=conversation_id,
+                model=responses_params.model,
+                started_at=started_at,
+                completed_at=completed_at,
+                summary=turn_summary,
+                query=query_request.query,
+                skip_userid_check=_skip_userid_check,
+                attachments=query_request.attachments,
+                generate_topic_summary=should_generate,
+                quota_reservations=quota_reservations,
+            )
+            journal_path = await pipeline.journal(record)
+            # the journaled turn settles the reservations, even after a restart
+            quota_settled = True
+            await pipeline.queue(journal_path, record)
+            add_span_event(root_span, SpanEvents.TURN_QUEUED)
+        else:
+            topic_summary = await maybe_get_topic_summary(
+                generate_topic_summary=should_generate,
+                input_text=query_request.query,
+                client=client,
+                model_id=responses_params.model,
+            )
+
+            logger.info("Consuming tokens")
+            await asyncio.to_thread(
+                consume_query_tokens,
+                user_id=user_id,
+                model_id=responses_params.model,
+                token_usage=turn_summary.token_usage,
+                quota_reservations=quota_reservations,
+            )
+            quota_settled = True
+
+            logger.info("Getting available quotas")
+            available_quotas = await asyncio.to_thread(
+                get_available_quotas,
+                quota_limiters=configuration.quota_limiters,
+                user_id=user_id,
+            )
+
+            completed_at = datetime.datetime.now(datetime.UTC).strftime(
+                "%Y-%m-%dT%H:%M:%SZ"
+            )
+
+            logger.info("Storing query results")
+            await store_query_results(
+                user_id=user_id,
+                conversation_id=conversation_id,
+                model=responses_params.model,
+                started_at=started_at,
+                completed_at=completed_at,
+                summary=turn_summary,
+                query=query_request.query,
+                attachments=query_request.attachments,
+                skip_userid_check=_skip_userid_check,
+                topic_summary=topic_summary,
+            )
+            # Emit turn persisted event immediately after storing
+            add_span_event(root_span, SpanEvents.TURN_PERSISTED)
+    finally:
+        if not quota_settled:
+            await asyncio.to_thread(release_query_tokens, quota_reservations)
 
     logger.info("Building final response")
 
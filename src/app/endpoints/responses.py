@@ -2,6 +2,7 @@
 
 """Handler for REST API call to provide answer using Responses API (LCORE specification)."""
 
+import asyncio
 import json
 import time
 from collections.abc import AsyncIterator, Sequence
@@ -283,7 +284,7 @@ async def _append_previous_response_turn(
         )
 
 
-def _store_response_query_results(
+async def _store_response_query_results(
     api_params: ResponsesApiParams,
     context: ResponsesContext,
     turn_summary: TurnSummary,
@@ -302,7 +303,7 @@ def _store_response_query_results(
     if not api_params.store:
         return
     user_id, _, skip_userid_check, _ = context.auth
-    store_query_results(
+    await store_query_results(
         user_id=user_id,
         conversation_id=normalize_conversation_id(api_params.conversation),
         model=api_params.model,
@@ -371,7 +372,9 @@ async def responses_endpoint_handler(
     await check_mcp_auth(configuration, mcp_headers, token, request.headers)
 
     # Check token availability
-    check_tokens_available(configuration.quota_limiters, user_id)
+    await asyncio.to_thread(
+        check_tokens_available, configuration.quota_limiters, user_id
+    )
 
     # Enforce RBAC: optionally disallow overriding model in requests
     validate_model_provider_override(
@@ -633,8 +636,10 @@ async def shield_violation_generator(
         SSE-formatted strings for streaming events, ending with [DONE]
     """
     normalized_conv_id = normalize_conversation_id(api_params.conversation)
-    available_quotas = get_available_quotas(
-        quota_limiters=configuration.quota_limiters, user_id=context.auth[0]
+    available_quotas = await asyncio.to_thread(
+        get_available_quotas,
+        quota_limiters=configuration.quota_limiters,
+        user_id=context.auth[0],
     )
     moderation_result = cast(ShieldModerationBlocked, context.moderation_result)
 
@@ -958,14 +963,16 @@ async def response_generator(
                     api_params.model,
                     context.endpoint_path,
                 )
-                consume_query_tokens(
+                await asyncio.to_thread(
+                    consume_query_tokens,
                     user_id=context.auth[0],
                     model_id=api_params.model,
                     token_usage=turn_summary.token_usage,
                 )
 
                 # Get available quotas after token consumption
-                chunk_dict["response"]["available_quotas"] = get_available_quotas(
+                chunk_dict["response"]["available_quotas"] = await asyncio.to_thread(
+                    get_available_quotas,
                     quota_limiters=configuration.quota_limiters,
                     user_id=context.auth[0],
                 )
@@ -1035,7 +1042,7 @@ async def generate_response(
         model_id=api_params.model,
     )
     completed_at = datetime.now(UTC)
-    _store_response_query_results(
+    await _store_response_query_results(
         api_params,
         context,
         turn_summary,
@@ -1103,7 +1110,8 @@ async def handle_non_streaming_response(
                 api_response.usage, api_params.model, context.endpoint_path
             )
             logger.info("Consuming tokens")
-            consume_query_tokens(
+            await asyncio.to_thread(
+                consume_query_tokens,
                 user_id=user_id,
                 model_id=api_params.model,
                 token_usage=token_usage,
@@ -1134,8 +1142,10 @@ async def handle_non_streaming_response(
 
     # Get available quotas
     logger.info("Getting available quotas")
-    available_quotas = get_available_quotas(
-        quota_limiters=configuration.quota_limiters, user_id=user_id
+    available_quotas = await asyncio.to_thread(
+        get_available_quotas,
+        quota_limiters=configuration.quota_limiters,
+        user_id=user_id,
     )
     topic_summary = await maybe_get_topic_summary(
         generate_topic_summary=context.generate_topic_summary,
@@ -1159,7 +1169,7 @@ async def handle_non_streaming_response(
     )
     turn_summary.rag_chunks.extend(context.inline_rag_context.rag_chunks)
     completed_at = datetime.now(UTC)
-    _store_response_query_results(
+    await _store_response_query_results(
         api_params,
         context,
         turn_summary,
@@ -4,6 +4,7 @@ This module provides the /infer endpoint for stateless inference requests
 from the RHEL Lightspeed Command Line Assistant (CLA).
 """
 
+import asyncio
 import functools
 import time
 from datetime import UTC, datetime
@@ -691,7 +692,9 @@ async def infer_endpoint(  # pylint: disable=R0914,R0915
             request_id,
             configuration.rlsapi_v1.quota_subject,
         )
-        check_tokens_available(configuration.quota_limiters, quota_id)
+        await asyncio.to_thread(
+            check_tokens_available, configuration.quota_limiters, quota_id
+        )
         logger.info(
             "Quota availability check passed for rlsapi v1 request %s", request_id
         )
@@ -803,7 +806,8 @@ async def infer_endpoint(  # pylint: disable=R0914,R0915
             token_usage.input_tokens,
             token_usage.output_tokens,
         )
-        consume_query_tokens(
+        await asyncio.to_thread(
+            consume_query_tokens,
             user_id=quota_id,
             model_id=model_id,
             token_usage=token_usage,
@@ -3,7 +3,6 @@
 from typing import Annotated, Any
 
 from fastapi import APIRouter, Depends, HTTPException, Request, status
-from fastapi.concurrency import run_in_threadpool
 from sqlalchemy.exc import SQLAlchemyError
 
 from authentication import get_auth_dependency
@@ -168,7 +167,7 @@ async def list_saved_prompts_handler(
     logger.info("Retrieving saved prompts")
 
     try:
-        rows = await run_in_threadpool(list_saved_prompts_by_user, user_id)
+        rows = await list_saved_prompts_by_user(user_id)
         prompts = [SavedPromptResponse.model_validate(row) for row in rows]
     except SQLAlchemyError as exc:
         logger.exception("Error retrieving saved prompts")
@@ -242,8 +241,7 @@ async def create_saved_prompts_handler(
     logger.info("Creating saved prompt")
 
     try:
-        row = await run_in_threadpool(
-            create_saved_prompt,
+        row = await create_saved_prompt(
             user_id,
             name,
             body.content,
@@ -322,8 +320,7 @@ async def delete_saved_prompts_handler(
     logger.info("Deleting saved prompt id=%s", prompt_id)
 
     try:
-        await run_in_threadpool(
-            delete_saved_prompt_by_id_and_user,
+        await delete_saved_prompt_by_id_and_user(
             prompt_id,
             user_id,
         )
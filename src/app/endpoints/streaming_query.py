@@ -78,10 +78,11 @@ from utils.query import (
     handle_known_apistatus_errors,
     is_context_length_error,
     prepare_input,
+    release_query_tokens,
+    reserve_query_tokens,
     validate_attachments_metadata,
     validate_model_provider_override,
 )
-from utils.quota_utils import check_tokens_available
 from utils.responses import (
     deduplicate_referenced_documents,
     extract_vector_store_ids_from_tools,
@@ -219,9 +220,6 @@ async def _handle_streaming_query_with_tracing(  # pylint: disable=too-many-loca
     # Check MCP Auth
     await check_mcp_auth(configuration, mcp_headers, token, request.headers)
 
-    # Check token availability
-    check_tokens_available(configuration.quota_limiters, user_id)
-
     # Enforce RBAC: optionally disallow overriding model/provider in requests
     validate_model_provider_override(
         query_request.model, query_request.provider, request.state.authorized_actions
@@ -244,7 +242,7 @@ async def _handle_streaming_query_with_tracing(  # pylint: disable=too-many-loca
             "Conversation ID specified in query: %s", query_request.conversation_id
         )
         normalized_conv_id = normalize_conversation_id(query_request.conversation_id)
-        user_conversation = validate_and_retrieve_conversation(
+        user_conversation = await validate_and_retrieve_conversation(
             normalized_conv_id=normalized_conv_id,
             user_id=user_id,
             others_allowed=Action.READ_OTHERS_CONVERSATIONS
@@ -257,126 +255,146 @@ async def _handle_streaming_query_with_tracing(  # pylint: disable=too-many-loca
     # context, to avoid false positives from retrieved document content.
     moderation_input = prepare_input(query_request)
     endpoint_path = ENDPOINT_PATH_STREAMING_QUERY
-    moderation_result = await run_shield_moderation(
-        client, moderation_input, endpoint_path, query_request.shield_ids
-    )
 
-    # Build RAG context from Inline RAG sources
-    inline_rag_context = await build_rag_context(
-        client,
-        moderation_result.decision,
-        query_request.query,
-        query_request.vector_store_ids,
-        query_request.solr,
+    # Reserve tokens for the query input, or check token availability
+    quota_reservations = await asyncio.to_thread(
+        reserve_query_tokens, user_id, moderation_input
     )
+    # reserved tokens are returned when the query fails before they are settled
+    try:
+        moderation_result = await run_shield_moderation(
+            client, moderation_input, endpoint_path, query_request.shield_ids
+        )
 
-    # Prepare API request parameters
-    responses_params = await prepare_responses_params(
-        client=client,
-        query_request=query_request,
-        user_conversation=user_conversation,
-        token=token,
-        mcp_headers=mcp_headers,
-        stream=True,
-        store=True,
-        request_headers=request.headers,
-        inline_rag_context=inline_rag_context.context_text,
-    )
+        # Build RAG context from Inline RAG sources
+        inline_rag_context = await build_rag_context(
+            client,
+            moderation_result.decision,
+            query_request.query,
+            query_request.vector_store_ids,
+            query_request.solr,
+        )
 
-    # Handle Azure token refresh if needed
-    if (
-        responses_params.model.startswith("azure")
-        and AzureEntraIDManager().is_entra_id_configured
-        and AzureEntraIDManager().is_token_expired
-        and AzureEntraIDManager().refresh_token()
-    ):
-        client = await AsyncOgxClientHolder().update_azure_token()
-
-    request_id = get_suid()
-
-    # Create context with index identification mapping for RAG source resolution
-    context = ResponseGeneratorContext(
-        conversation_id=normalize_conversation_id(responses_params.conversation),
-        request_id=request_id,
-        model_id=responses_params.model,
-        user_id=user_id,
-        skip_userid_check=_skip_userid_check,
-        query_request=query_request,
-        started_at=started_at,
-        client=client,
-        moderation_result=moderation_result,
-        vector_store_ids=extract_vector_store_ids_from_tools(responses_params.tools),
-        rag_id_mapping=configuration.rag_id_mapping,
-        inline_rag_context=inline_rag_context,
-    )
+        # Prepare API request parameters
+        responses_params = await prepare_responses_params(
+            client=client,
+            query_request=query_request,
+            user_conversation=user_conversation,
+            token=token,
+            mcp_headers=mcp_headers,
+            stream=True,
+            store=True,
+            request_headers=request.headers,
+            inline_rag_context=inline_rag_context.context_text,
+        )
 
-    # Update metrics for the LLM call
-    provider_id, model_id = extract_provider_and_model_from_model_id(
-        responses_params.model
-    )
-    recording.record_llm_call(provider_id, model_id, endpoint_path)
-
-    # Extract image attachments for multimodal support
-    image_attachments = [
-        a
-        for a in (query_request.attachments or [])
-        if a.content_type in IMAGE_CONTENT_TYPES
-    ] or None
-
-    response_media_type = (
-        MEDIA_TYPE_TEXT
-        if query_request.media_type == MEDIA_TYPE_TEXT
-        else MEDIA_TYPE_EVENT_STREAM
-    )
+        # Handle Azure token refresh if needed
+        if (
+            responses_params.model.startswith("azure")
+            and AzureEntraIDManager().is_entra_id_configured
+            and AzureEntraIDManager().is_token_expired
+            and AzureEntraIDManager().refresh_token()
+        ):
+            client = await AsyncOgxClientHolder().update_azure_token()
 
-    # Only conversations that actually compact (already have a summary marker,
-    # or would trigger one now) take the compaction-aware path, where the
-    # response is created inside the SSE stream so the progress event can be
-    # flushed before the summarization LLM call. Every other request keeps the
-    # unchanged path: the response stream is created here, so create-time errors
-    # surface as HTTP responses exactly as before.
-    if await needs_compaction_path(
-        context.client,
-        responses_params,
-        configuration.inference,
-        configuration.compaction,
-    ):
-        return StreamingResponse(
-            generate_response_with_compaction(
-                context=context,
-                responses_params=responses_params,
-                endpoint_path=endpoint_path,
-                image_attachments=image_attachments,
-                root_span=root_span,
+        request_id = get_suid()
+
+        # Create context with index identification mapping for RAG source resolution
+        context = ResponseGeneratorContext(
+            conversation_id=normalize_conversation_id(responses_params.conversation),
+            request_id=request_id,
+            model_id=responses_params.model,
+            user_id=user_id,
+            skip_userid_check=_skip_userid_check,
+            query_request=query_request,
+            started_at=started_at,
+            client=client,
+            moderation_result=moderation_result,
+            vector_store_ids=extract_vector_store_ids_from_tools(
+                responses_params.tools
             ),
-            media_type=response_media_type,
+            rag_id_mapping=configuration.rag_id_mapping,
+            inline_rag_context=inline_rag_context,
+            quota_reservations=quota_reservations,
         )
 
-    generator, turn_summary = await retrieve_agent_response_generator(
-        responses_params=responses_params,
-        context=context,
-        endpoint_path=endpoint_path,
-        no_tools=bool(query_request.no_tools),
-        image_attachments=image_attachments,
-    )
-
-    # Combine inline RAG results (BYOK + Solr) with tool-based results
-    if context.moderation_result.decision == "passed":
-        turn_summary.referenced_documents = deduplicate_referenced_documents(
-            inline_rag_context.referenced_documents + turn_summary.referenced_documents
+        # Update metrics for the LLM call
+        provider_id, model_id = extract_provider_and_model_from_model_id(
+            responses_params.model
+        )
+        recording.record_llm_call(provider_id, model_id, endpoint_path)
+
+        # Extract image attachments for multimodal support
+        image_attachments = [
+            a
+            for a in (query_request.attachments or [])
+            if a.content_type in IMAGE_CONTENT_TYPES
+        ] or None
+
+        response_media_type = (
+            MEDIA_TYPE_TEXT
+            if query_request.media_type == MEDIA_TYPE_TEXT
+            else MEDIA_TYPE_EVENT_STREAM
         )
 
-    return StreamingResponse(
-        generate_agent_response(
-            generator=generator,
-            context=context,
+        # Only conversations that actually compact (already have a summary marker,
+        # or would trigger one now) take the compaction-aware path, where the
+        # response is created inside the SSE stream so the progress event can be
+        # flushed before the summarization LLM call. Every other request keeps the
+        # unchanged path: the response stream is created here, so create-time errors
+        # surface as HTTP responses exactly as before.
+        if await needs_compaction_path(
+            context.client,
+            responses_params,
+            configuration.inference,
+            configuration.compaction,
+        ):
+            return StreamingResponse(
+                release_unsettled_tokens(
+                    generate_response_with_compaction(
+                        context=context,
+                        responses_params=responses_params,
+                        endpoint_path=endpoint_path,
+                        image_attachments=image_attachments,
+                        root_span=root_span,
+                    ),
+                    context,
+                ),
+                media_type=response_media_type,
+            )
+
+        generator, turn_summary = await retrieve_agent_response_generator(
             responses_params=responses_params,
-            turn_summary=turn_summary,
-            background_topic_summary_tasks=_background_topic_summary_tasks,
-            root_span=root_span,
-        ),
-        media_type=response_media_type,
-    )
+            context=context,
+            endpoint_path=endpoint_path,
+            no_tools=bool(query_request.no_tools),
+            image_attachments=image_attachments,
+        )
+
+        # Combine inline RAG results (BYOK + Solr) with tool-based results
+        if context.moderation_result.decision == "passed":
+            turn_summary.referenced_documents = deduplicate_referenced_documents(
+                inline_rag_context.referenced_documents
+                + turn_summary.referenced_documents
+            )
+
+        return StreamingResponse(
+            release_unsettled_tokens(
+                generate_agent_response(
+                    generator=generator,
+                    context=context,
+                    responses_params=responses_params,
+                    turn_summary=turn_summary,
+                    background_topic_summary_tasks=_background_topic_summary_tasks,
+                    root_span=root_span,
+                ),
+                context,
+            ),
+            media_type=response_media_type,
+        )
+    except BaseException:
+        await asyncio.to_thread(release_query_tokens, quota_reservations)
+        raise
 
 
 async def shutdown_background_topic_summary_tasks() -> None:
@@ -397,6 +415,29 @@ async def shutdown_background_topic_summary_tasks() -> None:
     await asyncio.gather(*tasks, return_exceptions=True)
 
 
+async def release_unsettled_tokens(
+    stream: AsyncIterator[str], context: ResponseGeneratorContext
+) -> AsyncIterator[str]:
+    """Re-yield a response stream and return tokens it has not settled.
+
+    Tokens reserved for the query are settled when the stream completes.
+    When the stream fails, ends with an error event or is closed by the
+    client before that, the reserved tokens are returned to the quota.
+
+    Args:
+        stream: SSE generator of the response.
+        context: The response generator context holding the reservations.
+
+    Yields:
+        SSE-formatted strings from the wrapped stream.
+    """
+    try:
+        async for event in stream:
+            yield event
+    finally:
+        await asyncio.to_thread(release_query_tokens, context.quota_reservations)
+
+
 async def generate_response_with_compaction(
     context: ResponseGeneratorContext,
     responses_params: ResponsesApiParams,
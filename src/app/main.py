@@ -16,7 +16,7 @@ from starlette.types import ASGIApp, Message, Receive, Scope, Send
 import version
 from a2a_storage import A2AStorageFactory
 from app import routers
-from app.database import create_tables, initialize_database
+from app.database import create_tables, dispose_async_engine, initialize_database
 from app.endpoints.streaming_query import shutdown_background_topic_summary_tasks
 from authorization.azure_token_manager import AzureEntraIDManager
 from client import AsyncOgxClientHolder
@@ -28,6 +28,11 @@ from models.api.responses.error import InternalServerErrorResponse
 from sentry import initialize_sentry
 from utils.degraded_mode import DegradedModeTracker
 from utils.llama_stack_version import check_llama_stack_version
+from utils.persistence_pipeline import (
+    start_persistence_pipeline,
+    stop_persistence_pipeline,
+)
+from utils.postgres_pool import close_postgres_pools
 
 logger = get_logger(__name__)
 
@@ -134,13 +139,22 @@ async def lifespan(_app: FastAPI) -> AsyncIterator[None]:
 
     initialize_database()
     create_tables()
+    await start_persistence_pipeline(configuration.persistence_pipeline_configuration)
 
     yield
 
     # Cleanup resources on shutdown
     try:
+        # drained first, the pipeline writes into database and caches
+        await stop_persistence_pipeline()
         await shutdown_background_topic_summary_tasks()
         await A2AStorageFactory.cleanup()
+        # also stores conversation turns queued in write-behind mode
+        await configuration.close_async_conversation_cache()
+        # writes tokens consumed from quota leases and buffered token usage
+        configuration.close_quota_limiters()
+        close_postgres_pools()
+        await dispose_async_engine()
     finally:
         # Flush pending Sentry events after cleanup so any errors during
         # shutdown are captured before the process exits.
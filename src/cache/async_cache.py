@@ -0,0 +1,310 @@
+"""Abstract class that is parent for all asynchronous cache implementations."""
+
+import builtins
+from abc import ABC, abstractmethod
+from collections.abc import Sequence
+from typing import Optional
+
+from cache.cache import Cache
+from cache.cache_entry import CacheEntry, CacheEntryPage
+from models.common import ConversationData, ConversationDataPage
+from models.compaction import ConversationSummary
+
+
+class AsyncCache(ABC):
+    """Abstract class that is parent for all asynchronous cache implementations.
+
+    The interface mirrors `cache.cache.Cache` method by method, but every
+    operation is a coroutine, so database backed implementations can use
+    native asyncio drivers and never block the event loop. Cache entries are
+    identified by the same compound key that consists of user ID and
+    conversation ID.
+    """
+
+    # separator between parts of compound key
+    COMPOUND_KEY_SEPARATOR = Cache.COMPOUND_KEY_SEPARATOR
+
+    @staticmethod
+    def construct_key(
+        user_id: str, conversation_id: str, skip_user_id_check: bool
+    ) -> str:
+        """Construct key to cache.
+
+        Parameters:
+        ----------
+            user_id (str): User identifier; validated unless `skip_user_id_check` is True.
+            conversation_id (str): Conversation identifier; always validated.
+            skip_user_id_check (bool): When True, skip validation of `user_id`.
+
+        Returns:
+        -------
+            str: Compound key in the form "user_id:conversation_id".
+        """
+        return Cache.construct_key(user_id, conversation_id, skip_user_id_check)
+
+    @abstractmethod
+    async def initialize_cache(self) -> None:
+        """Initialize cache, creating the storage schema when needed."""
+
+    @abstractmethod
+    async def get(
+        self, user_id: str, conversation_id: str, skip_user_id_check: bool
+    ) -> list[CacheEntry]:
+        """Retrieve cache entries for a given user and conversation.
+
+        Parameters:
+        ----------
+            user_id (str): User identifier.
+            conversation_id (str): Conversation identifier scoped to the user.
+            skip_user_id_check (bool): If True, skip validation of `user_id`.
+
+        Returns:
+        -------
+            list[CacheEntry]: List of cache entries for the specified key;
+            empty list if no entries exist.
+        """
+
+    @abstractmethod
+    async def get_page(  # pylint: disable=too-many-arguments,too-many-positional-arguments
+        self,
+        user_id: str,
+        conversation_id: str,
+        after_created_at: Optional[float],
+        limit: int,
+        skip_user_id_check: bool,
+    ) -> CacheEntryPage:
+        """Retrieve one page of conversation history, oldest first.
+
+        Parameters:
+        ----------
+            user_id (str): User identifier.
+            conversation_id (str): Conversation identifier scoped to the user.
+            after_created_at (Optional[float]): Cursor returned with the
+            previous page; None to start with the oldest turn.
+            limit (int): Maximal number of turns on the page.
+            skip_user_id_check (bool): If True, skip validation of `user_id`.
+
+        Returns:
+        -------
+            CacheEntryPage: Turns of the page and cursor of the next page.
+        """
+
+    @abstractmethod
+    async def insert_or_append(
+        self,
+        user_id: str,
+        conversation_id: str,
+        cache_entry: CacheEntry,
+        skip_user_id_check: bool,
+    ) -> None:
+        """Store or append a cache entry for the specified user and conversation.
+
+        Parameters:
+        ----------
+            user_id (str): Identifier of the user.
+            conversation_id (str): Identifier of the conversation within the user's scope.
+            cache_entry (CacheEntry): Cache entry to store or append.
+            skip_user_id_check (bool): If True, skip validation of `user_id`.
+        """
+
+    async def insert_or_append_many(
+        self,
+        entries: Sequence[tuple[str, str, CacheEntry]],
+        skip_user_id_check: bool = False,
+    ) -> None:
+        """Append several cache entries at once.
+
+        The default implementation appends the entries one by one; database
+        backed caches store them in a single transaction.
+
+        Parameters:
+        ----------
+            entries: Triples (user ID, conversation ID, cache entry), oldest first.
+            skip_user_id_check (bool): If True, skip validation of user IDs.
+        """
+        for user_id, conversation_id, cache_entry in entries:
+            await self.insert_or_append(
+                user_id, conversation_id, cache_entry, skip_user_id_check
+            )
+
+    @abstractmethod
+    async def delete(
+        self, user_id: str, conversation_id: str, skip_user_id_check: bool
+    ) -> bool:
+        """Delete all entries for a given conversation.
+
+        Parameters:
+        ----------
+            user_id: User identification.
+            conversation_id: Conversation ID unique for given user.
+            skip_user_id_check: Skip user_id suid check.
+
+        Returns:
+        -------
+            `True` if entries were deleted, `False` if no key was found.
+        """
+
+    @abstractmethod
+    async def list(
+        self, user_id: str, skip_user_id_check: bool
+    ) -> list[ConversationData]:
+        """List all conversations for a given user_id.
+
+        Parameters:
+        ----------
+            user_id (str): User identifier.
+            skip_user_id_check (bool): If True, skip validation of `user_id` before lookup.
+
+        Returns:
+        -------
+            list[ConversationData]: Conversations of the user, most recent first.
+        """
+
+    @abstractmethod
+    async def list_page(
+        self,
+        user_id: str,
+        before: Optional[str],
+        limit: int,
+        skip_user_id_check: bool,
+    ) -> ConversationDataPage:
+        """List one page of conversations for a given user_id, most recent first.
+
+        Parameters:
+        ----------
+            user_id (str): User identifier.
+            before (Optional[str]): Cursor returned with the previous page;
+            None to start with the most recent conversation.
+            limit (int): Maximal number of conversations on the page.
+            skip_user_id_check (bool): If True, skip validation of `user_id`.
+
+        Returns:
+        -------
+            ConversationDataPage: Conversations of the page and cursor of the
+            next page.
+        """
+
+    @abstractmethod
+    async def get_conversation_meta(
+        self, user_id: str, conversation_id: str, skip_user_id_check: bool
+    ) -> Optional[ConversationData]:
+        """Retrieve metadata of one conversation without its history.
+
+        Parameters:
+        ----------
+            user_id (str): User identifier.
+            conversation_id (str): Conversation identifier scoped to the user.
+            skip_user_id_check (bool): If True, skip validation of `user_id`.
+
+        Returns:
+        -------
+            Optional[ConversationData]: Topic summary and last message
+            timestamp of the conversation; None if it does not exist.
+        """
+
+    async def exists(
+        self, user_id: str, conversation_id: str, skip_user_id_check: bool
+    ) -> bool:
+        """Check if the conversation exists.
+
+        Parameters:
+        ----------
+            user_id (str): User identifier.
+            conversation_id (str): Conversation identifier scoped to the user.
+            skip_user_id_check (bool): If True, skip validation of `user_id`.
+
+        Returns:
+        -------
+            bool: True if the conversation exists for the user.
+        """
+        meta = await self.get_conversation_meta(
+            user_id, conversation_id, skip_user_id_check
+        )
+        return meta is not None
+
+    @abstractmethod
+    async def set_topic_summary(
+        self,
+        user_id: str,
+        conversation_id: str,
+        topic_summary: str,
+        skip_user_id_check: bool,
+    ) -> None:
+        """Store topic summary for the given conversation.
+
+        Parameters:
+        ----------
+            user_id (str): User identifier.
+            conversation_id (str): Conversation identifier.
+            topic_summary (str): Text summary of the conversation topic to store.
+            skip_user_id_check (bool): If True, skip validation of `user_id`.
+        """
+
+    @abstractmethod
+    async def store_summary(
+        self,
+        user_id: str,
+        conversation_id: str,
+        summary: ConversationSummary,
+        skip_user_id_check: bool,
+    ) -> None:
+        """Append a conversation-compaction summary chunk to the cache.
+
+        Parameters:
+        ----------
+            user_id (str): User identifier, part of the compound cache key.
+            conversation_id (str): Conversation identifier, part of the compound key.
+            summary (ConversationSummary): The summary chunk to persist.
+            skip_user_id_check (bool): If True, skip validation of `user_id`.
+        """
+
+    @abstractmethod
+    async def get_summaries(
+        self, user_id: str, conversation_id: str, skip_user_id_check: bool
+    ) -> builtins.list[ConversationSummary]:  # this class shadows the list builtin
+        """Retrieve all compaction summary chunks for a conversation.
+
+        Parameters:
+        ----------
+            user_id (str): User identifier, part of the compound cache key.
+            conversation_id (str): Conversation identifier, part of the compound key.
+            skip_user_id_check (bool): If True, skip validation of `user_id`.
+
+        Returns:
+        -------
+            list[ConversationSummary]: Summary chunks for the conversation,
+            oldest first (ordered by ``created_at``); empty list if none exist.
+        """
+
+    @abstractmethod
+    async def replace_summaries(
+        self,
+        user_id: str,
+        conversation_id: str,
+        folded_summary: ConversationSummary,
+        skip_user_id_check: bool,
+    ) -> None:
+        """Replace all stored summary chunks for a conversation with one fold.
+
+        Parameters:
+        ----------
+            user_id (str): User identifier, part of the compound cache key.
+            conversation_id (str): Conversation identifier, part of the compound key.
+            folded_summary (ConversationSummary): The folded summary that
+                supersedes the conversation's existing chunks.
+            skip_user_id_check (bool): If True, skip validation of `user_id`.
+        """
+
+    @abstractmethod
+    def ready(self) -> bool:
+        """Check if the cache is ready.
+
+        Returns:
+            True if the cache is ready, False otherwise.
+        """
+
+    async def close(self) -> None:
+        """Release resources (connection pools etc.) held by the cache.
+
+        The default implementation holds no resources and does nothing.
+        """
@@ -0,0 +1,829 @@
+"""Common parent for asynchronous caches backed by SQLAlchemy async engines."""
+
+import asyncio
+import builtins
+from abc import abstractmethod
+from collections.abc import Sequence
+from typing import Any, Optional
+
+from pydantic import BaseModel
+from sqlalchemy import ColumnElement, Table, delete, select, tuple_
+from sqlalchemy.dialects.postgresql import Insert as PostgresInsert
+from sqlalchemy.dialects.sqlite import Insert as SQLiteInsert
+from sqlalchemy.exc import SQLAlchemyError
+from sqlalchemy.ext.asyncio import AsyncEngine
+
+from cache.async_cache import AsyncCache
+from cache.cache import conversation_page, entry_page
+from cache.cache_entry import CacheEntry, CacheEntryPage
+from cache.cache_error import CacheError
+from log import get_logger
+from models.common import ConversationData, ConversationDataPage
+from models.compaction import ConversationSummary
+from utils.pagination import decode_cache_cursor
+from utils.read_replicas import record_user_write
+
+logger = get_logger(__name__)
+
+
+class AsyncDatabaseCache(AsyncCache):
+    """Common parent for asynchronous caches backed by SQLAlchemy async engines.
+
+    The tables used by the asynchronous caches are the very same tables the
+    synchronous `SQLiteCache` and `PostgresCache` use, so both flavours can be
+    pointed to one database. Schema is created by the DDL statements taken
+    from the synchronous implementations; the SQLAlchemy `Table` objects
+    provided by subclasses are used to build DML statements only.
+
+    Subclasses provide the engine, the tables and the few dialect specific
+    pieces (upsert construct, current timestamp, JSON encoding).
+    """
+
+    cache_table: Table
+    conversations_table: Table
+    summaries_table: Table
+
+    def __init__(
+        self, engine: AsyncEngine, read_engine: Optional[AsyncEngine] = None
+    ) -> None:
+        """Create a new instance of the cache on top of the given engine.
+
+        Parameters:
+        ----------
+            engine: SQLAlchemy async engine connected to the database.
+            read_engine: Engine serving reads only; reads use `engine`
+            when not provided.
+        """
+        self._engine = engine
+        self._read_engine = read_engine or engine
+        self._initialized = False
+        self._initialize_lock = asyncio.Lock()
+
+    def _reader(self, user_id: str) -> AsyncEngine:  # pylint: disable=unused-argument
+        """Return engine serving reads of the user's data.
+
+        Writes made by the cache are reported by `record_user_write()`, so
+        subclasses routing reads to read replicas can serve reads following
+        a write of the same user by the primary database.
+        """
+        return self._read_engine
+
+    def _writer(self, user_id: str) -> AsyncEngine:  # pylint: disable=unused-argument
+        """Return engine storing the user's data.
+
+        Subclasses spreading users across shards return the user's shard.
+        """
+        return self._engine
+
+    def _engines(self) -> builtins.list[AsyncEngine]:
+        """Return engines of all databases storing the cache."""
+        return [self._engine]
+
+    @abstractmethod
+    def _schema_statements(self) -> builtins.list[str]:
+        """Return DDL statements creating the cache schema."""
+
+    @abstractmethod
+    def _insert(self, table: Table) -> SQLiteInsert | PostgresInsert:
+        """Return dialect specific INSERT construct that supports upserts."""
+
+    @abstractmethod
+    def _current_timestamp(self, offset: int = 0) -> Any:
+        """Return value or SQL expression to be stored as current timestamp.
+
+        Parameters:
+        ----------
+            offset: Number of microseconds added to the timestamp, so rows
+            inserted by one statement get distinct, ordered timestamps.
+        """
+
+    @abstractmethod
+    def _epoch(self, column: Any) -> ColumnElement[Any]:
+        """Return SQL expression converting a timestamp column to epoch seconds."""
+
+    @abstractmethod
+    def _from_epoch(self, seconds: float) -> Any:
+        """Return value comparable with timestamp columns; inverse of `_epoch`."""
+
+    @abstractmethod
+    def _encode_items(self, items: builtins.list[dict[str, Any]]) -> Any:
+        """Encode list of JSON-compatible dictionaries for storage."""
+
+    @abstractmethod
+    def _decode_items(self, value: Any) -> Any:
+        """Decode stored list of dictionaries; inverse of `_encode_items`."""
+
+    def _fail(self, operation: str, e: Exception) -> CacheError:
+        """Log database error and wrap it into CacheError.
+
+        Parameters:
+        ----------
+            operation: Name of the cache operation that failed.
+            e: Exception raised by the database layer.
+
+        Returns:
+        -------
+            CacheError to be raised by the caller.
+        """
+        where = f"{type(self).__name__}.{operation}"
+        logger.error("%s: %s", where, e)
+        return CacheError(where, e)
+
+    async def initialize_cache(self) -> None:
+        """Initialize cache - create tables and indexes when they do not exist.
+
+        Raises:
+        ------
+            CacheError: If the schema can not be created.
+        """
+        if self._initialized:
+            return
+        async with self._initialize_lock:
+            if self._initialized:
+                return
+            try:
+                for engine in self._engines():
+                    async with engine.begin() as conn:
+                        for statement in self._schema_statements():
+                            await conn.exec_driver_sql(statement)
+            except SQLAlchemyError as e:
+                raise self._fail("initialize_cache", e) from e
+            self._initialized = True
+        logger.info("%s initialized successfully", type(self).__name__)
+
+    def _serialize(
+        self,
+        items: Optional[Sequence[BaseModel]],
+        field: str,
+        conversation_id: str,
+    ) -> Any:
+        """Serialize list of models into a storable value.
+
+        Parameters:
+        ----------
+            items: Models to serialize; None or empty list is stored as NULL.
+            field: Name of the serialized field, used in log messages.
+            conversation_id: Conversation ID, used in log messages.
+
+        Returns:
+        -------
+            Value to be stored into the database, or None.
+        """
+        if not items:
+            return None
+        try:
+            return self._encode_items([item.model_dump(mode="json") for item in items])
+        except (TypeError, ValueError) as e:
+            logger.warning(
+                "Failed to serialize %s for conversation %s: %s",
+                field,
+                conversation_id,
+                e,
+            )
+            return None
+
+    def _summary_values(
+        self, user_id: str, conversation_id: str, summary: ConversationSummary
+    ) -> dict[str, Any]:
+        """Return column values for a conversation_summaries row."""
+        return {
+            "user_id": user_id,
+            "conversation_id": conversation_id,
+            "created_at": summary.created_at,
+            "summarized_through_turn": summary.summarized_through_turn,
+            "token_count": summary.token_count,
+            "model_used": summary.model_used,
+            "summary_text": summary.summary_text,
+        }
+
+    async def get(
+        self, user_id: str, conversation_id: str, skip_user_id_check: bool = False
+    ) -> builtins.list[CacheEntry]:
+        """Get the value associated with the given key.
+
+        Parameters:
+        ----------
+            user_id: User identification.
+            conversation_id: Conversation ID unique for given user.
+            skip_user_id_check: Skip user_id suid check.
+
+        Returns:
+        -------
+            The conversation history, oldest first.
+
+        Raises:
+        ------
+            CacheError: If a database error occurs.
+        """
+        await self.initialize_cache()
+        c = self.cache_table.c
+        stmt = (
+            select(
+                c.query,
+                c.response,
+                c.provider,
+                c.model,
+                c.started_at,
+                c.completed_at,
+                c.referenced_documents,
+                c.tool_calls,
+                c.tool_results,
+            )
+            .where(c.user_id == user_id, c.conversation_id == conversation_id)
+            .order_by(c.created_at)
+        )
+        try:
+            async with self._reader(user_id).connect() as conn:
+                rows = (await conn.execute(stmt)).all()
+        except SQLAlchemyError as e:
+            raise self._fail("get", e) from e
+
+        # list fields are decoded when first accessed
+        return [
+            CacheEntry.from_encoded(
+                self._decode_items,
+                query=row.query,
+                response=row.response,
+                provider=row.provider,
+                model=row.model,
+                started_at=row.started_at,
+                completed_at=row.completed_at,
+                referenced_documents=row.referenced_documents,
+                tool_calls=row.tool_calls,
+                tool_results=row.tool_results,
+            )
+            for row in rows
+        ]
+
+    async def get_page(  # pylint: disable=too-many-arguments,too-many-positional-arguments
+        self,
+        user_id: str,
+        conversation_id: str,
+        after_created_at: Optional[float],
+        limit: int,
+        skip_user_id_check: bool = False,
+    ) -> CacheEntryPage:
+        """Get one page of conversation history, oldest first.
+
+        The range is served by the (user_id, conversation_id, created_at)
+        primary key of the cache table.
+
+        Parameters:
+        ----------
+            user_id: User identification.
+            conversation_id: Conversation ID unique for given user.
+            after_created_at: Cursor returned with the previous page, or None.
+            limit: Maximal number of turns on the page.
+            skip_user_id_check: Skip user_id suid check.
+
+        Returns:
+        -------
+            Turns of the page and cursor of the next page.
+
+        Raises:
+        ------
+            CacheError: If a database error occurs.
+        """
+        await self.initialize_cache()
+        c = self.cache_table.c
+        stmt = (
+            select(
+                c.query,
+                c.response,
+                c.provider,
+                c.model,
+                c.started_at,
+                c.completed_at,
+                c.referenced_documents,
+                c.tool_calls,
+                c.tool_results,
+                self._epoch(c.created_at).label("created_at"),
+            )
+            .where(c.user_id == user_id, c.conversation_id == conversation_id)
+            .order_by(c.created_at)
+            .limit(limit + 1)
+        )
+        if after_created_at is not None:
+            stmt = stmt.where(c.created_at > self._from_epoch(after_created_at))
+        try:
+            async with self._reader(user_id).connect() as conn:
+                rows = (await conn.execute(stmt)).all()
+        except SQLAlchemyError as e:
+            raise self._fail("get_page", e) from e
+
+        return entry_page(
+            [
+                (
+                    float(row.created_at),
+                    CacheEntry.from_encoded(
+                        self._decode_items,
+                        query=row.query,
+                        response=row.response,
+                        provider=row.provider,
+                        model=row.model,
+                        started_at=row.started_at,
+                        completed_at=row.completed_at,
+                        referenced_documents=row.referenced_documents,
+                        tool_calls=row.tool_calls,
+                        tool_results=row.tool_results,
+                    ),
+                )
+                for row in rows
+            ],
+            limit,
+        )
+
+    async def insert_or_append(
+        self,
+        user_id: str,
+        conversation_id: str,
+        cache_entry: CacheEntry,
+        skip_user_id_check: bool = False,
+    ) -> None:
+        """Set the value associated with the given key.
+
+        The history row is inserted and the conversation record is upserted
+        in one transaction.
+
+        Parameters:
+        ----------
+            user_id: User identification.
+            conversation_id: Conversation ID unique for given user.
+            cache_entry: The `CacheEntry` object to store.
+            skip_user_id_check: Skip user_id suid check.
+
+        Raises:
+        ------
+            CacheError: If a database error occurs.
+        """
+        await self.insert_or_append_many(
+            [(user_id, conversation_id, cache_entry)], skip_user_id_check
+        )
+
+    async def insert_or_append_many(
+        self,
+        entries: Sequence[tuple[str, str, CacheEntry]],
+        skip_user_id_check: bool = False,
+    ) -> None:
+        """Append several cache entries at once.
+
+        All history rows are inserted by one multi-row INSERT and every
+        conversation record is upserted once, in a single transaction.
+
+        Parameters:
+        ----------
+            entries: Triples (user ID, conversation ID, cache entry), oldest first.
+            skip_user_id_check: Skip user_id suid check.
+
+        Raises:
+        ------
+            CacheError: If a database error occurs.
+        """
+        if not entries:
+            return
+        await self.initialize_cache()
+        # users of one batch can be stored in different shards
+        batches: dict[AsyncEngine, builtins.list[tuple[str, str, CacheEntry]]] = {}
+        for entry in entries:
+            batches.setdefault(self._writer(entry[0]), []).append(entry)
+        for engine, batch in batches.items():
+            await self._insert_many(engine, batch)
+
+    async def _insert_many(
+        self, engine: AsyncEngine, entries: Sequence[tuple[str, str, CacheEntry]]
+    ) -> None:
+        """Append cache entries stored in one database in a single transaction.
+
+        Parameters:
+        ----------
+            engine: Engine of the database storing the entries.
+            entries: Triples (user ID, conversation ID, cache entry), oldest first.
+
+        Raises:
+        ------
+            CacheError: If a database error occurs.
+        """
+        rows = []
+        last_message_timestamps: dict[tuple[str, str], Any] = {}
+        for offset, (user_id, conversation_id, cache_entry) in enumerate(entries):
+            now = self._current_timestamp(offset)
+            last_message_timestamps[(user_id, conversation_id)] = now
+            rows.append(
+                {
+                    "user_id": user_id,
+                    "conversation_id": conversation_id,
+                    "created_at": now,
+                    "started_at": cache_entry.started_at,
+                    "completed_at": cache_entry.completed_at,
+                    "query": cache_entry.query,
+                    "response": cache_entry.response,
+                    "provider": cache_entry.provider,
+                    "model": cache_entry.model,
+                    "referenced_documents": self._serialize(
+                        cache_entry.referenced_documents,
+                        "referenced_documents",
+                        conversation_id,
+                    ),
+                    "tool_calls": self._serialize(
+                        cache_entry.tool_calls,
+                        "tool_calls",
+                        conversation_id,
+                    ),
+                    "tool_results": self._serialize(
+                        cache_entry.tool_results,
+                        "tool_results",
+                        conversation_id,
+                    ),
+                }
+            )
+        insert_entries = self._insert(self.cache_table).values(rows)
+        upsert = self._insert(self.conversations_table).values(
+            [
+                {
+                    "user_id": user_id,
+                    "conversation_id": conversation_id,
+                    "topic_summary": None,
+                    "last_message_timestamp": now,
+                }
+                for (user_id, conversation_id), now in last_message_timestamps.items()
+            ]
+        )
+        upsert = upsert.on_conflict_do_update(
+            index_elements=["user_id", "conversation_id"],
+            set_={"last_message_timestamp": upsert.excluded.last_message_timestamp},
+        )
+        try:
+            async with engine.begin() as conn:
+                await conn.execute(insert_entries)
+                await conn.execute(upsert)
+        except SQLAlchemyError as e:
+            raise self._fail("insert_or_append_many", e) from e
+        for user_id, _ in last_message_timestamps:
+            record_user_write(user_id)
+
+    async def delete(
+        self, user_id: str, conversation_id: str, skip_user_id_check: bool = False
+    ) -> bool:
+        """Delete conversation history for a given user_id and conversation_id.
+
+        Conversation record and compaction summaries are deleted as well.
+
+        Parameters:
+        ----------
+            user_id: User identification.
+            conversation_id: Conversation ID unique for given user.
+            skip_user_id_check: Skip user_id suid check.
+
+        Returns:
+        -------
+            bool: True if the conversation was deleted, False if not found.
+
+        Raises:
+        ------
+            CacheError: If a database error occurs.
+        """
+        await self.initialize_cache()
+        try:
+            async with self._writer(user_id).begin() as conn:
+                deleted = 0
+                for table in (
+                    self.cache_table,
+                    self.conversations_table,
+                    self.summaries_table,
+                ):
+                    result = await conn.execute(
+                        delete(table).where(
+                            table.c.user_id == user_id,
+                            table.c.conversation_id == conversation_id,
+                        )
+                    )
+                    if table is self.cache_table:
+                        deleted = result.rowcount
+        except SQLAlchemyError as e:
+            raise self._fail("delete", e) from e
+        record_user_write(user_id)
+        return deleted > 0
+
+    async def list(
+        self, user_id: str, skip_user_id_check: bool = False
+    ) -> builtins.list[ConversationData]:
+        """List all conversations for a given user_id.
+
+        Parameters:
+        ----------
+            user_id: User identification.
+            skip_user_id_check: Skip user_id suid check.
+
+        Returns:
+        -------
+            A list of ConversationData objects containing conversation_id,
+            topic_summary, and last_message_timestamp, most recent first.
+
+        Raises:
+        ------
+            CacheError: If a database error occurs.
+        """
+        await self.initialize_cache()
+        c = self.conversations_table.c
+        stmt = (
+            select(
+                c.conversation_id,
+                c.topic_summary,
+                self._epoch(c.last_message_timestamp),
+            )
+            .where(c.user_id == user_id)
+            .order_by(c.last_message_timestamp.desc())
+        )
+        try:
+            async with self._reader(user_id).connect() as conn:
+                rows = (await conn.execute(stmt)).all()
+        except SQLAlchemyError as e:
+            raise self._fail("list", e) from e
+
+        return [
+            ConversationData(
+                conversation_id=row[0],
+                topic_summary=row[1],
+                last_message_timestamp=float(row[2]),
+            )
+            for row in rows
+        ]
+
+    async def list_page(
+        self,
+        user_id: str,
+        before: Optional[str],
+        limit: int,
+        skip_user_id_check: bool = False,
+    ) -> ConversationDataPage:
+        """List one page of conversations for a given user_id, most recent first.
+
+        Parameters:
+        ----------
+            user_id: User identification.
+            before: Cursor returned with the previous page, or None.
+            limit: Maximal number of conversations on the page.
+            skip_user_id_check: Skip user_id suid check.
+
+        Returns:
+        -------
+            Conversations of the page and cursor of the next page.
+
+        Raises:
+        ------
+            CacheError: If a database error occurs.
+        """
+        await self.initialize_cache()
+        c = self.conversations_table.c
+        stmt = (
+            select(
+                c.conversation_id,
+                c.topic_summary,
+                self._epoch(c.last_message_timestamp),
+                # the stored timestamp is exact, unlike the epoch seconds
+                c.last_message_timestamp,
+            )
+            .where(c.user_id == user_id)
+            .order_by(c.last_message_timestamp.desc(), c.conversation_id.desc())
+            .limit(limit + 1)
+        )
+        if before is not None:
+            stmt = stmt.where(
+                tuple_(c.last_message_timestamp, c.conversation_id)
+                < tuple_(*decode_cache_cursor(before))
+            )
+        try:
+            async with self._reader(user_id).connect() as conn:
+                rows = (await conn.execute(stmt)).all()
+        except SQLAlchemyError as e:
+            raise self._fail("list_page", e) from e
+
+        return conversation_page(
+            [
+                (
+                    row[3],
+                    ConversationData(
+                        conversation_id=row[0],
+                        topic_summary=row[1],
+                        last_message_timestamp=float(row[2]),
+                    ),
+                )
+                for row in rows
+            ],
+            limit,
+        )
+
+    async def get_conversation_meta(
+        self, user_id: str, conversation_id: str, skip_user_id_check: bool = False
+    ) -> Optional[ConversationData]:
+        """Get metadata of one conversation by its primary key.
+
+        Parameters:
+        ----------
+            user_id: User identification.
+            conversation_id: Conversation ID unique for given user.
+            skip_user_id_check: Skip user_id suid check.
+
+        Returns:
+        -------
+            Metadata of the conversation, or None if it does not exist.
+
+        Raises:
+        ------
+            CacheError: If a database error occurs.
+        """
+        await self.initialize_cache()
+        c = self.conversations_table.c
+        stmt = select(c.topic_summary, self._epoch(c.last_message_timestamp)).where(
+            c.user_id == user_id, c.conversation_id == conversation_id
+        )
+        try:
+            async with self._reader(user_id).connect() as conn:
+                row = (await conn.execute(stmt)).first()
+        except SQLAlchemyError as e:
+            raise self._fail("get_conversation_meta", e) from e
+
+        if row is None:
+            return None
+        return ConversationData(
+            conversation_id=conversation_id,
+            topic_summary=row[0],
+            last_message_timestamp=float(row[1]),
+        )
+
+    async def set_topic_summary(
+        self,
+        user_id: str,
+        conversation_id: str,
+        topic_summary: str,
+        skip_user_id_check: bool = False,
+    ) -> None:
+        """Set the topic summary for the given conversation.
+
+        Parameters:
+        ----------
+            user_id: User identification.
+            conversation_id: Conversation ID unique for given user.
+            topic_summary: The topic summary to store.
+            skip_user_id_check: Skip user_id suid check.
+
+        Raises:
+        ------
+            CacheError: If a database error occurs.
+        """
+        await self.initialize_cache()
+        upsert = self._insert(self.conversations_table).values(
+            user_id=user_id,
+            conversation_id=conversation_id,
+            topic_summary=topic_summary,
+            last_message_timestamp=self._current_timestamp(),
+        )
+        upsert = upsert.on_conflict_do_update(
+            index_elements=["user_id", "conversation_id"],
+            set_={
+                "topic_summary": upsert.excluded.topic_summary,
+                "last_message_timestamp": upsert.excluded.last_message_timestamp,
+            },
+        )
+        try:
+            async with self._writer(user_id).begin() as conn:
+                await conn.execute(upsert)
+        except SQLAlchemyError as e:
+            raise self._fail("set_topic_summary", e) from e
+        record_user_write(user_id)
+
+    async def store_summary(
+        self,
+        user_id: str,
+        conversation_id: str,
+        summary: ConversationSummary,
+        skip_user_id_check: bool = False,
+    ) -> None:
+        """Append a compaction summary chunk for the given conversation.
+
+        Parameters:
+        ----------
+            user_id: User identification.
+            conversation_id: Conversation ID unique for given user.
+            summary: The ConversationSummary chunk to persist.
+            skip_user_id_check: Skip user_id suid check.
+
+        Raises:
+        ------
+            CacheError: If a database error occurs.
+        """
+        await self.initialize_cache()
+        stmt = self._insert(self.summaries_table).values(
+            **self._summary_values(user_id, conversation_id, summary)
+        )
+        try:
+            async with self._writer(user_id).begin() as conn:
+                await conn.execute(stmt)
+        except SQLAlchemyError as e:
+            raise self._fail("store_summary", e) from e
+        record_user_write(user_id)
+
+    async def get_summaries(
+        self, user_id: str, conversation_id: str, skip_user_id_check: bool = False
+    ) -> builtins.list[ConversationSummary]:
+        """Retrieve all compaction summary chunks for a conversation.
+
+        Parameters:
+        ----------
+            user_id: User identification.
+            conversation_id: Conversation ID unique for given user.
+            skip_user_id_check: Skip user_id suid check.
+
+        Returns:
+        -------
+            Summary chunks for the conversation, oldest first (ordered by
+            ``created_at``); empty list if none exist.
+
+        Raises:
+        ------
+            CacheError: If a database error occurs.
+        """
+        await self.initialize_cache()
+        c = self.summaries_table.c
+        stmt = (
+            select(
+                c.summary_text,
+                c.summarized_through_turn,
+                c.token_count,
+                c.created_at,
+                c.model_used,
+            )
+            .where(c.user_id == user_id, c.conversation_id == conversation_id)
+            .order_by(c.created_at)
+        )
+        try:
+            async with self._reader(user_id).connect() as conn:
+                rows = (await conn.execute(stmt)).all()
+        except SQLAlchemyError as e:
+            raise self._fail("get_summaries", e) from e
+
+        return [
+            ConversationSummary(
+                summary_text=row.summary_text,
+                summarized_through_turn=row.summarized_through_turn,
+                token_count=row.token_count,
+                created_at=row.created_at,
+                model_used=row.model_used,
+            )
+            for row in rows
+        ]
+
+    async def replace_summaries(
+        self,
+        user_id: str,
+        conversation_id: str,
+        folded_summary: ConversationSummary,
+        skip_user_id_check: bool = False,
+    ) -> None:
+        """Replace all stored summary chunks for a conversation with one fold.
+
+        Existing chunks are deleted and the fold is inserted in one transaction.
+
+        Parameters:
+        ----------
+            user_id: User identification.
+            conversation_id: Conversation ID unique for given user.
+            folded_summary: The folded summary that supersedes existing chunks.
+            skip_user_id_check: Skip user_id suid check.
+
+        Raises:
+        ------
+            CacheError: If a database error occurs.
+        """
+        await self.initialize_cache()
+        c = self.summaries_table.c
+        try:
+            async with self._writer(user_id).begin() as conn:
+                await conn.execute(
+                    delete(self.summaries_table).where(
+                        c.user_id == user_id, c.conversation_id == conversation_id
+                    )
+                )
+                await conn.execute(
+                    self._insert(self.summaries_table).values(
+                        **self._summary_values(user_id, conversation_id, folded_summary)
+                    )
+                )
+        except SQLAlchemyError as e:
+            raise self._fail("replace_summaries", e) from e
+        record_user_write(user_id)
+
+    def ready(self) -> bool:
+        """Check if the cache is ready.
+
+        Returns:
+            True if the cache is ready, False otherwise.
+        """
+        return True
+
+    async def close(self) -> None:
+        """Dispose the engines and their connection pools."""
+        await self._engine.dispose()
+        if self._read_engine is not self._engine:
+            await self._read_engine.dispose()
+        logger.info("Closed %s database engine", type(self).__name__)
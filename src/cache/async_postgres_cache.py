@@ -0,0 +1,232 @@
+"""Asynchronous cache that uses PostgreSQL (via asyncpg) to store cached values."""
+
+import builtins
+from datetime import datetime, timedelta
+from typing import Any, Optional
+from urllib.parse import quote_plus
+
+from sqlalchemy import (
+    Column,
+    ColumnElement,
+    DateTime,
+    Integer,
+    MetaData,
+    Table,
+    Text,
+    extract,
+    func,
+)
+from sqlalchemy.dialects.postgresql import JSONB, Insert, insert
+from sqlalchemy.ext.asyncio import AsyncEngine, create_async_engine
+
+from cache.async_database_cache import AsyncDatabaseCache
+from cache.postgres_cache import PostgresCache, validated_namespace
+from log import get_logger
+from models.config import PostgreSQLDatabaseConfiguration
+from utils.postgres_ssl import ssl_argument
+from utils.read_replicas import (
+    ReplicaRouter,
+    replica_configurations,
+    replica_router,
+    route_async_read,
+)
+from utils.shards import Shards, shard_configurations, shards_of
+
+logger = get_logger(__name__)
+
+# origin of EXTRACT(EPOCH FROM ...) for timestamp without time zone columns
+EPOCH = datetime(1970, 1, 1)
+
+# Table metadata used to build DML statements. The schema itself is created
+# by the DDL statements shared with PostgresCache.
+metadata = MetaData()
+
+cache_table = Table(
+    "cache",
+    metadata,
+    Column("user_id", Text, primary_key=True),
+    Column("conversation_id", Text, primary_key=True),
+    Column("created_at", DateTime, primary_key=True),
+    Column("started_at", Text),
+    Column("completed_at", Text),
+    Column("query", Text),
+    Column("response", Text),
+    Column("provider", Text),
+    Column("model", Text),
+    Column("referenced_documents", JSONB),
+    Column("tool_calls", JSONB),
+    Column("tool_results", JSONB),
+)
+
+conversations_table = Table(
+    "conversations",
+    metadata,
+    Column("user_id", Text, primary_key=True),
+    Column("conversation_id", Text, primary_key=True),
+    Column("topic_summary", Text),
+    Column("last_message_timestamp", DateTime, nullable=False),
+)
+
+summaries_table = Table(
+    "conversation_summaries",
+    metadata,
+    Column("user_id", Text, primary_key=True),
+    Column("conversation_id", Text, primary_key=True),
+    Column("created_at", Text, primary_key=True),
+    Column("summarized_through_turn", Integer, nullable=False),
+    Column("token_count", Integer, nullable=False),
+    Column("model_used", Text, nullable=False),
+    Column("summary_text", Text, nullable=False),
+)
+
+
+class AsyncPostgresCache(AsyncDatabaseCache):
+    """Asynchronous cache that uses PostgreSQL (via asyncpg) to store cached values.
+
+    Uses the same tables as `PostgresCache`; see its documentation for the
+    schema description. The `gss_encmode` option is not supported by asyncpg
+    and is ignored. Conversations of users are stored in their shards when
+    the database is sharded, otherwise reads are spread across read replicas
+    when configured.
+    """
+
+    cache_table = cache_table
+    conversations_table = conversations_table
+    summaries_table = summaries_table
+
+    def __init__(self, config: PostgreSQLDatabaseConfiguration) -> None:
+        """Create a new instance of asynchronous PostgreSQL cache.
+
+        The engine connects lazily, so no I/O is performed there.
+
+        Parameters:
+        ----------
+            config (PostgreSQLDatabaseConfiguration): Configuration used to
+            connect to the PostgreSQL server.
+
+        Raises:
+        ------
+            ValueError: If the configured namespace is not valid.
+        """
+        self.postgres_config = config
+        self.namespace = validated_namespace(config)
+        super().__init__(self._create_engine(config))
+        self._shards: Optional[Shards[AsyncEngine]] = shards_of(
+            config,
+            [self._create_engine(shard) for shard in shard_configurations(config)],
+        )
+        self._replica_router: Optional[ReplicaRouter[AsyncEngine]] = replica_router(
+            config,
+            [
+                self._create_engine(replica)
+                for replica in replica_configurations(config)
+                if self._shards is None
+            ],
+        )
+
+    def _create_engine(self, config: PostgreSQLDatabaseConfiguration) -> AsyncEngine:
+        """Create engine connected to the primary database, a shard or a replica.
+
+        Parameters:
+        ----------
+            config (PostgreSQLDatabaseConfiguration): Configuration used to
+            connect to the PostgreSQL server.
+
+        Returns:
+        -------
+            AsyncEngine: Engine connecting lazily to the server.
+        """
+        password = quote_plus(config.password.get_secret_value())
+        connection_string = (
+            f"postgresql+asyncpg://{quote_plus(config.user)}:{password}"
+            f"@{config.host}:{config.port}/{config.db}"
+        )
+        logger.info(
+            "Creating async PostgreSQL cache engine for %s:%s",
+            config.host,
+            config.port,
+        )
+        # asyncpg connections can not be shared with psycopg2 storages, so the
+        # engine keeps its own pool bounded by the same settings
+        return create_async_engine(
+            connection_string,
+            echo=False,
+            pool_size=config.pool.max_size,
+            max_overflow=0,
+            pool_timeout=config.pool.acquire_timeout,
+            pool_recycle=config.pool.max_lifetime,
+            connect_args={
+                "ssl": ssl_argument(config),
+                "server_settings": {"search_path": self.namespace},
+            },
+        )
+
+    def _reader(self, user_id: str) -> AsyncEngine:
+        """Return engine of the user's shard, a read replica or the primary."""
+        if self._shards is not None:
+            return self._shards.for_user(user_id)
+        return route_async_read(self._replica_router, user_id) or self._engine
+
+    def _writer(self, user_id: str) -> AsyncEngine:
+        """Return engine of the user's shard or of the primary database."""
+        if self._shards is not None:
+            return self._shards.for_user(user_id)
+        return self._engine
+
+    def _engines(self) -> builtins.list[AsyncEngine]:
+        """Return engines of the shards, or of the primary database."""
+        if self._shards is not None:
+            return list(self._shards)
+        return [self._engine]
+
+    def _schema_statements(self) -> builtins.list[str]:
+        """Return DDL statements creating the cache schema."""
+        statements = []
+        if self.namespace != "public":
+            statements.append(f"CREATE SCHEMA IF NOT EXISTS {self.namespace}")
+        statements.extend(
+            [
+                PostgresCache.CREATE_CACHE_TABLE,
+                PostgresCache.CREATE_CONVERSATIONS_TABLE,
+                PostgresCache.CREATE_CONVERSATION_SUMMARIES_TABLE,
+                PostgresCache.CREATE_INDEX,
+                PostgresCache.CREATE_CONVERSATIONS_INDEX,
+            ]
+        )
+        return statements
+
+    def _insert(self, table: Table) -> Insert:
+        """Return PostgreSQL INSERT construct that supports upserts."""
+        return insert(table)
+
+    def _current_timestamp(self, offset: int = 0) -> Any:
+        """Return CURRENT_TIMESTAMP expression, as used by PostgresCache."""
+        if offset == 0:
+            return func.current_timestamp()
+        return func.current_timestamp() + timedelta(microseconds=offset)
+
+    def _epoch(self, column: Any) -> ColumnElement[Any]:
+        """Return expression converting timestamp column to epoch seconds."""
+        return extract("epoch", column)
+
+    def _from_epoch(self, seconds: float) -> Any:
+        """Return timestamp that EXTRACT(EPOCH ...) converts to given seconds."""
+        return EPOCH + timedelta(seconds=seconds)
+
+    def _encode_items(self, items: builtins.list[dict[str, Any]]) -> Any:
+        """Return list of dictionaries as is; JSONB type encodes it."""
+        return items
+
+    def _decode_items(self, value: Any) -> Any:
+        """Return list of dictionaries as is; JSONB type decodes it."""
+        return value
+
+    async def close(self) -> None:
+        """Dispose the engines of the database, its shards and read replicas."""
+        await super().close()
+        if self._replica_router is not None:
+            for replica in self._replica_router.replicas:
+                await replica.dispose()
+        if self._shards is not None:
+            for shard in self._shards:
+                await shard.dispose()
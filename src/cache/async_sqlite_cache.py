@@ -0,0 +1,175 @@
+"""Asynchronous cache that uses SQLite (via aiosqlite) to store cached values."""
+
+import builtins
+from time import time
+from typing import Any
+
+from sqlalchemy import (
+    Column,
+    ColumnElement,
+    Float,
+    Integer,
+    MetaData,
+    Table,
+    Text,
+    event,
+)
+from sqlalchemy.dialects.sqlite import Insert, insert
+from sqlalchemy.ext.asyncio import AsyncEngine, create_async_engine
+
+from cache.async_database_cache import AsyncDatabaseCache
+from cache.entry_codec import decode_items, encode_items
+from cache.sqlite_cache import SQLiteCache, configure_connection
+from log import get_logger
+from models.config import SQLiteConcurrencyConfiguration, SQLiteDatabaseConfiguration
+
+logger = get_logger(__name__)
+
+# Table metadata used to build DML statements. The schema itself is created
+# by the DDL statements shared with SQLiteCache.
+metadata = MetaData()
+
+cache_table = Table(
+    "cache",
+    metadata,
+    Column("user_id", Text, primary_key=True),
+    Column("conversation_id", Text, primary_key=True),
+    Column("created_at", Float, primary_key=True),
+    Column("started_at", Text),
+    Column("completed_at", Text),
+    Column("query", Text),
+    Column("response", Text),
+    Column("provider", Text),
+    Column("model", Text),
+    # encoded by cache.entry_codec into BLOB values; legacy rows hold JSON
+    # text, both are passed through untouched by the Text type
+    Column("referenced_documents", Text),
+    Column("tool_calls", Text),
+    Column("tool_results", Text),
+)
+
+conversations_table = Table(
+    "conversations",
+    metadata,
+    Column("user_id", Text, primary_key=True),
+    Column("conversation_id", Text, primary_key=True),
+    Column("topic_summary", Text),
+    Column("last_message_timestamp", Float, nullable=False),
+)
+
+summaries_table = Table(
+    "conversation_summaries",
+    metadata,
+    Column("user_id", Text, primary_key=True),
+    Column("conversation_id", Text, primary_key=True),
+    Column("created_at", Text, primary_key=True),
+    Column("summarized_through_turn", Integer, nullable=False),
+    Column("token_count", Integer, nullable=False),
+    Column("model_used", Text, nullable=False),
+    Column("summary_text", Text, nullable=False),
+)
+
+
+class AsyncSQLiteCache(AsyncDatabaseCache):
+    """Asynchronous cache that uses SQLite (via aiosqlite) to store cached values.
+
+    Uses the same tables as `SQLiteCache`; see its documentation for the
+    schema description. JSON columns are stored as text.
+
+    In high-concurrency mode writes go through an engine with a single pooled
+    connection, while reads are served by a separate engine pooling
+    read-only connections; the database uses write-ahead log journal mode.
+    """
+
+    cache_table = cache_table
+    conversations_table = conversations_table
+    summaries_table = summaries_table
+
+    def __init__(self, config: SQLiteDatabaseConfiguration) -> None:
+        """Create a new instance of asynchronous SQLite cache.
+
+        The engine connects lazily, so no I/O is performed there.
+
+        Parameters:
+        ----------
+            config (SQLiteDatabaseConfiguration): Configuration containing the
+            SQLite database path.
+        """
+        self.sqlite_config = config
+        logger.info("Creating async SQLite cache engine for %s", config.db_path)
+        if config.concurrency is None:
+            super().__init__(
+                create_async_engine(f"sqlite+aiosqlite:///{config.db_path}", echo=False)
+            )
+            return
+        super().__init__(
+            self._create_engine(config.concurrency, 1, read_only=False),
+            self._create_engine(
+                config.concurrency, config.concurrency.readers, read_only=True
+            ),
+        )
+
+    def _create_engine(
+        self, config: SQLiteConcurrencyConfiguration, pool_size: int, read_only: bool
+    ) -> AsyncEngine:
+        """Create engine of high-concurrency mode with bounded connection pool.
+
+        Parameters:
+        ----------
+            config: High-concurrency mode configuration.
+            pool_size: Number of pooled connections.
+            read_only: True for engine serving reads only.
+
+        Returns:
+        -------
+            Engine applying the configured pragmas to each new connection.
+        """
+        engine = create_async_engine(
+            f"sqlite+aiosqlite:///{self.sqlite_config.db_path}",
+            echo=False,
+            pool_size=pool_size,
+            max_overflow=0,
+            connect_args={"cached_statements": config.statement_cache_size},
+        )
+
+        @event.listens_for(engine.sync_engine, "connect")
+        def on_connect(dbapi_connection: Any, _connection_record: Any) -> None:
+            """Apply pragmas of high-concurrency mode to new connection."""
+            configure_connection(dbapi_connection, config, read_only)
+
+        return engine
+
+    def _schema_statements(self) -> builtins.list[str]:
+        """Return DDL statements creating the cache schema."""
+        return [
+            SQLiteCache.ENABLE_INCREMENTAL_VACUUM,
+            SQLiteCache.CREATE_CACHE_TABLE,
+            SQLiteCache.CREATE_CONVERSATIONS_TABLE,
+            SQLiteCache.CREATE_CONVERSATION_SUMMARIES_TABLE,
+            SQLiteCache.CREATE_INDEX,
+            SQLiteCache.CREATE_CONVERSATIONS_INDEX,
+        ]
+
+    def _insert(self, table: Table) -> Insert:
+        """Return SQLite INSERT construct that supports upserts."""
+        return insert(table)
+
+    def _current_timestamp(self, offset: int = 0) -> Any:
+        """Return current time in epoch seconds, as stored by SQLiteCache."""
+        return time() + offset / 1_000_000
+
+    def _epoch(self, column: Any) -> ColumnElement[Any]:
+        """Return the column itself; timestamps are stored in epoch seconds."""
+        return column
+
+    def _from_epoch(self, seconds: float) -> Any:
+        """Return epoch seconds as is; timestamps are stored in epoch seconds."""
+        return seconds
+
+    def _encode_items(self, items: builtins.list[dict[str, Any]]) -> Any:
+        """Encode list of dictionaries into compact tagged format."""
+        return encode_items(items)
+
+    def _decode_items(self, value: Any) -> Any:
+        """Decode list of dictionaries from tagged format or legacy JSON text."""
+        return decode_items(value)
@@ -2,13 +2,66 @@
 
 import builtins
 from abc import ABC, abstractmethod
+from collections.abc import Sequence
+from datetime import datetime
+from typing import Optional
 
-from cache.cache_entry import CacheEntry
-from models.common import ConversationData
+from cache.cache_entry import CacheEntry, CacheEntryPage
+from models.common import ConversationData, ConversationDataPage
 from models.compaction import ConversationSummary
+from models.config import ConversationRetentionConfiguration
+from utils.pagination import encode_cache_cursor
 from utils.suid import check_suid
 
 
+def entry_page(rows: Sequence[tuple[float, CacheEntry]], limit: int) -> CacheEntryPage:
+    """Build a page of conversation history from rows read by a cache.
+
+    Parameters:
+    ----------
+        rows: Up to `limit + 1` pairs of creation time and turn, oldest
+        first; the extra row only tells that there is a next page.
+        limit: Maximal number of turns on the page.
+
+    Returns:
+    -------
+        CacheEntryPage: At most `limit` turns and cursor of the next page.
+    """
+    page = rows[:limit]
+    return CacheEntryPage(
+        entries=[entry for _, entry in page],
+        next_cursor=page[-1][0] if len(rows) > limit and page else None,
+    )
+
+
+def conversation_page(
+    rows: Sequence[tuple[float | datetime, ConversationData]], limit: int
+) -> ConversationDataPage:
+    """Build a page of conversations from rows read by a cache.
+
+    Parameters:
+    ----------
+        rows: Up to `limit + 1` pairs of stored last message timestamp and
+        conversation, most recent first; the extra row only tells that there
+        is a next page.
+        limit: Maximal number of conversations on the page.
+
+    Returns:
+    -------
+        ConversationDataPage: At most `limit` conversations and cursor of the
+        next page.
+    """
+    page = rows[:limit]
+    return ConversationDataPage(
+        conversations=[conversation for _, conversation in page],
+        next_cursor=(
+            encode_cache_cursor(page[-1][0], page[-1][1].conversation_id)
+            if len(rows) > limit and page
+            else None
+        ),
+    )
+
+
 class Cache(ABC):
     """Abstract class that is parent for all cache implementations.
 
@@ -100,6 +153,35 @@ class Cache(ABC):
             empty list if no entries exist.
         """
 
+    @abstractmethod
+    def get_page(  # pylint: disable=too-many-arguments,too-many-positional-arguments
+        self,
+        user_id: str,
+        conversation_id: str,
+        after_created_at: Optional[float],
+        limit: int,
+        skip_user_id_check: bool,
+    ) -> CacheEntryPage:
+        """Retrieve one page of conversation history, oldest first.
+
+        Pages are addressed by the creation time of the last turn of the
+        previous page (keyset pagination), so reading a page costs the same
+        regardless of its position in the history.
+
+        Parameters:
+        ----------
+            user_id (str): User identifier.
+            conversation_id (str): Conversation identifier scoped to the user.
+            after_created_at (Optional[float]): Cursor returned with the
+            previous page; None to start with the oldest turn.
+            limit (int): Maximal number of turns on the page.
+            skip_user_id_check (bool): If True, skip validation of `user_id`.
+
+        Returns:
+        -------
+            CacheEntryPage: Turns of the page and cursor of the next page.
+        """
+
     @abstractmethod
     def insert_or_append(
         self,
@@ -154,6 +236,76 @@ class Cache(ABC):
                         `topic_summary`, and `last_message_timestamp`.
         """
 
+    @abstractmethod
+    def list_page(
+        self,
+        user_id: str,
+        before: Optional[str],
+        limit: int,
+        skip_user_id_check: bool,
+    ) -> ConversationDataPage:
+        """List one page of conversations for a given user_id, most recent first.
+
+        Conversations are ordered by last message timestamp and conversation
+        ID, and pages are addressed by both of them of the last conversation
+        of the previous page (keyset pagination), so conversations sharing
+        the timestamp are neither skipped nor repeated.
+
+        Parameters:
+        ----------
+            user_id (str): User identifier.
+            before (Optional[str]): Cursor returned with the previous page;
+            None to start with the most recent conversation.
+            limit (int): Maximal number of conversations on the page.
+            skip_user_id_check (bool): If True, skip validation of `user_id`.
+
+        Returns:
+        -------
+            ConversationDataPage: Conversations of the page and cursor of the
+            next page.
+        """
+
+    @abstractmethod
+    def get_conversation_meta(
+        self, user_id: str, conversation_id: str, skip_user_id_check: bool
+    ) -> Optional[ConversationData]:
+        """Retrieve metadata of one conversation without its history.
+
+        Database backed caches look the conversation up by its primary key,
+        so the cost does not depend on the number of user's conversations.
+
+        Parameters:
+        ----------
+            user_id (str): User identifier.
+            conversation_id (str): Conversation identifier scoped to the user.
+            skip_user_id_check (bool): If True, skip validation of `user_id`.
+
+        Returns:
+        -------
+            Optional[ConversationData]: Topic summary and last message
+            timestamp of the conversation; None if it does not exist.
+        """
+
+    def exists(
+        self, user_id: str, conversation_id: str, skip_user_id_check: bool
+    ) -> bool:
+        """Check if the conversation exists.
+
+        Parameters:
+        ----------
+            user_id (str): User identifier.
+            conversation_id (str): Conversation identifier scoped to the user.
+            skip_user_id_check (bool): If True, skip validation of `user_id`.
+
+        Returns:
+        -------
+            bool: True if the conversation exists for the user.
+        """
+        return (
+            self.get_conversation_meta(user_id, conversation_id, skip_user_id_check)
+            is not None
+        )
+
     @abstractmethod
     def set_topic_summary(
         self,
@@ -240,6 +392,34 @@ class Cache(ABC):
             skip_user_id_check (bool): If True, skip validation of `user_id`.
         """
 
+    def apply_retention(
+        self,
+        retention: ConversationRetentionConfiguration,  # pylint: disable=unused-argument
+    ) -> dict[str, int]:
+        """Delete turns and conversations outside the retention policy.
+
+        Caches storing data in a database delete the rows in bounded batches;
+        other caches keep nothing to be deleted, which is the default.
+
+        Parameters:
+        ----------
+            retention: Retention policy to be enforced.
+
+        Returns:
+        -------
+            Number of deleted rows for each table.
+        """
+        return {}
+
+    def table_sizes(self) -> dict[str, int]:
+        """Return number of rows stored in each table.
+
+        Returns:
+        -------
+            Number of rows for each table; empty for caches without tables.
+        """
+        return {}
+
     @abstractmethod
     def ready(self) -> bool:
         """Check if the cache is ready.
@@ -1,19 +1,42 @@
 """Model for conversation history cache entry."""
 
-from typing import Optional
+from collections.abc import Callable, Iterator
+from typing import Any, Final, Optional
 
-from pydantic import BaseModel
+from pydantic import (
+    BaseModel,
+    PrivateAttr,
+    SerializationInfo,
+    SerializerFunctionWrapHandler,
+    model_serializer,
+)
 
+from log import get_logger
 from models.common.turn_summary import (
     ReferencedDocument,
     ToolCallSummary,
     ToolResultSummary,
 )
 
+logger = get_logger(__name__)
+
+# fields that can be stored in encoded form and decoded on first access,
+# together with model of their list items
+LAZY_FIELDS: Final[dict[str, type[BaseModel]]] = {
+    "referenced_documents": ReferencedDocument,
+    "tool_calls": ToolCallSummary,
+    "tool_results": ToolResultSummary,
+}
+
 
 class CacheEntry(BaseModel):
     """Model representing a cache entry.
 
+    Entries read from a cache can be created by `from_encoded`, in which case
+    referenced documents, tool calls and tool results are decoded only when
+    first accessed. Conversation listing or compaction, which need queries
+    and responses only, then do not pay for decoding large tool results.
+
     Attributes:
         query: The query string
         response: The response string
@@ -33,3 +56,146 @@ class CacheEntry(BaseModel):
     referenced_documents: Optional[list[ReferencedDocument]] = None
     tool_calls: Optional[list[ToolCallSummary]] = None
     tool_results: Optional[list[ToolResultSummary]] = None
+
+    # stored values of fields not decoded yet, and function decoding them
+    _encoded: dict[str, Any] = PrivateAttr(default_factory=dict)
+    _decode: Optional[Callable[[Any], Any]] = PrivateAttr(default=None)
+
+    @classmethod
+    def from_encoded(  # pylint: disable=too-many-arguments
+        cls,
+        decode: Optional[Callable[[Any], Any]],
+        *,
+        query: str,
+        response: str,
+        provider: str,
+        model: str,
+        started_at: str,
+        completed_at: str,
+        **encoded: Any,
+    ) -> "CacheEntry":
+        """Create entry whose list fields are decoded on first access.
+
+        Parameters:
+        ----------
+            decode: Function decoding stored value into list of dictionaries,
+            None when the values are lists of dictionaries already.
+            query: The query string.
+            response: The response string.
+            provider: Provider identification.
+            model: Model identification.
+            started_at: Time when the response generation started.
+            completed_at: Time when the response generation completed.
+            encoded: Stored values of `referenced_documents`, `tool_calls`
+            and `tool_results`; empty values mean the field is not set.
+
+        Returns:
+        -------
+            Cache entry with list fields decoded lazily.
+        """
+        entry = cls.model_construct(
+            query=query,
+            response=response,
+            provider=provider,
+            model=model,
+            started_at=started_at,
+            completed_at=completed_at,
+        )
+        entry._decode = decode
+        for name, value in encoded.items():
+            if name not in LAZY_FIELDS:
+                raise TypeError(f"Field {name} can not be decoded lazily")
+            if value:
+                # attribute access falls back to __getattr__ decoding the value
+                del entry.__dict__[name]
+                entry._encoded[name] = value
+        return entry
+
+    def _decode_field(self, name: str, value: Any) -> Optional[list[Any]]:
+        """Decode stored value of a list field into list of models."""
+        model = LAZY_FIELDS[name]
+        try:
+            decoded = self._decode(value) if self._decode is not None else value
+            return [model.model_validate(item) for item in decoded]
+        except (TypeError, ValueError) as e:
+            logger.warning("Failed to deserialize %s: %s", name, e)
+            return None
+
+    def __getattr__(self, name: str) -> Any:
+        """Decode a lazily decoded field on first access."""
+        if name not in LAZY_FIELDS:
+            return super().__getattr__(name)  # type: ignore[misc]
+        private = self.__pydantic_private__
+        if private and name in private["_encoded"]:
+            value = self._decode_field(name, private["_encoded"].pop(name))
+            self.__dict__[name] = value
+            if not private["_encoded"]:
+                # keep fields in declaration order, as serialized
+                fields = {
+                    key: self.__dict__[key] for key in CacheEntry.model_fields.keys()
+                }
+                self.__dict__.clear()
+                self.__dict__.update(fields)
+            return value
+        return super().__getattr__(name)  # type: ignore[misc]
+
+    def decode_all(self) -> None:
+        """Decode all fields that have not been accessed yet."""
+        for name in list(self._encoded):
+            getattr(self, name)
+        # fully decoded entry equals entry created by the constructor
+        self._decode = None
+
+    @model_serializer(mode="wrap")
+    def _serialize(
+        self, handler: SerializerFunctionWrapHandler, _info: SerializationInfo
+    ) -> Any:
+        """Decode all fields before the entry is serialized."""
+        self.decode_all()
+        return handler(self)
+
+    def __eq__(self, other: object) -> bool:
+        """Compare entries field by field, decoding them first."""
+        self.decode_all()
+        if isinstance(other, CacheEntry):
+            other.decode_all()
+        return super().__eq__(other)
+
+    def __iter__(self) -> Iterator[tuple[str, Any]]:  # type: ignore[override]
+        """Iterate over fields and their values, decoding them first."""
+        self.decode_all()
+        return super().__iter__()
+
+    def __repr_args__(self) -> Any:
+        """Return fields shown by repr, decoding them first."""
+        self.decode_all()
+        return super().__repr_args__()
+
+    def __copy__(self) -> "CacheEntry":
+        """Return shallow copy with all fields decoded."""
+        self.decode_all()
+        return super().__copy__()
+
+    def __deepcopy__(self, memo: Optional[dict[int, Any]] = None) -> "CacheEntry":
+        """Return deep copy with all fields decoded."""
+        self.decode_all()
+        return super().__deepcopy__(memo)
+
+    def __getstate__(self) -> dict[Any, Any]:
+        """Return pickled state with all fields decoded."""
+        self.decode_all()
+        return super().__getstate__()
+
+
+class CacheEntryPage(BaseModel):
+    """Model representing one page of conversation history.
+
+    Attributes:
+        entries: Conversation turns of the page, oldest first
+        next_cursor: Creation time of the last turn on the page, to be passed
+            as `after_created_at` to get the next page; None when there are
+            no more turns
+    """
+
+    entries: list[CacheEntry]
+    next_cursor: Optional[float] = None
@@ -1,18 +1,23 @@
 """Cache factory class."""
 
 import constants
+from cache.async_cache import AsyncCache
+from cache.async_postgres_cache import AsyncPostgresCache
+from cache.async_sqlite_cache import AsyncSQLiteCache
 from cache.cache import Cache
 from cache.in_memory_cache import InMemoryCache
 from cache.noop_cache import NoopCache
 from cache.postgres_cache import PostgresCache
+from cache.read_through_cache import ReadThroughCache
 from cache.sqlite_cache import SQLiteCache
+from cache.sync_cache_adapter import SyncCacheAdapter
+from cache.write_behind_cache import WriteBehindCache
 from log import get_logger
 from models.config import ConversationHistoryConfiguration
 
 logger = get_logger(__name__)
 
 
-# pylint: disable=R0903
 class CacheFactory:
     """Cache factory class."""
 
@@ -52,3 +57,78 @@ class CacheFactory:
                     f"Use '{constants.CACHE_TYPE_POSTGRES}' '{constants.CACHE_TYPE_SQLITE}' "
                     f"'{constants.CACHE_TYPE_MEMORY}' or '{constants.CACHE_TYPE_NOOP}' options."
                 )
+
+    @staticmethod
+    def async_conversation_cache(
+        config: ConversationHistoryConfiguration,
+    ) -> AsyncCache:
+        """Create an instance of AsyncCache based on loaded configuration.
+
+        Database backed caches use native asyncio drivers (aiosqlite and
+        asyncpg) and they are wrapped by `WriteBehindCache` when write-behind
+        mode is configured and by `ReadThroughCache` when read-through cache
+        is configured; in-process caches are wrapped by `SyncCacheAdapter`.
+
+        Returns:
+            An instance of `AsyncCache` (either `AsyncSQLiteCache`,
+            `AsyncPostgresCache`, `WriteBehindCache`, `ReadThroughCache` or
+            `SyncCacheAdapter`).
+
+        Raises:
+            ValueError: If `config.type` is None, if required type-specific
+            configuration is missing, or if `config.type` is not a recognized
+            cache type.
+        """
+        logger.info("Creating async cache instance of type %s", config.type)
+        match config.type:
+            case constants.CACHE_TYPE_NOOP:
+                return SyncCacheAdapter(NoopCache())
+            case constants.CACHE_TYPE_MEMORY:
+                if config.memory is not None:
+                    return SyncCacheAdapter(InMemoryCache(config.memory))
+                raise ValueError("Expecting configuration for in-memory cache")
+            case constants.CACHE_TYPE_SQLITE:
+                if config.sqlite is not None:
+                    return CacheFactory._with_wrappers(
+                        AsyncSQLiteCache(config.sqlite), config
+                    )
+                raise ValueError("Expecting configuration for SQLite cache")
+            case constants.CACHE_TYPE_POSTGRES:
+                if config.postgres is not None:
+                    return CacheFactory._with_wrappers(
+                        AsyncPostgresCache(config.postgres), config
+                    )
+                raise ValueError("Expecting configuration for PostgreSQL cache")
+            case None:
+                raise ValueError("Cache type must be set")
+            case _:
+                raise ValueError(
+                    f"Invalid cache type: {config.type}. "
+                    f"Use '{constants.CACHE_TYPE_POSTGRES}' '{constants.CACHE_TYPE_SQLITE}' "
+                    f"'{constants.CACHE_TYPE_MEMORY}' or '{constants.CACHE_TYPE_NOOP}' options."
+                )
+
+    @staticmethod
+    def _with_wrappers(
+        cache: AsyncCache, config: ConversationHistoryConfiguration
+    ) -> AsyncCache:
+        """Wrap the cache by configured write-behind and read-through caches.
+
+        The read-through cache is the outer one, so it is invalidated as soon
+        as a turn is queued by the write-behind cache.
+
+        Parameters:
+        ----------
+            cache: Database backed asynchronous cache.
+            config: Conversation history configuration.
+
+        Returns:
+            The wrapped cache, or the cache itself when no wrapper is configured.
+        """
+        if config.write_behind is not None:
+            logger.info("Enabling write-behind mode of conversation cache")
+            cache = WriteBehindCache(cache, config.write_behind)
+        if config.read_through is not None:
+            logger.info("Enabling read-through cache of conversation cache")
+            cache = ReadThroughCache(cache, config.read_through)
+        return cache
@@ -0,0 +1,87 @@
+"""Compact, versioned encoding of list columns stored in the conversation cache.
+
+Referenced documents, tool calls and tool results are stored as a format tag
+byte followed by the payload:
+
+```
+  0x01  compact UTF-8 JSON
+  0x02  zlib compressed compact UTF-8 JSON
+```
+
+Payloads larger than `COMPRESSION_THRESHOLD` bytes are compressed, which pays
+off for large tool results. Values written before the format was introduced
+are plain JSON text; they are recognized by their type (text, not bytes) or
+by the leading `[` and decoded as such, so existing databases keep working
+without migration.
+"""
+
+import json
+import zlib
+from typing import Any, Final
+
+FORMAT_JSON: Final[int] = 0x01
+FORMAT_JSON_ZLIB: Final[int] = 0x02
+# first byte of legacy JSON lists stored as binary
+LEGACY_JSON_START: Final[int] = ord("[")
+
+# payloads up to this size (in bytes) are stored uncompressed
+COMPRESSION_THRESHOLD: Final[int] = 512
+
+# zlib level 1 is several times faster than the default with similar ratio
+# on repetitive JSON
+COMPRESSION_LEVEL: Final[int] = 1
+
+
+def encode_items(items: list[dict[str, Any]]) -> bytes:
+    """Encode list of JSON-compatible dictionaries into tagged binary value.
+
+    Parameters:
+    ----------
+        items: Dictionaries to encode.
+
+    Returns:
+    -------
+        Format tag byte followed by the (possibly compressed) payload.
+
+    Raises:
+    ------
+        TypeError: If the items are not JSON serializable.
+        ValueError: If the items contain circular references.
+    """
+    payload = json.dumps(items, separators=(",", ":"), ensure_ascii=False).encode()
+    if len(payload) > COMPRESSION_THRESHOLD:
+        return bytes((FORMAT_JSON_ZLIB,)) + zlib.compress(payload, COMPRESSION_LEVEL)
+    return bytes((FORMAT_JSON,)) + payload
+
+
+def decode_items(value: Any) -> Any:
+    """Decode value stored by `encode_items` or legacy JSON text.
+
+    Parameters:
+    ----------
+        value: Tagged binary value, or JSON text written by older versions.
+
+    Returns:
+    -------
+        Decoded list of dictionaries.
+
+    Raises:
+    ------
+        ValueError: If the format tag is unknown or the payload is corrupted.
+    """
+    if isinstance(value, str):
+        return json.loads(value)
+    data = bytes(value)
+    if not data:
+        raise ValueError("Empty encoded value")
+    tag, payload = data[0], data[1:]
+    if tag == LEGACY_JSON_START:
+        return json.loads(data)
+    if tag == FORMAT_JSON:
+        return json.loads(payload)
+    if tag == FORMAT_JSON_ZLIB:
+        try:
+            return json.loads(zlib.decompress(payload))
+        except zlib.error as e:
+            raise ValueError(f"Corrupted compressed value: {e}") from e
+    raise ValueError(f"Unknown encoding format {tag:#04x}")
@@ -1,20 +1,64 @@
 """In-memory cache implementation."""
 
 import builtins
-
-from cache.cache import Cache
-from cache.cache_entry import CacheEntry
+import math
+from bisect import bisect_right
+from collections import OrderedDict
+from dataclasses import dataclass, field
+from threading import Lock
+from time import time
+from typing import Optional
+
+from cache.cache import Cache, conversation_page, entry_page
+from cache.cache_entry import CacheEntry, CacheEntryPage
 from log import get_logger
-from models.common import ConversationData
+from models.common import ConversationData, ConversationDataPage
 from models.compaction import ConversationSummary
 from models.config import InMemoryCacheConfig
 from utils.connection_decorator import connection
+from utils.pagination import decode_cache_cursor
 
 logger = get_logger(__name__)
 
 
+@dataclass
+class _ConversationRecord:
+    """Everything the in-memory cache stores for one conversation.
+
+    Attributes:
+        user_id: Owner of the conversation.
+        conversation_id: Conversation ID unique for given user.
+        last_message_timestamp: Time of the last write into the conversation.
+        topic_summary: Topic summary of the conversation (can be None).
+        entries: Conversation history, oldest first.
+        created_at: Strictly increasing creation times of the entries.
+        summaries: Compaction summary chunks in insertion order.
+    """
+
+    user_id: str
+    conversation_id: str
+    last_message_timestamp: float
+    topic_summary: Optional[str] = None
+    entries: list[CacheEntry] = field(default_factory=list)
+    created_at: list[float] = field(default_factory=list)
+    summaries: list[ConversationSummary] = field(default_factory=list)
+
+
 class InMemoryCache(Cache):
-    """In-memory cache implementation."""
+    """In-memory cache implementation.
+
+    Conversations are stored in an ordered dictionary keyed by the compound
+    key ``user_id:conversation_id`` and kept in least-recently-used order:
+    every read or write of a conversation moves it to the end, and when the
+    number of stored conversations exceeds ``max_entries`` the conversation
+    at the front is evicted together with its history, topic summary and
+    compaction summaries. A secondary per-user index makes ``list`` cost
+    proportional to the number of the user's conversations only.
+
+    All operations run under a single lock, so the cache can be shared by
+    worker threads and by async handlers calling it from the event loop.
+    Data are lost when the process stops.
+    """
 
     def __init__(self, config: InMemoryCacheConfig) -> None:
         """Create a new instance of in-memory cache.
@@ -26,6 +70,10 @@ class InMemoryCache(Cache):
             config (InMemoryCacheConfig): Configuration options controlling cache behavior.
         """
         self.cache_config = config
+        self.capacity = config.max_entries
+        self._conversations: OrderedDict[str, _ConversationRecord] = OrderedDict()
+        self._user_index: dict[str, set[str]] = {}
+        self._lock = Lock()
 
     def connect(self) -> None:
         """Initialize connection to database.
@@ -52,10 +100,81 @@ class InMemoryCache(Cache):
     def initialize_cache(self) -> None:
         """Initialize cache.
 
-        No-op placeholder for cache initialization.
+        Drop all stored conversations so the cache starts empty.
+        """
+        with self._lock:
+            self._conversations.clear()
+            self._user_index.clear()
+
+    def _lookup(self, key: str) -> Optional[_ConversationRecord]:
+        """Return the record stored under the key and mark it as recently used.
+
+        Must be called with the lock held.
+
+        Parameters:
+        ----------
+            key: Compound key of the conversation.
+
+        Returns:
+        -------
+            The conversation record, or None if the key is not cached.
+        """
+        record = self._conversations.get(key)
+        if record is not None:
+            self._conversations.move_to_end(key)
+        return record
+
+    def _lookup_or_create(
+        self, key: str, user_id: str, conversation_id: str
+    ) -> _ConversationRecord:
+        """Return the record stored under the key, creating it when missing.
+
+        Creating a record can evict the least recently used conversation when
+        the cache is full. Must be called with the lock held.
+
+        Parameters:
+        ----------
+            key: Compound key of the conversation.
+            user_id: User identification.
+            conversation_id: Conversation ID unique for given user.
+
+        Returns:
+        -------
+            The existing or newly created conversation record.
+        """
+        record = self._lookup(key)
+        if record is not None:
+            return record
+
+        record = _ConversationRecord(
+            user_id=user_id,
+            conversation_id=conversation_id,
+            last_message_timestamp=time(),
+        )
+        self._conversations[key] = record
+        self._user_index.setdefault(user_id, set()).add(key)
+        while len(self._conversations) > self.capacity:
+            evicted_key, evicted = self._conversations.popitem(last=False)
+            self._unindex(evicted_key, evicted.user_id)
+            logger.debug("Evicted conversation %s from cache", evicted_key)
+        return record
+
+    def _unindex(self, key: str, user_id: str) -> None:
+        """Remove the key from the per-user index.
+
+        Must be called with the lock held.
 
-        This implementation performs no actions and exists only to satisfy the cache interface.
+        Parameters:
+        ----------
+            key: Compound key of the conversation.
+            user_id: User identification.
         """
+        user_keys = self._user_index.get(user_id)
+        if user_keys is None:
+            return
+        user_keys.discard(key)
+        if not user_keys:
+            del self._user_index[user_id]
 
     @connection
     def get(
@@ -73,11 +192,55 @@ class InMemoryCache(Cache):
 
         Returns:
         -------
-            Empty list.
+            The conversation history, oldest first; empty list if not found.
         """
-        # just check if user_id and conversation_id are UUIDs
-        super().construct_key(user_id, conversation_id, skip_user_id_check)
-        return []
+        key = super().construct_key(user_id, conversation_id, skip_user_id_check)
+        with self._lock:
+            record = self._lookup(key)
+            if record is None:
+                return []
+            return list(record.entries)
+
+    @connection
+    def get_page(  # pylint: disable=too-many-arguments,too-many-positional-arguments
+        self,
+        user_id: str,
+        conversation_id: str,
+        after_created_at: Optional[float],
+        limit: int,
+        skip_user_id_check: bool = False,
+    ) -> CacheEntryPage:
+        """Get one page of conversation history, oldest first.
+
+        Parameters:
+        ----------
+            user_id: User identification.
+            conversation_id: Conversation ID unique for given user.
+            after_created_at: Cursor returned with the previous page, or None.
+            limit: Maximal number of turns on the page.
+            skip_user_id_check: Skip user_id suid check.
+
+        Returns:
+        -------
+            Turns of the page and cursor of the next page.
+        """
+        key = super().construct_key(user_id, conversation_id, skip_user_id_check)
+        with self._lock:
+            record = self._lookup(key)
+            if record is None:
+                return CacheEntryPage(entries=[])
+            start = (
+                0
+                if after_created_at is None
+                else bisect_right(record.created_at, after_created_at)
+            )
+            rows = list(
+                zip(
+                    record.created_at[start : start + limit + 1],
+                    record.entries[start : start + limit + 1],
+                )
+            )
+        return entry_page(rows, limit)
 
     @connection
     def insert_or_append(
@@ -89,11 +252,8 @@ class InMemoryCache(Cache):
     ) -> None:
         """Set the value associated with the given key.
 
-        Validate and construct the cache key for a user's conversation without storing data.
-
-        This method verifies the provided `user_id` and `conversation_id` (via
-        the base class key construction/validation) and performs no persistent
-        storage or mutation.
+        Append the cache entry to the conversation history and update the
+        conversation's last message timestamp.
 
         Parameters:
         ----------
@@ -102,8 +262,16 @@ class InMemoryCache(Cache):
             cache_entry: The `CacheEntry` object to store.
             skip_user_id_check: Skip user_id suid check.
         """
-        # just check if user_id and conversation_id are UUIDs
-        super().construct_key(user_id, conversation_id, skip_user_id_check)
+        key = super().construct_key(user_id, conversation_id, skip_user_id_check)
+        with self._lock:
+            record = self._lookup_or_create(key, user_id, conversation_id)
+            now = time()
+            if record.created_at and now <= record.created_at[-1]:
+                # creation times are cursors of history pages, keep them unique
+                now = math.nextafter(record.created_at[-1], math.inf)
+            record.entries.append(cache_entry)
+            record.created_at.append(now)
+            record.last_message_timestamp = now
 
     @connection
     def delete(
@@ -111,7 +279,8 @@ class InMemoryCache(Cache):
     ) -> bool:
         """Delete conversation history for a given user_id and conversation_id.
 
-        Validate the provided user and conversation identifiers and report deletion success.
+        The conversation record, its topic summary and its compaction
+        summaries are removed as well.
 
         Parameters:
         ----------
@@ -121,11 +290,15 @@ class InMemoryCache(Cache):
 
         Returns:
         -------
-            bool: True in all cases.
+            bool: True if the conversation had history entries, False otherwise.
         """
-        # just check if user_id and conversation_id are UUIDs
-        super().construct_key(user_id, conversation_id, skip_user_id_check)
-        return True
+        key = super().construct_key(user_id, conversation_id, skip_user_id_check)
+        with self._lock:
+            record = self._conversations.pop(key, None)
+            if record is None:
+                return False
+            self._unindex(key, user_id)
+            return len(record.entries) > 0
 
     @connection
     def list(
@@ -140,11 +313,88 @@ class InMemoryCache(Cache):
 
         Returns:
         -------
-            An empty list.
-
+            A list of ConversationData objects containing conversation_id,
+            topic_summary, and last_message_timestamp, most recent first.
         """
         super()._check_user_id(user_id, skip_user_id_check)
-        return []
+        with self._lock:
+            records = [
+                self._conversations[key] for key in self._user_index.get(user_id, ())
+            ]
+        records.sort(key=lambda record: record.last_message_timestamp, reverse=True)
+        return [
+            ConversationData(
+                conversation_id=record.conversation_id,
+                topic_summary=record.topic_summary,
+                last_message_timestamp=record.last_message_timestamp,
+            )
+            for record in records
+        ]
+
+    @connection
+    def list_page(
+        self,
+        user_id: str,
+        before: Optional[str],
+        limit: int,
+        skip_user_id_check: bool = False,
+    ) -> ConversationDataPage:
+        """List one page of conversations for a given user_id, most recent first.
+
+        Parameters:
+        ----------
+            user_id: User identification.
+            before: Cursor returned with the previous page, or None.
+            limit: Maximal number of conversations on the page.
+            skip_user_id_check: Skip user_id suid check.
+
+        Returns:
+        -------
+            Conversations of the page and cursor of the next page.
+        """
+        conversations = sorted(
+            self.list(user_id, skip_user_id_check),
+            key=lambda c: (c.last_message_timestamp, c.conversation_id),
+            reverse=True,
+        )
+        if before is not None:
+            position = decode_cache_cursor(before)
+            conversations = [
+                c
+                for c in conversations
+                if (c.last_message_timestamp, c.conversation_id) < position
+            ]
+        return conversation_page(
+            [(c.last_message_timestamp, c) for c in conversations[: limit + 1]],
+            limit,
+        )
+
+    @connection
+    def get_conversation_meta(
+        self, user_id: str, conversation_id: str, skip_user_id_check: bool = False
+    ) -> Optional[ConversationData]:
+        """Get metadata of one conversation.
+
+        Parameters:
+        ----------
+            user_id: User identification.
+            conversation_id: Conversation ID unique for given user.
+            skip_user_id_check: Skip user_id suid check.
+
+        Returns:
+        -------
+            Metadata of the conversation, or None if it does not exist.
+        """
+        key = super().construct_key(user_id, conversation_id, skip_user_id_check)
+        with self._lock:
+            record = self._lookup(key)
+            if record is None:
+                return None
+            return ConversationData(
+                conversation_id=record.conversation_id,
+                topic_summary=record.topic_summary,
+                last_message_timestamp=record.last_message_timestamp,
+            )
 
     @connection
     def set_topic_summary(
@@ -163,8 +413,11 @@ class InMemoryCache(Cache):
             topic_summary: The topic summary to store.
             skip_user_id_check: Skip user_id suid check.
         """
-        # just check if user_id and conversation_id are UUIDs
-        super().construct_key(user_id, conversation_id, skip_user_id_check)
+        key = super().construct_key(user_id, conversation_id, skip_user_id_check)
+        with self._lock:
+            record = self._lookup_or_create(key, user_id, conversation_id)
+            record.topic_summary = topic_summary
+            record.last_message_timestamp = time()
 
     @connection
     def store_summary(
@@ -174,26 +427,25 @@ class InMemoryCache(Cache):
         summary: ConversationSummary,
         skip_user_id_check: bool = False,
     ) -> None:
-        """Store a compaction summary chunk (no-op for the in-memory cache).
-
-        This implementation does not persist data; it only validates the
-        compound key, mirroring the other in-memory operations.
+        """Append a compaction summary chunk for the given conversation.
 
         Parameters:
         ----------
             user_id: User identification.
             conversation_id: Conversation ID unique for given user.
-            summary: The ConversationSummary chunk (not persisted).
+            summary: The ConversationSummary chunk to store.
             skip_user_id_check: Skip user_id suid check.
         """
-        # just check if user_id and conversation_id are UUIDs
-        super().construct_key(user_id, conversation_id, skip_user_id_check)
+        key = super().construct_key(user_id, conversation_id, skip_user_id_check)
+        with self._lock:
+            record = self._lookup_or_create(key, user_id, conversation_id)
+            record.summaries.append(summary)
 
     @connection
     def get_summaries(
         self, user_id: str, conversation_id: str, skip_user_id_check: bool = False
     ) -> builtins.list[ConversationSummary]:  # this class shadows the list builtin
-        """Return compaction summaries (always empty for the in-memory cache).
+        """Retrieve all compaction summary chunks for a conversation.
 
         Parameters:
         ----------
@@ -203,11 +455,17 @@ class InMemoryCache(Cache):
 
         Returns:
         -------
-            An empty list.
+            Summary chunks for the conversation, oldest first (ordered by
+            ``created_at``); empty list if none exist.
         """
-        # just check if user_id and conversation_id are UUIDs
-        super().construct_key(user_id, conversation_id, skip_user_id_check)
-        return []
+        key = super().construct_key(user_id, conversation_id, skip_user_id_check)
+        with self._lock:
+            record = self._lookup(key)
+            if record is None:
+                return []
+            summaries = builtins.list(record.summaries)
+        # stable sort keeps insertion order for chunks with equal timestamps
+        return sorted(summaries, key=lambda summary: summary.created_at)
 
     @connection
     def replace_summaries(
@@ -217,20 +475,19 @@ class InMemoryCache(Cache):
         folded_summary: ConversationSummary,
         skip_user_id_check: bool = False,
     ) -> None:
-        """Replace stored summary chunks with a fold (no-op for the in-memory cache).
-
-        This implementation does not persist data; it only validates the
-        compound key, mirroring the other in-memory summary operations.
+        """Replace all stored summary chunks for a conversation with one fold.
 
         Parameters:
         ----------
             user_id: User identification.
             conversation_id: Conversation ID unique for given user.
-            folded_summary: The folded summary (not persisted).
+            folded_summary: The folded summary that supersedes existing chunks.
             skip_user_id_check: Skip user_id suid check.
         """
-        # just check if user_id and conversation_id are UUIDs
-        super().construct_key(user_id, conversation_id, skip_user_id_check)
+        key = super().construct_key(user_id, conversation_id, skip_user_id_check)
+        with self._lock:
+            record = self._lookup_or_create(key, user_id, conversation_id)
+            record.summaries = [folded_summary]
 
     def ready(self) -> bool:
         """Check if the cache is ready.
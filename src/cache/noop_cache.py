@@ -1,11 +1,12 @@
 """No-operation cache implementation."""
 
 import builtins
+from typing import Optional
 
 from cache.cache import Cache
-from cache.cache_entry import CacheEntry
+from cache.cache_entry import CacheEntry, CacheEntryPage
 from log import get_logger
-from models.common import ConversationData
+from models.common import ConversationData, ConversationDataPage
 from models.compaction import ConversationSummary
 from utils.connection_decorator import connection
 
@@ -62,6 +63,33 @@ class NoopCache(Cache):
         super().construct_key(user_id, conversation_id, skip_user_id_check)
         return []
 
+    @connection
+    def get_page(  # pylint: disable=too-many-arguments,too-many-positional-arguments
+        self,
+        user_id: str,
+        conversation_id: str,
+        after_created_at: Optional[float],
+        limit: int,
+        skip_user_id_check: bool = False,
+    ) -> CacheEntryPage:
+        """Get one page of conversation history.
+
+        Parameters:
+        ----------
+            user_id: User identification.
+            conversation_id: Conversation ID unique for given user.
+            after_created_at: Cursor returned with the previous page, or None.
+            limit: Maximal number of turns on the page.
+            skip_user_id_check: Skip user_id suid check.
+
+        Returns:
+        -------
+            CacheEntryPage: An empty page (this cache does not persist entries).
+        """
+        # just check if user_id and conversation_id are UUIDs
+        super().construct_key(user_id, conversation_id, skip_user_id_check)
+        return CacheEntryPage(entries=[])
+
     @connection
     def insert_or_append(
         self,
@@ -125,6 +153,50 @@ class NoopCache(Cache):
         super()._check_user_id(user_id, skip_user_id_check)
         return []
 
+    @connection
+    def list_page(
+        self,
+        user_id: str,
+        before: Optional[str],
+        limit: int,
+        skip_user_id_check: bool = False,
+    ) -> ConversationDataPage:
+        """List one page of conversations for a given user_id.
+
+        Parameters:
+        ----------
+            user_id: User identification.
+            before: Cursor returned with the previous page, or None.
+            limit: Maximal number of conversations on the page.
+            skip_user_id_check: Skip user_id suid check.
+
+        Returns:
+        -------
+            An empty page.
+        """
+        super()._check_user_id(user_id, skip_user_id_check)
+        return ConversationDataPage(conversations=[])
+
+    @connection
+    def get_conversation_meta(  # pylint: disable=useless-return
+        self, user_id: str, conversation_id: str, skip_user_id_check: bool = False
+    ) -> Optional[ConversationData]:
+        """Get metadata of one conversation.
+
+        Parameters:
+        ----------
+            user_id: User identification.
+            conversation_id: Conversation ID unique for given user.
+            skip_user_id_check: Skip user_id suid check.
+
+        Returns:
+        -------
+            None, as no conversation is ever stored.
+        """
+        # just check if user_id and conversation_id are UUIDs
+        super().construct_key(user_id, conversation_id, skip_user_id_check)
+        return None
+
     @connection
     def set_topic_summary(
         self,
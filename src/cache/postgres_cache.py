@@ -1,28 +1,69 @@
 """PostgreSQL cache implementation."""
 
+# pylint: disable=too-many-lines
+
 import builtins
 import json
+from typing import Optional
 
 import psycopg2
 from psycopg2.extensions import AsIs
 
-from cache.cache import Cache
-from cache.cache_entry import CacheEntry
+from cache.cache import Cache, conversation_page, entry_page
+from cache.cache_entry import CacheEntry, CacheEntryPage
 from cache.cache_error import CacheError
-from log import get_logger
-from models.common import ConversationData
-from models.common.turn_summary import (
-    ReferencedDocument,
-    ToolCallSummary,
-    ToolResultSummary,
+from cache.retention import (
+    CACHE_TABLE,
+    CONVERSATIONS_TABLE,
+    RETENTION_TABLES,
+    SUMMARIES_TABLE,
+    add_counts,
+    delete_conversations_in_batches,
+    delete_in_batches,
 )
+from log import get_logger
+from models.common import ConversationData, ConversationDataPage
 from models.compaction import ConversationSummary
-from models.config import PostgreSQLDatabaseConfiguration
-from utils.connection_decorator import connection
+from models.config import (
+    ConversationRetentionConfiguration,
+    PostgreSQLDatabaseConfiguration,
+)
+from utils.connection_decorator import connection, start_heartbeat
+from utils.pagination import decode_cache_cursor
+from utils.postgres_pool import PostgresConnectionPool, get_postgres_pool
 
 logger = get_logger(__name__)
 
 
+def validated_namespace(config: PostgreSQLDatabaseConfiguration) -> str:
+    """Return PostgreSQL schema namespace to be used for cache tables.
+
+    Parameters:
+    ----------
+        config: PostgreSQL configuration with optional namespace.
+
+    Returns:
+    -------
+        The configured namespace, or "public" when none is configured.
+
+    Raises:
+    ------
+        ValueError: If the namespace is not a valid PostgreSQL identifier.
+    """
+    if config.namespace is None:
+        return "public"
+    namespace = config.namespace
+    # LCORE-1158 need to be implemented too!
+    # validate namespace contains only valid PostgreSQL identifier characters
+    if not namespace.replace("_", "").replace("$", "").isalnum():
+        raise ValueError(f"Invalid namespace: {namespace}")
+    if len(namespace) > 63:
+        raise ValueError(
+            f"Invalid namespace: {namespace}. Maximum length is 63 characters."
+        )
+    return namespace
+
+
 class PostgresCache(Cache):
     """Cache that uses PostgreSQL to store cached values.
 
@@ -47,6 +88,9 @@ class PostgresCache(Cache):
         "cache_pkey" PRIMARY KEY, btree (user_id, conversation_id, created_at)
         "timestamps" btree (created_at)
     ```
+
+    The conversations table is indexed by `(user_id, last_message_timestamp)`
+    for paginated listing.
     """
 
     CREATE_SCHEMA = """
@@ -99,6 +143,11 @@ class PostgresCache(Cache):
             ON cache (created_at)
         """
 
+    CREATE_CONVERSATIONS_INDEX = """
+        CREATE INDEX IF NOT EXISTS conversations_last_message
+            ON conversations (user_id, last_message_timestamp)
+        """
+
     SELECT_CONVERSATION_HISTORY_STATEMENT = """
         SELECT query, response, provider, model, started_at, completed_at,
                referenced_documents, tool_calls, tool_results
@@ -107,6 +156,21 @@ class PostgresCache(Cache):
          ORDER BY created_at
         """
 
+    # the primary key (user_id, conversation_id, created_at) serves the range;
+    # cursors are epoch seconds, NULL cursor starts with the oldest turn
+    SELECT_CONVERSATION_HISTORY_PAGE_STATEMENT = """
+        SELECT query, response, provider, model, started_at, completed_at,
+               referenced_documents, tool_calls, tool_results,
+               EXTRACT(EPOCH FROM created_at)
+          FROM cache
+         WHERE user_id=%s AND conversation_id=%s
+           AND created_at > COALESCE(
+                   TIMESTAMP 'epoch' + %s::float8 * INTERVAL '1 second',
+                   '-infinity')
+         ORDER BY created_at
+         LIMIT %s
+        """
+
     INSERT_CONVERSATION_HISTORY_STATEMENT = """
         INSERT INTO cache(user_id, conversation_id, created_at, started_at, completed_at,
                           query, response, provider, model, referenced_documents,
@@ -130,6 +194,23 @@ class PostgresCache(Cache):
          ORDER BY last_message_timestamp DESC
     """
 
+    SELECT_CONVERSATION_META_STATEMENT = """
+        SELECT topic_summary, EXTRACT(EPOCH FROM last_message_timestamp)
+          FROM conversations
+         WHERE user_id=%s AND conversation_id=%s
+    """
+
+    LIST_CONVERSATIONS_PAGE_STATEMENT = """
+        SELECT conversation_id, topic_summary, EXTRACT(EPOCH FROM last_message_timestamp),
+               last_message_timestamp
+          FROM conversations
+         WHERE user_id=%s
+           AND (last_message_timestamp, conversation_id)
+               < (COALESCE(%s::timestamp, 'infinity'), %s)
+         ORDER BY last_message_timestamp DESC, conversation_id DESC
+         LIMIT %s
+    """
+
     INSERT_OR_UPDATE_TOPIC_SUMMARY_STATEMENT = """
         INSERT INTO conversations(user_id, conversation_id, topic_summary, last_message_timestamp)
         VALUES (%s, %s, %s, CURRENT_TIMESTAMP)
@@ -167,13 +248,65 @@ class PostgresCache(Cache):
          WHERE user_id=%s AND conversation_id=%s
         """
 
+    SELECT_EXPIRED_CONVERSATIONS_STATEMENT = """
+        SELECT user_id, conversation_id
+          FROM conversations
+         WHERE last_message_timestamp < CURRENT_TIMESTAMP - make_interval(secs => %s)
+         LIMIT %s
+        """
+
+    SELECT_EXCESS_CONVERSATIONS_STATEMENT = """
+        SELECT user_id, conversation_id
+          FROM (SELECT user_id, conversation_id,
+                       ROW_NUMBER() OVER (PARTITION BY user_id
+                                          ORDER BY last_message_timestamp DESC)
+                       AS position
+                  FROM conversations) AS ranked
+         WHERE position > %s
+         LIMIT %s
+        """
+
+    # the timestamps index serves the range; ctid = ANY(ARRAY(...)) is
+    # executed as TID scan
+    DELETE_EXPIRED_TURNS_STATEMENT = """
+        DELETE FROM cache
+         WHERE ctid = ANY(ARRAY(
+               SELECT ctid FROM cache
+                WHERE created_at < CURRENT_TIMESTAMP - make_interval(secs => %s)
+                LIMIT %s))
+        """
+
+    DELETE_EXCESS_TURNS_STATEMENT = """
+        DELETE FROM cache
+         WHERE ctid = ANY(ARRAY(
+               SELECT ctid
+                 FROM (SELECT ctid,
+                              ROW_NUMBER() OVER (PARTITION BY user_id, conversation_id
+                                                 ORDER BY created_at DESC)
+                              AS position
+                         FROM cache) AS ranked
+                WHERE position > %s
+                LIMIT %s))
+        """
+
+    COUNT_ROWS_STATEMENTS = {
+        CACHE_TABLE: "SELECT count(*) FROM cache",
+        CONVERSATIONS_TABLE: "SELECT count(*) FROM conversations",
+        SUMMARIES_TABLE: "SELECT count(*) FROM conversation_summaries",
+    }
+
+    # errors meaning that the connection has been lost and needs to be
+    # re-established, see the @connection decorator
+    disconnect_errors = (psycopg2.OperationalError, psycopg2.InterfaceError)
+
     def __init__(self, config: PostgreSQLDatabaseConfiguration) -> None:
         """Create a new instance of PostgreSQL cache.
 
         Initialize a Postgres-backed cache using the provided database configuration.
 
         Stores the configuration on the instance and establishes the PostgreSQL
-        connection, initializing the cache schema.
+        connection, initializing the cache schema. Connection heartbeat is
+        started when configured.
 
         Parameters:
         ----------
@@ -184,67 +317,60 @@ class PostgresCache(Cache):
 
         # initialize connection to DB
         self.connect()
+        self.heartbeat = start_heartbeat(
+            type(self).__name__, self.ping, config.heartbeat_interval
+        )
         # self.capacity = config.max_entries
 
     # pylint: disable=W0201
     def connect(self) -> None:
-        """Initialize connection to database."""
+        """Initialize connection to database.
+
+        Connections are leased from the pool shared by all storages using the
+        same PostgreSQL database.
+        """
         logger.info("Connecting to storage")
         # make sure the connection will have known state
         # even if PostgreSQL is not alive
-        self.connection = None
-        config = self.postgres_config
-        namespace = "public"
-        if config.namespace is not None:
-            namespace = config.namespace
-            # LCORE-1158 need to be implemented too!
-            # validate namespace contains only valid PostgreSQL identifier characters
-            if not namespace.replace("_", "").replace("$", "").isalnum():
-                raise ValueError(f"Invalid namespace: {namespace}")
-            if len(namespace) > 63:
-                raise ValueError(
-                    f"Invalid namespace: {namespace}. Maximum length is 63 characters."
-                )
+        self.connection: Optional[PostgresConnectionPool] = None
+        namespace = validated_namespace(self.postgres_config)
         try:
-            self.connection = psycopg2.connect(
-                host=config.host,
-                port=config.port,
-                user=config.user,
-                password=config.password.get_secret_value(),
-                dbname=config.db,
-                sslmode=config.ssl_mode,
-                sslrootcert=config.ca_cert_path,
-                gssencmode=config.gss_encmode,
-                options=f"-c search_path={namespace}",
-            )
-            self.initialize_cache(namespace)
+            pool = get_postgres_pool(self.postgres_config)
+            with pool.lease():
+                self.connection = pool
+                self.initialize_cache(namespace)
         except Exception as e:
-            if self.connection is not None:
-                self.connection.close()
+            self.connection = None
             logger.exception("Error initializing Postgres cache:\n%s", e)
             raise
-        self.connection.autocommit = True
 
     def connected(self) -> bool:
-        """Check if connection to cache is alive.
+        """Check if connection to cache is established.
 
-        Determine whether the PostgreSQL connection is alive and responsive.
+        No query is sent to the database; a lost connection is detected when
+        an operation fails and it is re-established by the @connection
+        decorator.
 
         Returns:
-            bool: `True` if the connection exists and a simple probe query
-            succeeds, `False` otherwise.
+            bool: `True` if the connection exists, `False` otherwise.
         """
         if self.connection is None:
             logger.warning("Not connected, need to reconnect later")
             return False
-        try:
-            with self.connection.cursor() as cursor:
-                cursor.execute("SELECT 1")
-            logger.info("Connection to storage is ok")
-            return True
-        except (psycopg2.OperationalError, psycopg2.InterfaceError) as e:
-            logger.error("Disconnected from storage: %s", e)
-            return False
+        return True
+
+    @connection
+    def ping(self) -> None:
+        """Check that the connection is alive by sending a trivial query.
+
+        Raises:
+        ------
+            CacheError: If the cache is disconnected.
+        """
+        if self.connection is None:
+            raise CacheError("ping: cache is disconnected")
+        with self.connection.cursor() as cursor:
+            cursor.execute("SELECT 1")
 
     def initialize_cache(self, namespace: str) -> None:
         """Initialize cache and create schema if needed.
@@ -283,6 +409,9 @@ class PostgresCache(Cache):
         logger.info("Initializing index for cache")
         cursor.execute(PostgresCache.CREATE_INDEX)
 
+        logger.info("Initializing index for conversations")
+        cursor.execute(PostgresCache.CREATE_CONVERSATIONS_INDEX)
+
         cursor.close()
         self.connection.commit()
 
@@ -316,71 +445,84 @@ class PostgresCache(Cache):
             )
             conversation_entries = cursor.fetchall()
 
+            # JSONB values are parsed by the driver, list fields are
+            # validated into models when first accessed
             result = []
             for conversation_entry in conversation_entries:
-                # Parse referenced_documents back into ReferencedDocument objects
-                docs_data = conversation_entry[6]
-                docs_obj = None
-                if docs_data:
-                    try:
-                        docs_obj = [
-                            ReferencedDocument.model_validate(doc) for doc in docs_data
-                        ]
-                    except (ValueError, TypeError) as e:
-                        logger.warning(
-                            "Failed to deserialize referenced_documents for "
-                            "conversation %s: %s",
-                            conversation_id,
-                            e,
-                        )
-
-                # Parse tool_calls back into ToolCallSummary objects
-                tool_calls_data = conversation_entry[7]
-                tool_calls_obj = None
-                if tool_calls_data:
-                    try:
-                        tool_calls_obj = [
-                            ToolCallSummary.model_validate(tc) for tc in tool_calls_data
-                        ]
-                    except (ValueError, TypeError) as e:
-                        logger.warning(
-                            "Failed to deserialize tool_calls for conversation %s: %s",
-                            conversation_id,
-                            e,
-                        )
-
-                # Parse tool_results back into ToolResultSummary objects
-                tool_results_data = conversation_entry[8]
-                tool_results_obj = None
-                if tool_results_data:
-                    try:
-                        tool_results_obj = [
-                            ToolResultSummary.model_validate(tr)
-                            for tr in tool_results_data
-                        ]
-                    except (ValueError, TypeError) as e:
-                        logger.warning(
-                            "Failed to deserialize tool_results for "
-                            "conversation %s: %s",
-                            conversation_id,
-                            e,
-                        )
-
-                cache_entry = CacheEntry(
+                cache_entry = CacheEntry.from_encoded(
+                    None,
                     query=conversation_entry[0],
                     response=conversation_entry[1],
                     provider=conversation_entry[2],
                     model=conversation_entry[3],
                     started_at=conversation_entry[4],
                     completed_at=conversation_entry[5],
-                    referenced_documents=docs_obj,
-                    tool_calls=tool_calls_obj,
-                    tool_results=tool_results_obj,
+                    referenced_documents=conversation_entry[6],
+                    tool_calls=conversation_entry[7],
+                    tool_results=conversation_entry[8],
                 )
                 result.append(cache_entry)
 
         return result
 
+    @connection
+    def get_page(  # pylint: disable=too-many-arguments,too-many-positional-arguments
+        self,
+        user_id: str,
+        conversation_id: str,
+        after_created_at: Optional[float],
+        limit: int,
+        skip_user_id_check: bool = False,
+    ) -> CacheEntryPage:
+        """Get one page of conversation history, oldest first.
+
+        Parameters:
+        ----------
+            user_id: User identification.
+            conversation_id: Conversation ID unique for given user.
+            after_created_at: Cursor returned with the previous page, or None.
+            limit: Maximal number of turns on the page.
+            skip_user_id_check: Skip user_id suid check.
+
+        Returns:
+        -------
+            Turns of the page and cursor of the next page.
+
+        Raises:
+        ------
+            CacheError: If the cache connection is not available.
+        """
+        if self.connection is None:
+            logger.error("Cache is disconnected")
+            raise CacheError("get_page: cache is disconnected")
+
+        with self.connection.cursor() as cursor:
+            cursor.execute(
+                self.SELECT_CONVERSATION_HISTORY_PAGE_STATEMENT,
+                (user_id, conversation_id, after_created_at, limit + 1),
+            )
+            conversation_entries = cursor.fetchall()
+
+        rows = [
+            (
+                float(conversation_entry[9]),
+                CacheEntry.from_encoded(
+                    None,
+                    query=conversation_entry[0],
+                    response=conversation_entry[1],
+                    provider=conversation_entry[2],
+                    model=conversation_entry[3],
+                    started_at=conversation_entry[4],
+                    completed_at=conversation_entry[5],
+                    referenced_documents=conversation_entry[6],
+                    tool_calls=conversation_entry[7],
+                    tool_results=conversation_entry[8],
+                ),
+            )
+            for conversation_entry in conversation_entries
+        ]
+        return entry_page(rows, limit)
+
     @connection
     def insert_or_append(
         self,
@@ -566,6 +708,97 @@ class PostgresCache(Cache):
 
         return result
 
+    @connection
+    def list_page(
+        self,
+        user_id: str,
+        before: Optional[str],
+        limit: int,
+        skip_user_id_check: bool = False,
+    ) -> ConversationDataPage:
+        """List one page of conversations for a given user_id, most recent first.
+
+        Parameters:
+        ----------
+            user_id: User identification.
+            before: Cursor returned with the previous page, or None.
+            limit: Maximal number of conversations on the page.
+            skip_user_id_check: Skip user_id suid check.
+
+        Returns:
+        -------
+            Conversations of the page and cursor of the next page.
+
+        Raises:
+        ------
+            CacheError: If the cache connection is not available.
+        """
+        if self.connection is None:
+            logger.error("Cache is disconnected")
+            raise CacheError("list_page: cache is disconnected")
+
+        # the cursor holds the stored timestamp, which is exact unlike epoch
+        position = decode_cache_cursor(before) if before is not None else (None, "")
+        with self.connection.cursor() as cursor:
+            cursor.execute(
+                self.LIST_CONVERSATIONS_PAGE_STATEMENT,
+                (user_id, *position, limit + 1),
+            )
+            conversations = cursor.fetchall()
+
+        return conversation_page(
+            [
+                (
+                    conversation[3],
+                    ConversationData(
+                        conversation_id=conversation[0],
+                        topic_summary=conversation[1],
+                        last_message_timestamp=float(conversation[2]),
+                    ),
+                )
+                for conversation in conversations
+            ],
+            limit,
+        )
+
+    @connection
+    def get_conversation_meta(
+        self, user_id: str, conversation_id: str, skip_user_id_check: bool = False
+    ) -> Optional[ConversationData]:
+        """Get metadata of one conversation.
+
+        Parameters:
+        ----------
+            user_id: User identification.
+            conversation_id: Conversation ID unique for given user.
+            skip_user_id_check: Skip user_id suid check.
+
+        Returns:
+        -------
+            Metadata of the conversation, or None if it does not exist.
+
+        Raises:
+        ------
+            CacheError: If the cache connection is not available.
+        """
+        if self.connection is None:
+            logger.error("Cache is disconnected")
+            raise CacheError("get_conversation_meta: cache is disconnected")
+
+        with self.connection.cursor() as cursor:
+            cursor.execute(
+                self.SELECT_CONVERSATION_META_STATEMENT, (user_id, conversation_id)
+            )
+            row = cursor.fetchone()
+
+        if row is None:
+            return None
+        return ConversationData(
+            conversation_id=conversation_id,
+            topic_summary=row[0],
+            last_message_timestamp=float(row[1]),
+        )
+
     @connection
     def set_topic_summary(
         self,
@@ -738,6 +971,108 @@ class PostgresCache(Cache):
             logger.error("PostgresCache.replace_summaries: %s", e)
             raise CacheError("PostgresCache.replace_summaries", e) from e
 
+    @connection
+    def apply_retention(
+        self, retention: ConversationRetentionConfiguration
+    ) -> dict[str, int]:
+        """Delete turns and conversations outside the retention policy.
+
+        Rows are deleted in batches, each committed on its own. Free space is
+        reclaimed by PostgreSQL autovacuum.
+
+        Parameters:
+        ----------
+            retention: Retention policy to be enforced.
+
+        Returns:
+        -------
+            Number of deleted rows for each table.
+
+        Raises:
+        ------
+            CacheError: If the cache is disconnected or a database error occurs.
+        """
+        if self.connection is None:
+            logger.error("Cache is disconnected")
+            raise CacheError("apply_retention: cache is disconnected")
+
+        batch_size = retention.batch_size
+        conversation_statements = {
+            CACHE_TABLE: PostgresCache.DELETE_SINGLE_CONVERSATION_STATEMENT,
+            SUMMARIES_TABLE: PostgresCache.DELETE_SUMMARIES_STATEMENT,
+            CONVERSATIONS_TABLE: PostgresCache.DELETE_CONVERSATION_STATEMENT,
+        }
+        deleted = dict.fromkeys(RETENTION_TABLES, 0)
+
+        try:
+            with self.connection.cursor() as cursor:
+                if retention.max_age is not None:
+                    add_counts(
+                        deleted,
+                        delete_conversations_in_batches(
+                            cursor,
+                            PostgresCache.SELECT_EXPIRED_CONVERSATIONS_STATEMENT,
+                            (retention.max_age,),
+                            batch_size,
+                            conversation_statements,
+                        ),
+                    )
+                    deleted[CACHE_TABLE] += delete_in_batches(
+                        cursor,
+                        PostgresCache.DELETE_EXPIRED_TURNS_STATEMENT,
+                        (retention.max_age,),
+                        batch_size,
+                    )
+                if retention.max_conversations_per_user is not None:
+                    add_counts(
+                        deleted,
+                        delete_conversations_in_batches(
+                            cursor,
+                            PostgresCache.SELECT_EXCESS_CONVERSATIONS_STATEMENT,
+                            (retention.max_conversations_per_user,),
+                            batch_size,
+                            conversation_statements,
+                        ),
+                    )
+                if retention.max_turns_per_conversation is not None:
+                    deleted[CACHE_TABLE] += delete_in_batches(
+                        cursor,
+                        PostgresCache.DELETE_EXCESS_TURNS_STATEMENT,
+                        (retention.max_turns_per_conversation,),
+                        batch_size,
+                    )
+        except psycopg2.DatabaseError as e:
+            logger.error("PostgresCache.apply_retention: %s", e)
+            raise CacheError("PostgresCache.apply_retention", e) from e
+        return deleted
+
+    @connection
+    def table_sizes(self) -> dict[str, int]:
+        """Return number of rows stored in each table.
+
+        Returns:
+        -------
+            Number of rows for each table.
+
+        Raises:
+        ------
+            CacheError: If the cache is disconnected or a database error occurs.
+        """
+        if self.connection is None:
+            logger.error("Cache is disconnected")
+            raise CacheError("table_sizes: cache is disconnected")
+
+        sizes = {}
+        try:
+            with self.connection.cursor() as cursor:
+                for table, statement in PostgresCache.COUNT_ROWS_STATEMENTS.items():
+                    cursor.execute(statement)
+                    sizes[table] = cursor.fetchone()[0]
+        except psycopg2.DatabaseError as e:
+            logger.error("PostgresCache.table_sizes: %s", e)
+            raise CacheError("PostgresCache.table_sizes", e) from e
+        return sizes
+
     def ready(self) -> bool:
         """Check if the cache is ready.
 
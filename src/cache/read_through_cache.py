@@ -0,0 +1,449 @@
+"""Asynchronous cache that keeps recently read conversations in process memory."""
+
+import builtins
+import threading
+from collections import OrderedDict
+from collections.abc import Sequence
+from dataclasses import dataclass
+from time import monotonic
+from typing import Any, Final, Optional
+from weakref import WeakSet
+
+from cache.async_cache import AsyncCache
+from cache.cache_entry import CacheEntry, CacheEntryPage
+from log import get_logger
+from metrics.recording import record_conversation_cache_lookup
+from models.common import ConversationData, ConversationDataPage
+from models.compaction import ConversationSummary
+from models.config import ReadThroughCacheConfiguration
+
+logger = get_logger(__name__)
+
+# kinds of cached data
+HISTORY: Final[str] = "history"
+SUMMARIES: Final[str] = "summaries"
+
+# read-through caches created by this process
+_instances: "WeakSet[ReadThroughCache]" = WeakSet()
+_instances_lock = threading.Lock()
+
+
+def invalidate_read_through_caches() -> None:
+    """Drop data kept by all read-through caches of this process.
+
+    Used when conversations are changed outside of the caches, e.g. by the
+    cache retention sweeper. Safe to be called from any thread.
+    """
+    with _instances_lock:
+        caches = list(_instances)
+    for cache in caches:
+        cache.invalidate_all()
+
+
+@dataclass(eq=False)
+class _Read:
+    """Read of data missing in the cache, started in the given generation."""
+
+    generation: int
+
+
+class ReadThroughCache(AsyncCache):
+    """Cache wrapper that keeps recently read conversations in an LRU cache.
+
+    Conversation histories read by `get` and summary chunks read by
+    `get_summaries` are kept in process memory, so repeated reads of active
+    conversations do not need a database round trip. At most `max_entries`
+    histories and summary lists are kept; the least recently used ones are
+    evicted first. Cached data are invalidated by every operation changing
+    the conversation and they expire after `ttl` seconds, which bounds how
+    long changes made by other processes stay invisible. All cached data
+    are dropped by `invalidate_all`, e.g. when the cache retention sweeper
+    deletes old conversations.
+
+    Paginated reads, conversation listing and conversation metadata are
+    delegated to the wrapped cache directly.
+    """
+
+    def __init__(
+        self, cache: AsyncCache, config: ReadThroughCacheConfiguration
+    ) -> None:
+        """Create read-through wrapper of the given cache.
+
+        Parameters:
+        ----------
+            cache: Cache where the conversations are stored.
+            config: Read-through cache configuration.
+        """
+        self._cache = cache
+        self.max_entries = config.max_entries
+        self.ttl = config.ttl
+        # (kind, key) -> (expiration time, generation, cached data), least
+        # recent first
+        self._entries: OrderedDict[tuple[str, str], tuple[float, int, Any]] = (
+            OrderedDict()
+        )
+        # reads in progress; a change of the conversation drops its token,
+        # so data read before the change are not cached
+        self._loading: dict[tuple[str, str], _Read] = {}
+        # data cached in older generations are dropped when looked up
+        self._generation = 0
+        with _instances_lock:
+            _instances.add(self)
+
+    def __len__(self) -> int:
+        """Return number of cached histories and summary lists."""
+        return len(self._entries)
+
+    def _lookup(self, kind: str, key: str) -> Optional[Any]:
+        """Return cached data of the given kind, or None if not cached."""
+        cached = self._entries.get((kind, key))
+        if (
+            cached is not None
+            and cached[0] > monotonic()
+            and cached[1] == self._generation
+        ):
+            self._entries.move_to_end((kind, key))
+            record_conversation_cache_lookup(kind, True)
+            return cached[2]
+        if cached is not None:
+            del self._entries[(kind, key)]
+        record_conversation_cache_lookup(kind, False)
+        return None
+
+    def _start_loading(self, kind: str, key: str) -> _Read:
+        """Register read of data missing in the cache and return its token."""
+        token = _Read(self._generation)
+        self._loading[(kind, key)] = token
+        return token
+
+    def _store(self, kind: str, key: str, token: _Read, data: Any) -> None:
+        """Cache data unless the conversation has changed while being read."""
+        if self._loading.get((kind, key)) is not token:
+            return
+        del self._loading[(kind, key)]
+        if token.generation != self._generation:
+            return
+        self._entries[(kind, key)] = (monotonic() + self.ttl, token.generation, data)
+        self._entries.move_to_end((kind, key))
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+
+    def _cancel_loading(self, kind: str, key: str, token: _Read) -> None:
+        """Unregister read that failed."""
+        if self._loading.get((kind, key)) is token:
+            del self._loading[(kind, key)]
+
+    def _invalidate(self, key: str, *kinds: str) -> None:
+        """Drop cached data of the given kinds for the conversation."""
+        for kind in kinds:
+            self._entries.pop((kind, key), None)
+            self._loading.pop((kind, key), None)
+
+    def invalidate_all(self) -> None:
+        """Drop all cached data, including data being read.
+
+        Safe to be called from other threads than the one running the event
+        loop; the data are dropped when they are looked up next time.
+        """
+        self._generation += 1
+
+    async def initialize_cache(self) -> None:
+        """Initialize the wrapped cache."""
+        await self._cache.initialize_cache()
+
+    async def get(
+        self, user_id: str, conversation_id: str, skip_user_id_check: bool = False
+    ) -> builtins.list[CacheEntry]:
+        """Get the conversation history, oldest first.
+
+        Parameters:
+        ----------
+            user_id: User identification.
+            conversation_id: Conversation ID unique for given user.
+            skip_user_id_check: Skip user_id suid check.
+
+        Returns:
+        -------
+            The conversation history, oldest first.
+        """
+        key = self.construct_key(user_id, conversation_id, skip_user_id_check)
+        entries = self._lookup(HISTORY, key)
+        if entries is None:
+            token = self._start_loading(HISTORY, key)
+            try:
+                entries = await self._cache.get(
+                    user_id, conversation_id, skip_user_id_check
+                )
+            except BaseException:
+                self._cancel_loading(HISTORY, key, token)
+                raise
+            self._store(HISTORY, key, token, list(entries))
+        # callers are allowed to modify the returned list
+        return list(entries)
+
+    async def get_page(  # pylint: disable=too-many-arguments,too-many-positional-arguments
+        self,
+        user_id: str,
+        conversation_id: str,
+        after_created_at: Optional[float],
+        limit: int,
+        skip_user_id_check: bool = False,
+    ) -> CacheEntryPage:
+        """Get one page of conversation history from the wrapped cache.
+
+        Parameters:
+        ----------
+            user_id: User identification.
+            conversation_id: Conversation ID unique for given user.
+            after_created_at: Cursor returned with the previous page, or None.
+            limit: Maximal number of turns on the page.
+            skip_user_id_check: Skip user_id suid check.
+
+        Returns:
+        -------
+            Turns of the page and cursor of the next page.
+        """
+        return await self._cache.get_page(
+            user_id, conversation_id, after_created_at, limit, skip_user_id_check
+        )
+
+    async def insert_or_append(
+        self,
+        user_id: str,
+        conversation_id: str,
+        cache_entry: CacheEntry,
+        skip_user_id_check: bool = False,
+    ) -> None:
+        """Append the turn and invalidate the cached history.
+
+        Parameters:
+        ----------
+            user_id: User identification.
+            conversation_id: Conversation ID unique for given user.
+            cache_entry: The `CacheEntry` object to store.
+            skip_user_id_check: Skip user_id suid check.
+        """
+        key = self.construct_key(user_id, conversation_id, skip_user_id_check)
+        try:
+            await self._cache.insert_or_append(
+                user_id, conversation_id, cache_entry, skip_user_id_check
+            )
+        finally:
+            self._invalidate(key, HISTORY)
+
+    async def insert_or_append_many(
+        self,
+        entries: Sequence[tuple[str, str, CacheEntry]],
+        skip_user_id_check: bool,
+    ) -> None:
+        """Append several turns and invalidate the cached histories.
+
+        Parameters:
+        ----------
+            entries: Triples (user ID, conversation ID, cache entry), oldest first.
+            skip_user_id_check: Skip user_id suid check.
+        """
+        keys = {
+            self.construct_key(user_id, conversation_id, skip_user_id_check)
+            for user_id, conversation_id, _ in entries
+        }
+        try:
+            await self._cache.insert_or_append_many(entries, skip_user_id_check)
+        finally:
+            for key in keys:
+                self._invalidate(key, HISTORY)
+
+    async def delete(
+        self, user_id: str, conversation_id: str, skip_user_id_check: bool = False
+    ) -> bool:
+        """Delete the conversation and invalidate its cached data.
+
+        Parameters:
+        ----------
+            user_id: User identification.
+            conversation_id: Conversation ID unique for given user.
+            skip_user_id_check: Skip user_id suid check.
+
+        Returns:
+        -------
+            bool: True if the conversation was deleted, False if not found.
+        """
+        key = self.construct_key(user_id, conversation_id, skip_user_id_check)
+        try:
+            return await self._cache.delete(
+                user_id, conversation_id, skip_user_id_check
+            )
+        finally:
+            self._invalidate(key, HISTORY, SUMMARIES)
+
+    async def list(
+        self, user_id: str, skip_user_id_check: bool = False
+    ) -> builtins.list[ConversationData]:
+        """List all conversations for a given user_id.
+
+        Parameters:
+        ----------
+            user_id: User identification.
+            skip_user_id_check: Skip user_id suid check.
+
+        Returns:
+        -------
+            A list of ConversationData objects, most recent first.
+        """
+        return await self._cache.list(user_id, skip_user_id_check)
+
+    async def list_page(
+        self,
+        user_id: str,
+        before: Optional[str],
+        limit: int,
+        skip_user_id_check: bool = False,
+    ) -> ConversationDataPage:
+        """List one page of conversations from the wrapped cache.
+
+        Parameters:
+        ----------
+            user_id: User identification.
+            before: Cursor returned with the previous page, or None.
+            limit: Maximal number of conversations on the page.
+            skip_user_id_check: Skip user_id suid check.
+
+        Returns:
+        -------
+            Conversations of the page and cursor of the next page.
+        """
+        return await self._cache.list_page(user_id, before, limit, skip_user_id_check)
+
+    async def get_conversation_meta(
+        self, user_id: str, conversation_id: str, skip_user_id_check: bool = False
+    ) -> Optional[ConversationData]:
+        """Get metadata of one conversation from the wrapped cache.
+
+        Parameters:
+        ----------
+            user_id: User identification.
+            conversation_id: Conversation ID unique for given user.
+            skip_user_id_check: Skip user_id suid check.
+
+        Returns:
+        -------
+            Metadata of the conversation, or None if it does not exist.
+        """
+        return await self._cache.get_conversation_meta(
+            user_id, conversation_id, skip_user_id_check
+        )
+
+    async def set_topic_summary(
+        self,
+        user_id: str,
+        conversation_id: str,
+        topic_summary: str,
+        skip_user_id_check: bool = False,
+    ) -> None:
+        """Set the topic summary and invalidate the cached history.
+
+        Parameters:
+        ----------
+            user_id: User identification.
+            conversation_id: Conversation ID unique for given user.
+            topic_summary: The topic summary to store.
+            skip_user_id_check: Skip user_id suid check.
+        """
+        key = self.construct_key(user_id, conversation_id, skip_user_id_check)
+        try:
+            await self._cache.set_topic_summary(
+                user_id, conversation_id, topic_summary, skip_user_id_check
+            )
+        finally:
+            self._invalidate(key, HISTORY)
+
+    async def store_summary(
+        self,
+        user_id: str,
+        conversation_id: str,
+        summary: ConversationSummary,
+        skip_user_id_check: bool = False,
+    ) -> None:
+        """Store a summary chunk and invalidate the cached summaries.
+
+        Parameters:
+        ----------
+            user_id: User identification.
+            conversation_id: Conversation ID unique for given user.
+            summary: The summary chunk to store.
+            skip_user_id_check: Skip user_id suid check.
+        """
+        key = self.construct_key(user_id, conversation_id, skip_user_id_check)
+        try:
+            await self._cache.store_summary(
+                user_id, conversation_id, summary, skip_user_id_check
+            )
+        finally:
+            self._invalidate(key, SUMMARIES)
+
+    async def get_summaries(
+        self, user_id: str, conversation_id: str, skip_user_id_check: bool = False
+    ) -> builtins.list[ConversationSummary]:
+        """Return summary chunks of the conversation.
+
+        Parameters:
+        ----------
+            user_id: User identification.
+            conversation_id: Conversation ID unique for given user.
+            skip_user_id_check: Skip user_id suid check.
+
+        Returns:
+        -------
+            Summary chunks ordered by ``created_at`` ascending.
+        """
+        key = self.construct_key(user_id, conversation_id, skip_user_id_check)
+        summaries = self._lookup(SUMMARIES, key)
+        if summaries is None:
+            token = self._start_loading(SUMMARIES, key)
+            try:
+                summaries = await self._cache.get_summaries(
+                    user_id, conversation_id, skip_user_id_check
+                )
+            except BaseException:
+                self._cancel_loading(SUMMARIES, key, token)
+                raise
+            self._store(SUMMARIES, key, token, list(summaries))
+        return list(summaries)
+
+    async def replace_summaries(
+        self,
+        user_id: str,
+        conversation_id: str,
+        folded_summary: ConversationSummary,
+        skip_user_id_check: bool = False,
+    ) -> None:
+        """Replace stored summary chunks and invalidate the cached summaries.
+
+        Parameters:
+        ----------
+            user_id: User identification.
+            conversation_id: Conversation ID unique for given user.
+            folded_summary: The folded summary to store.
+            skip_user_id_check: Skip user_id suid check.
+        """
+        key = self.construct_key(user_id, conversation_id, skip_user_id_check)
+        try:
+            await self._cache.replace_summaries(
+                user_id, conversation_id, folded_summary, skip_user_id_check
+            )
+        finally:
+            self._invalidate(key, SUMMARIES)
+
+    def ready(self) -> bool:
+        """Check if the wrapped cache is ready.
+
+        Returns:
+            True if the cache is ready, False otherwise.
+        """
+        return self._cache.ready()
+
+    async def close(self) -> None:
+        """Drop cached data and close the wrapped cache."""
+        self._entries.clear()
+        self._loading.clear()
+        await self._cache.close()
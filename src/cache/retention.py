@@ -0,0 +1,89 @@
+"""Batched deletion of conversation cache rows outside the retention policy.
+
+Helpers shared by caches storing data in a database. Every statement deletes
+at most one batch of rows, so locks are held only briefly and requests using
+the cache are not blocked by the sweeper for long.
+"""
+
+from collections.abc import Sequence
+from typing import Any, Final
+
+from log import get_logger
+
+logger = get_logger(__name__)
+
+CACHE_TABLE: Final[str] = "cache"
+CONVERSATIONS_TABLE: Final[str] = "conversations"
+SUMMARIES_TABLE: Final[str] = "conversation_summaries"
+
+RETENTION_TABLES: Final[tuple[str, ...]] = (
+    CACHE_TABLE,
+    CONVERSATIONS_TABLE,
+    SUMMARIES_TABLE,
+)
+
+
+def delete_in_batches(
+    cursor: Any, statement: str, parameters: Sequence[Any], batch_size: int
+) -> int:
+    """Repeat DELETE statement until it deletes less than one batch of rows.
+
+    Parameters:
+    ----------
+        cursor: DB-API cursor of connection in autocommit mode.
+        statement: DELETE statement; its last parameter is the batch size.
+        parameters: Other parameters of the statement.
+        batch_size: Maximum number of rows deleted by one statement.
+
+    Returns:
+    -------
+        Total number of deleted rows.
+    """
+    deleted = 0
+    while True:
+        cursor.execute(statement, (*parameters, batch_size))
+        deleted += max(cursor.rowcount, 0)
+        if cursor.rowcount < batch_size:
+            return deleted
+
+
+def delete_conversations_in_batches(
+    cursor: Any,
+    select_statement: str,
+    parameters: Sequence[Any],
+    batch_size: int,
+    delete_statements: dict[str, str],
+) -> dict[str, int]:
+    """Delete selected conversations with all their rows, batch by batch.
+
+    Parameters:
+    ----------
+        cursor: DB-API cursor of connection in autocommit mode.
+        select_statement: Statement selecting (user_id, conversation_id) of
+        conversations to be deleted; its last parameter is the batch size.
+        parameters: Other parameters of the select statement.
+        batch_size: Maximum number of conversations deleted at once.
+        delete_statements: Statement deleting rows of one conversation,
+        for each table.
+
+    Returns:
+    -------
+        Number of deleted rows for each table.
+    """
+    deleted = dict.fromkeys(delete_statements, 0)
+    while True:
+        cursor.execute(select_statement, (*parameters, batch_size))
+        keys = cursor.fetchall()
+        if not keys:
+            return deleted
+        for table, statement in delete_statements.items():
+            cursor.executemany(statement, keys)
+            deleted[table] += max(cursor.rowcount, 0)
+        if len(keys) < batch_size:
+            return deleted
+
+
+def add_counts(total: dict[str, int], counts: dict[str, int]) -> None:
+    """Add numbers of deleted rows to totals for each table."""
+    for table, count in counts.items():
+        total[table] = total.get(table, 0) + count
@@ -1,26 +1,105 @@
 """Cache that uses SQLite to store cached values."""
 
+# pylint: disable=too-many-lines
+
 import builtins
-import json
 import sqlite3
+from collections.abc import Callable, Iterator
+from contextlib import contextmanager
+from functools import wraps
+from queue import Queue
+from threading import Lock
 from time import time
+from typing import Any, Concatenate, Optional, ParamSpec, TypeVar
 
-from cache.cache import Cache
-from cache.cache_entry import CacheEntry
+from cache.cache import Cache, conversation_page, entry_page
+from cache.cache_entry import CacheEntry, CacheEntryPage
 from cache.cache_error import CacheError
-from log import get_logger
-from models.common import ConversationData
-from models.common.turn_summary import (
-    ReferencedDocument,
-    ToolCallSummary,
-    ToolResultSummary,
+from cache.entry_codec import decode_items, encode_items
+from cache.retention import (
+    CACHE_TABLE,
+    CONVERSATIONS_TABLE,
+    RETENTION_TABLES,
+    SUMMARIES_TABLE,
+    add_counts,
+    delete_conversations_in_batches,
+    delete_in_batches,
 )
+from log import get_logger
+from models.common import ConversationData, ConversationDataPage
 from models.compaction import ConversationSummary
-from models.config import SQLiteDatabaseConfiguration
+from models.config import (
+    ConversationRetentionConfiguration,
+    SQLiteConcurrencyConfiguration,
+    SQLiteDatabaseConfiguration,
+)
 from utils.connection_decorator import connection
+from utils.pagination import decode_cache_cursor
 
 logger = get_logger(__name__)
 
+P = ParamSpec("P")
+R = TypeVar("R")
+
+# pragmas of high-concurrency mode; values are validated by the configuration
+ENABLE_WAL_STATEMENT = "PRAGMA journal_mode = WAL"
+SET_SYNCHRONOUS_STATEMENT = "PRAGMA synchronous = %s"
+SET_MMAP_SIZE_STATEMENT = "PRAGMA mmap_size = %d"
+# negative value means size in KiB instead of number of pages
+SET_CACHE_SIZE_STATEMENT = "PRAGMA cache_size = -%d"
+ENABLE_QUERY_ONLY_STATEMENT = "PRAGMA query_only = ON"
+
+
+def configure_connection(
+    dbapi_connection: Any, config: SQLiteConcurrencyConfiguration, read_only: bool
+) -> None:
+    """Apply pragmas of high-concurrency mode to a new connection.
+
+    The writer switches the database to write-ahead log journal mode, which
+    is persistent, so readers only tune their caches and refuse writes.
+    Auto-vacuum mode of a new database can not be changed once WAL mode is
+    enabled, so it is set by the writer first.
+
+    Parameters:
+    ----------
+        dbapi_connection: DB-API connection to SQLite database, not in
+        transaction.
+        config: High-concurrency mode configuration.
+        read_only: True for connections serving reads only.
+    """
+    cursor = dbapi_connection.cursor()
+    if read_only:
+        cursor.execute(ENABLE_QUERY_ONLY_STATEMENT)
+    else:
+        cursor.execute(SQLiteCache.ENABLE_INCREMENTAL_VACUUM)
+        cursor.execute(ENABLE_WAL_STATEMENT)
+        cursor.execute(SET_SYNCHRONOUS_STATEMENT % config.synchronous)
+    cursor.execute(SET_MMAP_SIZE_STATEMENT % config.mmap_size)
+    cursor.execute(SET_CACHE_SIZE_STATEMENT % config.cache_size)
+    cursor.close()
+
+
+def writer(
+    f: Callable[Concatenate["SQLiteCache", P], R],
+) -> Callable[Concatenate["SQLiteCache", P], R]:
+    """Run the decorated method while holding the write lock of the cache.
+
+    Parameters:
+    ----------
+        f: Cache method changing the database.
+
+    Returns:
+    -------
+        Wrapped method using the writer connection exclusively.
+    """
+
+    @wraps(f)
+    def wrapper(cache: "SQLiteCache", *args: P.args, **kwargs: P.kwargs) -> R:
+        with cache.write_lock:
+            return f(cache, *args, **kwargs)
+
+    return wrapper
+
 
 class SQLiteCache(Cache):
     """Cache that uses SQLite to store cached values.
@@ -46,10 +125,31 @@ class SQLiteCache(Cache):
         "cache_pkey" PRIMARY KEY, btree (user_id, conversation_id, created_at)
         "cache_key_key" UNIQUE CONSTRAINT, btree (key)
         "timestamps" btree (updated_at)
+        "conversations_last_message" btree (user_id, last_message_timestamp)
+            on conversations table
     Access method: heap
     ```
+
+    Referenced documents, tool calls and tool results are stored in the
+    compact format of `cache.entry_codec` (BLOB values, which SQLite allows
+    in text columns); rows written by older versions hold JSON text.
+
+    New databases are created with incremental auto-vacuum, so the space
+    freed by the retention sweeper can be returned to the file system.
+    Databases created by older versions need one full `VACUUM` to switch.
+
+    When high-concurrency mode is configured, the database uses write-ahead
+    log journal mode. All writes go through one dedicated writer connection
+    guarded by a lock, while reads lease one of a small pool of read-only
+    connections, so readers do not wait for the writer and the cache can be
+    shared by threads. Each connection keeps its prepared statements cached.
     """
 
+    # effective only before the first table is created
+    ENABLE_INCREMENTAL_VACUUM = """
+        PRAGMA auto_vacuum = INCREMENTAL
+        """
+
     CREATE_CACHE_TABLE = """
         CREATE TABLE IF NOT EXISTS cache (
             user_id              text NOT NULL,
@@ -96,6 +196,11 @@ class SQLiteCache(Cache):
             ON cache (created_at)
         """
 
+    CREATE_CONVERSATIONS_INDEX = """
+        CREATE INDEX IF NOT EXISTS conversations_last_message
+            ON conversations (user_id, last_message_timestamp)
+        """
+
     SELECT_CONVERSATION_HISTORY_STATEMENT = """
         SELECT query, response, provider, model, started_at, completed_at,
                referenced_documents, tool_calls, tool_results
@@ -104,6 +209,16 @@ class SQLiteCache(Cache):
          ORDER BY created_at
         """
 
+    # the primary key (user_id, conversation_id, created_at) serves the range
+    SELECT_CONVERSATION_HISTORY_PAGE_STATEMENT = """
+        SELECT query, response, provider, model, started_at, completed_at,
+               referenced_documents, tool_calls, tool_results, created_at
+          FROM cache
+         WHERE user_id=? AND conversation_id=? AND created_at > ?
+         ORDER BY created_at
+         LIMIT ?
+        """
+
     INSERT_CONVERSATION_HISTORY_STATEMENT = """
         INSERT INTO cache(user_id, conversation_id, created_at, started_at, completed_at,
                           query, response, provider, model, referenced_documents,
@@ -127,6 +242,20 @@ class SQLiteCache(Cache):
          ORDER BY last_message_timestamp DESC
     """
 
+    SELECT_CONVERSATION_META_STATEMENT = """
+        SELECT topic_summary, last_message_timestamp
+          FROM conversations
+         WHERE user_id=? AND conversation_id=?
+    """
+
+    LIST_CONVERSATIONS_PAGE_STATEMENT = """
+        SELECT conversation_id, topic_summary, last_message_timestamp
+          FROM conversations
+         WHERE user_id=? AND (last_message_timestamp, conversation_id) < (?, ?)
+         ORDER BY last_message_timestamp DESC, conversation_id DESC
+         LIMIT ?
+    """
+
     INSERT_OR_UPDATE_TOPIC_SUMMARY_STATEMENT = """
         INSERT OR REPLACE INTO conversations(user_id, conversation_id, topic_summary, last_message_timestamp)
         VALUES (?, ?, ?, ?)
@@ -162,6 +291,61 @@ class SQLiteCache(Cache):
          WHERE user_id=? AND conversation_id=?
         """
 
+    SELECT_EXPIRED_CONVERSATIONS_STATEMENT = """
+        SELECT user_id, conversation_id
+          FROM conversations
+         WHERE last_message_timestamp < ?
+         LIMIT ?
+        """
+
+    SELECT_EXCESS_CONVERSATIONS_STATEMENT = """
+        SELECT user_id, conversation_id
+          FROM (SELECT user_id, conversation_id,
+                       ROW_NUMBER() OVER (PARTITION BY user_id
+                                          ORDER BY last_message_timestamp DESC)
+                       AS position
+                  FROM conversations)
+         WHERE position > ?
+         LIMIT ?
+        """
+
+    # the timestamps index serves the range
+    DELETE_EXPIRED_TURNS_STATEMENT = """
+        DELETE FROM cache
+         WHERE rowid IN (SELECT rowid FROM cache WHERE created_at < ? LIMIT ?)
+        """
+
+    DELETE_EXCESS_TURNS_STATEMENT = """
+        DELETE FROM cache
+         WHERE rowid IN (
+               SELECT rowid
+                 FROM (SELECT rowid,
+                              ROW_NUMBER() OVER (PARTITION BY user_id, conversation_id
+                                                 ORDER BY created_at DESC)
+                              AS position
+                         FROM cache)
+                WHERE position > ?
+                LIMIT ?)
+        """
+
+    QUERY_AUTO_VACUUM = """
+        PRAGMA auto_vacuum
+        """
+
+    # SQLite does not accept bound parameters in PRAGMA statements
+    INCREMENTAL_VACUUM_STATEMENT = """
+        PRAGMA incremental_vacuum(%d)
+        """
+
+    # incremental value of auto_vacuum pragma
+    AUTO_VACUUM_INCREMENTAL = 2
+
+    COUNT_ROWS_STATEMENTS = {
+        CACHE_TABLE: "SELECT count(*) FROM cache",
+        CONVERSATIONS_TABLE: "SELECT count(*) FROM conversations",
+        SUMMARIES_TABLE: "SELECT count(*) FROM conversation_summaries",
+    }
+
     def __init__(self, config: SQLiteDatabaseConfiguration) -> None:
         """Create a new instance of SQLite cache.
 
@@ -175,6 +359,9 @@ class SQLiteCache(Cache):
             the connection.
         """
         self.sqlite_config = config
+        # pool of read-only connections in high-concurrency mode
+        self.readers: Optional[Queue[sqlite3.Connection]] = None
+        self.write_lock = Lock()
 
         # initialize connection to DB
         self.connect()
@@ -185,7 +372,9 @@ class SQLiteCache(Cache):
         """Initialize connection to database.
 
         Establish a SQLite connection using the configured db_path, initialize
-        the cache schema, and enable autocommit.
+        the cache schema, and enable autocommit. In high-concurrency mode the
+        connection becomes the dedicated writer and the pool of read-only
+        connections is opened as well.
 
         Raises:
             sqlite3.Error: If the database cannot be opened or the cache schema
@@ -195,43 +384,88 @@ class SQLiteCache(Cache):
         # make sure the connection will have known state
         # even if SQLite is not alive
         self.connection = None
+        self.close_readers()
         config = self.sqlite_config
         try:
-            self.connection = sqlite3.connect(database=config.db_path)
-            self.initialize_cache()
+            if config.concurrency is None:
+                self.connection = sqlite3.connect(database=config.db_path)
+                self.initialize_cache()
+            else:
+                self.connection = self._open(config.concurrency)
+                self.initialize_cache()
+                configure_connection(self.connection, config.concurrency, False)
+                self.readers = Queue()
+                for _ in range(config.concurrency.readers):
+                    reader = self._open(config.concurrency)
+                    configure_connection(reader, config.concurrency, True)
+                    self.readers.put(reader)
         except sqlite3.Error as e:
             if self.connection is not None:
                 self.connection.close()
+            self.close_readers()
             logger.exception("Error initializing SQLite cache:\n%s", e)
             raise
         self.connection.autocommit = True
 
+    def _open(self, config: SQLiteConcurrencyConfiguration) -> sqlite3.Connection:
+        """Open connection of high-concurrency mode.
+
+        Connections may be used by any thread; the write lock and the pool of
+        readers make sure each one is used by one thread at a time.
+
+        Parameters:
+        ----------
+            config: High-concurrency mode configuration.
+
+        Returns:
+        -------
+            Connection in autocommit mode.
+        """
+        return sqlite3.connect(
+            database=self.sqlite_config.db_path,
+            check_same_thread=False,
+            cached_statements=config.statement_cache_size,
+            autocommit=True,
+        )
+
+    def close_readers(self) -> None:
+        """Close all read-only connections of high-concurrency mode."""
+        readers, self.readers = self.readers, None
+        while readers is not None and not readers.empty():
+            readers.get_nowait().close()
+
+    @contextmanager
+    def reader(self) -> Iterator[sqlite3.Connection]:
+        """Lease read-only connection, or the only connection in default mode.
+
+        Yields:
+        ------
+            Connection to be used for reads by the current thread.
+        """
+        if self.readers is None:
+            if self.connection is None:
+                raise CacheError("reader: cache is disconnected")
+            yield self.connection
+            return
+        leased = self.readers.get()
+        try:
+            yield leased
+        finally:
+            self.readers.put(leased)
+
     def connected(self) -> bool:
-        """Check if connection to cache is alive.
+        """Check if connection to cache is established.
 
-        Return whether the SQLite connection used by the cache is alive.
+        No query is sent to the database. SQLite database is a local file, so
+        an open connection can not be lost the way a network connection can.
 
         Returns:
-            bool: `True` if a working connection to storage exists, `False` otherwise.
+            bool: `True` if the connection exists, `False` otherwise.
         """
         if self.connection is None:
             logger.warning("Not connected, need to reconnect later")
             return False
-        cursor = None
-        try:
-            cursor = self.connection.cursor()
-            cursor.execute("SELECT 1")
-            logger.info("Connection to storage is ok")
-            return True
-        except sqlite3.Error as e:
-            logger.error("Disconnected from storage: %s", e)
-            return False
-        finally:
-            if cursor is not None:
-                try:
-                    cursor.close()
-                except Exception:  # pylint: disable=broad-exception-caught
-                    logger.warning("Unable to close cursor")
+        return True
 
     def initialize_cache(self) -> None:
         """Initialize cache - clean it up etc.
@@ -252,6 +486,8 @@ class SQLiteCache(Cache):
 
         cursor = self.connection.cursor()
 
+        cursor.execute(SQLiteCache.ENABLE_INCREMENTAL_VACUUM)
+
         logger.info("Initializing table for cache")
         cursor.execute(SQLiteCache.CREATE_CACHE_TABLE)
 
@@ -264,6 +500,9 @@ class SQLiteCache(Cache):
         logger.info("Initializing index for cache")
         cursor.execute(SQLiteCache.CREATE_INDEX)
 
+        logger.info("Initializing index for conversations")
+        cursor.execute(SQLiteCache.CREATE_CONVERSATIONS_INDEX)
+
         cursor.close()
         self.connection.commit()
 
@@ -291,79 +530,100 @@ class SQLiteCache(Cache):
             logger.error("Cache is disconnected")
             raise CacheError("get: cache is disconnected")
 
-        cursor = self.connection.cursor()
-        cursor.execute(
-            self.SELECT_CONVERSATION_HISTORY_STATEMENT, (user_id, conversation_id)
-        )
-        conversation_entries = cursor.fetchall()
-        cursor.close()
+        with self.reader() as reader:
+            cursor = reader.cursor()
+            cursor.execute(
+                self.SELECT_CONVERSATION_HISTORY_STATEMENT, (user_id, conversation_id)
+            )
+            conversation_entries = cursor.fetchall()
+            cursor.close()
 
+        # list fields are decoded when first accessed
         result = []
         for conversation_entry in conversation_entries:
-            docs_json_str = conversation_entry[6]
-            docs_obj = None
-            if docs_json_str:
-                try:
-                    docs_data = json.loads(docs_json_str)
-                    docs_obj = [
-                        ReferencedDocument.model_validate(doc) for doc in docs_data
-                    ]
-                except (json.JSONDecodeError, ValueError) as e:
-                    logger.warning(
-                        "Failed to deserialize referenced_documents for "
-                        "conversation %s: %s",
-                        conversation_id,
-                        e,
-                    )
-
-            # Parse tool_calls back into ToolCallSummary objects
-            tool_calls_json_str = conversation_entry[7]
-            tool_calls_obj = None
-            if tool_calls_json_str:
-                try:
-                    tool_calls_data = json.loads(tool_calls_json_str)
-                    tool_calls_obj = [
-                        ToolCallSummary.model_validate(tc) for tc in tool_calls_data
-                    ]
-                except (json.JSONDecodeError, ValueError) as e:
-                    logger.warning(
-                        "Failed to deserialize tool_calls for conversation %s: %s",
-                        conversation_id,
-                        e,
-                    )
-
-            # Parse tool_results back into ToolResultSummary objects
-            tool_results_json_str = conversation_entry[8]
-            tool_results_obj = None
-            if tool_results_json_str:
-                try:
-                    tool_results_data = json.loads(tool_results_json_str)
-                    tool_results_obj = [
-                        ToolResultSummary.model_validate(tr) for tr in tool_results_data
-                    ]
-                except (json.JSONDecodeError, ValueError) as e:
-                    logger.warning(
-                        "Failed to deserialize tool_results for conversation %s: %s",
-                        conversation_id,
-                        e,
-                    )
-
-            cache_entry = CacheEntry(
+            cache_entry = CacheEntry.from_encoded(
+                decode_items,
                 query=conversation_entry[0],
                 response=conversation_entry[1],
                 provider=conversation_entry[2],
                 model=conversation_entry[3],
                 started_at=conversation_entry[4],
                 completed_at=conversation_entry[5],
-                referenced_documents=docs_obj,
-                tool_calls=tool_calls_obj,
-                tool_results=tool_results_obj,
+                referenced_documents=conversation_entry[6],
+                tool_calls=conversation_entry[7],
+                tool_results=conversation_entry[8],
             )
             result.append(cache_entry)
 
         return result
 
     @connection
+    def get_page(  # pylint: disable=too-many-arguments,too-many-positional-arguments
+        self,
+        user_id: str,
+        conversation_id: str,
+        after_created_at: Optional[float],
+        limit: int,
+        skip_user_id_check: bool = False,
+    ) -> CacheEntryPage:
+        """Get one page of conversation history, oldest first.
+
+        Parameters:
+        ----------
+            user_id: User identification.
+            conversation_id: Conversation ID unique for given user.
+            after_created_at: Cursor returned with the previous page, or None.
+            limit: Maximal number of turns on the page.
+            skip_user_id_check: Skip user_id suid check.
+
+        Returns:
+        -------
+            Turns of the page and cursor of the next page.
+
+        Raises:
+        ------
+            CacheError: If the cache connection is disconnected.
+        """
+        if self.connection is None:
+            logger.error("Cache is disconnected")
+            raise CacheError("get_page: cache is disconnected")
+
+        with self.reader() as reader:
+            cursor = reader.cursor()
+            cursor.execute(
+                self.SELECT_CONVERSATION_HISTORY_PAGE_STATEMENT,
+                (
+                    user_id,
+                    conversation_id,
+                    float("-inf") if after_created_at is None else after_created_at,
+                    limit + 1,
+                ),
+            )
+            conversation_entries = cursor.fetchall()
+            cursor.close()
+
+        rows = [
+            (
+                conversation_entry[9],
+                CacheEntry.from_encoded(
+                    decode_items,
+                    query=conversation_entry[0],
+                    response=conversation_entry[1],
+                    provider=conversation_entry[2],
+                    model=conversation_entry[3],
+                    started_at=conversation_entry[4],
+                    completed_at=conversation_entry[5],
+                    referenced_documents=conversation_entry[6],
+                    tool_calls=conversation_entry[7],
+                    tool_results=conversation_entry[8],
+                ),
+            )
+            for conversation_entry in conversation_entries
+        ]
+        return entry_page(rows, limit)
+
+    @connection
+    @writer
     def insert_or_append(
         self,
         user_id: str,
@@ -391,14 +651,14 @@ class SQLiteCache(Cache):
         cursor = self.connection.cursor()
         current_time = time()
 
-        referenced_documents_json = None
+        referenced_documents_value = None
         if cache_entry.referenced_documents:
             try:
                 docs_as_dicts = [
                     doc.model_dump(mode="json")
                     for doc in cache_entry.referenced_documents
                 ]
-                referenced_documents_json = json.dumps(docs_as_dicts)
+                referenced_documents_value = encode_items(docs_as_dicts)
             except (TypeError, ValueError) as e:
                 logger.warning(
                     "Failed to serialize referenced_documents for conversation %s: %s",
@@ -406,13 +666,13 @@ class SQLiteCache(Cache):
                     e,
                 )
 
-        tool_calls_json = None
+        tool_calls_value = None
         if cache_entry.tool_calls:
             try:
                 tool_calls_as_dicts = [
                     tc.model_dump(mode="json") for tc in cache_entry.tool_calls
                 ]
-                tool_calls_json = json.dumps(tool_calls_as_dicts)
+                tool_calls_value = encode_items(tool_calls_as_dicts)
             except (TypeError, ValueError) as e:
                 logger.warning(
                     "Failed to serialize tool_calls for conversation %s: %s",
@@ -420,13 +680,13 @@ class SQLiteCache(Cache):
                     e,
                 )
 
-        tool_results_json = None
+        tool_results_value = None
         if cache_entry.tool_results:
             try:
                 tool_results_as_dicts = [
                     tr.model_dump(mode="json") for tr in cache_entry.tool_results
                 ]
-                tool_results_json = json.dumps(tool_results_as_dicts)
+                tool_results_value = encode_items(tool_results_as_dicts)
             except (TypeError, ValueError) as e:
                 logger.warning(
                     "Failed to serialize tool_results for conversation %s: %s",
@@ -446,9 +706,9 @@ class SQLiteCache(Cache):
                 cache_entry.response,
                 cache_entry.provider,
                 cache_entry.model,
-                referenced_documents_json,
-                tool_calls_json,
-                tool_results_json,
+                referenced_documents_value,
+                tool_calls_value,
+                tool_results_value,
             ),
         )
 
@@ -462,6 +722,7 @@ class SQLiteCache(Cache):
         self.connection.commit()
 
     @connection
+    @writer
     def delete(
         self, user_id: str, conversation_id: str, skip_user_id_check: bool = False
     ) -> bool:
@@ -529,10 +790,11 @@ class SQLiteCache(Cache):
             logger.error("Cache is disconnected")
             raise CacheError("list: cache is disconnected")
 
-        cursor = self.connection.cursor()
-        cursor.execute(self.LIST_CONVERSATIONS_STATEMENT, (user_id,))
-        conversations = cursor.fetchall()
-        cursor.close()
+        with self.reader() as reader:
+            cursor = reader.cursor()
+            cursor.execute(self.LIST_CONVERSATIONS_STATEMENT, (user_id,))
+            conversations = cursor.fetchall()
+            cursor.close()
 
         result = []
         for conversation in conversations:
@@ -546,6 +808,103 @@ class SQLiteCache(Cache):
         return result
 
     @connection
+    def list_page(
+        self,
+        user_id: str,
+        before: Optional[str],
+        limit: int,
+        skip_user_id_check: bool = False,
+    ) -> ConversationDataPage:
+        """List one page of conversations for a given user_id, most recent first.
+
+        Parameters:
+        ----------
+            user_id: User identification.
+            before: Cursor returned with the previous page, or None.
+            limit: Maximal number of conversations on the page.
+            skip_user_id_check: Skip user_id suid check.
+
+        Returns:
+        -------
+            Conversations of the page and cursor of the next page.
+
+        Raises:
+        ------
+            CacheError: If the cache connection is disconnected.
+        """
+        if self.connection is None:
+            logger.error("Cache is disconnected")
+            raise CacheError("list_page: cache is disconnected")
+
+        position = (
+            decode_cache_cursor(before) if before is not None else (float("inf"), "")
+        )
+        with self.reader() as reader:
+            cursor = reader.cursor()
+            cursor.execute(
+                self.LIST_CONVERSATIONS_PAGE_STATEMENT,
+                (user_id, *position, limit + 1),
+            )
+            conversations = cursor.fetchall()
+            cursor.close()
+
+        return conversation_page(
+            [
+                (
+                    conversation[2],
+                    ConversationData(
+                        conversation_id=conversation[0],
+                        topic_summary=conversation[1],
+                        last_message_timestamp=conversation[2],
+                    ),
+                )
+                for conversation in conversations
+            ],
+            limit,
+        )
+
+    @connection
+    def get_conversation_meta(
+        self, user_id: str, conversation_id: str, skip_user_id_check: bool = False
+    ) -> Optional[ConversationData]:
+        """Get metadata of one conversation.
+
+        Parameters:
+        ----------
+            user_id: User identification.
+            conversation_id: Conversation ID unique for given user.
+            skip_user_id_check: Skip user_id suid check.
+
+        Returns:
+        -------
+            Metadata of the conversation, or None if it does not exist.
+
+        Raises:
+        ------
+            CacheError: If the cache connection is disconnected.
+        """
+        if self.connection is None:
+            logger.error("Cache is disconnected")
+            raise CacheError("get_conversation_meta: cache is disconnected")
+
+        with self.reader() as reader:
+            cursor = reader.cursor()
+            cursor.execute(
+                self.SELECT_CONVERSATION_META_STATEMENT, (user_id, conversation_id)
+            )
+            row = cursor.fetchone()
+            cursor.close()
+
+        if row is None:
+            return None
+        return ConversationData(
+            conversation_id=conversation_id,
+            topic_summary=row[0],
+            last_message_timestamp=row[1],
+        )
+
+    @connection
+    @writer
     def set_topic_summary(
         self,
         user_id: str,
@@ -575,6 +934,7 @@ class SQLiteCache(Cache):
         self.connection.commit()
 
     @connection
+    @writer
     def store_summary(
         self,
         user_id: str,
@@ -640,10 +1000,11 @@ class SQLiteCache(Cache):
             logger.error("Cache is disconnected")
             raise CacheError("get_summaries: cache is disconnected")
 
-        cursor = self.connection.cursor()
-        cursor.execute(self.SELECT_SUMMARIES_STATEMENT, (user_id, conversation_id))
-        rows = cursor.fetchall()
-        cursor.close()
+        with self.reader() as reader:
+            cursor = reader.cursor()
+            cursor.execute(self.SELECT_SUMMARIES_STATEMENT, (user_id, conversation_id))
+            rows = cursor.fetchall()
+            cursor.close()
 
         return [
             ConversationSummary(
@@ -657,6 +1018,7 @@ class SQLiteCache(Cache):
         ]
 
     @connection
+    @writer
     def replace_summaries(
         self,
         user_id: str,
@@ -703,6 +1065,118 @@ class SQLiteCache(Cache):
         cursor.close()
         self.connection.commit()
 
+    @connection
+    @writer
+    def apply_retention(
+        self, retention: ConversationRetentionConfiguration
+    ) -> dict[str, int]:
+        """Delete turns and conversations outside the retention policy.
+
+        Rows are deleted in batches, each committed on its own. When anything
+        has been deleted, up to `retention.vacuum_pages` free pages are
+        returned to the file system by incremental vacuum.
+
+        Parameters:
+        ----------
+            retention: Retention policy to be enforced.
+
+        Returns:
+        -------
+            Number of deleted rows for each table.
+
+        Raises:
+        ------
+            CacheError: If the cache connection is not available.
+        """
+        if self.connection is None:
+            logger.error("Cache is disconnected")
+            raise CacheError("apply_retention: cache is disconnected")
+
+        batch_size = retention.batch_size
+        conversation_statements = {
+            CACHE_TABLE: self.DELETE_SINGLE_CONVERSATION_STATEMENT,
+            SUMMARIES_TABLE: self.DELETE_SUMMARIES_STATEMENT,
+            CONVERSATIONS_TABLE: self.DELETE_CONVERSATION_STATEMENT,
+        }
+        deleted = dict.fromkeys(RETENTION_TABLES, 0)
+
+        cursor = self.connection.cursor()
+        if retention.max_age is not None:
+            cutoff = time() - retention.max_age
+            add_counts(
+                deleted,
+                delete_conversations_in_batches(
+                    cursor,
+                    self.SELECT_EXPIRED_CONVERSATIONS_STATEMENT,
+                    (cutoff,),
+                    batch_size,
+                    conversation_statements,
+                ),
+            )
+            deleted[CACHE_TABLE] += delete_in_batches(
+                cursor, self.DELETE_EXPIRED_TURNS_STATEMENT, (cutoff,), batch_size
+            )
+        if retention.max_conversations_per_user is not None:
+            add_counts(
+                deleted,
+                delete_conversations_in_batches(
+                    cursor,
+                    self.SELECT_EXCESS_CONVERSATIONS_STATEMENT,
+                    (retention.max_conversations_per_user,),
+                    batch_size,
+                    conversation_statements,
+                ),
+            )
+        if retention.max_turns_per_conversation is not None:
+            deleted[CACHE_TABLE] += delete_in_batches(
+                cursor,
+                self.DELETE_EXCESS_TURNS_STATEMENT,
+                (retention.max_turns_per_conversation,),
+                batch_size,
+            )
+
+        if any(deleted.values()):
+            cursor.execute(self.QUERY_AUTO_VACUUM)
+            if cursor.fetchone()[0] == self.AUTO_VACUUM_INCREMENTAL:
+                cursor.execute(
+                    self.INCREMENTAL_VACUUM_STATEMENT % retention.vacuum_pages
+                )
+                # the pragma frees pages while its result rows are stepped through
+                cursor.fetchall()
+            else:
+                logger.info(
+                    "Incremental vacuum is not enabled for %s, "
+                    "full VACUUM is needed to reclaim free space",
+                    self.sqlite_config.db_path,
+                )
+        cursor.close()
+        return deleted
+
+    @connection
+    def table_sizes(self) -> dict[str, int]:
+        """Return number of rows stored in each table.
+
+        Returns:
+        -------
+            Number of rows for each table.
+
+        Raises:
+        ------
+            CacheError: If the cache connection is not available.
+        """
+        if self.connection is None:
+            logger.error("Cache is disconnected")
+            raise CacheError("table_sizes: cache is disconnected")
+
+        with self.reader() as reader:
+            cursor = reader.cursor()
+            sizes = {}
+            for table, statement in self.COUNT_ROWS_STATEMENTS.items():
+                cursor.execute(statement)
+                sizes[table] = cursor.fetchone()[0]
+            cursor.close()
+        return sizes
+
     def ready(self) -> bool:
         """Check if the cache is ready.
 
@@ -0,0 +1,253 @@
+"""Adapter exposing an in-process cache through the asynchronous cache interface."""
+
+import builtins
+from typing import Optional
+
+from cache.async_cache import AsyncCache
+from cache.cache_entry import CacheEntry, CacheEntryPage
+from cache.in_memory_cache import InMemoryCache
+from cache.noop_cache import NoopCache
+from models.common import ConversationData, ConversationDataPage
+from models.compaction import ConversationSummary
+
+
+class SyncCacheAdapter(AsyncCache):
+    """Adapter exposing an in-process cache through the asynchronous cache interface.
+
+    Meant for caches that never perform I/O (in-memory and no-op caches):
+    their operations are short and CPU bound, so they are called directly from
+    the event loop instead of being offloaded to a worker thread.
+    """
+
+    def __init__(self, cache: InMemoryCache | NoopCache) -> None:
+        """Create a new adapter for the given cache.
+
+        Parameters:
+        ----------
+            cache: In-process cache implementation to delegate to.
+        """
+        self.cache = cache
+
+    async def initialize_cache(self) -> None:
+        """Initialize the wrapped cache."""
+        self.cache.initialize_cache()
+
+    async def get(
+        self, user_id: str, conversation_id: str, skip_user_id_check: bool = False
+    ) -> list[CacheEntry]:
+        """Get the value associated with the given key.
+
+        Parameters:
+        ----------
+            user_id: User identification.
+            conversation_id: Conversation ID unique for given user.
+            skip_user_id_check: Skip user_id suid check.
+
+        Returns:
+        -------
+            The conversation history, oldest first.
+        """
+        return self.cache.get(user_id, conversation_id, skip_user_id_check)
+
+    async def get_page(  # pylint: disable=too-many-arguments,too-many-positional-arguments
+        self,
+        user_id: str,
+        conversation_id: str,
+        after_created_at: Optional[float],
+        limit: int,
+        skip_user_id_check: bool = False,
+    ) -> CacheEntryPage:
+        """Get one page of conversation history, oldest first.
+
+        Parameters:
+        ----------
+            user_id: User identification.
+            conversation_id: Conversation ID unique for given user.
+            after_created_at: Cursor returned with the previous page, or None.
+            limit: Maximal number of turns on the page.
+            skip_user_id_check: Skip user_id suid check.
+
+        Returns:
+        -------
+            Turns of the page and cursor of the next page.
+        """
+        return self.cache.get_page(
+            user_id, conversation_id, after_created_at, limit, skip_user_id_check
+        )
+
+    async def insert_or_append(
+        self,
+        user_id: str,
+        conversation_id: str,
+        cache_entry: CacheEntry,
+        skip_user_id_check: bool = False,
+    ) -> None:
+        """Set the value associated with the given key.
+
+        Parameters:
+        ----------
+            user_id: User identification.
+            conversation_id: Conversation ID unique for given user.
+            cache_entry: The `CacheEntry` object to store.
+            skip_user_id_check: Skip user_id suid check.
+        """
+        self.cache.insert_or_append(
+            user_id, conversation_id, cache_entry, skip_user_id_check
+        )
+
+    async def delete(
+        self, user_id: str, conversation_id: str, skip_user_id_check: bool = False
+    ) -> bool:
+        """Delete conversation history for a given user_id and conversation_id.
+
+        Parameters:
+        ----------
+            user_id: User identification.
+            conversation_id: Conversation ID unique for given user.
+            skip_user_id_check: Skip user_id suid check.
+
+        Returns:
+        -------
+            bool: True if the conversation was deleted, False if not found.
+        """
+        return self.cache.delete(user_id, conversation_id, skip_user_id_check)
+
+    async def list(
+        self, user_id: str, skip_user_id_check: bool = False
+    ) -> list[ConversationData]:
+        """List all conversations for a given user_id.
+
+        Parameters:
+        ----------
+            user_id: User identification.
+            skip_user_id_check: Skip user_id suid check.
+
+        Returns:
+        -------
+            A list of ConversationData objects, most recent first.
+        """
+        return self.cache.list(user_id, skip_user_id_check)
+
+    async def list_page(
+        self,
+        user_id: str,
+        before: Optional[str],
+        limit: int,
+        skip_user_id_check: bool = False,
+    ) -> ConversationDataPage:
+        """List one page of conversations for a given user_id, most recent first.
+
+        Parameters:
+        ----------
+            user_id: User identification.
+            before: Cursor returned with the previous page, or None.
+            limit: Maximal number of conversations on the page.
+            skip_user_id_check: Skip user_id suid check.
+
+        Returns:
+        -------
+            Conversations of the page and cursor of the next page.
+        """
+        return self.cache.list_page(user_id, before, limit, skip_user_id_check)
+
+    async def get_conversation_meta(
+        self, user_id: str, conversation_id: str, skip_user_id_check: bool = False
+    ) -> Optional[ConversationData]:
+        """Get metadata of one conversation.
+
+        Parameters:
+        ----------
+            user_id: User identification.
+            conversation_id: Conversation ID unique for given user.
+            skip_user_id_check: Skip user_id suid check.
+
+        Returns:
+        -------
+            Metadata of the conversation, or None if it does not exist.
+        """
+        return self.cache.get_conversation_meta(
+            user_id, conversation_id, skip_user_id_check
+        )
+
+    async def set_topic_summary(
+        self,
+        user_id: str,
+        conversation_id: str,
+        topic_summary: str,
+        skip_user_id_check: bool = False,
+    ) -> None:
+        """Set the topic summary for the given conversation.
+
+        Parameters:
+        ----------
+            user_id: User identification.
+            conversation_id: Conversation ID unique for given user.
+            topic_summary: The topic summary to store.
+            skip_user_id_check: Skip user_id suid check.
+        """
+        self.cache.set_topic_summary(
+            user_id, conversation_id, topic_summary, skip_user_id_check
+        )
+
+    async def store_summary(
+        self,
+        user_id: str,
+        conversation_id: str,
+        summary: ConversationSummary,
+        skip_user_id_check: bool = False,
+    ) -> None:
+        """Append a compaction summary chunk for the given conversation.
+
+        Parameters:
+        ----------
+            user_id: User identification.
+            conversation_id: Conversation ID unique for given user.
+            summary: The ConversationSummary chunk to store.
+            skip_user_id_check: Skip user_id suid check.
+        """
+        self.cache.store_summary(user_id, conversation_id, summary, skip_user_id_check)
+
+    async def get_summaries(
+        self, user_id: str, conversation_id: str, skip_user_id_check: bool = False
+    ) -> builtins.list[ConversationSummary]:  # this class shadows the list builtin
+        """Retrieve all compaction summary chunks for a conversation.
+
+        Parameters:
+        ----------
+            user_id: User identification.
+            conversation_id: Conversation ID unique for given user.
+            skip_user_id_check: Skip user_id suid check.
+
+        Returns:
+        -------
+            Summary chunks for the conversation, oldest first.
+        """
+        return self.cache.get_summaries(user_id, conversation_id, skip_user_id_check)
+
+    async def replace_summaries(
+        self,
+        user_id: str,
+        conversation_id: str,
+        folded_summary: ConversationSummary,
+        skip_user_id_check: bool = False,
+    ) -> None:
+        """Replace all stored summary chunks for a conversation with one fold.
+
+        Parameters:
+        ----------
+            user_id: User identification.
+            conversation_id: Conversation ID unique for given user.
+            folded_summary: The folded summary that supersedes existing chunks.
+            skip_user_id_check: Skip user_id suid check.
+        """
+        self.cache.replace_summaries(
+            user_id, conversation_id, folded_summary, skip_user_id_check
+        )
+
+    def ready(self) -> bool:
+        """Check if the cache is ready.
+
+        Returns:
+            True if the wrapped cache is ready, False otherwise.
+        """
+        return self.cache.ready()
@@ -0,0 +1,493 @@
+"""Asynchronous cache that stores appended conversation turns in batches."""
+
+import asyncio
+import builtins
+from collections import deque
+from dataclasses import dataclass, field
+from time import time
+from typing import Optional
+
+from cache.async_cache import AsyncCache
+from cache.cache_entry import CacheEntry, CacheEntryPage
+from cache.cache_error import CacheError
+from log import get_logger
+from models.common import ConversationData, ConversationDataPage
+from models.compaction import ConversationSummary
+from models.config import WriteBehindConfiguration
+
+logger = get_logger(__name__)
+
+
+@dataclass
+class PendingEntry:
+    """Conversation turn waiting in the queue to be stored."""
+
+    key: str
+    user_id: str
+    conversation_id: str
+    cache_entry: CacheEntry
+    enqueued_at: float = field(default_factory=time)
+
+
+class WriteBehindCache(AsyncCache):  # pylint: disable=too-many-instance-attributes
+    """Cache wrapper that queues appended turns and stores them in batches.
+
+    `insert_or_append` only puts the turn into a bounded in-memory queue. A
+    background task stores queued turns by `insert_or_append_many` of the
+    wrapped cache, in one transaction per batch, every `flush_interval`
+    milliseconds or as soon as `batch_size` turns are queued. When the queue
+    is full, appending waits until there is a free slot, at most
+    `append_timeout` milliseconds.
+
+    Reads of conversations with queued turns see them (read-your-writes):
+    such reads wait for a running flush to finish and combine stored and
+    queued turns. Paginated reads store the queued turns of the conversation
+    or user first. Queued turns are flushed by `close()`, which is called on
+    application shutdown. All other operations are delegated to the wrapped
+    cache directly.
+    """
+
+    def __init__(self, cache: AsyncCache, config: WriteBehindConfiguration) -> None:
+        """Create write-behind wrapper of the given cache.
+
+        Parameters:
+        ----------
+            cache: Cache where the turns are stored.
+            config: Write-behind mode configuration.
+        """
+        self._cache = cache
+        self.flush_interval = config.flush_interval / 1000
+        self.batch_size = config.batch_size
+        self.max_pending = config.max_pending
+        self.append_timeout = config.append_timeout / 1000
+        self._pending: deque[PendingEntry] = deque()
+        # held while queued turns are being stored and by reads that need
+        # a consistent view of stored and queued turns
+        self._flush_lock = asyncio.Lock()
+        self._not_full = asyncio.Condition()
+        self._wakeup = asyncio.Event()
+        self._flusher: Optional[asyncio.Task[None]] = None
+
+    @property
+    def pending(self) -> int:
+        """Return number of queued turns that have not been stored yet."""
+        return len(self._pending)
+
+    def _has_pending(self, key: str) -> bool:
+        """Check if there are queued turns for the given conversation."""
+        return any(entry.key == key for entry in self._pending)
+
+    def _start_flusher(self) -> None:
+        """Start background task storing queued turns unless it runs already."""
+        if self._flusher is None or self._flusher.done():
+            self._flusher = asyncio.create_task(
+                self._run_flusher(), name="conversation cache write-behind"
+            )
+
+    async def _run_flusher(self) -> None:
+        """Store queued turns periodically or when a batch is complete."""
+        while True:
+            try:
+                await asyncio.wait_for(self._wakeup.wait(), self.flush_interval)
+            except TimeoutError:
+                pass
+            self._wakeup.clear()
+            try:
+                await self.flush()
+            except CacheError:
+                # already logged, queued turns are stored by next flush
+                pass
+
+    async def flush(self) -> None:
+        """Store all queued turns, one transaction per batch.
+
+        Raises:
+        ------
+            CacheError: If storing a batch fails; the batch and all following
+            turns stay queued.
+        """
+        async with self._flush_lock:
+            while self._pending:
+                batch = [
+                    self._pending[i]
+                    for i in range(min(self.batch_size, len(self._pending)))
+                ]
+                try:
+                    # user IDs have been checked when the turns were queued
+                    await self._cache.insert_or_append_many(
+                        [
+                            (entry.user_id, entry.conversation_id, entry.cache_entry)
+                            for entry in batch
+                        ],
+                        True,
+                    )
+                except CacheError as e:
+                    logger.error(
+                        "Failed to store %d queued conversation turns: %s",
+                        len(self._pending),
+                        e,
+                    )
+                    raise
+                for _ in batch:
+                    self._pending.popleft()
+                async with self._not_full:
+                    self._not_full.notify_all()
+
+    async def initialize_cache(self) -> None:
+        """Initialize the wrapped cache."""
+        await self._cache.initialize_cache()
+
+    async def get(
+        self, user_id: str, conversation_id: str, skip_user_id_check: bool = False
+    ) -> builtins.list[CacheEntry]:
+        """Get stored and queued turns of the conversation, oldest first.
+
+        Parameters:
+        ----------
+            user_id: User identification.
+            conversation_id: Conversation ID unique for given user.
+            skip_user_id_check: Skip user_id suid check.
+
+        Returns:
+        -------
+            The conversation history, oldest first.
+        """
+        key = self.construct_key(user_id, conversation_id, skip_user_id_check)
+        if not self._has_pending(key):
+            return await self._cache.get(user_id, conversation_id, skip_user_id_check)
+        async with self._flush_lock:
+            entries = await self._cache.get(
+                user_id, conversation_id, skip_user_id_check
+            )
+            entries.extend(
+                entry.cache_entry for entry in self._pending if entry.key == key
+            )
+        return entries
+
+    async def get_page(  # pylint: disable=too-many-arguments,too-many-positional-arguments
+        self,
+        user_id: str,
+        conversation_id: str,
+        after_created_at: Optional[float],
+        limit: int,
+        skip_user_id_check: bool = False,
+    ) -> CacheEntryPage:
+        """Get one page of conversation history, oldest first.
+
+        Queued turns of the conversation are stored first, as they get the
+        creation time used as page cursor only when stored.
+
+        Parameters:
+        ----------
+            user_id: User identification.
+            conversation_id: Conversation ID unique for given user.
+            after_created_at: Cursor returned with the previous page, or None.
+            limit: Maximal number of turns on the page.
+            skip_user_id_check: Skip user_id suid check.
+
+        Returns:
+        -------
+            Turns of the page and cursor of the next page.
+        """
+        key = self.construct_key(user_id, conversation_id, skip_user_id_check)
+        if self._has_pending(key):
+            await self.flush()
+        return await self._cache.get_page(
+            user_id, conversation_id, after_created_at, limit, skip_user_id_check
+        )
+
+    async def insert_or_append(
+        self,
+        user_id: str,
+        conversation_id: str,
+        cache_entry: CacheEntry,
+        skip_user_id_check: bool = False,
+    ) -> None:
+        """Queue the turn to be stored by background task.
+
+        Waits for a free slot when the queue is full.
+
+        Parameters:
+        ----------
+            user_id: User identification.
+            conversation_id: Conversation ID unique for given user.
+            cache_entry: The `CacheEntry` object to store.
+            skip_user_id_check: Skip user_id suid check.
+
+        Raises:
+        ------
+            CacheError: If the queue stays full for `append_timeout`, e.g.
+            because the wrapped cache fails to store the queued turns.
+        """
+        key = self.construct_key(user_id, conversation_id, skip_user_id_check)
+        self._start_flusher()
+        async with self._not_full:
+            if len(self._pending) >= self.max_pending:
+                logger.warning(
+                    "Write-behind queue is full, waiting for %d turns to be stored",
+                    len(self._pending),
+                )
+                self._wakeup.set()
+                try:
+                    await asyncio.wait_for(
+                        self._not_full.wait_for(
+                            lambda: len(self._pending) < self.max_pending
+                        ),
+                        self.append_timeout,
+                    )
+                except TimeoutError as e:
+                    logger.error(
+                        "Write-behind queue stayed full for %.1f seconds",
+                        self.append_timeout,
+                    )
+                    raise CacheError(
+                        "insert_or_append: write-behind queue is full"
+                    ) from e
+            self._pending.append(
+                PendingEntry(key, user_id, conversation_id, cache_entry)
+            )
+        if len(self._pending) >= self.batch_size:
+            self._wakeup.set()
+
+    async def delete(
+        self, user_id: str, conversation_id: str, skip_user_id_check: bool = False
+    ) -> bool:
+        """Delete stored and queued turns of the conversation.
+
+        Parameters:
+        ----------
+            user_id: User identification.
+            conversation_id: Conversation ID unique for given user.
+            skip_user_id_check: Skip user_id suid check.
+
+        Returns:
+        -------
+            bool: True if the conversation was deleted, False if not found.
+        """
+        key = self.construct_key(user_id, conversation_id, skip_user_id_check)
+        async with self._flush_lock:
+            queued = len(self._pending)
+            self._pending = deque(entry for entry in self._pending if entry.key != key)
+            dropped = queued - len(self._pending)
+            deleted = await self._cache.delete(
+                user_id, conversation_id, skip_user_id_check
+            )
+        if dropped:
+            async with self._not_full:
+                self._not_full.notify_all()
+        return deleted or dropped > 0
+
+    async def list(
+        self, user_id: str, skip_user_id_check: bool = False
+    ) -> builtins.list[ConversationData]:
+        """List stored and queued conversations of the user, most recent first.
+
+        Parameters:
+        ----------
+            user_id: User identification.
+            skip_user_id_check: Skip user_id suid check.
+
+        Returns:
+        -------
+            A list of ConversationData objects, most recent first.
+        """
+        if not any(entry.user_id == user_id for entry in self._pending):
+            return await self._cache.list(user_id, skip_user_id_check)
+        async with self._flush_lock:
+            conversations = {
+                conversation.conversation_id: conversation
+                for conversation in await self._cache.list(user_id, skip_user_id_check)
+            }
+            for entry in self._pending:
+                if entry.user_id != user_id:
+                    continue
+                conversation = conversations.get(entry.conversation_id)
+                if conversation is None:
+                    conversations[entry.conversation_id] = ConversationData(
+                        conversation_id=entry.conversation_id,
+                        topic_summary=None,
+                        last_message_timestamp=entry.enqueued_at,
+                    )
+                else:
+                    conversation.last_message_timestamp = max(
+                        conversation.last_message_timestamp, entry.enqueued_at
+                    )
+        return sorted(
+            conversations.values(),
+            key=lambda conversation: conversation.last_message_timestamp,
+            reverse=True,
+        )
+
+    async def list_page(
+        self,
+        user_id: str,
+        before: Optional[str],
+        limit: int,
+        skip_user_id_check: bool = False,
+    ) -> ConversationDataPage:
+        """List one page of conversations for a given user_id, most recent first.
+
+        Queued turns of the user are stored first, so the conversations are
+        ordered by their stored last message timestamps.
+
+        Parameters:
+        ----------
+            user_id: User identification.
+            before: Cursor returned with the previous page, or None.
+            limit: Maximal number of conversations on the page.
+            skip_user_id_check: Skip user_id suid check.
+
+        Returns:
+        -------
+            Conversations of the page and cursor of the next page.
+        """
+        if any(entry.user_id == user_id for entry in self._pending):
+            await self.flush()
+        return await self._cache.list_page(user_id, before, limit, skip_user_id_check)
+
+    async def get_conversation_meta(
+        self, user_id: str, conversation_id: str, skip_user_id_check: bool = False
+    ) -> Optional[ConversationData]:
+        """Get metadata of one conversation, including its queued turns.
+
+        Parameters:
+        ----------
+            user_id: User identification.
+            conversation_id: Conversation ID unique for given user.
+            skip_user_id_check: Skip user_id suid check.
+
+        Returns:
+        -------
+            Metadata of the conversation, or None if it is neither stored
+            nor queued.
+        """
+        key = self.construct_key(user_id, conversation_id, skip_user_id_check)
+        if not self._has_pending(key):
+            return await self._cache.get_conversation_meta(
+                user_id, conversation_id, skip_user_id_check
+            )
+        async with self._flush_lock:
+            meta = await self._cache.get_conversation_meta(
+                user_id, conversation_id, skip_user_id_check
+            )
+            enqueued_at = max(
+                (entry.enqueued_at for entry in self._pending if entry.key == key),
+                default=None,
+            )
+        if enqueued_at is None:
+            # queued turns have been stored meanwhile
+            return meta
+        if meta is None:
+            return ConversationData(
+                conversation_id=conversation_id,
+                topic_summary=None,
+                last_message_timestamp=enqueued_at,
+            )
+        meta.last_message_timestamp = max(meta.last_message_timestamp, enqueued_at)
+        return meta
+
+    async def set_topic_summary(
+        self,
+        user_id: str,
+        conversation_id: str,
+        topic_summary: str,
+        skip_user_id_check: bool = False,
+    ) -> None:
+        """Set the topic summary for the given conversation.
+
+        Parameters:
+        ----------
+            user_id: User identification.
+            conversation_id: Conversation ID unique for given user.
+            topic_summary: The topic summary to store.
+            skip_user_id_check: Skip user_id suid check.
+        """
+        await self._cache.set_topic_summary(
+            user_id, conversation_id, topic_summary, skip_user_id_check
+        )
+
+    async def store_summary(
+        self,
+        user_id: str,
+        conversation_id: str,
+        summary: ConversationSummary,
+        skip_user_id_check: bool = False,
+    ) -> None:
+        """Append a conversation-compaction summary chunk.
+
+        Parameters:
+        ----------
+            user_id: User identification.
+            conversation_id: Conversation ID unique for given user.
+            summary: The summary chunk to persist.
+            skip_user_id_check: Skip user_id suid check.
+        """
+        await self._cache.store_summary(
+            user_id, conversation_id, summary, skip_user_id_check
+        )
+
+    async def get_summaries(
+        self, user_id: str, conversation_id: str, skip_user_id_check: bool = False
+    ) -> builtins.list[ConversationSummary]:
+        """Return all compaction summary chunks for a conversation, oldest first.
+
+        Parameters:
+        ----------
+            user_id: User identification.
+            conversation_id: Conversation ID unique for given user.
+            skip_user_id_check: Skip user_id suid check.
+
+        Returns:
+        -------
+            Summary chunks ordered by ``created_at`` ascending.
+        """
+        return await self._cache.get_summaries(
+            user_id, conversation_id, skip_user_id_check
+        )
+
+    async def replace_summaries(
+        self,
+        user_id: str,
+        conversation_id: str,
+        folded_summary: ConversationSummary,
+        skip_user_id_check: bool = False,
+    ) -> None:
+        """Replace all stored summary chunks with a single folded summary.
+
+        Parameters:
+        ----------
+            user_id: User identification.
+            conversation_id: Conversation ID unique for given user.
+            folded_summary: The folded summary to store.
+            skip_user_id_check: Skip user_id suid check.
+        """
+        await self._cache.replace_summaries(
+            user_id, conversation_id, folded_summary, skip_user_id_check
+        )
+
+    def ready(self) -> bool:
+        """Check if the wrapped cache is ready.
+
+        Returns:
+            True if the cache is ready, False otherwise.
+        """
+        return self._cache.ready()
+
+    async def close(self) -> None:
+        """Stop the background task, store queued turns and close the wrapped cache."""
+        if self._flusher is not None:
+            # do not interrupt the background task while it stores a batch
+            async with self._flush_lock:
+                self._flusher.cancel()
+            try:
+                await self._flusher
+            except asyncio.CancelledError:
+                pass
+            self._flusher = None
+        try:
+            await self.flush()
+        except CacheError:
+            logger.error(
+                "%d queued conversation turns have not been stored", self.pending
+            )
+        await self._cache.close()
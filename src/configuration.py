@@ -9,6 +9,7 @@ import yaml
 from ogx.core.stack import replace_env_vars
 
 import constants
+from cache.async_cache import AsyncCache
 from cache.cache import Cache
 from cache.cache_factory import CacheFactory
 from log import get_logger
@@ -27,6 +28,7 @@ from models.config import (
     LlamaStackConfiguration,
     ModelContextProtocolServer,
     OkpConfiguration,
+    PersistencePipelineConfiguration,
     QuotaHandlersConfiguration,
     RagConfiguration,
     RerankerConfiguration,
@@ -109,6 +111,7 @@ class AppConfig:  # pylint: disable=too-many-public-methods
         """
         self._configuration: Optional[Configuration] = None
         self._conversation_cache: Optional[Cache] = None
+        self._async_conversation_cache: Optional[AsyncCache] = None
         self._quota_limiters: list[QuotaLimiter] = []
         self._token_usage_history: Optional[TokenUsageHistory] = None
         self._dynamic_mcp_server_names: set[str] = set()
@@ -139,6 +142,7 @@ class AppConfig:  # pylint: disable=too-many-public-methods
         """
         # clear cached values when configuration changes
         self._conversation_cache = None
+        self._async_conversation_cache = None
         self._quota_limiters = []
         self._token_usage_history = None
         # now it is possible to re-read configuration
@@ -421,6 +425,24 @@ class AppConfig:  # pylint: disable=too-many-public-methods
             raise LogicError("logic error: configuration is not loaded")
         return self._configuration.quota_handlers
 
+    @property
+    def persistence_pipeline_configuration(
+        self,
+    ) -> Optional[PersistencePipelineConfiguration]:
+        """Return persistence pipeline configuration.
+
+        Returns:
+            Optional[PersistencePipelineConfiguration]: The persistence
+            pipeline configuration, or None if turns are persisted by the
+            request handlers.
+
+        Raises:
+            LogicError: If configuration has not been loaded.
+        """
+        if self._configuration is None:
+            raise LogicError("logic error: configuration is not loaded")
+        return self._configuration.persistence_pipeline
+
     @property
     def a2a_state(self) -> "A2AStateConfiguration":
         """Return A2A state configuration."""
@@ -446,6 +468,47 @@ class AppConfig:  # pylint: disable=too-many-public-methods
             )
         return self._conversation_cache
 
+    @property
+    def async_conversation_cache(self) -> AsyncCache:
+        """Return the asynchronous conversation cache.
+
+        The asynchronous cache is used by request handlers so that cache
+        queries never block the event loop.
+
+        Returns:
+            AsyncCache: The asynchronous conversation cache instance configured
+            by the loaded configuration.
+
+        Raises:
+            LogicError: If the configuration has not been loaded.
+        """
+        if self._configuration is None:
+            raise LogicError("logic error: configuration is not loaded")
+        if self._async_conversation_cache is None:
+            self._async_conversation_cache = CacheFactory.async_conversation_cache(
+                self._configuration.conversation_cache
+            )
+        return self._async_conversation_cache
+
+    async def close_async_conversation_cache(self) -> None:
+        """Close the asynchronous conversation cache if it has been created."""
+        if self._async_conversation_cache is not None:
+            await self._async_conversation_cache.close()
+            self._async_conversation_cache = None
+
+    def close_quota_limiters(self) -> None:
+        """Close the quota limiters and token usage history if they have been created.
+
+        Tokens consumed from quota leases and token usage aggregated in the
+        token history buffer are written to the database.
+        """
+        for quota_limiter in self._quota_limiters:
+            quota_limiter.close()
+        self._quota_limiters = []
+        if self._token_usage_history is not None:
+            self._token_usage_history.close()
+            self._token_usage_history = None
+
     @property
     def quota_limiters(self) -> list[QuotaLimiter]:
         """Return list of all setup quota limiters.
@@ -191,12 +191,67 @@ LLM_TURN_COMPLETE_EVENT: Final[str] = "turn_complete"
 POSTGRES_DEFAULT_SSL_MODE: Final[Literal["prefer"]] = "prefer"
 # See: https://www.postgresql.org/docs/current/libpq-connect.html#LIBPQ-CONNECT-GSSENCMODE
 POSTGRES_DEFAULT_GSS_ENCMODE: Final[Literal["prefer"]] = "prefer"
+# Connection pool shared by all storages using one PostgreSQL database
+POSTGRES_POOL_DEFAULT_MIN_SIZE: Final[int] = 1
+POSTGRES_POOL_DEFAULT_MAX_SIZE: Final[int] = 10
+# Seconds to wait for a free pooled connection
+POSTGRES_POOL_DEFAULT_ACQUIRE_TIMEOUT: Final[float] = 30.0
+# Seconds after which a pooled connection is closed and replaced
+POSTGRES_POOL_DEFAULT_MAX_LIFETIME: Final[float] = 3600.0
+# Seconds a read replica may lag behind the primary and still serve reads
+POSTGRES_DEFAULT_MAX_REPLICA_LAG: Final[float] = 5.0
+# Seconds during which reads of a user go to the primary after their write
+POSTGRES_DEFAULT_READ_YOUR_WRITES_WINDOW: Final[float] = 10.0
+# Seconds between two measurements of the replication lag of a replica
+POSTGRES_REPLICA_LAG_CHECK_INTERVAL: Final[float] = 5.0
+# Maximal number of users whose last write is remembered for read-your-writes
+POSTGRES_READ_YOUR_WRITES_MAX_USERS: Final[int] = 100000
+# Number of rows copied by one INSERT when users are moved between shards
+RESHARD_BATCH_SIZE: Final[int] = 1000
 
 # cache constants
 CACHE_TYPE_MEMORY: Final[str] = "memory"
 CACHE_TYPE_SQLITE: Final[str] = "sqlite"
 CACHE_TYPE_POSTGRES: Final[str] = "postgres"
 CACHE_TYPE_NOOP: Final[str] = "noop"
+# write-behind mode of conversation cache
+WRITE_BEHIND_DEFAULT_FLUSH_INTERVAL: Final[int] = 100  # milliseconds
+WRITE_BEHIND_DEFAULT_BATCH_SIZE: Final[int] = 100
+# bound keeping multi-row INSERT below SQLite limit of bound parameters
+WRITE_BEHIND_MAX_BATCH_SIZE: Final[int] = 1000
+WRITE_BEHIND_DEFAULT_MAX_PENDING: Final[int] = 10000
+WRITE_BEHIND_DEFAULT_APPEND_TIMEOUT: Final[int] = 30000  # milliseconds
+# page size of paginated conversation history and conversation list
+CONVERSATIONS_PAGE_DEFAULT_LIMIT: Final[int] = 100
+CONVERSATIONS_PAGE_MAX_LIMIT: Final[int] = 1000
+# read-through in-process cache in front of conversation cache
+READ_THROUGH_DEFAULT_MAX_ENTRIES: Final[int] = 1000
+READ_THROUGH_DEFAULT_TTL: Final[int] = 60  # seconds
+# in-process cache of conversation records used by query endpoints
+CONVERSATION_METADATA_CACHE_MAX_ENTRIES: Final[int] = 10000
+CONVERSATION_METADATA_CACHE_TTL: Final[int] = 30  # seconds
+# high-concurrency mode of SQLite conversation cache
+SQLITE_CONCURRENCY_DEFAULT_SYNCHRONOUS: Final[str] = "NORMAL"
+SQLITE_CONCURRENCY_DEFAULT_MMAP_SIZE: Final[int] = 256 * 1024 * 1024  # bytes
+SQLITE_CONCURRENCY_DEFAULT_CACHE_SIZE: Final[int] = 64 * 1024  # KiB
+SQLITE_CONCURRENCY_DEFAULT_READERS: Final[int] = 4
+SQLITE_CONCURRENCY_DEFAULT_STATEMENT_CACHE_SIZE: Final[int] = 256
+# retention sweeper of conversation cache
+RETENTION_DEFAULT_PERIOD: Final[int] = 3600  # seconds
+RETENTION_DEFAULT_BATCH_SIZE: Final[int] = 500
+RETENTION_DEFAULT_VACUUM_PAGES: Final[int] = 1000
+# one cache retention sweeper per database is elected the same way as the
+# quota scheduler
+CACHE_RETENTION_ADVISORY_LOCK_ID: Final[int] = 4_204_381_948
+CACHE_RETENTION_LEASE_NAME: Final[str] = "cache_retention"
+
+# background persistence of query turns
+PERSISTENCE_PIPELINE_DEFAULT_WORKERS: Final[int] = 4
+PERSISTENCE_PIPELINE_DEFAULT_MAX_PENDING: Final[int] = 1000
+PERSISTENCE_PIPELINE_DEFAULT_MAX_ATTEMPTS: Final[int] = 5
+PERSISTENCE_PIPELINE_DEFAULT_RETRY_DELAY: Final[int] = 1000  # milliseconds
+PERSISTENCE_PIPELINE_DEFAULT_DRAIN_TIMEOUT: Final[int] = 30  # seconds
+PERSISTENCE_PIPELINE_DEFAULT_WAIT_TIMEOUT: Final[int] = 10  # seconds
 
 # BYOK RAG
 # Backends that have enrichment support in llama_stack_configuration.py
@@ -220,6 +275,33 @@ DEFAULT_CROSS_ENCODER_MODEL: Final[str] = "cross-encoder/ms-marco-MiniLM-L6-v2"
 USER_QUOTA_LIMITER: Final[str] = "user_limiter"
 CLUSTER_QUOTA_LIMITER: Final[str] = "cluster_limiter"
 
+# quota scheduler applying the quota periods; one scheduler per database is
+# elected by PostgreSQL advisory lock or by SQLite lease row
+QUOTA_SCHEDULER_DEFAULT_CHUNK_SIZE: Final[int] = 1000
+QUOTA_SCHEDULER_ADVISORY_LOCK_ID: Final[int] = 4_204_381_947
+QUOTA_SCHEDULER_LEASE_NAME: Final[str] = "quota_scheduler"
+QUOTA_SCHEDULER_MIN_LEASE_DURATION: Final[int] = 60  # seconds
+
+# quota leased by workers to be consumed without database access
+QUOTA_LEASE_DEFAULT_FRACTION: Final[float] = 0.1
+QUOTA_LEASE_DEFAULT_SYNC_PERIOD: Final[int] = 5  # seconds
+
+# tokens reserved by requests before calling the LLM
+QUOTA_RESERVATION_DEFAULT_OUTPUT_TOKENS: Final[int] = 1000
+QUOTA_RESERVATION_DEFAULT_TIMEOUT: Final[int] = 600  # seconds
+# settled reservations are kept, so repeated settles are ignored
+QUOTA_RESERVATION_SETTLED_RETENTION: Final[int] = 86400  # seconds
+
+# token usage history aggregated in memory before it is written
+TOKEN_HISTORY_BUFFER_DEFAULT_FLUSH_PERIOD: Final[int] = 10  # seconds
+TOKEN_HISTORY_BUFFER_DEFAULT_MAX_KEYS: Final[int] = 1000
+
+# subjects with exhausted quota refused without database access
+QUOTA_NEGATIVE_CACHE_DEFAULT_TTL: Final[int] = 5  # seconds
+QUOTA_NEGATIVE_CACHE_DEFAULT_MAX_ENTRIES: Final[int] = 10000
+# quota exceeded errors are logged with stack trace at most once per interval
+QUOTA_EXCEEDED_TRACE_LOG_INTERVAL: Final[int] = 60  # seconds
+
 # Default chunk limits (used as Pydantic field defaults in RagConfiguration).
 # These replace the old hardcoded INLINE_RAG_MAX_CHUNKS, TOOL_RAG_MAX_CHUNKS,
 # BYOK_RAG_MAX_CHUNKS, and OKP_RAG_MAX_CHUNKS constants.
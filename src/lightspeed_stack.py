@@ -12,7 +12,9 @@ from configuration import configuration
 from constants import LIGHTSPEED_STACK_LOG_LEVEL_ENV_VAR
 from llama_stack_configuration import migrate_config_dumb
 from log import get_logger, setup_logging
+from runners.cache_retention import start_cache_retention_sweeper
 from runners.quota_scheduler import start_quota_scheduler
+from runners.reshard import reshard_storages
 from runners.uvicorn import start_uvicorn
 from utils import config_dumper, models_dumper
 
@@ -36,6 +38,7 @@ def create_argument_parser() -> ArgumentParser:
                                                  configuration from the service configuration
     - -i / --input-config-file: Llama Stack input configuration filename (default "run.yaml")
     - -o / --output-config-file: Llama Stack output configuration filename (default "run_.yaml")
+    - --reshard: move conversations of users to their database shards and quit
 
     Returns:
         Configured ArgumentParser for parsing the service CLI options.
@@ -116,6 +119,14 @@ def create_argument_parser() -> ArgumentParser:
         action="store_true",
         default=False,
     )
+    parser.add_argument(
+        "--reshard",
+        dest="reshard",
+        help="move conversations of users to their database shards and quit; "
+        "the service must not be running meanwhile",
+        action="store_true",
+        default=False,
+    )
     parser.add_argument(
         "--run-yaml",
         dest="run_yaml",
@@ -146,6 +157,9 @@ def main() -> None:
       configuration.json and exits (exits with status 1 on failure).
     - If --dump-schema is provided, writes the active configuration schema to
       schema.json and exits (exits with status 1 on failure).
+    - If --reshard is provided, moves conversations of users stored outside
+      of their PostgreSQL shards to the shards and exits (exits with status 1
+      on failure).
     - If --migrate-config is provided, migrates the legacy two-file config
       (--run-yaml plus the -c lightspeed-stack.yaml) into a unified single
       file at --migrate-output and exits (status 1 on failure or missing
@@ -246,6 +260,17 @@ def main() -> None:
             raise SystemExit(1) from e
         return
 
+    # --reshard CLI flag is used to move conversations of users to their shards
+    # after the shards of the database or conversation cache have changed
+    if args.reshard:
+        try:
+            moved = reshard_storages(configuration.configuration)
+            logger.info("Conversations of %d users moved to their shards", moved)
+        except Exception as e:
+            logger.error("Failed to reshard conversation storage: %s", e)
+            raise SystemExit(1) from e
+        return
+
     # Store config path in env so each uvicorn worker can load it
     # (step is needed because process context isn't shared).
     os.environ[constants.CONFIG_PATH_ENV_VAR] = args.config_file
@@ -263,6 +288,7 @@ def main() -> None:
 
     # start the runners
     start_quota_scheduler(configuration.configuration)
+    start_cache_retention_sweeper(configuration.configuration)
     # if every previous steps don't fail, start the service on specified port
     start_uvicorn(configuration.service_configuration)
     logger.info("Lightspeed Core Stack finished")
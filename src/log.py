@@ -7,6 +7,8 @@ import sys
 import typing as t
 from copy import deepcopy
 from datetime import datetime
+from threading import Lock
+from time import monotonic
 
 import uvicorn.config
 from rich.text import Text
@@ -90,6 +92,59 @@ def get_logger(name: str) -> logging.Logger:
     return logging.getLogger(f"{DEFAULT_LOGGER_NAME}.{name}")
 
 
+class RateLimitedTrace:  # pylint: disable=too-few-public-methods
+    """Log errors with exception details at most once per interval.
+
+    Errors logged during the interval are logged without the exception
+    details, so frequently repeated errors do not flood the log.
+    """
+
+    def __init__(self, logger: logging.Logger, interval: float) -> None:
+        """Create the rate limited log.
+
+        Parameters:
+        ----------
+            logger: Logger the errors are logged to.
+            interval: Minimal number of seconds between two exception details.
+        """
+        self.logger = logger
+        self.interval = interval
+        self._next_trace = 0.0
+        self._suppressed = 0
+        self._lock = Lock()
+
+    def error(self, exc: BaseException, msg: str, *args: t.Any) -> None:
+        """Log error, with exception details unless they were logged recently.
+
+        Parameters:
+        ----------
+            exc: Exception whose details (and stack trace, if it was raised)
+            are logged.
+            msg: Log message format.
+            args: Log message arguments.
+        """
+        suppressed: t.Optional[int] = None
+        with self._lock:
+            now = monotonic()
+            if now < self._next_trace:
+                self._suppressed += 1
+            else:
+                self._next_trace = now + self.interval
+                suppressed, self._suppressed = self._suppressed, 0
+        if suppressed is None:
+            self.logger.error(msg, *args)
+            return
+        if suppressed:
+            self.logger.error(
+                msg + " (details of %d similar errors not logged)",
+                *args,
+                suppressed,
+                exc_info=exc,
+            )
+            return
+        self.logger.error(msg, *args, exc_info=exc)
+
+
 def build_logging_config() -> dict[t.Any, t.Any]:
     """Create logging configuration."""
     handler = "default"
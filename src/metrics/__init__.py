@@ -22,6 +22,19 @@ LLM_INFERENCE_DURATION_BUCKETS: Final[tuple[float, ...]] = (
     float("inf"),
 )
 
+POSTGRES_POOL_WAIT_BUCKETS: Final[tuple[float, ...]] = (
+    0.001,
+    0.005,
+    0.01,
+    0.05,
+    0.1,
+    0.5,
+    1.0,
+    5.0,
+    30.0,
+    float("inf"),
+)
+
 # Counter to track REST API calls
 # This will be used to count how many times each API endpoint is called
 # and the status code of the response
@@ -88,3 +101,69 @@ started_in_degraded_mode = Gauge(
     "ls_started_in_degraded_mode",
     "Indicates if service started in degraded mode (1 = degraded, 0 = healthy)",
 )
+
+# Metric that counts reconnects of database backed storages (conversation
+# cache, quota limiters, token usage history) triggered by lost connections
+storage_reconnects_total = Counter(
+    "ls_storage_reconnects_total",
+    "Storage reconnects after lost database connection",
+    ["storage", "operation", "result"],
+)
+
+# Histogram to measure how long storages wait for a pooled PostgreSQL connection
+postgres_pool_wait_seconds = Histogram(
+    "ls_postgres_pool_wait_seconds",
+    "Time spent waiting for a pooled PostgreSQL connection",
+    ["pool"],
+    buckets=POSTGRES_POOL_WAIT_BUCKETS,
+)
+
+# Gauge to track pooled PostgreSQL connections by state (in_use, idle)
+postgres_pool_connections = Gauge(
+    "ls_postgres_pool_connections",
+    "Number of pooled PostgreSQL connections",
+    ["pool", "state"],
+)
+
+# Gauge to track ratio of in use connections to the maximum pool size
+postgres_pool_utilization = Gauge(
+    "ls_postgres_pool_utilization",
+    "Ratio of in use PostgreSQL connections to the maximum pool size",
+    ["pool"],
+)
+
+# Metric that counts conversation cache rows deleted by the retention sweeper
+cache_retention_deleted_rows_total = Counter(
+    "ls_cache_retention_deleted_rows_total",
+    "Conversation cache rows deleted by the retention sweeper",
+    ["table"],
+)
+
+# Gauge to track number of rows in conversation cache tables
+cache_table_rows = Gauge(
+    "ls_cache_table_rows",
+    "Number of rows in conversation cache tables",
+    ["table"],
+)
+
+# Gauge to track age of the oldest token usage aggregated in memory when the
+# token usage history buffer is flushed
+token_usage_flush_lag_seconds = Gauge(
+    "ls_token_usage_flush_lag_seconds",
+    "Age of the oldest buffered token usage when the buffer was flushed",
+)
+
+# Gauge to track time of the last run of the quota scheduler that applied all
+# quota limiters; it is set by the scheduler elected for the database only
+quota_scheduler_last_success_timestamp_seconds = Gauge(
+    "ls_quota_scheduler_last_success_timestamp_seconds",
+    "Unix time of the last successful run of the quota scheduler",
+)
+
+# Metric that counts lookups in the in-process read-through conversation cache
+# by kind of data (history, summaries) and result (hit, miss)
+conversation_cache_lookups_total = Counter(
+    "ls_conversation_cache_lookups_total",
+    "Lookups in the in-process read-through conversation cache",
+    ["kind", "result"],
+)
@@ -172,3 +172,119 @@ def set_started_in_degraded_mode(is_degraded: bool) -> None:
         metrics.started_in_degraded_mode.set(1 if is_degraded else 0)
     except (AttributeError, TypeError, ValueError):
         logger.warning("Failed to update started_in_degraded_mode gauge", exc_info=True)
+
+
+STORAGE_RECONNECT_RESULT_SUCCESS: Final[str] = "success"
+STORAGE_RECONNECT_RESULT_FAILURE: Final[str] = "failure"
+
+
+def record_storage_reconnect(storage: str, operation: str, success: bool) -> None:
+    """Record one reconnect of a database backed storage.
+
+    Args:
+        storage: Name of the storage class that lost its connection.
+        operation: Storage operation that detected the lost connection.
+        success: True if the connection was re-established.
+    """
+    result = (
+        STORAGE_RECONNECT_RESULT_SUCCESS
+        if success
+        else STORAGE_RECONNECT_RESULT_FAILURE
+    )
+    try:
+        metrics.storage_reconnects_total.labels(storage, operation, result).inc()
+    except (AttributeError, TypeError, ValueError):
+        logger.warning("Failed to update storage reconnect metric", exc_info=True)
+
+
+POSTGRES_POOL_STATE_IN_USE: Final[str] = "in_use"
+POSTGRES_POOL_STATE_IDLE: Final[str] = "idle"
+
+
+def record_postgres_pool_wait(pool: str, duration: float) -> None:
+    """Record time spent waiting for a pooled PostgreSQL connection.
+
+    Args:
+        pool: Name of the connection pool.
+        duration: Number of seconds spent waiting for the connection.
+    """
+    try:
+        metrics.postgres_pool_wait_seconds.labels(pool).observe(duration)
+    except (AttributeError, TypeError, ValueError):
+        logger.warning("Failed to update PostgreSQL pool wait metric", exc_info=True)
+
+
+def record_postgres_pool_usage(
+    pool: str, in_use: int, idle: int, max_size: int
+) -> None:
+    """Record number of pooled PostgreSQL connections and pool utilization.
+
+    Args:
+        pool: Name of the connection pool.
+        in_use: Number of connections leased by storages.
+        idle: Number of open connections waiting in the pool.
+        max_size: Maximum number of connections opened by the pool.
+    """
+    try:
+        metrics.postgres_pool_connections.labels(pool, POSTGRES_POOL_STATE_IN_USE).set(
+            in_use
+        )
+        metrics.postgres_pool_connections.labels(pool, POSTGRES_POOL_STATE_IDLE).set(
+            idle
+        )
+        metrics.postgres_pool_utilization.labels(pool).set(in_use / max_size)
+    except (AttributeError, TypeError, ValueError):
+        logger.warning("Failed to update PostgreSQL pool usage metrics", exc_info=True)
+
+
+def record_cache_retention(deleted: dict[str, int], sizes: dict[str, int]) -> None:
+    """Record rows deleted by the retention sweeper and sizes of cache tables.
+
+    Args:
+        deleted: Number of deleted rows for each table.
+        sizes: Number of rows remaining in each table.
+    """
+    try:
+        for table, count in deleted.items():
+            metrics.cache_retention_deleted_rows_total.labels(table).inc(count)
+        for table, count in sizes.items():
+            metrics.cache_table_rows.labels(table).set(count)
+    except (AttributeError, TypeError, ValueError):
+        logger.warning("Failed to update cache retention metrics", exc_info=True)
+
+
+def record_conversation_cache_lookup(kind: str, hit: bool) -> None:
+    """Record lookup in the in-process read-through conversation cache.
+
+    Args:
+        kind: Kind of cached data, history or summaries.
+        hit: True if the data were found in the cache.
+    """
+    try:
+        metrics.conversation_cache_lookups_total.labels(
+            kind, "hit" if hit else "miss"
+        ).inc()
+    except (AttributeError, TypeError, ValueError):
+        logger.warning(
+            "Failed to update conversation cache lookup metric", exc_info=True
+        )
+
+
+def record_token_usage_flush_lag(lag: float) -> None:
+    """Record age of the oldest buffered token usage when the buffer is flushed.
+
+    Args:
+        lag: Number of seconds the oldest token usage waited in the buffer.
+    """
+    try:
+        metrics.token_usage_flush_lag_seconds.set(lag)
+    except (AttributeError, TypeError, ValueError):
+        logger.warning("Failed to update token usage flush lag metric", exc_info=True)
+
+
+def record_quota_scheduler_run() -> None:
+    """Record that the quota scheduler applied all quota limiters."""
+    try:
+        metrics.quota_scheduler_last_success_timestamp_seconds.set_to_current_time()
+    except (AttributeError, TypeError, ValueError):
+        logger.warning("Failed to update quota scheduler run metric", exc_info=True)
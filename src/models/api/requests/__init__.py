@@ -1,7 +1,12 @@
 """Concrete REST API request models grouped by domain."""
 
 from models.api.requests.catalog import ModelFilter
-from models.api.requests.conversations import ConversationUpdateRequest
+from models.api.requests.conversations import (
+    ConversationPageParams,
+    ConversationsListPageParams,
+    ConversationUpdateRequest,
+    UserConversationsPageParams,
+)
 from models.api.requests.feedback import FeedbackRequest, FeedbackStatusUpdateRequest
 from models.api.requests.mcp_servers import MCPServerRegistrationRequest
 from models.api.requests.prompts import PromptCreateRequest, PromptUpdateRequest
@@ -23,7 +28,9 @@ from models.api.requests.vector_stores import (
 )
 
 __all__ = [
+    "ConversationPageParams",
     "ConversationUpdateRequest",
+    "ConversationsListPageParams",
     "FeedbackRequest",
     "FeedbackStatusUpdateRequest",
     "MCPServerRegistrationRequest",
@@ -40,6 +47,7 @@ __all__ = [
     "RlsapiV1Terminal",
     "SavedPromptCreateRequest",
     "StreamingInterruptRequest",
+    "UserConversationsPageParams",
     "VectorStoreCreateRequest",
     "VectorStoreFileCreateRequest",
     "VectorStoreUpdateRequest",
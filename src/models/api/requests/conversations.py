@@ -1,6 +1,11 @@
 """Request models for conversation endpoints."""
 
-from pydantic import BaseModel, Field
+from typing import Optional
+
+from pydantic import BaseModel, Field, field_validator
+
+from constants import CONVERSATIONS_PAGE_MAX_LIMIT
+from utils.pagination import decode_cache_cursor, decode_conversation_cursor
 
 
 class ConversationUpdateRequest(BaseModel):
@@ -20,3 +25,118 @@ class ConversationUpdateRequest(BaseModel):
 
     # Reject unknown fields
     model_config = {"extra": "forbid"}
+
+
+class ConversationPageParams(BaseModel):
+    """Model representing query parameters selecting a page of conversation history.
+
+    When neither parameter is specified, the whole history is returned.
+
+    Attributes:
+        limit: Maximal number of turns on the page.
+        after: Cursor returned as `next_cursor` with the previous page.
+    """
+
+    model_config = {"extra": "forbid"}
+    limit: Optional[int] = Field(
+        None,
+        description="Maximal number of conversation turns to return",
+        ge=1,
+        le=CONVERSATIONS_PAGE_MAX_LIMIT,
+        examples=[20],
+    )
+    after: Optional[float] = Field(
+        None,
+        description="Return turns following this cursor "
+        "(next_cursor of previous page)",
+        examples=[1704067200.0],
+    )
+
+
+class ConversationsListPageParams(BaseModel):
+    """Model representing query parameters selecting a page of conversations.
+
+    When neither parameter is specified, all conversations are returned.
+
+    Attributes:
+        limit: Maximal number of conversations on the page.
+        before: Cursor returned as `next_cursor` with the previous page.
+    """
+
+    model_config = {"extra": "forbid"}
+    limit: Optional[int] = Field(
+        None,
+        description="Maximal number of conversations to return",
+        ge=1,
+        le=CONVERSATIONS_PAGE_MAX_LIMIT,
+        examples=[20],
+    )
+    before: Optional[str] = Field(
+        None,
+        description="Return conversations preceding this cursor "
+        "(next_cursor of previous page)",
+        examples=["WzE3MDQwNjcyMDAuMCwgIjEyMyJd"],
+    )
+
+    @field_validator("before")
+    @classmethod
+    def check_cursor(cls, value: Optional[str]) -> Optional[str]:
+        """Validate that the cursor was produced by the conversations listing.
+
+        Args:
+            value: Cursor to validate.
+
+        Returns:
+            The validated cursor.
+
+        Raises:
+            ValueError: If the cursor is malformed.
+        """
+        if value is not None:
+            decode_cache_cursor(value)
+        return value
+
+
+class UserConversationsPageParams(BaseModel):
+    """Model representing query parameters selecting a page of user conversations.
+
+    When neither parameter is specified, all conversations of the user are
+    returned; conversations of all users are always returned by pages.
+
+    Attributes:
+        limit: Maximal number of conversations on the page.
+        before: Cursor returned as `next_cursor` with the previous page.
+    """
+
+    model_config = {"extra": "forbid"}
+    limit: Optional[int] = Field(
+        None,
+        description="Maximal number of conversations to return",
+        ge=1,
+        le=CONVERSATIONS_PAGE_MAX_LIMIT,
+        examples=[20],
+    )
+    before: Optional[str] = Field(
+        None,
+        description="Return conversations preceding this cursor "
+        "(next_cursor of previous page)",
+        examples=["WyIyMDI0LTAxLTAxVDAwOjA1OjAwKzAwOjAwIiwgIjEyMyJd"],
+    )
+
+    @field_validator("before")
+    @classmethod
+    def check_cursor(cls, value: Optional[str]) -> Optional[str]:
+        """Validate that the cursor was produced by the conversations listing.
+
+        Args:
+            value: Cursor to validate.
+
+        Returns:
+            The validated cursor.
+
+        Raises:
+            ValueError: If the cursor is malformed.
+        """
+        if value is not None:
+            decode_conversation_cursor(value)
+        return value
@@ -1,6 +1,6 @@
 """Successful responses for conversation CRUD and listing."""
 
-from typing import ClassVar
+from typing import ClassVar, Optional
 
 from pydantic import Field, computed_field
 
@@ -24,6 +24,7 @@ class ConversationResponse(AbstractSuccessfulResponse):
     Attributes:
         conversation_id: The conversation ID (UUID).
         chat_history: The chat history as a list of conversation turns.
+        next_cursor: Cursor of the next page of paginated chat history.
     """
 
     conversation_id: str = Field(
@@ -51,6 +52,13 @@ class ConversationResponse(AbstractSuccessfulResponse):
         ],
     )
 
+    next_cursor: Optional[float] = Field(
+        None,
+        description="Cursor of the next page of paginated chat history; "
+        "null on the last page or when the history is not paginated",
+        examples=[1704067205.0],
+    )
+
     # provides examples for /docs endpoint
     model_config = {
         "json_schema_extra": {
@@ -122,9 +130,16 @@ class ConversationsListResponse(AbstractSuccessfulResponse):
 
     Attributes:
         conversations: List of conversation details associated with the user.
+        next_cursor: Cursor of the next page of paginated listing.
     """
 
     conversations: list[ConversationDetails]
+    next_cursor: Optional[str] = Field(
+        None,
+        description="Cursor of the next page of paginated listing; "
+        "null on the last page or when the listing is not paginated",
+        examples=["WyIyMDI0LTAxLTAxVDAwOjA1OjAwKzAwOjAwIiwgIjEyMyJd"],
+    )
 
     model_config = {
         "json_schema_extra": {
@@ -160,9 +175,16 @@ class ConversationsListResponseV2(AbstractSuccessfulResponse):
 
     Attributes:
         conversations: List of conversation data associated with the user.
+        next_cursor: Cursor of the next page of paginated listing.
     """
 
     conversations: list[ConversationData]
+    next_cursor: Optional[str] = Field(
+        None,
+        description="Cursor of the next page of paginated listing; "
+        "null on the last page or when the listing is not paginated",
+        examples=["WzE3MDQwNjcyMDAuMCwgIjEyMyJd"],
+    )
 
     model_config = {
         "json_schema_extra": {
@@ -2,6 +2,7 @@
 
 from models.common.conversation import (
     ConversationData,
+    ConversationDataPage,
     ConversationDetails,
     ConversationTurn,
     Message,
@@ -45,6 +46,7 @@ __all__ = [
     "CatalogTool",
     "CatalogToolParameter",
     "ConversationData",
+    "ConversationDataPage",
     "ConversationDetails",
     "ConversationTurn",
     "FeedbackCategory",
@@ -25,6 +25,20 @@ class ConversationData(BaseModel):
     last_message_timestamp: float
 
 
+class ConversationDataPage(BaseModel):
+    """Model representing one page of conversations returned by cache.
+
+    Attributes:
+        conversations: Conversations of the page, most recent first
+        next_cursor: Opaque position (last message timestamp and ID) of the
+            last conversation on the page, to be passed as `before` to get
+            the next page; None when there are no more conversations
+    """
+
+    conversations: list[ConversationData]
+    next_cursor: Optional[str] = None
+
+
 class ConversationDetails(BaseModel):
     """Model representing the details of a user conversation.
 
@@ -12,6 +12,7 @@ from models.api.requests import QueryRequest
 from models.common.moderation import ShieldModerationResult
 from models.common.responses.types import ResponseInput
 from models.common.turn_summary import RAGContext
+from quota.quota_limiter import QuotaReservation
 
 
 # TODO: LCORE-2121: Use AuthTuple everywhere (type refactoring needed) pylint: disable=W0511
@@ -87,6 +88,8 @@ class ResponseGeneratorContext:  # pylint: disable=too-many-instance-attributes
         inline_rag_context: Inline RAG context
         vector_store_ids: Vector store IDs used in the query for source resolution.
         rag_id_mapping: Mapping from vector_db_id to user-facing rag_id.
+        quota_reservations: Tokens reserved in quota limiters for the query,
+            emptied once they are settled.
     """
 
     # Conversation & User context
@@ -110,3 +113,6 @@ class ResponseGeneratorContext:  # pylint: disable=too-many-instance-attributes
     inline_rag_context: RAGContext
     vector_store_ids: list[str] = field(default_factory=list)
     rag_id_mapping: dict[str, str] = field(default_factory=dict)
+
+    # Quota
+    quota_reservations: list[Optional[QuotaReservation]] = field(default_factory=list)
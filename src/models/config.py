@@ -19,7 +19,9 @@ from pydantic import (
     ConfigDict,
     Field,
     FilePath,
+    NonNegativeFloat,
     NonNegativeInt,
+    PositiveFloat,
     PositiveInt,
     PrivateAttr,
     SecretStr,
@@ -160,6 +162,48 @@ class CORSConfiguration(ConfigurationBase):
         return self
 
 
+class SQLiteConcurrencyConfiguration(ConfigurationBase):
+    """High-concurrency mode of SQLite database.
+
+    The database is switched to write-ahead log journal mode, so readers do
+    not block the writer and the writer does not block readers. Writes go
+    through one dedicated connection, reads are served by a small pool of
+    read-only connections. Used by the conversation cache only.
+    """
+
+    synchronous: Literal["OFF", "NORMAL", "FULL", "EXTRA"] = Field(
+        constants.SQLITE_CONCURRENCY_DEFAULT_SYNCHRONOUS,
+        title="Synchronous",
+        description="Value of the synchronous pragma; NORMAL is safe in WAL "
+        "mode and avoids syncing the database file on every commit",
+    )
+
+    mmap_size: NonNegativeInt = Field(
+        constants.SQLITE_CONCURRENCY_DEFAULT_MMAP_SIZE,
+        title="Memory map size",
+        description="Maximum number of bytes of the database file accessed "
+        "through memory-mapped I/O; zero disables memory-mapped I/O",
+    )
+
+    cache_size: PositiveInt = Field(
+        constants.SQLITE_CONCURRENCY_DEFAULT_CACHE_SIZE,
+        title="Page cache size",
+        description="Size of the page cache of each connection in KiB",
+    )
+
+    readers: PositiveInt = Field(
+        constants.SQLITE_CONCURRENCY_DEFAULT_READERS,
+        title="Readers",
+        description="Number of read-only connections serving reads",
+    )
+
+    statement_cache_size: PositiveInt = Field(
+        constants.SQLITE_CONCURRENCY_DEFAULT_STATEMENT_CACHE_SIZE,
+        title="Statement cache size",
+        description="Number of prepared statements cached by each connection",
+    )
+
+
 class SQLiteDatabaseConfiguration(ConfigurationBase):
     """SQLite database configuration."""
 
@@ -169,6 +213,13 @@ class SQLiteDatabaseConfiguration(ConfigurationBase):
         description="Path to file where SQLite database is stored",
     )
 
+    concurrency: Optional[SQLiteConcurrencyConfiguration] = Field(
+        default=None,
+        title="High-concurrency mode",
+        description="Write-ahead log journal mode with dedicated writer and "
+        "pool of read-only connections; used by the conversation cache only",
+    )
+
 
 class InMemoryCacheConfig(ConfigurationBase):
     """In-memory cache configuration."""
@@ -180,6 +231,144 @@ class InMemoryCacheConfig(ConfigurationBase):
     )
 
 
+class PostgreSQLPoolConfiguration(ConfigurationBase):
+    """PostgreSQL connection pool configuration.
+
+    Conversation cache, quota limiters and token usage history share one
+    bounded pool of connections per database, so concurrent requests do not
+    have to wait for a single connection. Request handlers call quota
+    limiters and token usage history from the default thread pool of the
+    event loop, which bounds the number of connections used at once.
+    """
+
+    min_size: NonNegativeInt = Field(
+        constants.POSTGRES_POOL_DEFAULT_MIN_SIZE,
+        title="Minimum size",
+        description="Number of connections opened when the pool is created and "
+        "kept open while idle",
+    )
+
+    max_size: PositiveInt = Field(
+        constants.POSTGRES_POOL_DEFAULT_MAX_SIZE,
+        title="Maximum size",
+        description="Maximum number of connections opened by the pool",
+    )
+
+    acquire_timeout: PositiveFloat = Field(
+        constants.POSTGRES_POOL_DEFAULT_ACQUIRE_TIMEOUT,
+        title="Acquire timeout",
+        description="Number of seconds to wait for a free connection when all "
+        "connections are in use",
+    )
+
+    max_lifetime: PositiveFloat = Field(
+        constants.POSTGRES_POOL_DEFAULT_MAX_LIFETIME,
+        title="Maximum lifetime",
+        description="Number of seconds after which a connection is closed and "
+        "replaced by a new one",
+    )
+
+    @model_validator(mode="after")
+    def check_pool_configuration(self) -> Self:
+        """
+        Validate connection pool size constraints.
+
+        Returns:
+            self: The validated configuration instance.
+
+        Raises:
+            ValueError: If `min_size` is greater than `max_size`.
+        """
+        if self.min_size > self.max_size:
+            raise ValueError("Pool min_size should not be greater than max_size")
+        return self
+
+
+class PostgreSQLReplicaConfiguration(ConfigurationBase):
+    """PostgreSQL read replica configuration.
+
+    Replica serves read-only operations. Database name, credentials, namespace,
+    SSL and pool settings are the same as for the primary database.
+    """
+
+    host: str = Field(
+        ...,
+        title="Hostname",
+        description="Replica server host or socket directory",
+    )
+
+    port: PositiveInt = Field(
+        5432,
+        title="Port",
+        description="Replica server port",
+    )
+
+    @model_validator(mode="after")
+    def check_replica_configuration(self) -> Self:
+        """
+        Validate PostgreSQL replica configuration constraints.
+
+        Returns:
+            self: The validated configuration instance.
+
+        Raises:
+            ValueError: If `port` is greater than 65535.
+        """
+        if self.port > 65535:
+            raise ValueError("Port value should be less than 65536")
+        return self
+
+
+class PostgreSQLShardConfiguration(ConfigurationBase):
+    """PostgreSQL shard configuration.
+
+    Shard stores conversations of a part of users. Credentials, namespace,
+    SSL and pool settings are the same as for the primary database.
+    """
+
+    name: str = Field(
+        ...,
+        min_length=1,
+        title="Name",
+        description="Unique name of the shard. Users are assigned to shards by "
+        "hash of the user ID and the shard name, so the name must not change "
+        "while the shard holds data.",
+    )
+
+    host: str = Field(
+        "localhost",
+        title="Hostname",
+        description="Shard server host or socket directory",
+    )
+
+    port: PositiveInt = Field(
+        5432,
+        title="Port",
+        description="Shard server port",
+    )
+
+    db: str = Field(
+        ...,
+        title="Database name",
+        description="Shard database name to connect to",
+    )
+
+    @model_validator(mode="after")
+    def check_shard_configuration(self) -> Self:
+        """
+        Validate PostgreSQL shard configuration constraints.
+
+        Returns:
+            self: The validated configuration instance.
+
+        Raises:
+            ValueError: If `port` is greater than 65535.
+        """
+        if self.port > 65535:
+            raise ValueError("Port value should be less than 65536")
+        return self
+
+
 class PostgreSQLDatabaseConfiguration(ConfigurationBase):
     """PostgreSQL database configuration.
 
@@ -251,21 +440,78 @@ class PostgreSQLDatabaseConfiguration(ConfigurationBase):
         description="Path to CA certificate",
     )
 
+    heartbeat_interval: Optional[PositiveInt] = Field(
+        None,
+        title="Heartbeat interval",
+        description="Interval in seconds between background connection liveness "
+        "checks. When not set, lost connections are detected by failing queries "
+        "and re-established on demand.",
+    )
+
+    pool: PostgreSQLPoolConfiguration = Field(
+        default_factory=lambda: PostgreSQLPoolConfiguration(
+            min_size=constants.POSTGRES_POOL_DEFAULT_MIN_SIZE,
+            max_size=constants.POSTGRES_POOL_DEFAULT_MAX_SIZE,
+            acquire_timeout=constants.POSTGRES_POOL_DEFAULT_ACQUIRE_TIMEOUT,
+            max_lifetime=constants.POSTGRES_POOL_DEFAULT_MAX_LIFETIME,
+        ),
+        title="Connection pool",
+        description="Bounded pool of connections shared by all storages using "
+        "this database",
+    )
+
+    replicas: list[PostgreSQLReplicaConfiguration] = Field(
+        default_factory=list,
+        title="Read replicas",
+        description="Read replicas of the database. Read-only operations such as "
+        "conversation listing, history retrieval, ownership checks and quota "
+        "lookups are spread across the replicas in round-robin fashion.",
+    )
+
+    max_replica_lag: NonNegativeFloat = Field(
+        constants.POSTGRES_DEFAULT_MAX_REPLICA_LAG,
+        title="Maximum replica lag",
+        description="Number of seconds a replica may lag behind the primary "
+        "database. Reads are served by the primary while a replica lags more "
+        "or is unreachable.",
+    )
+
+    read_your_writes_window: NonNegativeFloat = Field(
+        constants.POSTGRES_DEFAULT_READ_YOUR_WRITES_WINDOW,
+        title="Read-your-writes window",
+        description="Number of seconds after a write of a user during which "
+        "reads of the same user are served by the primary database",
+    )
+
+    shards: list[PostgreSQLShardConfiguration] = Field(
+        default_factory=list,
+        title="Shards",
+        description="Databases storing conversations, each of them holds "
+        "conversations of a part of users chosen by hash of the user ID. Other "
+        "data stay in this database. Use the --reshard command line option to "
+        "move stored conversations after the list of shards changes.",
+    )
+
     @model_validator(mode="after")
     def check_postgres_configuration(self) -> Self:
         """
         Validate PostgreSQL configuration constraints.
 
-        Ensures the configured port is within the valid TCP port range.
+        Ensures the configured port is within the valid TCP port range and
+        that shard names are unique.
 
         Returns:
             self: The validated configuration instance.
 
         Raises:
-            ValueError: If `port` is greater than 65535.
+            ValueError: If `port` is greater than 65535 or if two shards share
+            a name.
         """
         if self.port > 65535:
             raise ValueError("Port value should be less than 65536")
+        names = [shard.name for shard in self.shards]
+        if len(set(names)) != len(names):
+            raise ValueError("Shard names should be unique")
         return self
 
 
@@ -1899,6 +2145,120 @@ class CompactionConfiguration(ConfigurationBase):
         return value
 
 
+class WriteBehindConfiguration(ConfigurationBase):
+    """Write-behind mode of conversation cache.
+
+    Appended conversation turns are put into a bounded in-memory queue and a
+    background task stores them in batches, so one transaction is committed
+    for many turns. Pending turns are visible to reads and they are flushed
+    when the service shuts down.
+    """
+
+    flush_interval: PositiveInt = Field(
+        constants.WRITE_BEHIND_DEFAULT_FLUSH_INTERVAL,
+        title="Flush interval",
+        description="Maximum number of milliseconds an appended turn waits in "
+        "the queue before it is stored",
+    )
+
+    batch_size: PositiveInt = Field(
+        constants.WRITE_BEHIND_DEFAULT_BATCH_SIZE,
+        le=constants.WRITE_BEHIND_MAX_BATCH_SIZE,
+        title="Batch size",
+        description="Number of queued turns that triggers flush; also the "
+        "maximum number of turns stored by one transaction",
+    )
+
+    max_pending: PositiveInt = Field(
+        constants.WRITE_BEHIND_DEFAULT_MAX_PENDING,
+        title="Maximum pending turns",
+        description="Capacity of the queue; requests appending turns wait when "
+        "the queue is full",
+    )
+
+    append_timeout: PositiveInt = Field(
+        constants.WRITE_BEHIND_DEFAULT_APPEND_TIMEOUT,
+        title="Append timeout",
+        description="Maximum number of milliseconds a request waits for a free "
+        "slot in the full queue before appending the turn fails",
+    )
+
+
+class ReadThroughCacheConfiguration(ConfigurationBase):
+    """In-process read-through cache in front of conversation cache.
+
+    Recently read conversation histories and compaction summaries are kept
+    in a bounded LRU cache, so repeated reads of active conversations do not
+    need a database round trip. Entries are invalidated when the conversation
+    is changed by the same process; changes made by other processes (Uvicorn
+    workers or replicas) become visible when the entry expires.
+    """
+
+    max_entries: PositiveInt = Field(
+        constants.READ_THROUGH_DEFAULT_MAX_ENTRIES,
+        title="Maximum entries",
+        description="Maximum number of conversation histories and summary "
+        "lists kept in the cache; least recently used ones are evicted first",
+    )
+
+    ttl: PositiveInt = Field(
+        constants.READ_THROUGH_DEFAULT_TTL,
+        title="Time to live",
+        description="Number of seconds after which a cached entry is read "
+        "from the database again",
+    )
+
+
+class ConversationRetentionConfiguration(ConfigurationBase):
+    """Retention policy of conversation cache.
+
+    A background sweeper periodically deletes turns and conversations that
+    fall outside the policy. Rows are deleted in small batches, each in its
+    own short transaction, so requests are never blocked for long. Limits
+    that are not set are not enforced.
+    """
+
+    max_age: Optional[PositiveInt] = Field(
+        None,
+        title="Maximum age",
+        description="Number of seconds after which conversation turns are "
+        "deleted; conversations without a newer message are deleted entirely",
+    )
+
+    max_turns_per_conversation: Optional[PositiveInt] = Field(
+        None,
+        title="Maximum turns per conversation",
+        description="Number of most recent turns kept in each conversation",
+    )
+
+    max_conversations_per_user: Optional[PositiveInt] = Field(
+        None,
+        title="Maximum conversations per user",
+        description="Number of most recently active conversations kept for "
+        "each user",
+    )
+
+    period: PositiveInt = Field(
+        constants.RETENTION_DEFAULT_PERIOD,
+        title="Period",
+        description="Number of seconds between two runs of the sweeper",
+    )
+
+    batch_size: PositiveInt = Field(
+        constants.RETENTION_DEFAULT_BATCH_SIZE,
+        title="Batch size",
+        description="Maximum number of rows (or conversations) deleted by one "
+        "transaction",
+    )
+
+    vacuum_pages: PositiveInt = Field(
+        constants.RETENTION_DEFAULT_VACUUM_PAGES,
+        title="Vacuum pages",
+        description="Maximum number of free pages returned to the file system "
+        "by incremental vacuum after each run; SQLite only",
+    )
+
+
 class ConversationHistoryConfiguration(ConfigurationBase):
     """Conversation history configuration."""
 
@@ -1926,8 +2286,31 @@ class ConversationHistoryConfiguration(ConfigurationBase):
         description="PostgreSQL database configuration",
     )
 
+    write_behind: Optional[WriteBehindConfiguration] = Field(
+        None,
+        title="Write-behind mode",
+        description="When configured, appended conversation turns are stored "
+        "in batches by a background task. Supported by SQLite and PostgreSQL "
+        "caches.",
+    )
+
+    read_through: Optional[ReadThroughCacheConfiguration] = Field(
+        None,
+        title="Read-through cache",
+        description="When configured, conversation histories and summaries "
+        "are cached in process memory. Supported by SQLite and PostgreSQL "
+        "caches.",
+    )
+
+    retention: Optional[ConversationRetentionConfiguration] = Field(
+        None,
+        title="Retention policy",
+        description="When configured, old turns and conversations are deleted "
+        "by a background sweeper. Supported by SQLite and PostgreSQL caches.",
+    )
+
     @model_validator(mode="after")
-    def check_cache_configuration(self) -> Self:
+    def check_cache_configuration(self) -> Self:  # pylint: disable=too-many-branches
         """
         Validate the conversation cache configuration and enforce the selected cache type backend.
 
@@ -1939,10 +2322,26 @@ class ConversationHistoryConfiguration(ConfigurationBase):
                         or if other backend configs are present.
             ValueError: If `type` is "postgres" but `postgres` config is
                         missing, or if other backend configs are present.
+            ValueError: If write-behind mode, read-through cache or
+                        retention policy is configured for other than SQLite
+                        or PostgreSQL cache.
 
         Returns:
             The validated model instance.
         """
+        database_features = {
+            "Write-behind mode": self.write_behind,
+            "Read-through cache": self.read_through,
+            "Retention policy": self.retention,
+        }
+        for feature, feature_config in database_features.items():
+            if feature_config is not None and self.type not in (
+                constants.CACHE_TYPE_SQLITE,
+                constants.CACHE_TYPE_POSTGRES,
+            ):
+                raise ValueError(
+                    f"{feature} is supported by SQLite and PostgreSQL caches only"
+                )
         # if any backend config is provided, type must be explicitly selected
         if self.type is None:
             if any([self.memory, self.sqlite, self.postgres]):
@@ -2454,9 +2853,37 @@ class QuotaLimiterConfiguration(ConfigurationBase):
         description="Period specified in human readable form",
     )
 
+    shards: PositiveInt = Field(
+        1,
+        title="Shards",
+        description="Number of rows the cluster quota is split into, so "
+        "concurrent requests consume tokens from different rows",
+    )
+
+    @model_validator(mode="after")
+    def check_shards(self) -> Self:
+        """
+        Validate that only the cluster quota is split into shards.
+
+        Returns:
+            self: The validated configuration instance.
+
+        Raises:
+            ValueError: If `shards` is set for a user quota limiter.
+        """
+        if self.shards > 1 and self.type != "cluster_limiter":
+            raise ValueError("Only cluster_limiter quota can be split into shards")
+        return self
+
 
 class QuotaSchedulerConfiguration(ConfigurationBase):
-    """Quota scheduler configuration."""
+    """Quota scheduler configuration.
+
+    Every process started with quota limiters runs the quota scheduler, but
+    only one of the schedulers sharing a database applies the quota periods.
+    It is elected by PostgreSQL advisory lock, or by a lease row renewed in
+    SQLite database.
+    """
 
     period: PositiveInt = Field(
         1,
@@ -2480,6 +2907,118 @@ class QuotaSchedulerConfiguration(ConfigurationBase):
         "times with specified delay.",
     )
 
+    chunk_size: PositiveInt = Field(
+        constants.QUOTA_SCHEDULER_DEFAULT_CHUNK_SIZE,
+        title="Chunk size",
+        description="Maximum number of quota rows updated by one statement, "
+        "so rows are not locked for the whole table update",
+    )
+
+
+class QuotaLeaseConfiguration(ConfigurationBase):
+    """Quota consumed by workers without database access.
+
+    Every worker leases a part of the available quota of a subject and checks
+    and consumes tokens locally. Consumed tokens are written to the database
+    periodically and on shutdown, when the lease is renewed. Tokens consumed
+    from a lease taken before the quota scheduler revoked the quota are not
+    charged to the new period. Every worker can over-spend the quota of a
+    subject by at most the leased part of the quota limit.
+    """
+
+    fraction: float = Field(
+        constants.QUOTA_LEASE_DEFAULT_FRACTION,
+        gt=0,
+        le=1,
+        title="Leased fraction",
+        description="Part of the quota limit leased by a worker at once. It is "
+        "the upper bound of quota over-spent by every worker.",
+    )
+
+    sync_period: PositiveInt = Field(
+        constants.QUOTA_LEASE_DEFAULT_SYNC_PERIOD,
+        title="Synchronization period",
+        description="Number of seconds between writes of consumed tokens to "
+        "the database. Changes of the quota made by the quota scheduler are "
+        "seen by workers after this period.",
+    )
+
+
+class TokenHistoryBufferConfiguration(ConfigurationBase):
+    """Token usage history aggregated in memory before it is written.
+
+    Input and output tokens are summed per user, provider and model and
+    written by one multi-row upsert every flush period, when the number of
+    aggregated keys reaches the limit and on shutdown. Token usage history
+    is used for reporting only; usage aggregated since the last write is
+    lost when the service crashes.
+    """
+
+    flush_period: PositiveInt = Field(
+        constants.TOKEN_HISTORY_BUFFER_DEFAULT_FLUSH_PERIOD,
+        title="Flush period",
+        description="Number of seconds between writes of aggregated token "
+        "usage. It bounds the period of token usage lost on a crash.",
+    )
+
+    max_keys: PositiveInt = Field(
+        constants.TOKEN_HISTORY_BUFFER_DEFAULT_MAX_KEYS,
+        title="Maximum number of keys",
+        description="Number of aggregated (user, provider, model) keys that "
+        "triggers a write before the flush period elapses",
+    )
+
+
+class QuotaReservationConfiguration(ConfigurationBase):
+    """Tokens reserved by requests before calling the LLM.
+
+    The number of tokens of the request input is estimated and, together with
+    the expected number of output tokens, atomically subtracted from the
+    available quota when the request starts. Requests are refused when the
+    available quota is lower than the estimate, so concurrent requests can
+    not over-spend the quota. The reservation is settled by the actual token
+    usage when the request finishes. Reservations of requests that never
+    finished are returned to the quota by the quota scheduler. Reservations
+    are not used when the quota is leased to workers.
+    """
+
+    output_tokens: NonNegativeInt = Field(
+        constants.QUOTA_RESERVATION_DEFAULT_OUTPUT_TOKENS,
+        title="Output tokens",
+        description="Number of output tokens reserved for every request in "
+        "addition to the estimated number of input tokens",
+    )
+
+    timeout: PositiveInt = Field(
+        constants.QUOTA_RESERVATION_DEFAULT_TIMEOUT,
+        title="Reservation timeout",
+        description="Number of seconds after which tokens reserved by a "
+        "request that did not settle them are returned to the quota",
+    )
+
+
+class QuotaNegativeCacheConfiguration(ConfigurationBase):
+    """Cache of subjects whose quota has been found exhausted.
+
+    Requests of such subjects are refused without reading the quota from the
+    database until the entry expires, or until the quota is revoked or
+    increased by the quota scheduler running in the same process.
+    """
+
+    ttl: PositiveInt = Field(
+        constants.QUOTA_NEGATIVE_CACHE_DEFAULT_TTL,
+        title="Time to live",
+        description="Number of seconds a subject with exhausted quota is "
+        "refused without reading its quota",
+    )
+
+    max_entries: PositiveInt = Field(
+        constants.QUOTA_NEGATIVE_CACHE_DEFAULT_MAX_ENTRIES,
+        title="Maximum entries",
+        description="Maximum number of cached subjects per quota limiter; the "
+        "least recently refused ones are evicted first",
+    )
+
 
 class QuotaHandlersConfiguration(ConfigurationBase):
     """Quota limiter configuration.
@@ -2510,7 +3049,10 @@ class QuotaHandlersConfiguration(ConfigurationBase):
 
     scheduler: QuotaSchedulerConfiguration = Field(
         default_factory=lambda: QuotaSchedulerConfiguration(
-            period=1, database_reconnection_count=10, database_reconnection_delay=1
+            period=1,
+            database_reconnection_count=10,
+            database_reconnection_delay=1,
+            chunk_size=constants.QUOTA_SCHEDULER_DEFAULT_CHUNK_SIZE,
         ),
         title="Quota scheduler",
         description="Quota scheduler configuration",
@@ -2522,6 +3064,135 @@ class QuotaHandlersConfiguration(ConfigurationBase):
         description="Enables storing information about token usage history",
     )
 
+    token_history_buffer: Optional[TokenHistoryBufferConfiguration] = Field(
+        None,
+        title="Token history buffer",
+        description="When configured, token usage history is aggregated in "
+        "memory and written periodically instead of once per request",
+    )
+
+    lease: Optional[QuotaLeaseConfiguration] = Field(
+        None,
+        title="Quota lease",
+        description="When configured, quota is checked and consumed by workers "
+        "locally and written to the database periodically",
+    )
+
+    reservation: Optional[QuotaReservationConfiguration] = Field(
+        None,
+        title="Quota reservation",
+        description="When configured, tokens estimated for a query are "
+        "reserved before calling the LLM and settled by the actual usage",
+    )
+
+    negative_cache: Optional[QuotaNegativeCacheConfiguration] = Field(
+        None,
+        title="Quota negative cache",
+        description="When configured, subjects whose quota has been found "
+        "exhausted are refused for a short time without database access",
+    )
+
+    @model_validator(mode="after")
+    def check_sharded_lease(self) -> Self:
+        """
+        Validate that leased quota is not split into shards.
+
+        Leases are written periodically, so they do not update the quota row
+        by every request.
+
+        Returns:
+            self: The validated configuration instance.
+
+        Raises:
+            ValueError: If quota lease is configured together with a quota
+            limiter split into shards.
+        """
+        if self.lease is not None and any(
+            limiter.shards > 1 for limiter in self.limiters
+        ):
+            raise ValueError("Quota lease can not be used with sharded quota")
+        return self
+
+
+class PersistencePipelineConfiguration(ConfigurationBase):
+    """Background persistence of query turns.
+
+    The query endpoint journals the turn on disk and returns the response
+    without waiting for quota consumption, topic summary generation,
+    transcript, database and conversation cache writes. Background workers
+    perform them, retry failed ones and remove the turn from the journal.
+    Turns left in the journal by a crashed process are performed on the
+    next start. Available quotas reported in the response are those before
+    the turn is consumed. Requests reading a conversation wait for its
+    turns queued in the same process, up to the wait timeout; follow-up
+    requests served by another process may not see the previous turn until
+    it is persisted.
+    """
+
+    journal_path: str = Field(
+        ...,
+        title="Journal directory",
+        description="Path to directory where turns waiting to be persisted "
+        "are journaled. Every process uses its own subdirectory.",
+    )
+
+    workers: PositiveInt = Field(
+        constants.PERSISTENCE_PIPELINE_DEFAULT_WORKERS,
+        title="Number of workers",
+        description="Number of background tasks persisting turns; turns of one "
+        "conversation are always persisted by the same task, in order",
+    )
+
+    max_pending: PositiveInt = Field(
+        constants.PERSISTENCE_PIPELINE_DEFAULT_MAX_PENDING,
+        title="Maximum pending turns",
+        description="Capacity of the queue; requests wait when the queue is full",
+    )
+
+    max_attempts: PositiveInt = Field(
+        constants.PERSISTENCE_PIPELINE_DEFAULT_MAX_ATTEMPTS,
+        title="Maximum attempts",
+        description="Number of attempts to persist a turn before it is moved "
+        "to the 'failed' subdirectory of the journal",
+    )
+
+    retry_delay: PositiveInt = Field(
+        constants.PERSISTENCE_PIPELINE_DEFAULT_RETRY_DELAY,
+        title="Retry delay",
+        description="Milliseconds to wait before the first retry; the delay "
+        "doubles with every further attempt",
+    )
+
+    drain_timeout: PositiveInt = Field(
+        constants.PERSISTENCE_PIPELINE_DEFAULT_DRAIN_TIMEOUT,
+        title="Drain timeout",
+        description="Seconds to wait for pending turns on shutdown; turns not "
+        "persisted by then stay in the journal",
+    )
+
+    wait_timeout: PositiveInt = Field(
+        constants.PERSISTENCE_PIPELINE_DEFAULT_WAIT_TIMEOUT,
+        title="Wait timeout",
+        description="Seconds a request reading a conversation waits for its "
+        "queued turns to be persisted; the conversation is read without them "
+        "afterwards",
+    )
+
+    @model_validator(mode="after")
+    def check_journal_path(self) -> Self:
+        """Ensure the journal directory is writable if it exists.
+
+        Returns:
+            self: The validated PersistencePipelineConfiguration instance.
+        """
+        checks.directory_check(
+            Path(self.journal_path),
+            desc="Check directory to journal persisted turns",
+            must_exists=False,
+            must_be_writable=True,
+        )
+        return self
+
 
 class RerankerConfiguration(ConfigurationBase):
     """Reranker configuration for RAG chunk reranking."""
@@ -3207,7 +3878,13 @@ class Configuration(ConfigurationBase):
 
     conversation_cache: ConversationHistoryConfiguration = Field(
         default_factory=lambda: ConversationHistoryConfiguration(
-            type=None, memory=None, sqlite=None, postgres=None
+            type=None,
+            memory=None,
+            sqlite=None,
+            postgres=None,
+            write_behind=None,
+            read_through=None,
+            retention=None,
         ),
         title="Conversation history configuration",
         description="Conversation history configuration.",
@@ -3257,11 +3934,25 @@ class Configuration(ConfigurationBase):
 
     quota_handlers: QuotaHandlersConfiguration = Field(
         default_factory=lambda: QuotaHandlersConfiguration(
-            sqlite=None, postgres=None, enable_token_history=False
+            sqlite=None,
+            postgres=None,
+            enable_token_history=False,
+            token_history_buffer=None,
+            lease=None,
+            reservation=None,
+            negative_cache=None,
         ),
         title="Quota handlers",
         description="Quota handlers configuration",
     )
+
+    persistence_pipeline: Optional[PersistencePipelineConfiguration] = Field(
+        None,
+        title="Persistence pipeline",
+        description="When configured, the query endpoint persists turns by "
+        "background workers after the response is returned.",
+    )
+
     azure_entra_id: Optional[AzureEntraIdConfiguration] = None
 
     rlsapi_v1: RlsapiV1Configuration = Field(
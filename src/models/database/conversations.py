@@ -2,7 +2,7 @@
 
 from datetime import datetime
 
-from sqlalchemy import DateTime, ForeignKey, func
+from sqlalchemy import DateTime, ForeignKey, Index, func
 from sqlalchemy.orm import Mapped, mapped_column
 
 from models.database.base import Base
@@ -13,11 +13,21 @@ class UserConversation(Base):  # pylint: disable=too-few-public-methods
 
     __tablename__ = "user_conversation"
 
+    # Conversations are listed per user, most recently used first; the index
+    # also serves lookups by user ID alone
+    __table_args__ = (
+        Index(
+            "ix_user_conversation_user_id_last_message_at",
+            "user_id",
+            "last_message_at",
+        ),
+    )
+
     # The conversation ID
     id: Mapped[str] = mapped_column(primary_key=True)
 
     # The user ID associated with the conversation
-    user_id: Mapped[str] = mapped_column(index=True)
+    user_id: Mapped[str] = mapped_column()
 
     # The last provider/model used in the conversation
     last_used_model: Mapped[str] = mapped_column()
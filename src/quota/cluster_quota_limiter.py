@@ -15,6 +15,7 @@ class ClusterQuotaLimiter(RevokableQuotaLimiter):
         configuration: QuotaHandlersConfiguration,
         initial_quota: int = 0,
         increase_by: int = 0,
+        shards: int = 1,
     ) -> None:
         """
         Create a quota limiter and initialize its persistent storage.
@@ -24,13 +25,15 @@ class ClusterQuotaLimiter(RevokableQuotaLimiter):
             configuration (QuotaHandlersConfiguration): Handlers and settings used by the limiter.
             initial_quota (int): Starting quota value for the entire cluster.
             increase_by (int): Amount by which the quota is increased when applicable.
+            shards (int): Number of rows the quota is split into, so
+            concurrent requests do not update the same row.
 
         Notes:
         -----
             Establishes the database connection and ensures required tables exist.
         """
         subject = "c"  # cluster
-        super().__init__(configuration, initial_quota, increase_by, subject)
+        super().__init__(configuration, initial_quota, increase_by, subject, shards)
 
         # initialize connection to DB
         # and initialize tables too
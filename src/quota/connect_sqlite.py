@@ -31,7 +31,9 @@ def connect_sqlite(config: SQLiteDatabaseConfiguration) -> Any:
     # even if SQLite is not alive
     connection = None
     try:
-        connection = sqlite3.connect(database=config.db_path)
+        # the connection is used by background synchronization threads too;
+        # storages serialize its use by their connection lock
+        connection = sqlite3.connect(database=config.db_path, check_same_thread=False)
         if connection is not None:
             connection.autocommit = True
         return connection
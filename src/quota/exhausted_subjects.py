@@ -0,0 +1,109 @@
+"""Subjects whose quota has recently been found exhausted.
+
+Requests of such subjects are refused without reading the quota from the
+database. The entries expire after a short time, and they are invalidated
+when the quota of the subject type is revoked or increased by the quota
+scheduler running in this process. Quota revoked or increased by a scheduler
+running in another process is taken into account when the entries expire.
+"""
+
+from collections import OrderedDict
+from threading import Lock
+from time import monotonic
+from typing import Optional
+
+from models.config import QuotaNegativeCacheConfiguration
+
+# number of quota revocations and increases by subject type; entries cached
+# before the last one are stale
+_revocations: dict[str, int] = {}
+_revocations_lock = Lock()
+
+
+def quota_revoked(subject_type: str) -> None:
+    """Invalidate cached subjects of given type whose quota has been changed.
+
+    Parameters:
+    ----------
+        subject_type: Type of the subjects, "u" for users, "c" for cluster.
+    """
+    with _revocations_lock:
+        _revocations[subject_type] = _revocations.get(subject_type, 0) + 1
+
+
+class ExhaustedSubjects:
+    """Cache of subjects whose quota has recently been found exhausted."""
+
+    def __init__(
+        self, subject_type: str, configuration: QuotaNegativeCacheConfiguration
+    ) -> None:
+        """Create an empty cache.
+
+        Parameters:
+        ----------
+            subject_type: Type of the cached subjects.
+            configuration: Expiration and size of the cache.
+        """
+        self.subject_type = subject_type
+        self.ttl = configuration.ttl
+        self.max_entries = configuration.max_entries
+        # subject ID -> (expiration time, revocations, available quota),
+        # least recently refused first
+        self._entries: OrderedDict[str, tuple[float, int, int]] = OrderedDict()
+        self._lock = Lock()
+
+    def __len__(self) -> int:
+        """Return number of cached subjects."""
+        return len(self._entries)
+
+    def add(self, subject_id: str, available: int) -> None:
+        """Cache subject whose quota has been found exhausted.
+
+        Parameters:
+        ----------
+            subject_id: Identifier of the subject.
+            available: Available quota of the subject.
+        """
+        with self._lock:
+            self._entries[subject_id] = (
+                monotonic() + self.ttl,
+                _revocations.get(self.subject_type, 0),
+                available,
+            )
+            self._entries.move_to_end(subject_id)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    def get(self, subject_id: str) -> Optional[int]:
+        """Return available quota of the subject if it is cached as exhausted.
+
+        Parameters:
+        ----------
+            subject_id: Identifier of the subject.
+
+        Returns:
+        -------
+            The available quota found when the subject was cached, or None
+            when the subject is not cached or the entry is stale.
+        """
+        with self._lock:
+            entry = self._entries.get(subject_id)
+            if entry is None:
+                return None
+            expires_at, revocations, available = entry
+            if expires_at > monotonic() and revocations == _revocations.get(
+                self.subject_type, 0
+            ):
+                return available
+            del self._entries[subject_id]
+            return None
+
+    def invalidate(self, subject_id: str) -> None:
+        """Drop the subject from the cache, as its quota has been changed.
+
+        Parameters:
+        ----------
+            subject_id: Identifier of the subject.
+        """
+        with self._lock:
+            self._entries.pop(subject_id, None)
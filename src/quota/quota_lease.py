@@ -0,0 +1,73 @@
+"""Quota leased by a worker to be checked and consumed without database access.
+
+A lease is a part of the available quota of one subject. Tokens are consumed
+from the lease locally and the consumed tokens are written to the database
+when the lease is renewed, which happens periodically in a background thread
+(see `utils.periodic_sync`), when the lease is exhausted and on shutdown.
+"""
+
+from dataclasses import dataclass
+from math import ceil
+from typing import Any
+
+
+@dataclass
+class QuotaLease:
+    """Part of the available quota of a subject leased by the worker."""
+
+    # available quota stored in the database when the lease was taken
+    stored: int
+    # reset timestamp stored with the quota; the tokens consumed from the
+    # lease are not written when the quota has been reset since then
+    reset_at: Any
+    # number of tokens that can be consumed before the lease is renewed
+    granted: int
+    consumed: int = 0
+    # leases not used between two renewals are dropped
+    used: bool = True
+
+    @property
+    def available(self) -> int:
+        """Return the available quota including tokens consumed locally."""
+        return self.stored - self.consumed
+
+    @property
+    def remaining(self) -> int:
+        """Return the number of tokens that can still be consumed locally."""
+        return self.granted - self.consumed
+
+
+def lease_size(quota_limit: int, fraction: float) -> int:
+    """Return the number of tokens leased at once.
+
+    Parameters:
+    ----------
+        quota_limit: Quota set or added by the quota scheduler.
+        fraction: Part of the quota limit leased at once.
+
+    Returns:
+    -------
+        Number of tokens in one lease, at least one.
+    """
+    return max(1, ceil(quota_limit * fraction))
+
+
+def new_lease(available: int, reset_at: Any, size: int) -> QuotaLease:
+    """Lease a part of the available quota.
+
+    Parameters:
+    ----------
+        available: Available quota stored in the database.
+        reset_at: Reset timestamp stored with the quota.
+        size: Number of tokens leased at once.
+
+    Returns:
+    -------
+        The lease; nothing is granted when no quota is available.
+    """
+    return QuotaLease(
+        stored=available,
+        reset_at=reset_at,
+        granted=min(size, max(available, 0)),
+        used=False,
+    )
@@ -33,21 +33,67 @@ two user quota limiters can be set to:
 import datetime
 import sqlite3
 from abc import ABC, abstractmethod
+from collections.abc import Hashable, Sequence
 from typing import Optional
 
 import psycopg2
+from pydantic import BaseModel
 
 from log import get_logger
-from models.config import PostgreSQLDatabaseConfiguration, SQLiteDatabaseConfiguration
-from quota.connect_pg import connect_pg
+from models.config import (
+    PostgreSQLDatabaseConfiguration,
+    QuotaHandlersConfiguration,
+    SQLiteDatabaseConfiguration,
+)
 from quota.connect_sqlite import connect_sqlite
+from utils.connection_decorator import (
+    connection,
+    connection_pool,
+    leased_connection,
+)
+from utils.postgres_pool import get_postgres_pool
 
 logger = get_logger(__name__)
 
 
+def heartbeat_interval(configuration: QuotaHandlersConfiguration) -> Optional[int]:
+    """Return connection heartbeat interval for quota storage.
+
+    Heartbeat is used for PostgreSQL connections only, SQLite database is a
+    local file. SQLite takes precedence when both storages are configured.
+
+    Parameters:
+    ----------
+        configuration: Quota handlers configuration with storage settings.
+
+    Returns:
+    -------
+        Heartbeat interval in seconds, or None when heartbeat is disabled.
+    """
+    if configuration.sqlite is not None or configuration.postgres is None:
+        return None
+    return configuration.postgres.heartbeat_interval
+
+
+class QuotaReservation(BaseModel):
+    """Tokens reserved by a request in a quota limiter.
+
+    Reservations are journaled together with the turns persisted in the
+    background, so they are serializable.
+    """
+
+    reservation_id: str
+    subject_id: str
+    tokens: int
+
+
 class QuotaLimiter(ABC):
     """Abstract class that is parent for all quota limiter implementations."""
 
+    # errors meaning that the connection has been lost and needs to be
+    # re-established, see the @connection decorator
+    disconnect_errors = (psycopg2.OperationalError, psycopg2.InterfaceError)
+
     @abstractmethod
     def available_quota(self, subject_id: str) -> int:
         """Retrieve available quota for given user.
@@ -85,8 +131,109 @@ class QuotaLimiter(ABC):
         """
 
     @abstractmethod
-    def ensure_available_quota(self, subject_id: str = "") -> None:
-        """Ensure that there's available quota left."""
+    def ensure_available_quota(
+        self, subject_id: str = "", available: Optional[int] = None
+    ) -> None:
+        """Ensure that there's available quota left.
+
+        Parameters:
+        ----------
+            subject_id (str): Identifier of the subject to check.
+            available (Optional[int]): Available quota already read by
+            `available_quotas`; it is read by the limiter when omitted.
+
+        Raises:
+        ------
+            QuotaExceedError: If the quota of the subject is exhausted.
+        """
+
+    def ensure_not_exhausted(
+        self, subject_id: str = ""  # pylint: disable=unused-argument
+    ) -> None:
+        """Refuse subject whose quota has recently been found exhausted.
+
+        The check does not access the database. Quota limiters not caching
+        exhausted subjects do not refuse anybody.
+
+        Parameters:
+        ----------
+            subject_id (str): Identifier of the subject to check.
+
+        Raises:
+        ------
+            QuotaExceedError: If the quota of the subject has recently been
+            found exhausted.
+        """
+
+    def shared_storage(self) -> Optional[Hashable]:
+        """Return identification of the storage the quota is read from.
+
+        Quota of limiters returning the same value is read by one query, see
+        `available_quotas`.
+
+        Returns:
+        -------
+            Optional[Hashable]: Storage identification, or None when the quota
+            can be read by the limiter itself only.
+        """
+        return None
+
+    def read_available_quotas(
+        self,
+        quota_limiters: Sequence["QuotaLimiter"],
+        subject_id: str,  # pylint: disable=unused-argument
+    ) -> list[Optional[int]]:
+        """Read available quota of limiters sharing the storage by one query.
+
+        Parameters:
+        ----------
+            quota_limiters (Sequence[QuotaLimiter]): Limiters sharing the
+            storage with this limiter, including this one.
+            subject_id (str): Identifier of the subject whose quota is read.
+
+        Returns:
+        -------
+            list[Optional[int]]: Available quota for every limiter, None when
+            it has not been read.
+        """
+        return [None] * len(quota_limiters)
+
+    @staticmethod
+    def available_quotas(
+        quota_limiters: Sequence["QuotaLimiter"], subject_id: str
+    ) -> list[Optional[int]]:
+        """Read available quota of all limiters with as few queries as possible.
+
+        Quota of limiters sharing the storage is read by one query. Quota not
+        read this way, for example quota of a subject not stored yet, is
+        reported as None and it is up to the limiter to read it.
+
+        Parameters:
+        ----------
+            quota_limiters (Sequence[QuotaLimiter]): Configured quota limiters.
+            subject_id (str): Identifier of the subject whose quota is read.
+
+        Returns:
+        -------
+            list[Optional[int]]: Available quota for every limiter, in the
+            order of the limiters.
+        """
+        groups: dict[Hashable, list[int]] = {}
+        for index, quota_limiter in enumerate(quota_limiters):
+            storage = quota_limiter.shared_storage()
+            if storage is not None:
+                groups.setdefault(storage, []).append(index)
+
+        quotas: list[Optional[int]] = [None] * len(quota_limiters)
+        for indexes in groups.values():
+            # a single quota is read by the limiter as before
+            if len(indexes) < 2:
+                continue
+            group = [quota_limiters[index] for index in indexes]
+            read = group[0].read_available_quotas(group, subject_id)
+            for index, available in zip(indexes, read):
+                quotas[index] = available
+        return quotas
 
     @abstractmethod
     def consume_tokens(
@@ -104,6 +251,55 @@ class QuotaLimiter(ABC):
             quota will be reduced. If omitted, applies to the default subject.
         """
 
+    def reserve_tokens(  # pylint: disable=useless-return
+        self,
+        tokens: int,  # pylint: disable=unused-argument
+        subject_id: str = "",
+    ) -> Optional[QuotaReservation]:
+        """Reserve tokens expected to be consumed by a request.
+
+        Quota limiters not supporting reservations only ensure that there is
+        available quota left.
+
+        Parameters:
+        ----------
+            tokens (int): Number of tokens expected to be consumed.
+            subject_id (str): Identifier of the subject consuming the tokens.
+
+        Returns:
+        -------
+            Optional[QuotaReservation]: The reservation to be settled, or
+            None when no tokens have been reserved.
+
+        Raises:
+        ------
+            QuotaExceedError: If the quota of the subject is exhausted.
+        """
+        self.ensure_available_quota(subject_id)
+        return None
+
+    def settle_tokens(
+        self,
+        reservation: QuotaReservation,
+        input_tokens: int,
+        output_tokens: int,
+    ) -> None:
+        """Replace reserved tokens by the tokens actually consumed.
+
+        Parameters:
+        ----------
+            reservation (QuotaReservation): Reservation made by the request.
+            input_tokens (int): Number of input tokens consumed.
+            output_tokens (int): Number of output tokens consumed.
+        """
+        self.consume_tokens(input_tokens, output_tokens, reservation.subject_id)
+
+    def close(self) -> None:
+        """Write pending changes to the database and stop background threads.
+
+        Quota limiters writing all changes immediately have nothing to do.
+        """
+
     @abstractmethod
     def __init__(self) -> None:
         """Initialize connection configuration(s).
@@ -141,14 +337,16 @@ class QuotaLimiter(ABC):
         Establish the configured database connection, initialize required
         tables, and enable autocommit.
 
-        If a PostgreSQL or SQLite configuration is present, a connection to
-        that backend will be created, then _initialize_tables() will be called
-        to prepare storage. If table initialization fails, the connection is
-        closed and the original exception is propagated.
+        If a PostgreSQL configuration is present, connections are leased from
+        the pool shared by all storages using the same database. If a SQLite
+        configuration is present, a connection to that database is created.
+        Then _initialize_tables() is called to prepare storage. If table
+        initialization fails, the SQLite connection is closed and the original
+        exception is propagated.
         """
         logger.info("Initializing connection to quota limiter database")
         if self.postgres_connection_config is not None:
-            self.connection = connect_pg(self.postgres_connection_config)
+            self.connection = get_postgres_pool(self.postgres_connection_config)
         if self.sqlite_connection_config is not None:
             self.connection = connect_sqlite(self.sqlite_connection_config)
             # the default adapters and converters are deprecated as of Python
@@ -159,37 +357,39 @@ class QuotaLimiter(ABC):
             )
 
         try:
-            self._initialize_tables()
+            with leased_connection(self):
+                self._initialize_tables()
         except Exception as e:
-            self.connection.close()
+            # pooled connections are discarded by the pool itself
+            if connection_pool(self) is None:
+                self.connection.close()
             logger.exception("Error initializing quota limiter database:\n%s", e)
             raise
 
-        self.connection.autocommit = True
+        # pooled connections are always in autocommit mode
+        if connection_pool(self) is None:
+            self.connection.autocommit = True
 
     def connected(self) -> bool:
-        """Check if connection to quota limiter database is alive.
+        """Check if connection to quota limiter database is established.
 
-        Determine whether the storage connection is alive.
+        No query is sent to the database; a lost connection is detected when
+        an operation fails and it is re-established by the @connection
+        decorator.
 
         Returns:
-            `true` if the connection is alive, `false` otherwise.
+            `true` if the connection exists, `false` otherwise.
         """
         if self.connection is None:
             logger.warning("Not connected, need to reconnect later")
             return False
-        cursor = None
-        try:
-            cursor = self.connection.cursor()
-            cursor.execute("SELECT 1")
-            logger.info("Connection to storage is ok")
-            return True
-        except (psycopg2.OperationalError, sqlite3.Error) as e:
-            logger.error("Disconnected from storage: %s", e)
-            return False
-        finally:
-            if cursor is not None:
-                try:
-                    cursor.close()
-                except (psycopg2.Error, sqlite3.ProgrammingError):
-                    logger.warning("Unable to close cursor")
+        return True
+
+    @connection
+    def ping(self) -> None:
+        """Check that the connection is alive by sending a trivial query."""
+        # it is not possible to use context manager there, because SQLite does
+        # not support it
+        cursor = self.connection.cursor()
+        cursor.execute("SELECT 1")
+        cursor.close()
@@ -50,7 +50,7 @@ class QuotaLimiterFactory:
             initial_quota = limiter_config.initial_quota
             increase_by = limiter_config.quota_increase
             limiter = QuotaLimiterFactory.create_limiter(
-                config, limiter_type, initial_quota, increase_by
+                config, limiter_type, initial_quota, increase_by, limiter_config.shards
             )
             limiters.append(limiter)
             logger.info("Set up quota limiter '%s'", limiter_name)
@@ -62,6 +62,7 @@ class QuotaLimiterFactory:
         limiter_type: str,
         initial_quota: int,
         increase_by: int,
+        shards: int = 1,
     ) -> QuotaLimiter:
         """Create selected quota limiter.
 
@@ -75,6 +76,7 @@ class QuotaLimiterFactory:
                 `constants.USER_QUOTA_LIMITER` or `constants.CLUSTER_QUOTA_LIMITER`.
             initial_quota (int): Starting quota value assigned to the limiter.
             increase_by (int): Amount by which the quota increases when replenished.
+            shards (int): Number of rows the cluster quota is split into.
 
         Returns:
         -------
@@ -88,6 +90,8 @@ class QuotaLimiterFactory:
             case constants.USER_QUOTA_LIMITER:
                 return UserQuotaLimiter(configuration, initial_quota, increase_by)
             case constants.CLUSTER_QUOTA_LIMITER:
-                return ClusterQuotaLimiter(configuration, initial_quota, increase_by)
+                return ClusterQuotaLimiter(
+                    configuration, initial_quota, increase_by, shards
+                )
             case _:
                 raise ValueError(f"Invalid limiter type: {limiter_type}.")
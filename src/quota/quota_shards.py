@@ -0,0 +1,67 @@
+"""Cluster quota split across several rows of the quota table.
+
+With sharded counters, the available quota of the cluster is the sum of the
+quota stored in several rows, so concurrent requests consuming tokens update
+different rows instead of waiting for a lock of a single row. Tokens are
+consumed from a randomly chosen shard, or from its siblings when the chosen
+shard does not have enough quota left. The first shard is stored in the row
+used by the unsharded quota.
+"""
+
+import json
+from random import randrange
+from typing import Any
+
+
+def shard_ids(shards: int) -> list[str]:
+    """Return IDs of the rows storing the shards of the quota.
+
+    Parameters:
+    ----------
+        shards: Number of shards.
+
+    Returns:
+    -------
+        IDs of the rows, the first one is the ID of the unsharded quota.
+    """
+    return [""] + [str(index) for index in range(1, shards)]
+
+
+def shard_order(shards: int) -> list[str]:
+    """Return IDs of the shards in the order tokens are consumed from them.
+
+    Parameters:
+    ----------
+        shards: Number of shards.
+
+    Returns:
+    -------
+        IDs of all shards starting by a randomly chosen one.
+    """
+    ids = shard_ids(shards)
+    start = randrange(shards)
+    return ids[start:] + ids[:start]
+
+
+def shard_parameters(quota: int, shards: int) -> dict[str, Any]:
+    """Split quota among the shards.
+
+    The first shard gets the remainder of the split, see the statements
+    updating the shards in `quota.sql`.
+
+    Parameters:
+    ----------
+        quota: Quota to be split.
+        shards: Number of shards.
+
+    Returns:
+    -------
+        Statement parameters: quota of the first shard, quota of every other
+        shard and IDs of all shards encoded as JSON array.
+    """
+    share = quota // shards
+    return {
+        "first": quota - share * (shards - 1),
+        "share": share,
+        "ids": json.dumps(shard_ids(shards)),
+    }
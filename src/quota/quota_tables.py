@@ -0,0 +1,41 @@
+"""Creation of the table storing quota of the subjects.
+
+The table is created by quota limiters and by the quota scheduler, whichever
+starts first. Tables created by older versions are migrated in place.
+"""
+
+from typing import Any
+
+from log import get_logger
+from quota.sql import (
+    ADD_QUOTA_RESET_COLUMN_PG,
+    ADD_QUOTA_RESET_COLUMN_SQLITE,
+    CREATE_QUOTA_TABLE_PG,
+    CREATE_QUOTA_TABLE_SQLITE,
+    SELECT_QUOTA_RESET_COLUMN_SQLITE,
+)
+
+logger = get_logger(__name__)
+
+
+def create_quota_table(cursor: Any, sqlite: bool) -> None:
+    """Create the quota table and add columns missing in older tables.
+
+    The changes are not committed.
+
+    Parameters:
+    ----------
+        cursor: Cursor of the database connection (Postgres or SQLite).
+        sqlite: True when the quota is stored in SQLite database.
+    """
+    if not sqlite:
+        cursor.execute(CREATE_QUOTA_TABLE_PG)
+        cursor.execute(ADD_QUOTA_RESET_COLUMN_PG)
+        return
+    cursor.execute(CREATE_QUOTA_TABLE_SQLITE)
+    # SQLite does not support adding the column if it does not exist
+    cursor.execute(SELECT_QUOTA_RESET_COLUMN_SQLITE)
+    row = cursor.fetchone()
+    if row is not None and row[0] == 0:
+        logger.info("Adding column with reset timestamp to the quota table")
+        cursor.execute(ADD_QUOTA_RESET_COLUMN_SQLITE)
@@ -1,29 +1,93 @@
 """Simple quota limiter where quota can be revoked."""
 
+# pylint: disable=too-many-lines
+
+from collections.abc import Hashable, Sequence
 from datetime import UTC, datetime
+from threading import RLock
+from typing import Any, Optional
+
+import psycopg2
 
-from log import get_logger
+import constants
+from log import RateLimitedTrace, get_logger
 from models.config import QuotaHandlersConfiguration
+from quota.exhausted_subjects import ExhaustedSubjects
 from quota.quota_exceed_error import QuotaExceedError
-from quota.quota_limiter import QuotaLimiter
+from quota.quota_lease import QuotaLease, lease_size, new_lease
+from quota.quota_limiter import QuotaLimiter, QuotaReservation, heartbeat_interval
+from quota.quota_shards import shard_ids, shard_order, shard_parameters
+from quota.quota_tables import create_quota_table
 from quota.sql import (
-    CREATE_QUOTA_TABLE_PG,
-    CREATE_QUOTA_TABLE_SQLITE,
+    CONSUME_SHARD_TOKENS_PG,
+    CONSUME_SHARD_TOKENS_SQLITE,
+    CREATE_QUOTA_RESERVATIONS_INDEX,
+    CREATE_QUOTA_RESERVATIONS_TABLE,
     INIT_QUOTA_PG,
     INIT_QUOTA_SQLITE,
+    INSERT_QUOTA_RESERVATION_SQLITE,
+    MARK_QUOTA_RESERVATION_SETTLED_SQLITE,
+    RESERVE_QUOTA_PG,
+    RESERVE_QUOTA_SQLITE,
+    SELECT_QUOTA_LEASE_PG,
+    SELECT_QUOTA_LEASE_SQLITE,
     SELECT_QUOTA_PG,
+    SELECT_QUOTA_RESERVATION_SQLITE,
     SELECT_QUOTA_SQLITE,
+    SELECT_QUOTAS_PG,
+    SELECT_QUOTAS_SQLITE,
     SET_AVAILABLE_QUOTA_PG,
     SET_AVAILABLE_QUOTA_SQLITE,
+    SET_SHARDS_QUOTA_PG,
+    SET_SHARDS_QUOTA_SQLITE,
+    SETTLE_QUOTA_PG,
+    SETTLE_QUOTA_SQLITE,
     UPDATE_AVAILABLE_QUOTA_PG,
     UPDATE_AVAILABLE_QUOTA_SQLITE,
+    UPDATE_SHARDS_QUOTA_PG,
+    UPDATE_SHARDS_QUOTA_SQLITE,
+)
+from utils.connection_decorator import connection, connection_pool, start_heartbeat
+from utils.periodic_sync import PeriodicSync
+from utils.read_replicas import (
+    record_user_write,
+    replica_configurations,
+    replica_router,
+    route_pooled_read,
 )
-from utils.connection_decorator import connection
+from utils.suid import get_suid
 
 logger = get_logger(__name__)
 
+# clients retrying requests with exhausted quota would flood the log
+exceeded_trace = RateLimitedTrace(logger, constants.QUOTA_EXCEEDED_TRACE_LOG_INTERVAL)
+
+
+def stored_quota(
+    quotas: dict[tuple[str, str], int], keys: list[tuple[str, str]]
+) -> Optional[int]:
+    """Sum up quota stored in given rows.
 
-class RevokableQuotaLimiter(QuotaLimiter):
+    Parameters:
+    ----------
+        quotas (dict[tuple[str, str], int]): Available quota by the primary
+        key of rows read from the database.
+        keys (list[tuple[str, str]]): Primary keys of the rows storing the
+        quota, one per shard.
+
+    Returns:
+    -------
+        Optional[int]: The available quota, or None when one of the rows has
+        not been read.
+    """
+    if any(key not in quotas for key in keys):
+        return None
+    return sum(quotas[key] for key in keys)
+
+
+class RevokableQuotaLimiter(
+    QuotaLimiter
+):  # pylint: disable=too-many-instance-attributes
     """Simple quota limiter where quota can be revoked."""
 
     def __init__(
@@ -32,6 +96,7 @@ class RevokableQuotaLimiter(QuotaLimiter):
         initial_quota: int,
         increase_by: int,
         subject_type: str,
+        shards: int = 1,
     ) -> None:
         """Initialize quota limiter.
 
@@ -47,18 +112,64 @@ class RevokableQuotaLimiter(QuotaLimiter):
             subject_type (str): Identifier for the kind of subject the limiter
             applies to (e.g., user, customer); when set to "c" the limiter
             treats subject IDs as empty strings.
+            shards (int): Number of rows the quota of the cluster is split
+            into, see `quota.quota_shards`; used by the cluster limiter only.
+
+        Connection heartbeat and synchronization of quota leases are
+        started when configured.
         """
         self.subject_type = subject_type
         self.initial_quota = initial_quota
         self.increase_by = increase_by
+        self.shards = shards
         self.sqlite_connection_config = configuration.sqlite
         self.postgres_connection_config = configuration.postgres
+        self.replica_router = replica_router(
+            configuration.postgres,
+            (
+                replica_configurations(configuration.postgres)
+                if configuration.postgres is not None
+                else []
+            ),
+        )
+        self.heartbeat = start_heartbeat(
+            f"{type(self).__name__} {subject_type}",
+            self.ping,
+            heartbeat_interval(configuration),
+        )
+        self.lease_configuration = configuration.lease
+        self.leases: dict[str, QuotaLease] = {}
+        # leases are used by request handlers and the synchronization thread
+        self.leases_lock = RLock()
+        # SQLite connection is used by them too; one lock avoids lock ordering
+        # issues between the leases and the connection
+        self.connection_lock = self.leases_lock
+        self.lease_sync: Optional[PeriodicSync] = None
+        if self.lease_configuration is not None:
+            self.lease_sync = PeriodicSync(
+                f"{type(self).__name__} {subject_type} leases",
+                self.sync_leases,
+                self.lease_configuration.sync_period,
+            )
+            self.lease_sync.start()
+        # leased quota is checked locally, so tokens are not reserved
+        self.reservation_configuration = (
+            configuration.reservation if self.lease_configuration is None else None
+        )
+        self.exhausted_subjects: Optional[ExhaustedSubjects] = None
+        if configuration.negative_cache is not None:
+            self.exhausted_subjects = ExhaustedSubjects(
+                subject_type, configuration.negative_cache
+            )
 
-    @connection
     def available_quota(self, subject_id: str = "") -> int:
         """Retrieve available quota for given subject.
 
-        Get the available quota for a subject.
+        Get the available quota for a subject. With quota lease configured,
+        the quota is taken from the lease, including tokens consumed locally.
+        Quota split into shards is summed up. With PostgreSQL read replicas
+        configured, the quota is read from a replica unless the subject's
+        quota changed recently or the replicas lag behind the primary.
 
         Parameters:
         ----------
@@ -72,6 +183,57 @@ class RevokableQuotaLimiter(QuotaLimiter):
         """
         if self.subject_type == "c":
             subject_id = ""
+        if self.lease_configuration is not None:
+            with self.leases_lock:
+                return self._lease(subject_id).available
+        if self.sqlite_connection_config is None:
+            available = self._read_replica_quota(subject_id)
+            if available is not None:
+                return available
+        return self._available_quota(subject_id)
+
+    def _read_replica_quota(self, subject_id: str) -> Optional[int]:
+        """Read available quota from a read replica of PostgreSQL database.
+
+        Parameters:
+        ----------
+            subject_id (str): Identifier of the subject whose quota is requested.
+
+        Returns:
+        -------
+            Optional[int]: The available quota, or None when the quota has to
+            be read from the primary database.
+        """
+        if self.shards > 1:
+            quotas = self._read_replica_quotas(self.quota_keys(subject_id))
+            return None if quotas is None else sum(quotas.values())
+        try:
+            pool = route_pooled_read(self.replica_router, subject_id)
+            if pool is None:
+                return None
+            with pool.lease() as replica, replica.cursor() as cursor:
+                cursor.execute(SELECT_QUOTA_PG, (subject_id, self.subject_type))
+                value = cursor.fetchone()
+        except psycopg2.Error as e:
+            logger.warning("Quota read from read replica failed: %s", e)
+            return None
+        # quota of new subjects is initialized in the primary database
+        return None if value is None else int(value[0])
+
+    @connection
+    def _available_quota(self, subject_id: str) -> int:
+        """Retrieve available quota for given subject from the primary database.
+
+        Parameters:
+        ----------
+            subject_id (str): Subject identifier, already normalized.
+
+        Returns:
+        -------
+            int: The available quota for the subject. Returns 0 if no backend is configured.
+        """
+        if self.shards > 1:
+            return self._read_shards_quota()
         if self.sqlite_connection_config is not None:
             return self._read_available_quota(SELECT_QUOTA_SQLITE, subject_id)
         if self.postgres_connection_config is not None:
@@ -112,6 +274,208 @@ class RevokableQuotaLimiter(QuotaLimiter):
         # help type linters to infer return value type
         return int(value[0])
 
+    def _read_shards_quota(self) -> int:
+        """Read available quota split into shards from the primary database.
+
+        Missing shards are initialized. When none of them is stored yet, the
+        initial quota is split among them, otherwise the missing shards are
+        added empty, so the stored quota is not increased.
+
+        Returns:
+        -------
+            int: Sum of the quota available in all shards.
+        """
+        keys = self.quota_keys()
+        quotas = self._read_quotas(keys)
+        missing = [key[0] for key in keys if key not in quotas]
+        available = sum(quotas.values())
+        if missing:
+            available += self._init_shards(missing, 0 if quotas else self.initial_quota)
+        return available
+
+    def _init_shards(self, quota_ids: list[str], quota: int) -> int:
+        """Initialize shards of the quota.
+
+        Parameters:
+        ----------
+            quota_ids (list[str]): IDs of the shards to be initialized.
+            quota (int): Quota split among all shards of the quota.
+
+        Returns:
+        -------
+            int: Sum of the quota stored in the initialized shards.
+        """
+        parameters = shard_parameters(quota, self.shards)
+        # timestamp to be used
+        revoked_at = datetime.now(tz=UTC)
+        rows = [
+            (
+                quota_id,
+                self.subject_type,
+                self.initial_quota,
+                parameters["first"] if quota_id == "" else parameters["share"],
+                revoked_at,
+            )
+            for quota_id in quota_ids
+        ]
+        if self.sqlite_connection_config is not None:
+            insert_statement = INIT_QUOTA_SQLITE
+        else:
+            insert_statement = INIT_QUOTA_PG
+        cursor = self.connection.cursor()
+        cursor.executemany(insert_statement, rows)
+        self.connection.commit()
+        cursor.close()
+        return sum(row[3] for row in rows)
+
+    def quota_keys(self, subject_id: str = "") -> list[tuple[str, str]]:
+        """Return primary keys of the rows storing quota of the subject.
+
+        Parameters:
+        ----------
+            subject_id (str): Subject identifier. For limiters with
+            subject_type "c", this value is ignored and treated as an empty
+            string.
+
+        Returns:
+        -------
+            list[tuple[str, str]]: Values of the `id` and `subject` columns,
+            one item per shard of the quota.
+        """
+        if self.subject_type == "c":
+            subject_id = ""
+        if self.shards > 1:
+            return [
+                (quota_id, self.subject_type) for quota_id in shard_ids(self.shards)
+            ]
+        return [(subject_id, self.subject_type)]
+
+    def shared_storage(self) -> Optional[Hashable]:
+        """Return identification of the storage the quota is read from.
+
+        Leased quota is read locally and in-memory SQLite databases are not
+        shared by limiters, so such quota is read by the limiter only.
+
+        Returns:
+        -------
+            Optional[Hashable]: Connection pool of the PostgreSQL database or
+            path to the SQLite database, None when the quota can not be read
+            together with quota of other limiters.
+        """
+        if self.lease_configuration is not None:
+            return None
+        if self.postgres_connection_config is not None:
+            return connection_pool(self)
+        if (
+            self.sqlite_connection_config is not None
+            and self.sqlite_connection_config.db_path != ":memory:"
+        ):
+            return ("sqlite", self.sqlite_connection_config.db_path)
+        return None
+
+    def read_available_quotas(
+        self, quota_limiters: Sequence[QuotaLimiter], subject_id: str
+    ) -> list[Optional[int]]:
+        """Read available quota of limiters sharing the storage by one query.
+
+        With PostgreSQL read replicas configured, the quota is read from a
+        replica unless quota of one of the subjects changed recently.
+
+        Parameters:
+        ----------
+            quota_limiters (Sequence[QuotaLimiter]): Limiters sharing the
+            storage with this limiter, including this one.
+            subject_id (str): Identifier of the subject whose quota is read.
+
+        Returns:
+        -------
+            list[Optional[int]]: Available quota for every limiter, None when
+            the quota (or one of its shards) is not stored yet and has to be
+            initialized by the limiter.
+        """
+        keys = [
+            key
+            for quota_limiter in quota_limiters
+            if isinstance(quota_limiter, RevokableQuotaLimiter)
+            for key in quota_limiter.quota_keys(subject_id)
+        ]
+        quotas: Optional[dict[tuple[str, str], int]] = None
+        if self.sqlite_connection_config is None:
+            quotas = self._read_replica_quotas(keys)
+        if quotas is None:
+            quotas = self._read_quotas(keys)
+        return [
+            (
+                stored_quota(quotas, quota_limiter.quota_keys(subject_id))
+                if isinstance(quota_limiter, RevokableQuotaLimiter)
+                else None
+            )
+            for quota_limiter in quota_limiters
+        ]
+
+    def _read_replica_quotas(
+        self, keys: list[tuple[str, str]]
+    ) -> Optional[dict[tuple[str, str], int]]:
+        """Read quota stored in given rows from a read replica.
+
+        Parameters:
+        ----------
+            keys (list[tuple[str, str]]): Primary keys of the rows.
+
+        Returns:
+        -------
+            Optional[dict[tuple[str, str], int]]: Available quota by the
+            primary key, or None when the quota has to be read from the
+            primary database.
+        """
+        try:
+            pool = None
+            # every subject must be allowed to be read from a replica
+            for subject_id, _ in keys:
+                pool = route_pooled_read(self.replica_router, subject_id)
+                if pool is None:
+                    return None
+            if pool is None:
+                return None
+            with pool.lease() as replica, replica.cursor() as cursor:
+                cursor.execute(SELECT_QUOTAS_PG, (tuple(keys),))
+                rows = cursor.fetchall()
+        except psycopg2.Error as e:
+            logger.warning("Quota read from read replica failed: %s", e)
+            return None
+        quotas = {(row[0], row[1]): int(row[2]) for row in rows}
+        # quota of new subjects is initialized in the primary database
+        return quotas if len(quotas) == len(set(keys)) else None
+
+    @connection
+    def _read_quotas(self, keys: list[tuple[str, str]]) -> dict[tuple[str, str], int]:
+        """Read quota stored in given rows from the primary database.
+
+        Parameters:
+        ----------
+            keys (list[tuple[str, str]]): Primary keys of the rows.
+
+        Returns:
+        -------
+            dict[tuple[str, str], int]: Available quota by the primary key of
+            rows found in the database.
+        """
+        if self.sqlite_connection_config is not None:
+            # it is not possible to use context manager there, because SQLite
+            # does not support it
+            cursor = self.connection.cursor()
+            cursor.execute(
+                SELECT_QUOTAS_SQLITE.format(values=", ".join(["(?, ?)"] * len(keys))),
+                [value for key in keys for value in key],
+            )
+            rows = cursor.fetchall()
+            cursor.close()
+        else:
+            with self.connection.cursor() as cursor:
+                cursor.execute(SELECT_QUOTAS_PG, (tuple(keys),))
+                rows = cursor.fetchall()
+        return {(row[0], row[1]): int(row[2]) for row in rows}
+
     @connection
     def revoke_quota(self, subject_id: str = "") -> None:
         """Revoke quota for given subject.
@@ -126,6 +490,15 @@ class RevokableQuotaLimiter(QuotaLimiter):
         """
         if self.subject_type == "c":
             subject_id = ""
+        if self.exhausted_subjects is not None:
+            self.exhausted_subjects.invalidate(subject_id)
+
+        if self.shards > 1:
+            if self.sqlite_connection_config is not None:
+                self._update_shards(SET_SHARDS_QUOTA_SQLITE, self.initial_quota)
+            else:
+                self._update_shards(SET_SHARDS_QUOTA_PG, self.initial_quota)
+            return
 
         if self.postgres_connection_config is not None:
             self._revoke_quota(SET_AVAILABLE_QUOTA_PG, subject_id)
@@ -142,8 +515,8 @@ class RevokableQuotaLimiter(QuotaLimiter):
 
         Parameters:
         ----------
-            set_statement (str): SQL statement that updates the available quota
-                                 and `revoked_at` for a subject.
+            set_statement (str): SQL statement that updates the available quota,
+                                 `revoked_at` and `reset_at` for a subject.
             subject_id (str): Identifier of the subject whose quota will be
                               revoked.
         """
@@ -153,10 +526,11 @@ class RevokableQuotaLimiter(QuotaLimiter):
         cursor = self.connection.cursor()
         cursor.execute(
             set_statement,
-            (self.initial_quota, revoked_at, subject_id, self.subject_type),
+            (self.initial_quota, revoked_at, revoked_at, subject_id, self.subject_type),
         )
         self.connection.commit()
         cursor.close()
+        record_user_write(subject_id)
 
     @connection
     def increase_quota(self, subject_id: str = "") -> None:
@@ -173,6 +547,15 @@ class RevokableQuotaLimiter(QuotaLimiter):
         """
         if self.subject_type == "c":
             subject_id = ""
+        if self.exhausted_subjects is not None:
+            self.exhausted_subjects.invalidate(subject_id)
+
+        if self.shards > 1:
+            if self.sqlite_connection_config is not None:
+                self._update_shards(UPDATE_SHARDS_QUOTA_SQLITE, self.increase_by)
+            else:
+                self._update_shards(UPDATE_SHARDS_QUOTA_PG, self.increase_by)
+            return
 
         if self.postgres_connection_config is not None:
             self._increase_quota(UPDATE_AVAILABLE_QUOTA_PG, subject_id)
@@ -206,8 +589,31 @@ class RevokableQuotaLimiter(QuotaLimiter):
             (self.increase_by, updated_at, subject_id, self.subject_type),
         )
         self.connection.commit()
+        record_user_write(subject_id)
+
+    def _update_shards(self, update_statement: str, quota: int) -> None:
+        """Split quota among the shards and update all of them by one statement.
+
+        Parameters:
+        ----------
+            update_statement (str): SQL statement that sets or increases the
+            available quota of the shards.
+            quota (int): Quota to be split among the shards.
+        """
+        parameters = shard_parameters(quota, self.shards)
+        parameters["subject"] = self.subject_type
+        # timestamp to be used
+        parameters["timestamp"] = datetime.now(tz=UTC)
+
+        cursor = self.connection.cursor()
+        cursor.execute(update_statement, parameters)
+        self.connection.commit()
+        cursor.close()
+        record_user_write("")
 
-    def ensure_available_quota(self, subject_id: str = "") -> None:
+    def ensure_available_quota(
+        self, subject_id: str = "", available: Optional[int] = None
+    ) -> None:
         """Ensure that there's available quota left.
 
         Ensure the subject has available quota; raises if quota is exhausted.
@@ -217,6 +623,8 @@ class RevokableQuotaLimiter(QuotaLimiter):
                 subject_id (str): Identifier of the subject to check. If this
                 limiter's `subject_type` is `"c"`, the value is ignored and
                 treated as an empty string.
+                available (Optional[int]): Available quota already read by
+                `available_quotas`; it is read by the limiter when omitted.
 
         Raises:
         ------
@@ -225,15 +633,45 @@ class RevokableQuotaLimiter(QuotaLimiter):
         """
         if self.subject_type == "c":
             subject_id = ""
-        available = self.available_quota(subject_id)
+        if self.lease_configuration is not None:
+            available = self._leased_quota(subject_id)
+        elif available is None:
+            available = self.available_quota(subject_id)
         logger.info("Available quota for subject %s is %d", subject_id, available)
         # check if ID still have available tokens to be consumed
         if available <= 0:
+            if self.exhausted_subjects is not None:
+                self.exhausted_subjects.add(subject_id, available)
             e = QuotaExceedError(subject_id, self.subject_type, available)
-            logger.exception("Quota exceed: %s", e)
+            exceeded_trace.error(e, "Quota exceed: %s", e)
+            raise e
+
+    def ensure_not_exhausted(self, subject_id: str = "") -> None:
+        """Refuse subject whose quota has recently been found exhausted.
+
+        The check does not access the database, see `quota.exhausted_subjects`.
+
+        Parameters:
+        ----------
+                subject_id (str): Identifier of the subject to check. If this
+                limiter's `subject_type` is `"c"`, the value is ignored and
+                treated as an empty string.
+
+        Raises:
+        ------
+                QuotaExceedError: If the quota of the subject has recently
+                been found exhausted.
+        """
+        if self.exhausted_subjects is None:
+            return
+        if self.subject_type == "c":
+            subject_id = ""
+        available = self.exhausted_subjects.get(subject_id)
+        if available is not None:
+            e = QuotaExceedError(subject_id, self.subject_type, available)
+            exceeded_trace.error(e, "Quota exceed (cached): %s", e)
             raise e
 
-    @connection
     def consume_tokens(
         self,
         input_tokens: int = 0,
@@ -245,8 +683,11 @@ class RevokableQuotaLimiter(QuotaLimiter):
 
         Deducts the sum of `input_tokens` and `output_tokens` from the
         subject's stored quota and persists the update to the configured
-        database backend. For subject type "c", the `subject_id` is normalized
-        to an empty string before performing the operation.
+        database backend. With quota lease configured, the tokens are consumed
+        from the lease and written to the database when the lease is renewed.
+        Quota split into shards is consumed from one of the shards.
+        For subject type "c", the `subject_id` is normalized to an empty
+        string before performing the operation.
 
         Parameters:
         ----------
@@ -263,6 +704,15 @@ class RevokableQuotaLimiter(QuotaLimiter):
             subject_id,
         )
 
+        if self.lease_configuration is not None:
+            with self.leases_lock:
+                self._lease(subject_id).consumed += input_tokens + output_tokens
+            return
+
+        if self.shards > 1:
+            self._consume_shard_tokens(input_tokens + output_tokens)
+            return
+
         if self.sqlite_connection_config is not None:
             self._consume_tokens(
                 UPDATE_AVAILABLE_QUOTA_SQLITE, input_tokens, output_tokens, subject_id
@@ -275,6 +725,7 @@ class RevokableQuotaLimiter(QuotaLimiter):
             )
             return
 
+    @connection
     def _consume_tokens(
         self,
         update_statement: str,
@@ -312,6 +763,385 @@ class RevokableQuotaLimiter(QuotaLimiter):
         )
         self.connection.commit()
         cursor.close()
+        record_user_write(subject_id)
+
+    @connection
+    def _consume_shard_tokens(self, tokens: int) -> None:
+        """Consume tokens from one shard of the quota.
+
+        Tokens are consumed from a randomly chosen shard, or from its siblings
+        when the chosen shard does not have enough quota left. When no shard
+        has enough quota left, the chosen shard is overdrawn, as the unsharded
+        quota would be.
+
+        Parameters:
+        ----------
+            tokens (int): Number of tokens to consume.
+        """
+        if self.sqlite_connection_config is not None:
+            consume_statement = CONSUME_SHARD_TOKENS_SQLITE
+            update_statement = UPDATE_AVAILABLE_QUOTA_SQLITE
+        else:
+            consume_statement = CONSUME_SHARD_TOKENS_PG
+            update_statement = UPDATE_AVAILABLE_QUOTA_PG
+        # timestamp to be used
+        updated_at = datetime.now(tz=UTC)
+
+        quota_ids = shard_order(self.shards)
+        cursor = self.connection.cursor()
+        for quota_id in quota_ids:
+            cursor.execute(
+                consume_statement,
+                (-tokens, updated_at, quota_id, self.subject_type, tokens),
+            )
+            if cursor.rowcount > 0:
+                break
+        else:
+            cursor.execute(
+                update_statement,
+                (-tokens, updated_at, quota_ids[0], self.subject_type),
+            )
+        self.connection.commit()
+        cursor.close()
+        record_user_write("")
+
+    def reserve_tokens(
+        self, tokens: int, subject_id: str = ""
+    ) -> Optional[QuotaReservation]:
+        """Reserve tokens expected to be consumed by a request.
+
+        The tokens are subtracted from the available quota only when enough
+        quota is available, in a single statement in PostgreSQL, so
+        concurrent requests can not over-spend the quota. Without
+        reservations configured, the available quota is checked only.
+
+        Parameters:
+        ----------
+            tokens (int): Number of tokens expected to be consumed.
+            subject_id (str): Identifier of the subject consuming the tokens.
+            If this limiter's `subject_type` is `"c"`, the value is ignored
+            and treated as an empty string.
+
+        Returns:
+        -------
+            Optional[QuotaReservation]: The reservation to be settled, or
+            None when reservations are not configured.
+
+        Raises:
+        ------
+            QuotaExceedError: If the available quota is lower than the
+            number of reserved tokens.
+        """
+        if self.subject_type == "c":
+            subject_id = ""
+        if self.reservation_configuration is None:
+            self.ensure_available_quota(subject_id)
+            return None
+        # at least one token is reserved, so exhausted quota is refused
+        reservation = QuotaReservation(
+            reservation_id=get_suid(), subject_id=subject_id, tokens=max(tokens, 1)
+        )
+        available = self._reserve_shard_tokens(reservation)
+        if available is None:
+            # quota of new subjects is initialized when it is read
+            if self._available_quota(subject_id) >= reservation.tokens:
+                available = self._reserve_shard_tokens(reservation)
+        if available is None:
+            available = self._available_quota(subject_id)
+            if available <= 0 and self.exhausted_subjects is not None:
+                self.exhausted_subjects.add(subject_id, available)
+            e = QuotaExceedError(
+                subject_id, self.subject_type, available, reservation.tokens
+            )
+            exceeded_trace.error(e, "Quota exceed: %s", e)
+            raise e
+        logger.info(
+            "Reserved %d tokens for subject %s, available quota is %d",
+            reservation.tokens,
+            subject_id,
+            available,
+        )
+        return reservation
+
+    def _reserve_shard_tokens(self, reservation: QuotaReservation) -> Optional[int]:
+        """Reserve tokens from one shard of the quota.
+
+        Tokens are reserved from a randomly chosen shard, or from its siblings
+        when the chosen shard does not have enough quota left. Unsharded quota
+        is reserved as a whole.
+
+        Parameters:
+        ----------
+            reservation (QuotaReservation): Reservation to be made.
+
+        Returns:
+        -------
+            Optional[int]: The quota available in the shard after the
+            reservation, or None when no shard has enough quota available.
+        """
+        if self.shards == 1:
+            return self._reserve_tokens(reservation, reservation.subject_id)
+        for quota_id in shard_order(self.shards):
+            available = self._reserve_tokens(reservation, quota_id)
+            if available is not None:
+                return available
+        return None
+
+    @connection
+    def _reserve_tokens(
+        self, reservation: QuotaReservation, quota_id: str
+    ) -> Optional[int]:
+        """Subtract reserved tokens from the quota and record the reservation.
+
+        Parameters:
+        ----------
+            reservation (QuotaReservation): Reservation to be made.
+            quota_id (str): ID of the row the tokens are reserved from, the
+            subject itself or one shard of its quota.
+
+        Returns:
+        -------
+            Optional[int]: The available quota after the reservation, or None
+            when not enough quota is available.
+        """
+        parameters: dict[str, Any] = {
+            "reservation_id": reservation.reservation_id,
+            "id": quota_id,
+            "subject": self.subject_type,
+            "tokens": reservation.tokens,
+            "reserved_at": datetime.now(tz=UTC),
+        }
+        if self.sqlite_connection_config is not None:
+            # SQLite does not support data-modifying CTEs, both statements are
+            # executed in one transaction instead
+            cursor = self.connection.cursor()
+            try:
+                cursor.execute("BEGIN IMMEDIATE")
+                cursor.execute(RESERVE_QUOTA_SQLITE, parameters)
+                value = cursor.fetchone()
+                if value is not None:
+                    cursor.execute(INSERT_QUOTA_RESERVATION_SQLITE, parameters)
+                cursor.execute("COMMIT")
+            except Exception:
+                cursor.execute("ROLLBACK")
+                raise
+            finally:
+                cursor.close()
+        else:
+            with self.connection.cursor() as cursor:
+                cursor.execute(RESERVE_QUOTA_PG, parameters)
+                value = cursor.fetchone()
+            self.connection.commit()
+        if value is None:
+            return None
+        record_user_write(reservation.subject_id)
+        return int(value[0])
+
+    @connection
+    def settle_tokens(
+        self,
+        reservation: QuotaReservation,
+        input_tokens: int,
+        output_tokens: int,
+    ) -> None:
+        """Replace reserved tokens by the tokens actually consumed.
+
+        The reserved tokens are returned to the quota and the consumed ones
+        are subtracted in a single statement in PostgreSQL. When the
+        reservation has already been reclaimed, the consumed tokens are
+        subtracted only. Settling the reservation again does nothing.
+
+        Parameters:
+        ----------
+            reservation (QuotaReservation): Reservation made by the request.
+            input_tokens (int): Number of input tokens consumed.
+            output_tokens (int): Number of output tokens consumed.
+        """
+        logger.info(
+            "Settling %d reserved tokens by %d input and %d output tokens "
+            "for subject %s",
+            reservation.tokens,
+            input_tokens,
+            output_tokens,
+            reservation.subject_id,
+        )
+        parameters = {
+            "reservation_id": reservation.reservation_id,
+            "id": reservation.subject_id,
+            "subject": self.subject_type,
+            "tokens": input_tokens + output_tokens,
+            "updated_at": datetime.now(tz=UTC),
+        }
+        if self.sqlite_connection_config is not None:
+            cursor = self.connection.cursor()
+            try:
+                cursor.execute("BEGIN IMMEDIATE")
+                cursor.execute(MARK_QUOTA_RESERVATION_SETTLED_SQLITE, parameters)
+                value = cursor.fetchone()
+                if value is not None:
+                    # the reservation is settled in the shard it was made from
+                    (
+                        parameters["id"],
+                        parameters["reserved"],
+                        parameters["reserved_at"],
+                    ) = value
+                    cursor.execute(SETTLE_QUOTA_SQLITE, parameters)
+                    settled, exists = True, True
+                else:
+                    cursor.execute(SELECT_QUOTA_RESERVATION_SQLITE, parameters)
+                    settled, exists = False, cursor.fetchone() is not None
+                cursor.execute("COMMIT")
+            except Exception:
+                cursor.execute("ROLLBACK")
+                raise
+            finally:
+                cursor.close()
+        else:
+            with self.connection.cursor() as cursor:
+                cursor.execute(SETTLE_QUOTA_PG, parameters)
+                settled, exists = cursor.fetchone()
+            self.connection.commit()
+        if exists and not settled:
+            logger.info(
+                "Reservation %s has already been settled",
+                reservation.reservation_id,
+            )
+            return
+        if not settled:
+            logger.warning(
+                "Reservation %s has been reclaimed, consuming tokens only",
+                reservation.reservation_id,
+            )
+            self.consume_tokens(input_tokens, output_tokens, reservation.subject_id)
+            return
+        record_user_write(reservation.subject_id)
+
+    def _lease(self, subject_id: str) -> QuotaLease:
+        """Return the lease of the subject, taking a new one if needed.
+
+        Must be called with the leases lock held.
+
+        Parameters:
+        ----------
+            subject_id (str): Identifier of the subject, already normalized.
+
+        Returns:
+        -------
+            QuotaLease: The lease, marked as used.
+        """
+        if subject_id not in self.leases:
+            self._renew_leases([subject_id])
+        lease = self.leases[subject_id]
+        lease.used = True
+        return lease
+
+    def _leased_quota(self, subject_id: str) -> int:
+        """Return the available quota of the subject for the quota check.
+
+        An exhausted lease is renewed, so the consumed tokens are written and
+        the quota consumed by other workers is taken into account.
+
+        Parameters:
+        ----------
+            subject_id (str): Identifier of the subject, already normalized.
+
+        Returns:
+        -------
+            int: The available quota; it is positive only when tokens can be
+            consumed from the lease.
+        """
+        with self.leases_lock:
+            lease = self._lease(subject_id)
+            if lease.consumed and lease.remaining <= 0:
+                self._renew_leases([subject_id])
+                lease = self._lease(subject_id)
+            if lease.remaining <= 0:
+                return min(lease.available, 0)
+            return lease.available
+
+    def sync_leases(self) -> None:
+        """Write tokens consumed from the leases and renew the leases.
+
+        Leases not used since their last renewal are dropped, so quota of
+        inactive subjects is not kept in memory.
+        """
+        with self.leases_lock:
+            for subject_id, lease in list(self.leases.items()):
+                if not lease.used and not lease.consumed:
+                    del self.leases[subject_id]
+            if self.leases:
+                self._renew_leases(list(self.leases))
+
+    @connection
+    def _renew_leases(self, subject_ids: list[str]) -> None:
+        """Write tokens consumed from the leases and take new leases.
+
+        Tokens consumed by all subjects are written in one batch. When the
+        quota of a subject has been reset since its lease was taken, the
+        consumed tokens are not written, as the reset sets the quota for the
+        new period. Tokens consumed before the quota was increased are
+        written. Must be called with the leases lock held.
+
+        Parameters:
+        ----------
+            subject_ids (list[str]): Identifiers of the subjects, already
+            normalized.
+        """
+        if self.lease_configuration is None:
+            return
+        if self.sqlite_connection_config is not None:
+            select_statement = SELECT_QUOTA_LEASE_SQLITE
+            update_statement = UPDATE_AVAILABLE_QUOTA_SQLITE
+        else:
+            select_statement = SELECT_QUOTA_LEASE_PG
+            update_statement = UPDATE_AVAILABLE_QUOTA_PG
+        size = lease_size(
+            self.initial_quota or self.increase_by, self.lease_configuration.fraction
+        )
+        # timestamp to be used
+        updated_at = datetime.now(tz=UTC)
+
+        updates = []
+        renewed: dict[str, QuotaLease] = {}
+        cursor = self.connection.cursor()
+        for subject_id in subject_ids:
+            cursor.execute(select_statement, (subject_id, self.subject_type))
+            value = cursor.fetchone()
+            if value is None:
+                self._init_quota(subject_id)
+                cursor.execute(select_statement, (subject_id, self.subject_type))
+                value = cursor.fetchone()
+            available, reset_at = int(value[0]), value[1]
+            lease = self.leases.get(subject_id)
+            if lease is not None and lease.consumed:
+                if reset_at == lease.reset_at:
+                    updates.append(
+                        (-lease.consumed, updated_at, subject_id, self.subject_type)
+                    )
+                    available -= lease.consumed
+                else:
+                    logger.info(
+                        "Quota of subject %s has been reset, %d tokens consumed "
+                        "before the reset are not charged",
+                        subject_id,
+                        lease.consumed,
+                    )
+            renewed[subject_id] = new_lease(available, reset_at, size)
+        if updates:
+            cursor.executemany(update_statement, updates)
+            self.connection.commit()
+        cursor.close()
+        self.leases.update(renewed)
+        for _, _, subject_id, _ in updates:
+            record_user_write(subject_id)
+
+    def close(self) -> None:
+        """Stop synchronization of leases and write tokens consumed from them."""
+        if self.lease_sync is not None:
+            self.lease_sync.stop()
+            self.lease_sync = None
+        if self.leases:
+            self.sync_leases()
 
     def _initialize_tables(self) -> None:
         """Initialize tables used by quota limiter.
@@ -323,9 +1153,12 @@ class RevokableQuotaLimiter(QuotaLimiter):
         logger.info("Initializing tables for quota limiter")
         cursor = self.connection.cursor()
         if self.sqlite_connection_config is not None:
-            cursor.execute(CREATE_QUOTA_TABLE_SQLITE)
+            create_quota_table(cursor, sqlite=True)
         elif self.postgres_connection_config is not None:
-            cursor.execute(CREATE_QUOTA_TABLE_PG)
+            create_quota_table(cursor, sqlite=False)
+        if self.reservation_configuration is not None:
+            cursor.execute(CREATE_QUOTA_RESERVATIONS_TABLE)
+            cursor.execute(CREATE_QUOTA_RESERVATIONS_INDEX)
         cursor.close()
         self.connection.commit()
 
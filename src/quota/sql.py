@@ -8,6 +8,7 @@ CREATE_QUOTA_TABLE_PG = """
         available       int,
         updated_at      timestamp with time zone,
         revoked_at      timestamp with time zone,
+        reset_at        timestamp with time zone,
         PRIMARY KEY(id, subject)
     );
     """
@@ -21,40 +22,176 @@ CREATE_QUOTA_TABLE_SQLITE = """
         available       int,
         updated_at      timestamp with time zone,
         revoked_at      timestamp with time zone,
+        reset_at        timestamp with time zone,
         PRIMARY KEY(id, subject)
     );
     """
 
 
+# `revoked_at` marks the start of the period for the quota scheduler and it is
+# changed by both increases and resets of the quota; `reset_at` is changed by
+# resets only, so tokens consumed from leases and reserved before an increase
+# are still charged; tables created without the column get it added
+ADD_QUOTA_RESET_COLUMN_PG = """
+    ALTER TABLE quota_limits ADD COLUMN IF NOT EXISTS reset_at timestamp with time zone
+    """
+
+
+SELECT_QUOTA_RESET_COLUMN_SQLITE = """
+    SELECT COUNT(*) FROM pragma_table_info('quota_limits') WHERE name='reset_at'
+    """
+
+
+ADD_QUOTA_RESET_COLUMN_SQLITE = """
+    ALTER TABLE quota_limits ADD COLUMN reset_at timestamp with time zone
+    """
+
+# the scheduler updates quota of subjects by chunks, every chunk is a range
+# of IDs starting at `start` and ending before `end` (the last chunk has no
+# end), so rows of the whole table are not locked by one statement
 INCREASE_QUOTA_STATEMENT_PG = """
     UPDATE quota_limits
-       SET available=available+%s, revoked_at=NOW()
-     WHERE subject=%s
-       AND revoked_at < NOW() - INTERVAL %s ;
+       SET available=available+%(quota)s, revoked_at=NOW()
+     WHERE subject=%(subject)s
+       AND id >= %(start)s
+       AND (%(end)s IS NULL OR id < %(end)s)
+       AND revoked_at < NOW() - INTERVAL %(period)s ;
     """
 
 
 INCREASE_QUOTA_STATEMENT_SQLITE = """
     UPDATE quota_limits
-       SET available=available+?, revoked_at=datetime('now')
-     WHERE subject=?
-       AND revoked_at < datetime('now', ?);
+       SET available=available+:quota, revoked_at=datetime('now')
+     WHERE subject=:subject
+       AND id >= :start
+       AND (:end IS NULL OR id < :end)
+       AND revoked_at < datetime('now', :period);
     """
 
 
 RESET_QUOTA_STATEMENT_PG = """
     UPDATE quota_limits
-       SET available=%s, revoked_at=NOW()
-     WHERE subject=%s
-       AND revoked_at < NOW() - INTERVAL %s ;
+       SET available=%(quota)s, revoked_at=NOW(), reset_at=NOW()
+     WHERE subject=%(subject)s
+       AND id >= %(start)s
+       AND (%(end)s IS NULL OR id < %(end)s)
+       AND revoked_at < NOW() - INTERVAL %(period)s ;
     """
 
 
 RESET_QUOTA_STATEMENT_SQLITE = """
     UPDATE quota_limits
-       SET available=?, revoked_at=datetime('now')
-     WHERE subject=?
-       AND revoked_at < datetime('now', ?);
+       SET available=:quota, revoked_at=datetime('now'),
+           reset_at=datetime('now')
+     WHERE subject=:subject
+       AND id >= :start
+       AND (:end IS NULL OR id < :end)
+       AND revoked_at < datetime('now', :period);
+    """
+
+# first ID of the chunk following the chunk starting at given ID, no row is
+# returned for the last chunk
+SELECT_QUOTA_CHUNK_END_PG = """
+    SELECT id
+      FROM quota_limits
+     WHERE subject=%(subject)s AND id >= %(start)s
+     ORDER BY id
+     LIMIT 1 OFFSET %(chunk_size)s
+    """
+
+
+SELECT_QUOTA_CHUNK_END_SQLITE = """
+    SELECT id
+      FROM quota_limits
+     WHERE subject=:subject AND id >= :start
+     ORDER BY id
+     LIMIT 1 OFFSET :chunk_size
+    """
+
+# one quota scheduler (or cache retention sweeper) per PostgreSQL database
+# holds the session level lock
+TRY_QUOTA_SCHEDULER_LOCK_PG = """
+    SELECT pg_try_advisory_lock(%s)
+    """
+
+# one quota scheduler (or cache retention sweeper) per SQLite database holds
+# the lease row; the lease is renewed by its holder and taken over by another
+# process when it expires
+CREATE_QUOTA_SCHEDULER_LEASE_TABLE_SQLITE = """
+    CREATE TABLE IF NOT EXISTS quota_scheduler_lease (
+        name            text NOT NULL,
+        holder          text NOT NULL,
+        expires_at      timestamp NOT NULL,
+        PRIMARY KEY(name)
+    );
+    """
+
+
+ACQUIRE_QUOTA_SCHEDULER_LEASE_SQLITE = """
+    INSERT INTO quota_scheduler_lease (name, holder, expires_at)
+    VALUES (:name, :holder, datetime('now', :duration))
+        ON CONFLICT (name) DO UPDATE
+       SET holder=excluded.holder, expires_at=excluded.expires_at
+     WHERE quota_scheduler_lease.holder=excluded.holder
+        OR quota_scheduler_lease.expires_at < datetime('now');
+    """
+
+# the cluster quota split into shards is updated as a whole, when the most
+# recent revocation of its shards is older than the period; the first shard
+# (stored in the row with empty ID) gets the remainder of the split
+INCREASE_SHARDS_QUOTA_STATEMENT_PG = """
+    UPDATE quota_limits
+       SET available=available+CASE WHEN id='' THEN %(first)s ELSE %(share)s END,
+           revoked_at=NOW()
+     WHERE subject=%(subject)s
+       AND id IN (SELECT json_array_elements_text(%(ids)s::json))
+       AND (SELECT MAX(revoked_at)
+              FROM quota_limits
+             WHERE subject=%(subject)s
+               AND id IN (SELECT json_array_elements_text(%(ids)s::json))
+           ) < NOW() - INTERVAL %(period)s ;
+    """
+
+
+INCREASE_SHARDS_QUOTA_STATEMENT_SQLITE = """
+    UPDATE quota_limits
+       SET available=available+CASE WHEN id='' THEN :first ELSE :share END,
+           revoked_at=datetime('now')
+     WHERE subject=:subject
+       AND id IN (SELECT value FROM json_each(:ids))
+       AND (SELECT MAX(revoked_at)
+              FROM quota_limits
+             WHERE subject=:subject
+               AND id IN (SELECT value FROM json_each(:ids))
+           ) < datetime('now', :period);
+    """
+
+
+RESET_SHARDS_QUOTA_STATEMENT_PG = """
+    UPDATE quota_limits
+       SET available=CASE WHEN id='' THEN %(first)s ELSE %(share)s END,
+           revoked_at=NOW(), reset_at=NOW()
+     WHERE subject=%(subject)s
+       AND id IN (SELECT json_array_elements_text(%(ids)s::json))
+       AND (SELECT MAX(revoked_at)
+              FROM quota_limits
+             WHERE subject=%(subject)s
+               AND id IN (SELECT json_array_elements_text(%(ids)s::json))
+           ) < NOW() - INTERVAL %(period)s ;
+    """
+
+
+RESET_SHARDS_QUOTA_STATEMENT_SQLITE = """
+    UPDATE quota_limits
+       SET available=CASE WHEN id='' THEN :first ELSE :share END,
+           revoked_at=datetime('now'), reset_at=datetime('now')
+     WHERE subject=:subject
+       AND id IN (SELECT value FROM json_each(:ids))
+       AND (SELECT MAX(revoked_at)
+              FROM quota_limits
+             WHERE subject=:subject
+               AND id IN (SELECT value FROM json_each(:ids))
+           ) < datetime('now', :period);
     """
 
 INIT_QUOTA_PG = """
@@ -79,15 +216,29 @@ SELECT_QUOTA_SQLITE = """
      WHERE id=? AND subject=? LIMIT 1
     """
 
+# quota of several limiters sharing the database is read by one query
+SELECT_QUOTAS_PG = """
+    SELECT id, subject, available
+      FROM quota_limits
+     WHERE (id, subject) IN %s
+    """
+
+# the row values list is filled with one "(?, ?)" item per requested quota
+SELECT_QUOTAS_SQLITE = """
+    SELECT id, subject, available
+      FROM quota_limits
+     WHERE (id, subject) IN (VALUES {values})
+    """
+
 SET_AVAILABLE_QUOTA_PG = """
     UPDATE quota_limits
-       SET available=%s, revoked_at=%s
+       SET available=%s, revoked_at=%s, reset_at=%s
      WHERE id=%s AND subject=%s
     """
 
 SET_AVAILABLE_QUOTA_SQLITE = """
     UPDATE quota_limits
-       SET available=?, revoked_at=?
+       SET available=?, revoked_at=?, reset_at=?
      WHERE id=? AND subject=?
     """
 
@@ -103,6 +254,51 @@ UPDATE_AVAILABLE_QUOTA_SQLITE = """
      WHERE id=? AND subject=?
     """
 
+SET_SHARDS_QUOTA_PG = """
+    UPDATE quota_limits
+       SET available=CASE WHEN id='' THEN %(first)s ELSE %(share)s END,
+           revoked_at=%(timestamp)s, reset_at=%(timestamp)s
+     WHERE subject=%(subject)s
+       AND id IN (SELECT json_array_elements_text(%(ids)s::json))
+    """
+
+SET_SHARDS_QUOTA_SQLITE = """
+    UPDATE quota_limits
+       SET available=CASE WHEN id='' THEN :first ELSE :share END,
+           revoked_at=:timestamp, reset_at=:timestamp
+     WHERE subject=:subject
+       AND id IN (SELECT value FROM json_each(:ids))
+    """
+
+UPDATE_SHARDS_QUOTA_PG = """
+    UPDATE quota_limits
+       SET available=available+CASE WHEN id='' THEN %(first)s ELSE %(share)s END,
+           updated_at=%(timestamp)s
+     WHERE subject=%(subject)s
+       AND id IN (SELECT json_array_elements_text(%(ids)s::json))
+    """
+
+UPDATE_SHARDS_QUOTA_SQLITE = """
+    UPDATE quota_limits
+       SET available=available+CASE WHEN id='' THEN :first ELSE :share END,
+           updated_at=:timestamp
+     WHERE subject=:subject
+       AND id IN (SELECT value FROM json_each(:ids))
+    """
+
+# tokens are consumed from a shard only when it has enough quota left
+CONSUME_SHARD_TOKENS_PG = """
+    UPDATE quota_limits
+       SET available=available+%s, updated_at=%s
+     WHERE id=%s AND subject=%s AND available>=%s
+    """
+
+CONSUME_SHARD_TOKENS_SQLITE = """
+    UPDATE quota_limits
+       SET available=available+?, updated_at=?
+     WHERE id=? AND subject=? AND available>=?
+    """
+
 CREATE_TOKEN_USAGE_TABLE = """
     CREATE TABLE IF NOT EXISTS token_usage (
         user_id         text NOT NULL,
@@ -145,3 +341,184 @@ CONSUME_TOKENS_FOR_USER_PG = """
        AND token_usage.provider=%(provider)s
        AND token_usage.model=%(model)s
     """
+
+# token usage aggregated in memory is written by one multi-row upsert
+CONSUME_TOKENS_BATCH_PG = """
+    INSERT INTO token_usage (user_id, provider, model, input_tokens, output_tokens, updated_at)
+    VALUES %s
+    ON CONFLICT (user_id, provider, model)
+    DO UPDATE
+       SET input_tokens=token_usage.input_tokens+EXCLUDED.input_tokens,
+           output_tokens=token_usage.output_tokens+EXCLUDED.output_tokens,
+           updated_at=EXCLUDED.updated_at
+    """
+
+# the values list is filled with one "(?, ?, ?, ?, ?, ?)" item per row
+CONSUME_TOKENS_BATCH_SQLITE = """
+    INSERT INTO token_usage (user_id, provider, model, input_tokens, output_tokens, updated_at)
+    VALUES {values}
+    ON CONFLICT (user_id, provider, model)
+    DO UPDATE
+       SET input_tokens=token_usage.input_tokens+excluded.input_tokens,
+           output_tokens=token_usage.output_tokens+excluded.output_tokens,
+           updated_at=excluded.updated_at
+    """
+
+SELECT_QUOTA_LEASE_PG = """
+    SELECT available, reset_at
+      FROM quota_limits
+     WHERE id=%s AND subject=%s LIMIT 1
+    """
+
+SELECT_QUOTA_LEASE_SQLITE = """
+    SELECT available, reset_at
+      FROM quota_limits
+     WHERE id=? AND subject=? LIMIT 1
+    """
+
+CREATE_QUOTA_RESERVATIONS_TABLE = """
+    CREATE TABLE IF NOT EXISTS quota_reservations (
+        reservation_id  text NOT NULL,
+        id              text NOT NULL,
+        subject         char(1) NOT NULL,
+        tokens          int NOT NULL,
+        reserved_at     timestamp with time zone NOT NULL,
+        settled_at      timestamp with time zone,
+        PRIMARY KEY(reservation_id)
+    );
+    """
+
+CREATE_QUOTA_RESERVATIONS_INDEX = """
+    CREATE INDEX IF NOT EXISTS quota_reservations_reserved_at
+        ON quota_reservations (reserved_at)
+    """
+
+RESERVE_QUOTA_PG = """
+    WITH reserved AS (
+        UPDATE quota_limits
+           SET available=available-%(tokens)s, updated_at=%(reserved_at)s
+         WHERE id=%(id)s AND subject=%(subject)s AND available>=%(tokens)s
+     RETURNING available
+    ), recorded AS (
+        INSERT INTO quota_reservations (reservation_id, id, subject, tokens, reserved_at)
+        SELECT %(reservation_id)s, %(id)s, %(subject)s, %(tokens)s, %(reserved_at)s
+          FROM reserved
+    )
+    SELECT available FROM reserved
+    """
+
+RESERVE_QUOTA_SQLITE = """
+    UPDATE quota_limits
+       SET available=available-:tokens, updated_at=:reserved_at
+     WHERE id=:id AND subject=:subject AND available>=:tokens
+ RETURNING available
+    """
+
+INSERT_QUOTA_RESERVATION_SQLITE = """
+    INSERT INTO quota_reservations (reservation_id, id, subject, tokens, reserved_at)
+    VALUES (:reservation_id, :id, :subject, :tokens, :reserved_at)
+    """
+
+# reserved tokens are returned only when the quota has not been reset since
+# the reservation, as the reset sets the quota for a new period; tokens
+# reserved before the quota was increased are returned; settled reservations
+# are kept as markers, so settling them again does not consume the tokens
+# twice; the statement returns whether the reservation has been settled now
+# and whether it still exists (it does not when it has been reclaimed)
+SETTLE_QUOTA_PG = """
+    WITH settled AS (
+        UPDATE quota_reservations
+           SET settled_at=%(updated_at)s
+         WHERE reservation_id=%(reservation_id)s AND settled_at IS NULL
+     RETURNING id, subject, tokens, reserved_at
+    ), charged AS (
+        UPDATE quota_limits q
+           SET available=q.available-%(tokens)s+CASE
+                   WHEN q.reset_at IS NULL OR s.reserved_at>=q.reset_at THEN s.tokens
+                   ELSE 0
+               END,
+               updated_at=%(updated_at)s
+          FROM settled s
+         WHERE q.id=s.id AND q.subject=s.subject
+    )
+    SELECT EXISTS (SELECT 1 FROM settled),
+           EXISTS (SELECT 1 FROM quota_reservations
+                    WHERE reservation_id=%(reservation_id)s)
+    """
+
+MARK_QUOTA_RESERVATION_SETTLED_SQLITE = """
+    UPDATE quota_reservations
+       SET settled_at=:updated_at
+     WHERE reservation_id=:reservation_id AND settled_at IS NULL
+ RETURNING id, tokens, reserved_at
+    """
+
+SELECT_QUOTA_RESERVATION_SQLITE = """
+    SELECT 1 FROM quota_reservations WHERE reservation_id=:reservation_id
+    """
+
+SETTLE_QUOTA_SQLITE = """
+    UPDATE quota_limits
+       SET available=available-:tokens+CASE
+               WHEN reset_at IS NULL
+                 OR julianday(:reserved_at)>=julianday(reset_at) THEN :reserved
+               ELSE 0
+           END,
+           updated_at=:updated_at
+     WHERE id=:id AND subject=:subject
+    """
+
+# reservations not settled before the timeout are returned to the quota;
+# markers of settled reservations are deleted after the retention period
+RECLAIM_QUOTA_RESERVATIONS_PG = """
+    WITH expired AS (
+        DELETE FROM quota_reservations
+         WHERE reserved_at < NOW() - %(timeout)s * INTERVAL '1 second'
+           AND settled_at IS NULL
+     RETURNING id, subject, tokens, reserved_at
+    ), retained AS (
+        DELETE FROM quota_reservations
+         WHERE reserved_at < NOW() - %(retention)s * INTERVAL '1 second'
+           AND settled_at IS NOT NULL
+    ), refunds AS (
+        SELECT e.id, e.subject, SUM(e.tokens) AS tokens
+          FROM expired e
+          JOIN quota_limits q ON q.id=e.id AND q.subject=e.subject
+         WHERE q.reset_at IS NULL OR e.reserved_at>=q.reset_at
+      GROUP BY e.id, e.subject
+    )
+    UPDATE quota_limits q
+       SET available=q.available+r.tokens
+      FROM refunds r
+     WHERE q.id=r.id AND q.subject=r.subject
+    """
+
+RECLAIM_QUOTA_RESERVATIONS_SQLITE = """
+    UPDATE quota_limits
+       SET available=available+(
+           SELECT SUM(r.tokens)
+             FROM quota_reservations r
+            WHERE r.id=quota_limits.id AND r.subject=quota_limits.subject
+              AND r.settled_at IS NULL
+              AND julianday(r.reserved_at)<julianday(:expired_at)
+              AND (quota_limits.reset_at IS NULL
+                   OR julianday(r.reserved_at)>=julianday(quota_limits.reset_at))
+       )
+     WHERE EXISTS (
+           SELECT 1
+             FROM quota_reservations r
+            WHERE r.id=quota_limits.id AND r.subject=quota_limits.subject
+              AND r.settled_at IS NULL
+              AND julianday(r.reserved_at)<julianday(:expired_at)
+              AND (quota_limits.reset_at IS NULL
+                   OR julianday(r.reserved_at)>=julianday(quota_limits.reset_at))
+       )
+    """
+
+DELETE_EXPIRED_QUOTA_RESERVATIONS_SQLITE = """
+    DELETE FROM quota_reservations
+     WHERE (settled_at IS NULL
+            AND julianday(reserved_at)<julianday(:expired_at))
+        OR (settled_at IS NOT NULL
+            AND julianday(reserved_at)<julianday(:retained_until))
+    """
@@ -3,35 +3,61 @@
 One table named `token_usage` is used to store statistic about token usage
 history. Input and output token count are stored for each triple (user_id,
 provider, model). This triple is also used as a primary key to this table.
+
+When the token history buffer is configured, token usage is summed in memory
+per triple and written periodically by one multi-row upsert, so requests do
+not write to the table themselves.
 """
 
-import sqlite3
 from datetime import UTC, datetime
+from threading import Lock, RLock
+from time import monotonic
 from typing import Any, Optional
 
 import psycopg2
+from psycopg2.extras import execute_values
 
 from log import get_logger
+from metrics.recording import record_token_usage_flush_lag
 from models.config import (
     PostgreSQLDatabaseConfiguration,
     QuotaHandlersConfiguration,
     SQLiteDatabaseConfiguration,
 )
-from quota.connect_pg import connect_pg
 from quota.connect_sqlite import connect_sqlite
+from quota.quota_limiter import heartbeat_interval
 from quota.sql import (
+    CONSUME_TOKENS_BATCH_PG,
+    CONSUME_TOKENS_BATCH_SQLITE,
     CONSUME_TOKENS_FOR_USER_PG,
     CONSUME_TOKENS_FOR_USER_SQLITE,
     CREATE_TOKEN_USAGE_TABLE,
 )
-from utils.connection_decorator import connection
+from utils.connection_decorator import (
+    connection,
+    connection_pool,
+    leased_connection,
+    start_heartbeat,
+)
+from utils.periodic_sync import PeriodicSync
+from utils.postgres_pool import get_postgres_pool
 
 logger = get_logger(__name__)
 
+# number of rows written by one statement, SQLite limits number of parameters
+SQLITE_BATCH_SIZE = 500
+
+# token usage is aggregated per (user_id, provider, model)
+UsageKey = tuple[str, str, str]
+
 
-class TokenUsageHistory:
+class TokenUsageHistory:  # pylint: disable=too-many-instance-attributes
     """Class with implementation of storage for token usage history."""
 
+    # errors meaning that the connection has been lost and needs to be
+    # re-established, see the @connection decorator
+    disconnect_errors = (psycopg2.OperationalError, psycopg2.InterfaceError)
+
     def __init__(self, configuration: QuotaHandlersConfiguration) -> None:
         """Initialize token usage history storage.
 
@@ -39,8 +65,9 @@ class TokenUsageHistory:
         establish a database connection.
 
         Stores SQLite and PostgreSQL connection settings for later reconnection
-        attempts, initializes the internal connection state, and opens the
-        database connection.
+        attempts, initializes the internal connection state, opens the
+        database connection and starts connection heartbeat and flushing of
+        the token history buffer when configured.
 
         Parameters:
         ----------
@@ -56,9 +83,30 @@ class TokenUsageHistory:
             configuration.postgres
         )
         self.connection: Optional[Any] = None
+        # SQLite connection is used by request handlers and the flushing thread
+        self.connection_lock = RLock()
 
         # initialize connection to DB
         self.connect()
+        self.heartbeat = start_heartbeat(
+            type(self).__name__, self.ping, heartbeat_interval(configuration)
+        )
+
+        self.buffer_configuration = configuration.token_history_buffer
+        # [input_tokens, output_tokens] aggregated per key
+        self.buffer: dict[UsageKey, list[int]] = {}
+        # monotonic time the oldest aggregated usage was added
+        self.buffered_since: Optional[float] = None
+        # buffer is used by request handlers and the flushing thread
+        self.buffer_lock = Lock()
+        self.buffer_flush: Optional[PeriodicSync] = None
+        if self.buffer_configuration is not None:
+            self.buffer_flush = PeriodicSync(
+                f"{type(self).__name__} buffer",
+                self.flush,
+                self.buffer_configuration.flush_period,
+            )
+            self.buffer_flush.start()
 
     # pylint: disable=W0201
     def connect(self) -> None:
@@ -67,31 +115,37 @@ class TokenUsageHistory:
         Establish a database connection for token usage history and ensure required tables exist.
 
         Selects PostgreSQL if its configuration is present, otherwise uses
-        SQLite; initializes the token_usage table, enables autocommit on the
-        connection, and ensures the connection is closed and the exception is
-        re-raised if table initialization fails.
+        SQLite; PostgreSQL connections are leased from the pool shared by all
+        storages using the same database. Initializes the token_usage table,
+        enables autocommit on the SQLite connection, and ensures the SQLite
+        connection is closed and the exception is re-raised if table
+        initialization fails.
 
         Raises:
             ValueError: If neither PostgreSQL nor SQLite configuration is provided.
         """
         logger.info("Initializing connection to quota usage history database")
         if self.postgres_connection_config is not None:
-            self.connection = connect_pg(self.postgres_connection_config)
+            self.connection = get_postgres_pool(self.postgres_connection_config)
         if self.sqlite_connection_config is not None:
             self.connection = connect_sqlite(self.sqlite_connection_config)
         if self.connection is None:
             return
 
         try:
-            self._initialize_tables()
+            with leased_connection(self):
+                self._initialize_tables()
         except Exception as e:
-            self.connection.close()
+            # pooled connections are discarded by the pool itself
+            if connection_pool(self) is None:
+                self.connection.close()
             logger.exception("Error initializing quota usage history database:\n%s", e)
             raise
 
-        self.connection.autocommit = True
+        # pooled connections are always in autocommit mode
+        if connection_pool(self) is None:
+            self.connection.autocommit = True
 
-    @connection
     def consume_tokens(  # pylint: disable=too-many-arguments,too-many-positional-arguments
         self,
         user_id: str,
@@ -102,7 +156,9 @@ class TokenUsageHistory:
     ) -> None:
         """Consume tokens by given user.
 
-        Record token usage for a specific user/provider/model triple in persistent storage.
+        Record token usage for a specific user/provider/model triple in
+        persistent storage. With the token history buffer configured, the
+        usage is added to the buffer and written when the buffer is flushed.
 
         Parameters:
         ----------
@@ -124,6 +180,39 @@ class TokenUsageHistory:
             input_tokens,
             output_tokens,
         )
+        if self.buffer_configuration is None:
+            self._consume_tokens(user_id, provider, model, input_tokens, output_tokens)
+            return
+
+        with self.buffer_lock:
+            usage = self.buffer.setdefault((user_id, provider, model), [0, 0])
+            usage[0] += input_tokens
+            usage[1] += output_tokens
+            if self.buffered_since is None:
+                self.buffered_since = monotonic()
+            full = len(self.buffer) >= self.buffer_configuration.max_keys
+        if full and self.buffer_flush is not None:
+            self.buffer_flush.trigger()
+
+    @connection
+    def _consume_tokens(  # pylint: disable=too-many-arguments,too-many-positional-arguments
+        self,
+        user_id: str,
+        provider: str,
+        model: str,
+        input_tokens: int,
+        output_tokens: int,
+    ) -> None:
+        """Write token usage of one request to the database.
+
+        Parameters:
+        ----------
+            user_id (str): Identifier of the user whose token usage will be updated.
+            provider (str): Provider name associated with the usage.
+            model (str): Model name associated with the usage.
+            input_tokens (int): Number of input tokens to add to the stored usage.
+            output_tokens (int): Number of output tokens to add to the stored usage.
+        """
         query_statement: str = ""
         if self.postgres_connection_config is not None:
             query_statement = CONSUME_TOKENS_FOR_USER_PG
@@ -154,33 +243,116 @@ class TokenUsageHistory:
         )
         cursor.close()
 
+    def flush(self) -> None:
+        """Write token usage aggregated in the buffer to the database.
+
+        Usage which can not be written is returned to the buffer and written
+        by the next flush.
+        """
+        with self.buffer_lock:
+            buffer, self.buffer = self.buffer, {}
+            buffered_since, self.buffered_since = self.buffered_since, None
+        if not buffer or buffered_since is None:
+            return
+        try:
+            self._write_buffer(buffer)
+        except Exception:
+            with self.buffer_lock:
+                for key, (input_tokens, output_tokens) in buffer.items():
+                    usage = self.buffer.setdefault(key, [0, 0])
+                    usage[0] += input_tokens
+                    usage[1] += output_tokens
+                self.buffered_since = buffered_since
+            raise
+        finally:
+            record_token_usage_flush_lag(monotonic() - buffered_since)
+        logger.info("Token usage history written for %d keys", len(buffer))
+
+    @connection
+    def _write_buffer(self, buffer: dict[UsageKey, list[int]]) -> None:
+        """Write aggregated token usage by multi-row upserts.
+
+        All rows are written by one statement in PostgreSQL and in one
+        transaction in SQLite.
+
+        Parameters:
+        ----------
+            buffer (dict[UsageKey, list[int]]): Input and output tokens
+            aggregated per (user_id, provider, model).
+        """
+        if self.connection is None:
+            raise psycopg2.OperationalError("Not connected to token usage database")
+
+        updated_at = datetime.now(tz=UTC)
+        rows = [
+            (*key, input_tokens, output_tokens, updated_at)
+            for key, (input_tokens, output_tokens) in buffer.items()
+        ]
+        if self.sqlite_connection_config is not None:
+            # it is not possible to use context manager there, because SQLite
+            # does not support it
+            cursor = self.connection.cursor()
+            try:
+                cursor.execute("BEGIN IMMEDIATE")
+                for start in range(0, len(rows), SQLITE_BATCH_SIZE):
+                    batch = rows[start : start + SQLITE_BATCH_SIZE]
+                    cursor.execute(
+                        CONSUME_TOKENS_BATCH_SQLITE.format(
+                            values=", ".join(["(?, ?, ?, ?, ?, ?)"] * len(batch))
+                        ),
+                        [value for row in batch for value in row],
+                    )
+                cursor.execute("COMMIT")
+            except Exception:
+                cursor.execute("ROLLBACK")
+                raise
+            finally:
+                cursor.close()
+            return
+
+        # pooled connections are in autocommit mode, all rows are written by
+        # one statement, so the buffer is never written partially
+        with self.connection.cursor() as cursor:
+            execute_values(cursor, CONSUME_TOKENS_BATCH_PG, rows, page_size=len(rows))
+
+    def close(self) -> None:
+        """Write the token history buffer and stop flushing it periodically."""
+        if self.buffer_flush is not None:
+            self.buffer_flush.stop()
+            self.buffer_flush = None
+        try:
+            self.flush()
+        except Exception as e:  # pylint: disable=broad-exception-caught
+            logger.error("Token usage history not written on shutdown: %s", e)
+
     def connected(self) -> bool:
-        """Check if connection to quota usage history database is alive.
+        """Check if connection to quota usage history database is established.
 
-        Verify that the storage connection for token usage history is alive.
+        No query is sent to the database; a lost connection is detected when
+        an operation fails and it is re-established by the @connection
+        decorator.
 
         Returns:
-            `true` if the database connection is present and responds to a
-            simple query, `false` otherwise.
+            `true` if the database connection is present, `false` otherwise.
         """
         if self.connection is None:
             logger.warning("Not connected, need to reconnect later")
             return False
-        cursor = None
-        try:
-            cursor = self.connection.cursor()
-            cursor.execute("SELECT 1")
-            logger.info("Connection to storage is ok")
-            return True
-        except (psycopg2.OperationalError, sqlite3.Error) as e:
-            logger.error("Disconnected from storage: %s", e)
-            return False
-        finally:
-            if cursor is not None:
-                try:
-                    cursor.close()
-                except (psycopg2.Error, sqlite3.ProgrammingError):
-                    logger.warning("Unable to close cursor")
+        return True
+
+    @connection
+    def ping(self) -> None:
+        """Check that the connection is alive by sending a trivial query."""
+        # check if the connection was established
+        if self.connection is None:
+            logger.warning("Not connected, need to reconnect later")
+            return
+
+        # it is not possible to use context manager there, because SQLite does
+        # not support it
+        cursor = self.connection.cursor()
+        cursor.execute("SELECT 1")
+        cursor.close()
 
     def _initialize_tables(self) -> None:
         """Initialize tables used by quota limiter.
@@ -0,0 +1,239 @@
+"""Conversation cache retention sweeper runner."""
+
+from collections import Counter
+from collections.abc import Sequence
+from threading import Thread
+from time import sleep
+from typing import Any
+from uuid import uuid4
+
+import constants
+from cache.cache import Cache
+from cache.cache_factory import CacheFactory
+from cache.read_through_cache import invalidate_read_through_caches
+from log import get_logger
+from metrics.recording import record_cache_retention
+from models.config import (
+    Configuration,
+    ConversationHistoryConfiguration,
+    ConversationRetentionConfiguration,
+)
+from quota.connect_pg import connect_pg
+from quota.connect_sqlite import connect_sqlite
+from quota.sql import CREATE_QUOTA_SCHEDULER_LEASE_TABLE_SQLITE
+from runners.quota_scheduler import connected, elect_leader, init_tables
+from utils.shards import shard_configurations
+
+logger = get_logger(__name__)
+
+
+def cache_retention_sweeper(config: ConversationHistoryConfiguration) -> bool:
+    """
+    Run the loop deleting conversation cache rows outside the retention policy.
+
+    The rows are deleted by one sweeper per database, elected like the quota
+    scheduler. Every process drops the conversations kept by its
+    read-through caches after each period, so the deleted rows are not
+    served from memory.
+
+    Parameters:
+    ----------
+        config (ConversationHistoryConfiguration): Conversation cache
+        configuration with the retention policy. If no policy is configured
+        or the cache can not be created, the sweeper will not start.
+
+    Returns:
+    -------
+        bool: `True` if the sweeper started (unreachable in normal execution
+        because the function enters an infinite loop), `False` if the
+        sweeper is not configured or the cache could not be created.
+    """
+    retention = config.retention
+    if retention is None:
+        logger.info("Conversation cache retention is not configured, skipping")
+        return False
+
+    try:
+        # own cache instances, so the connections are used by this thread only
+        caches = [
+            CacheFactory.conversation_cache(shard_config)
+            for shard_config in _shard_cache_configurations(config)
+        ]
+    except Exception as e:  # pylint: disable=broad-exception-caught
+        logger.warning("Can not create conversation cache, skipping: %s", e)
+        return False
+
+    # identifies this sweeper in the lease row stored in SQLite database
+    holder = str(uuid4())
+    connection: Any = None
+    leader = False
+
+    logger.info(
+        "Cache retention sweeper started in separated thread with period set "
+        "to %d seconds",
+        retention.period,
+    )
+
+    while True:
+        connection, leader = elect_sweeper(config, connection, holder, leader)
+        if leader:
+            sweep(caches, retention)
+        else:
+            logger.info("Cache retention is applied by another process, skipping")
+        # the rows might have been deleted by sweeper of another process
+        invalidate_read_through_caches()
+        sleep(retention.period)
+    # unreachable code
+    return True
+
+
+def elect_sweeper(
+    config: ConversationHistoryConfiguration,
+    connection: Any,
+    holder: str,
+    leader: bool,
+) -> tuple[Any, bool]:
+    """
+    Elect the only sweeper deleting rows of the shared conversation cache.
+
+    Parameters:
+    ----------
+        config (ConversationHistoryConfiguration): Conversation cache
+        configuration with the retention policy.
+        connection (Any): Connection used by the previous election, or None.
+        holder (str): Identifier of this sweeper.
+        leader (bool): Whether this sweeper has been elected by the previous
+        run using the same connection.
+
+    Returns:
+    -------
+        tuple[Any, bool]: Connection to be used by the next election and
+        `True` if this sweeper deletes the rows.
+    """
+    period = constants.RETENTION_DEFAULT_PERIOD
+    if config.retention is not None:
+        period = config.retention.period
+    try:
+        if not connected(connection):
+            # the old connection might be closed to avoid resource leaks
+            try:
+                if connection is not None:
+                    connection.close()
+            except Exception:  # pylint: disable=broad-exception-caught
+                pass  # Connection already dead
+            # the advisory lock is released together with the old session
+            leader = False
+            connection = connect(config)
+        return connection, elect_leader(
+            connection,
+            holder,
+            leader,
+            postgres=config.postgres is not None,
+            lock_id=constants.CACHE_RETENTION_ADVISORY_LOCK_ID,
+            lease_name=constants.CACHE_RETENTION_LEASE_NAME,
+            period=period,
+        )
+    except Exception as e:  # pylint: disable=broad-exception-caught
+        logger.error("Cache retention sweeper election error: %s", e)
+        return connection, False
+
+
+def connect(config: ConversationHistoryConfiguration) -> Any:
+    """
+    Connect to the database used to elect the cache retention sweeper.
+
+    Parameters:
+    ----------
+        config (ConversationHistoryConfiguration): Conversation cache
+        configuration.
+
+    Returns:
+    -------
+        A database connection to the PostgreSQL database (its primary when
+        sharded) or to the SQLite database storing the cache, or `None` if
+        neither is configured.
+    """
+    if config.postgres is not None:
+        return connect_pg(config.postgres)
+    if config.sqlite is not None:
+        connection = connect_sqlite(config.sqlite)
+        init_tables(connection, CREATE_QUOTA_SCHEDULER_LEASE_TABLE_SQLITE)
+        return connection
+    return None
+
+
+def _shard_cache_configurations(
+    config: ConversationHistoryConfiguration,
+) -> list[ConversationHistoryConfiguration]:
+    """
+    Return cache configurations of all databases storing the conversations.
+
+    Parameters:
+    ----------
+        config (ConversationHistoryConfiguration): Conversation cache
+        configuration.
+
+    Returns:
+    -------
+        list[ConversationHistoryConfiguration]: One configuration per shard of
+        a sharded PostgreSQL cache, otherwise the given configuration.
+    """
+    if config.postgres is None or not config.postgres.shards:
+        return [config]
+    return [
+        config.model_copy(update={"postgres": shard})
+        for shard in shard_configurations(config.postgres)
+    ]
+
+
+def sweep(
+    caches: Sequence[Cache], retention: ConversationRetentionConfiguration
+) -> None:
+    """
+    Delete rows outside the retention policy once and publish metrics.
+
+    Errors are logged only, so the next run is attempted later. Table sizes
+    are published only when all shards of the cache have been swept.
+
+    Parameters:
+    ----------
+        caches (Sequence[Cache]): Conversation cache to be swept, one
+        instance per shard.
+        retention (ConversationRetentionConfiguration): Retention policy.
+    """
+    logger.info("Cache retention sweep started")
+    deleted: Counter[str] = Counter()
+    sizes: Counter[str] = Counter()
+    failed = False
+    for cache in caches:
+        try:
+            deleted.update(cache.apply_retention(retention))
+            sizes.update(cache.table_sizes())
+        except Exception as e:  # pylint: disable=broad-exception-caught
+            logger.error("Cache retention sweep error: %s", e)
+            failed = True
+    if failed and not deleted:
+        return
+    record_cache_retention(dict(deleted), {} if failed else dict(sizes))
+    logger.info("Cache retention sweep finished, deleted rows: %s", dict(deleted))
+
+
+def start_cache_retention_sweeper(configuration: Configuration) -> None:
+    """
+    Start the cache retention sweeper in a daemon thread when it is configured.
+
+    Parameters:
+    ----------
+        configuration (Configuration): Global configuration whose
+                                       `conversation_cache` attribute is
+                                       passed to the sweeper thread.
+    """
+    if configuration.conversation_cache.retention is None:
+        return
+    logger.info("Starting cache retention sweeper")
+    thread = Thread(
+        target=cache_retention_sweeper,
+        daemon=True,
+        args=(configuration.conversation_cache,),
+    )
+    thread.start()
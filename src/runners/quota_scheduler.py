@@ -1,25 +1,43 @@
 """User and cluster quota scheduler runner."""
 
+from datetime import UTC, datetime, timedelta
 from threading import Thread
 from time import sleep
 from typing import Any, Optional
+from uuid import uuid4
 
 import constants
 from log import get_logger
+from metrics.recording import record_quota_scheduler_run
 from models.config import (
     Configuration,
     QuotaHandlersConfiguration,
     QuotaLimiterConfiguration,
 )
+from quota import quota_tables
 from quota.connect_pg import connect_pg
 from quota.connect_sqlite import connect_sqlite
+from quota.exhausted_subjects import quota_revoked
+from quota.quota_shards import shard_parameters
 from quota.sql import (
-    CREATE_QUOTA_TABLE_PG,
-    CREATE_QUOTA_TABLE_SQLITE,
+    ACQUIRE_QUOTA_SCHEDULER_LEASE_SQLITE,
+    CREATE_QUOTA_RESERVATIONS_INDEX,
+    CREATE_QUOTA_RESERVATIONS_TABLE,
+    CREATE_QUOTA_SCHEDULER_LEASE_TABLE_SQLITE,
+    DELETE_EXPIRED_QUOTA_RESERVATIONS_SQLITE,
     INCREASE_QUOTA_STATEMENT_PG,
     INCREASE_QUOTA_STATEMENT_SQLITE,
+    INCREASE_SHARDS_QUOTA_STATEMENT_PG,
+    INCREASE_SHARDS_QUOTA_STATEMENT_SQLITE,
+    RECLAIM_QUOTA_RESERVATIONS_PG,
+    RECLAIM_QUOTA_RESERVATIONS_SQLITE,
     RESET_QUOTA_STATEMENT_PG,
     RESET_QUOTA_STATEMENT_SQLITE,
+    RESET_SHARDS_QUOTA_STATEMENT_PG,
+    RESET_SHARDS_QUOTA_STATEMENT_SQLITE,
+    SELECT_QUOTA_CHUNK_END_PG,
+    SELECT_QUOTA_CHUNK_END_SQLITE,
+    TRY_QUOTA_SCHEDULER_LOCK_PG,
 )
 
 logger = get_logger(__name__)
@@ -71,45 +89,42 @@ def quota_scheduler(config: QuotaHandlersConfiguration) -> bool:
         logger.warning("Can not connect to database, skipping")
         return False
 
-    create_quota_table: Optional[str] = None
-    if config.postgres is not None:
-        create_quota_table = CREATE_QUOTA_TABLE_PG
-    elif config.sqlite is not None:
-        create_quota_table = CREATE_QUOTA_TABLE_SQLITE
-
-    if create_quota_table is not None:
-        init_tables(connection, create_quota_table)
+    init_quota_tables(config, connection)
 
     period = config.scheduler.period
-
-    increase_quota_statement = get_increase_quota_statement(config)
-    reset_quota_statement = get_reset_quota_statement(config)
+    # identifies this scheduler in the lease row stored in SQLite database
+    holder = str(uuid4())
+    leader = False
 
     logger.info(
         "Quota scheduler started in separated thread with period set to %d seconds",
         period,
     )
 
-    while True:  # pylint: disable=too-many-nested-blocks
+    while True:
         logger.info("Quota scheduler sync started")
-        for limiter in config.limiters:
-            try:
-                if not connected(connection):
-                    # the old connection might be closed to avoid resource leaks
-                    try:
-                        if connection is not None:
-                            connection.close()
-                    except Exception:  # pylint: disable=broad-exception-caught
-                        pass  # Connection already dead
-                    connection = connect(config)
-                    if connection is None:
-                        logger.warning("Can not connect to database, skipping")
-                        continue
-                quota_revocation(
-                    connection, limiter, increase_quota_statement, reset_quota_statement
-                )
-            except Exception as e:  # pylint: disable=broad-exception-caught
-                logger.error("Quota revoke error: %s", e)
+        try:
+            if not connected(connection):
+                # the old connection might be closed to avoid resource leaks
+                try:
+                    if connection is not None:
+                        connection.close()
+                except Exception:  # pylint: disable=broad-exception-caught
+                    pass  # Connection already dead
+                # the advisory lock is released together with the old session
+                leader = False
+                connection = connect(config)
+            if connection is None:
+                logger.warning("Can not connect to database, skipping")
+            else:
+                leader = elect_scheduler(config, connection, holder, leader)
+        except Exception as e:  # pylint: disable=broad-exception-caught
+            logger.error("Quota scheduler election error: %s", e)
+            leader = False
+        if leader:
+            quota_sync(config, connection)
+        else:
+            logger.info("Quota is applied by scheduler of another process, skipping")
         logger.info("Quota scheduler sync finished")
         sleep(period)
     # unreachable code
@@ -117,6 +132,151 @@ def quota_scheduler(config: QuotaHandlersConfiguration) -> bool:
     return True
 
 
+def elect_scheduler(
+    config: QuotaHandlersConfiguration, connection: Any, holder: str, leader: bool
+) -> bool:
+    """
+    Elect the only quota scheduler applying quota periods in the database.
+
+    Parameters:
+    ----------
+        config (QuotaHandlersConfiguration): Configuration that indicates which
+        storage backend (SQLite or PostgreSQL) is in use.
+        connection (Any): Database connection object (Postgres or SQLite).
+        holder (str): Identifier of this scheduler.
+        leader (bool): Whether this scheduler has been elected by the
+        previous run using the same connection.
+
+    Returns:
+    -------
+        bool: `True` if this scheduler applies the quota periods.
+    """
+    return elect_leader(
+        connection,
+        holder,
+        leader,
+        postgres=config.postgres is not None,
+        lock_id=constants.QUOTA_SCHEDULER_ADVISORY_LOCK_ID,
+        lease_name=constants.QUOTA_SCHEDULER_LEASE_NAME,
+        period=config.scheduler.period,
+    )
+
+
+def elect_leader(  # pylint: disable=too-many-arguments
+    connection: Any,
+    holder: str,
+    leader: bool,
+    *,
+    postgres: bool,
+    lock_id: int,
+    lease_name: str,
+    period: int,
+) -> bool:
+    """
+    Elect the only process running a periodic task against the database.
+
+    In PostgreSQL, the process holding the session level advisory lock is
+    elected; the lock is released when its connection is closed. In SQLite,
+    the process holding the lease row is elected; the lease is renewed on
+    every run and it can be taken over by other process when it expires.
+
+    Parameters:
+    ----------
+        connection (Any): Database connection object (Postgres or SQLite).
+        holder (str): Identifier of this process.
+        leader (bool): Whether this process has been elected by the
+        previous run using the same connection.
+        postgres (bool): Whether the connection is made to PostgreSQL.
+        lock_id (int): ID of the PostgreSQL advisory lock.
+        lease_name (str): Name of the SQLite lease row.
+        period (int): Period of the task in seconds.
+
+    Returns:
+    -------
+        bool: `True` if this process runs the task.
+    """
+    # for compatibility with SQLite it is not possible to use context manager
+    # there
+    if postgres:
+        if leader:
+            # the lock is held until the session ends
+            return True
+        cursor = connection.cursor()
+        cursor.execute(TRY_QUOTA_SCHEDULER_LOCK_PG, (lock_id,))
+        row = cursor.fetchone()
+        elected = row is not None and bool(row[0])
+    else:
+        cursor = connection.cursor()
+        cursor.execute(
+            ACQUIRE_QUOTA_SCHEDULER_LEASE_SQLITE,
+            {
+                "name": lease_name,
+                "holder": holder,
+                "duration": f"+{lease_duration(period)} seconds",
+            },
+        )
+        elected = cursor.rowcount > 0
+    cursor.close()
+    connection.commit()
+    if elected and not leader:
+        logger.info("Process %s elected to run %s", holder, lease_name)
+    elif leader and not elected:
+        logger.warning("Process %s lost its %s lease", holder, lease_name)
+    return elected
+
+
+def lease_duration(period: int) -> int:
+    """
+    Return the number of seconds the lease of the SQLite scheduler is held.
+
+    Parameters:
+    ----------
+        period (int): Period of the scheduler in seconds.
+
+    Returns:
+    -------
+        int: Lease duration; the lease outlives two periods of the scheduler,
+        so it is renewed before it expires.
+    """
+    return max(constants.QUOTA_SCHEDULER_MIN_LEASE_DURATION, 2 * period)
+
+
+def quota_sync(config: QuotaHandlersConfiguration, connection: Any) -> None:
+    """
+    Apply all quota limiters and reclaim expired reservations once.
+
+    Errors are logged only, so the next run is attempted later. The run is
+    recorded in metrics only when no error occurred.
+
+    Parameters:
+    ----------
+        config (QuotaHandlersConfiguration): Quota limiters configuration.
+        connection (Any): Database connection object (Postgres or SQLite).
+    """
+    failed = False
+    for limiter in config.limiters:
+        try:
+            quota_revocation(
+                connection,
+                limiter,
+                get_increase_quota_statement(config, limiter.shards),
+                get_reset_quota_statement(config, limiter.shards),
+                get_quota_chunk_statement(config),
+                config.scheduler.chunk_size,
+            )
+        except Exception as e:  # pylint: disable=broad-exception-caught
+            logger.error("Quota revoke error: %s", e)
+            failed = True
+    if config.reservation is not None:
+        try:
+            reclaim_reservations(config, connection, config.reservation.timeout)
+        except Exception as e:  # pylint: disable=broad-exception-caught
+            logger.error("Quota reservations reclaim error: %s", e)
+            failed = True
+    if not failed:
+        record_quota_scheduler_run()
+
+
 def connected(connection: Any) -> bool:
     """Check if DB is still connected.
 
@@ -143,7 +303,9 @@ def connected(connection: Any) -> bool:
         return False
 
 
-def get_increase_quota_statement(config: QuotaHandlersConfiguration) -> str:
+def get_increase_quota_statement(
+    config: QuotaHandlersConfiguration, shards: int = 1
+) -> str:
     """
     Select the SQL statement used to increase stored quota according to the database backend.
 
@@ -151,34 +313,72 @@ def get_increase_quota_statement(config: QuotaHandlersConfiguration) -> str:
     ----------
         config (QuotaHandlersConfiguration): Configuration that indicates which
         storage backend (SQLite or PostgreSQL) is in use.
+        shards (int): Number of rows the quota is split into.
 
     Returns:
     -------
         str: SQL statement to perform a quota increase appropriate for the configured backend.
     """
+    if shards > 1:
+        if config.sqlite is not None:
+            return INCREASE_SHARDS_QUOTA_STATEMENT_SQLITE
+        return INCREASE_SHARDS_QUOTA_STATEMENT_PG
     if config.sqlite is not None:
         return INCREASE_QUOTA_STATEMENT_SQLITE
     return INCREASE_QUOTA_STATEMENT_PG
 
 
-def get_reset_quota_statement(config: QuotaHandlersConfiguration) -> str:
+def get_reset_quota_statement(
+    config: QuotaHandlersConfiguration, shards: int = 1
+) -> str:
     """
     Return the SQL statement used to reset quota records for the configured database backend.
 
+    Parameters:
+    ----------
+        config (QuotaHandlersConfiguration): Configuration that indicates which
+        storage backend (SQLite or PostgreSQL) is in use.
+        shards (int): Number of rows the quota is split into.
+
     Returns:
         str: The SQLite reset SQL statement when `config.sqlite` is set,
         otherwise the PostgreSQL reset SQL statement.
     """
+    if shards > 1:
+        if config.sqlite is not None:
+            return RESET_SHARDS_QUOTA_STATEMENT_SQLITE
+        return RESET_SHARDS_QUOTA_STATEMENT_PG
     if config.sqlite is not None:
         return RESET_QUOTA_STATEMENT_SQLITE
     return RESET_QUOTA_STATEMENT_PG
 
 
-def quota_revocation(
+def get_quota_chunk_statement(config: QuotaHandlersConfiguration) -> str:
+    """
+    Return the SQL statement selecting the end of a chunk of updated quota rows.
+
+    Parameters:
+    ----------
+        config (QuotaHandlersConfiguration): Configuration that indicates which
+        storage backend (SQLite or PostgreSQL) is in use.
+
+    Returns:
+    -------
+        str: The SQLite statement when `config.sqlite` is set, otherwise the
+        PostgreSQL statement.
+    """
+    if config.sqlite is not None:
+        return SELECT_QUOTA_CHUNK_END_SQLITE
+    return SELECT_QUOTA_CHUNK_END_PG
+
+
+def quota_revocation(  # pylint: disable=too-many-arguments,too-many-positional-arguments
     connection: Any,
     quota_limiter: QuotaLimiterConfiguration,
     increase_quota_statement: str,
     reset_quota_statement: str,
+    chunk_statement: Optional[str] = None,
+    chunk_size: int = constants.QUOTA_SCHEDULER_DEFAULT_CHUNK_SIZE,
 ) -> None:
     """
     Apply configured quota updates for a quota limiter using the provided database connection.
@@ -194,6 +394,10 @@ def quota_revocation(
         quota_limiter (QuotaLimiterConfiguration): Limiter configuration to process.
         increase_quota_statement (str): SQL statement used to increment quota values.
         reset_quota_statement (str): SQL statement used to reset quota values.
+        chunk_statement (Optional[str]): SQL statement selecting the end of a
+                                         chunk of updated rows; all rows are
+                                         updated by one statement when omitted.
+        chunk_size (int): Maximum number of rows updated by one statement.
 
     Raises:
     ------
@@ -220,6 +424,9 @@ def quota_revocation(
             subject_id,
             quota_limiter.quota_increase,
             quota_limiter.period,
+            quota_limiter.shards,
+            chunk_statement,
+            chunk_size,
         )
 
     if quota_limiter.initial_quota is not None and quota_limiter.initial_quota > 0:
@@ -229,15 +436,21 @@ def quota_revocation(
             subject_id,
             quota_limiter.initial_quota,
             quota_limiter.period,
+            quota_limiter.shards,
+            chunk_statement,
+            chunk_size,
         )
 
 
-def increase_quota(
+def increase_quota(  # pylint: disable=too-many-arguments,too-many-positional-arguments
     connection: Any,
     update_statement: str,
     subject_id: str,
     increase_by: int,
     period: str,
+    shards: int = 1,
+    chunk_statement: Optional[str] = None,
+    chunk_size: int = constants.QUOTA_SCHEDULER_DEFAULT_CHUNK_SIZE,
 ) -> None:
     """
     Increase the stored quota for a subject by a specified amount for a given period.
@@ -249,12 +462,19 @@ def increase_quota(
     ----------
         connection (Any): Database connection object (Postgres or SQLite) to
                           execute the statement on.
-        update_statement (str): SQL update statement that accepts parameters
-                                (increase_by, subject_id, period).
+        update_statement (str): SQL update statement that accepts named
+                                parameters (quota, subject, period and
+                                range of IDs or shard parameters).
         subject_id (str): Identifier for the subject whose quota is modified
                           (e.g., "u" for user, "c" for cluster).
         increase_by (int): Amount to add to the subject's quota.
         period (str): Quota period identifier used to scope the update.
+        shards (int): Number of rows the quota is split into; the amount is
+                      split among them.
+        chunk_statement (Optional[str]): SQL statement selecting the end of a
+                                         chunk of updated rows of unsharded
+                                         quota.
+        chunk_size (int): Maximum number of rows updated by one statement.
     """
     logger.info(
         "Increasing quota for subject '%s' by %d when period %s is reached",
@@ -263,28 +483,29 @@ def increase_quota(
         period,
     )
 
-    # for compatibility with SQLite it is not possible to use context manager
-    # there
-    cursor = connection.cursor()
-    cursor.execute(
+    changed = update_quota(
+        connection,
         update_statement,
-        (
-            increase_by,
-            subject_id,
-            period,
-        ),
+        quota_parameters(increase_by, subject_id, period, shards),
+        # the shards are updated together
+        chunk_statement if shards == 1 else None,
+        chunk_size,
     )
-    cursor.close()
-    connection.commit()
-    logger.info("Changed %d rows in database", cursor.rowcount)
+    logger.info("Changed %d rows in database", changed)
+    if changed > 0:
+        # subjects refused for exhausted quota may have quota again
+        quota_revoked(subject_id)
 
 
-def reset_quota(
+def reset_quota(  # pylint: disable=too-many-arguments,too-many-positional-arguments
     connection: Any,
     update_statement: str,
     subject_id: str,
     reset_to: int,
     period: str,
+    shards: int = 1,
+    chunk_statement: Optional[str] = None,
+    chunk_size: int = constants.QUOTA_SCHEDULER_DEFAULT_CHUNK_SIZE,
 ) -> None:
     """
     Set the stored quota for a subject to a specific value for the given period.
@@ -293,10 +514,17 @@ def reset_quota(
     ----------
         connection (Any): Database connection object used to execute the update.
         update_statement (str): SQL statement that sets the quota value
-                                (expects parameters: new_value, subject_id, period).
+                                (expects named parameters: quota, subject,
+                                period and range of IDs or shard parameters).
         subject_id (str): Identifier for the quota subject (e.g., "u" for user, "c" for cluster).
         reset_to (int): Value to set the subject's quota to.
         period (str): Period identifier for which the quota is being set.
+        shards (int): Number of rows the quota is split into; the value is
+                      split among them.
+        chunk_statement (Optional[str]): SQL statement selecting the end of a
+                                         chunk of updated rows of unsharded
+                                         quota.
+        chunk_size (int): Maximum number of rows updated by one statement.
     """
     logger.info(
         "Resetting quota for subject '%s' to %d when period %s is reached",
@@ -305,20 +533,192 @@ def reset_quota(
         period,
     )
 
+    changed = update_quota(
+        connection,
+        update_statement,
+        quota_parameters(reset_to, subject_id, period, shards),
+        # the shards are updated together
+        chunk_statement if shards == 1 else None,
+        chunk_size,
+    )
+    logger.info("Changed %d rows in database", changed)
+    if changed > 0:
+        # subjects refused for exhausted quota may have quota again
+        quota_revoked(subject_id)
+
+
+def update_quota(
+    connection: Any,
+    update_statement: str,
+    parameters: dict[str, Any],
+    chunk_statement: Optional[str],
+    chunk_size: int,
+) -> int:
+    """
+    Execute the statement increasing or resetting quota, chunk by chunk.
+
+    Every chunk is a range of at most `chunk_size` IDs and it is committed
+    separately, so the rows of the whole table are not locked at once.
+
+    Parameters:
+    ----------
+        connection (Any): Database connection object (Postgres or SQLite).
+        update_statement (str): SQL statement increasing or resetting quota.
+        parameters (dict[str, Any]): Parameters of the statement.
+        chunk_statement (Optional[str]): SQL statement selecting the end of a
+                                         chunk; all rows are updated by one
+                                         statement when omitted.
+        chunk_size (int): Maximum number of rows updated by one statement.
+
+    Returns:
+    -------
+        int: Number of changed rows.
+    """
+    changed = 0
     # for compatibility with SQLite it is not possible to use context manager
     # there
     cursor = connection.cursor()
-    cursor.execute(
-        update_statement,
-        (
-            reset_to,
-            subject_id,
-            period,
-        ),
-    )
-    cursor.close()
-    connection.commit()
-    logger.info("Changed %d rows in database", cursor.rowcount)
+    try:
+        while True:
+            end = None
+            if chunk_statement is not None:
+                cursor.execute(
+                    chunk_statement,
+                    {
+                        "subject": parameters["subject"],
+                        "start": parameters["start"],
+                        "chunk_size": chunk_size,
+                    },
+                )
+                row = cursor.fetchone()
+                if row is not None:
+                    end = row[0]
+            cursor.execute(update_statement, parameters | {"end": end})
+            changed += cursor.rowcount
+            connection.commit()
+            if end is None:
+                return changed
+            parameters = parameters | {"start": end}
+    finally:
+        cursor.close()
+
+
+def quota_parameters(
+    quota: int, subject_id: str, period: str, shards: int
+) -> dict[str, Any]:
+    """
+    Return parameters of the statement increasing or resetting quota.
+
+    Parameters:
+    ----------
+        quota (int): Amount the quota is increased by or reset to.
+        subject_id (str): Identifier for the quota subject.
+        period (str): Period identifier used to scope the update.
+        shards (int): Number of rows the quota is split into.
+
+    Returns:
+    -------
+        dict[str, Any]: Parameters of the statement updating unsharded quota
+        of all subjects (the range of IDs is narrowed by `update_quota`), or
+        parameters of the statement updating all shards of the quota.
+    """
+    if shards == 1:
+        return {
+            "quota": quota,
+            "subject": subject_id,
+            "period": period,
+            # the empty ID is the lowest one
+            "start": "",
+            "end": None,
+        }
+    parameters = shard_parameters(quota, shards)
+    parameters["subject"] = subject_id
+    parameters["period"] = period
+    return parameters
+
+
+def init_quota_tables(config: QuotaHandlersConfiguration, connection: Any) -> None:
+    """
+    Create the tables used by the quota limiters if they do not exist.
+
+    Parameters:
+    ----------
+        config (QuotaHandlersConfiguration): Configuration that indicates which
+        storage backend (SQLite or PostgreSQL) is in use and whether quota
+        reservations are enabled. The table with the scheduler lease is
+        created in SQLite database.
+        connection (Any): Database connection object (Postgres or SQLite).
+    """
+    if config.postgres is not None or config.sqlite is not None:
+        logger.info("Initializing tables for quota limiter")
+        cursor = connection.cursor()
+        quota_tables.create_quota_table(cursor, sqlite=config.postgres is None)
+        cursor.close()
+        connection.commit()
+    if config.postgres is None and config.sqlite is not None:
+        init_tables(connection, CREATE_QUOTA_SCHEDULER_LEASE_TABLE_SQLITE)
+    if config.reservation is not None:
+        init_tables(connection, CREATE_QUOTA_RESERVATIONS_TABLE)
+        init_tables(connection, CREATE_QUOTA_RESERVATIONS_INDEX)
+
+
+def reclaim_reservations(
+    config: QuotaHandlersConfiguration, connection: Any, timeout: int
+) -> None:
+    """
+    Return tokens reserved by requests that did not settle them to the quota.
+
+    Tokens are not returned when the quota has been reset since the
+    reservation, as the reset sets the quota for a new period. Tokens
+    reserved before the quota was increased are returned. Settled
+    reservations are deleted after the retention period, but not before the
+    timeout.
+
+    Parameters:
+    ----------
+        config (QuotaHandlersConfiguration): Configuration that indicates which
+        storage backend (SQLite or PostgreSQL) is in use.
+        connection (Any): Database connection object (Postgres or SQLite) used
+                          to reclaim the reservations.
+        timeout (int): Number of seconds after which reservations are reclaimed.
+    """
+    # for compatibility with SQLite it is not possible to use context manager
+    # there
+    retention = max(timeout, constants.QUOTA_RESERVATION_SETTLED_RETENTION)
+    cursor = connection.cursor()
+    if config.sqlite is not None:
+        # SQLite does not support data-modifying CTEs, both statements are
+        # executed in one transaction instead
+        # timestamps are stored in UTC without time zone in SQLite
+        now = datetime.now(tz=UTC).replace(tzinfo=None)
+        expired_at = (now - timedelta(seconds=timeout)).isoformat()
+        retained_until = (now - timedelta(seconds=retention)).isoformat()
+        try:
+            cursor.execute("BEGIN IMMEDIATE")
+            cursor.execute(
+                RECLAIM_QUOTA_RESERVATIONS_SQLITE, {"expired_at": expired_at}
+            )
+            cursor.execute(
+                DELETE_EXPIRED_QUOTA_RESERVATIONS_SQLITE,
+                {"expired_at": expired_at, "retained_until": retained_until},
+            )
+            reclaimed = cursor.rowcount
+            cursor.execute("COMMIT")
+        except Exception:
+            cursor.execute("ROLLBACK")
+            raise
+        finally:
+            cursor.close()
+    else:
+        cursor.execute(
+            RECLAIM_QUOTA_RESERVATIONS_PG,
+            {"timeout": timeout, "retention": retention},
+        )
+        reclaimed = cursor.rowcount
+        cursor.close()
+        connection.commit()
+    if reclaimed:
+        logger.info("Reclaimed quota reservations, changed %d rows", reclaimed)
 
 
 def get_subject_id(limiter_type: str) -> str:
@@ -0,0 +1,206 @@
+"""Offline tool moving conversations of users to their PostgreSQL shards.
+
+Conversations are stored in the shard chosen by the user ID, see
+`utils.shards`. When shards are added or removed, or when a database starts
+to be sharded, conversations of some users are stored elsewhere and have to
+be moved. The tool is run while the service is stopped. For every user found
+outside of their shard, the rows of the user are copied to the shard in one
+transaction and deleted from the original database afterwards; rows already
+present in the shard are kept, so an interrupted run can simply be repeated.
+"""
+
+from collections.abc import Callable, Sequence
+from dataclasses import dataclass
+
+from sqlalchemy import ColumnElement, Engine, Table, delete, inspect, select
+from sqlalchemy.dialects.postgresql import insert
+
+import constants
+from app.database import _create_postgres_engine
+from cache.async_postgres_cache import cache_table, conversations_table, summaries_table
+from cache.postgres_cache import PostgresCache
+from log import get_logger
+from models.config import Configuration, PostgreSQLDatabaseConfiguration
+from models.database.base import Base
+from models.database.conversations import UserConversation, UserTurn
+from utils.shards import shard_configurations, shard_index
+
+logger = get_logger(__name__)
+
+
+@dataclass(frozen=True)
+class ShardedTable:
+    """Table whose rows are stored in the shard of the user owning them."""
+
+    table: Table
+    # condition selecting rows owned by the given user
+    owned_by: Callable[[str], ColumnElement[bool]]
+
+
+def _owned_by_user(table: Table) -> Callable[[str], ColumnElement[bool]]:
+    """Return condition selecting rows of the table by their user_id column."""
+    return lambda user_id: table.c.user_id == user_id
+
+
+user_conversation_table = Base.metadata.tables[UserConversation.__tablename__]
+user_turn_table = Base.metadata.tables[UserTurn.__tablename__]
+
+# parent tables come first, rows are copied in this order and deleted in
+# the reversed one; owners are listed from the first table
+DATABASE_TABLES = [
+    ShardedTable(user_conversation_table, _owned_by_user(user_conversation_table)),
+    ShardedTable(
+        user_turn_table,
+        lambda user_id: user_turn_table.c.conversation_id.in_(
+            select(UserConversation.id).where(UserConversation.user_id == user_id)
+        ),
+    ),
+]
+
+CACHE_TABLES = [
+    ShardedTable(table, _owned_by_user(table))
+    for table in (conversations_table, cache_table, summaries_table)
+]
+
+
+def _create_database_schema(engine: Engine) -> None:
+    """Create tables of the service database."""
+    Base.metadata.create_all(engine)
+
+
+def _create_cache_schema(engine: Engine) -> None:
+    """Create tables of the conversation cache, as PostgresCache does."""
+    with engine.begin() as connection:
+        for statement in (
+            PostgresCache.CREATE_CACHE_TABLE,
+            PostgresCache.CREATE_CONVERSATIONS_TABLE,
+            PostgresCache.CREATE_CONVERSATION_SUMMARIES_TABLE,
+            PostgresCache.CREATE_INDEX,
+            PostgresCache.CREATE_CONVERSATIONS_INDEX,
+        ):
+            connection.exec_driver_sql(statement)
+
+
+def _database_key(config: PostgreSQLDatabaseConfiguration) -> tuple[str, int, str]:
+    """Return identification of the database the configuration connects to."""
+    return (config.host, config.port, config.db)
+
+
+def _stored_users(engine: Engine, owners: Table) -> Sequence[str]:
+    """Return IDs of users owning rows of the table in the database."""
+    with engine.connect() as connection:
+        if not inspect(connection).has_table(owners.name):
+            return []
+        return connection.scalars(select(owners.c.user_id).distinct()).all()
+
+
+def move_user(
+    user_id: str, tables: Sequence[ShardedTable], source: Engine, target: Engine
+) -> None:
+    """Move all rows of the user from the source database to the target one.
+
+    Parameters:
+    ----------
+        user_id: User whose rows are moved.
+        tables: Tables storing rows of the user, parent tables first.
+        source: Engine of the database the rows are stored in.
+        target: Engine of the shard of the user.
+    """
+    with source.connect() as source_connection, target.begin() as target_connection:
+        for sharded in tables:
+            rows = source_connection.execution_options(
+                yield_per=constants.RESHARD_BATCH_SIZE
+            ).execute(select(sharded.table).where(sharded.owned_by(user_id)))
+            for batch in rows.mappings().partitions():
+                target_connection.execute(
+                    insert(sharded.table).on_conflict_do_nothing(),
+                    [dict(row) for row in batch],
+                )
+    # the rows are deleted only after they have been committed in the shard
+    with source.begin() as source_connection:
+        for sharded in reversed(tables):
+            source_connection.execute(
+                delete(sharded.table).where(sharded.owned_by(user_id))
+            )
+
+
+def reshard(
+    config: PostgreSQLDatabaseConfiguration,
+    tables: Sequence[ShardedTable],
+    create_schema: Callable[[Engine], None],
+) -> int:
+    """Move users stored outside of their shards to the shards.
+
+    Users are looked up in all shards and in the primary database, which
+    stores the conversations of the database used before sharding.
+
+    Parameters:
+    ----------
+        config: Configuration of the sharded PostgreSQL database.
+        tables: Tables storing rows of users, parent tables first.
+        create_schema: Function creating the tables in a shard.
+
+    Returns:
+    -------
+        Number of moved users.
+    """
+    shards = shard_configurations(config)
+    names = [shard.name for shard in config.shards]
+    keys = [_database_key(shard) for shard in shards]
+    shard_engines = [_create_postgres_engine(shard) for shard in shards]
+    sources = list(zip(keys, shard_engines))
+    # the primary database is skipped when it is one of the shards
+    if _database_key(config) not in keys:
+        sources.append((_database_key(config), _create_postgres_engine(config)))
+
+    moved = 0
+    try:
+        for engine in shard_engines:
+            create_schema(engine)
+        for key, source in sources:
+            for user_id in _stored_users(source, tables[0].table):
+                target = shard_index(user_id, names)
+                if keys[target] == key:
+                    continue
+                logger.info(
+                    "Moving rows of user %s from %s to shard %s",
+                    user_id,
+                    key[0],
+                    names[target],
+                )
+                move_user(user_id, tables, source, shard_engines[target])
+                moved += 1
+    finally:
+        for _, engine in sources:
+            engine.dispose()
+    return moved
+
+
+def reshard_storages(configuration: Configuration) -> int:
+    """Move conversations of users to their shards in all sharded storages.
+
+    The service database and the PostgreSQL conversation cache are resharded
+    when they have shards configured.
+
+    Parameters:
+    ----------
+        configuration (Configuration): Global configuration.
+
+    Returns:
+    -------
+        Number of users moved, counted once per storage.
+    """
+    moved = 0
+    database = configuration.database.postgres
+    if database is not None and database.shards:
+        logger.info("Resharding database")
+        moved += reshard(database, DATABASE_TABLES, _create_database_schema)
+    cache = configuration.conversation_cache
+    if (
+        cache.type == constants.CACHE_TYPE_POSTGRES
+        and cache.postgres is not None
+        and cache.postgres.shards
+    ):
+        logger.info("Resharding conversation cache")
+        moved += reshard(cache.postgres, CACHE_TABLES, _create_cache_schema)
+    return moved
@@ -286,13 +286,18 @@ async def generate_agent_response(  # pylint: disable=too-many-statements
             root_span.end()
         return
     logger.info("Consuming tokens")
-    consume_query_tokens(
+    await asyncio.to_thread(
+        consume_query_tokens,
         user_id=context.user_id,
         model_id=responses_params.model,
         token_usage=turn_summary.token_usage,
+        quota_reservations=context.quota_reservations,
     )
+    # settled reservations are not released when the stream is closed
+    context.quota_reservations = []
     logger.info("Getting available quotas")
-    available_quotas = get_available_quotas(
+    available_quotas = await asyncio.to_thread(
+        get_available_quotas,
         quota_limiters=configuration.quota_limiters,
         user_id=context.user_id,
     )
@@ -306,7 +311,7 @@ async def generate_agent_response(  # pylint: disable=too-many-statements
 
     completed_at = datetime.datetime.now(datetime.UTC).strftime("%Y-%m-%dT%H:%M:%SZ")
     logger.info("Storing query results")
-    store_query_results(
+    await store_query_results(
         user_id=context.user_id,
         conversation_id=context.conversation_id,
         model=responses_params.model,
@@ -1,14 +1,41 @@
-"""Decorator that makes sure the object is 'connected' according to it's connected predicate."""
+"""Decorator that makes sure the object is 'connected' according to it's connected predicate.
 
-from collections.abc import Callable
+Connection health is tracked passively: `connected()` is expected to be a
+cheap check that performs no I/O, and a lost connection is detected by the
+wrapped method failing with one of the errors listed in the connectable's
+`disconnect_errors` class attribute. In such case the decorator reconnects
+and retries the method once.
+
+Storages using PostgreSQL keep a shared `PostgresConnectionPool` in their
+`connection` attribute; the decorator leases a pooled connection to the
+current thread for the duration of the wrapped method. Storages sharing one
+dedicated connection (SQLite) between request handlers and background threads
+keep a reentrant lock in their `connection_lock` attribute; the decorator holds
+it for the duration of the wrapped method, so the connection is never used by
+two threads at once.
+
+Idle connections can optionally be kept alive and checked by
+`ConnectionHeartbeat`, which periodically calls a probe in a background thread.
+"""
+
+from collections.abc import Callable, Iterator
+from contextlib import AbstractContextManager, contextmanager, nullcontext
+from threading import Event, Thread
 from typing import (
     Concatenate,
+    Optional,
     ParamSpec,
     Protocol,
     TypeVar,
     runtime_checkable,
 )
 
+from log import get_logger
+from metrics.recording import record_storage_reconnect
+from utils.postgres_pool import PostgresConnectionPool
+
+logger = get_logger(__name__)
+
 P = ParamSpec("P")
 R = TypeVar("R")
 S = TypeVar("S", bound="Connectable")  # the method's self type
@@ -19,13 +46,88 @@ class Connectable(Protocol):
     """Any class that implements methods connected and connect."""
 
     def connected(self) -> bool:
-        """Check if DB is connected."""
+        """Check if DB is connected; must not perform any I/O."""
         return False
 
     def connect(self) -> None:
         """Connect or reconnect the database."""
 
 
+def is_disconnect_error(connectable: object, error: BaseException) -> bool:
+    """Check if the error means that connection to database has been lost.
+
+    Storages often wrap driver errors into their own exception types, so the
+    direct cause of the error is checked as well.
+
+    Parameters:
+    ----------
+        connectable: Object whose `disconnect_errors` attribute lists
+        exception types signalling a lost connection.
+        error: The exception raised by a wrapped method.
+
+    Returns:
+    -------
+        bool: True if the error or its direct cause is a disconnect error.
+    """
+    disconnect_errors = getattr(connectable, "disconnect_errors", ())
+    return isinstance(error, disconnect_errors) or isinstance(
+        error.__cause__, disconnect_errors
+    )
+
+
+def connection_pool(connectable: object) -> Optional[PostgresConnectionPool]:
+    """Return connection pool used by the connectable, if any.
+
+    Parameters:
+    ----------
+        connectable: Object storing its connection in `connection` attribute.
+
+    Returns:
+    -------
+        The pool, or None when the object uses a dedicated connection.
+    """
+    pool = getattr(connectable, "connection", None)
+    if isinstance(pool, PostgresConnectionPool):
+        return pool
+    return None
+
+
+def connection_lock(connectable: object) -> AbstractContextManager[object]:
+    """Return lock serializing use of the dedicated connection of the connectable.
+
+    Parameters:
+    ----------
+        connectable: Object storing its connection in `connection` attribute
+        and, when the connection is shared by threads, its lock in
+        `connection_lock` attribute.
+
+    Returns:
+    -------
+        The lock, or a context doing nothing when the object uses a
+        connection pool or its connection is not shared by threads.
+    """
+    lock = getattr(connectable, "connection_lock", None)
+    if lock is None or connection_pool(connectable) is not None:
+        return nullcontext()
+    return lock
+
+
+@contextmanager
+def leased_connection(connectable: object) -> Iterator[None]:
+    """Lease a pooled connection to the current thread if the connectable uses a pool.
+
+    Parameters:
+    ----------
+        connectable: Object storing its connection in `connection` attribute.
+    """
+    pool = connection_pool(connectable)
+    if pool is None:
+        yield
+        return
+    with pool.lease():
+        yield
+
+
 def connection(
     f: Callable[Concatenate[S, P], R],
 ) -> Callable[..., R]:
@@ -34,7 +136,11 @@ def connection(
 
     The returned wrapper calls `connectable.connected()` and, if that returns
     `False`, calls `connectable.connect()` prior to delegating to the original
-    method.
+    method. The method runs with a pooled connection leased to the current
+    thread when the connectable uses a connection pool, otherwise with the
+    lock of its dedicated connection held, if any. If the method fails
+    because the connection has been lost, the wrapper reconnects and calls the
+    method once more.
 
     Parameters:
     ----------
@@ -70,8 +176,102 @@ def connection(
         -------
                 Any: The value returned by the wrapped callable.
         """
-        if not self.connected():
-            self.connect()
-        return f(self, *args, **kwargs)
+        with connection_lock(self):
+            pool = connection_pool(self)
+            if pool is not None and pool.leased():
+                # nested call, lost connection is handled by the outermost one
+                return f(self, *args, **kwargs)
+            if not self.connected():
+                self.connect()
+            try:
+                with leased_connection(self):
+                    return f(self, *args, **kwargs)
+            except Exception as e:  # pylint: disable=broad-exception-caught
+                if not is_disconnect_error(self, e):
+                    raise
+                storage = type(self).__name__
+                logger.warning(
+                    "%s.%s: connection to storage lost, reconnecting: %s",
+                    storage,
+                    f.__name__,
+                    e,
+                )
+                try:
+                    self.connect()
+                except Exception:
+                    record_storage_reconnect(storage, f.__name__, False)
+                    raise
+                record_storage_reconnect(storage, f.__name__, True)
+            with leased_connection(self):
+                return f(self, *args, **kwargs)
 
     return wrapper
+
+
+class ConnectionHeartbeat:
+    """Background thread that periodically checks a storage connection.
+
+    The probe is expected to be a method decorated by `connection`, so a lost
+    connection is re-established by the probe itself.
+    """
+
+    def __init__(self, name: str, probe: Callable[[], None], interval: float) -> None:
+        """Create a new, not yet started, heartbeat.
+
+        Parameters:
+        ----------
+            name: Name of the checked storage, used in logs and thread name.
+            probe: Callable performing a trivial query on the connection.
+            interval: Number of seconds between two probes.
+        """
+        self.name = name
+        self.interval = interval
+        self._probe = probe
+        self._stopped = Event()
+        self._thread = Thread(target=self._run, name=f"{name} heartbeat", daemon=True)
+
+    def start(self) -> None:
+        """Start the heartbeat thread."""
+        logger.info(
+            "Starting connection heartbeat for %s every %s seconds",
+            self.name,
+            self.interval,
+        )
+        self._thread.start()
+
+    def stop(self) -> None:
+        """Stop the heartbeat thread and wait for it to finish."""
+        self._stopped.set()
+        if self._thread.is_alive():
+            self._thread.join()
+
+    def _run(self) -> None:
+        """Call the probe until the heartbeat is stopped."""
+        while not self._stopped.wait(self.interval):
+            try:
+                self._probe()
+            except Exception as e:  # pylint: disable=broad-exception-caught
+                # the next probe will try to reconnect again
+                logger.warning("Connection heartbeat for %s failed: %s", self.name, e)
+
+
+def start_heartbeat(
+    name: str, probe: Callable[[], None], interval: Optional[float]
+) -> Optional[ConnectionHeartbeat]:
+    """Start connection heartbeat if the interval is configured.
+
+    Parameters:
+    ----------
+        name: Name of the checked storage, used in logs and thread name.
+        probe: Callable performing a trivial query on the connection.
+        interval: Number of seconds between two probes; None disables heartbeat.
+
+    Returns:
+    -------
+        The started heartbeat, or None when heartbeat is disabled.
+    """
+    if interval is None:
+        return None
+    heartbeat = ConnectionHeartbeat(name, probe, interval)
+    heartbeat.start()
+    return heartbeat
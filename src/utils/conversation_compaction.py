@@ -51,7 +51,7 @@ from ogx_api.openai_responses import OpenAIResponseMessage
 from ogx_client import AsyncOgxClient
 from ogx_client.types.conversations.item_create_params import Item
 
-from cache.cache import Cache
+from cache.async_cache import AsyncCache
 from cache.cache_error import CacheError
 from configuration import configuration
 from log import get_logger
@@ -289,8 +289,8 @@ async def _write_summary_marker(
     )
 
 
-def _read_cached_summaries(
-    cache: Optional[Cache],
+async def _read_cached_summaries(
+    cache: Optional[AsyncCache],
     user_id: str,
     conversation_id: str,
     skip_user_id_check: bool,
@@ -306,14 +306,14 @@ def _read_cached_summaries(
     if cache is None:
         return []
     try:
-        return cache.get_summaries(user_id, conversation_id, skip_user_id_check)
+        return await cache.get_summaries(user_id, conversation_id, skip_user_id_check)
     except CacheError as exc:  # markers remain a valid fallback
         logger.warning("compaction: cache get_summaries failed: %s", exc)
         return []
 
 
-def _store_cached_summary(
-    cache: Optional[Cache],
+async def _store_cached_summary(
+    cache: Optional[AsyncCache],
     user_id: str,
     conversation_id: str,
     summary: ConversationSummary,
@@ -328,12 +328,12 @@ def _store_cached_summary(
     if cache is None:
         return
     try:
-        cache.store_summary(user_id, conversation_id, summary, skip_user_id_check)
+        await cache.store_summary(user_id, conversation_id, summary, skip_user_id_check)
     except CacheError as exc:  # the marker write already preserved the summary
         logger.warning("compaction: cache store_summary failed: %s", exc)
 
 
-def configured_conversation_cache() -> Optional[Cache]:
+def configured_conversation_cache() -> Optional[AsyncCache]:
     """Return the conversation cache for compaction, or None when not applicable.
 
     Endpoints pass this to :func:`apply_compaction` / :func:`apply_compaction_blocking`.
@@ -347,7 +347,7 @@ def configured_conversation_cache() -> Optional[Cache]:
         return None
     if configuration.conversation_cache_configuration.type is None:
         return None
-    return configuration.conversation_cache
+    return configuration.async_conversation_cache
 
 
 def _estimate_response_input_tokens(value: ResponseInput, encoding_name: str) -> int:
@@ -377,9 +377,9 @@ def _should_compact(
     return estimated_tokens > threshold and estimated_tokens > config.token_floor
 
 
-def _load_compaction_state(
+async def _load_compaction_state(
     items: list[Any],
-    cache: Optional[Cache],
+    cache: Optional[AsyncCache],
     user_id: str,
     conversation_id: str,
     skip_user_id_check: bool,
@@ -393,7 +393,7 @@ def _load_compaction_state(
 
     Returns ``(summaries, cached_summaries, recent_items)``.
     """
-    cached_summaries = _read_cached_summaries(
+    cached_summaries = await _read_cached_summaries(
         cache, user_id, conversation_id, skip_user_id_check
     )
     summaries = (
@@ -424,20 +424,22 @@ async def _persist_new_summary_chunk(  # pylint: disable=too-many-arguments,too-
     client: AsyncOgxClient,
     conversation_id: str,
     summary: ConversationSummary,
-    cache: Optional[Cache],
+    cache: Optional[AsyncCache],
     user_id: str,
     skip_user_id_check: bool,
 ) -> None:
     """Persist a fresh summary chunk: write the Llama Stack marker + best-effort cache."""
     await _write_summary_marker(client, conversation_id, summary.summary_text)
-    _store_cached_summary(cache, user_id, conversation_id, summary, skip_user_id_check)
+    await _store_cached_summary(
+        cache, user_id, conversation_id, summary, skip_user_id_check
+    )
 
 
 async def _maybe_persist_fold(  # pylint: disable=too-many-arguments,too-many-positional-arguments
     client: AsyncOgxClient,
     model: str,
     conversation_id: str,
-    cache: Optional[Cache],
+    cache: Optional[AsyncCache],
     user_id: str,
     skip_user_id_check: bool,
     cached_summaries: list[ConversationSummary],
@@ -467,7 +469,9 @@ async def _maybe_persist_fold(  # pylint: disable=too-many-arguments,too-many-po
         client, model, cached_summaries, encoding_name
     )
     try:
-        cache.replace_summaries(user_id, conversation_id, folded, skip_user_id_check)
+        await cache.replace_summaries(
+            user_id, conversation_id, folded, skip_user_id_check
+        )
     except CacheError as exc:  # keep the unfolded summaries
         logger.warning("compaction: cache replace_summaries failed: %s", exc)
         return summaries, cached_summaries
@@ -497,7 +501,7 @@ async def apply_compaction(  # pylint: disable=too-many-arguments,too-many-posit
     compaction_config: CompactionConfiguration,
     emit_events: bool = False,
     encoding_name: str = DEFAULT_ENCODING_NAME,
-    cache: Optional[Cache] = None,
+    cache: Optional[AsyncCache] = None,
     user_id: str = "",
     skip_user_id_check: bool = False,
 ) -> AsyncIterator[Any]:
@@ -547,7 +551,7 @@ async def apply_compaction(  # pylint: disable=too-many-arguments,too-many-posit
 
     async with _conversation_lock(conversation_id):
         items = await get_all_conversation_items(client, conversation_id)
-        summaries, cached_summaries, recent_items = _load_compaction_state(
+        summaries, cached_summaries, recent_items = await _load_compaction_state(
             items, cache, user_id, conversation_id, skip_user_id_check
         )
 
@@ -621,7 +625,7 @@ async def apply_compaction_blocking(  # pylint: disable=too-many-arguments,too-m
     inference_config: InferenceConfiguration,
     compaction_config: CompactionConfiguration,
     encoding_name: str = DEFAULT_ENCODING_NAME,
-    cache: Optional[Cache] = None,
+    cache: Optional[AsyncCache] = None,
     user_id: str = "",
     skip_user_id_check: bool = False,
 ) -> CompactionResult:
@@ -0,0 +1,163 @@
+"""In-process cache of conversation records read on the query hot path."""
+
+from collections import OrderedDict
+from time import monotonic
+from typing import Any, Optional
+
+from sqlalchemy import inspect
+
+import constants
+from models.database.conversations import UserConversation
+
+# attributes mapped to columns of the user_conversation table
+_COLUMNS = tuple(attr.key for attr in inspect(UserConversation).column_attrs)
+
+
+class ConversationMetadataCache:
+    """Bounded TTL cache of user conversation records.
+
+    Query endpoints read the conversation record (owner, last used model and
+    provider, last response ID) on every follow-up turn. Recently used
+    records are kept in process memory, so the ownership check and the model
+    selection do not need a database round trip. At most `max_entries`
+    records are kept; the least recently used ones are evicted first.
+    Records are invalidated by every change made by this process and they
+    expire after `ttl` seconds, which bounds how long changes made by other
+    processes stay invisible.
+
+    Records are returned as new transient UserConversation objects, so
+    callers are free to modify them.
+    """
+
+    def __init__(self, max_entries: int, ttl: float) -> None:
+        """Create empty cache.
+
+        Parameters:
+        ----------
+            max_entries: Maximal number of cached conversation records.
+            ttl: Number of seconds after which a cached record expires.
+        """
+        self.max_entries = max_entries
+        self.ttl = ttl
+        # conversation ID -> (expiration time, column values), least recent first
+        self._entries: OrderedDict[str, tuple[float, dict[str, Any]]] = OrderedDict()
+        # reads in progress; a change of the conversation drops its token,
+        # so records read before the change are not cached
+        self._loading: dict[str, object] = {}
+
+    def __len__(self) -> int:
+        """Return number of cached conversation records."""
+        return len(self._entries)
+
+    def get(self, conversation_id: str) -> Optional[UserConversation]:
+        """Return cached conversation record, or None if not cached.
+
+        Parameters:
+        ----------
+            conversation_id: Normalized conversation ID.
+
+        Returns:
+        -------
+            Copy of the cached conversation record or None.
+        """
+        cached = self._entries.get(conversation_id)
+        if cached is None:
+            return None
+        if cached[0] <= monotonic():
+            del self._entries[conversation_id]
+            return None
+        self._entries.move_to_end(conversation_id)
+        return UserConversation(**cached[1])
+
+    def start_loading(self, conversation_id: str) -> object:
+        """Register read of a conversation record missing in the cache.
+
+        Parameters:
+        ----------
+            conversation_id: Normalized conversation ID.
+
+        Returns:
+        -------
+            Token to be passed to `store` or `cancel_loading`.
+        """
+        token = object()
+        self._loading[conversation_id] = token
+        return token
+
+    def store(
+        self,
+        conversation_id: str,
+        token: object,
+        conversation: Optional[UserConversation],
+    ) -> None:
+        """Cache record read from database unless it has changed meanwhile.
+
+        Missing conversations are not cached, they are usually created by the
+        request which looked them up.
+
+        Parameters:
+        ----------
+            conversation_id: Normalized conversation ID.
+            token: Token returned by `start_loading`.
+            conversation: Record read from database, or None if not found.
+        """
+        if self._loading.get(conversation_id) is not token:
+            return
+        del self._loading[conversation_id]
+        if conversation is not None:
+            self._put(conversation)
+
+    def cancel_loading(self, conversation_id: str, token: object) -> None:
+        """Unregister read that failed.
+
+        Parameters:
+        ----------
+            conversation_id: Normalized conversation ID.
+            token: Token returned by `start_loading`.
+        """
+        if self._loading.get(conversation_id) is token:
+            del self._loading[conversation_id]
+
+    def update(self, conversation: UserConversation) -> None:
+        """Replace cached record by the record written to database.
+
+        Concurrent turns of the same conversation can finish in any order,
+        so the record with the highest message count is kept.
+
+        Parameters:
+        ----------
+            conversation: Record as returned by the database write.
+        """
+        self._loading.pop(conversation.id, None)
+        cached = self._entries.get(conversation.id)
+        if cached is None or cached[1]["message_count"] <= conversation.message_count:
+            self._put(conversation)
+
+    def _put(self, conversation: UserConversation) -> None:
+        """Cache the record and evict the least recently used ones."""
+        values = {column: getattr(conversation, column) for column in _COLUMNS}
+        self._entries[conversation.id] = (monotonic() + self.ttl, values)
+        self._entries.move_to_end(conversation.id)
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+
+    def invalidate(self, conversation_id: str) -> None:
+        """Drop cached record of the conversation.
+
+        Parameters:
+        ----------
+            conversation_id: Normalized conversation ID.
+        """
+        self._entries.pop(conversation_id, None)
+        self._loading.pop(conversation_id, None)
+
+    def clear(self) -> None:
+        """Drop all cached records."""
+        self._entries.clear()
+        self._loading.clear()
+
+
+conversation_metadata_cache = ConversationMetadataCache(
+    constants.CONVERSATION_METADATA_CACHE_MAX_ENTRIES,
+    constants.CONVERSATION_METADATA_CACHE_TTL,
+)
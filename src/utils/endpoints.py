@@ -1,13 +1,15 @@
 """Utility functions for endpoint handlers."""
 
+from datetime import datetime
 from typing import Any, Optional
 
 from fastapi import HTTPException
 from pydantic import AnyUrl, ValidationError
+from sqlalchemy import Select, select, tuple_
 from sqlalchemy.exc import SQLAlchemyError
 
 import constants
-from app.database import get_session
+from app.database import get_async_session, get_async_sessions
 from client import AsyncOgxClientHolder
 from configuration import AppConfig, LogicError
 from log import get_logger
@@ -21,13 +23,16 @@ from models.common.responses.responses_conversation_context import (
 )
 from models.common.turn_summary import RAGChunk, ReferencedDocument, TurnSummary
 from models.database.conversations import UserConversation, UserTurn
+from utils.conversation_metadata_cache import conversation_metadata_cache
+from utils.persistence_pipeline import get_persistence_pipeline
+from utils.read_replicas import record_user_write
 from utils.responses import create_new_conversation
 from utils.suid import normalize_conversation_id, to_llama_stack_conversation_id
 
 logger = get_logger(__name__)
 
 
-def delete_conversation(conversation_id: str) -> bool:
+async def delete_conversation(conversation_id: str) -> bool:
     """Delete a conversation from the local database by its ID.
 
     Args:
@@ -36,40 +41,105 @@ def delete_conversation(conversation_id: str) -> bool:
     Returns:
         bool: True if the conversation was deleted, False if it was not found.
     """
-    with get_session() as session:
-        db_conversation = (
-            session.query(UserConversation).filter_by(id=conversation_id).first()
-        )
-        if db_conversation:
-            session.delete(db_conversation)
-            session.commit()
-            logger.info("Deleted conversation %s from local database", conversation_id)
-            return True
-        logger.info(
-            "Conversation %s not found in local database, it may have already been deleted",
-            conversation_id,
-        )
-        return False
+    for session in get_async_sessions():
+        async with session:
+            db_conversation = await session.get(UserConversation, conversation_id)
+            if db_conversation:
+                await session.delete(db_conversation)
+                await session.commit()
+                conversation_metadata_cache.invalidate(conversation_id)
+                record_user_write(db_conversation.user_id)
+                logger.info(
+                    "Deleted conversation %s from local database", conversation_id
+                )
+                return True
+    logger.info(
+        "Conversation %s not found in local database, it may have already been deleted",
+        conversation_id,
+    )
+    return False
+
 
+async def _find_conversation(
+    conversation_id: str, user_id: Optional[str], read_only: bool
+) -> Optional[UserConversation]:
+    """Find a conversation in the databases storing conversations.
 
-def retrieve_conversation(conversation_id: str) -> Optional[UserConversation]:
+    The shard of the user is searched first, as users usually access their
+    own conversations.
+
+    Args:
+        conversation_id (str): The unique identifier of the conversation.
+        user_id (Optional[str]): User accessing the conversation.
+        read_only (bool): Whether the conversation may be read from a read
+            replica.
+
+    Returns:
+        Optional[UserConversation]: The conversation object if found, otherwise None.
+    """
+    for session in get_async_sessions(user_id, read_only):
+        async with session:
+            conversation = await session.get(UserConversation, conversation_id)
+            if conversation is not None:
+                return conversation
+    return None
+
+
+async def retrieve_conversation(
+    conversation_id: str, user_id: Optional[str] = None, read_only: bool = False
+) -> Optional[UserConversation]:
     """Retrieve a conversation from the database by its ID.
 
+    Recently used conversations are served from the in-process conversation
+    metadata cache. Turns of the conversation queued in the persistence
+    pipeline are persisted first.
+
+    Read-only retrievals may be served by a read replica. Conversations read
+    from a replica can be slightly stale, so they are not cached.
+
     Args:
         conversation_id (str): The unique identifier of the conversation to retrieve.
+        user_id (Optional[str]): User retrieving the conversation, whose shard
+            is searched first.
+        read_only (bool): Whether the conversation is only checked or
+            displayed, not modified afterwards.
 
     Returns:
         Optional[UserConversation]: The conversation object if found, otherwise None.
     """
-    with get_session() as session:
-        return session.query(UserConversation).filter_by(id=conversation_id).first()
+    pipeline = get_persistence_pipeline()
+    if pipeline is not None:
+        await pipeline.wait_for_conversation(conversation_id)
+
+    conversation = conversation_metadata_cache.get(conversation_id)
+    if conversation is not None:
+        return conversation
+
+    if read_only and user_id is not None:
+        return await _find_conversation(conversation_id, user_id, read_only=True)
 
+    token = conversation_metadata_cache.start_loading(conversation_id)
+    try:
+        conversation = await _find_conversation(
+            conversation_id, user_id, read_only=False
+        )
+    except BaseException:
+        conversation_metadata_cache.cancel_loading(conversation_id, token)
+        raise
+    conversation_metadata_cache.store(conversation_id, token, conversation)
+    return conversation
 
-def retrieve_conversation_turns(conversation_id: str) -> list[UserTurn]:
+
+async def retrieve_conversation_turns(
+    conversation_id: str, owner_id: Optional[str] = None, read_only: bool = False
+) -> list[UserTurn]:
     """Retrieve all turns for a conversation from the database, ordered by turn number.
 
     Args:
         conversation_id (str): The normalized conversation ID.
+        owner_id (Optional[str]): Owner of the conversation, whose shard
+            stores the turns.
+        read_only (bool): Whether the turns may be read from a read replica.
 
     Returns:
         list[UserTurn]: The list of turns for the conversation, ordered by turn_number.
@@ -78,13 +148,13 @@ def retrieve_conversation_turns(conversation_id: str) -> list[UserTurn]:
         HTTPException: 500 if a database error occurs.
     """
     try:
-        with get_session() as session:
-            return (
-                session.query(UserTurn)
+        async with get_async_session(owner_id, read_only) as session:
+            turns = await session.scalars(
+                select(UserTurn)
                 .filter_by(conversation_id=conversation_id)
                 .order_by(UserTurn.turn_number)
-                .all()
             )
+            return list(turns.all())
     except SQLAlchemyError as e:
         logger.error(
             "Database error occurred while retrieving conversation turns for %s.",
@@ -94,7 +164,49 @@ def retrieve_conversation_turns(conversation_id: str) -> list[UserTurn]:
         raise HTTPException(**response.model_dump()) from e
 
 
-def can_access_conversation(
+def conversations_list_statement(
+    user_id: Optional[str],
+    before: Optional[tuple[datetime, str]] = None,
+    limit: Optional[int] = None,
+) -> Select:
+    """Build statement listing conversations, most recently used first.
+
+    Only the columns needed by the conversations listing are selected. The
+    listing is ordered by last message time and conversation ID, so it can be
+    paginated by the position of the last conversation on the previous page.
+
+    Args:
+        user_id (Optional[str]): Owner of the conversations, None to list
+            conversations of all users.
+        before (Optional[tuple[datetime, str]]): Last message time and ID of
+            the last conversation on the previous page.
+        limit (Optional[int]): Maximal number of conversations to select.
+
+    Returns:
+        Select: Statement selecting the conversations.
+    """
+    statement = select(
+        UserConversation.id,
+        UserConversation.created_at,
+        UserConversation.last_message_at,
+        UserConversation.message_count,
+        UserConversation.last_used_model,
+        UserConversation.last_used_provider,
+        UserConversation.topic_summary,
+    ).order_by(UserConversation.last_message_at.desc(), UserConversation.id.desc())
+    if user_id is not None:
+        statement = statement.where(UserConversation.user_id == user_id)
+    if before is not None:
+        statement = statement.where(
+            tuple_(UserConversation.last_message_at, UserConversation.id)
+            < tuple_(*before)
+        )
+    if limit is not None:
+        statement = statement.limit(limit)
+    return statement
+
+
+async def can_access_conversation(
     conversation_id: str, user_id: str, others_allowed: bool
 ) -> bool:
     """Check only whether a user is allowed to access a conversation.
@@ -110,35 +222,36 @@ def can_access_conversation(
     if others_allowed:
         return True
 
-    with get_session() as session:
-        owner_user_id = (
-            session.query(UserConversation.user_id)
-            .filter(UserConversation.id == conversation_id)
-            .scalar()
-        )
-        # If conversation does not exist, permissions check returns True
-        if owner_user_id is None:
-            return True
+    # the primary database is asked, as access to a conversation missing in a
+    # lagging replica would be granted
+    conversation = await retrieve_conversation(conversation_id, user_id)
+    # If conversation does not exist, permissions check returns True
+    if conversation is None:
+        return True
 
-        # If conversation exists, user_id must match
-        return owner_user_id == user_id
+    # If conversation exists, user_id must match
+    return conversation.user_id == user_id
 
 
-def validate_and_retrieve_conversation(
+async def validate_and_retrieve_conversation(
     normalized_conv_id: str,
     user_id: str,
     others_allowed: bool,
+    read_only: bool = False,
 ) -> UserConversation:
     """
     Validate access and retrieve a conversation from the database.
 
-    This function performs access validation, retrieves the conversation,
+    This function retrieves the conversation, performs access validation
     and handles all error cases (forbidden access, not found, database errors).
+    The conversation is read once, usually from the conversation metadata cache.
 
     Args:
         normalized_conv_id: The normalized conversation ID to retrieve.
         user_id: The ID of the user requesting access.
         others_allowed: Whether the user can access conversations owned by others.
+        read_only: Whether the conversation is only displayed, so it may be
+            read from a read replica.
 
     Returns:
         UserConversation: The conversation object if found and accessible.
@@ -149,11 +262,30 @@ def validate_and_retrieve_conversation(
             - 404 Not Found: If conversation doesn't exist in database.
             - 500 Internal Server Error: If database error occurs.
     """
-    if not can_access_conversation(
-        normalized_conv_id,
-        user_id,
-        others_allowed=others_allowed,
-    ):
+    try:
+        user_conversation = await retrieve_conversation(
+            normalized_conv_id, user_id, read_only=read_only
+        )
+    except SQLAlchemyError as e:
+        logger.error(
+            "Database error occurred while retrieving conversation %s: %s",
+            normalized_conv_id,
+            str(e),
+        )
+        response = InternalServerErrorResponse.database_error()
+        raise HTTPException(**response.model_dump()) from e
+
+    if user_conversation is None:
+        logger.error(
+            "Conversation %s not found in database.",
+            normalized_conv_id,
+        )
+        response = NotFoundResponse(
+            resource="conversation", resource_id=normalized_conv_id
+        )
+        raise HTTPException(**response.model_dump())
+
+    if not others_allowed and user_conversation.user_id != user_id:
         logger.warning(
             "User %s attempted to read conversation %s they don't have access to",
             user_id,
@@ -166,28 +298,6 @@ def validate_and_retrieve_conversation(
         )
         raise HTTPException(**response.model_dump())
 
-    # If reached this, user is authorized to retrieve this conversation
-    try:
-        user_conversation = retrieve_conversation(normalized_conv_id)
-        if user_conversation is None:
-            logger.error(
-                "Conversation %s not found in database.",
-                normalized_conv_id,
-            )
-            response = NotFoundResponse(
-                resource="conversation", resource_id=normalized_conv_id
-            )
-            raise HTTPException(**response.model_dump())
-
-    except SQLAlchemyError as e:
-        logger.error(
-            "Database error occurred while retrieving conversation %s: %s",
-            normalized_conv_id,
-            str(e),
-        )
-        response = InternalServerErrorResponse.database_error()
-        raise HTTPException(**response.model_dump()) from e
-
     return user_conversation
 
 
@@ -222,7 +332,7 @@ async def resolve_response_context(
     # Context for the LLM passed by conversation
     if conversation_id:
         logger.info("Conversation ID specified in request: %s", conversation_id)
-        user_conversation = validate_and_retrieve_conversation(
+        user_conversation = await validate_and_retrieve_conversation(
             normalized_conv_id=normalize_conversation_id(conversation_id),
             user_id=user_id,
             others_allowed=others_allowed,
@@ -235,13 +345,15 @@ async def resolve_response_context(
 
     # Context for the LLM passed by previous response id
     if previous_response_id:
-        if not check_turn_existence(previous_response_id):
+        if not await check_turn_existence(previous_response_id, user_id):
             error_response = NotFoundResponse(
                 resource="response", resource_id=previous_response_id
             )
             raise HTTPException(**error_response.model_dump())
-        prev_user_turn = retrieve_turn_by_response_id(previous_response_id)
-        user_conversation = validate_and_retrieve_conversation(
+        prev_user_turn = await retrieve_turn_by_response_id(
+            previous_response_id, user_id
+        )
+        user_conversation = await validate_and_retrieve_conversation(
             normalized_conv_id=prev_user_turn.conversation_id,
             user_id=user_id,
             others_allowed=others_allowed,
@@ -277,7 +389,9 @@ async def resolve_response_context(
     )
 
 
-def retrieve_turn_by_response_id(response_id: str) -> UserTurn:
+async def retrieve_turn_by_response_id(
+    response_id: str, user_id: Optional[str] = None
+) -> UserTurn:
     """Retrieve a response's turn from the database by response ID.
 
     Looks up the turn that has this response_id to get its conversation.
@@ -285,6 +399,7 @@ def retrieve_turn_by_response_id(response_id: str) -> UserTurn:
 
     Args:
         response_id: The ID of the response (stored on UserTurn.response_id).
+        user_id: User resolving the response, whose shard is searched first.
 
     Returns:
         The UserTurn row for that response (has conversation_id).
@@ -293,15 +408,16 @@ def retrieve_turn_by_response_id(response_id: str) -> UserTurn:
         HTTPException: 404 if no turn has this response_id; 500 on database error.
     """
     try:
-        with get_session() as session:
-            turn = session.query(UserTurn).filter_by(response_id=response_id).first()
-            if turn is None:
-                logger.error("Response %s not found in database.", response_id)
-                response = NotFoundResponse(
-                    resource="response", resource_id=response_id
+        for session in get_async_sessions(user_id):
+            async with session:
+                turn = await session.scalar(
+                    select(UserTurn).filter_by(response_id=response_id).limit(1)
                 )
-                raise HTTPException(**response.model_dump())
-            return turn
+                if turn is not None:
+                    return turn
+        logger.error("Response %s not found in database.", response_id)
+        response = NotFoundResponse(resource="response", resource_id=response_id)
+        raise HTTPException(**response.model_dump())
     except SQLAlchemyError as e:
         logger.exception(
             "Database error while retrieving turn by response_id %s", response_id
@@ -310,19 +426,27 @@ def retrieve_turn_by_response_id(response_id: str) -> UserTurn:
         raise HTTPException(**response.model_dump()) from e
 
 
-def check_turn_existence(response_id: str) -> bool:
+async def check_turn_existence(response_id: str, user_id: Optional[str] = None) -> bool:
     """Check if a turn exists for a given response ID.
 
     Args:
         response_id: The ID of the response to check.
+        user_id: User checking the response, whose shard is searched first.
 
     Returns:
         bool: True if the turn exists, False otherwise.
     """
     try:
-        with get_session() as session:
-            turn = session.query(UserTurn).filter_by(response_id=response_id).first()
-            return turn is not None
+        for session in get_async_sessions(user_id):
+            async with session:
+                turn_number = await session.scalar(
+                    select(UserTurn.turn_number)
+                    .filter_by(response_id=response_id)
+                    .limit(1)
+                )
+                if turn_number is not None:
+                    return True
+        return False
     except SQLAlchemyError as e:
         logger.exception(
             "Database error while checking turn existence for response_id %s",
@@ -53,6 +53,7 @@ class SpanEvents(StrEnum):
     SKILL_ACTIVATED = "skill.activated"
     LLM_RESPONSE_COMPLETED = "llm.response.completed"
     TURN_PERSISTED = "turn.persisted"
+    TURN_QUEUED = "turn.queued"
 
 
 def anonymize_value(value: str, max_length: int = 50) -> str:
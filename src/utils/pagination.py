@@ -0,0 +1,112 @@
+"""Cursor encoding for keyset-paginated listings."""
+
+import base64
+import binascii
+import json
+from datetime import datetime
+from typing import Any
+
+
+def _encode_cursor(payload: list[Any]) -> str:
+    """Encode JSON payload into opaque URL-safe cursor."""
+    return base64.urlsafe_b64encode(json.dumps(payload).encode("utf-8")).decode("ascii")
+
+
+def _decode_cursor(cursor: str) -> Any:
+    """Decode JSON payload of cursor produced by _encode_cursor."""
+    try:
+        return json.loads(base64.urlsafe_b64decode(cursor.encode("ascii")))
+    except (UnicodeEncodeError, binascii.Error, json.JSONDecodeError) as e:
+        raise ValueError("Malformed cursor") from e
+
+
+def encode_conversation_cursor(last_message_at: datetime, conversation_id: str) -> str:
+    """
+    Encode position of a conversation in the conversations listing.
+
+    The listing is ordered by last message time and conversation ID, so the
+    pair identifies the position uniquely even when several conversations
+    share the same last message time.
+
+    Parameters:
+    ----------
+        last_message_at (datetime): Time of the last message of the conversation.
+        conversation_id (str): ID of the conversation.
+
+    Returns:
+        str: Opaque URL-safe cursor.
+    """
+    return _encode_cursor([last_message_at.isoformat(), conversation_id])
+
+
+def decode_conversation_cursor(cursor: str) -> tuple[datetime, str]:
+    """
+    Decode cursor produced by encode_conversation_cursor.
+
+    Parameters:
+    ----------
+        cursor (str): Cursor returned with the previous page.
+
+    Returns:
+        tuple[datetime, str]: Last message time and ID of the conversation.
+
+    Raises:
+        ValueError: If the cursor is malformed.
+    """
+    match _decode_cursor(cursor):
+        case [str() as last_message_at, str() as conversation_id]:
+            return datetime.fromisoformat(last_message_at), conversation_id
+        case _:
+            raise ValueError("Malformed cursor")
+
+
+def encode_cache_cursor(
+    last_message_timestamp: float | datetime, conversation_id: str
+) -> str:
+    """
+    Encode position of a conversation in a conversation cache listing.
+
+    Caches order conversations by last message timestamp and conversation ID.
+    The timestamp is encoded exactly as the cache stores it: epoch seconds
+    as JSON number, which preserves every bit of the float, and timestamps
+    of PostgreSQL as ISO 8601 text.
+
+    Parameters:
+    ----------
+        last_message_timestamp (float | datetime): Stored last message
+            timestamp of the conversation.
+        conversation_id (str): ID of the conversation.
+
+    Returns:
+        str: Opaque URL-safe cursor.
+    """
+    if isinstance(last_message_timestamp, datetime):
+        return _encode_cursor([last_message_timestamp.isoformat(), conversation_id])
+    return _encode_cursor([float(last_message_timestamp), conversation_id])
+
+
+def decode_cache_cursor(cursor: str) -> tuple[float | datetime, str]:
+    """
+    Decode cursor produced by encode_cache_cursor.
+
+    Parameters:
+    ----------
+        cursor (str): Cursor returned with the previous page.
+
+    Returns:
+        tuple[float | datetime, str]: Last message timestamp and ID of the
+        conversation.
+
+    Raises:
+        ValueError: If the cursor is malformed.
+    """
+    match _decode_cursor(cursor):
+        case [str() as last_message_timestamp, str() as conversation_id]:
+            return datetime.fromisoformat(last_message_timestamp), conversation_id
+        case [
+            int() | float() as last_message_timestamp,
+            str() as conversation_id,
+        ] if not isinstance(last_message_timestamp, bool):
+            return float(last_message_timestamp), conversation_id
+        case _:
+            raise ValueError("Malformed cursor")
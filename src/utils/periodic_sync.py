@@ -0,0 +1,65 @@
+"""Background thread periodically writing state kept in memory to a database.
+
+The thread calls the synchronization function every period. It can be woken
+up earlier, for example when the amount of state kept in memory reaches a
+threshold. Errors are logged only; state which has not been written is
+expected to be kept by the caller and written by the next run.
+"""
+
+from collections.abc import Callable
+from threading import Event, Thread
+
+from log import get_logger
+
+logger = get_logger(__name__)
+
+
+class PeriodicSync:
+    """Background thread that periodically calls a synchronization function."""
+
+    def __init__(self, name: str, sync: Callable[[], None], period: float) -> None:
+        """Create a new, not yet started, synchronization thread.
+
+        Parameters:
+        ----------
+            name: Name of the synchronized state, used in logs and thread name.
+            sync: Callable writing the state to the database.
+            period: Number of seconds between two synchronizations.
+        """
+        self.name = name
+        self.period = period
+        self._sync = sync
+        self._stopped = Event()
+        self._triggered = Event()
+        self._thread = Thread(target=self._run, name=f"{name} sync", daemon=True)
+
+    def start(self) -> None:
+        """Start the synchronization thread."""
+        logger.info(
+            "Starting synchronization of %s every %s seconds", self.name, self.period
+        )
+        self._thread.start()
+
+    def trigger(self) -> None:
+        """Wake the thread up to synchronize without waiting for the period."""
+        self._triggered.set()
+
+    def stop(self) -> None:
+        """Stop the synchronization thread and wait for it to finish."""
+        self._stopped.set()
+        self._triggered.set()
+        if self._thread.is_alive():
+            self._thread.join()
+
+    def _run(self) -> None:
+        """Synchronize the state until the thread is stopped."""
+        while True:
+            self._triggered.wait(self.period)
+            self._triggered.clear()
+            if self._stopped.is_set():
+                return
+            try:
+                self._sync()
+            except Exception as e:  # pylint: disable=broad-exception-caught
+                # the state is kept and written by the next run
+                logger.warning("Synchronization of %s failed: %s", self.name, e)
@@ -0,0 +1,523 @@
+"""Background pipeline persisting query turns after the response is returned."""
+
+import asyncio
+import fcntl
+import os
+import time
+import zlib
+from pathlib import Path
+from typing import Literal, Optional, get_args
+
+from pydantic import BaseModel, Field, ValidationError
+
+from client import AsyncOgxClientHolder
+from configuration import LogicError
+from log import get_logger
+from models.common.query import Attachment
+from models.common.turn_summary import TurnSummary
+from models.config import PersistencePipelineConfiguration
+from quota.quota_limiter import QuotaReservation
+from utils.query import (
+    consume_query_tokens,
+    store_query_cache_entry,
+    store_query_conversation_details,
+    store_query_transcript,
+)
+from utils.responses import get_topic_summary
+from utils.suid import get_suid
+
+logger = get_logger(__name__)
+
+PersistenceStep = Literal[
+    "topic_summary", "quota", "transcript", "conversation", "cache"
+]
+
+# steps in the order in which they are performed
+PERSISTENCE_STEPS: tuple[PersistenceStep, ...] = get_args(PersistenceStep)
+
+JOURNAL_SUFFIX = ".json"
+LOCK_FILE = "lock"
+# journaled turns which could not be persisted
+FAILED_DIRECTORY = "failed"
+
+
+class TurnRecord(BaseModel):
+    """Writes of one query turn performed after the response is returned.
+
+    Steps are performed in the order given by PERSISTENCE_STEPS. Completed
+    steps are journaled and skipped by a retried or recovered turn. Steps
+    are performed at least once: a step which took effect before it failed,
+    or before the process stopped and the step was journaled, is performed
+    again, so quota might be consumed or the turn appended twice.
+    """
+
+    user_id: str
+    conversation_id: str
+    model: str
+    started_at: str
+    completed_at: str
+    summary: TurnSummary
+    query: str
+    skip_userid_check: bool
+    attachments: Optional[list[Attachment]] = None
+    generate_topic_summary: bool = False
+    quota_reservations: list[Optional[QuotaReservation]] = Field(default_factory=list)
+    topic_summary: Optional[str] = None
+    completed_steps: list[PersistenceStep] = Field(default_factory=list)
+    attempts: int = 0
+
+
+def _fsync_directory(directory: Path) -> None:
+    """Make creation, rename or removal of files in the directory durable."""
+    fd = os.open(directory, os.O_RDONLY)
+    try:
+        os.fsync(fd)
+    finally:
+        os.close(fd)
+
+
+def _write_journal_file(path: Path, record: TurnRecord) -> None:
+    """Atomically replace the journal file by the record."""
+    temporary_path = path.with_suffix(".tmp")
+    with open(temporary_path, "w", encoding="utf-8") as journal_file:
+        journal_file.write(record.model_dump_json())
+        journal_file.flush()
+        os.fsync(journal_file.fileno())
+    os.replace(temporary_path, path)
+    _fsync_directory(path.parent)
+
+
+def _remove_journal_file(path: Path) -> None:
+    """Remove journal file of persisted turn."""
+    path.unlink()
+    _fsync_directory(path.parent)
+
+
+async def _perform_step(step: PersistenceStep, record: TurnRecord) -> None:
+    """Perform one step of turn persistence.
+
+    Parameters:
+    ----------
+        step: Step to perform.
+        record: Turn to persist; the generated topic summary is stored into it.
+
+    Raises:
+    ------
+        HTTPException: If the step fails.
+    """
+    match step:
+        case "topic_summary":
+            if record.generate_topic_summary:
+                record.topic_summary = await get_topic_summary(
+                    record.query, AsyncOgxClientHolder().get_client(), record.model
+                )
+        case "quota":
+            await asyncio.to_thread(
+                consume_query_tokens,
+                user_id=record.user_id,
+                model_id=record.model,
+                token_usage=record.summary.token_usage,
+                quota_reservations=record.quota_reservations,
+            )
+        case "transcript":
+            store_query_transcript(
+                user_id=record.user_id,
+                conversation_id=record.conversation_id,
+                model=record.model,
+                summary=record.summary,
+                query=record.query,
+                attachments=record.attachments,
+            )
+        case "conversation":
+            await store_query_conversation_details(
+                user_id=record.user_id,
+                conversation_id=record.conversation_id,
+                model=record.model,
+                started_at=record.started_at,
+                completed_at=record.completed_at,
+                summary=record.summary,
+                topic_summary=record.topic_summary,
+            )
+        case "cache":
+            await store_query_cache_entry(
+                user_id=record.user_id,
+                conversation_id=record.conversation_id,
+                model=record.model,
+                started_at=record.started_at,
+                completed_at=record.completed_at,
+                summary=record.summary,
+                query=record.query,
+                skip_userid_check=record.skip_userid_check,
+                topic_summary=record.topic_summary,
+            )
+
+
+class PersistencePipeline:  # pylint: disable=too-many-instance-attributes
+    """Bounded queue of query turns persisted by background workers.
+
+    `enqueue` journals the turn into a file and queues it. Turns of one
+    conversation are always handled by the same worker, so they are
+    persisted in order. A failed step is retried with exponential backoff;
+    after `max_attempts` attempts the journal file is moved to the `failed`
+    subdirectory. The journal file is removed when all steps are done.
+
+    Every process journals into its own subdirectory of `journal_path`,
+    locked for the lifetime of the pipeline. On start, turns journaled by
+    processes which do not hold their lock anymore (they crashed or were
+    stopped before all turns were persisted) are taken over.
+
+    Readers of a conversation wait for its pending turns only in the process
+    which queued them; other processes may serve the conversation without
+    its latest turns until they are persisted.
+    """
+
+    def __init__(self, config: PersistencePipelineConfiguration) -> None:
+        """Create pipeline, `start` has to be called before use.
+
+        Parameters:
+        ----------
+            config: Persistence pipeline configuration.
+        """
+        self.journal_path = Path(config.journal_path)
+        self.max_attempts = config.max_attempts
+        self.retry_delay = config.retry_delay / 1000
+        self.drain_timeout = config.drain_timeout
+        self.wait_timeout = config.wait_timeout
+        queue_size = max(1, config.max_pending // config.workers)
+        self._queues: list[asyncio.Queue[tuple[Path, TurnRecord]]] = [
+            asyncio.Queue(queue_size) for _ in range(config.workers)
+        ]
+        self._workers: list[asyncio.Task[None]] = []
+        self._directory: Optional[Path] = None
+        self._lock_fd: Optional[int] = None
+        # conversation ID -> number of queued turns not persisted yet
+        self._pending: dict[str, int] = {}
+        self._persisted = asyncio.Condition()
+
+    @property
+    def pending(self) -> int:
+        """Return number of queued turns that have not been persisted yet."""
+        return sum(self._pending.values())
+
+    async def start(self) -> None:
+        """Start workers and queue turns left in the journal by other processes."""
+        self._directory, self._lock_fd = await asyncio.to_thread(self._claim_directory)
+        recovered = await asyncio.to_thread(self._adopt_orphaned_turns)
+        self._workers = [
+            asyncio.create_task(
+                self._run_worker(queue), name=f"persistence pipeline {index}"
+            )
+            for index, queue in enumerate(self._queues)
+        ]
+        if recovered:
+            logger.warning("Persisting %d turns found in journal", len(recovered))
+        for path, record in recovered:
+            await self.queue(path, record)
+
+    def _claim_directory(self) -> tuple[Path, int]:
+        """Create and lock journal subdirectory of this process."""
+        name = get_suid()
+        # hidden until locked, so other processes do not take it over
+        hidden_directory = self.journal_path / f".{name}"
+        hidden_directory.mkdir(parents=True)
+        lock_fd = os.open(hidden_directory / LOCK_FILE, os.O_RDWR | os.O_CREAT)
+        fcntl.flock(lock_fd, fcntl.LOCK_EX | fcntl.LOCK_NB)
+        directory = hidden_directory.rename(self.journal_path / name)
+        return directory, lock_fd
+
+    def _adopt_orphaned_turns(self) -> list[tuple[Path, TurnRecord]]:
+        """Move turns from unlocked journal subdirectories into own one.
+
+        Returns:
+        -------
+            Journaled turns, oldest first.
+        """
+        if self._directory is None:
+            raise LogicError("logic error: journal directory is not claimed")
+        for directory in self.journal_path.iterdir():
+            if (
+                directory.name.startswith(".")
+                or directory.name in (self._directory.name, FAILED_DIRECTORY)
+                or not directory.is_dir()
+            ):
+                continue
+            self._adopt_directory(directory, self._directory)
+
+        recovered = []
+        # file names start with the time when the turn was journaled
+        for path in sorted(self._directory.glob(f"*{JOURNAL_SUFFIX}")):
+            try:
+                record = TurnRecord.model_validate_json(path.read_text("utf-8"))
+            except ValidationError as e:
+                logger.error("Malformed journaled turn %s: %s", path, e)
+                self._move_to_failed(path)
+                continue
+            recovered.append((path, record))
+        return recovered
+
+    @staticmethod
+    def _adopt_directory(directory: Path, own_directory: Path) -> None:
+        """Move turns from the journal subdirectory unless its owner runs."""
+        try:
+            lock_fd = os.open(directory / LOCK_FILE, os.O_RDWR | os.O_CREAT)
+        except FileNotFoundError:
+            # taken over by another process meanwhile
+            return
+        try:
+            fcntl.flock(lock_fd, fcntl.LOCK_EX | fcntl.LOCK_NB)
+        except BlockingIOError:
+            # owned by a running process
+            os.close(lock_fd)
+            return
+        try:
+            for path in directory.glob(f"*{JOURNAL_SUFFIX}"):
+                path.rename(own_directory / path.name)
+            _fsync_directory(own_directory)
+            for path in directory.iterdir():
+                path.unlink(missing_ok=True)
+            directory.rmdir()
+        except OSError:
+            # removed by another process which has taken it over meanwhile
+            pass
+        finally:
+            os.close(lock_fd)
+
+    def _move_to_failed(self, path: Path) -> None:
+        """Move journal file of turn that could not be persisted aside."""
+        failed_directory = self.journal_path / FAILED_DIRECTORY
+        failed_directory.mkdir(exist_ok=True)
+        path.rename(failed_directory / path.name)
+        _fsync_directory(failed_directory)
+
+    async def enqueue(self, record: TurnRecord) -> None:
+        """Journal the turn and queue it to be persisted.
+
+        Waits for a free slot when the queue is full. Once this returns, the
+        turn is persisted even if the process crashes meanwhile.
+
+        Parameters:
+        ----------
+            record: Turn to persist.
+
+        Raises:
+        ------
+            LogicError: If the pipeline has not been started.
+        """
+        path = await self.journal(record)
+        await self.queue(path, record)
+
+    async def journal(self, record: TurnRecord) -> Path:
+        """Journal the turn, so it is persisted even if the process crashes.
+
+        The turn has to be queued by `queue` afterwards; if that fails, it is
+        persisted by the next process started with the same journal.
+
+        Parameters:
+        ----------
+            record: Turn to persist.
+
+        Returns:
+        -------
+            Path to the journal file of the turn.
+
+        Raises:
+        ------
+            LogicError: If the pipeline has not been started.
+        """
+        if self._directory is None:
+            raise LogicError("logic error: persistence pipeline is not started")
+        path = self._directory / f"{time.time_ns()}-{get_suid()}{JOURNAL_SUFFIX}"
+        await asyncio.to_thread(_write_journal_file, path, record)
+        return path
+
+    async def queue(self, path: Path, record: TurnRecord) -> None:
+        """Queue journaled turn to worker handling its conversation.
+
+        Waits for a free slot when the queue is full.
+
+        Parameters:
+        ----------
+            path: Path to the journal file of the turn.
+            record: Journaled turn.
+        """
+        conversation_id = record.conversation_id
+        queue = self._queues[
+            zlib.crc32(conversation_id.encode("utf-8")) % len(self._queues)
+        ]
+        self._pending[conversation_id] = self._pending.get(conversation_id, 0) + 1
+        if queue.full():
+            logger.warning(
+                "Persistence queue is full, waiting for %d turns to be persisted",
+                self.pending,
+            )
+        try:
+            await queue.put((path, record))
+        except BaseException:
+            # the turn stays journaled and it is persisted after restart
+            await self._finish(conversation_id)
+            raise
+
+    async def _finish(self, conversation_id: str) -> None:
+        """Mark one turn of the conversation as no longer pending."""
+        self._pending[conversation_id] -= 1
+        if self._pending[conversation_id] == 0:
+            del self._pending[conversation_id]
+        async with self._persisted:
+            self._persisted.notify_all()
+
+    async def wait_for_conversation(self, conversation_id: str) -> None:
+        """Wait until queued turns of the conversation are persisted.
+
+        Waits up to the wait timeout, so readers are not blocked by turns
+        whose persistence is being retried. Only turns queued by this process
+        are waited for.
+
+        Parameters:
+        ----------
+            conversation_id: Normalized conversation ID.
+        """
+        if conversation_id not in self._pending:
+            return
+        try:
+            async with asyncio.timeout(self.wait_timeout), self._persisted:
+                await self._persisted.wait_for(
+                    lambda: conversation_id not in self._pending
+                )
+        except TimeoutError:
+            logger.warning(
+                "Turns of conversation %s have not been persisted in %d s, "
+                "reading it without them",
+                conversation_id,
+                self.wait_timeout,
+            )
+
+    async def _run_worker(self, queue: asyncio.Queue[tuple[Path, TurnRecord]]) -> None:
+        """Persist turns from the queue one by one."""
+        while True:
+            path, record = await queue.get()
+            try:
+                await self._persist(path, record)
+            except OSError as e:
+                logger.error("Failed to update journaled turn %s: %s", path, e)
+            finally:
+                queue.task_done()
+                await self._finish(record.conversation_id)
+
+    async def _persist(self, path: Path, record: TurnRecord) -> None:
+        """Perform remaining steps of the turn, retrying failed ones.
+
+        Raises:
+        ------
+            OSError: If the journal can not be updated.
+        """
+        while True:
+            try:
+                for step in PERSISTENCE_STEPS:
+                    if step in record.completed_steps:
+                        continue
+                    await _perform_step(step, record)
+                    record.completed_steps.append(step)
+                    if step != PERSISTENCE_STEPS[-1]:
+                        await asyncio.to_thread(_write_journal_file, path, record)
+            except Exception as e:  # pylint: disable=broad-exception-caught
+                record.attempts += 1
+                if record.attempts >= self.max_attempts:
+                    logger.error(
+                        "Giving up persisting turn of conversation %s after %d "
+                        "attempts, it is kept in %s: %s",
+                        record.conversation_id,
+                        record.attempts,
+                        self.journal_path / FAILED_DIRECTORY,
+                        e,
+                    )
+                    await asyncio.to_thread(_write_journal_file, path, record)
+                    await asyncio.to_thread(self._move_to_failed, path)
+                    return
+                delay = self.retry_delay * 2 ** (record.attempts - 1)
+                logger.warning(
+                    "Failed to persist turn of conversation %s, retrying in %.1f s: %s",
+                    record.conversation_id,
+                    delay,
+                    e,
+                )
+                await asyncio.to_thread(_write_journal_file, path, record)
+                await asyncio.sleep(delay)
+            else:
+                await asyncio.to_thread(_remove_journal_file, path)
+                return
+
+    async def stop(self) -> None:
+        """Wait for queued turns up to drain timeout and stop the workers.
+
+        Turns not persisted by then stay in the journal and are persisted by
+        the next process started with the same journal directory.
+        """
+        try:
+            await asyncio.wait_for(
+                asyncio.gather(*(queue.join() for queue in self._queues)),
+                self.drain_timeout,
+            )
+        except TimeoutError:
+            logger.warning(
+                "%d turns have not been persisted, they stay in the journal",
+                self.pending,
+            )
+        for worker in self._workers:
+            worker.cancel()
+        await asyncio.gather(*self._workers, return_exceptions=True)
+        self._workers = []
+        if self._lock_fd is not None:
+            os.close(self._lock_fd)
+            self._lock_fd = None
+        if self._directory is not None:
+            await asyncio.to_thread(self._release_directory, self._directory)
+            self._directory = None
+
+    @staticmethod
+    def _release_directory(directory: Path) -> None:
+        """Remove own journal subdirectory unless turns remain in it."""
+        if any(directory.glob(f"*{JOURNAL_SUFFIX}")):
+            return
+        for path in directory.iterdir():
+            path.unlink()
+        directory.rmdir()
+
+
+_PIPELINE: Optional[PersistencePipeline] = None
+
+
+def get_persistence_pipeline() -> Optional[PersistencePipeline]:
+    """Return running persistence pipeline.
+
+    Returns:
+    -------
+        The pipeline, or None if turns are persisted by request handlers.
+    """
+    return _PIPELINE
+
+
+async def start_persistence_pipeline(
+    config: Optional[PersistencePipelineConfiguration],
+) -> None:
+    """Start persistence pipeline if it is configured.
+
+    Parameters:
+    ----------
+        config: Persistence pipeline configuration, or None.
+    """
+    global _PIPELINE  # pylint: disable=global-statement
+    if config is None:
+        return
+    pipeline = PersistencePipeline(config)
+    await pipeline.start()
+    _PIPELINE = pipeline
+    logger.info("Persistence pipeline started, journal: %s", config.journal_path)
+
+
+async def stop_persistence_pipeline() -> None:
+    """Drain and stop persistence pipeline if it runs."""
+    global _PIPELINE  # pylint: disable=global-statement
+    if _PIPELINE is None:
+        return
+    pipeline, _PIPELINE = _PIPELINE, None
+    await pipeline.stop()
@@ -0,0 +1,371 @@
+"""Bounded pool of PostgreSQL connections shared by database backed storages.
+
+Conversation cache, quota limiters and token usage history lease connections
+from one pool per database instead of holding a dedicated connection each, so
+concurrent requests are not serialized on a single connection.
+
+A connection is leased for the duration of one storage operation: methods
+decorated by `connection` run inside `PostgresConnectionPool.lease()`. The
+pool itself provides the subset of psycopg2 connection interface used by the
+storages (`cursor`, `commit` and `rollback`) and delegates it to the connection
+leased by the current thread. Leases are reentrant, so an operation calling
+another operation keeps using the same connection.
+
+Connections are leased per thread, so request handlers call quota limiters
+and token usage history by `asyncio.to_thread`; called on the event loop
+thread, concurrent requests would be serialized on one connection.
+"""
+
+import threading
+import time
+from collections import deque
+from collections.abc import Iterator
+from contextlib import contextmanager
+from dataclasses import dataclass, field
+from typing import Any, Optional
+
+import psycopg2
+from psycopg2.pool import PoolError
+
+from log import get_logger
+from metrics.recording import record_postgres_pool_usage, record_postgres_pool_wait
+from models.config import PostgreSQLDatabaseConfiguration
+
+logger = get_logger(__name__)
+
+
+@dataclass
+class PooledConnection:
+    """Connection owned by the pool together with its creation time."""
+
+    connection: Any
+    created_at: float = field(default_factory=time.monotonic)
+
+    def expired(self, max_lifetime: float) -> bool:
+        """Check if the connection is older than the allowed lifetime."""
+        return time.monotonic() - self.created_at >= max_lifetime
+
+
+@dataclass
+class _Lease:
+    """Connection leased by one thread and number of nested leases."""
+
+    pooled: PooledConnection
+    depth: int = 1
+
+
+def pool_name(config: PostgreSQLDatabaseConfiguration) -> str:
+    """Return name identifying the pool in logs and metrics.
+
+    Parameters:
+    ----------
+        config: PostgreSQL configuration the pool connects to.
+
+    Returns:
+    -------
+        Name in form `host:port/db/namespace`.
+    """
+    return f"{config.host}:{config.port}/{config.db}/{config.namespace or 'public'}"
+
+
+class PostgresConnectionPool:  # pylint: disable=too-many-instance-attributes
+    """Thread safe, bounded pool of PostgreSQL connections.
+
+    At most `max_size` connections are open at any time. When all of them are
+    leased, callers wait up to `acquire_timeout` seconds for a connection to be
+    returned, `psycopg2.pool.PoolError` is raised afterwards. Connections older
+    than `max_lifetime` are closed instead of being reused, and a connection
+    that failed with a disconnect error is discarded together with all idle
+    connections, as those have most probably been closed by the server too.
+    """
+
+    # errors meaning that the connection has been lost and must not be reused
+    disconnect_errors = (psycopg2.OperationalError, psycopg2.InterfaceError)
+
+    def __init__(self, config: PostgreSQLDatabaseConfiguration) -> None:
+        """Create a pool and open the minimal number of connections.
+
+        Parameters:
+        ----------
+            config: PostgreSQL configuration with connection pool settings.
+
+        Raises:
+        ------
+            psycopg2.Error: If opening the initial connections fails.
+        """
+        self.config = config
+        self.name = pool_name(config)
+        self.min_size = config.pool.min_size
+        self.max_size = config.pool.max_size
+        self.acquire_timeout = config.pool.acquire_timeout
+        self.max_lifetime = config.pool.max_lifetime
+        self.closed = False
+        self._idle: deque[PooledConnection] = deque()
+        # number of leased connections including the ones being opened
+        self._in_use = 0
+        self._condition = threading.Condition()
+        self._local = threading.local()
+
+        logger.info(
+            "Creating PostgreSQL connection pool %s with %d-%d connections",
+            self.name,
+            self.min_size,
+            self.max_size,
+        )
+        try:
+            for _ in range(self.min_size):
+                self._idle.append(self._open())
+        except psycopg2.Error:
+            self.close()
+            raise
+        self._record_usage()
+
+    def _open(self) -> PooledConnection:
+        """Open a new connection to the database.
+
+        Returns:
+        -------
+            Newly opened connection in autocommit mode.
+        """
+        config = self.config
+        connection = psycopg2.connect(
+            host=config.host,
+            port=config.port,
+            user=config.user,
+            password=config.password.get_secret_value(),
+            dbname=config.db,
+            sslmode=config.ssl_mode,
+            sslrootcert=config.ca_cert_path,
+            gssencmode=config.gss_encmode,
+            options=f"-c search_path={config.namespace or 'public'}",
+        )
+        connection.autocommit = True
+        return PooledConnection(connection)
+
+    @staticmethod
+    def _close_connections(connections: list[PooledConnection]) -> None:
+        """Close connections, ignoring errors of already broken ones."""
+        for pooled in connections:
+            try:
+                pooled.connection.close()
+            except psycopg2.Error as e:
+                logger.debug("Error closing pooled connection: %s", e)
+
+    def _record_usage(self) -> None:
+        """Report current pool usage to metrics."""
+        record_postgres_pool_usage(
+            self.name, self._in_use, len(self._idle), self.max_size
+        )
+
+    def acquire(self) -> PooledConnection:
+        """Take a connection from the pool, opening a new one if allowed.
+
+        Returns:
+        -------
+            Connection that must be returned by calling `release()`.
+
+        Raises:
+        ------
+            psycopg2.pool.PoolError: If the pool is closed or no connection
+            became available within the acquire timeout.
+            psycopg2.Error: If opening a new connection fails.
+        """
+        started = time.monotonic()
+        deadline = started + self.acquire_timeout
+        expired: list[PooledConnection] = []
+        pooled: Optional[PooledConnection] = None
+        try:
+            with self._condition:
+                while True:
+                    if self.closed:
+                        raise PoolError(f"Connection pool {self.name} is closed")
+                    while self._idle:
+                        candidate = self._idle.pop()
+                        if candidate.expired(self.max_lifetime):
+                            expired.append(candidate)
+                        else:
+                            pooled = candidate
+                            break
+                    if (
+                        pooled is not None
+                        or self._in_use + len(self._idle) < self.max_size
+                    ):
+                        self._in_use += 1
+                        break
+                    remaining = deadline - time.monotonic()
+                    if remaining <= 0:
+                        raise PoolError(
+                            f"Timeout waiting for connection from pool {self.name}"
+                        )
+                    self._condition.wait(remaining)
+                self._record_usage()
+        finally:
+            self._close_connections(expired)
+
+        record_postgres_pool_wait(self.name, time.monotonic() - started)
+        if pooled is not None:
+            return pooled
+
+        try:
+            return self._open()
+        except psycopg2.Error:
+            with self._condition:
+                self._in_use -= 1
+                self._condition.notify()
+                self._record_usage()
+            raise
+
+    def release(self, pooled: PooledConnection, discard: bool = False) -> None:
+        """Return a connection to the pool.
+
+        Parameters:
+        ----------
+            pooled: Connection obtained by `acquire()`.
+            discard: True if the connection has been lost; it is closed
+            together with all idle connections.
+        """
+        to_close: list[PooledConnection] = []
+        with self._condition:
+            self._in_use -= 1
+            if discard:
+                to_close.append(pooled)
+                to_close.extend(self._idle)
+                self._idle.clear()
+            elif self.closed or pooled.expired(self.max_lifetime):
+                to_close.append(pooled)
+            else:
+                self._idle.append(pooled)
+            self._condition.notify()
+            self._record_usage()
+        self._close_connections(to_close)
+
+    def is_disconnect_error(self, error: BaseException) -> bool:
+        """Check if the error means that the leased connection has been lost."""
+        return isinstance(error, self.disconnect_errors) or isinstance(
+            error.__cause__, self.disconnect_errors
+        )
+
+    @contextmanager
+    def lease(self) -> Iterator[Any]:
+        """Lease a connection to the current thread.
+
+        Nested leases in one thread share the outermost leased connection,
+        which is returned to the pool when the outermost lease ends.
+
+        Yields:
+        ------
+            The leased psycopg2 connection.
+        """
+        current: Optional[_Lease] = getattr(self._local, "lease", None)
+        if current is not None:
+            current.depth += 1
+            try:
+                yield current.pooled.connection
+            finally:
+                current.depth -= 1
+            return
+
+        pooled = self.acquire()
+        self._local.lease = _Lease(pooled)
+        discard = False
+        try:
+            yield pooled.connection
+        except BaseException as e:
+            discard = self.is_disconnect_error(e)
+            raise
+        finally:
+            self._local.lease = None
+            self.release(pooled, discard)
+
+    def leased(self) -> bool:
+        """Check if the current thread holds a lease."""
+        return getattr(self._local, "lease", None) is not None
+
+    def _leased_connection(self) -> Any:
+        """Return connection leased by the current thread."""
+        current: Optional[_Lease] = getattr(self._local, "lease", None)
+        if current is None:
+            raise PoolError(
+                f"No connection from pool {self.name} is leased by current thread"
+            )
+        return current.pooled.connection
+
+    def cursor(self, *args: Any, **kwargs: Any) -> Any:
+        """Create a cursor on the connection leased by the current thread."""
+        return self._leased_connection().cursor(*args, **kwargs)
+
+    def commit(self) -> None:
+        """Commit on the connection leased by the current thread."""
+        self._leased_connection().commit()
+
+    def rollback(self) -> None:
+        """Roll back on the connection leased by the current thread."""
+        self._leased_connection().rollback()
+
+    def close(self) -> None:
+        """Close idle connections; leased ones are closed when released."""
+        with self._condition:
+            self.closed = True
+            to_close = list(self._idle)
+            self._idle.clear()
+            self._condition.notify_all()
+            self._record_usage()
+        self._close_connections(to_close)
+
+
+_pools: dict[tuple[Any, ...], PostgresConnectionPool] = {}
+_pools_lock = threading.Lock()
+
+
+def _pool_key(config: PostgreSQLDatabaseConfiguration) -> tuple[Any, ...]:
+    """Return key identifying connections that can be shared."""
+    return (
+        config.host,
+        config.port,
+        config.db,
+        config.user,
+        config.password.get_secret_value(),
+        config.namespace or "public",
+        config.ssl_mode,
+        config.gss_encmode,
+        config.ca_cert_path,
+    )
+
+
+def get_postgres_pool(
+    config: PostgreSQLDatabaseConfiguration,
+) -> PostgresConnectionPool:
+    """Return connection pool shared by all storages using the same database.
+
+    The pool is created on first use. When several storages configure the
+    same database differently, pool settings of the first one are used.
+
+    Parameters:
+    ----------
+        config: PostgreSQL configuration of the storage.
+
+    Returns:
+    -------
+        Connection pool for the configured database.
+
+    Raises:
+    ------
+        psycopg2.Error: If opening the initial connections fails.
+    """
+    key = _pool_key(config)
+    with _pools_lock:
+        pool = _pools.get(key)
+        if pool is None or pool.closed:
+            pool = PostgresConnectionPool(config)
+            _pools[key] = pool
+        return pool
+
+
+def close_postgres_pools() -> None:
+    """Close all shared connection pools, used on application shutdown."""
+    with _pools_lock:
+        pools = list(_pools.values())
+        _pools.clear()
+    for pool in pools:
+        logger.info("Closing PostgreSQL connection pool %s", pool.name)
+        pool.close()
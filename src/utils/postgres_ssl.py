@@ -0,0 +1,27 @@
+"""SSL settings of asyncpg connections to PostgreSQL."""
+
+import ssl
+
+from models.config import PostgreSQLDatabaseConfiguration
+
+
+def ssl_argument(config: PostgreSQLDatabaseConfiguration) -> str | ssl.SSLContext:
+    """Translate SSL related configuration into asyncpg `ssl` argument.
+
+    Parameters:
+    ----------
+        config: PostgreSQL configuration.
+
+    Returns:
+    -------
+        SSL mode name, or SSL context when certificate verification against
+        the configured CA certificate is requested.
+    """
+    if config.ca_cert_path is None or config.ssl_mode not in (
+        "verify-ca",
+        "verify-full",
+    ):
+        return config.ssl_mode
+    context = ssl.create_default_context(cafile=str(config.ca_cert_path))
+    context.check_hostname = config.ssl_mode == "verify-full"
+    return context
@@ -1,8 +1,9 @@
 """Utility functions for working with queries."""
 
 import sqlite3
+from collections.abc import Callable
 from datetime import UTC, datetime
-from typing import Optional
+from typing import Any, Optional
 
 import psycopg2
 from fastapi import HTTPException
@@ -11,11 +12,11 @@ from ogx_client import (
 )
 from openai._exceptions import APIStatusError as OpenAIAPIStatusError
 from pydantic_ai.messages import ImageUrl, UserContent
-from sqlalchemy import func
+from sqlalchemy.dialects import postgresql, sqlite
 from sqlalchemy.exc import SQLAlchemyError
 
 import constants
-from app.database import get_session
+from app.database import get_async_session, get_async_sessions
 from cache.cache_entry import CacheEntry
 from cache.cache_error import CacheError
 from configuration import configuration
@@ -33,9 +34,18 @@ from models.common.query import Attachment
 from models.common.turn_summary import TurnSummary
 from models.config import Action
 from models.database.conversations import UserConversation, UserTurn
-from utils.quota_utils import consume_tokens
+from quota.quota_limiter import QuotaReservation
+from utils.conversation_metadata_cache import conversation_metadata_cache
+from utils.quota_utils import (
+    check_tokens_available,
+    consume_tokens,
+    release_reservations,
+    reserve_tokens,
+)
+from utils.read_replicas import record_user_write
 from utils.suid import is_moderation_id, normalize_conversation_id
 from utils.token_counter import TokenCounter
+from utils.token_estimator import estimate_tokens
 from utils.transcripts import (
     create_transcript,
     create_transcript_metadata,
@@ -58,7 +68,7 @@ def is_context_length_error(error_message: str) -> bool:
     return "context_length" in msg_lower or "context length" in msg_lower
 
 
-def store_conversation_into_cache(
+async def store_conversation_into_cache(
     user_id: str,
     conversation_id: str,
     cache_entry: CacheEntry,
@@ -86,14 +96,16 @@ def store_conversation_into_cache(
         logger.warning("Conversation cache is not configured")
         return
 
-    cache = configuration.conversation_cache
+    cache = configuration.async_conversation_cache
     if cache is None:
         logger.warning("Conversation cache configured but not initialized")
         return
 
-    cache.insert_or_append(user_id, conversation_id, cache_entry, skip_userid_check)
+    await cache.insert_or_append(
+        user_id, conversation_id, cache_entry, skip_userid_check
+    )
     if topic_summary:
-        cache.set_topic_summary(
+        await cache.set_topic_summary(
             user_id, conversation_id, topic_summary, skip_userid_check
         )
 
@@ -173,7 +185,7 @@ def build_multimodal_input(
     return parts
 
 
-def store_query_results(  # pylint: disable=too-many-arguments
+async def store_query_results(  # pylint: disable=too-many-arguments
     user_id: str,
     conversation_id: str,
     model: str,
@@ -208,32 +220,106 @@ def store_query_results(  # pylint: disable=too-many-arguments
     Raises:
         HTTPException: On any database, cache, or IO errors during processing
     """
-    provider_id, model_id = extract_provider_and_model_from_model_id(model)
-    # Store transcript if enabled
-    if is_transcripts_enabled():
-        logger.info("Storing transcript")
-        metadata = create_transcript_metadata(
-            user_id=user_id,
-            conversation_id=conversation_id,
-            model_id=model_id,
-            provider_id=provider_id,
-            query_provider=provider_id,
-            query_model=model_id,
-        )
-        transcript = create_transcript(
-            metadata=metadata,
-            redacted_query=query,
-            summary=summary,
-            attachments=attachments or [],
-        )
-        store_transcript(transcript)
-    else:
+    store_query_transcript(
+        user_id=user_id,
+        conversation_id=conversation_id,
+        model=model,
+        summary=summary,
+        query=query,
+        attachments=attachments,
+    )
+    await store_query_conversation_details(
+        user_id=user_id,
+        conversation_id=conversation_id,
+        model=model,
+        started_at=started_at,
+        completed_at=completed_at,
+        summary=summary,
+        topic_summary=topic_summary,
+    )
+    await store_query_cache_entry(
+        user_id=user_id,
+        conversation_id=conversation_id,
+        model=model,
+        started_at=started_at,
+        completed_at=completed_at,
+        summary=summary,
+        query=query,
+        skip_userid_check=skip_userid_check,
+        topic_summary=topic_summary,
+    )
+
+
+def store_query_transcript(  # pylint: disable=too-many-arguments
+    user_id: str,
+    conversation_id: str,
+    model: str,
+    summary: TurnSummary,
+    query: str,
+    attachments: Optional[list[Attachment]] = None,
+) -> None:
+    """Store transcript of the turn if transcripts are enabled.
+
+    Args:
+        user_id: The authenticated user ID
+        conversation_id: The conversation ID
+        model: The model identifier (provider/model format)
+        summary: Summary of the turn including LLM response and tool calls
+        query: The query text
+        attachments: Optional list of attachments
+
+    Raises:
+        HTTPException: If the transcript can not be written
+    """
+    if not is_transcripts_enabled():
         logger.debug("Transcript collection is disabled in the configuration")
+        return
+    provider_id, model_id = extract_provider_and_model_from_model_id(model)
+    logger.info("Storing transcript")
+    metadata = create_transcript_metadata(
+        user_id=user_id,
+        conversation_id=conversation_id,
+        model_id=model_id,
+        provider_id=provider_id,
+        query_provider=provider_id,
+        query_model=model_id,
+    )
+    transcript = create_transcript(
+        metadata=metadata,
+        redacted_query=query,
+        summary=summary,
+        attachments=attachments or [],
+    )
+    store_transcript(transcript)
+
+
+async def store_query_conversation_details(  # pylint: disable=too-many-arguments
+    user_id: str,
+    conversation_id: str,
+    model: str,
+    started_at: str,
+    completed_at: str,
+    summary: TurnSummary,
+    topic_summary: Optional[str] = None,
+) -> None:
+    """Persist the turn and conversation details to database.
 
-    # Persist conversation details
+    Args:
+        user_id: The authenticated user ID
+        conversation_id: The conversation ID
+        model: The model identifier (provider/model format)
+        started_at: ISO formatted timestamp when the request started
+        completed_at: ISO formatted timestamp when the request completed
+        summary: Summary of the turn including LLM response and tool calls
+        topic_summary: Optional topic summary for the conversation
+
+    Raises:
+        HTTPException: On database errors
+    """
+    provider_id, model_id = extract_provider_and_model_from_model_id(model)
     try:
         logger.info("Persisting conversation details")
-        persist_user_conversation_details(
+        await persist_user_conversation_details(
             user_id=user_id,
             conversation_id=conversation_id,
             started_at=started_at,
@@ -248,7 +334,35 @@ def store_query_results(  # pylint: disable=too-many-arguments
         response = InternalServerErrorResponse.database_error()
         raise HTTPException(**response.model_dump()) from e
 
-    # Store conversation in cache
+
+async def store_query_cache_entry(  # pylint: disable=too-many-arguments
+    user_id: str,
+    conversation_id: str,
+    model: str,
+    started_at: str,
+    completed_at: str,
+    summary: TurnSummary,
+    query: str,
+    skip_userid_check: bool,
+    topic_summary: Optional[str] = None,
+) -> None:
+    """Append the turn to the conversation cache.
+
+    Args:
+        user_id: The authenticated user ID
+        conversation_id: The conversation ID
+        model: The model identifier (provider/model format)
+        started_at: ISO formatted timestamp when the request started
+        completed_at: ISO formatted timestamp when the request completed
+        summary: Summary of the turn including LLM response and tool calls
+        query: The query text
+        skip_userid_check: Whether to skip user ID validation
+        topic_summary: Optional topic summary for the conversation
+
+    Raises:
+        HTTPException: On cache errors
+    """
+    provider_id, model_id = extract_provider_and_model_from_model_id(model)
     cache_entry = CacheEntry(
         query=query,
         response=summary.llm_response,
@@ -262,7 +376,7 @@ def store_query_results(  # pylint: disable=too-many-arguments
     )
     try:
         logger.info("Storing conversation in cache")
-        store_conversation_into_cache(
+        await store_conversation_into_cache(
             user_id=user_id,
             conversation_id=conversation_id,
             cache_entry=cache_entry,
@@ -275,10 +389,52 @@ def store_query_results(  # pylint: disable=too-many-arguments
         raise HTTPException(**response.model_dump()) from e
 
 
+def reserve_query_tokens(
+    user_id: str, query_input: str
+) -> list[Optional[QuotaReservation]]:
+    """Reserve tokens expected to be consumed by a query in quota limiters.
+
+    The number of input tokens is estimated from the prepared query input.
+    When quota reservations are not configured, the available quota is
+    checked only.
+
+    Args:
+        user_id: The authenticated user ID
+        query_input: Prepared input of the query
+
+    Returns:
+        Reservations to be passed to consume_query_tokens, one item per
+        quota limiter; empty when reservations are not configured.
+
+    Raises:
+        HTTPException: On database errors or when the quota is exceeded
+    """
+    reservation = configuration.quota_handlers_configuration.reservation
+    if reservation is None:
+        check_tokens_available(configuration.quota_limiters, user_id)
+        return []
+    tokens = estimate_tokens(query_input) + reservation.output_tokens
+    return reserve_tokens(configuration.quota_limiters, user_id, tokens)
+
+
+def release_query_tokens(
+    quota_reservations: list[Optional[QuotaReservation]],
+) -> None:
+    """Return tokens reserved for a query which failed before being settled.
+
+    Args:
+        quota_reservations: Tokens reserved by reserve_query_tokens
+    """
+    if quota_reservations:
+        logger.info("Releasing reserved tokens")
+        release_reservations(configuration.quota_limiters, quota_reservations)
+
+
 def consume_query_tokens(
     user_id: str,
     model_id: str,
     token_usage: TokenCounter,
+    quota_reservations: Optional[list[Optional[QuotaReservation]]] = None,
 ) -> None:
     """Consume tokens from quota limiters for a query.
 
@@ -290,6 +446,8 @@ def consume_query_tokens(
         user_id: The authenticated user ID
         model_id: The full model identifier in "provider/model" format
         token_usage: TokenCounter object with input and output token counts
+        quota_reservations: Tokens reserved by reserve_query_tokens, settled
+            by the consumed tokens
 
     Raises:
         HTTPException: On database errors during token consumption
@@ -305,6 +463,7 @@ def consume_query_tokens(
             output_tokens=token_usage.output_tokens,
             model_id=model,
             provider_id=provider,
+            reservations=quota_reservations,
         )
     except (psycopg2.Error, sqlite3.Error, ValueError) as e:
         logger.exception("Error consuming tokens: %s", e)
@@ -324,7 +483,7 @@ def is_transcripts_enabled() -> bool:
     return transcripts_enabled
 
 
-def persist_user_conversation_details(
+async def persist_user_conversation_details(
     user_id: str,
     conversation_id: str,
     started_at: str,
@@ -355,48 +514,55 @@ def persist_user_conversation_details(
         user_id,
     )
 
-    with get_session() as session:
-        existing_conversation = (
-            session.query(UserConversation).filter_by(id=normalized_id).first()
+    moderated = is_moderation_id(response_id)
+    # conversations continued by other users stay in the shard of their owner,
+    # whose record has been cached by the preceding access check
+    cached = conversation_metadata_cache.get(normalized_id)
+    owner_id = cached.user_id if cached is not None else user_id
+    async with get_async_session(owner_id) as session:
+        insert: Callable[..., Any] = (
+            postgresql.insert
+            if session.get_bind().dialect.name == "postgresql"
+            else sqlite.insert
         )
-        if not existing_conversation:
-            conversation = UserConversation(
-                id=normalized_id,
-                user_id=user_id,
-                last_used_model=model_id,
-                last_used_provider=provider_id,
-                topic_summary=topic_summary or "",
-                message_count=1,
-                # For new conversation either current response or None if moderation-blocked
-                last_response_id=(
-                    response_id if not is_moderation_id(response_id) else None
-                ),
-            )
-            session.add(conversation)
-            logger.debug(
-                "Associated conversation %s to user %s", normalized_id, user_id
-            )
-        else:
-            existing_conversation.last_used_model = model_id
-            existing_conversation.last_used_provider = provider_id
-            existing_conversation.last_message_at = datetime.now(UTC)
-            existing_conversation.message_count += 1
-            logger.debug(
-                "Updating existing conversation in DB - ID: %s, User: %s, Messages: %d",
-                normalized_id,
-                user_id,
-                existing_conversation.message_count,
-            )
-            # Update last response id only if not moderation-blocked
-            if not is_moderation_id(response_id):
-                existing_conversation.last_response_id = response_id
-
-        max_turn_number = (
-            session.query(func.max(UserTurn.turn_number))
-            .filter_by(conversation_id=normalized_id)
-            .scalar()
+        statement = insert(UserConversation).values(
+            id=normalized_id,
+            user_id=user_id,
+            last_used_model=model_id,
+            last_used_provider=provider_id,
+            topic_summary=topic_summary or "",
+            message_count=1,
+            # For new conversation either current response or None if moderation-blocked
+            last_response_id=None if moderated else response_id,
+        )
+        changes = {
+            "last_used_model": statement.excluded.last_used_model,
+            "last_used_provider": statement.excluded.last_used_provider,
+            "last_message_at": datetime.now(UTC),
+            "message_count": UserConversation.message_count + 1,
+        }
+        # Update last response id only if not moderation-blocked
+        if not moderated:
+            changes["last_response_id"] = statement.excluded.last_response_id
+
+        # every turn increments the counter atomically, so it also numbers the
+        # turns without scanning the turns stored so far; the whole updated
+        # record is returned to refresh the conversation metadata cache
+        result = await session.scalars(
+            statement.on_conflict_do_update(
+                index_elements=[UserConversation.id], set_=changes
+            ).returning(UserConversation),
+            execution_options={"populate_existing": True},
+        )
+        conversation = result.one()
+        turn_number = conversation.message_count
+        logger.debug(
+            "Associated conversation %s to user %s, messages: %d",
+            normalized_id,
+            user_id,
+            turn_number,
         )
-        turn_number = (max_turn_number or 0) + 1
+
         turn = UserTurn(
             conversation_id=normalized_id,
             turn_number=turn_number,
@@ -413,13 +579,15 @@ def persist_user_conversation_details(
             turn_number,
         )
 
-        session.commit()
+        await session.commit()
+        conversation_metadata_cache.update(conversation)
+        record_user_write(owner_id)
         logger.debug(
             "Successfully committed conversation %s to database", normalized_id
         )
 
 
-def update_conversation_topic_summary(
+async def update_conversation_topic_summary(
     conversation_id: str,
     topic_summary: str,
     user_id: Optional[str] = None,
@@ -435,27 +603,31 @@ def update_conversation_topic_summary(
         skip_userid_check: Whether to skip user ID validation for cache operations.
     """
     normalized_id = normalize_conversation_id(conversation_id)
-    with get_session() as session:
-        existing = session.query(UserConversation).filter_by(id=normalized_id).first()
-        if existing:
-            existing.topic_summary = topic_summary
-            session.commit()
-            logger.debug("Updated topic summary for conversation %s", normalized_id)
-        else:
-            logger.debug(
-                "No conversation found for topic summary update: id=%s, "
-                "topic_summary_len=%d",
-                normalized_id,
-                len(topic_summary),
-            )
+    for session in get_async_sessions(user_id):
+        async with session:
+            existing = await session.get(UserConversation, normalized_id)
+            if existing:
+                existing.topic_summary = topic_summary
+                await session.commit()
+                conversation_metadata_cache.invalidate(normalized_id)
+                record_user_write(existing.user_id)
+                logger.debug("Updated topic summary for conversation %s", normalized_id)
+                break
+    else:
+        logger.debug(
+            "No conversation found for topic summary update: id=%s, "
+            "topic_summary_len=%d",
+            normalized_id,
+            len(topic_summary),
+        )
 
     if (
         user_id
         and configuration.conversation_cache_configuration.type is not None
-        and configuration.conversation_cache is not None
+        and configuration.async_conversation_cache is not None
     ):
         try:
-            configuration.conversation_cache.set_topic_summary(
+            await configuration.async_conversation_cache.set_topic_summary(
                 user_id, conversation_id, topic_summary, skip_userid_check
             )
         except Exception as e:  # pylint: disable=broad-except
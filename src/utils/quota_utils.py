@@ -13,7 +13,7 @@ from models.api.responses.error import (
     QuotaExceededResponse,
 )
 from quota.quota_exceed_error import QuotaExceedError
-from quota.quota_limiter import QuotaLimiter
+from quota.quota_limiter import QuotaLimiter, QuotaReservation
 from quota.token_usage_history import TokenUsageHistory
 from utils.otel_tracing import SpanAttributes, record_exception
 
@@ -30,6 +30,7 @@ def consume_tokens(
     output_tokens: int,
     model_id: str,
     provider_id: str,
+    reservations: Optional[list[Optional[QuotaReservation]]] = None,
 ) -> None:
     """Consume tokens from cluster and/or user quotas.
 
@@ -42,6 +43,8 @@ def consume_tokens(
         output_tokens: Number of output tokens to consume.
         model_id: Model identification
         provider_id: Provider identification
+        reservations: Tokens reserved by the request, one item per quota
+            limiter; reserved tokens are replaced by the consumed ones.
 
     Returns:
     -------
@@ -57,7 +60,13 @@ def consume_tokens(
             output_tokens=output_tokens,
         )
     # consume tokens all configured quota limiters
-    for quota_limiter in quota_limiters:
+    for index, quota_limiter in enumerate(quota_limiters):
+        reservation = reservations[index] if reservations else None
+        if reservation is not None:
+            quota_limiter.settle_tokens(
+                reservation, input_tokens=input_tokens, output_tokens=output_tokens
+            )
+            continue
         quota_limiter.consume_tokens(
             input_tokens=input_tokens,
             output_tokens=output_tokens,
@@ -84,10 +93,68 @@ def check_tokens_available(quota_limiters: list[QuotaLimiter], user_id: str) ->
     """
     with tracer.start_as_current_span("quota.check") as span:
         try:
+            # subjects recently found out of quota are refused without
+            # database access
+            for quota_limiter in quota_limiters:
+                quota_limiter.ensure_not_exhausted(user_id)
+            # quota of limiters sharing the database is read by one query
+            available_quotas = QuotaLimiter.available_quotas(quota_limiters, user_id)
             # check available tokens using all configured quota limiters
+            for quota_limiter, available in zip(quota_limiters, available_quotas):
+                quota_limiter.ensure_available_quota(
+                    subject_id=user_id, available=available
+                )
+            span.set_attribute(SpanAttributes.QUOTA_CHECK_PASSED, True)
+        except (psycopg2.Error, sqlite3.Error) as pg_error:
+            message = "Error communicating with quota database backend"
+            logger.error(message)
+            span.set_attribute(SpanAttributes.QUOTA_CHECK_PASSED, False)
+            record_exception(span, pg_error)
+            response = InternalServerErrorResponse.database_error()
+            raise HTTPException(**response.model_dump()) from pg_error
+        except QuotaExceedError as e:
+            logger.error("The quota has been exceeded")
+            span.set_attribute(SpanAttributes.QUOTA_CHECK_PASSED, False)
+            record_exception(span, e)
+            response = QuotaExceededResponse.from_exception(e)
+            raise HTTPException(**response.model_dump()) from e
+
+
+def reserve_tokens(
+    quota_limiters: list[QuotaLimiter], user_id: str, tokens: int
+) -> list[Optional[QuotaReservation]]:
+    """Reserve tokens expected to be consumed by a request of the user.
+
+    When the quota of one limiter is exceeded, tokens already reserved in the
+    other limiters are returned.
+
+    Parameters:
+    ----------
+        quota_limiters: List of quota limiter instances to reserve tokens in.
+        user_id: Identifier of the user to reserve tokens for.
+        tokens: Number of tokens expected to be consumed.
+
+    Returns:
+    -------
+        Reservations to be settled, one item per quota limiter; None for
+        limiters that only checked the available quota.
+
+    Raises:
+    ------
+        HTTPException: With status 500 if database communication fails,
+            or status 429 if quota is exceeded.
+    """
+    reservations: list[Optional[QuotaReservation]] = []
+    with tracer.start_as_current_span("quota.check") as span:
+        try:
+            for quota_limiter in quota_limiters:
+                quota_limiter.ensure_not_exhausted(user_id)
             for quota_limiter in quota_limiters:
-                quota_limiter.ensure_available_quota(subject_id=user_id)
+                reservations.append(
+                    quota_limiter.reserve_tokens(tokens, subject_id=user_id)
+                )
             span.set_attribute(SpanAttributes.QUOTA_CHECK_PASSED, True)
+            return reservations
         except (psycopg2.Error, sqlite3.Error) as pg_error:
             message = "Error communicating with quota database backend"
             logger.error(message)
@@ -99,10 +166,35 @@ def check_tokens_available(quota_limiters: list[QuotaLimiter], user_id: str) ->
             logger.error("The quota has been exceeded")
             span.set_attribute(SpanAttributes.QUOTA_CHECK_PASSED, False)
             record_exception(span, e)
+            release_reservations(quota_limiters, reservations)
             response = QuotaExceededResponse.from_exception(e)
             raise HTTPException(**response.model_dump()) from e
 
 
+def release_reservations(
+    quota_limiters: list[QuotaLimiter],
+    reservations: list[Optional[QuotaReservation]],
+) -> None:
+    """Return reserved tokens of a refused or failed request to the quota.
+
+    Reservations which can not be returned now are reclaimed later.
+
+    Parameters:
+    ----------
+        quota_limiters: List of quota limiter instances holding the reservations.
+        reservations: Reservations made so far, in the order of the limiters.
+    """
+    for quota_limiter, reservation in zip(quota_limiters, reservations):
+        if reservation is None:
+            continue
+        try:
+            quota_limiter.settle_tokens(reservation, input_tokens=0, output_tokens=0)
+        except (psycopg2.Error, sqlite3.Error) as e:
+            logger.warning(
+                "Reservation %s not released: %s", reservation.reservation_id, e
+            )
+
+
 def get_available_quotas(
     quota_limiters: list[QuotaLimiter],
     user_id: str,
@@ -121,14 +213,17 @@ def get_available_quotas(
     """
     available_quotas: dict[str, int] = {}
 
-    # retrieve available tokens using all configured quota limiters
-    for quota_limiter in quota_limiters:
-        name = quota_limiter.__class__.__name__
-        try:
-            available_quota = quota_limiter.available_quota(user_id)
+    try:
+        # quota of limiters sharing the database is read by one query
+        read_quotas = QuotaLimiter.available_quotas(quota_limiters, user_id)
+        # retrieve remaining tokens using all configured quota limiters
+        for quota_limiter, available_quota in zip(quota_limiters, read_quotas):
+            name = quota_limiter.__class__.__name__
+            if available_quota is None:
+                available_quota = quota_limiter.available_quota(user_id)
             available_quotas[name] = available_quota
-        except (psycopg2.Error, sqlite3.Error) as e:
-            logger.exception("Database error getting available quotas.")
-            response = InternalServerErrorResponse.database_error()
-            raise HTTPException(**response.model_dump()) from e
+    except (psycopg2.Error, sqlite3.Error) as e:
+        logger.exception("Database error getting available quotas.")
+        response = InternalServerErrorResponse.database_error()
+        raise HTTPException(**response.model_dump()) from e
     return available_quotas
@@ -0,0 +1,333 @@
+"""Routing of read-only database operations to PostgreSQL read replicas.
+
+Read-only operations are spread across the configured replicas in
+round-robin fashion, writes always go to the primary database. Replication
+lag of every replica is measured at most once per
+`POSTGRES_REPLICA_LAG_CHECK_INTERVAL` seconds; replicas lagging more than
+`max_replica_lag` seconds or failing to answer are skipped until the next
+measurement finds them healthy again.
+
+Storages report writes made on behalf of a user by `record_user_write()`.
+Reads of that user are then served by the primary database for
+`read_your_writes_window` seconds, so the user sees their own changes even
+though the replicas have not replayed them yet. Writes are remembered per
+process only.
+"""
+
+import asyncio
+import itertools
+import threading
+from collections import OrderedDict
+from collections.abc import Sequence
+from dataclasses import dataclass
+from time import monotonic
+from typing import Optional
+
+import psycopg2
+from sqlalchemy import text
+from sqlalchemy.exc import SQLAlchemyError
+from sqlalchemy.ext.asyncio import AsyncEngine
+
+import constants
+from log import get_logger
+from models.config import PostgreSQLDatabaseConfiguration
+from utils.postgres_pool import PostgresConnectionPool, get_postgres_pool
+
+logger = get_logger(__name__)
+
+# seconds since the last transaction replayed by a standby; zero when the
+# standby has replayed everything it received, or when queried on a primary
+REPLICA_LAG_QUERY = """
+    SELECT CASE
+        WHEN pg_last_wal_receive_lsn() = pg_last_wal_replay_lsn() THEN 0
+        ELSE COALESCE(
+            EXTRACT(EPOCH FROM now() - pg_last_xact_replay_timestamp()), 0)
+    END
+    """
+
+# user ID -> monotonic time of the last write, least recent first
+_USER_WRITES: OrderedDict[str, float] = OrderedDict()
+_USER_WRITES_LOCK = threading.Lock()
+
+# lag checks in progress; the event loop keeps weak references to tasks only
+_LAG_CHECKS: set[asyncio.Task] = set()
+
+
+def record_user_write(user_id: Optional[str]) -> None:
+    """Remember that data of the user have just been written to the primary.
+
+    Parameters:
+    ----------
+        user_id: User whose data have been written; None or empty ID is
+        ignored.
+    """
+    if not user_id:
+        return
+    with _USER_WRITES_LOCK:
+        _USER_WRITES[user_id] = monotonic()
+        _USER_WRITES.move_to_end(user_id)
+        while len(_USER_WRITES) > constants.POSTGRES_READ_YOUR_WRITES_MAX_USERS:
+            _USER_WRITES.popitem(last=False)
+
+
+def wrote_recently(user_id: Optional[str], window: float) -> bool:
+    """Check if data of the user have been written within the window.
+
+    Parameters:
+    ----------
+        user_id: User to check; None or empty ID never wrote.
+        window: Number of seconds to look back.
+
+    Returns:
+    -------
+        True if the last write of the user is not older than `window` seconds.
+    """
+    if not user_id:
+        return False
+    with _USER_WRITES_LOCK:
+        written_at = _USER_WRITES.get(user_id)
+    return written_at is not None and monotonic() - written_at <= window
+
+
+def clear_user_writes() -> None:
+    """Forget all recorded writes."""
+    with _USER_WRITES_LOCK:
+        _USER_WRITES.clear()
+
+
+def replica_configurations(
+    config: PostgreSQLDatabaseConfiguration,
+) -> list[PostgreSQLDatabaseConfiguration]:
+    """Return connection configurations of read replicas of the database.
+
+    Replicas share all settings except host and port with the primary.
+
+    Parameters:
+    ----------
+        config: PostgreSQL configuration of the primary database.
+
+    Returns:
+    -------
+        One configuration per replica, in the configured order.
+    """
+    return [
+        config.model_copy(
+            update={
+                "host": replica.host,
+                "port": replica.port,
+                "replicas": [],
+                "shards": [],
+            }
+        )
+        for replica in config.replicas
+    ]
+
+
+@dataclass
+class _ReplicaState:
+    """Result of the last replication lag measurement of a replica."""
+
+    # replicas serve reads only after their lag has been measured
+    healthy: bool = False
+    checked_at: float = float("-inf")
+
+
+class ReplicaRouter[T]:
+    """Chooses a read replica to serve a read-only operation.
+
+    Replicas are connection handles of any kind, such as async engines or
+    connection configurations; the router keeps track of their health only.
+    """
+
+    def __init__(
+        self,
+        replicas: Sequence[T],
+        max_lag: float,
+        read_your_writes_window: float,
+        check_interval: float = constants.POSTGRES_REPLICA_LAG_CHECK_INTERVAL,
+    ) -> None:
+        """Create router over the given replicas.
+
+        Parameters:
+        ----------
+            replicas: Connection handles of the replicas.
+            max_lag: Number of seconds a replica may lag behind the primary.
+            read_your_writes_window: Number of seconds after a write of a
+            user during which reads of the user go to the primary.
+            check_interval: Number of seconds between two lag measurements
+            of one replica.
+        """
+        self.replicas = list(replicas)
+        self.max_lag = max_lag
+        self.read_your_writes_window = read_your_writes_window
+        self.check_interval = check_interval
+        self._states = [_ReplicaState() for _ in self.replicas]
+        self._turns = itertools.count()
+        self._lock = threading.Lock()
+
+    def choose(self, user_id: Optional[str]) -> Optional[T]:
+        """Choose replica serving a read of the user.
+
+        Parameters:
+        ----------
+            user_id: User whose data are read, None when the read is not
+            bound to a user.
+
+        Returns:
+        -------
+            The next healthy replica in round-robin order, or None when the
+            read must be served by the primary database.
+        """
+        if wrote_recently(user_id, self.read_your_writes_window):
+            return None
+        count = len(self.replicas)
+        start = next(self._turns)
+        for offset in range(count):
+            index = (start + offset) % count
+            if self._states[index].healthy:
+                return self.replicas[index]
+        return None
+
+    def claim_lag_checks(self) -> list[int]:
+        """Return indexes of replicas whose lag should be measured now.
+
+        Claimed measurements are not handed out again until the check
+        interval passes, so concurrent callers do not measure one replica
+        several times.
+
+        Returns:
+        -------
+            Indexes of the replicas to measure.
+        """
+        now = monotonic()
+        due = []
+        with self._lock:
+            for index, state in enumerate(self._states):
+                if now - state.checked_at >= self.check_interval:
+                    state.checked_at = now
+                    due.append(index)
+        return due
+
+    def report_lag(self, index: int, lag: Optional[float]) -> None:
+        """Record measured replication lag of a replica.
+
+        Parameters:
+        ----------
+            index: Index of the measured replica.
+            lag: Lag in seconds, None when the replica could not be reached.
+        """
+        healthy = lag is not None and lag <= self.max_lag
+        state = self._states[index]
+        if state.healthy and not healthy:
+            logger.warning(
+                "Read replica %d is not used, replication lag: %s", index, lag
+            )
+        elif healthy and not state.healthy:
+            logger.info("Read replica %d is used, replication lag: %s", index, lag)
+        state.healthy = healthy
+
+
+def replica_router[T](
+    config: Optional[PostgreSQLDatabaseConfiguration], replicas: Sequence[T]
+) -> Optional[ReplicaRouter[T]]:
+    """Create router over the replicas of the database, if any.
+
+    Parameters:
+    ----------
+        config: PostgreSQL configuration of the primary database.
+        replicas: Connection handles of the replicas, one per configured
+        replica.
+
+    Returns:
+    -------
+        Router over the replicas, or None when no replica is configured.
+    """
+    if config is None or not replicas:
+        return None
+    return ReplicaRouter(
+        replicas, config.max_replica_lag, config.read_your_writes_window
+    )
+
+
+async def _check_async_replica_lag(
+    router: ReplicaRouter[AsyncEngine], index: int
+) -> None:
+    """Measure replication lag of a replica served by an async engine."""
+    lag: Optional[float] = None
+    try:
+        async with router.replicas[index].connect() as conn:
+            lag = float((await conn.execute(text(REPLICA_LAG_QUERY))).scalar_one())
+    except (SQLAlchemyError, OSError) as e:
+        logger.warning("Replication lag check of read replica %d failed: %s", index, e)
+    router.report_lag(index, lag)
+
+
+def route_async_read(
+    router: Optional[ReplicaRouter[AsyncEngine]], user_id: Optional[str]
+) -> Optional[AsyncEngine]:
+    """Choose async engine of a replica serving a read of the user.
+
+    Lag measurements that are due run in background tasks, so the read does
+    not wait for them. Must be called from a running event loop.
+
+    Parameters:
+    ----------
+        router: Router over replica engines, None when there are no replicas.
+        user_id: User whose data are read.
+
+    Returns:
+    -------
+        Engine of the chosen replica, or None when the read must be served
+        by the primary database.
+    """
+    if router is None:
+        return None
+    for index in router.claim_lag_checks():
+        task = asyncio.create_task(_check_async_replica_lag(router, index))
+        _LAG_CHECKS.add(task)
+        task.add_done_callback(_LAG_CHECKS.discard)
+    return router.choose(user_id)
+
+
+def route_pooled_read(
+    router: Optional[ReplicaRouter[PostgreSQLDatabaseConfiguration]],
+    user_id: Optional[str],
+) -> Optional[PostgresConnectionPool]:
+    """Choose connection pool of a replica serving a read of the user.
+
+    Lag measurements that are due are performed before the replica is
+    chosen, over connections leased from the replica pools.
+
+    Parameters:
+    ----------
+        router: Router over replica configurations, None when there are no
+        replicas.
+        user_id: User whose data are read.
+
+    Returns:
+    -------
+        Connection pool of the chosen replica, or None when the read must be
+        served by the primary database.
+
+    Raises:
+    ------
+        psycopg2.Error: If opening connections of the chosen replica fails.
+    """
+    if router is None:
+        return None
+    for index in router.claim_lag_checks():
+        lag: Optional[float] = None
+        try:
+            with get_postgres_pool(router.replicas[index]).lease() as connection:
+                with connection.cursor() as cursor:
+                    cursor.execute(REPLICA_LAG_QUERY)
+                    lag = float(cursor.fetchone()[0])
+        except psycopg2.Error as e:
+            logger.warning(
+                "Replication lag check of read replica %d failed: %s", index, e
+            )
+        router.report_lag(index, lag)
+    replica = router.choose(user_id)
+    if replica is None:
+        return None
+    return get_postgres_pool(replica)
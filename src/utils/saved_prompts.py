@@ -1,9 +1,10 @@
 """Validation helpers and data access for saved prompts."""
 
+from sqlalchemy import func, select
 from sqlalchemy.exc import IntegrityError
 
 import constants
-from app.database import get_session
+from app.database import get_async_session
 from log import get_logger
 from models.database.saved_prompts import SavedPrompt
 from utils.suid import get_suid
@@ -118,7 +119,7 @@ def validate_saved_prompt_content(
         )
 
 
-def create_saved_prompt(
+async def create_saved_prompt(
     user_id: str,
     name: str,
     content: str,
@@ -145,9 +146,13 @@ def create_saved_prompt(
         SavedPromptConflictError: If insert violates a unique constraint
             (practically always duplicate ``(user_id, name)``).
     """
-    with get_session() as session:
-        current_count = session.query(SavedPrompt).filter_by(user_id=user_id).count()
-        validate_saved_prompt_quota(current_count, max_prompts_per_user)
+    async with get_async_session() as session:
+        current_count = await session.scalar(
+            select(func.count())
+            .select_from(SavedPrompt)
+            .where(SavedPrompt.user_id == user_id)
+        )
+        validate_saved_prompt_quota(current_count or 0, max_prompts_per_user)
 
         saved_prompt = SavedPrompt(
             id=get_suid(),
@@ -157,7 +162,7 @@ def create_saved_prompt(
         )
         session.add(saved_prompt)
         try:
-            session.commit()
+            await session.commit()
         except IntegrityError as exc:
             logger.debug(
                 "Saved prompt create conflict for user_id=%s",
@@ -166,7 +171,7 @@ def create_saved_prompt(
             raise SavedPromptConflictError("Saved prompt name already exists") from exc
 
         # reload server default timestamps so they remain usable after the session closes
-        session.refresh(saved_prompt)
+        await session.refresh(saved_prompt)
         logger.debug(
             "Created saved prompt id=%s for user_id=%s",
             saved_prompt.id,
@@ -175,7 +180,7 @@ def create_saved_prompt(
         return saved_prompt
 
 
-def list_saved_prompts_by_user(user_id: str) -> list[SavedPrompt]:
+async def list_saved_prompts_by_user(user_id: str) -> list[SavedPrompt]:
     """List saved prompts for a user ordered by created_at descending.
 
     Results are capped at ``SAVED_PROMPTS_MAX_PER_USER_UPPER_BOUND`` so a
@@ -188,17 +193,17 @@ def list_saved_prompts_by_user(user_id: str) -> list[SavedPrompt]:
         List of ``SavedPrompt`` rows for the user. Empty list if none exist.
         Tie order when ``created_at`` values are equal is database-defined.
     """
-    with get_session() as session:
-        return (
-            session.query(SavedPrompt)
+    async with get_async_session() as session:
+        saved_prompts = await session.scalars(
+            select(SavedPrompt)
             .filter_by(user_id=user_id)
             .order_by(SavedPrompt.created_at.desc())
             .limit(constants.SAVED_PROMPTS_MAX_PER_USER_UPPER_BOUND)
-            .all()
         )
+        return list(saved_prompts.all())
 
 
-def delete_saved_prompt_by_id_and_user(prompt_id: str, user_id: str) -> None:
+async def delete_saved_prompt_by_id_and_user(prompt_id: str, user_id: str) -> None:
     """Delete a saved prompt only if it belongs to the given user.
 
     Parameters:
@@ -210,8 +215,8 @@ def delete_saved_prompt_by_id_and_user(prompt_id: str, user_id: str) -> None:
         SavedPromptAccessDeniedError: If the row exists but ``user_id`` does not
             match the owner.
     """
-    with get_session() as session:
-        saved_prompt = session.query(SavedPrompt).filter_by(id=prompt_id).first()
+    async with get_async_session() as session:
+        saved_prompt = await session.get(SavedPrompt, prompt_id)
         if saved_prompt is None:
             logger.debug(
                 "Saved prompt not found for delete prompt_id=%s user_id=%s",
@@ -228,8 +233,8 @@ def delete_saved_prompt_by_id_and_user(prompt_id: str, user_id: str) -> None:
             )
             raise SavedPromptAccessDeniedError("Saved prompt access denied")
 
-        session.delete(saved_prompt)
-        session.commit()
+        await session.delete(saved_prompt)
+        await session.commit()
         logger.debug(
             "Deleted saved prompt id=%s for user_id=%s",
             prompt_id,
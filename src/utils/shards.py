@@ -0,0 +1,161 @@
+"""Assignment of users to PostgreSQL shards storing their conversations.
+
+Users are assigned to shards by rendezvous (highest random weight) hashing:
+every shard is scored by a stable hash of the shard name and the user ID and
+the shard with the highest score wins. The assignment does not depend on the
+order of shards, and adding or removing a shard moves only the users of that
+shard, so resharding after such a change copies as little data as possible.
+"""
+
+import hashlib
+from collections.abc import Iterator, Sequence
+from typing import Optional
+
+from models.config import PostgreSQLDatabaseConfiguration
+
+
+def _score(shard_name: str, user_id: str) -> bytes:
+    """Return stable score of the shard for the user."""
+    return hashlib.blake2b(
+        f"{shard_name}\0{user_id}".encode("utf-8"), digest_size=8
+    ).digest()
+
+
+def shard_index(user_id: str, shard_names: Sequence[str]) -> int:
+    """Return index of the shard storing conversations of the user.
+
+    Parameters:
+    ----------
+        user_id: User whose conversations are stored.
+        shard_names: Names of all shards.
+
+    Returns:
+    -------
+        Index into `shard_names`.
+
+    Raises:
+    ------
+        ValueError: If there are no shards.
+    """
+    if not shard_names:
+        raise ValueError("No shards to choose from")
+    return max(
+        range(len(shard_names)), key=lambda index: _score(shard_names[index], user_id)
+    )
+
+
+def shard_configurations(
+    config: PostgreSQLDatabaseConfiguration,
+) -> list[PostgreSQLDatabaseConfiguration]:
+    """Return connection configurations of shards of the database.
+
+    Shards share all settings except name, host, port and database name with
+    the primary database; they have neither read replicas nor shards.
+
+    Parameters:
+    ----------
+        config: PostgreSQL configuration of the primary database.
+
+    Returns:
+    -------
+        One configuration per shard, in the configured order.
+    """
+    return [
+        config.model_copy(
+            update={
+                "host": shard.host,
+                "port": shard.port,
+                "db": shard.db,
+                "replicas": [],
+                "shards": [],
+            }
+        )
+        for shard in config.shards
+    ]
+
+
+class Shards[T]:
+    """Connection handles of shards addressed by user ID.
+
+    Handles can be of any kind, such as engines or connection configurations.
+    """
+
+    def __init__(self, names: Sequence[str], handles: Sequence[T]) -> None:
+        """Create mapping of users to the given shards.
+
+        Parameters:
+        ----------
+            names: Names of the shards.
+            handles: Connection handles of the shards, in the order of names.
+
+        Raises:
+        ------
+            ValueError: If there are no shards or the sequences differ in
+            length.
+        """
+        if not names or len(names) != len(handles):
+            raise ValueError("Every shard needs a name and a connection handle")
+        self.names = list(names)
+        self.handles = list(handles)
+
+    def __len__(self) -> int:
+        """Return number of shards."""
+        return len(self.handles)
+
+    def __iter__(self) -> Iterator[T]:
+        """Iterate over handles of all shards."""
+        return iter(self.handles)
+
+    def for_user(self, user_id: str) -> T:
+        """Return handle of the shard storing conversations of the user.
+
+        Parameters:
+        ----------
+            user_id: User whose conversations are accessed.
+
+        Returns:
+        -------
+            Handle of the user's shard.
+        """
+        return self.handles[shard_index(user_id, self.names)]
+
+    def user_first(self, user_id: Optional[str]) -> list[T]:
+        """Return handles of all shards, the shard of the user first.
+
+        Used to look up data whose owner is not known, such as a conversation
+        of another user: the user's own data are found by the first query.
+
+        Parameters:
+        ----------
+            user_id: User whose shard is searched first, None to keep the
+            configured order.
+
+        Returns:
+        -------
+            Handles of all shards.
+        """
+        if user_id is None:
+            return list(self.handles)
+        first = shard_index(user_id, self.names)
+        return [self.handles[first]] + [
+            handle for index, handle in enumerate(self.handles) if index != first
+        ]
+
+
+def shards_of[T](
+    config: Optional[PostgreSQLDatabaseConfiguration], handles: Sequence[T]
+) -> Optional[Shards[T]]:
+    """Create mapping of users to the shards of the database, if any.
+
+    Parameters:
+    ----------
+        config: PostgreSQL configuration of the primary database.
+        handles: Connection handles of the shards, one per configured shard.
+
+    Returns:
+    -------
+        Mapping of users to the shards, or None when no shard is configured.
+    """
+    if config is None or not config.shards:
+        return None
+    return Shards([shard.name for shard in config.shards], handles)
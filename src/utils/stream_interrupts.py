@@ -200,7 +200,7 @@ async def background_update_topic_summary(
             timeout=TOPIC_SUMMARY_INTERRUPT_TIMEOUT_SECONDS,
         )
         if topic_summary:
-            update_conversation_topic_summary(
+            await update_conversation_topic_summary(
                 context.conversation_id,
                 topic_summary,
                 user_id=context.user_id,
@@ -297,7 +297,7 @@ async def persist_interrupted_turn(
         completed_at = datetime.datetime.now(datetime.UTC).strftime(
             "%Y-%m-%dT%H:%M:%SZ"
         )
-        store_query_results(
+        await store_query_results(
             user_id=context.user_id,
             conversation_id=context.conversation_id,
             model=responses_params.model,
@@ -1,13 +1,16 @@
 """Database benchmarks implementations."""
 
+import asyncio
 from datetime import UTC, datetime
 from typing import Optional
 
 from pytest_benchmark.fixture import BenchmarkFixture
 from sqlalchemy.orm import Session
 
-from app.database import get_session
-from models.database.conversations import UserConversation
+from app.database import dispose_async_engine, get_session
+from models.database.conversations import UserConversation, UserTurn
+from utils.endpoints import conversations_list_statement
+from utils.query import persist_user_conversation_details
 from utils.suid import get_suid
 
 from .data_generators import (
@@ -16,6 +19,9 @@ from .data_generators import (
     generate_topic_summary,
 )
 
+# number of users owning the conversations in paginated listing benchmarks
+PAGINATED_LISTING_USERS = 10
+
 
 def store_new_user_conversation(
     session: Session, id: Optional[str] = None, user_id: Optional[str] = None
@@ -54,6 +60,65 @@ def store_new_user_conversation(
     session.commit()
 
 
+def store_user_turns(session: Session, conversation_id: str, turns: int) -> None:
+    """Store turns of existing conversation into database.
+
+    The message count of the conversation is updated to match the number of
+    stored turns, the same way it is maintained when turns are persisted.
+
+    Parameters:
+    ----------
+        session (Session): SQLAlchemy session used to persist the records.
+        conversation_id (str): ID of conversation the turns belong to.
+        turns (int): Number of turns to store.
+
+    Returns:
+    -------
+        None
+    """
+    started_at = datetime.now(UTC)
+    session.add_all(
+        UserTurn(
+            conversation_id=conversation_id,
+            turn_number=turn_number,
+            started_at=started_at,
+            completed_at=started_at,
+            provider="provider",
+            model="model",
+            response_id=get_suid(),
+        )
+        for turn_number in range(1, turns + 1)
+    )
+    conversation = session.get(UserConversation, conversation_id)
+    assert conversation is not None
+    conversation.message_count = turns
+    session.commit()
+
+
+async def persist_turn(conversation_id: str, user_id: str) -> None:
+    """Persist one more turn of existing conversation.
+
+    Parameters:
+    ----------
+        conversation_id (str): ID of conversation to append the turn to.
+        user_id (str): ID of user owning the conversation.
+
+    Returns:
+    -------
+        None
+    """
+    await persist_user_conversation_details(
+        user_id=user_id,
+        conversation_id=conversation_id,
+        started_at="2025-10-03T09:31:25+00:00",
+        completed_at="2025-10-03T09:31:29+00:00",
+        model_id="model",
+        provider_id="provider",
+        topic_summary=None,
+        response_id=get_suid(),
+    )
+
+
 def update_user_conversation(session: Session, id: str) -> None:
     """Update existing conversation in the database.
 
@@ -107,6 +172,56 @@ def list_conversation_for_all_users(session: Session) -> None:
     assert len(user_conversations) >= 0
 
 
+def list_conversations_page(
+    session: Session,
+    user_id: Optional[str],
+    before: Optional[tuple[datetime, str]],
+    limit: int,
+) -> None:
+    """Query and assert retrieval of one page of conversations.
+
+    This helper runs the statement used by the conversations listing endpoint,
+    selecting one more conversation than the page size to detect next page.
+
+    Parameters:
+    ----------
+        session (Session): SQLAlchemy session used to query conversations.
+        user_id (Optional[str]): Owner of the conversations, None for all users.
+        before (Optional[tuple[datetime, str]]): Position of the last
+            conversation on the previous page.
+        limit (int): Number of conversations on the page.
+
+    Returns:
+    -------
+        None
+    """
+    statement = conversations_list_statement(user_id, before, limit + 1)
+
+    conversations = session.execute(statement).all()
+    assert len(conversations) <= limit + 1
+
+
+def middle_page_cursor(
+    session: Session, user_id: Optional[str]
+) -> Optional[tuple[datetime, str]]:
+    """Retrieve position of the conversation in the middle of the listing.
+
+    Parameters:
+    ----------
+        session (Session): SQLAlchemy session used to query conversations.
+        user_id (Optional[str]): Owner of the conversations, None for all users.
+
+    Returns:
+    -------
+        Optional[tuple[datetime, str]]: Last message time and ID of the
+        conversation, None when there are no conversations.
+    """
+    statement = conversations_list_statement(user_id)
+    count = len(session.execute(statement).all())
+    row = session.execute(statement.offset(count // 2).limit(1)).first()
+    return (row.last_message_at, row.id) if row is not None else None
+
+
 def retrieve_conversation(
     session: Session, conversation_id: str, should_be_none: bool
 ) -> None:
@@ -240,17 +355,22 @@ def benchmark_update_user_conversation(
 
 
 def benchmark_list_conversations_for_all_users(
-    benchmark: BenchmarkFixture, records_to_insert: int
+    benchmark: BenchmarkFixture,
+    records_to_insert: int,
+    page_size: Optional[int] = None,
 ) -> None:
     """Prepare DB and benchmark listing all conversations.
 
     Pre-populates the DB with ``records_to_insert`` entries and benchmarks
     the performance of querying and retrieving all UserConversation rows.
+    When ``page_size`` is specified, one page of conversations from the middle
+    of the listing is retrieved instead.
 
     Parameters:
     ----------
         benchmark (BenchmarkFixture): pytest-benchmark fixture to run the measurement.
         records_to_insert (int): Number of records to pre-populate before benchmarking.
+        page_size (Optional[int]): Number of conversations on the listed page.
 
     Returns:
     -------
@@ -261,26 +381,47 @@ def benchmark_list_conversations_for_all_users(
         for id in range(records_to_insert):
             store_new_user_conversation(session, str(id))
         # then perform the benchmark
-        benchmark(list_conversation_for_all_users, session)
+        if page_size is None:
+            benchmark(list_conversation_for_all_users, session)
+        else:
+            before = middle_page_cursor(session, None)
+            benchmark(list_conversations_page, session, None, before, page_size)
 
 
 def benchmark_list_conversations_for_one_user(
-    benchmark: BenchmarkFixture, records_to_insert: int
+    benchmark: BenchmarkFixture,
+    records_to_insert: int,
+    page_size: Optional[int] = None,
 ) -> None:
     """Prepare DB and benchmark listing all conversations.
 
     Pre-populates the DB with ``records_to_insert`` entries and benchmarks
     the performance of querying and retrieving all UserConversation rows.
+    When ``page_size`` is specified, the conversations are shared by
+    ``PAGINATED_LISTING_USERS`` users and one page from the middle of one
+    user's listing is retrieved instead.
 
     Parameters:
     ----------
         benchmark (BenchmarkFixture): pytest-benchmark fixture to run the measurement.
         records_to_insert (int): Number of records to pre-populate before benchmarking.
+        page_size (Optional[int]): Number of conversations on the listed page.
 
     Returns:
     -------
         None
     """
+    if page_size is not None:
+        with get_session() as session:
+            for id in range(records_to_insert):
+                store_new_user_conversation(
+                    session, str(id), str(id % PAGINATED_LISTING_USERS)
+                )
+            user_id = "0"
+            before = middle_page_cursor(session, user_id)
+            benchmark(list_conversations_page, session, user_id, before, page_size)
+        return
+
     with get_session() as session:
         # store bunch of conversations first
         for id in range(records_to_insert):
@@ -355,3 +496,32 @@ def benchmark_retrieve_conversation_for_one_user(
             conversation_id,
             records_to_insert == 0,  # a flag whether records should be read
         )
+
+
+def benchmark_persist_turn_long_conversation(
+    benchmark: BenchmarkFixture, turns: int
+) -> None:
+    """Prepare DB and benchmark persisting a turn of long conversation.
+
+    The database is pre-populated with one conversation having ``turns``
+    turns, then the benchmark task appends one more turn to it.
+
+    Parameters:
+    ----------
+        benchmark (BenchmarkFixture): pytest-benchmark fixture to run the measurement.
+        turns (int): Number of turns stored in the conversation before benchmarking.
+
+    Returns:
+    -------
+        None
+    """
+    conversation_id = get_suid()
+    user_id = get_suid()
+    with get_session() as session:
+        store_new_user_conversation(session, conversation_id, user_id)
+        store_user_turns(session, conversation_id, turns)
+
+    # pooled async connections are bound to the event loop that opened them
+    with asyncio.Runner() as runner:
+        benchmark(lambda: runner.run(persist_turn(conversation_id, user_id)))
+        runner.run(dispose_async_engine())
@@ -2,9 +2,12 @@
 
 from pytest_benchmark.fixture import BenchmarkFixture
 
+from constants import CONVERSATIONS_PAGE_DEFAULT_LIMIT
+
 from .db_benchmarks import (
     benchmark_list_conversations_for_all_users,
     benchmark_list_conversations_for_one_user,
+    benchmark_persist_turn_long_conversation,
     benchmark_retrieve_conversation,
     benchmark_retrieve_conversation_for_one_user,
     benchmark_store_new_user_conversations,
@@ -16,6 +19,11 @@ SMALL_DB_RECORDS_COUNT = 100
 MIDDLE_DB_RECORDS_COUNT = 1000
 LARGE_DB_RECORDS_COUNT = 10000
 
+# number of turns stored in conversation before benchmarks
+SHORT_CONVERSATION_TURNS = 10
+LONG_CONVERSATION_TURNS = 1000
+VERY_LONG_CONVERSATION_TURNS = 10000
+
 
 def test_sqlite_store_new_user_conversations_empty_db(
     sqlite_database: None, benchmark: BenchmarkFixture
@@ -437,6 +445,171 @@ def test_sqlite_retrieve_conversation_for_one_user_large_db(
     benchmark_retrieve_conversation_for_one_user(benchmark, LARGE_DB_RECORDS_COUNT)
 
 
+def test_sqlite_list_conversations_page_for_all_users_small_db(
+    sqlite_database: None, benchmark: BenchmarkFixture
+) -> None:
+    """Benchmark listing one page of conversations for all users on a small database.
+
+    Parameters:
+    ----------
+        sqlite_database: Fixture that prepares a temporary SQLite DB.
+        benchmark (BenchmarkFixture): pytest-benchmark fixture.
+
+    Returns:
+    -------
+        None
+    """
+    benchmark_list_conversations_for_all_users(
+        benchmark, SMALL_DB_RECORDS_COUNT, CONVERSATIONS_PAGE_DEFAULT_LIMIT
+    )
+
+
+def test_sqlite_list_conversations_page_for_all_users_middle_db(
+    sqlite_database: None, benchmark: BenchmarkFixture
+) -> None:
+    """Benchmark listing one page of conversations for all users on a medium-sized database.
+
+    Parameters:
+    ----------
+        sqlite_database: Fixture that prepares a temporary SQLite DB.
+        benchmark (BenchmarkFixture): pytest-benchmark fixture.
+
+    Returns:
+    -------
+        None
+    """
+    benchmark_list_conversations_for_all_users(
+        benchmark, MIDDLE_DB_RECORDS_COUNT, CONVERSATIONS_PAGE_DEFAULT_LIMIT
+    )
+
+
+def test_sqlite_list_conversations_page_for_all_users_large_db(
+    sqlite_database: None, benchmark: BenchmarkFixture
+) -> None:
+    """Benchmark listing one page of conversations for all users on a large database.
+
+    Parameters:
+    ----------
+        sqlite_database: Fixture that prepares a temporary SQLite DB.
+        benchmark (BenchmarkFixture): pytest-benchmark fixture.
+
+    Returns:
+    -------
+        None
+    """
+    benchmark_list_conversations_for_all_users(
+        benchmark, LARGE_DB_RECORDS_COUNT, CONVERSATIONS_PAGE_DEFAULT_LIMIT
+    )
+
+
+def test_sqlite_list_conversations_page_for_one_user_small_db(
+    sqlite_database: None, benchmark: BenchmarkFixture
+) -> None:
+    """Benchmark listing one page of conversations for one user on a small database.
+
+    Parameters:
+    ----------
+        sqlite_database: Fixture that prepares a temporary SQLite DB.
+        benchmark (BenchmarkFixture): pytest-benchmark fixture.
+
+    Returns:
+    -------
+        None
+    """
+    benchmark_list_conversations_for_one_user(
+        benchmark, SMALL_DB_RECORDS_COUNT, CONVERSATIONS_PAGE_DEFAULT_LIMIT
+    )
+
+
+def test_sqlite_list_conversations_page_for_one_user_middle_db(
+    sqlite_database: None, benchmark: BenchmarkFixture
+) -> None:
+    """Benchmark listing one page of conversations for one user on a medium-sized database.
+
+    Parameters:
+    ----------
+        sqlite_database: Fixture that prepares a temporary SQLite DB.
+        benchmark (BenchmarkFixture): pytest-benchmark fixture.
+
+    Returns:
+    -------
+        None
+    """
+    benchmark_list_conversations_for_one_user(
+        benchmark, MIDDLE_DB_RECORDS_COUNT, CONVERSATIONS_PAGE_DEFAULT_LIMIT
+    )
+
+
+def test_sqlite_list_conversations_page_for_one_user_large_db(
+    sqlite_database: None, benchmark: BenchmarkFixture
+) -> None:
+    """Benchmark listing one page of conversations for one user on a large database.
+
+    Parameters:
+    ----------
+        sqlite_database: Fixture that prepares a temporary SQLite DB.
+        benchmark (BenchmarkFixture): pytest-benchmark fixture.
+
+    Returns:
+    -------
+        None
+    """
+    benchmark_list_conversations_for_one_user(
+        benchmark, LARGE_DB_RECORDS_COUNT, CONVERSATIONS_PAGE_DEFAULT_LIMIT
+    )
+
+
+def test_sqlite_persist_turn_short_conversation(
+    sqlite_database: None, benchmark: BenchmarkFixture
+) -> None:
+    """Benchmark persisting a turn of a short conversation.
+
+    Parameters:
+    ----------
+        sqlite_database: Fixture that prepares a temporary SQLite DB.
+        benchmark (BenchmarkFixture): pytest-benchmark fixture.
+
+    Returns:
+    -------
+        None
+    """
+    benchmark_persist_turn_long_conversation(benchmark, SHORT_CONVERSATION_TURNS)
+
+
+def test_sqlite_persist_turn_long_conversation(
+    sqlite_database: None, benchmark: BenchmarkFixture
+) -> None:
+    """Benchmark persisting a turn of a long conversation.
+
+    Parameters:
+    ----------
+        sqlite_database: Fixture that prepares a temporary SQLite DB.
+        benchmark (BenchmarkFixture): pytest-benchmark fixture.
+
+    Returns:
+    -------
+        None
+    """
+    benchmark_persist_turn_long_conversation(benchmark, LONG_CONVERSATION_TURNS)
+
+
+def test_sqlite_persist_turn_very_long_conversation(
+    sqlite_database: None, benchmark: BenchmarkFixture
+) -> None:
+    """Benchmark persisting a turn of a very long conversation.
+
+    Parameters:
+    ----------
+        sqlite_database: Fixture that prepares a temporary SQLite DB.
+        benchmark (BenchmarkFixture): pytest-benchmark fixture.
+
+    Returns:
+    -------
+        None
+    """
+    benchmark_persist_turn_long_conversation(benchmark, VERY_LONG_CONVERSATION_TURNS)
+
+
 def test_postgres_store_new_user_conversations_empty_db(
     postgres_database: None, benchmark: BenchmarkFixture
 ) -> None:
@@ -855,3 +1028,168 @@ def test_postgres_retrieve_conversation_for_one_user_large_db(
         None
     """
     benchmark_retrieve_conversation_for_one_user(benchmark, LARGE_DB_RECORDS_COUNT)
+
+
+def test_postgres_list_conversations_page_for_all_users_small_db(
+    postgres_database: None, benchmark: BenchmarkFixture
+) -> None:
+    """Benchmark listing one page of conversations for all users on a small database.
+
+    Parameters:
+    ----------
+        postgres_database: Fixture that prepares a temporary PostgreSQL DB.
+        benchmark (BenchmarkFixture): pytest-benchmark fixture.
+
+    Returns:
+    -------
+        None
+    """
+    benchmark_list_conversations_for_all_users(
+        benchmark, SMALL_DB_RECORDS_COUNT, CONVERSATIONS_PAGE_DEFAULT_LIMIT
+    )
+
+
+def test_postgres_list_conversations_page_for_all_users_middle_db(
+    postgres_database: None, benchmark: BenchmarkFixture
+) -> None:
+    """Benchmark listing one page of conversations for all users on a medium-sized database.
+
+    Parameters:
+    ----------
+        postgres_database: Fixture that prepares a temporary PostgreSQL DB.
+        benchmark (BenchmarkFixture): pytest-benchmark fixture.
+
+    Returns:
+    -------
+        None
+    """
+    benchmark_list_conversations_for_all_users(
+        benchmark, MIDDLE_DB_RECORDS_COUNT, CONVERSATIONS_PAGE_DEFAULT_LIMIT
+    )
+
+
+def test_postgres_list_conversations_page_for_all_users_large_db(
+    postgres_database: None, benchmark: BenchmarkFixture
+) -> None:
+    """Benchmark listing one page of conversations for all users on a large database.
+
+    Parameters:
+    ----------
+        postgres_database: Fixture that prepares a temporary PostgreSQL DB.
+        benchmark (BenchmarkFixture): pytest-benchmark fixture.
+
+    Returns:
+    -------
+        None
+    """
+    benchmark_list_conversations_for_all_users(
+        benchmark, LARGE_DB_RECORDS_COUNT, CONVERSATIONS_PAGE_DEFAULT_LIMIT
+    )
+
+
+def test_postgres_list_conversations_page_for_one_user_small_db(
+    postgres_database: None, benchmark: BenchmarkFixture
+) -> None:
+    """Benchmark listing one page of conversations for one user on a small database.
+
+    Parameters:
+    ----------
+        postgres_database: Fixture that prepares a temporary PostgreSQL DB.
+        benchmark (BenchmarkFixture): pytest-benchmark fixture.
+
+    Returns:
+    -------
+        None
+    """
+    benchmark_list_conversations_for_one_user(
+        benchmark, SMALL_DB_RECORDS_COUNT, CONVERSATIONS_PAGE_DEFAULT_LIMIT
+    )
+
+
+def test_postgres_list_conversations_page_for_one_user_middle_db(
+    postgres_database: None, benchmark: BenchmarkFixture
+) -> None:
+    """Benchmark listing one page of conversations for one user on a medium-sized database.
+
+    Parameters:
+    ----------
+        postgres_database: Fixture that prepares a temporary PostgreSQL DB.
+        benchmark (BenchmarkFixture): pytest-benchmark fixture.
+
+    Returns:
+    -------
+        None
+    """
+    benchmark_list_conversations_for_one_user(
+        benchmark, MIDDLE_DB_RECORDS_COUNT, CONVERSATIONS_PAGE_DEFAULT_LIMIT
+    )
+
+
+def test_postgres_list_conversations_page_for_one_user_large_db(
+    postgres_database: None, benchmark: BenchmarkFixture
+) -> None:
+    """Benchmark listing one page of conversations for one user on a large database.
+
+    Parameters:
+    ----------
+        postgres_database: Fixture that prepares a temporary PostgreSQL DB.
+        benchmark (BenchmarkFixture): pytest-benchmark fixture.
+
+    Returns:
+    -------
+        None
+    """
+    benchmark_list_conversations_for_one_user(
+        benchmark, LARGE_DB_RECORDS_COUNT, CONVERSATIONS_PAGE_DEFAULT_LIMIT
+    )
+
+
+def test_postgres_persist_turn_short_conversation(
+    postgres_database: None, benchmark: BenchmarkFixture
+) -> None:
+    """Benchmark persisting a turn of a short conversation.
+
+    Parameters:
+    ----------
+        postgres_database: Fixture that prepares a temporary PostgreSQL DB.
+        benchmark (BenchmarkFixture): pytest-benchmark fixture.
+
+    Returns:
+    -------
+        None
+    """
+    benchmark_persist_turn_long_conversation(benchmark, SHORT_CONVERSATION_TURNS)
+
+
+def test_postgres_persist_turn_long_conversation(
+    postgres_database: None, benchmark: BenchmarkFixture
+) -> None:
+    """Benchmark persisting a turn of a long conversation.
+
+    Parameters:
+    ----------
+        postgres_database: Fixture that prepares a temporary PostgreSQL DB.
+        benchmark (BenchmarkFixture): pytest-benchmark fixture.
+
+    Returns:
+    -------
+        None
+    """
+    benchmark_persist_turn_long_conversation(benchmark, LONG_CONVERSATION_TURNS)
+
+
+def test_postgres_persist_turn_very_long_conversation(
+    postgres_database: None, benchmark: BenchmarkFixture
+) -> None:
+    """Benchmark persisting a turn of a very long conversation.
+
+    Parameters:
+    ----------
+        postgres_database: Fixture that prepares a temporary PostgreSQL DB.
+        benchmark (BenchmarkFixture): pytest-benchmark fixture.
+
+    Returns:
+    -------
+        None
+    """
+    benchmark_persist_turn_long_conversation(benchmark, VERY_LONG_CONVERSATION_TURNS)
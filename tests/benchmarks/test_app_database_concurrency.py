@@ -0,0 +1,204 @@
+"""Benchmarks of request latency while other requests access the database."""
+
+import asyncio
+from collections.abc import Callable, Coroutine
+from datetime import datetime
+from typing import Any
+
+import pytest
+from pytest_benchmark.fixture import BenchmarkFixture
+from sqlalchemy import func
+
+from app.database import dispose_async_engine, get_session
+from models.database.conversations import UserConversation, UserTurn
+from utils.conversation_metadata_cache import conversation_metadata_cache
+from utils.endpoints import validate_and_retrieve_conversation
+from utils.query import persist_user_conversation_details
+from utils.suid import get_suid
+
+from .db_benchmarks import store_new_user_conversation
+
+# number of requests reading and updating conversations at the same time
+CONCURRENT_REQUESTS = 32
+
+# time spent by a request waiting for the LLM, the event loop is free meanwhile
+LLM_LATENCY = 0.01
+
+# number of benchmark rounds, every round handles a new batch of requests
+ROUNDS = 10
+
+USER_ID = get_suid()
+
+STARTED_AT = "2025-10-03T09:31:25+00:00"
+COMPLETED_AT = "2025-10-03T09:31:29+00:00"
+
+
+def blocking_retrieve_conversation(conversation_id: str) -> None:
+    """Read a conversation through a synchronous session.
+
+    Parameters:
+    ----------
+        conversation_id (str): Conversation to read.
+
+    Returns:
+    -------
+        None
+    """
+    with get_session() as session:
+        conversation = (
+            session.query(UserConversation).filter_by(id=conversation_id).first()
+        )
+        assert conversation is not None
+
+
+def blocking_persist_turn(conversation_id: str) -> None:
+    """Append a turn to a conversation through a synchronous session.
+
+    Parameters:
+    ----------
+        conversation_id (str): Conversation to append a turn to.
+
+    Returns:
+    -------
+        None
+    """
+    with get_session() as session:
+        conversation = (
+            session.query(UserConversation).filter_by(id=conversation_id).first()
+        )
+        assert conversation is not None
+        conversation.message_count += 1
+        max_turn_number = (
+            session.query(func.max(UserTurn.turn_number))
+            .filter_by(conversation_id=conversation_id)
+            .scalar()
+        )
+        session.add(
+            UserTurn(
+                conversation_id=conversation_id,
+                turn_number=(max_turn_number or 0) + 1,
+                started_at=datetime.fromisoformat(STARTED_AT),
+                completed_at=datetime.fromisoformat(COMPLETED_AT),
+                provider="provider",
+                model="model",
+                response_id=get_suid(),
+            )
+        )
+        session.commit()
+
+
+async def sync_session_request(conversation_id: str) -> None:
+    """Handle a query request using blocking database calls.
+
+    This is how request handlers accessed the database before they were
+    moved to the asynchronous engine.
+
+    Parameters:
+    ----------
+        conversation_id (str): Conversation used by the request.
+
+    Returns:
+    -------
+        None
+    """
+    blocking_retrieve_conversation(conversation_id)
+    await asyncio.sleep(LLM_LATENCY)
+    blocking_persist_turn(conversation_id)
+
+
+async def async_session_request(conversation_id: str) -> None:
+    """Handle a query request using the asynchronous database helpers.
+
+    Parameters:
+    ----------
+        conversation_id (str): Conversation used by the request.
+
+    Returns:
+    -------
+        None
+    """
+    await validate_and_retrieve_conversation(
+        normalized_conv_id=conversation_id, user_id=USER_ID, others_allowed=False
+    )
+    await asyncio.sleep(LLM_LATENCY)
+    await persist_user_conversation_details(
+        user_id=USER_ID,
+        conversation_id=conversation_id,
+        started_at=STARTED_AT,
+        completed_at=COMPLETED_AT,
+        model_id="model",
+        provider_id="provider",
+        topic_summary=None,
+        response_id=get_suid(),
+    )
+
+
+async def lightweight_request() -> None:
+    """Handle a request which does not touch the database.
+
+    Stands for requests such as streamed chunks of other responses or
+    liveness probes served by the same event loop.
+
+    Returns:
+    -------
+        None
+    """
+    await asyncio.sleep(LLM_LATENCY)
+
+
+@pytest.mark.parametrize(
+    "request_handler",
+    [sync_session_request, async_session_request],
+    ids=["sync_session", "async_session"],
+)
+def test_sqlite_request_latency_with_concurrent_database_access(
+    sqlite_database: None,
+    benchmark: BenchmarkFixture,
+    request_handler: Callable[[str], Coroutine[Any, Any, None]],
+) -> None:
+    """Benchmark a request served while other requests access the database.
+
+    Blocking database calls stall the event loop, so the measured request
+    waits for the database work of all other requests. With the asynchronous
+    engine the database work is awaited and the event loop keeps serving
+    other requests.
+
+    Parameters:
+    ----------
+        sqlite_database: Fixture that prepares a temporary SQLite DB.
+        benchmark (BenchmarkFixture): pytest-benchmark fixture.
+        request_handler: Coroutine function handling a database request.
+
+    Returns:
+    -------
+        None
+    """
+    conversation_ids = [get_suid() for _ in range(CONCURRENT_REQUESTS)]
+    with get_session() as session:
+        for conversation_id in conversation_ids:
+            store_new_user_conversation(session, conversation_id, USER_ID)
+
+    # pooled async connections are bound to the event loop that opened them
+    with asyncio.Runner() as runner:
+        in_flight: list[asyncio.Task] = []
+
+        async def start_requests() -> None:
+            # every round reads the conversations from the database, as
+            # requests served by a worker that has not cached them yet do
+            conversation_metadata_cache.clear()
+            in_flight.extend(
+                asyncio.create_task(request_handler(conversation_id))
+                for conversation_id in conversation_ids
+            )
+
+        async def finish_requests() -> None:
+            await asyncio.gather(*in_flight)
+            in_flight.clear()
+
+        benchmark.pedantic(  # type: ignore[no-untyped-call]
+            lambda: runner.run(lightweight_request()),
+            setup=lambda: runner.run(start_requests()),
+            teardown=lambda: runner.run(finish_requests()),
+            rounds=ROUNDS,
+        )
+        runner.run(dispose_async_engine())
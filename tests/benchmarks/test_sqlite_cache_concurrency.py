@@ -0,0 +1,125 @@
+"""Benchmarks of SQLite conversation cache reads with concurrent writers."""
+
+import sqlite3
+from collections.abc import Callable, Iterator
+from contextlib import contextmanager
+from pathlib import Path
+from threading import Event, Thread
+
+import pytest
+from pytest_benchmark.fixture import BenchmarkFixture
+
+from cache.cache_entry import CacheEntry
+from cache.sqlite_cache import SQLiteCache
+from models.config import SQLiteConcurrencyConfiguration, SQLiteDatabaseConfiguration
+from utils import suid
+
+# number of turns stored in the conversation read by benchmarks
+CONVERSATION_TURNS = 20
+
+# number of threads appending turns while reads are measured
+WRITERS_COUNT = 4
+
+USER_ID = suid.get_suid()
+CONVERSATION_ID = suid.get_suid()
+
+CACHE_ENTRY = CacheEntry(
+    query="user message",
+    response="AI message",
+    provider="foo",
+    model="bar",
+    started_at="2025-10-03T09:31:25Z",
+    completed_at="2025-10-03T09:31:29Z",
+)
+
+
+@contextmanager
+def concurrent_writers(writer_cache: Callable[[], SQLiteCache]) -> Iterator[None]:
+    """Keep appending turns to other conversations from several threads.
+
+    Parameters:
+    ----------
+        writer_cache: Function returning cache to be used by a writer thread.
+
+    Yields:
+    ------
+        None while the writers are running.
+    """
+    stop = Event()
+
+    def write() -> None:
+        cache = writer_cache()
+        conversation_id = suid.get_suid()
+        while not stop.is_set():
+            # default mode gives up waiting for a lock after five seconds
+            try:
+                cache.insert_or_append(USER_ID, conversation_id, CACHE_ENTRY)
+            except sqlite3.OperationalError:
+                pass
+
+    threads = [Thread(target=write, daemon=True) for _ in range(WRITERS_COUNT)]
+    for thread in threads:
+        thread.start()
+    try:
+        yield
+    finally:
+        stop.set()
+        for thread in threads:
+            thread.join()
+
+
+def read_history(cache: SQLiteCache) -> list[CacheEntry]:
+    """Read the benchmarked conversation, retrying when the database is locked.
+
+    Parameters:
+    ----------
+        cache (SQLiteCache): Cache to read the conversation from.
+
+    Returns:
+    -------
+        list[CacheEntry]: Turns of the conversation.
+    """
+    # default mode gives up waiting for a lock after five seconds
+    while True:
+        try:
+            return cache.get(USER_ID, CONVERSATION_ID)
+        except sqlite3.OperationalError:
+            pass
+
+
+@pytest.mark.parametrize("high_concurrency", [False, True])
+def test_sqlite_cache_read_with_concurrent_writers(
+    tmp_path: Path, benchmark: BenchmarkFixture, high_concurrency: bool
+) -> None:
+    """Benchmark reading conversation history while other threads write.
+
+    In default mode each thread needs its own connection and readers wait
+    for the writers holding the database lock. In high-concurrency mode one
+    cache is shared by all threads and reads go through read-only
+    connections that are not blocked by the writer.
+
+    Parameters:
+    ----------
+        tmp_path (Path): pytest-provided temporary directory for the DB file.
+        benchmark (BenchmarkFixture): pytest-benchmark fixture.
+        high_concurrency (bool): Whether high-concurrency mode is enabled.
+
+    Returns:
+    -------
+        None
+    """
+    config = SQLiteDatabaseConfiguration(
+        db_path=str(tmp_path / "cache.db"),
+        concurrency=SQLiteConcurrencyConfiguration() if high_concurrency else None,
+    )
+    cache = SQLiteCache(config)
+    for _ in range(CONVERSATION_TURNS):
+        cache.insert_or_append(USER_ID, CONVERSATION_ID, CACHE_ENTRY)
+
+    # a connection in default mode can be used by the thread which opened it only
+    writer_cache = (
+        (lambda: cache) if high_concurrency else (lambda: SQLiteCache(config))
+    )
+    with concurrent_writers(writer_cache):
+        entries = benchmark(read_history, cache)
+    assert len(entries) == CONVERSATION_TURNS
@@ -30,8 +30,9 @@ from pydantic_ai.usage import RunUsage
 from pytest_mock import AsyncMockType, MockerFixture
 from sqlalchemy import create_engine
 from sqlalchemy.engine import Engine
+from sqlalchemy.ext.asyncio import AsyncEngine, async_sessionmaker, create_async_engine
 from sqlalchemy.orm import Session, sessionmaker
-from sqlalchemy.pool import StaticPool
+from sqlalchemy.pool import NullPool
 
 import app.database
 from authentication.interface import AuthTuple
@@ -39,6 +40,7 @@ from authentication.noop import NoopAuthDependency
 from configuration import configuration
 from models.config import Action
 from models.database.base import Base
+from utils.conversation_metadata_cache import conversation_metadata_cache
 
 # ==========================================
 # Common Test Constants
@@ -481,6 +483,17 @@ def reset_configuration_state() -> Generator:
     yield
 
 
+@pytest.fixture(autouse=True)
+def reset_conversation_metadata_cache() -> Generator:
+    """Drop cached conversation records after each integration test.
+
+    Every test uses its own database, so records cached by one test must not
+    be visible to the following tests.
+    """
+    yield
+    conversation_metadata_cache.clear()
+
+
 @pytest.fixture(name="test_config", scope="function")
 def test_config_fixture() -> Generator:
     """Load real configuration for integration tests.
@@ -523,25 +536,32 @@ def current_config_fixture() -> Generator:
     # Note: Cleanup is handled by the autouse reset_configuration_state fixture
 
 
+@pytest.fixture(name="test_db_path", scope="function")
+def test_db_path_fixture(tmp_path: Path) -> Path:
+    """Provide path to the SQLite database file used by a test.
+
+    Returns:
+        Path: Location of the database file in the test's temporary directory.
+    """
+    return tmp_path / "test.db"
+
+
 @pytest.fixture(name="test_db_engine", scope="function")
-def test_db_engine_fixture() -> Generator:
-    """Create an in-memory SQLite database engine for testing.
+def test_db_engine_fixture(test_db_path: Path) -> Generator:
+    """Create a SQLite database engine for testing.
 
     This provides a real database (not mocked) for integration tests.
-    Each test gets a fresh database.
-
-    Uses StaticPool to ensure the same in-memory database is shared across
-    all threads (including background tasks like quota_scheduler).
+    Each test gets a fresh database stored in a temporary file, so it is
+    shared with the asynchronous engine and with all threads (including
+    background tasks like quota_scheduler).
 
     Yields:
-        engine (Engine): A SQLAlchemy Engine connected to a new in-memory SQLite database.
+        engine (Engine): A SQLAlchemy Engine connected to a new SQLite database.
     """
-    # Create in-memory SQLite database with StaticPool for thread safety
     engine = create_engine(
-        "sqlite:///:memory:",
+        f"sqlite:///{test_db_path}",
         echo=False,  # Set to True to see SQL queries
         connect_args={"check_same_thread": False},  # Allow multi-threaded access
-        poolclass=StaticPool,  # Share single in-memory DB across all threads
     )
 
     # Create all tables
@@ -554,6 +574,30 @@ def test_db_engine_fixture() -> Generator:
     engine.dispose()
 
 
+@pytest.fixture(name="test_async_db_engine", scope="function")
+async def test_async_db_engine_fixture(
+    test_db_engine: Engine, test_db_path: Path
+) -> AsyncIterator[AsyncEngine]:
+    """Create an asynchronous engine for the test database.
+
+    Connections are not pooled, because TestClient runs the application in
+    its own event loop and pooled aiosqlite connections are bound to the
+    loop that opened them.
+
+    Yields:
+        engine (AsyncEngine): A SQLAlchemy AsyncEngine connected to the same
+        SQLite database as `test_db_engine`.
+    """
+    _ = test_db_engine
+    engine = create_async_engine(
+        f"sqlite+aiosqlite:///{test_db_path}", echo=False, poolclass=NullPool
+    )
+
+    yield engine
+
+    await engine.dispose()
+
+
 @pytest.fixture(name="test_db_session", scope="function")
 def test_db_session_fixture(test_db_engine: Engine) -> Generator[Session, None, None]:
     """Create a database session for testing.
@@ -682,16 +726,19 @@ def integration_http_client_fixture(
 def patch_db_session_fixture(
     test_db_session: Session,
     test_db_engine: Engine,
+    test_async_db_engine: AsyncEngine,
 ) -> Generator[Session, None, None]:
     """Initialize database session for integration tests.
 
-    This sets up the global session_local in app.database to use the test database.
-    Uses an in-memory SQLite database, isolating tests from production data.
+    This sets up the global session_local and async_session_local in
+    app.database to use the test database.
+    Uses a temporary SQLite database, isolating tests from production data.
     This fixture is autouse=True, so it automatically applies to all integration tests.
 
     Args:
         test_db_session: Test database session
         test_db_engine: Test database engine
+        test_async_db_engine: Asynchronous engine for the test database
 
     Yields:
         The test database Session instance to be used by the test.
@@ -699,6 +746,8 @@ def patch_db_session_fixture(
     # Store original values to restore later
     original_engine = app.database.engine
     original_session_local = app.database.session_local
+    original_async_engine = app.database.async_engine
+    original_async_session_local = app.database.async_session_local
 
     # Set the test database engine and session maker globally
     # Match initialize_database() settings: autocommit=False, autoflush=False
@@ -706,12 +755,18 @@ def patch_db_session_fixture(
     app.database.session_local = sessionmaker(
         autocommit=False, autoflush=False, bind=test_db_engine
     )
+    app.database.async_engine = test_async_db_engine
+    app.database.async_session_local = async_sessionmaker(
+        test_async_db_engine, autoflush=False, expire_on_commit=False
+    )
 
     yield test_db_session
 
     # Restore original values
     app.database.engine = original_engine
     app.database.session_local = original_session_local
+    app.database.async_engine = original_async_engine
+    app.database.async_session_local = original_async_session_local
 
 
 @pytest.fixture(name="mock_request_with_auth")
@@ -3,8 +3,9 @@
 # pylint: disable=too-many-arguments  # Integration tests need many fixtures
 # pylint: disable=too-many-positional-arguments  # Integration tests need many fixtures
 
-from collections.abc import Generator
+from collections.abc import AsyncGenerator
 from datetime import UTC, datetime
+from pathlib import Path
 
 import pytest
 from fastapi import HTTPException, Request, status
@@ -17,6 +18,7 @@ from app.endpoints.conversations_v2 import (
     update_conversation_endpoint_handler,
 )
 from authentication.interface import AuthTuple
+from cache.async_sqlite_cache import AsyncSQLiteCache
 from cache.cache_entry import CacheEntry
 from cache.sqlite_cache import SQLiteCache
 from configuration import AppConfig
@@ -32,40 +34,49 @@ from tests.integration.conftest import (
 
 
 @pytest.fixture(name="setup_conversation_cache", autouse=True)
-def setup_conversation_cache_fixture(
+async def setup_conversation_cache_fixture(
     test_config: AppConfig,
     mocker: MockerFixture,
-) -> Generator[SQLiteCache, None, None]:
+    tmp_path: Path,
+) -> AsyncGenerator[SQLiteCache, None]:
     """Setup conversation cache for integration tests.
 
-    This fixture configures the test configuration to use SQLite conversation cache
-    with an in-memory database, ensuring cache is properly initialized for each test.
+    This fixture configures the test configuration to use SQLite conversation
+    cache with a per-test database file. Endpoints read the database through
+    the asynchronous cache, tests seed it through the synchronous one.
 
     Returns:
         SQLiteCache: The configured cache instance.
     """
-    # Ensure cache configuration is set to sqlite with in-memory database
+    # Ensure cache configuration is set to sqlite
     test_config.conversation_cache_configuration.type = "sqlite"
 
-    # Configure SQLite to use in-memory database
-    sqlite_config = SQLiteDatabaseConfiguration(db_path=":memory:")
+    # Both caches share one database file
+    sqlite_config = SQLiteDatabaseConfiguration(db_path=str(tmp_path / "cache.db"))
 
     # Initialize the cache
     cache = SQLiteCache(sqlite_config)
     cache.connect()
     cache.initialize_cache()
+    async_cache = AsyncSQLiteCache(sqlite_config)
 
-    # Patch the conversation_cache property to return our test cache
+    # Patch the conversation cache properties to return our test caches
     mocker.patch.object(
         type(test_config),
         "conversation_cache",
         new_callable=mocker.PropertyMock,
         return_value=cache,
     )
+    mocker.patch.object(
+        type(test_config),
+        "async_conversation_cache",
+        new_callable=mocker.PropertyMock,
+        return_value=async_cache,
+    )
 
     yield cache
 
-    # Cleanup handled by in-memory database (cleared on connection close)
+    await async_cache.close()
 
 
 def create_test_cache_entry(
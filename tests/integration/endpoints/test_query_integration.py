@@ -1319,9 +1319,9 @@ async def test_query_v2_endpoint_rejects_query_when_quota_exceeded(
     _ = mock_ogx_client
     _ = mock_query_agent
 
-    # Mock check_tokens_available to simulate quota exceeded
+    # Mock reserve_query_tokens to simulate quota exceeded
     mocker.patch(
-        "app.endpoints.query.check_tokens_available",
+        "app.endpoints.query.reserve_query_tokens",
         side_effect=HTTPException(
             status_code=status.HTTP_429_TOO_MANY_REQUESTS,
             detail={"response": "Quota exceeded", "cause": "Token limit reached"},
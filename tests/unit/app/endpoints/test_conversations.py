@@ -9,8 +9,11 @@ from typing import Any, Optional
 import pytest
 from fastapi import HTTPException, Request, status
 from ogx_client import APIConnectionError, APIStatusError, NotFoundError
-from pytest_mock import MockerFixture, MockType
+from pydantic import ValidationError
+from pytest_mock import AsyncMockType, MockerFixture, MockType
+from sqlalchemy import Select
 from sqlalchemy.exc import SQLAlchemyError
+from sqlalchemy.ext.asyncio import AsyncSession
 
 from app.endpoints.conversations_v1 import (
     delete_conversation_endpoint_handler,
@@ -19,7 +22,7 @@ from app.endpoints.conversations_v1 import (
     update_conversation_endpoint_handler,
 )
 from configuration import AppConfig
-from models.api.requests import ConversationUpdateRequest
+from models.api.requests import ConversationUpdateRequest, UserConversationsPageParams
 from models.api.responses.error import (
     ForbiddenResponse,
     InternalServerErrorResponse,
@@ -34,6 +37,7 @@ from models.config import Action
 from models.database.conversations import UserConversation, UserTurn
 from tests.unit.utils.auth_helpers import mock_authorization_resolvers
 from utils.conversations import build_conversation_turns_from_items
+from utils.pagination import decode_conversation_cursor, encode_conversation_cursor
 
 MOCK_AUTH = ("mock_user_id", "mock_username", False, "mock_token")
 VALID_CONVERSATION_ID = "123e4567-e89b-12d3-a456-426614174000"
@@ -60,6 +64,25 @@ def dummy_request() -> Request:
     return request
 
 
+def mock_own_conversations_authorization(mocker: MockerFixture) -> None:
+    """Mock authorization resolvers to allow listing only own conversations.
+
+    Args:
+        mocker: Mocker fixture for creating patches.
+    """
+    mock_resolvers = mocker.patch(
+        "authorization.middleware.get_authorization_resolvers"
+    )
+    mock_role_resolver = mocker.AsyncMock()
+    mock_access_resolver = mocker.Mock()
+    mock_role_resolver.resolve_roles.return_value = set()
+    mock_access_resolver.check_access.return_value = True
+    mock_access_resolver.get_actions = mocker.Mock(
+        return_value=set(Action) - {Action.LIST_OTHERS_CONVERSATIONS}
+    )
+    mock_resolvers.return_value = (mock_role_resolver, mock_access_resolver)
+
+
 def create_mock_conversation(
     mocker: MockerFixture,
     conversation_id: str,
@@ -145,54 +168,39 @@ def create_mock_db_turn(
     return mock_turn
 
 
-def _setup_user_turn_query(
-    mock_query: MockType, db_turns: Optional[list[MockType]]
-) -> None:
-    """Configure mock query for UserTurn model.
+def _create_mock_async_session(mocker: MockerFixture) -> AsyncMockType:
+    """Create AsyncSession mock usable as an async context manager.
 
     Args:
-        mock_query: The mock query object to configure.
-        db_turns: List of UserTurn objects to return, or None for empty list.
-    """
-    turns_to_return = db_turns if db_turns is not None else []
-    mock_query.filter_by.return_value.order_by.return_value.all.return_value = (
-        turns_to_return
-    )
+        mocker: Mocker fixture for creating mocks.
 
-
-def _setup_user_conversation_query(
-    mock_query: MockType, query_result: Optional[list[MockType]]
-) -> None:
-    """Configure mock query for UserConversation model.
-
-    Args:
-        mock_query: The mock query object to configure.
-        query_result: List of UserConversation objects to return, or None for None.
+    Returns:
+        AsyncMock: The mocked session, also returned by `async with`.
     """
-    if query_result is not None:
-        mock_query.all.return_value = query_result
-        mock_query.filter_by.return_value.all.return_value = query_result
-        mock_query.filter_by.return_value.first.return_value = (
-            query_result[0] if query_result else None
-        )
-    else:
-        mock_query.filter_by.return_value.first.return_value = None
+    mock_session = mocker.AsyncMock(spec=AsyncSession)
+    mock_session.__aenter__.return_value = mock_session
+    return mock_session
 
 
-def _patch_get_session_functions(
-    mocker: MockerFixture, mock_session_context: MockType
+def _patch_get_async_session_functions(
+    mocker: MockerFixture, mock_session: AsyncMockType
 ) -> None:
-    """Patch all get_session functions used by the endpoint handlers.
+    """Patch all get_async_session functions used by the endpoint handlers.
 
     Args:
         mocker: Mocker fixture for creating patches.
-        mock_session_context: The context manager mock to return from get_session.
+        mock_session: The session mock to return from get_async_session.
     """
     mocker.patch(
-        "app.endpoints.conversations_v1.get_session", return_value=mock_session_context
+        "app.endpoints.conversations_v1.get_async_session", return_value=mock_session
+    )
+    mocker.patch(
+        "app.endpoints.conversations_v1.get_async_sessions",
+        return_value=[mock_session],
     )
-    mocker.patch("app.database.get_session", return_value=mock_session_context)
-    mocker.patch("utils.endpoints.get_session", return_value=mock_session_context)
+    mocker.patch("app.database.get_async_session", return_value=mock_session)
+    mocker.patch("utils.endpoints.get_async_session", return_value=mock_session)
+    mocker.patch("utils.endpoints.get_async_sessions", return_value=[mock_session])
     mocker.patch("utils.endpoints.can_access_conversation", return_value=True)
 
 
@@ -200,44 +208,44 @@ def mock_database_session(
     mocker: MockerFixture,
     query_result: Optional[list[MockType]] = None,
     db_turns: Optional[list[MockType]] = None,
-) -> MockType:
-    """Helper function to mock get_session with proper context manager support.
+) -> AsyncMockType:
+    """Helper function to mock get_async_session with async context manager support.
 
-    Create and patch a mocked database session and a context-manager-compatible get_session.
+    Create and patch a mocked asynchronous database session.
 
     Parameters:
     ----------
         mocker (pytest.MockerFixture): Fixture used to create and patch mocks.
-        query_result (Optional[list]): If provided, configures the
-        session.query().all() and session.query().filter_by().all() to return
-        this list (for UserConversation queries).
-        db_turns (Optional[list]): If provided, configures UserTurn queries
-        to return this list.
+        query_result (Optional[list]): If provided, configures session.execute()
+        to return this list for the conversations listing
+        and session.get() to return its first item.
+        db_turns (Optional[list]): If provided, configures session.scalars()
+        to return this list for UserTurn statements.
 
     Returns:
     -------
-        Mock: The mocked session object that will be yielded by the patched
-        get_session context manager.
+        AsyncMock: The mocked session object that will be returned by the
+        patched get_async_session.
     """
-    mock_session = mocker.Mock()
+    mock_session = _create_mock_async_session(mocker)
 
-    def query_side_effect(model_class: type[Any]) -> Any:
-        """Handle different model queries."""
-        mock_query = mocker.Mock()
-        if model_class == UserTurn:
-            _setup_user_turn_query(mock_query, db_turns)
+    def scalars_side_effect(statement: Select) -> Any:
+        """Handle statements selecting different models."""
+        result = mocker.Mock()
+        if statement.column_descriptions[0]["entity"] is UserTurn:
+            result.all.return_value = db_turns if db_turns is not None else []
         else:
-            _setup_user_conversation_query(mock_query, query_result)
-        return mock_query
+            result.all.return_value = query_result if query_result is not None else []
+        return result
 
-    mock_session.query.side_effect = query_side_effect
+    mock_session.scalars.side_effect = scalars_side_effect
+    mock_session.get.return_value = query_result[0] if query_result else None
 
-    # Create context manager mock for get_session
-    mock_session_context = mocker.MagicMock()
-    mock_session_context.__enter__.return_value = mock_session
-    mock_session_context.__exit__.return_value = None
+    rows = query_result if query_result is not None else []
+    mock_session.execute.return_value = mocker.Mock()
+    mock_session.execute.return_value.all.return_value = rows
 
-    _patch_get_session_functions(mocker, mock_session_context)
+    _patch_get_async_session_functions(mocker, mock_session)
 
     return mock_session
 
@@ -938,29 +946,10 @@ class TestGetConversationEndpoint:
             return_value=mock_conversation,
         )
 
-        # Mock get_session to raise SQLAlchemyError when querying UserTurn
-        mock_session = mocker.Mock()
-
-        def query_side_effect(model_class: type[Any]) -> Any:
-            if model_class == UserTurn:
-                mock_query = mocker.Mock()
-                mock_query_chain = (
-                    mock_query.filter_by.return_value.order_by.return_value.all
-                )
-                mock_query_chain.side_effect = SQLAlchemyError("Database error")
-                return mock_query
-            # Return a default mock for other queries
-            return mocker.Mock()
-
-        mock_session.query.side_effect = query_side_effect
-
-        mock_session_context = mocker.MagicMock()
-        mock_session_context.__enter__.return_value = mock_session
-        mock_session_context.__exit__.return_value = None
-        mocker.patch(
-            "utils.endpoints.get_session",
-            return_value=mock_session_context,
-        )
+        # Mock get_async_session to raise SQLAlchemyError when querying UserTurn
+        mock_session = _create_mock_async_session(mocker)
+        mock_session.scalars.side_effect = SQLAlchemyError("Database error")
+        mocker.patch("utils.endpoints.get_async_session", return_value=mock_session)
 
         mock_client = mocker.AsyncMock()
         mock_items_response = mocker.Mock()
@@ -1004,19 +993,9 @@ class TestGetConversationEndpoint:
             return_value=True,
         )
 
-        mock_session = mocker.Mock()
-        mock_query = mocker.Mock()
-        mock_query.filter_by.return_value.first.side_effect = SQLAlchemyError(
-            "Database error"
-        )
-        mock_session.query.return_value = mock_query
-        mock_session_context = mocker.MagicMock()
-        mock_session_context.__enter__.return_value = mock_session
-        mock_session_context.__exit__.return_value = None
-        mocker.patch(
-            "utils.endpoints.get_session",
-            return_value=mock_session_context,
-        )
+        mock_session = _create_mock_async_session(mocker)
+        mock_session.get.side_effect = SQLAlchemyError("Database error")
+        mocker.patch("utils.endpoints.get_async_sessions", return_value=[mock_session])
 
         with pytest.raises(HTTPException) as exc_info:
             await get_conversation_endpoint_handler(
@@ -1195,18 +1174,10 @@ class TestDeleteConversationEndpoint:
             return_value=set(Action.DELETE_CONVERSATION),
         )
 
-        mock_row = mocker.Mock()
-        mock_row.user_id = "different_user_id"
-
-        mock_session = mocker.MagicMock()
-        mock_session.query.return_value.filter.return_value.first.return_value = (
-            mock_row
-        )
+        mock_session = _create_mock_async_session(mocker)
+        mock_session.scalar.return_value = "different_user_id"
 
-        mock_session.__enter__.return_value = mock_session
-        mock_session.__exit__.return_value = None
-
-        mocker.patch("utils.endpoints.get_session", return_value=mock_session)
+        mocker.patch("utils.endpoints.get_async_sessions", return_value=[mock_session])
 
         with pytest.raises(HTTPException) as exc_info:
             await delete_conversation_endpoint_handler(
@@ -1535,7 +1506,7 @@ class TestGetConversationsListEndpoint:
 
         # Mock database session to raise exception
         mock_session = mock_database_session(mocker)
-        mock_session.query.side_effect = Exception("Database error")
+        mock_session.execute.side_effect = Exception("Database error")
 
         with pytest.raises(Exception, match="Database error"):
             await get_conversations_list_endpoint_handler(
@@ -1555,23 +1526,16 @@ class TestGetConversationsListEndpoint:
             "app.endpoints.conversations_v1.configuration", setup_configuration
         )
 
-        # Mock database session to raise SQLAlchemyError when all() is called
-        # Since dummy_request has all actions, it will use query directly (not filter_by)
-        mock_session = mocker.Mock()
-        mock_query = mocker.Mock()
-        # Configure all() to raise SQLAlchemyError
-        mock_query.all = mocker.Mock(
-            side_effect=SQLAlchemyError("Database connection error")
+        # Mock database session to raise SQLAlchemyError when the query is executed
+        mock_session = _create_mock_async_session(mocker)
+        mock_session.execute.side_effect = SQLAlchemyError("Database connection error")
+        mocker.patch(
+            "app.endpoints.conversations_v1.get_async_session",
+            return_value=mock_session,
         )
-        mock_session.query.return_value = mock_query
-
-        # Mock get_session to return a context manager
-        mock_session_context = mocker.MagicMock()
-        mock_session_context.__enter__.return_value = mock_session
-        mock_session_context.__exit__.return_value = None
         mocker.patch(
-            "app.endpoints.conversations_v1.get_session",
-            return_value=mock_session_context,
+            "app.endpoints.conversations_v1.get_async_sessions",
+            return_value=[mock_session],
         )
 
         with pytest.raises(HTTPException) as exc_info:
@@ -1779,6 +1743,178 @@ class TestGetConversationsListEndpoint:
         assert "topic_summary" in conv_dict
         assert conv_dict["topic_summary"] == "Test topic summary"
 
+    @pytest.mark.asyncio
+    async def test_own_conversations_are_not_paginated(
+        self,
+        mocker: MockerFixture,
+        setup_configuration: AppConfig,
+        dummy_request: Request,
+    ) -> None:
+        """Test listing only own conversations filters them by user ID.
+
+        Without the page parameters, all conversations of the user are listed.
+        """
+        mock_own_conversations_authorization(mocker)
+        mocker.patch(
+            "app.endpoints.conversations_v1.configuration", setup_configuration
+        )
+        mock_conversations = [
+            create_mock_conversation(
+                mocker,
+                "123e4567-e89b-12d3-a456-426614174000",
+                "2024-01-01T00:00:00Z",
+                "2024-01-01T00:05:00Z",
+                5,
+                "gemini/gemini-2.0-flash",
+                "gemini",
+                "Topic",
+            ),
+        ]
+        mock_session = mock_database_session(mocker, mock_conversations)
+
+        response = await get_conversations_list_endpoint_handler(
+            auth=MOCK_AUTH, request=dummy_request
+        )
+
+        assert len(response.conversations) == 1
+        assert response.next_cursor is None
+        statement = mock_session.execute.call_args.args[0]
+        assert statement.compile().params == {"user_id_1": "mock_user_id"}
+
+    @pytest.mark.asyncio
+    async def test_conversations_list_page(
+        self,
+        mocker: MockerFixture,
+        setup_configuration: AppConfig,
+        dummy_request: Request,
+    ) -> None:
+        """Test listing one page of conversations returns cursor of next page."""
+        mock_own_conversations_authorization(mocker)
+        mocker.patch(
+            "app.endpoints.conversations_v1.configuration", setup_configuration
+        )
+        mock_conversations = [
+            create_mock_conversation(
+                mocker,
+                f"conversation-{index}",
+                "2024-01-01T00:00:00Z",
+                f"2024-01-01T00:0{5 - index}:00Z",
+                1,
+                "gemini/gemini-2.0-flash",
+                "gemini",
+            )
+            for index in range(3)
+        ]
+        mock_session = mock_database_session(mocker, mock_conversations)
+
+        response = await get_conversations_list_endpoint_handler(
+            auth=MOCK_AUTH,
+            request=dummy_request,
+            page=UserConversationsPageParams(limit=2),
+        )
+
+        assert [conv.conversation_id for conv in response.conversations] == [
+            "conversation-0",
+            "conversation-1",
+        ]
+        assert response.next_cursor is not None
+        assert decode_conversation_cursor(response.next_cursor) == (
+            datetime(2024, 1, 1, 0, 4, tzinfo=UTC),
+            "conversation-1",
+        )
+        # one more conversation is selected to detect the next page
+        statement = mock_session.execute.call_args.args[0]
+        assert statement.compile().params["param_1"] == 3
+
+    @pytest.mark.asyncio
+    async def test_conversations_list_last_page(
+        self,
+        mocker: MockerFixture,
+        setup_configuration: AppConfig,
+        dummy_request: Request,
+    ) -> None:
+        """Test listing the last page of conversations after a cursor."""
+        mock_authorization_resolvers(mocker)
+        mocker.patch(
+            "app.endpoints.conversations_v1.configuration", setup_configuration
+        )
+        mock_conversations = [
+            create_mock_conversation(
+                mocker,
+                "conversation-2",
+                "2024-01-01T00:00:00Z",
+                "2024-01-01T00:03:00Z",
+                1,
+                "gemini/gemini-2.0-flash",
+                "gemini",
+            ),
+        ]
+        mock_session = mock_database_session(mocker, mock_conversations)
+        cursor = encode_conversation_cursor(
+            datetime(2024, 1, 1, 0, 4, tzinfo=UTC), "conversation-1"
+        )
+
+        response = await get_conversations_list_endpoint_handler(
+            auth=MOCK_AUTH,
+            request=dummy_request,
+            page=UserConversationsPageParams(limit=2, before=cursor),
+        )
+
+        assert [conv.conversation_id for conv in response.conversations] == [
+            "conversation-2"
+        ]
+        assert response.next_cursor is None
+        params = mock_session.execute.call_args.args[0].compile().params
+        assert datetime(2024, 1, 1, 0, 4, tzinfo=UTC) in params.values()
+        assert "conversation-1" in params.values()
+        assert "mock_user_id" not in params.values()
+
+    @pytest.mark.asyncio
+    async def test_all_conversations_listed_by_pages(
+        self,
+        mocker: MockerFixture,
+        setup_configuration: AppConfig,
+        dummy_request: Request,
+    ) -> None:
+        """Test listing conversations of all users returns the default page size."""
+        mock_authorization_resolvers(mocker)
+        mocker.patch(
+            "app.endpoints.conversations_v1.configuration", setup_configuration
+        )
+        mocker.patch(
+            "app.endpoints.conversations_v1.CONVERSATIONS_PAGE_DEFAULT_LIMIT", 2
+        )
+        mock_conversations = [
+            create_mock_conversation(
+                mocker,
+                f"conversation-{index}",
+                "2024-01-01T00:00:00Z",
+                f"2024-01-01T00:0{5 - index}:00Z",
+                1,
+                "gemini/gemini-2.0-flash",
+                "gemini",
+            )
+            for index in range(3)
+        ]
+        mock_session = mock_database_session(mocker, mock_conversations)
+
+        response = await get_conversations_list_endpoint_handler(
+            auth=MOCK_AUTH, request=dummy_request
+        )
+
+        assert [conv.conversation_id for conv in response.conversations] == [
+            "conversation-0",
+            "conversation-1",
+        ]
+        assert response.next_cursor is not None
+        params = mock_session.execute.call_args.args[0].compile().params
+        assert params == {"param_1": 3}
+
+    def test_malformed_cursor_rejected(self) -> None:
+        """Test that malformed cursor is rejected by request validation."""
+        with pytest.raises(ValidationError, match="Malformed cursor"):
+            UserConversationsPageParams(before="not a cursor")
+
 
 class TestUpdateConversationEndpoint:
     """Test cases for the PUT /conversations/{conversation_id} endpoint."""
@@ -1972,18 +2108,13 @@ class TestUpdateConversationEndpoint:
         )
 
         # Mock database session for update
-        mock_session = mocker.Mock()
+        mock_session = _create_mock_async_session(mocker)
         mock_db_conv = mocker.Mock()
         mock_db_conv.topic_summary = None
-        mock_session.query.return_value.filter_by.return_value.first.return_value = (
-            mock_db_conv
-        )
-        mock_session_context = mocker.MagicMock()
-        mock_session_context.__enter__.return_value = mock_session
-        mock_session_context.__exit__.return_value = None
+        mock_session.get.return_value = mock_db_conv
         mocker.patch(
-            "app.endpoints.conversations_v1.get_session",
-            return_value=mock_session_context,
+            "app.endpoints.conversations_v1.get_async_session",
+            return_value=mock_session,
         )
 
         # Mock AsyncOgxClientHolder
@@ -2008,7 +2139,7 @@ class TestUpdateConversationEndpoint:
         assert response.success is True
         assert "updated successfully" in response.message
         mock_client.conversations.update.assert_called_once()
-        mock_session.commit.assert_called_once()
+        mock_session.commit.assert_awaited_once()
 
     @pytest.mark.asyncio
     async def test_llama_stack_connection_error_in_update(
@@ -2133,19 +2264,14 @@ class TestUpdateConversationEndpoint:
         mock_client_holder.return_value.get_client.return_value = mock_client
 
         # Mock database session - commit raises SQLAlchemyError
-        mock_session = mocker.Mock()
+        mock_session = _create_mock_async_session(mocker)
         mock_db_conv = mocker.Mock()
         mock_db_conv.topic_summary = None
-        mock_session.query.return_value.filter_by.return_value.first.return_value = (
-            mock_db_conv
-        )
+        mock_session.get.return_value = mock_db_conv
         mock_session.commit.side_effect = SQLAlchemyError("Database error")
-        mock_session_context = mocker.MagicMock()
-        mock_session_context.__enter__.return_value = mock_session
-        mock_session_context.__exit__.return_value = None
         mocker.patch(
-            "app.endpoints.conversations_v1.get_session",
-            return_value=mock_session_context,
+            "app.endpoints.conversations_v1.get_async_session",
+            return_value=mock_session,
         )
 
         update_request = ConversationUpdateRequest(topic_summary="New topic")
@@ -2162,3 +2288,59 @@ class TestUpdateConversationEndpoint:
         detail = exc_info.value.detail
         assert isinstance(detail, dict)
         assert "Database" in detail["response"]  # pyright: ignore[reportArgumentType]
+
+    @pytest.mark.asyncio
+    async def test_conversations_list_merges_shards(
+        self,
+        mocker: MockerFixture,
+        setup_configuration: AppConfig,
+        dummy_request: Request,
+    ) -> None:
+        """Test listing conversations of all users merges pages of all shards."""
+        mock_authorization_resolvers(mocker)
+        mocker.patch(
+            "app.endpoints.conversations_v1.configuration", setup_configuration
+        )
+        shard_conversations: list[list[MockType]] = [[], []]
+        for index in range(4):
+            conversation = create_mock_conversation(
+                mocker,
+                f"conversation-{index}",
+                "2024-01-01T00:00:00Z",
+                "",
+                1,
+                "gemini/gemini-2.0-flash",
+                "gemini",
+            )
+            conversation.last_message_at = datetime(
+                2024, 1, 1, 0, 5 - index, tzinfo=UTC
+            )
+            shard_conversations[index % 2].append(conversation)
+        sessions = []
+        for conversations in shard_conversations:
+            session = _create_mock_async_session(mocker)
+            session.execute.return_value = mocker.Mock()
+            session.execute.return_value.all.return_value = conversations
+            sessions.append(session)
+        mocker.patch(
+            "app.endpoints.conversations_v1.get_async_sessions", return_value=sessions
+        )
+
+        response = await get_conversations_list_endpoint_handler(
+            auth=MOCK_AUTH,
+            request=dummy_request,
+            page=UserConversationsPageParams(limit=3),
+        )
+
+        assert [conv.conversation_id for conv in response.conversations] == [
+            "conversation-0",
+            "conversation-1",
+            "conversation-2",
+        ]
+        assert response.next_cursor is not None
+        assert decode_conversation_cursor(response.next_cursor) == (
+            datetime(2024, 1, 1, 0, 3, tzinfo=UTC),
+            "conversation-2",
+        )
+        for session in sessions:
+            session.execute.assert_called_once()
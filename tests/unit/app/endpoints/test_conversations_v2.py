@@ -1,4 +1,4 @@
-# pylint: disable=redefined-outer-name
+# pylint: disable=redefined-outer-name, too-many-lines
 
 """Unit tests for the /conversations REST API endpoints."""
 
@@ -7,7 +7,7 @@ from typing import Any, cast
 
 import pytest
 from fastapi import HTTPException, status
-from pydantic import HttpUrl
+from pydantic import HttpUrl, ValidationError
 from pytest_mock import MockerFixture, MockType
 
 from app.endpoints.conversations_v2 import (
@@ -19,17 +19,22 @@ from app.endpoints.conversations_v2 import (
     get_conversations_list_endpoint_handler,
     update_conversation_endpoint_handler,
 )
-from cache.cache_entry import CacheEntry
+from cache.cache_entry import CacheEntry, CacheEntryPage
 from configuration import AppConfig
-from models.api.requests import ConversationUpdateRequest
+from models.api.requests import (
+    ConversationPageParams,
+    ConversationsListPageParams,
+    ConversationUpdateRequest,
+)
 from models.api.responses.successful import ConversationUpdateResponse
-from models.common import ConversationData
+from models.common import ConversationData, ConversationDataPage
 from models.common.turn_summary import (
     ReferencedDocument,
     ToolCallSummary,
     ToolResultSummary,
 )
 from tests.unit.utils.auth_helpers import mock_authorization_resolvers
+from utils.pagination import encode_cache_cursor
 
 MOCK_AUTH = ("mock_user_id", "mock_username", False, "mock_token")
 VALID_CONVERSATION_ID = "123e4567-e89b-12d3-a456-426614174000"
@@ -229,7 +234,8 @@ class TestBuildConversationTurnFromCacheEntry:
 def mock_configuration(mocker: MockerFixture) -> MockType:
     """Mock configuration with conversation cache.
 
-    Create a mocked configuration object with a mocked `conversation_cache` attribute.
+    Create a mocked configuration object with a mocked `async_conversation_cache`
+    attribute.
 
     Parameters:
     ----------
@@ -237,11 +243,12 @@ def mock_configuration(mocker: MockerFixture) -> MockType:
 
     Returns:
     -------
-        Mock: A mock configuration object whose `conversation_cache` attribute is a mock.
+        Mock: A mock configuration object whose `async_conversation_cache`
+        attribute is an async mock.
     """
     mock_config = mocker.Mock()
-    mock_cache = mocker.Mock()
-    mock_config.conversation_cache = mock_cache
+    mock_cache = mocker.AsyncMock()
+    mock_config.async_conversation_cache = mock_cache
     return mock_config
 
 
@@ -271,27 +278,30 @@ class TestCheckValidConversationId:
 class TestCheckConversationExistence:
     """Test cases for the check_conversation_existence function."""
 
-    def test_conversation_exists(
+    @pytest.mark.asyncio
+    async def test_conversation_exists(
         self, mocker: MockerFixture, mock_configuration: MockType
     ) -> None:
         """Test when conversation exists."""
-        mock_configuration.conversation_cache.list.return_value = [
-            mocker.Mock(conversation_id=VALID_CONVERSATION_ID)
-        ]
+        mock_configuration.async_conversation_cache.exists.return_value = True
         mocker.patch("app.endpoints.conversations_v2.configuration", mock_configuration)
 
         # Should not raise an exception
-        check_conversation_existence("user_id", VALID_CONVERSATION_ID)
+        await check_conversation_existence("user_id", VALID_CONVERSATION_ID, False)
+        mock_configuration.async_conversation_cache.exists.assert_awaited_once_with(
+            "user_id", VALID_CONVERSATION_ID, False
+        )
 
-    def test_conversation_not_exists(
+    @pytest.mark.asyncio
+    async def test_conversation_not_exists(
         self, mocker: MockerFixture, mock_configuration: MockType
     ) -> None:
         """Test when conversation does not exist."""
-        mock_configuration.conversation_cache.list.return_value = []
+        mock_configuration.async_conversation_cache.exists.return_value = False
         mocker.patch("app.endpoints.conversations_v2.configuration", mock_configuration)
 
         with pytest.raises(HTTPException) as exc_info:
-            check_conversation_existence("user_id", VALID_CONVERSATION_ID)
+            await check_conversation_existence("user_id", VALID_CONVERSATION_ID, False)
 
         assert exc_info.value.status_code == status.HTTP_404_NOT_FOUND
         detail = exc_info.value.detail
@@ -299,7 +309,8 @@ class TestCheckConversationExistence:
         response = detail["response"]  # pyright: ignore[reportArgumentType]
         assert "Conversation not found" in response
 
-    def test_conversation_cache_type_none(
+    @pytest.mark.asyncio
+    async def test_conversation_cache_type_none(
         self, mocker: MockerFixture, mock_configuration: MockType
     ) -> None:
         """Test when conversation_cache_configuration.type is None."""
@@ -308,11 +319,11 @@ class TestCheckConversationExistence:
         mock_configuration.conversation_cache_configuration = mock_cache_config
         mocker.patch("app.endpoints.conversations_v2.configuration", mock_configuration)
 
-        # Should return early without raising an exception or calling list
-        check_conversation_existence("user_id", VALID_CONVERSATION_ID)
+        # Should return early without raising an exception or calling exists
+        await check_conversation_existence("user_id", VALID_CONVERSATION_ID, False)
 
-        # Verify that conversation_cache.list was not called
-        mock_configuration.conversation_cache.list.assert_not_called()
+        # Verify that async_conversation_cache.exists was not called
+        mock_configuration.async_conversation_cache.exists.assert_not_awaited()
 
 
 class TestGetConversationsListEndpoint:
@@ -370,7 +381,7 @@ class TestGetConversationsListEndpoint:
         timestamp_dt = datetime.fromisoformat(timestamp_str).replace(tzinfo=UTC)
         timestamp = timestamp_dt.timestamp()
 
-        mock_configuration.conversation_cache.list.return_value = [
+        mock_configuration.async_conversation_cache.list.return_value = [
             ConversationData(
                 conversation_id=VALID_CONVERSATION_ID,
                 topic_summary="summary",
@@ -394,7 +405,7 @@ class TestGetConversationsListEndpoint:
         """Test successful retrieval of an empty conversation list."""
         mock_authorization_resolvers(mocker)
         mocker.patch("app.endpoints.conversations_v2.configuration", mock_configuration)
-        mock_configuration.conversation_cache.list.return_value = []
+        mock_configuration.async_conversation_cache.list.return_value = []
 
         response = await get_conversations_list_endpoint_handler(
             request=mocker.Mock(),
@@ -414,12 +425,12 @@ class TestGetConversationsListEndpoint:
         flag from the auth tuple to the conversation cache.
 
         Sets up a mocked configuration and auth tuple with the skip flag set to
-        True, invokes the handler, and asserts that `conversation_cache.list`
+        True, invokes the handler, and asserts that `async_conversation_cache.list`
         is called with the user ID and `True`.
         """
         mock_authorization_resolvers(mocker)
         mocker.patch("app.endpoints.conversations_v2.configuration", mock_configuration)
-        mock_configuration.conversation_cache.list.return_value = []
+        mock_configuration.async_conversation_cache.list.return_value = []
         mock_auth_with_skip = ("mock_user_id", "mock_username", True, "mock_token")
 
         await get_conversations_list_endpoint_handler(
@@ -427,10 +438,50 @@ class TestGetConversationsListEndpoint:
             auth=mock_auth_with_skip,
         )
 
-        mock_configuration.conversation_cache.list.assert_called_once_with(
+        mock_configuration.async_conversation_cache.list.assert_called_once_with(
             "mock_user_id", True
         )
 
+    @pytest.mark.asyncio
+    async def test_paginated_retrieval(
+        self, mocker: MockerFixture, mock_configuration: MockType
+    ) -> None:
+        """Test that one page of conversations is returned with its cursor."""
+        before = encode_cache_cursor(1800000000.0, VALID_CONVERSATION_ID)
+        next_cursor = encode_cache_cursor(1700000000.0, VALID_CONVERSATION_ID)
+        mock_authorization_resolvers(mocker)
+        mocker.patch("app.endpoints.conversations_v2.configuration", mock_configuration)
+        mock_configuration.async_conversation_cache.list_page.return_value = (
+            ConversationDataPage(
+                conversations=[
+                    ConversationData(
+                        conversation_id=VALID_CONVERSATION_ID,
+                        topic_summary="summary",
+                        last_message_timestamp=1700000000.0,
+                    )
+                ],
+                next_cursor=next_cursor,
+            )
+        )
+
+        response = await get_conversations_list_endpoint_handler(
+            request=mocker.Mock(),
+            auth=MOCK_AUTH,
+            page=ConversationsListPageParams(limit=1, before=before),
+        )
+
+        assert len(response.conversations) == 1
+        assert response.next_cursor == next_cursor
+        mock_configuration.async_conversation_cache.list_page.assert_called_once_with(
+            "mock_user_id", before, 1, False
+        )
+        mock_configuration.async_conversation_cache.list.assert_not_called()
+
+    def test_malformed_cursor_rejected(self) -> None:
+        """Test that malformed cursor is rejected by request validation."""
+        with pytest.raises(ValidationError, match="Malformed cursor"):
+            ConversationsListPageParams(before="1800000000.0")
+
 
 class TestGetConversationEndpoint:
     """Test cases for the GET /conversations/{conversation_id} endpoint."""
@@ -515,7 +566,7 @@ class TestGetConversationEndpoint:
         mock_authorization_resolvers(mocker)
         mocker.patch("app.endpoints.conversations_v2.configuration", mock_configuration)
         mocker.patch("app.endpoints.conversations_v2.check_suid", return_value=True)
-        mock_configuration.conversation_cache.list.return_value = []
+        mock_configuration.async_conversation_cache.exists.return_value = False
 
         with pytest.raises(HTTPException) as exc_info:
             await get_conversation_endpoint_handler(
@@ -534,10 +585,8 @@ class TestGetConversationEndpoint:
         mock_authorization_resolvers(mocker)
         mocker.patch("app.endpoints.conversations_v2.configuration", mock_configuration)
         mocker.patch("app.endpoints.conversations_v2.check_suid", return_value=True)
-        mock_configuration.conversation_cache.list.return_value = [
-            mocker.Mock(conversation_id=VALID_CONVERSATION_ID)
-        ]
-        mock_configuration.conversation_cache.get.return_value = [
+        mock_configuration.async_conversation_cache.exists.return_value = True
+        mock_configuration.async_conversation_cache.get.return_value = [
             CacheEntry(
                 query="query",
                 response="response",
@@ -579,10 +628,8 @@ class TestGetConversationEndpoint:
                 source="vs_abc123",
             ),
         ]
-        mock_configuration.conversation_cache.list.return_value = [
-            mocker.Mock(conversation_id=VALID_CONVERSATION_ID)
-        ]
-        mock_configuration.conversation_cache.get.return_value = [
+        mock_configuration.async_conversation_cache.exists.return_value = True
+        mock_configuration.async_conversation_cache.get.return_value = [
             CacheEntry(
                 query="What is RHDH?",
                 response="RHDH is a developer hub.",
@@ -623,10 +670,8 @@ class TestGetConversationEndpoint:
         mock_authorization_resolvers(mocker)
         mocker.patch("app.endpoints.conversations_v2.configuration", mock_configuration)
         mocker.patch("app.endpoints.conversations_v2.check_suid", return_value=True)
-        mock_configuration.conversation_cache.list.return_value = [
-            mocker.Mock(conversation_id=VALID_CONVERSATION_ID)
-        ]
-        mock_configuration.conversation_cache.get.return_value = [
+        mock_configuration.async_conversation_cache.exists.return_value = True
+        mock_configuration.async_conversation_cache.get.return_value = [
             CacheEntry(
                 query="Hello",
                 response="Hi there!",
@@ -656,10 +701,8 @@ class TestGetConversationEndpoint:
         mock_authorization_resolvers(mocker)
         mocker.patch("app.endpoints.conversations_v2.configuration", mock_configuration)
         mocker.patch("app.endpoints.conversations_v2.check_suid", return_value=True)
-        mock_configuration.conversation_cache.list.return_value = [
-            mocker.Mock(conversation_id=VALID_CONVERSATION_ID)
-        ]
-        mock_configuration.conversation_cache.get.return_value = [
+        mock_configuration.async_conversation_cache.exists.return_value = True
+        mock_configuration.async_conversation_cache.get.return_value = [
             CacheEntry(
                 query="query",
                 response="response",
@@ -677,10 +720,49 @@ class TestGetConversationEndpoint:
             auth=mock_auth_with_skip,
         )
 
-        mock_configuration.conversation_cache.get.assert_called_once_with(
+        mock_configuration.async_conversation_cache.get.assert_called_once_with(
             "mock_user_id", VALID_CONVERSATION_ID, True
         )
 
+    @pytest.mark.asyncio
+    async def test_paginated_retrieval(
+        self, mocker: MockerFixture, mock_configuration: MockType
+    ) -> None:
+        """Test that one page of chat history is returned with its cursor."""
+        mock_authorization_resolvers(mocker)
+        mocker.patch("app.endpoints.conversations_v2.configuration", mock_configuration)
+        mocker.patch("app.endpoints.conversations_v2.check_suid", return_value=True)
+        mock_configuration.async_conversation_cache.exists.return_value = True
+        mock_configuration.async_conversation_cache.get_page.return_value = (
+            CacheEntryPage(
+                entries=[
+                    CacheEntry(
+                        query="query",
+                        response="response",
+                        provider="provider",
+                        model="model",
+                        started_at="2024-01-01T00:00:00Z",
+                        completed_at="2024-01-01T00:00:05Z",
+                    )
+                ],
+                next_cursor=1700000000.0,
+            )
+        )
+
+        response = await get_conversation_endpoint_handler(
+            request=mocker.Mock(),
+            conversation_id=VALID_CONVERSATION_ID,
+            auth=MOCK_AUTH,
+            page=ConversationPageParams(after=1600000000.0),
+        )
+
+        assert len(response.chat_history) == 1
+        assert response.next_cursor == 1700000000.0
+        mock_configuration.async_conversation_cache.get_page.assert_called_once_with(
+            "mock_user_id", VALID_CONVERSATION_ID, 1600000000.0, 100, False
+        )
+        mock_configuration.async_conversation_cache.get.assert_not_called()
+
 
 class TestDeleteConversationEndpoint:
     """Test cases for the DELETE /conversations/{conversation_id} endpoint."""
@@ -754,7 +836,7 @@ class TestDeleteConversationEndpoint:
         mock_authorization_resolvers(mocker)
         mocker.patch("app.endpoints.conversations_v2.configuration", mock_configuration)
         mocker.patch("app.endpoints.conversations_v2.check_suid", return_value=True)
-        mock_configuration.conversation_cache.delete.return_value = True
+        mock_configuration.async_conversation_cache.delete.return_value = True
 
         response = await delete_conversation_endpoint_handler(
             request=mocker.Mock(),
@@ -775,7 +857,7 @@ class TestDeleteConversationEndpoint:
         mock_authorization_resolvers(mocker)
         mocker.patch("app.endpoints.conversations_v2.configuration", mock_configuration)
         mocker.patch("app.endpoints.conversations_v2.check_suid", return_value=True)
-        mock_configuration.conversation_cache.delete.return_value = False
+        mock_configuration.async_conversation_cache.delete.return_value = False
 
         response = await delete_conversation_endpoint_handler(
             request=mocker.Mock(),
@@ -806,7 +888,7 @@ class TestDeleteConversationEndpoint:
         mock_authorization_resolvers(mocker)
         mocker.patch("app.endpoints.conversations_v2.configuration", mock_configuration)
         mocker.patch("app.endpoints.conversations_v2.check_suid", return_value=True)
-        mock_configuration.conversation_cache.delete.return_value = True
+        mock_configuration.async_conversation_cache.delete.return_value = True
         mock_auth_with_skip = ("mock_user_id", "mock_username", True, "mock_token")
 
         await delete_conversation_endpoint_handler(
@@ -815,7 +897,7 @@ class TestDeleteConversationEndpoint:
             auth=mock_auth_with_skip,
         )
 
-        mock_configuration.conversation_cache.delete.assert_called_once_with(
+        mock_configuration.async_conversation_cache.delete.assert_called_once_with(
             "mock_user_id", VALID_CONVERSATION_ID, True
         )
 
@@ -905,7 +987,7 @@ class TestUpdateConversationEndpoint:
         mock_authorization_resolvers(mocker)
         mocker.patch("app.endpoints.conversations_v2.configuration", mock_configuration)
         mocker.patch("app.endpoints.conversations_v2.check_suid", return_value=True)
-        mock_configuration.conversation_cache.list.return_value = []
+        mock_configuration.async_conversation_cache.exists.return_value = False
 
         update_request = ConversationUpdateRequest(topic_summary="New topic summary")
 
@@ -930,9 +1012,7 @@ class TestUpdateConversationEndpoint:
         mock_authorization_resolvers(mocker)
         mocker.patch("app.endpoints.conversations_v2.configuration", mock_configuration)
         mocker.patch("app.endpoints.conversations_v2.check_suid", return_value=True)
-        mock_configuration.conversation_cache.list.return_value = [
-            mocker.Mock(conversation_id=VALID_CONVERSATION_ID)
-        ]
+        mock_configuration.async_conversation_cache.exists.return_value = True
 
         update_request = ConversationUpdateRequest(topic_summary="New topic summary")
 
@@ -948,7 +1028,7 @@ class TestUpdateConversationEndpoint:
         assert response.message == "Topic summary updated successfully"
 
         # Verify that set_topic_summary was called
-        mock_configuration.conversation_cache.set_topic_summary.assert_called_once_with(
+        mock_configuration.async_conversation_cache.set_topic_summary.assert_called_once_with(
             "mock_user_id", VALID_CONVERSATION_ID, "New topic summary", False
         )
 
@@ -960,9 +1040,7 @@ class TestUpdateConversationEndpoint:
         mock_authorization_resolvers(mocker)
         mocker.patch("app.endpoints.conversations_v2.configuration", mock_configuration)
         mocker.patch("app.endpoints.conversations_v2.check_suid", return_value=True)
-        mock_configuration.conversation_cache.list.return_value = [
-            mocker.Mock(conversation_id=VALID_CONVERSATION_ID)
-        ]
+        mock_configuration.async_conversation_cache.exists.return_value = True
         mock_auth_with_skip = ("mock_user_id", "mock_username", True, "mock_token")
         update_request = ConversationUpdateRequest(topic_summary="New topic summary")
 
@@ -972,6 +1050,6 @@ class TestUpdateConversationEndpoint:
             auth=mock_auth_with_skip,
         )
 
-        mock_configuration.conversation_cache.set_topic_summary.assert_called_once_with(
+        mock_configuration.async_conversation_cache.set_topic_summary.assert_called_once_with(
             "mock_user_id", VALID_CONVERSATION_ID, "New topic summary", True
         )
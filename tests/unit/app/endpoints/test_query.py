@@ -1,10 +1,12 @@
 # pylint: disable=too-many-locals
 """Unit tests for the /query (v2) REST API endpoint using Responses API."""
 
-from typing import Any
+import threading
+from pathlib import Path
+from typing import Any, Optional
 
 import pytest
-from fastapi import Request
+from fastapi import HTTPException, Request
 from ogx_client import AsyncOgxClient
 from pytest_mock import MockerFixture
 
@@ -22,6 +24,7 @@ from models.common.turn_summary import (
     TurnSummary,
 )
 from models.database.conversations import UserConversation
+from quota.quota_limiter import QuotaReservation
 
 # User ID must be proper UUID
 MOCK_AUTH = (
@@ -107,7 +110,7 @@ class TestQueryEndpointHandler:
 
         mocker.patch("app.endpoints.query.configuration", setup_configuration)
         mocker.patch("app.endpoints.query.check_configuration_loaded")
-        mocker.patch("app.endpoints.query.check_tokens_available")
+        mocker.patch("app.endpoints.query.reserve_query_tokens", return_value=[])
         mocker.patch("app.endpoints.query.validate_model_provider_override")
 
         mock_client = mocker.AsyncMock(spec=AsyncOgxClient)
@@ -190,7 +193,7 @@ class TestQueryEndpointHandler:
 
         mocker.patch("app.endpoints.query.configuration", setup_configuration)
         mocker.patch("app.endpoints.query.check_configuration_loaded")
-        mocker.patch("app.endpoints.query.check_tokens_available")
+        mocker.patch("app.endpoints.query.reserve_query_tokens", return_value=[])
         mocker.patch("app.endpoints.query.validate_model_provider_override")
 
         mock_client = mocker.AsyncMock(spec=AsyncOgxClient)
@@ -280,7 +283,7 @@ class TestQueryEndpointHandler:
 
         mocker.patch("app.endpoints.query.configuration", setup_configuration)
         mocker.patch("app.endpoints.query.check_configuration_loaded")
-        mocker.patch("app.endpoints.query.check_tokens_available")
+        mocker.patch("app.endpoints.query.reserve_query_tokens", return_value=[])
         mocker.patch("app.endpoints.query.validate_model_provider_override")
         mocker.patch(
             "app.endpoints.query.normalize_conversation_id", return_value="123"
@@ -353,7 +356,7 @@ class TestQueryEndpointHandler:
 
         mocker.patch("app.endpoints.query.configuration", setup_configuration)
         mocker.patch("app.endpoints.query.check_configuration_loaded")
-        mocker.patch("app.endpoints.query.check_tokens_available")
+        mocker.patch("app.endpoints.query.reserve_query_tokens", return_value=[])
         mocker.patch("app.endpoints.query.validate_model_provider_override")
         mock_validate = mocker.patch(
             "app.endpoints.query.validate_attachments_metadata"
@@ -431,7 +434,7 @@ class TestQueryEndpointHandler:
 
         mocker.patch("app.endpoints.query.configuration", setup_configuration)
         mocker.patch("app.endpoints.query.check_configuration_loaded")
-        mocker.patch("app.endpoints.query.check_tokens_available")
+        mocker.patch("app.endpoints.query.reserve_query_tokens", return_value=[])
         mocker.patch("app.endpoints.query.validate_model_provider_override")
 
         mock_client = mocker.AsyncMock(spec=AsyncOgxClient)
@@ -483,6 +486,171 @@ class TestQueryEndpointHandler:
 
         mock_maybe_get_topic_summary.assert_called_once()
 
+    @pytest.mark.asyncio
+    async def test_query_with_persistence_pipeline(
+        self,
+        dummy_request: Request,
+        setup_configuration: AppConfig,
+        mocker: MockerFixture,
+    ) -> None:
+        """Test query queues the turn instead of storing it when pipeline runs."""
+        query_request = QueryRequest(
+            query="What is Kubernetes?", generate_topic_summary=True
+        )  # pyright: ignore[reportCallIssue]
+
+        mocker.patch("app.endpoints.query.configuration", setup_configuration)
+        mocker.patch("app.endpoints.query.check_configuration_loaded")
+        mocker.patch("app.endpoints.query.reserve_query_tokens", return_value=[])
+        mocker.patch("app.endpoints.query.validate_model_provider_override")
+
+        mock_client = mocker.AsyncMock(spec=AsyncOgxClient)
+        mock_client_holder = mocker.Mock()
+        mock_client_holder.get_client.return_value = mock_client
+        mocker.patch(
+            "app.endpoints.query.AsyncOgxClientHolder",
+            return_value=mock_client_holder,
+        )
+        mocker.patch(
+            "app.endpoints.query.run_shield_moderation",
+            new=mocker.AsyncMock(return_value=ShieldModerationPassed()),
+        )
+
+        mock_responses_params = mocker.Mock(spec=ResponsesApiParams)
+        mock_responses_params.model = "provider1/model1"
+        mock_responses_params.conversation = "conv_123"
+        mock_responses_params.tools = None
+        mock_responses_params.model_dump.return_value = {
+            "input": "test",
+            "model": "provider1/model1",
+        }
+        mocker.patch(
+            "app.endpoints.query.prepare_responses_params",
+            new=mocker.AsyncMock(return_value=mock_responses_params),
+        )
+
+        turn_summary = TurnSummary(id="resp_1", llm_response="Orchestrator")
+        mocker.patch(
+            "app.endpoints.query.retrieve_agent_response",
+            new=mocker.AsyncMock(return_value=turn_summary),
+        )
+        mock_topic_summary = mocker.patch(
+            "app.endpoints.query.maybe_get_topic_summary", new=mocker.AsyncMock()
+        )
+        mocker.patch(
+            "app.endpoints.query.normalize_conversation_id", return_value="123"
+        )
+        mock_store = mocker.patch("app.endpoints.query.store_query_results")
+        mock_consume = mocker.patch("app.endpoints.query.consume_query_tokens")
+        mocker.patch(
+            "app.endpoints.query.get_available_quotas",
+            return_value={"UserQuotaLimiter": 100},
+        )
+        mock_pipeline = mocker.Mock()
+        mock_pipeline.journal = mocker.AsyncMock(return_value=Path("turn.json"))
+        mock_pipeline.queue = mocker.AsyncMock()
+        mocker.patch(
+            "app.endpoints.query.get_persistence_pipeline",
+            return_value=mock_pipeline,
+        )
+
+        response = await query_endpoint_handler(
+            request=dummy_request,
+            query_request=query_request,
+            auth=MOCK_AUTH,
+            mcp_headers={},
+        )
+
+        assert response.available_quotas == {"UserQuotaLimiter": 100}
+        mock_topic_summary.assert_not_called()
+        mock_consume.assert_not_called()
+        mock_store.assert_not_called()
+        mock_pipeline.journal.assert_awaited_once()
+        record = mock_pipeline.journal.call_args.args[0]
+        mock_pipeline.queue.assert_awaited_once_with(Path("turn.json"), record)
+        assert record.user_id == MOCK_AUTH[0]
+        assert record.conversation_id == "123"
+        assert record.model == "provider1/model1"
+        assert record.summary == turn_summary
+        assert record.query == "What is Kubernetes?"
+        assert record.generate_topic_summary is True
+        assert not record.completed_steps
+
+    @pytest.mark.asyncio
+    @pytest.mark.parametrize(
+        ("failing_step", "released"), [("journal", True), ("queue", False)]
+    )
+    async def test_query_pipeline_owns_reservations_once_journaled(
+        self,
+        dummy_request: Request,
+        setup_configuration: AppConfig,
+        mocker: MockerFixture,
+        failing_step: str,
+        released: bool,
+    ) -> None:
+        """Test that reservations of a journaled turn are not released."""
+        query_request = QueryRequest(
+            query="What is Kubernetes?"
+        )  # pyright: ignore[reportCallIssue]
+        reservations: list[Optional[QuotaReservation]] = [
+            QuotaReservation(reservation_id="r1", subject_id="user", tokens=100)
+        ]
+
+        mocker.patch("app.endpoints.query.configuration", setup_configuration)
+        mocker.patch("app.endpoints.query.check_configuration_loaded")
+        mocker.patch(
+            "app.endpoints.query.reserve_query_tokens", return_value=reservations
+        )
+        mock_release = mocker.patch("app.endpoints.query.release_query_tokens")
+        mocker.patch("app.endpoints.query.validate_model_provider_override")
+        mock_client_holder = mocker.Mock()
+        mock_client_holder.get_client.return_value = mocker.AsyncMock(
+            spec=AsyncOgxClient
+        )
+        mocker.patch(
+            "app.endpoints.query.AsyncOgxClientHolder",
+            return_value=mock_client_holder,
+        )
+        mocker.patch(
+            "app.endpoints.query.run_shield_moderation",
+            new=mocker.AsyncMock(return_value=ShieldModerationPassed()),
+        )
+        mock_responses_params = mocker.Mock(spec=ResponsesApiParams)
+        mock_responses_params.model = "provider1/model1"
+        mock_responses_params.conversation = "conv_123"
+        mocker.patch(
+            "app.endpoints.query.prepare_responses_params",
+            new=mocker.AsyncMock(return_value=mock_responses_params),
+        )
+        mocker.patch(
+            "app.endpoints.query.retrieve_agent_response",
+            new=mocker.AsyncMock(
+                return_value=TurnSummary(id="resp_1", llm_response="answer")
+            ),
+        )
+        mocker.patch(
+            "app.endpoints.query.normalize_conversation_id", return_value="123"
+        )
+        mocker.patch("app.endpoints.query.get_available_quotas", return_value={})
+        mock_pipeline = mocker.Mock()
+        mock_pipeline.journal = mocker.AsyncMock(return_value=Path("turn.json"))
+        mock_pipeline.queue = mocker.AsyncMock()
+        getattr(mock_pipeline, failing_step).side_effect = OSError("disk full")
+        mocker.patch(
+            "app.endpoints.query.get_persistence_pipeline",
+            return_value=mock_pipeline,
+        )
+
+        with pytest.raises(OSError, match="disk full"):
+            await query_endpoint_handler(
+                request=dummy_request,
+                query_request=query_request,
+                auth=MOCK_AUTH,
+                mcp_headers={},
+            )
+
+        # the journaled turn settles the reservations when it is persisted
+        assert mock_release.called is released
+
     @pytest.mark.asyncio
     async def test_query_azure_token_refresh(
         self,
@@ -497,7 +665,7 @@ class TestQueryEndpointHandler:
 
         mocker.patch("app.endpoints.query.configuration", setup_configuration)
         mocker.patch("app.endpoints.query.check_configuration_loaded")
-        mocker.patch("app.endpoints.query.check_tokens_available")
+        mocker.patch("app.endpoints.query.reserve_query_tokens", return_value=[])
         mocker.patch("app.endpoints.query.validate_model_provider_override")
 
         mock_client = mocker.AsyncMock(spec=AsyncOgxClient)
@@ -570,3 +738,84 @@ class TestQueryEndpointHandler:
         )
 
         mock_client_holder.update_azure_token.assert_called_once()
+
+    @pytest.mark.asyncio
+    async def test_query_validation_error_reserves_no_tokens(
+        self,
+        dummy_request: Request,
+        setup_configuration: AppConfig,
+        mocker: MockerFixture,
+    ) -> None:
+        """Test that tokens are not reserved for a query refused by validation."""
+        query_request = QueryRequest(
+            query="What is Kubernetes?"
+        )  # pyright: ignore[reportCallIssue]
+
+        mocker.patch("app.endpoints.query.configuration", setup_configuration)
+        mocker.patch("app.endpoints.query.check_configuration_loaded")
+        mock_reserve = mocker.patch("app.endpoints.query.reserve_query_tokens")
+        mocker.patch(
+            "app.endpoints.query.validate_model_provider_override",
+            side_effect=HTTPException(status_code=403, detail="forbidden"),
+        )
+
+        with pytest.raises(HTTPException):
+            await query_endpoint_handler(
+                request=dummy_request,
+                query_request=query_request,
+                auth=MOCK_AUTH,
+                mcp_headers={},
+            )
+
+        mock_reserve.assert_not_called()
+
+    @pytest.mark.asyncio
+    async def test_query_llm_error_releases_reserved_tokens(
+        self,
+        dummy_request: Request,
+        setup_configuration: AppConfig,
+        mocker: MockerFixture,
+    ) -> None:
+        """Test that tokens reserved for a failed query are released."""
+        query_request = QueryRequest(
+            query="What is Kubernetes?"
+        )  # pyright: ignore[reportCallIssue]
+        reservations = [mocker.Mock()]
+        reserving_threads: list[int] = []
+
+        def reserve(*_args: Any) -> list[Any]:
+            reserving_threads.append(threading.get_ident())
+            return reservations
+
+        mocker.patch("app.endpoints.query.configuration", setup_configuration)
+        mocker.patch("app.endpoints.query.check_configuration_loaded")
+        mocker.patch("app.endpoints.query.reserve_query_tokens", side_effect=reserve)
+        mock_release = mocker.patch("app.endpoints.query.release_query_tokens")
+        mocker.patch("app.endpoints.query.validate_model_provider_override")
+        mock_client_holder = mocker.Mock()
+        mock_client_holder.get_client.return_value = mocker.AsyncMock(
+            spec=AsyncOgxClient
+        )
+        mocker.patch(
+            "app.endpoints.query.AsyncOgxClientHolder",
+            return_value=mock_client_holder,
+        )
+        mocker.patch(
+            "app.endpoints.query.run_shield_moderation",
+            new=mocker.AsyncMock(side_effect=HTTPException(status_code=503)),
+        )
+        mock_consume = mocker.patch("app.endpoints.query.consume_query_tokens")
+
+        with pytest.raises(HTTPException):
+            await query_endpoint_handler(
+                request=dummy_request,
+                query_request=query_request,
+                auth=MOCK_AUTH,
+                mcp_headers={},
+            )
+
+        mock_consume.assert_not_called()
+        mock_release.assert_called_once_with(reservations)
+        # database is not accessed from the event loop thread
+        assert len(reserving_threads) == 1
+        assert reserving_threads[0] != threading.get_ident()
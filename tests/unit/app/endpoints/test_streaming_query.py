@@ -1,3 +1,4 @@
+# pylint: disable=too-many-lines
 """Unit tests for the /streaming_query (v2) endpoint using Responses API."""
 
 from collections.abc import AsyncIterator
@@ -14,6 +15,7 @@ from opentelemetry.sdk.trace.export.in_memory_span_exporter import (
 from pytest_mock import MockerFixture
 
 from app.endpoints.streaming_query import (
+    release_unsettled_tokens,
     streaming_query_endpoint_handler,
 )
 from configuration import AppConfig
@@ -124,7 +126,9 @@ class TestStreamingQueryEndpointHandler:
 
         mocker.patch("app.endpoints.streaming_query.configuration", setup_configuration)
         mocker.patch("app.endpoints.streaming_query.check_configuration_loaded")
-        mocker.patch("app.endpoints.streaming_query.check_tokens_available")
+        mocker.patch(
+            "app.endpoints.streaming_query.reserve_query_tokens", return_value=[]
+        )
         mocker.patch("app.endpoints.streaming_query.validate_model_provider_override")
         mocker.patch(
             "app.endpoints.streaming_query.build_rag_context",
@@ -211,7 +215,9 @@ class TestStreamingQueryEndpointHandler:
 
         mocker.patch("app.endpoints.streaming_query.configuration", setup_configuration)
         mocker.patch("app.endpoints.streaming_query.check_configuration_loaded")
-        mocker.patch("app.endpoints.streaming_query.check_tokens_available")
+        mocker.patch(
+            "app.endpoints.streaming_query.reserve_query_tokens", return_value=[]
+        )
         mocker.patch("app.endpoints.streaming_query.validate_model_provider_override")
         mocker.patch(
             "app.endpoints.streaming_query.build_rag_context",
@@ -301,7 +307,9 @@ class TestStreamingQueryEndpointHandler:
 
         mocker.patch("app.endpoints.streaming_query.configuration", setup_configuration)
         mocker.patch("app.endpoints.streaming_query.check_configuration_loaded")
-        mocker.patch("app.endpoints.streaming_query.check_tokens_available")
+        mocker.patch(
+            "app.endpoints.streaming_query.reserve_query_tokens", return_value=[]
+        )
         mocker.patch("app.endpoints.streaming_query.validate_model_provider_override")
         mocker.patch(
             "app.endpoints.streaming_query.build_rag_context",
@@ -402,7 +410,9 @@ class TestStreamingQueryEndpointHandler:
 
         mocker.patch("app.endpoints.streaming_query.configuration", setup_configuration)
         mocker.patch("app.endpoints.streaming_query.check_configuration_loaded")
-        mocker.patch("app.endpoints.streaming_query.check_tokens_available")
+        mocker.patch(
+            "app.endpoints.streaming_query.reserve_query_tokens", return_value=[]
+        )
         mocker.patch("app.endpoints.streaming_query.validate_model_provider_override")
         mocker.patch(
             "app.endpoints.streaming_query.build_rag_context",
@@ -491,7 +501,9 @@ class TestStreamingQueryEndpointHandler:
 
         mocker.patch("app.endpoints.streaming_query.configuration", setup_configuration)
         mocker.patch("app.endpoints.streaming_query.check_configuration_loaded")
-        mocker.patch("app.endpoints.streaming_query.check_tokens_available")
+        mocker.patch(
+            "app.endpoints.streaming_query.reserve_query_tokens", return_value=[]
+        )
         mocker.patch("app.endpoints.streaming_query.validate_model_provider_override")
         mocker.patch(
             "app.endpoints.streaming_query.build_rag_context",
@@ -575,6 +587,100 @@ class TestStreamingQueryEndpointHandler:
 
         mock_client_holder.update_azure_token.assert_called_once()
 
+    @pytest.mark.asyncio
+    async def test_streaming_query_error_releases_reserved_tokens(
+        self,
+        dummy_request: Request,  # pylint: disable=redefined-outer-name
+        setup_configuration: AppConfig,
+        mocker: MockerFixture,
+    ) -> None:
+        """Test that tokens reserved for a query failing before streaming are released."""
+        query_request = QueryRequest(
+            query="What is Kubernetes?"
+        )  # pyright: ignore[reportCallIssue]
+        reservations = [mocker.Mock()]
+
+        mocker.patch("app.endpoints.streaming_query.configuration", setup_configuration)
+        mocker.patch("app.endpoints.streaming_query.check_configuration_loaded")
+        mocker.patch(
+            "app.endpoints.streaming_query.reserve_query_tokens",
+            return_value=reservations,
+        )
+        mock_release = mocker.patch(
+            "app.endpoints.streaming_query.release_query_tokens"
+        )
+        mocker.patch("app.endpoints.streaming_query.validate_model_provider_override")
+        mock_client_holder = mocker.Mock()
+        mock_client_holder.get_client.return_value = mocker.AsyncMock(
+            spec=AsyncOgxClient
+        )
+        mocker.patch(
+            "app.endpoints.streaming_query.AsyncOgxClientHolder",
+            return_value=mock_client_holder,
+        )
+        mocker.patch(
+            "app.endpoints.streaming_query.run_shield_moderation",
+            new=mocker.AsyncMock(side_effect=HTTPException(status_code=503)),
+        )
+
+        with pytest.raises(HTTPException):
+            await streaming_query_endpoint_handler(
+                request=dummy_request,
+                query_request=query_request,
+                auth=MOCK_AUTH_STREAMING,
+                mcp_headers={},
+            )
+
+        mock_release.assert_called_once_with(reservations)
+
+
+class TestReleaseUnsettledTokens:
+    """Tests for release_unsettled_tokens function."""
+
+    @pytest.mark.asyncio
+    async def test_failed_stream_releases_reserved_tokens(
+        self, mocker: MockerFixture
+    ) -> None:
+        """Test that tokens are released when the stream fails before settling."""
+        reservations = [mocker.Mock()]
+        context = mocker.Mock(quota_reservations=reservations)
+        mock_release = mocker.patch(
+            "app.endpoints.streaming_query.release_query_tokens"
+        )
+
+        async def failing_stream() -> AsyncIterator[str]:
+            yield "data: start\n\n"
+            raise RuntimeError("stream aborted")
+
+        events = []
+        with pytest.raises(RuntimeError):
+            async for event in release_unsettled_tokens(failing_stream(), context):
+                events.append(event)
+
+        assert events == ["data: start\n\n"]
+        mock_release.assert_called_once_with(reservations)
+
+    @pytest.mark.asyncio
+    async def test_closed_stream_releases_reserved_tokens(
+        self, mocker: MockerFixture
+    ) -> None:
+        """Test that tokens are released when the client closes the stream."""
+        reservations = [mocker.Mock()]
+        context = mocker.Mock(quota_reservations=reservations)
+        mock_release = mocker.patch(
+            "app.endpoints.streaming_query.release_query_tokens"
+        )
+
+        async def endless_stream() -> AsyncIterator[str]:
+            while True:
+                yield "data: token\n\n"
+
+        stream = release_unsettled_tokens(endless_stream(), context)
+        assert await anext(stream) == "data: token\n\n"
+        await stream.aclose()  # type: ignore[attr-defined]
+
+        mock_release.assert_called_once_with(reservations)
+
 
 async def _drain_response(response: StreamingResponse) -> None:
     """Consume a StreamingResponse body to trigger the generator."""
@@ -594,7 +700,9 @@ class TestStreamingQueryOtelInstrumentation:
         """Set up common mocks for OTEL tests."""
         mocker.patch("app.endpoints.streaming_query.configuration", setup_configuration)
         mocker.patch("app.endpoints.streaming_query.check_configuration_loaded")
-        mocker.patch("app.endpoints.streaming_query.check_tokens_available")
+        mocker.patch(
+            "app.endpoints.streaming_query.reserve_query_tokens", return_value=[]
+        )
         mocker.patch("app.endpoints.streaming_query.validate_model_provider_override")
         mocker.patch(
             "app.endpoints.streaming_query.build_rag_context",
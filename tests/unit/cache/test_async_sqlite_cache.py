@@ -0,0 +1,342 @@
+"""Unit tests for asynchronous SQLite cache implementation."""
+
+from collections.abc import AsyncIterator
+from pathlib import Path
+
+import pytest
+from pydantic import AnyUrl
+from pytest_mock import MockerFixture
+from sqlalchemy.exc import OperationalError
+
+from cache.async_sqlite_cache import AsyncSQLiteCache
+from cache.cache_entry import CacheEntry
+from cache.cache_error import CacheError
+from cache.sqlite_cache import SQLiteCache
+from models.common.turn_summary import (
+    ReferencedDocument,
+    ToolCallSummary,
+    ToolResultSummary,
+)
+from models.compaction import ConversationSummary
+from models.config import SQLiteConcurrencyConfiguration, SQLiteDatabaseConfiguration
+from utils import suid
+
+USER_ID_1 = suid.get_suid()
+USER_ID_2 = suid.get_suid()
+CONVERSATION_ID_1 = suid.get_suid()
+CONVERSATION_ID_2 = suid.get_suid()
+cache_entry_1 = CacheEntry(
+    query="user message1",
+    response="AI message1",
+    provider="foo",
+    model="bar",
+    started_at="2025-10-03T09:31:25Z",
+    completed_at="2025-10-03T09:31:29Z",
+)
+cache_entry_2 = CacheEntry(
+    query="user message2",
+    response="AI message2",
+    provider="foo",
+    model="bar",
+    started_at="2025-10-03T09:31:35Z",
+    completed_at="2025-10-03T09:31:39Z",
+)
+
+
+def _summary(text: str, created_at: str) -> ConversationSummary:
+    """Build a compaction summary chunk for tests."""
+    return ConversationSummary(
+        summary_text=text,
+        summarized_through_turn=2,
+        token_count=10,
+        created_at=created_at,
+        model_used="bar",
+    )
+
+
+@pytest.fixture(name="db_config")
+def db_config_fixture(tmp_path: Path) -> SQLiteDatabaseConfiguration:
+    """Return SQLite configuration pointing to a temporary database file."""
+    return SQLiteDatabaseConfiguration(db_path=str(tmp_path / "cache.db"))
+
+
+@pytest.fixture(name="cache")
+async def cache_fixture(
+    db_config: SQLiteDatabaseConfiguration,
+) -> AsyncIterator[AsyncSQLiteCache]:
+    """Return initialized asynchronous SQLite cache; dispose it afterwards."""
+    cache = AsyncSQLiteCache(db_config)
+    await cache.initialize_cache()
+    yield cache
+    await cache.close()
+
+
+async def test_initialize_cache_is_idempotent(cache: AsyncSQLiteCache) -> None:
+    """Test that repeated initialization keeps the existing data."""
+    await cache.insert_or_append(USER_ID_1, CONVERSATION_ID_1, cache_entry_1)
+    await cache.initialize_cache()
+    assert await cache.get(USER_ID_1, CONVERSATION_ID_1) == [cache_entry_1]
+
+
+async def test_operations_initialize_schema_lazily(
+    db_config: SQLiteDatabaseConfiguration,
+) -> None:
+    """Test that the schema is created on first use."""
+    cache = AsyncSQLiteCache(db_config)
+    try:
+        assert not await cache.list(USER_ID_1)
+    finally:
+        await cache.close()
+
+
+async def test_ready(cache: AsyncSQLiteCache) -> None:
+    """Test the ready method."""
+    assert cache.ready() is True
+
+
+async def test_get_empty(cache: AsyncSQLiteCache) -> None:
+    """Test get on empty cache."""
+    assert not await cache.get(USER_ID_1, CONVERSATION_ID_1)
+
+
+async def test_insert_or_append_and_get(cache: AsyncSQLiteCache) -> None:
+    """Test that entries are appended and returned oldest first."""
+    await cache.insert_or_append(USER_ID_1, CONVERSATION_ID_1, cache_entry_1)
+    await cache.insert_or_append(USER_ID_1, CONVERSATION_ID_1, cache_entry_2)
+
+    assert await cache.get(USER_ID_1, CONVERSATION_ID_1) == [
+        cache_entry_1,
+        cache_entry_2,
+    ]
+    assert not await cache.get(USER_ID_2, CONVERSATION_ID_1)
+
+
+async def test_insert_or_append_many(cache: AsyncSQLiteCache) -> None:
+    """Test that a batch of entries keeps order, also within one conversation."""
+    await cache.insert_or_append_many(
+        [
+            (USER_ID_1, CONVERSATION_ID_1, cache_entry_1),
+            (USER_ID_1, CONVERSATION_ID_2, cache_entry_1),
+            (USER_ID_1, CONVERSATION_ID_1, cache_entry_2),
+        ]
+    )
+    await cache.insert_or_append_many([])
+
+    assert await cache.get(USER_ID_1, CONVERSATION_ID_1) == [
+        cache_entry_1,
+        cache_entry_2,
+    ]
+    assert await cache.get(USER_ID_1, CONVERSATION_ID_2) == [cache_entry_1]
+    # conversation updated last is listed first
+    assert [c.conversation_id for c in await cache.list(USER_ID_1)] == [
+        CONVERSATION_ID_1,
+        CONVERSATION_ID_2,
+    ]
+
+
+async def test_insert_and_get_with_attachments(cache: AsyncSQLiteCache) -> None:
+    """Test that referenced documents, tool calls and results round-trip."""
+    entry = cache_entry_1.model_copy(
+        update={
+            "referenced_documents": [
+                ReferencedDocument(
+                    doc_title="Doc", doc_url=AnyUrl("http://example.com/doc")
+                )
+            ],
+            "tool_calls": [
+                ToolCallSummary(id="call_1", name="tool", args={"a": 1}, type="tool")
+            ],
+            "tool_results": [
+                ToolResultSummary(
+                    id="call_1",
+                    status="success",
+                    content="result",
+                    type="tool_result",
+                    round=1,
+                )
+            ],
+        }
+    )
+    await cache.insert_or_append(USER_ID_1, CONVERSATION_ID_1, entry)
+
+    assert await cache.get(USER_ID_1, CONVERSATION_ID_1) == [entry]
+
+
+async def test_list_and_topic_summary(cache: AsyncSQLiteCache) -> None:
+    """Test listing conversations, most recent first, with topic summaries."""
+    await cache.insert_or_append(USER_ID_1, CONVERSATION_ID_1, cache_entry_1)
+    await cache.insert_or_append(USER_ID_1, CONVERSATION_ID_2, cache_entry_2)
+    await cache.set_topic_summary(USER_ID_1, CONVERSATION_ID_2, "topic")
+
+    conversations = await cache.list(USER_ID_1)
+
+    assert [c.conversation_id for c in conversations] == [
+        CONVERSATION_ID_2,
+        CONVERSATION_ID_1,
+    ]
+    assert conversations[0].topic_summary == "topic"
+    assert conversations[1].topic_summary is None
+    assert not await cache.list(USER_ID_2)
+
+
+async def test_delete(cache: AsyncSQLiteCache) -> None:
+    """Test that delete removes history, conversation record and summaries."""
+    await cache.insert_or_append(USER_ID_1, CONVERSATION_ID_1, cache_entry_1)
+    await cache.store_summary(
+        USER_ID_1, CONVERSATION_ID_1, _summary("s", "2026-01-01T00:00:00Z")
+    )
+
+    assert await cache.delete(USER_ID_1, CONVERSATION_ID_1) is True
+    assert not await cache.get(USER_ID_1, CONVERSATION_ID_1)
+    assert not await cache.list(USER_ID_1)
+    assert not await cache.get_summaries(USER_ID_1, CONVERSATION_ID_1)
+    assert await cache.delete(USER_ID_1, CONVERSATION_ID_1) is False
+
+
+async def test_summaries(cache: AsyncSQLiteCache) -> None:
+    """Test storing, reading and replacing compaction summaries."""
+    first = _summary("first", "2026-01-01T00:00:00Z")
+    second = _summary("second", "2026-01-01T00:10:00Z")
+    await cache.store_summary(USER_ID_1, CONVERSATION_ID_1, second)
+    await cache.store_summary(USER_ID_1, CONVERSATION_ID_1, first)
+
+    assert await cache.get_summaries(USER_ID_1, CONVERSATION_ID_1) == [first, second]
+
+    folded = _summary("folded", "2026-01-01T00:20:00Z")
+    await cache.replace_summaries(USER_ID_1, CONVERSATION_ID_1, folded)
+
+    assert await cache.get_summaries(USER_ID_1, CONVERSATION_ID_1) == [folded]
+
+
+async def test_shares_tables_with_sync_cache(
+    cache: AsyncSQLiteCache, db_config: SQLiteDatabaseConfiguration
+) -> None:
+    """Test that data written by the synchronous cache is readable and vice versa."""
+    sync_cache = SQLiteCache(db_config)
+    sync_cache.insert_or_append(USER_ID_1, CONVERSATION_ID_1, cache_entry_1)
+    await cache.insert_or_append(USER_ID_1, CONVERSATION_ID_1, cache_entry_2)
+
+    assert await cache.get(USER_ID_1, CONVERSATION_ID_1) == [
+        cache_entry_1,
+        cache_entry_2,
+    ]
+    assert sync_cache.get(USER_ID_1, CONVERSATION_ID_1) == [
+        cache_entry_1,
+        cache_entry_2,
+    ]
+    assert [c.conversation_id for c in sync_cache.list(USER_ID_1)] == [
+        CONVERSATION_ID_1
+    ]
+
+
+async def test_database_error_is_wrapped(
+    cache: AsyncSQLiteCache, mocker: MockerFixture
+) -> None:
+    """Test that database errors are reported as CacheError."""
+    mocker.patch.object(
+        cache,
+        "_read_engine",
+        mocker.Mock(
+            connect=mocker.Mock(
+                side_effect=OperationalError("SELECT", {}, Exception("boom"))
+            ),
+            dispose=mocker.AsyncMock(),
+        ),
+    )
+    with pytest.raises(CacheError, match="AsyncSQLiteCache.list"):
+        await cache.list(USER_ID_1)
+
+
+async def test_get_page(cache: AsyncSQLiteCache) -> None:
+    """Test that conversation history is returned page by page."""
+    entries = [
+        cache_entry_1.model_copy(update={"query": f"message{i}"}) for i in range(3)
+    ]
+    await cache.insert_or_append_many(
+        [(USER_ID_1, CONVERSATION_ID_1, entry) for entry in entries]
+    )
+
+    first = await cache.get_page(USER_ID_1, CONVERSATION_ID_1, None, 2)
+    assert first.entries == entries[:2]
+    assert first.next_cursor is not None
+
+    last = await cache.get_page(USER_ID_1, CONVERSATION_ID_1, first.next_cursor, 2)
+    assert last.entries == entries[2:]
+    assert last.next_cursor is None
+
+
+async def test_list_page(cache: AsyncSQLiteCache) -> None:
+    """Test that conversations are listed page by page, most recent first."""
+    await cache.insert_or_append(USER_ID_1, CONVERSATION_ID_1, cache_entry_1)
+    await cache.insert_or_append(USER_ID_1, CONVERSATION_ID_2, cache_entry_2)
+
+    first = await cache.list_page(USER_ID_1, None, 1)
+    assert [c.conversation_id for c in first.conversations] == [CONVERSATION_ID_2]
+    assert first.next_cursor is not None
+
+    last = await cache.list_page(USER_ID_1, first.next_cursor, 1)
+    assert [c.conversation_id for c in last.conversations] == [CONVERSATION_ID_1]
+    assert last.next_cursor is None
+
+
+async def test_list_page_tied_timestamps(
+    cache: AsyncSQLiteCache, mocker: MockerFixture
+) -> None:
+    """Test that conversations sharing the last message time are all listed."""
+    mocker.patch("cache.async_sqlite_cache.time", return_value=1704067200.123456)
+    conversation_ids = [suid.get_suid() for _ in range(3)]
+    for conversation_id in conversation_ids:
+        await cache.insert_or_append(USER_ID_1, conversation_id, cache_entry_1)
+
+    first = await cache.list_page(USER_ID_1, None, 2)
+    last = await cache.list_page(USER_ID_1, first.next_cursor, 2)
+
+    # ties are ordered by conversation ID, none is skipped or repeated
+    assert [c.conversation_id for c in first.conversations + last.conversations] == (
+        sorted(conversation_ids, reverse=True)
+    )
+    assert last.next_cursor is None
+
+
+async def test_high_concurrency_mode(tmp_path: Path) -> None:
+    """Test that reads go through engine with read-only connections."""
+    cache = AsyncSQLiteCache(
+        SQLiteDatabaseConfiguration(
+            db_path=str(tmp_path / "cache.db"),
+            concurrency=SQLiteConcurrencyConfiguration(readers=2),
+        )
+    )
+    try:
+        await cache.insert_or_append(USER_ID_1, CONVERSATION_ID_1, cache_entry_1)
+        assert await cache.get(USER_ID_1, CONVERSATION_ID_1) == [cache_entry_1]
+
+        # pylint: disable=protected-access
+        assert cache._read_engine is not cache._engine
+        assert cache._engine.pool.size() == 1  # type: ignore[attr-defined]
+        assert cache._read_engine.pool.size() == 2  # type: ignore[attr-defined]
+        async with cache._engine.connect() as conn:
+            result = await conn.exec_driver_sql("PRAGMA journal_mode")
+            assert result.scalar() == "wal"
+            result = await conn.exec_driver_sql("PRAGMA auto_vacuum")
+            assert result.scalar() == 2
+        async with cache._read_engine.connect() as conn:
+            result = await conn.exec_driver_sql("PRAGMA query_only")
+            assert result.scalar() == 1
+    finally:
+        await cache.close()
+
+
+async def test_get_conversation_meta(cache: AsyncSQLiteCache) -> None:
+    """Test that one conversation is looked up by its primary key."""
+    assert await cache.get_conversation_meta(USER_ID_1, CONVERSATION_ID_1) is None
+    assert await cache.exists(USER_ID_1, CONVERSATION_ID_1, False) is False
+
+    await cache.insert_or_append(USER_ID_1, CONVERSATION_ID_1, cache_entry_1)
+    await cache.set_topic_summary(USER_ID_1, CONVERSATION_ID_1, "topic")
+
+    meta = await cache.get_conversation_meta(USER_ID_1, CONVERSATION_ID_1)
+    assert meta == (await cache.list(USER_ID_1))[0]
+    assert meta is not None
+    assert meta.topic_summary == "topic"
+    assert await cache.exists(USER_ID_1, CONVERSATION_ID_1, False) is True
+    assert await cache.exists(USER_ID_2, CONVERSATION_ID_1, False) is False
@@ -0,0 +1,89 @@
+"""Unit tests for CacheEntry model."""
+
+import copy
+import pickle
+
+from pytest_mock import MockerFixture
+
+from cache.cache_entry import CacheEntry
+from cache.entry_codec import decode_items, encode_items
+from models.common.turn_summary import ToolCallSummary, ToolResultSummary
+
+TOOL_CALLS = [ToolCallSummary(id="call_1", name="tool", args={}, type="tool_call")]
+TOOL_RESULTS = [
+    ToolResultSummary(
+        id="call_1", status="success", content="output", type="tool_result", round=1
+    )
+]
+ENTRY = CacheEntry(
+    query="query",
+    response="response",
+    provider="provider",
+    model="model",
+    started_at="start",
+    completed_at="end",
+    tool_calls=TOOL_CALLS,
+    tool_results=TOOL_RESULTS,
+)
+
+
+def _lazy_entry(decode: object = decode_items) -> CacheEntry:
+    """Return entry equal to ENTRY with list fields decoded lazily."""
+    return CacheEntry.from_encoded(
+        decode,  # type: ignore[arg-type]
+        query="query",
+        response="response",
+        provider="provider",
+        model="model",
+        started_at="start",
+        completed_at="end",
+        referenced_documents=None,
+        tool_calls=encode_items([tc.model_dump(mode="json") for tc in TOOL_CALLS]),
+        tool_results=encode_items([tr.model_dump(mode="json") for tr in TOOL_RESULTS]),
+    )
+
+
+def test_fields_are_decoded_on_first_access(mocker: MockerFixture) -> None:
+    """Test that list fields are decoded once, when accessed."""
+    decode = mocker.Mock(side_effect=decode_items)
+    entry = _lazy_entry(decode)
+
+    assert entry.query == "query"
+    assert entry.referenced_documents is None
+    decode.assert_not_called()
+
+    assert entry.tool_calls == TOOL_CALLS
+    assert entry.tool_calls == TOOL_CALLS
+    decode.assert_called_once()
+
+
+def test_lazy_entry_behaves_as_decoded_entry() -> None:
+    """Test that comparison, serialization and copies see decoded fields."""
+    assert _lazy_entry() == ENTRY
+    assert ENTRY == _lazy_entry()
+    assert _lazy_entry().model_dump() == ENTRY.model_dump()
+    assert _lazy_entry().model_dump_json() == ENTRY.model_dump_json()
+    assert dict(_lazy_entry()) == dict(ENTRY)
+    assert repr(_lazy_entry()) == repr(ENTRY)
+    assert _lazy_entry().model_copy() == ENTRY
+    assert copy.deepcopy(_lazy_entry()) == ENTRY
+    assert pickle.loads(pickle.dumps(_lazy_entry())) == ENTRY
+
+
+def test_invalid_value_is_decoded_as_none() -> None:
+    """Test that a field that can not be decoded is None."""
+    entry = CacheEntry.from_encoded(
+        decode_items,
+        query="query",
+        response="response",
+        provider="provider",
+        model="model",
+        started_at="start",
+        completed_at="end",
+        tool_calls=b"\x7fcorrupted",
+        tool_results="[{}]",
+    )
+
+    assert entry.tool_calls is None
+    assert entry.tool_results is None
+    assert entry.query == "query"
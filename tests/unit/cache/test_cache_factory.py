@@ -6,11 +6,17 @@ import pytest
 from pydantic import SecretStr
 from pytest_mock import MockerFixture
 
+from cache.async_postgres_cache import AsyncPostgresCache
+from cache.async_sqlite_cache import AsyncSQLiteCache
+from cache.cache_entry import CacheEntry
 from cache.cache_factory import CacheFactory
 from cache.in_memory_cache import InMemoryCache
 from cache.noop_cache import NoopCache
 from cache.postgres_cache import PostgresCache
+from cache.read_through_cache import ReadThroughCache
 from cache.sqlite_cache import SQLiteCache
+from cache.sync_cache_adapter import SyncCacheAdapter
+from cache.write_behind_cache import WriteBehindCache
 from constants import (
     CACHE_TYPE_MEMORY,
     CACHE_TYPE_NOOP,
@@ -21,7 +27,11 @@ from models.config import (
     ConversationHistoryConfiguration,
     InMemoryCacheConfig,
     PostgreSQLDatabaseConfiguration,
+    PostgreSQLReplicaConfiguration,
+    PostgreSQLShardConfiguration,
+    ReadThroughCacheConfiguration,
     SQLiteDatabaseConfiguration,
+    WriteBehindConfiguration,
 )
 
 
@@ -263,3 +273,174 @@ def test_conversation_cache_wrong_cache(
     """
     with pytest.raises(ValueError, match="Invalid cache type"):
         CacheFactory.conversation_cache(invalid_cache_type_config_fixture)
+
+
+def test_async_conversation_cache_noop(
+    noop_cache_config_fixture: ConversationHistoryConfiguration,
+) -> None:
+    """Check if NoopCache wrapped by adapter is returned by async factory."""
+    cache = CacheFactory.async_conversation_cache(noop_cache_config_fixture)
+    assert isinstance(cache, SyncCacheAdapter)
+    assert isinstance(cache.cache, NoopCache)
+
+
+def test_async_conversation_cache_in_memory(
+    memory_cache_config_fixture: ConversationHistoryConfiguration,
+) -> None:
+    """Check if InMemoryCache wrapped by adapter is returned by async factory."""
+    cache = CacheFactory.async_conversation_cache(memory_cache_config_fixture)
+    assert isinstance(cache, SyncCacheAdapter)
+    assert isinstance(cache.cache, InMemoryCache)
+
+
+def test_async_conversation_cache_sqlite(
+    sqlite_cache_config_fixture: ConversationHistoryConfiguration,
+) -> None:
+    """Check if AsyncSQLiteCache is returned by async factory."""
+    cache = CacheFactory.async_conversation_cache(sqlite_cache_config_fixture)
+    assert isinstance(cache, AsyncSQLiteCache)
+
+
+def test_async_conversation_cache_write_behind(
+    sqlite_cache_config_fixture: ConversationHistoryConfiguration,
+) -> None:
+    """Check if database cache is wrapped when write-behind mode is configured."""
+    config = sqlite_cache_config_fixture.model_copy(
+        update={"write_behind": WriteBehindConfiguration(batch_size=10)}
+    )
+    cache = CacheFactory.async_conversation_cache(config)
+    assert isinstance(cache, WriteBehindCache)
+    assert cache.batch_size == 10
+
+
+def test_async_conversation_cache_read_through(
+    sqlite_cache_config_fixture: ConversationHistoryConfiguration,
+) -> None:
+    """Check if read-through cache is the outermost wrapper."""
+    config = sqlite_cache_config_fixture.model_copy(
+        update={
+            "write_behind": WriteBehindConfiguration(),
+            "read_through": ReadThroughCacheConfiguration(max_entries=10),
+        }
+    )
+    cache = CacheFactory.async_conversation_cache(config)
+    assert isinstance(cache, ReadThroughCache)
+    assert cache.max_entries == 10
+    # pylint: disable=protected-access
+    assert isinstance(cache._cache, WriteBehindCache)
+
+
+def test_async_conversation_cache_postgres(
+    postgres_cache_config_fixture: ConversationHistoryConfiguration,
+) -> None:
+    """Check if AsyncPostgresCache is returned by async factory.
+
+    The engine connects lazily, so no database server is needed.
+    """
+    cache = CacheFactory.async_conversation_cache(postgres_cache_config_fixture)
+    assert isinstance(cache, AsyncPostgresCache)
+
+
+async def test_async_conversation_cache_postgres_replicas(
+    mocker: MockerFixture,
+) -> None:
+    """Check that AsyncPostgresCache reads from replica chosen for the user."""
+    config = ConversationHistoryConfiguration(
+        type=CACHE_TYPE_POSTGRES,
+        postgres=PostgreSQLDatabaseConfiguration(
+            db="database",
+            user="user",
+            password=SecretStr("password"),
+            replicas=[PostgreSQLReplicaConfiguration(host="replica")],
+        ),  # pyright: ignore[reportCallIssue],
+    )
+    cache = CacheFactory.async_conversation_cache(config)
+    assert isinstance(cache, AsyncPostgresCache)
+    # pylint: disable=protected-access
+    router = cache._replica_router
+    assert router is not None
+    (replica,) = router.replicas
+    assert replica.url.host == "replica"
+
+    route = mocker.patch(
+        "cache.async_postgres_cache.route_async_read", side_effect=[replica, None]
+    )
+    assert cache._reader("user") is replica
+    route.assert_called_once_with(router, "user")
+    assert cache._reader("user") is cache._engine
+    await cache.close()
+
+
+async def test_async_conversation_cache_postgres_shards(
+    mocker: MockerFixture,
+) -> None:
+    """Check that AsyncPostgresCache stores conversations in user's shard."""
+    config = ConversationHistoryConfiguration(
+        type=CACHE_TYPE_POSTGRES,
+        postgres=PostgreSQLDatabaseConfiguration(
+            db="database",
+            user="user",
+            password=SecretStr("password"),
+            replicas=[PostgreSQLReplicaConfiguration(host="replica")],
+            shards=[
+                PostgreSQLShardConfiguration(name="a", host="a", db="cache_a"),
+                PostgreSQLShardConfiguration(name="b", host="b", db="cache_b"),
+            ],
+        ),  # pyright: ignore[reportCallIssue],
+    )
+    cache = CacheFactory.async_conversation_cache(config)
+    assert isinstance(cache, AsyncPostgresCache)
+    # pylint: disable=protected-access
+    assert cache._replica_router is None
+    assert [engine.url.database for engine in cache._engines()] == [
+        "cache_a",
+        "cache_b",
+    ]
+    shard_a, shard_b = cache._engines()
+    # users are assigned to shards by their IDs
+    assert cache._writer("u1") is shard_a
+    assert cache._reader("u1") is shard_a
+    assert cache._writer("u3") is shard_b
+
+    mocker.patch.object(cache, "initialize_cache")
+    insert_many = mocker.patch.object(cache, "_insert_many")
+    entry = CacheEntry(
+        query="q",
+        response="r",
+        provider="p",
+        model="m",
+        started_at="2025-10-03T09:31:25Z",
+        completed_at="2025-10-03T09:31:29Z",
+    )
+    await cache.insert_or_append_many(
+        [("u1", "c1", entry), ("u3", "c3", entry), ("u2", "c2", entry)]
+    )
+    assert insert_many.await_args_list == [
+        mocker.call(shard_a, [("u1", "c1", entry), ("u2", "c2", entry)]),
+        mocker.call(shard_b, [("u3", "c3", entry)]),
+    ]
+    await cache.close()
+
+
+def test_async_conversation_cache_improper_config() -> None:
+    """Check if missing type-specific configuration is detected by async factory."""
+    cc = ConversationHistoryConfiguration(
+        type=CACHE_TYPE_POSTGRES,
+        postgres=PostgreSQLDatabaseConfiguration(
+            db="db", user="u", password=SecretStr("p")
+        ),  # pyright: ignore[reportCallIssue]
+    )
+    # simulate improper configuration (can not be done directly as model checks this)
+    cc.postgres = None
+    with pytest.raises(
+        ValueError, match="Expecting configuration for PostgreSQL cache"
+    ):
+        CacheFactory.async_conversation_cache(cc)
+
+
+def test_async_conversation_cache_wrong_cache(
+    invalid_cache_type_config_fixture: ConversationHistoryConfiguration,
+) -> None:
+    """Check if wrong cache type is detected by async factory."""
+    with pytest.raises(ValueError, match="Invalid cache type"):
+        CacheFactory.async_conversation_cache(invalid_cache_type_config_fixture)
@@ -0,0 +1,68 @@
+"""Unit tests for compact encoding of conversation cache list columns."""
+
+import json
+
+import pytest
+
+from cache.entry_codec import (
+    COMPRESSION_THRESHOLD,
+    FORMAT_JSON,
+    FORMAT_JSON_ZLIB,
+    decode_items,
+    encode_items,
+)
+
+ITEMS = [{"id": "call_1", "name": "tool", "args": {"text": "žluťoučký kůň"}}]
+
+
+def test_small_items_are_stored_uncompressed() -> None:
+    """Test that small values are compact JSON with format tag."""
+    encoded = encode_items(ITEMS)
+
+    assert encoded == bytes((FORMAT_JSON,)) + json.dumps(
+        ITEMS, separators=(",", ":"), ensure_ascii=False
+    ).encode("utf-8")
+    assert decode_items(encoded) == ITEMS
+
+
+def test_large_items_are_compressed() -> None:
+    """Test that values over the threshold are compressed."""
+    items = [{"content": "result " * COMPRESSION_THRESHOLD}]
+
+    encoded = encode_items(items)
+
+    assert encoded[0] == FORMAT_JSON_ZLIB
+    assert len(encoded) < COMPRESSION_THRESHOLD
+    assert decode_items(encoded) == items
+    assert decode_items(memoryview(encoded)) == items
+
+
+@pytest.mark.parametrize(
+    "value",
+    [json.dumps(ITEMS), json.dumps(ITEMS).encode()],
+    ids=["text", "bytes"],
+)
+def test_legacy_json_is_decoded(value: str | bytes) -> None:
+    """Test that JSON written before the format was introduced is readable."""
+    assert decode_items(value) == ITEMS
+
+
+@pytest.mark.parametrize(
+    ("value", "message"),
+    [
+        (b"", "Empty encoded value"),
+        (b"\x7fdata", "Unknown encoding format 0x7f"),
+        (bytes((FORMAT_JSON_ZLIB,)) + b"not compressed", "Corrupted"),
+        (bytes((FORMAT_JSON,)) + b"{", "Expecting"),
+    ],
+)
+def test_invalid_values(value: bytes, message: str) -> None:
+    """Test that invalid values raise ValueError."""
+    with pytest.raises(ValueError, match=message):
+        decode_items(value)
+
+
+def test_encode_non_serializable_items() -> None:
+    """Test that items that are not JSON serializable raise TypeError."""
+    with pytest.raises(TypeError):
+        encode_items([{"value": object()}])
@@ -1,20 +1,37 @@
-"""Unit tests for InMemoryCache class — conversation compaction summaries (LCORE-1571).
-
-The in-memory cache is a non-persisting implementation (its ``get`` returns an
-empty list and ``insert_or_append`` is a no-op). The summary operations follow
-the same contract: ``store_summary`` validates the key but does not persist, and
-``get_summaries`` always returns an empty list.
-"""
+"""Unit tests for InMemoryCache class."""
 
 import pytest
+from pytest_mock import MockerFixture
 
+from cache.cache_entry import CacheEntry
 from cache.in_memory_cache import InMemoryCache
 from models.compaction import ConversationSummary
 from models.config import InMemoryCacheConfig
 from utils import suid
+from utils.pagination import encode_cache_cursor
 
 USER_ID = suid.get_suid()
+USER_ID_2 = suid.get_suid()
 CONVERSATION_ID = suid.get_suid()
+CONVERSATION_ID_2 = suid.get_suid()
+CONVERSATION_ID_3 = suid.get_suid()
+
+cache_entry_1 = CacheEntry(
+    query="user message1",
+    response="AI message1",
+    provider="foo",
+    model="bar",
+    started_at="2025-10-03T09:31:25Z",
+    completed_at="2025-10-03T09:31:29Z",
+)
+cache_entry_2 = CacheEntry(
+    query="user message2",
+    response="AI message2",
+    provider="foo",
+    model="bar",
+    started_at="2025-10-03T09:32:25Z",
+    completed_at="2025-10-03T09:32:29Z",
+)
 
 summary_1 = ConversationSummary(
     summary_text="Summary chunk for the in-memory cache test.",
@@ -23,6 +40,20 @@ summary_1 = ConversationSummary(
     created_at="2025-10-03T09:31:29Z",
     model_used="openai/gpt-4o-mini",
 )
+summary_2 = ConversationSummary(
+    summary_text="Second summary chunk.",
+    summarized_through_turn=16,
+    token_count=5,
+    created_at="2025-10-03T09:41:29Z",
+    model_used="openai/gpt-4o-mini",
+)
+folded_summary = ConversationSummary(
+    summary_text="Folded summary.",
+    summarized_through_turn=16,
+    token_count=4,
+    created_at="2025-10-03T09:51:29Z",
+    model_used="openai/gpt-4o-mini",
+)
 
 
 @pytest.fixture(name="cache_fixture")
@@ -33,15 +64,137 @@ def cache() -> InMemoryCache:
     return c
 
 
-def test_store_summary_is_noop(cache_fixture: InMemoryCache) -> None:
-    """store_summary accepts a summary without persisting (in-memory cache)."""
+def test_get_unknown_conversation(cache_fixture: InMemoryCache) -> None:
+    """get returns an empty list for a conversation that is not cached."""
+    assert not cache_fixture.get(USER_ID, CONVERSATION_ID)
+
+
+def test_insert_or_append(cache_fixture: InMemoryCache) -> None:
+    """Entries are appended to the conversation history in order."""
+    cache_fixture.insert_or_append(USER_ID, CONVERSATION_ID, cache_entry_1)
+    cache_fixture.insert_or_append(USER_ID, CONVERSATION_ID, cache_entry_2)
+
+    assert cache_fixture.get(USER_ID, CONVERSATION_ID) == [
+        cache_entry_1,
+        cache_entry_2,
+    ]
+
+
+def test_get_returns_copy(cache_fixture: InMemoryCache) -> None:
+    """Mutating the returned history does not change the cached one."""
+    cache_fixture.insert_or_append(USER_ID, CONVERSATION_ID, cache_entry_1)
+    history = cache_fixture.get(USER_ID, CONVERSATION_ID)
+    history.append(cache_entry_2)
+
+    assert cache_fixture.get(USER_ID, CONVERSATION_ID) == [cache_entry_1]
+
+
+def test_conversations_are_scoped_to_user(cache_fixture: InMemoryCache) -> None:
+    """Users can not see entries stored for other users."""
+    cache_fixture.insert_or_append(USER_ID, CONVERSATION_ID, cache_entry_1)
+
+    assert not cache_fixture.get(USER_ID_2, CONVERSATION_ID)
+    assert not cache_fixture.list(USER_ID_2)
+
+
+def test_delete(cache_fixture: InMemoryCache) -> None:
+    """delete removes history, summaries and the conversation record."""
+    cache_fixture.insert_or_append(USER_ID, CONVERSATION_ID, cache_entry_1)
     cache_fixture.store_summary(USER_ID, CONVERSATION_ID, summary_1)
 
+    assert cache_fixture.delete(USER_ID, CONVERSATION_ID) is True
+    assert not cache_fixture.get(USER_ID, CONVERSATION_ID)
+    assert not cache_fixture.get_summaries(USER_ID, CONVERSATION_ID)
+    assert not cache_fixture.list(USER_ID)
+
+
+def test_delete_unknown_conversation(cache_fixture: InMemoryCache) -> None:
+    """delete returns False when there is nothing to delete."""
+    assert cache_fixture.delete(USER_ID, CONVERSATION_ID) is False
+
+
+def test_list(cache_fixture: InMemoryCache) -> None:
+    """list returns the user's conversations, most recent first."""
+    cache_fixture.insert_or_append(USER_ID, CONVERSATION_ID, cache_entry_1)
+    cache_fixture.insert_or_append(USER_ID, CONVERSATION_ID_2, cache_entry_1)
+    cache_fixture.insert_or_append(USER_ID_2, CONVERSATION_ID_3, cache_entry_1)
+
+    conversations = cache_fixture.list(USER_ID)
+
+    assert [c.conversation_id for c in conversations] == [
+        CONVERSATION_ID_2,
+        CONVERSATION_ID,
+    ]
+    assert conversations[0].topic_summary is None
+
+
+def test_set_topic_summary(cache_fixture: InMemoryCache) -> None:
+    """Topic summary is stored and kept when new entries are appended."""
+    cache_fixture.set_topic_summary(USER_ID, CONVERSATION_ID, "topic")
+    cache_fixture.insert_or_append(USER_ID, CONVERSATION_ID, cache_entry_1)
+
+    conversations = cache_fixture.list(USER_ID)
+
+    assert len(conversations) == 1
+    assert conversations[0].topic_summary == "topic"
+
+
+def test_store_and_get_summaries(cache_fixture: InMemoryCache) -> None:
+    """Summary chunks are returned oldest first."""
+    cache_fixture.store_summary(USER_ID, CONVERSATION_ID, summary_2)
+    cache_fixture.store_summary(USER_ID, CONVERSATION_ID, summary_1)
+
+    assert cache_fixture.get_summaries(USER_ID, CONVERSATION_ID) == [
+        summary_1,
+        summary_2,
+    ]
+
 
-def test_get_summaries_returns_empty(cache_fixture: InMemoryCache) -> None:
-    """get_summaries always returns an empty list for the in-memory cache."""
+def test_replace_summaries(cache_fixture: InMemoryCache) -> None:
+    """replace_summaries collapses existing chunks into the fold."""
     cache_fixture.store_summary(USER_ID, CONVERSATION_ID, summary_1)
-    assert cache_fixture.get_summaries(USER_ID, CONVERSATION_ID) == []
+    cache_fixture.store_summary(USER_ID, CONVERSATION_ID, summary_2)
+    cache_fixture.replace_summaries(USER_ID, CONVERSATION_ID, folded_summary)
+
+    assert cache_fixture.get_summaries(USER_ID, CONVERSATION_ID) == [folded_summary]
+
+
+def test_lru_eviction() -> None:
+    """The least recently used conversation is evicted when the cache is full."""
+    c = InMemoryCache(InMemoryCacheConfig(max_entries=2))
+    c.insert_or_append(USER_ID, CONVERSATION_ID, cache_entry_1)
+    c.insert_or_append(USER_ID, CONVERSATION_ID_2, cache_entry_1)
+
+    # touch the first conversation so the second one becomes the LRU one
+    c.get(USER_ID, CONVERSATION_ID)
+    c.insert_or_append(USER_ID, CONVERSATION_ID_3, cache_entry_1)
+
+    assert c.get(USER_ID, CONVERSATION_ID) == [cache_entry_1]
+    assert not c.get(USER_ID, CONVERSATION_ID_2)
+    assert c.get(USER_ID, CONVERSATION_ID_3) == [cache_entry_1]
+    assert {conv.conversation_id for conv in c.list(USER_ID)} == {
+        CONVERSATION_ID,
+        CONVERSATION_ID_3,
+    }
+
+
+def test_eviction_drops_summaries() -> None:
+    """Summaries of an evicted conversation are evicted too."""
+    c = InMemoryCache(InMemoryCacheConfig(max_entries=1))
+    c.store_summary(USER_ID, CONVERSATION_ID, summary_1)
+    c.insert_or_append(USER_ID_2, CONVERSATION_ID_2, cache_entry_1)
+
+    assert not c.get_summaries(USER_ID, CONVERSATION_ID)
+    assert not c.list(USER_ID)
+
+
+def test_initialize_cache_clears_content(cache_fixture: InMemoryCache) -> None:
+    """initialize_cache drops everything stored so far."""
+    cache_fixture.insert_or_append(USER_ID, CONVERSATION_ID, cache_entry_1)
+    cache_fixture.initialize_cache()
+
+    assert not cache_fixture.get(USER_ID, CONVERSATION_ID)
+    assert not cache_fixture.list(USER_ID)
 
 
 def test_store_summary_validates_conversation_id(cache_fixture: InMemoryCache) -> None:
@@ -56,15 +209,83 @@ def test_get_summaries_validates_conversation_id(cache_fixture: InMemoryCache) -
         cache_fixture.get_summaries(USER_ID, "not-a-valid-uuid")
 
 
-def test_replace_summaries_is_noop(cache_fixture: InMemoryCache) -> None:
-    """replace_summaries accepts a fold without persisting (in-memory cache)."""
-    cache_fixture.replace_summaries(USER_ID, CONVERSATION_ID, summary_1)
-    assert cache_fixture.get_summaries(USER_ID, CONVERSATION_ID) == []
-
-
 def test_replace_summaries_validates_conversation_id(
     cache_fixture: InMemoryCache,
 ) -> None:
     """replace_summaries validates the conversation ID like the other operations."""
     with pytest.raises(ValueError, match="Invalid conversation ID"):
         cache_fixture.replace_summaries(USER_ID, "not-a-valid-uuid", summary_1)
+
+
+def test_list_validates_user_id(cache_fixture: InMemoryCache) -> None:
+    """list validates the user ID unless the check is skipped."""
+    with pytest.raises(ValueError, match="Invalid user ID"):
+        cache_fixture.list("not-a-valid-uuid")
+    assert not cache_fixture.list("not-a-valid-uuid", skip_user_id_check=True)
+
+
+def test_get_page(cache_fixture: InMemoryCache, mocker: MockerFixture) -> None:
+    """Test reading conversation history page by page."""
+    # turns appended within one clock tick still get distinct cursors
+    mocker.patch("cache.in_memory_cache.time", return_value=1000.0)
+    for entry in (cache_entry_1, cache_entry_2, cache_entry_1):
+        cache_fixture.insert_or_append(USER_ID, CONVERSATION_ID, entry)
+
+    page_1 = cache_fixture.get_page(USER_ID, CONVERSATION_ID, None, 2)
+    assert page_1.entries == [cache_entry_1, cache_entry_2]
+    assert page_1.next_cursor is not None
+
+    page_2 = cache_fixture.get_page(USER_ID, CONVERSATION_ID, page_1.next_cursor, 2)
+    assert page_2.entries == [cache_entry_1]
+    assert page_2.next_cursor is None
+
+    assert not cache_fixture.get_page(USER_ID, CONVERSATION_ID_2, None, 2).entries
+
+
+def test_list_page(cache_fixture: InMemoryCache, mocker: MockerFixture) -> None:
+    """Test listing conversations page by page, most recent first."""
+    mocker.patch("cache.in_memory_cache.time", side_effect=[1.0, 1.0, 2.0, 2.0])
+    cache_fixture.insert_or_append(USER_ID, CONVERSATION_ID, cache_entry_1)
+    cache_fixture.insert_or_append(USER_ID, CONVERSATION_ID_2, cache_entry_1)
+
+    page_1 = cache_fixture.list_page(USER_ID, None, 1)
+    assert [c.conversation_id for c in page_1.conversations] == [CONVERSATION_ID_2]
+    assert page_1.next_cursor == encode_cache_cursor(2.0, CONVERSATION_ID_2)
+
+    page_2 = cache_fixture.list_page(USER_ID, page_1.next_cursor, 1)
+    assert [c.conversation_id for c in page_2.conversations] == [CONVERSATION_ID]
+    assert page_2.next_cursor is None
+
+
+def test_list_page_tied_timestamps(
+    cache_fixture: InMemoryCache, mocker: MockerFixture
+) -> None:
+    """Test that conversations sharing the last message time are all listed."""
+    mocker.patch("cache.in_memory_cache.time", return_value=1.0)
+    for conversation_id in (CONVERSATION_ID, CONVERSATION_ID_2):
+        cache_fixture.insert_or_append(USER_ID, conversation_id, cache_entry_1)
+
+    page_1 = cache_fixture.list_page(USER_ID, None, 1)
+    page_2 = cache_fixture.list_page(USER_ID, page_1.next_cursor, 1)
+
+    assert [c.conversation_id for c in page_1.conversations + page_2.conversations] == (
+        sorted([CONVERSATION_ID, CONVERSATION_ID_2], reverse=True)
+    )
+    assert page_2.next_cursor is None
+
+
+def test_get_conversation_meta(cache_fixture: InMemoryCache) -> None:
+    """Metadata and existence of one conversation are looked up by its key."""
+    assert cache_fixture.get_conversation_meta(USER_ID, CONVERSATION_ID) is None
+    assert cache_fixture.exists(USER_ID, CONVERSATION_ID, False) is False
+
+    cache_fixture.insert_or_append(USER_ID, CONVERSATION_ID, cache_entry_1)
+    cache_fixture.set_topic_summary(USER_ID, CONVERSATION_ID, "topic")
+
+    meta = cache_fixture.get_conversation_meta(USER_ID, CONVERSATION_ID)
+    assert meta == cache_fixture.list(USER_ID)[0]
+    assert meta is not None
+    assert meta.topic_summary == "topic"
+    assert cache_fixture.exists(USER_ID, CONVERSATION_ID, False) is True
+    # conversations are scoped to user
+    assert cache_fixture.exists(USER_ID_2, CONVERSATION_ID, False) is False
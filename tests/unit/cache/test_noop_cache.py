@@ -290,3 +290,26 @@ def test_replace_summaries_validates_conversation_id(cache_fixture: NoopCache) -
     """replace_summaries validates the conversation ID like the other operations."""
     with pytest.raises(ValueError, match="Invalid conversation ID"):
         cache_fixture.replace_summaries(USER_ID, "this-is-not-valid-uuid", summary_1)
+
+
+def test_pages_are_empty(cache_fixture: NoopCache) -> None:
+    """Test that paginated reads return empty pages."""
+    cache_fixture.insert_or_append(USER_ID, CONVERSATION_ID, cache_entry_1)
+
+    page = cache_fixture.get_page(USER_ID, CONVERSATION_ID, None, 10)
+    assert not page.entries
+    assert page.next_cursor is None
+
+    conversations = cache_fixture.list_page(USER_ID, None, 10)
+    assert not conversations.conversations
+    assert conversations.next_cursor is None
+
+
+def test_conversation_never_exists(cache_fixture: NoopCache) -> None:
+    """Test that no conversation metadata is ever found."""
+    cache_fixture.insert_or_append(USER_ID, CONVERSATION_ID, cache_entry_1)
+
+    assert cache_fixture.get_conversation_meta(USER_ID, CONVERSATION_ID) is None
+    assert cache_fixture.exists(USER_ID, CONVERSATION_ID, False) is False
+    with pytest.raises(ValueError, match="Invalid conversation ID"):
+        cache_fixture.get_conversation_meta(USER_ID, "this-is-not-valid-uuid")
@@ -3,6 +3,8 @@
 # pylint: disable=too-many-lines
 
 import json
+from datetime import datetime
+from decimal import Decimal
 from typing import Any
 
 import psycopg2
@@ -20,7 +22,10 @@ from models.common.turn_summary import (
     ToolResultSummary,
 )
 from models.compaction import ConversationSummary
-from models.config import PostgreSQLDatabaseConfiguration
+from models.config import (
+    ConversationRetentionConfiguration,
+    PostgreSQLDatabaseConfiguration,
+)
 from utils import suid
 
 USER_ID_1 = suid.get_suid()
@@ -260,19 +265,62 @@ def test_connected_when_disconnected(
     assert cache.connected() is False
 
 
-def test_connected_when_connection_error(
+def test_connected_does_not_probe_connection(
     postgres_cache_config_fixture: PostgreSQLDatabaseConfiguration,
     mocker: MockerFixture,
 ) -> None:
-    """Test the connected() method."""
+    """Test that the connected() method does not send any query."""
     # prevent real connection to PG instance
     mocker.patch("psycopg2.connect")
-    # simulate connection error
     cache = PostgresCache(postgres_cache_config_fixture)
-    # connection does not have to have proper type
+    # broken connection is detected only when an operation fails
     cache.connection = ConnectionMock()  # pyright: ignore[reportAttributeAccessIssue]
-    assert cache.connection is not None
-    assert cache.connected() is False
+    assert cache.connected() is True
+
+
+def test_reconnect_on_lost_connection(
+    postgres_cache_config_fixture: PostgreSQLDatabaseConfiguration,
+    mocker: MockerFixture,
+) -> None:
+    """Test that a lost connection is re-established and the operation retried."""
+    lost_connection = mocker.MagicMock()
+    new_connection = mocker.MagicMock()
+    mock_connect = mocker.patch(
+        "psycopg2.connect", side_effect=[lost_connection, new_connection]
+    )
+    cache = PostgresCache(postgres_cache_config_fixture)
+    lost_connection.cursor.side_effect = psycopg2.OperationalError("connection lost")
+
+    assert not cache.list(USER_ID_1)
+
+    # the lost connection is discarded and replaced by a new pooled one
+    assert mock_connect.call_count == 2
+    lost_connection.close.assert_called_once()
+    new_connection.cursor.assert_called()
+
+
+def test_ping(
+    postgres_cache_config_fixture: PostgreSQLDatabaseConfiguration,
+    mocker: MockerFixture,
+) -> None:
+    """Test that ping sends a trivial query."""
+    mock_connect = mocker.patch("psycopg2.connect")
+    cache = PostgresCache(postgres_cache_config_fixture)
+
+    cache.ping()
+
+    mock_cursor = mock_connect.return_value.cursor.return_value.__enter__.return_value
+    mock_cursor.execute.assert_called_with("SELECT 1")
+
+
+def test_heartbeat_disabled_by_default(
+    postgres_cache_config_fixture: PostgreSQLDatabaseConfiguration,
+    mocker: MockerFixture,
+) -> None:
+    """Test that connection heartbeat is not started unless configured."""
+    mocker.patch("psycopg2.connect")
+    cache = PostgresCache(postgres_cache_config_fixture)
+    assert cache.heartbeat is None
 
 
 def test_initialize_cache_when_connected(
@@ -290,8 +338,10 @@ def test_initialize_cache_when_connected(
     # prevent real connection to PG instance
     mocker.patch("psycopg2.connect")
     cache = PostgresCache(postgres_cache_config_fixture)
+    assert cache.connection is not None
     # should not fail
-    cache.initialize_cache("public")
+    with cache.connection.lease():
+        cache.initialize_cache("public")
 
 
 def test_initialize_cache_when_disconnected(
@@ -508,6 +558,53 @@ def test_delete_operation_operation_error(
         cache.delete(USER_ID_1, CONVERSATION_ID_1, False)
 
 
+def test_apply_retention(
+    postgres_cache_config_fixture: PostgreSQLDatabaseConfiguration,
+    mocker: MockerFixture,
+) -> None:
+    """Test that expired conversations and turns are deleted in batches."""
+    # prevent real connection to PG instance
+    mock_connect = mocker.patch("psycopg2.connect")
+    cache = PostgresCache(postgres_cache_config_fixture)
+
+    mock_connection = mock_connect.return_value
+    mock_cursor = mock_connection.cursor.return_value.__enter__.return_value
+    # batches smaller than the batch size are the last ones
+    mock_cursor.fetchall.return_value = [(USER_ID_1, CONVERSATION_ID_1)]
+    mock_cursor.rowcount = 1
+
+    deleted = cache.apply_retention(
+        ConversationRetentionConfiguration(max_age=60, batch_size=2)
+    )
+
+    assert deleted == {"cache": 2, "conversations": 1, "conversation_summaries": 1}
+    mock_cursor.executemany.assert_any_call(
+        PostgresCache.DELETE_CONVERSATION_STATEMENT,
+        [(USER_ID_1, CONVERSATION_ID_1)],
+    )
+    mock_cursor.execute.assert_any_call(
+        PostgresCache.DELETE_EXPIRED_TURNS_STATEMENT, (60, 2)
+    )
+
+
+def test_apply_retention_operation_error(
+    postgres_cache_config_fixture: PostgreSQLDatabaseConfiguration,
+    mocker: MockerFixture,
+) -> None:
+    """Test that database errors are reported as cache errors."""
+    # prevent real connection to PG instance
+    mocker.patch("psycopg2.connect")
+    cache = PostgresCache(postgres_cache_config_fixture)
+
+    # no operation for @connection decorator
+    cache.connect = lambda: None
+    # connection does not have to have proper type
+    cache.connection = ConnectionMock()  # pyright: ignore[reportAttributeAccessIssue]
+
+    with pytest.raises(CacheError, match="apply_retention"):
+        cache.apply_retention(ConversationRetentionConfiguration(max_age=60))
+
+
 def test_list_operation_when_disconnected(
     postgres_cache_config_fixture: PostgreSQLDatabaseConfiguration,
     mocker: MockerFixture,
@@ -774,7 +871,9 @@ def test_initialize_cache_with_custom_namespace(
     mock_cursor = mock_connection.cursor.return_value
 
     # should not fail and should execute CREATE SCHEMA
-    cache.initialize_cache("custom_schema")
+    assert cache.connection is not None
+    with cache.connection.lease():
+        cache.initialize_cache("custom_schema")
 
     # Verify CREATE SCHEMA was called for non-public namespace
     create_schema_calls = [
@@ -970,8 +1069,7 @@ def test_store_summary_when_connected(
     cache.store_summary(USER_ID_1, CONVERSATION_ID_1, summary_1, False)
 
     mock_cursor = mock_connect.return_value.cursor.return_value.__enter__.return_value
-    # The most recent execute() is the INSERT (an earlier "SELECT 1" comes from
-    # the @connection decorator's connected() probe sharing this mock cursor).
+    # The most recent execute() is the INSERT
     statement, params = mock_cursor.execute.call_args[0]
     assert "INSERT INTO conversation_summaries" in statement
     # the values tuple carries the summary fields in column order
@@ -1127,3 +1225,65 @@ def test_replace_summaries_database_error(
 
     with pytest.raises(CacheError, match="replace_summaries"):
         cache.replace_summaries(USER_ID_1, CONVERSATION_ID_1, folded_summary, False)
+
+
+def test_get_conversation_meta(
+    postgres_cache_config_fixture: PostgreSQLDatabaseConfiguration,
+    mocker: MockerFixture,
+) -> None:
+    """Test that one conversation is looked up by its primary key."""
+    # prevent real connection to PG instance
+    mock_connect = mocker.patch("psycopg2.connect")
+    cache = PostgresCache(postgres_cache_config_fixture)
+
+    mock_connection = mock_connect.return_value
+    mock_cursor = mock_connection.cursor.return_value.__enter__.return_value
+    mock_cursor.fetchone.return_value = ("topic", 1234567890)
+
+    meta = cache.get_conversation_meta(USER_ID_1, CONVERSATION_ID_1, False)
+    assert meta == ConversationData(
+        conversation_id=CONVERSATION_ID_1,
+        topic_summary="topic",
+        last_message_timestamp=1234567890.0,
+    )
+    mock_cursor.execute.assert_called_with(
+        PostgresCache.SELECT_CONVERSATION_META_STATEMENT,
+        (USER_ID_1, CONVERSATION_ID_1),
+    )
+
+    mock_cursor.fetchone.return_value = None
+    assert cache.get_conversation_meta(USER_ID_1, CONVERSATION_ID_1, False) is None
+    assert cache.exists(USER_ID_1, CONVERSATION_ID_1, False) is False
+
+
+def test_list_page_cursor_is_exact(
+    postgres_cache_config_fixture: PostgreSQLDatabaseConfiguration,
+    mocker: MockerFixture,
+) -> None:
+    """Test that the next page starts at the stored timestamp and conversation ID."""
+    # prevent real connection to PG instance
+    mock_connect = mocker.patch("psycopg2.connect")
+    cache = PostgresCache(postgres_cache_config_fixture)
+
+    mock_connection = mock_connect.return_value
+    mock_cursor = mock_connection.cursor.return_value.__enter__.return_value
+    # microseconds are lost when the timestamp is converted to epoch seconds
+    stored_at = datetime(2024, 1, 1, 0, 0, 0, 123457)
+    mock_cursor.fetchall.return_value = [
+        (CONVERSATION_ID_2, None, Decimal("1704067200.123457"), stored_at),
+        (CONVERSATION_ID_1, None, Decimal("1704067200.123457"), stored_at),
+    ]
+
+    page = cache.list_page(USER_ID_1, None, 1, False)
+    assert [c.conversation_id for c in page.conversations] == [CONVERSATION_ID_2]
+    mock_cursor.execute.assert_called_with(
+        PostgresCache.LIST_CONVERSATIONS_PAGE_STATEMENT, (USER_ID_1, None, "", 2)
+    )
+
+    mock_cursor.fetchall.return_value = []
+    assert page.next_cursor is not None
+    cache.list_page(USER_ID_1, page.next_cursor, 1, False)
+    mock_cursor.execute.assert_called_with(
+        PostgresCache.LIST_CONVERSATIONS_PAGE_STATEMENT,
+        (USER_ID_1, stored_at, CONVERSATION_ID_2, 2),
+    )
@@ -0,0 +1,257 @@
+"""Unit tests for ReadThroughCache class."""
+
+import asyncio
+from collections.abc import AsyncIterator
+from pathlib import Path
+
+import pytest
+from pytest_mock import MockerFixture
+
+from cache.async_sqlite_cache import AsyncSQLiteCache
+from cache.cache_entry import CacheEntry
+from cache.cache_error import CacheError
+from cache.read_through_cache import ReadThroughCache, invalidate_read_through_caches
+from models.compaction import ConversationSummary
+from models.config import ReadThroughCacheConfiguration, SQLiteDatabaseConfiguration
+from utils import suid
+
+USER_ID = suid.get_suid()
+CONVERSATION_ID_1 = suid.get_suid()
+CONVERSATION_ID_2 = suid.get_suid()
+cache_entry_1 = CacheEntry(
+    query="user message1",
+    response="AI message1",
+    provider="foo",
+    model="bar",
+    started_at="2025-10-03T09:31:25Z",
+    completed_at="2025-10-03T09:31:29Z",
+)
+cache_entry_2 = CacheEntry(
+    query="user message2",
+    response="AI message2",
+    provider="foo",
+    model="bar",
+    started_at="2025-10-03T09:31:35Z",
+    completed_at="2025-10-03T09:31:39Z",
+)
+summary = ConversationSummary(
+    summary_text="summary",
+    summarized_through_turn=1,
+    token_count=3,
+    created_at="2026-01-01T00:00:00Z",
+    model_used="bar",
+)
+
+
+@pytest.fixture(name="backend")
+async def backend_fixture(tmp_path: Path) -> AsyncIterator[AsyncSQLiteCache]:
+    """Return asynchronous SQLite cache wrapped by the read-through cache."""
+    backend = AsyncSQLiteCache(
+        SQLiteDatabaseConfiguration(db_path=str(tmp_path / "cache.db"))
+    )
+    yield backend
+    await backend.close()
+
+
+def _read_through(
+    backend: AsyncSQLiteCache, max_entries: int = 10, ttl: int = 60
+) -> ReadThroughCache:
+    """Return read-through wrapper of the given cache."""
+    return ReadThroughCache(
+        backend, ReadThroughCacheConfiguration(max_entries=max_entries, ttl=ttl)
+    )
+
+
+async def test_repeated_reads_hit_cache(
+    backend: AsyncSQLiteCache, mocker: MockerFixture
+) -> None:
+    """Test that repeated reads do not reach the wrapped cache."""
+    cache = _read_through(backend)
+    await cache.insert_or_append(USER_ID, CONVERSATION_ID_1, cache_entry_1)
+    await cache.store_summary(USER_ID, CONVERSATION_ID_1, summary)
+    get = mocker.spy(backend, "get")
+    get_summaries = mocker.spy(backend, "get_summaries")
+    record = mocker.patch("cache.read_through_cache.record_conversation_cache_lookup")
+
+    for _ in range(3):
+        assert await cache.get(USER_ID, CONVERSATION_ID_1) == [cache_entry_1]
+        assert await cache.get_summaries(USER_ID, CONVERSATION_ID_1) == [summary]
+
+    assert get.call_count == 1
+    assert get_summaries.call_count == 1
+    record.assert_any_call("history", False)
+    record.assert_any_call("history", True)
+    record.assert_any_call("summaries", False)
+    record.assert_any_call("summaries", True)
+
+
+async def test_returned_list_can_be_modified(backend: AsyncSQLiteCache) -> None:
+    """Test that callers modifying the returned list do not change the cache."""
+    cache = _read_through(backend)
+    await cache.insert_or_append(USER_ID, CONVERSATION_ID_1, cache_entry_1)
+
+    entries = await cache.get(USER_ID, CONVERSATION_ID_1)
+    entries.append(cache_entry_2)
+
+    assert await cache.get(USER_ID, CONVERSATION_ID_1) == [cache_entry_1]
+
+
+async def test_changes_invalidate_cache(backend: AsyncSQLiteCache) -> None:
+    """Test that cached data are invalidated by changes of the conversation."""
+    cache = _read_through(backend)
+    await cache.insert_or_append(USER_ID, CONVERSATION_ID_1, cache_entry_1)
+    await cache.store_summary(USER_ID, CONVERSATION_ID_1, summary)
+    assert await cache.get(USER_ID, CONVERSATION_ID_1) == [cache_entry_1]
+    assert await cache.get_summaries(USER_ID, CONVERSATION_ID_1) == [summary]
+
+    await cache.insert_or_append(USER_ID, CONVERSATION_ID_1, cache_entry_2)
+    assert await cache.get(USER_ID, CONVERSATION_ID_1) == [
+        cache_entry_1,
+        cache_entry_2,
+    ]
+
+    folded = summary.model_copy(update={"summary_text": "folded"})
+    await cache.replace_summaries(USER_ID, CONVERSATION_ID_1, folded)
+    assert await cache.get_summaries(USER_ID, CONVERSATION_ID_1) == [folded]
+
+    assert await cache.delete(USER_ID, CONVERSATION_ID_1) is True
+    assert not await cache.get(USER_ID, CONVERSATION_ID_1)
+    assert not await cache.get_summaries(USER_ID, CONVERSATION_ID_1)
+
+
+async def test_least_recently_used_are_evicted(
+    backend: AsyncSQLiteCache, mocker: MockerFixture
+) -> None:
+    """Test that the cache is bounded by the maximum number of entries."""
+    cache = _read_through(backend, max_entries=1)
+    await cache.insert_or_append(USER_ID, CONVERSATION_ID_1, cache_entry_1)
+    await cache.insert_or_append(USER_ID, CONVERSATION_ID_2, cache_entry_2)
+    get = mocker.spy(backend, "get")
+
+    await cache.get(USER_ID, CONVERSATION_ID_1)
+    await cache.get(USER_ID, CONVERSATION_ID_2)
+    assert len(cache) == 1
+    await cache.get(USER_ID, CONVERSATION_ID_1)
+
+    assert get.call_count == 3
+
+
+async def test_entries_expire(backend: AsyncSQLiteCache, mocker: MockerFixture) -> None:
+    """Test that cached data are read again after they expire."""
+    cache = _read_through(backend, ttl=10)
+    await cache.insert_or_append(USER_ID, CONVERSATION_ID_1, cache_entry_1)
+    monotonic = mocker.patch("cache.read_through_cache.monotonic", return_value=100)
+    get = mocker.spy(backend, "get")
+
+    await cache.get(USER_ID, CONVERSATION_ID_1)
+    monotonic.return_value = 109
+    await cache.get(USER_ID, CONVERSATION_ID_1)
+    assert get.call_count == 1
+
+    monotonic.return_value = 111
+    await cache.get(USER_ID, CONVERSATION_ID_1)
+    assert get.call_count == 2
+
+
+async def test_invalidated_entries_are_read_again(
+    backend: AsyncSQLiteCache, mocker: MockerFixture
+) -> None:
+    """Test that data cached by all read-through caches are dropped."""
+    caches = [_read_through(backend), _read_through(backend)]
+    await backend.insert_or_append(USER_ID, CONVERSATION_ID_1, cache_entry_1)
+    for cache in caches:
+        await cache.get(USER_ID, CONVERSATION_ID_1)
+    get = mocker.spy(backend, "get")
+
+    invalidate_read_through_caches()
+    for cache in caches:
+        await cache.get(USER_ID, CONVERSATION_ID_1)
+        await cache.get(USER_ID, CONVERSATION_ID_1)
+
+    assert get.call_count == 2
+
+
+async def test_read_racing_with_invalidation_is_not_cached(
+    backend: AsyncSQLiteCache, mocker: MockerFixture
+) -> None:
+    """Test that history read before the invalidation is not cached."""
+    cache = _read_through(backend)
+    await cache.insert_or_append(USER_ID, CONVERSATION_ID_1, cache_entry_1)
+    original_get = backend.get
+
+    async def invalidated_get(*args: object) -> list[CacheEntry]:
+        entries = await original_get(*args)  # type: ignore[arg-type]
+        cache.invalidate_all()
+        return entries
+
+    get = mocker.patch.object(backend, "get", side_effect=invalidated_get)
+    await cache.get(USER_ID, CONVERSATION_ID_1)
+    await cache.get(USER_ID, CONVERSATION_ID_1)
+
+    assert get.call_count == 2
+
+
+async def test_read_racing_with_change_is_not_cached(
+    backend: AsyncSQLiteCache, mocker: MockerFixture
+) -> None:
+    """Test that history read before a concurrent change is not cached."""
+    cache = _read_through(backend)
+    await cache.insert_or_append(USER_ID, CONVERSATION_ID_1, cache_entry_1)
+    read_started = asyncio.Event()
+    change_done = asyncio.Event()
+    original_get = backend.get
+
+    async def slow_get(*args: object) -> list[CacheEntry]:
+        entries = await original_get(*args)  # type: ignore[arg-type]
+        read_started.set()
+        await change_done.wait()
+        return entries
+
+    mocker.patch.object(backend, "get", side_effect=slow_get)
+    read = asyncio.create_task(cache.get(USER_ID, CONVERSATION_ID_1))
+    await read_started.wait()
+    await cache.insert_or_append(USER_ID, CONVERSATION_ID_1, cache_entry_2)
+    change_done.set()
+
+    assert await read == [cache_entry_1]
+    assert len(cache) == 0
+
+
+async def test_failed_read_is_not_cached(
+    backend: AsyncSQLiteCache, mocker: MockerFixture
+) -> None:
+    """Test that errors are propagated and nothing is cached."""
+    cache = _read_through(backend)
+    mocker.patch.object(backend, "get", side_effect=CacheError("AsyncSQLiteCache.get"))
+
+    with pytest.raises(CacheError):
+        await cache.get(USER_ID, CONVERSATION_ID_1)
+
+    assert len(cache) == 0
+
+
+async def test_other_operations_are_delegated(backend: AsyncSQLiteCache) -> None:
+    """Test listing, pagination and topic summary operations."""
+    cache = _read_through(backend)
+    await cache.initialize_cache()
+    await cache.insert_or_append_many(
+        [
+            (USER_ID, CONVERSATION_ID_1, cache_entry_1),
+            (USER_ID, CONVERSATION_ID_1, cache_entry_2),
+        ],
+        False,
+    )
+    await cache.set_topic_summary(USER_ID, CONVERSATION_ID_1, "topic")
+
+    assert cache.ready() is True
+    assert [c.topic_summary for c in await cache.list(USER_ID)] == ["topic"]
+    page = await cache.list_page(USER_ID, None, 10)
+    assert [c.topic_summary for c in page.conversations] == ["topic"]
+    history = await cache.get_page(USER_ID, CONVERSATION_ID_1, None, 1)
+    assert history.entries == [cache_entry_1]
+    meta = await cache.get_conversation_meta(USER_ID, CONVERSATION_ID_1)
+    assert meta is not None
+    assert meta.topic_summary == "topic"
+    assert await cache.exists(USER_ID, CONVERSATION_ID_2, False) is False
+    await cache.close()
+    assert len(cache) == 0
@@ -1,11 +1,15 @@
+# pylint: disable=too-many-lines
+
 """Unit tests for SQLite cache implementation."""
 
 import sqlite3
 from pathlib import Path
+from threading import Thread
 from typing import Any
 
 import pytest
 from pydantic import AnyUrl
+from pytest_mock import MockerFixture
 
 from cache.cache_entry import CacheEntry
 from cache.cache_error import CacheError
@@ -17,7 +21,11 @@ from models.common.turn_summary import (
     ToolResultSummary,
 )
 from models.compaction import ConversationSummary
-from models.config import SQLiteDatabaseConfiguration
+from models.config import (
+    ConversationRetentionConfiguration,
+    SQLiteConcurrencyConfiguration,
+    SQLiteDatabaseConfiguration,
+)
 from utils import suid
 
 USER_ID_1 = suid.get_suid()
@@ -149,14 +157,13 @@ def test_connected_when_disconnected(tmpdir: Path) -> None:
     assert cache.connected() is False
 
 
-def test_connected_when_connection_error(tmpdir: Path) -> None:
-    """Test the connected() method."""
-    # simulate connection error
+def test_connected_does_not_probe_connection(tmpdir: Path) -> None:
+    """Test that the connected() method does not send any query."""
     cache = create_cache(tmpdir)
     # connection can have any type
     cache.connection = ConnectionMock()  # pyright: ignore[reportAttributeAccessIssue]
     assert cache.connection is not None
-    assert cache.connected() is False
+    assert cache.connected() is True
 
 
 def test_initialize_cache_when_connected(tmpdir: Path) -> None:
@@ -819,3 +826,343 @@ def test_migration_adds_summaries_table_to_existing_db(tmpdir: Path) -> None:
     cache = SQLiteCache(SQLiteDatabaseConfiguration(db_path=db_path))
     cache.store_summary(USER_ID_1, CONVERSATION_ID_1, summary_1, False)
     assert cache.get_summaries(USER_ID_1, CONVERSATION_ID_1, False) == [summary_1]
+
+
+def test_get_reads_legacy_json_rows(tmpdir: Path) -> None:
+    """Test that rows with JSON text written by older versions are readable."""
+    cache = create_cache(tmpdir)
+    assert cache.connection is not None
+    cache.connection.execute(
+        SQLiteCache.INSERT_CONVERSATION_HISTORY_STATEMENT,
+        (
+            USER_ID_1,
+            CONVERSATION_ID_1,
+            1,
+            "start",
+            "end",
+            "user query",
+            "AI response",
+            "provider",
+            "model",
+            None,
+            '[{"id": "call_1", "name": "test_tool", "args": {}, "type": "tool_call"}]',
+            None,
+        ),
+    )
+    cache.connection.commit()
+
+    entries = cache.get(USER_ID_1, CONVERSATION_ID_1)
+
+    assert entries[0].referenced_documents is None
+    assert entries[0].tool_calls == [
+        ToolCallSummary(id="call_1", name="test_tool", args={}, type="tool_call")
+    ]
+
+
+def test_list_fields_are_stored_in_compact_format(tmpdir: Path) -> None:
+    """Test that list fields are stored as tagged binary values."""
+    cache = create_cache(tmpdir)
+    entry = cache_entry_1.model_copy(
+        update={
+            "tool_results": [
+                ToolResultSummary(
+                    id="call_1",
+                    status="success",
+                    content="output " * 1000,
+                    type="tool_result",
+                    round=1,
+                )
+            ]
+        }
+    )
+    cache.insert_or_append(USER_ID_1, CONVERSATION_ID_1, entry)
+    assert cache.connection is not None
+
+    stored = cache.connection.execute("SELECT tool_results FROM cache").fetchone()[0]
+
+    assert isinstance(stored, bytes)
+    # large values are compressed
+    assert stored[0] == 0x02
+    assert len(stored) < 1000
+    assert cache.get(USER_ID_1, CONVERSATION_ID_1) == [entry]
+
+
+def test_get_page(tmpdir: Path) -> None:
+    """Test that conversation history is returned page by page."""
+    cache = create_cache(tmpdir)
+    entries = [
+        cache_entry_1.model_copy(update={"query": f"message{i}"}) for i in range(5)
+    ]
+    for entry in entries:
+        cache.insert_or_append(USER_ID_1, CONVERSATION_ID_1, entry)
+
+    first = cache.get_page(USER_ID_1, CONVERSATION_ID_1, None, 2)
+    assert first.entries == entries[:2]
+    assert first.next_cursor is not None
+
+    second = cache.get_page(USER_ID_1, CONVERSATION_ID_1, first.next_cursor, 2)
+    assert second.entries == entries[2:4]
+
+    last = cache.get_page(USER_ID_1, CONVERSATION_ID_1, second.next_cursor, 2)
+    assert last.entries == entries[4:]
+    assert last.next_cursor is None
+
+    assert not cache.get_page(USER_ID_2, CONVERSATION_ID_1, None, 2).entries
+
+
+def test_list_page(tmpdir: Path) -> None:
+    """Test that conversations are listed page by page, most recent first."""
+    cache = create_cache(tmpdir)
+    cache.insert_or_append(USER_ID_1, CONVERSATION_ID_1, cache_entry_1)
+    cache.insert_or_append(USER_ID_1, CONVERSATION_ID_2, cache_entry_2)
+
+    first = cache.list_page(USER_ID_1, None, 1)
+    assert [c.conversation_id for c in first.conversations] == [CONVERSATION_ID_2]
+    assert first.next_cursor is not None
+
+    last = cache.list_page(USER_ID_1, first.next_cursor, 1)
+    assert [c.conversation_id for c in last.conversations] == [CONVERSATION_ID_1]
+    assert last.next_cursor is None
+
+    assert cache.list_page(USER_ID_1, None, 10).conversations == cache.list(USER_ID_1)
+
+
+def test_list_page_tied_timestamps(tmpdir: Path, mocker: MockerFixture) -> None:
+    """Test that conversations sharing the last message time are all listed."""
+    cache = create_cache(tmpdir)
+    mocker.patch("cache.sqlite_cache.time", return_value=1704067200.123456)
+    conversation_ids = [suid.get_suid() for _ in range(3)]
+    for conversation_id in conversation_ids:
+        cache.insert_or_append(USER_ID_1, conversation_id, cache_entry_1)
+
+    listed: list[str] = []
+    cursor = None
+    for _ in conversation_ids:
+        page = cache.list_page(USER_ID_1, cursor, 1)
+        listed.extend(c.conversation_id for c in page.conversations)
+        cursor = page.next_cursor
+    assert cursor is None
+
+    # ties are ordered by conversation ID, none is skipped or repeated
+    assert listed == sorted(conversation_ids, reverse=True)
+
+
+def test_apply_retention_max_age(tmpdir: Path, mocker: MockerFixture) -> None:
+    """Test that old turns and inactive conversations are deleted."""
+    cache = create_cache(tmpdir)
+    time_mock = mocker.patch("cache.sqlite_cache.time")
+    time_mock.return_value = 1000.0
+    cache.insert_or_append(USER_ID_1, CONVERSATION_ID_1, cache_entry_1)
+    summary = ConversationSummary(
+        summary_text="summary",
+        summarized_through_turn=1,
+        token_count=3,
+        created_at="2026-01-01T00:00:00Z",
+        model_used="bar",
+    )
+    cache.store_summary(USER_ID_1, CONVERSATION_ID_1, summary)
+    cache.insert_or_append(USER_ID_1, CONVERSATION_ID_2, cache_entry_1)
+    time_mock.return_value = 2000.0
+    cache.insert_or_append(USER_ID_1, CONVERSATION_ID_2, cache_entry_2)
+
+    time_mock.return_value = 2500.0
+    deleted = cache.apply_retention(
+        ConversationRetentionConfiguration(max_age=1000, batch_size=1)
+    )
+
+    assert deleted == {"cache": 2, "conversations": 1, "conversation_summaries": 1}
+    assert not cache.get(USER_ID_1, CONVERSATION_ID_1)
+    assert not cache.get_summaries(USER_ID_1, CONVERSATION_ID_1)
+    assert cache.get(USER_ID_1, CONVERSATION_ID_2) == [cache_entry_2]
+    assert cache.table_sizes() == {
+        "cache": 1,
+        "conversations": 1,
+        "conversation_summaries": 0,
+    }
+
+
+def test_apply_retention_max_turns(tmpdir: Path) -> None:
+    """Test that only the most recent turns of each conversation are kept."""
+    cache = create_cache(tmpdir)
+    entries = [
+        cache_entry_1.model_copy(update={"query": f"message{i}"}) for i in range(5)
+    ]
+    for entry in entries:
+        cache.insert_or_append(USER_ID_1, CONVERSATION_ID_1, entry)
+    cache.insert_or_append(USER_ID_1, CONVERSATION_ID_2, cache_entry_1)
+
+    deleted = cache.apply_retention(
+        ConversationRetentionConfiguration(max_turns_per_conversation=2, batch_size=2)
+    )
+
+    assert deleted["cache"] == 3
+    assert cache.get(USER_ID_1, CONVERSATION_ID_1) == entries[3:]
+    assert cache.get(USER_ID_1, CONVERSATION_ID_2) == [cache_entry_1]
+
+
+def test_apply_retention_max_conversations(tmpdir: Path) -> None:
+    """Test that only the most recently active conversations are kept."""
+    cache = create_cache(tmpdir)
+    cache.insert_or_append(USER_ID_1, CONVERSATION_ID_1, cache_entry_1)
+    cache.insert_or_append(USER_ID_1, CONVERSATION_ID_2, cache_entry_1)
+    cache.insert_or_append(USER_ID_2, CONVERSATION_ID_1, cache_entry_1)
+
+    deleted = cache.apply_retention(
+        ConversationRetentionConfiguration(max_conversations_per_user=1)
+    )
+
+    assert deleted == {"cache": 1, "conversations": 1, "conversation_summaries": 0}
+    assert [c.conversation_id for c in cache.list(USER_ID_1)] == [CONVERSATION_ID_2]
+    assert cache.get(USER_ID_2, CONVERSATION_ID_1) == [cache_entry_1]
+
+
+def test_apply_retention_incremental_vacuum(tmpdir: Path) -> None:
+    """Test that free pages are returned to the file system."""
+    cache = create_cache(tmpdir)
+    assert cache.connection is not None
+    large_entry = cache_entry_1.model_copy(update={"response": "x" * 100_000})
+    cache.insert_or_append(USER_ID_1, CONVERSATION_ID_1, large_entry)
+    cache.insert_or_append(USER_ID_1, CONVERSATION_ID_1, cache_entry_2)
+    pages = cache.connection.execute("PRAGMA page_count").fetchone()[0]
+
+    cache.apply_retention(
+        ConversationRetentionConfiguration(max_turns_per_conversation=1)
+    )
+
+    assert cache.connection.execute("PRAGMA auto_vacuum").fetchone()[0] == 2
+    assert cache.connection.execute("PRAGMA page_count").fetchone()[0] < pages
+    assert cache.connection.execute("PRAGMA freelist_count").fetchone()[0] == 0
+
+
+def create_concurrent_cache(path: Path) -> SQLiteCache:
+    """Create the cache instance in high-concurrency mode.
+
+    Parameters:
+    ----------
+        path (Path): Directory in which the `test.sqlite` database file will be created.
+
+    Returns:
+    -------
+        SQLiteCache: Cache instance with two read-only connections.
+    """
+    cc = SQLiteDatabaseConfiguration(
+        db_path=str(path / "test.sqlite"),
+        concurrency=SQLiteConcurrencyConfiguration(readers=2, cache_size=1024),
+    )
+    return SQLiteCache(cc)
+
+
+def test_high_concurrency_mode_pragmas(tmpdir: Path) -> None:
+    """Test that high-concurrency mode configures writer and readers."""
+    cache = create_concurrent_cache(tmpdir)
+    assert cache.connection is not None
+    assert cache.readers is not None
+    assert cache.readers.qsize() == 2
+
+    writer = cache.connection
+    assert writer.execute("PRAGMA journal_mode").fetchone()[0] == "wal"
+    # synchronous = NORMAL
+    assert writer.execute("PRAGMA synchronous").fetchone()[0] == 1
+    assert writer.execute("PRAGMA cache_size").fetchone()[0] == -1024
+    # incremental auto-vacuum is kept for new databases
+    assert writer.execute("PRAGMA auto_vacuum").fetchone()[0] == 2
+
+    with cache.reader() as reader:
+        assert reader is not writer
+        assert reader.execute("PRAGMA query_only").fetchone()[0] == 1
+        with pytest.raises(sqlite3.OperationalError, match="readonly"):
+            reader.execute("DELETE FROM cache")
+    assert cache.readers.qsize() == 2
+
+
+def test_reader_in_default_mode(tmpdir: Path) -> None:
+    """Test that reads use the only connection in default mode."""
+    cache = create_cache(tmpdir)
+    assert cache.readers is None
+    with cache.reader() as reader:
+        assert reader is cache.connection
+
+
+def test_high_concurrency_mode_operations(tmpdir: Path) -> None:
+    """Test that readers see changes made by the writer."""
+    cache = create_concurrent_cache(tmpdir)
+    cache.insert_or_append(USER_ID_1, CONVERSATION_ID_1, cache_entry_1)
+    cache.set_topic_summary(USER_ID_1, CONVERSATION_ID_1, "topic")
+
+    assert cache.get(USER_ID_1, CONVERSATION_ID_1) == [cache_entry_1]
+    conversations = cache.list(USER_ID_1)
+    assert [c.topic_summary for c in conversations] == ["topic"]
+    assert cache.table_sizes()["cache"] == 1
+
+    assert cache.delete(USER_ID_1, CONVERSATION_ID_1) is True
+    assert not cache.get(USER_ID_1, CONVERSATION_ID_1)
+
+
+def test_high_concurrency_mode_shared_by_threads(tmpdir: Path) -> None:
+    """Test that one cache can be used by several threads at once."""
+    cache = create_concurrent_cache(tmpdir)
+    errors: list[BaseException] = []
+
+    def use_cache(conversation_id: str) -> None:
+        try:
+            for _ in range(20):
+                cache.insert_or_append(USER_ID_1, conversation_id, cache_entry_1)
+                cache.get(USER_ID_1, conversation_id)
+        except BaseException as e:  # pylint: disable=broad-exception-caught
+            errors.append(e)
+
+    threads = [Thread(target=use_cache, args=(suid.get_suid(),)) for _ in range(4)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    assert not errors
+    assert cache.table_sizes() == {
+        "cache": 80,
+        "conversations": 4,
+        "conversation_summaries": 0,
+    }
+
+
+def test_high_concurrency_mode_reconnect_closes_readers(tmpdir: Path) -> None:
+    """Test that reconnecting replaces the pool of read-only connections."""
+    cache = create_concurrent_cache(tmpdir)
+    assert cache.readers is not None
+    with cache.reader() as old_reader:
+        pass
+
+    cache.connect()
+
+    with pytest.raises(sqlite3.ProgrammingError):
+        old_reader.execute("SELECT 1")
+    assert cache.readers is not None
+    assert cache.readers.qsize() == 2
+
+
+def test_get_conversation_meta(tmpdir: Path) -> None:
+    """Test that one conversation is looked up without listing all of them."""
+    cache = create_cache(tmpdir)
+    assert cache.get_conversation_meta(USER_ID_1, CONVERSATION_ID_1) is None
+    assert cache.exists(USER_ID_1, CONVERSATION_ID_1, False) is False
+
+    cache.insert_or_append(USER_ID_1, CONVERSATION_ID_1, cache_entry_1)
+    cache.set_topic_summary(USER_ID_1, CONVERSATION_ID_1, "topic")
+
+    meta = cache.get_conversation_meta(USER_ID_1, CONVERSATION_ID_1)
+    assert meta == cache.list(USER_ID_1)[0]
+    assert meta is not None
+    assert meta.topic_summary == "topic"
+    assert cache.exists(USER_ID_1, CONVERSATION_ID_1, False) is True
+    assert cache.exists(USER_ID_2, CONVERSATION_ID_1, False) is False
+
+
+def test_get_conversation_meta_when_disconnected(tmpdir: Path) -> None:
+    """Test that get_conversation_meta raises CacheError when disconnected."""
+    cache = create_cache(tmpdir)
+    cache.connection = None
+    # no operation for @connection decorator
+    cache.connect = lambda: None
+
+    with pytest.raises(CacheError, match="cache is disconnected"):
+        cache.get_conversation_meta(USER_ID_1, CONVERSATION_ID_1)
@@ -0,0 +1,76 @@
+"""Unit tests for SyncCacheAdapter class."""
+
+import pytest
+
+from cache.cache_entry import CacheEntry
+from cache.in_memory_cache import InMemoryCache
+from cache.noop_cache import NoopCache
+from cache.sync_cache_adapter import SyncCacheAdapter
+from models.compaction import ConversationSummary
+from models.config import InMemoryCacheConfig
+from utils import suid
+
+USER_ID = suid.get_suid()
+CONVERSATION_ID = suid.get_suid()
+cache_entry = CacheEntry(
+    query="user message",
+    response="AI message",
+    provider="foo",
+    model="bar",
+    started_at="2025-10-03T09:31:25Z",
+    completed_at="2025-10-03T09:31:29Z",
+)
+summary = ConversationSummary(
+    summary_text="summary",
+    summarized_through_turn=1,
+    token_count=3,
+    created_at="2026-01-01T00:00:00Z",
+    model_used="bar",
+)
+
+
+@pytest.fixture(name="adapter")
+async def adapter_fixture() -> SyncCacheAdapter:
+    """Return initialized adapter wrapping an in-memory cache."""
+    adapter = SyncCacheAdapter(InMemoryCache(InMemoryCacheConfig(max_entries=10)))
+    await adapter.initialize_cache()
+    return adapter
+
+
+async def test_conversation_operations(adapter: SyncCacheAdapter) -> None:
+    """Test that conversation operations are delegated to the wrapped cache."""
+    await adapter.insert_or_append(USER_ID, CONVERSATION_ID, cache_entry)
+    await adapter.set_topic_summary(USER_ID, CONVERSATION_ID, "topic")
+
+    assert await adapter.get(USER_ID, CONVERSATION_ID) == [cache_entry]
+    conversations = await adapter.list(USER_ID)
+    assert [c.topic_summary for c in conversations] == ["topic"]
+    page = await adapter.get_page(USER_ID, CONVERSATION_ID, None, 10)
+    assert page.entries == [cache_entry]
+    conversations_page = await adapter.list_page(USER_ID, None, 10)
+    assert conversations_page.conversations == conversations
+    assert await adapter.get_conversation_meta(USER_ID, CONVERSATION_ID) == (
+        conversations[0]
+    )
+    assert await adapter.exists(USER_ID, CONVERSATION_ID, False) is True
+
+    assert await adapter.delete(USER_ID, CONVERSATION_ID) is True
+    assert not await adapter.get(USER_ID, CONVERSATION_ID)
+
+
+async def test_summary_operations(adapter: SyncCacheAdapter) -> None:
+    """Test that summary operations are delegated to the wrapped cache."""
+    await adapter.store_summary(USER_ID, CONVERSATION_ID, summary)
+    assert await adapter.get_summaries(USER_ID, CONVERSATION_ID) == [summary]
+
+    folded = summary.model_copy(update={"summary_text": "folded"})
+    await adapter.replace_summaries(USER_ID, CONVERSATION_ID, folded)
+    assert await adapter.get_summaries(USER_ID, CONVERSATION_ID) == [folded]
+
+
+async def test_ready_and_close() -> None:
+    """Test ready delegation and that close is a no-op."""
+    adapter = SyncCacheAdapter(NoopCache())
+    assert adapter.ready() is True
+    await adapter.close()
+    assert not await adapter.list(USER_ID)
@@ -0,0 +1,289 @@
+"""Unit tests for WriteBehindCache class."""
+
+import asyncio
+from collections.abc import AsyncIterator
+from pathlib import Path
+
+import pytest
+from pytest_mock import MockerFixture
+
+from cache.async_sqlite_cache import AsyncSQLiteCache
+from cache.cache_entry import CacheEntry
+from cache.cache_error import CacheError
+from cache.write_behind_cache import WriteBehindCache
+from models.compaction import ConversationSummary
+from models.config import SQLiteDatabaseConfiguration, WriteBehindConfiguration
+from utils import suid
+
+USER_ID = suid.get_suid()
+CONVERSATION_ID_1 = suid.get_suid()
+CONVERSATION_ID_2 = suid.get_suid()
+cache_entry_1 = CacheEntry(
+    query="user message1",
+    response="AI message1",
+    provider="foo",
+    model="bar",
+    started_at="2025-10-03T09:31:25Z",
+    completed_at="2025-10-03T09:31:29Z",
+)
+cache_entry_2 = CacheEntry(
+    query="user message2",
+    response="AI message2",
+    provider="foo",
+    model="bar",
+    started_at="2025-10-03T09:31:35Z",
+    completed_at="2025-10-03T09:31:39Z",
+)
+
+# long enough for the background task not to interfere with tests
+NO_PERIODIC_FLUSH = 60_000
+
+
+@pytest.fixture(name="backend")
+async def backend_fixture(tmp_path: Path) -> AsyncIterator[AsyncSQLiteCache]:
+    """Return asynchronous SQLite cache used to store the queued turns."""
+    backend = AsyncSQLiteCache(
+        SQLiteDatabaseConfiguration(db_path=str(tmp_path / "cache.db"))
+    )
+    yield backend
+    await backend.close()
+
+
+def _write_behind(
+    backend: AsyncSQLiteCache,
+    flush_interval: int = NO_PERIODIC_FLUSH,
+    batch_size: int = 100,
+    max_pending: int = 100,
+    append_timeout: int = 30_000,
+) -> WriteBehindCache:
+    """Return write-behind wrapper of the given cache."""
+    return WriteBehindCache(
+        backend,
+        WriteBehindConfiguration(
+            flush_interval=flush_interval,
+            batch_size=batch_size,
+            max_pending=max_pending,
+            append_timeout=append_timeout,
+        ),
+    )
+
+
+async def _wait_until_stored(cache: WriteBehindCache) -> None:
+    """Wait for the background task to store all queued turns."""
+    async with asyncio.timeout(5):
+        while cache.pending:
+            await asyncio.sleep(0.001)
+
+
+async def test_read_your_writes(backend: AsyncSQLiteCache) -> None:
+    """Test that queued turns are visible before they are stored."""
+    cache = _write_behind(backend)
+    await backend.insert_or_append(USER_ID, CONVERSATION_ID_1, cache_entry_1)
+
+    await cache.insert_or_append(USER_ID, CONVERSATION_ID_1, cache_entry_2)
+    await cache.insert_or_append(USER_ID, CONVERSATION_ID_2, cache_entry_1)
+
+    assert cache.pending == 2
+    assert await backend.get(USER_ID, CONVERSATION_ID_1) == [cache_entry_1]
+    assert await cache.get(USER_ID, CONVERSATION_ID_1) == [
+        cache_entry_1,
+        cache_entry_2,
+    ]
+    assert await cache.get(USER_ID, CONVERSATION_ID_2) == [cache_entry_1]
+    conversations = await cache.list(USER_ID)
+    assert [c.conversation_id for c in conversations] == [
+        CONVERSATION_ID_2,
+        CONVERSATION_ID_1,
+    ]
+    assert await backend.get_conversation_meta(USER_ID, CONVERSATION_ID_2) is None
+    assert await cache.get_conversation_meta(USER_ID, CONVERSATION_ID_2) == (
+        conversations[0]
+    )
+    assert await cache.get_conversation_meta(USER_ID, CONVERSATION_ID_1) == (
+        conversations[1]
+    )
+    assert await cache.exists(USER_ID, CONVERSATION_ID_2, False) is True
+    await cache.close()
+
+
+async def test_paginated_reads_flush_queued_turns(
+    backend: AsyncSQLiteCache,
+) -> None:
+    """Test that queued turns are stored before a page is read."""
+    cache = _write_behind(backend)
+    await cache.insert_or_append(USER_ID, CONVERSATION_ID_1, cache_entry_1)
+    await cache.insert_or_append(USER_ID, CONVERSATION_ID_1, cache_entry_2)
+
+    page = await cache.get_page(USER_ID, CONVERSATION_ID_1, None, 1)
+    assert cache.pending == 0
+    assert page.entries == [cache_entry_1]
+    page = await cache.get_page(USER_ID, CONVERSATION_ID_1, page.next_cursor, 1)
+    assert page.entries == [cache_entry_2]
+
+    await cache.insert_or_append(USER_ID, CONVERSATION_ID_2, cache_entry_1)
+    conversations = await cache.list_page(USER_ID, None, 10)
+    assert cache.pending == 0
+    assert [c.conversation_id for c in conversations.conversations] == [
+        CONVERSATION_ID_2,
+        CONVERSATION_ID_1,
+    ]
+    await cache.close()
+
+
+async def test_flush_stores_batches(
+    backend: AsyncSQLiteCache, mocker: MockerFixture
+) -> None:
+    """Test that queued turns are stored in batches, oldest first."""
+    cache = _write_behind(backend, batch_size=2)
+    spy = mocker.spy(backend, "insert_or_append_many")
+    # keep the background task from flushing complete batches
+    mocker.patch.object(cache, "_start_flusher")
+    await cache.insert_or_append(USER_ID, CONVERSATION_ID_1, cache_entry_1)
+    await cache.insert_or_append(USER_ID, CONVERSATION_ID_2, cache_entry_1)
+    await cache.insert_or_append(USER_ID, CONVERSATION_ID_1, cache_entry_2)
+
+    await cache.flush()
+
+    assert spy.call_count == 2
+    assert cache.pending == 0
+    assert await backend.get(USER_ID, CONVERSATION_ID_1) == [
+        cache_entry_1,
+        cache_entry_2,
+    ]
+    assert await backend.get(USER_ID, CONVERSATION_ID_2) == [cache_entry_1]
+
+
+async def test_background_flush_on_batch_size(backend: AsyncSQLiteCache) -> None:
+    """Test that a complete batch is stored without waiting for the interval."""
+    cache = _write_behind(backend, batch_size=2)
+    await cache.insert_or_append(USER_ID, CONVERSATION_ID_1, cache_entry_1)
+    await cache.insert_or_append(USER_ID, CONVERSATION_ID_1, cache_entry_2)
+
+    await _wait_until_stored(cache)
+
+    assert await backend.get(USER_ID, CONVERSATION_ID_1) == [
+        cache_entry_1,
+        cache_entry_2,
+    ]
+    await cache.close()
+
+
+async def test_background_flush_on_interval(backend: AsyncSQLiteCache) -> None:
+    """Test that queued turns are stored after the flush interval."""
+    cache = _write_behind(backend, flush_interval=10)
+    await cache.insert_or_append(USER_ID, CONVERSATION_ID_1, cache_entry_1)
+
+    await _wait_until_stored(cache)
+
+    assert await backend.get(USER_ID, CONVERSATION_ID_1) == [cache_entry_1]
+    await cache.close()
+
+
+async def test_backpressure(backend: AsyncSQLiteCache) -> None:
+    """Test that appending waits for a free slot when the queue is full."""
+    cache = _write_behind(backend, max_pending=1)
+    await cache.insert_or_append(USER_ID, CONVERSATION_ID_1, cache_entry_1)
+
+    # the full queue wakes the background task up, which frees the slot
+    async with asyncio.timeout(5):
+        await cache.insert_or_append(USER_ID, CONVERSATION_ID_1, cache_entry_2)
+
+    assert cache.pending == 1
+    assert await backend.get(USER_ID, CONVERSATION_ID_1) == [cache_entry_1]
+    await cache.close()
+    assert await backend.get(USER_ID, CONVERSATION_ID_1) == [
+        cache_entry_1,
+        cache_entry_2,
+    ]
+
+
+async def test_full_queue_append_times_out(
+    backend: AsyncSQLiteCache, mocker: MockerFixture
+) -> None:
+    """Test that appending to the queue the backend never drains fails."""
+    cache = _write_behind(backend, max_pending=1, append_timeout=50)
+    mocker.patch.object(
+        backend,
+        "insert_or_append_many",
+        side_effect=CacheError("AsyncSQLiteCache.insert_or_append_many"),
+    )
+    await cache.insert_or_append(USER_ID, CONVERSATION_ID_1, cache_entry_1)
+
+    async with asyncio.timeout(5):
+        with pytest.raises(CacheError, match="queue is full"):
+            await cache.insert_or_append(USER_ID, CONVERSATION_ID_1, cache_entry_2)
+
+    # the refused turn is not queued, the queued one is still readable
+    assert cache.pending == 1
+    assert await cache.get(USER_ID, CONVERSATION_ID_1) == [cache_entry_1]
+    await cache.close()
+
+
+async def test_delete_drops_queued_turns(backend: AsyncSQLiteCache) -> None:
+    """Test that deleting a conversation drops its queued turns."""
+    cache = _write_behind(backend)
+    await cache.insert_or_append(USER_ID, CONVERSATION_ID_1, cache_entry_1)
+    await cache.insert_or_append(USER_ID, CONVERSATION_ID_2, cache_entry_1)
+
+    assert await cache.delete(USER_ID, CONVERSATION_ID_1) is True
+    assert await cache.delete(USER_ID, CONVERSATION_ID_1) is False
+    assert cache.pending == 1
+
+    await cache.close()
+    assert not await backend.get(USER_ID, CONVERSATION_ID_1)
+    assert await backend.get(USER_ID, CONVERSATION_ID_2) == [cache_entry_1]
+
+
+async def test_failed_flush_keeps_queued_turns(
+    backend: AsyncSQLiteCache, mocker: MockerFixture
+) -> None:
+    """Test that turns stay queued and readable when they can not be stored."""
+    cache = _write_behind(backend)
+    await cache.insert_or_append(USER_ID, CONVERSATION_ID_1, cache_entry_1)
+    mocker.patch.object(
+        backend,
+        "insert_or_append_many",
+        side_effect=CacheError("AsyncSQLiteCache.insert_or_append_many"),
+    )
+
+    with pytest.raises(CacheError):
+        await cache.flush()
+
+    assert cache.pending == 1
+    assert await cache.get(USER_ID, CONVERSATION_ID_1) == [cache_entry_1]
+
+
+async def test_close_flushes_queued_turns(backend: AsyncSQLiteCache) -> None:
+    """Test that queued turns are stored when the cache is closed."""
+    cache = _write_behind(backend)
+    await cache.insert_or_append(USER_ID, CONVERSATION_ID_1, cache_entry_1)
+
+    await cache.close()
+
+    assert cache.pending == 0
+    assert await backend.get(USER_ID, CONVERSATION_ID_1) == [cache_entry_1]
+
+
+async def test_other_operations_are_delegated(backend: AsyncSQLiteCache) -> None:
+    """Test topic summary and compaction summary operations."""
+    cache = _write_behind(backend)
+    summary = ConversationSummary(
+        summary_text="summary",
+        summarized_through_turn=1,
+        token_count=3,
+        created_at="2026-01-01T00:00:00Z",
+        model_used="bar",
+    )
+    await cache.initialize_cache()
+    await cache.insert_or_append(USER_ID, CONVERSATION_ID_1, cache_entry_1)
+    await cache.set_topic_summary(USER_ID, CONVERSATION_ID_1, "topic")
+    await cache.store_summary(USER_ID, CONVERSATION_ID_1, summary)
+
+    assert cache.ready() is True
+    assert [c.topic_summary for c in await cache.list(USER_ID)] == ["topic"]
+    assert await cache.get_summaries(USER_ID, CONVERSATION_ID_1) == [summary]
+
+    folded = summary.model_copy(update={"summary_text": "folded"})
+    await cache.replace_summaries(USER_ID, CONVERSATION_ID_1, folded)
+    assert await cache.get_summaries(USER_ID, CONVERSATION_ID_1) == [folded]
+    await cache.close()
@@ -22,6 +22,8 @@ from configuration import AppConfig
 from constants import DEFAULT_LOGGER_NAME
 from models.common.responses.responses_api_params import ResponsesApiParams
 from models.config import ShieldConfiguration, SkillsConfiguration
+from utils.conversation_metadata_cache import conversation_metadata_cache
+from utils.postgres_pool import close_postgres_pools
 
 type AgentFixtures = Generator[
     tuple[
@@ -91,6 +93,28 @@ def reset_logging_state() -> Generator[None, None, None]:
     logger.level = original_level
 
 
+@pytest.fixture(autouse=True)
+def reset_postgres_pools() -> Generator[None, None, None]:
+    """Close shared PostgreSQL connection pools after each test.
+
+    Pools are shared per database for the whole process, so without this
+    fixture a pool holding mocked connections would leak into other tests.
+    """
+    yield
+    close_postgres_pools()
+
+
+@pytest.fixture(autouse=True)
+def reset_conversation_metadata_cache() -> Generator[None, None, None]:
+    """Drop cached conversation records after each test.
+
+    The cache is shared by the whole process, so without this fixture a
+    record read from a mocked session would leak into other tests.
+    """
+    yield
+    conversation_metadata_cache.clear()
+
+
 @pytest.fixture(name="prepare_agent_mocks", scope="function")
 def prepare_agent_mocks_fixture(
     mocker: MockerFixture,
@@ -194,6 +194,14 @@ def recording_logger_fixture(mocker: MockerFixture) -> MockType:
             duration=1.5,
             warning_message="Failed to update LLM inference duration metric",
         ),
+        HistogramRecorderCase(
+            metric_path="metrics.recording.metrics.postgres_pool_wait_seconds",
+            recorder=recording.record_postgres_pool_wait,
+            args=("localhost:5432/db/public", 0.25),
+            labels=("localhost:5432/db/public",),
+            duration=0.25,
+            warning_message="Failed to update PostgreSQL pool wait metric",
+        ),
     ],
 )
 def test_histogram_recorders_observe_metrics_and_log_errors(
@@ -234,3 +242,113 @@ def test_record_llm_inference_duration_bounds_result_label(
         "vertexai", "gemini", "/v1/responses", "failure"
     )
     mock_metric.labels.return_value.observe.assert_called_once_with(2.0)
+
+
+def test_record_postgres_pool_usage(
+    mocker: MockerFixture, recording_logger: MockType
+) -> None:
+    """Test that pool connection counts and utilization are recorded."""
+    mock_connections = mocker.patch(
+        "metrics.recording.metrics.postgres_pool_connections"
+    )
+    mock_utilization = mocker.patch(
+        "metrics.recording.metrics.postgres_pool_utilization"
+    )
+
+    recording.record_postgres_pool_usage("pool", 3, 1, 4)
+
+    mock_connections.labels.assert_any_call("pool", "in_use")
+    mock_connections.labels.assert_any_call("pool", "idle")
+    mock_utilization.labels.assert_called_once_with("pool")
+    mock_utilization.labels.return_value.set.assert_called_once_with(0.75)
+
+    mock_utilization.labels.return_value.set.side_effect = ValueError("bad")
+    recording.record_postgres_pool_usage("pool", 3, 1, 4)
+
+    recording_logger.warning.assert_called_once_with(
+        "Failed to update PostgreSQL pool usage metrics", exc_info=True
+    )
+
+
+def test_record_cache_retention(
+    mocker: MockerFixture, recording_logger: MockType
+) -> None:
+    """Test that deleted rows and table sizes are recorded."""
+    mock_deleted = mocker.patch(
+        "metrics.recording.metrics.cache_retention_deleted_rows_total"
+    )
+    mock_rows = mocker.patch("metrics.recording.metrics.cache_table_rows")
+
+    recording.record_cache_retention({"cache": 5}, {"cache": 10})
+
+    mock_deleted.labels.assert_called_once_with("cache")
+    mock_deleted.labels.return_value.inc.assert_called_once_with(5)
+    mock_rows.labels.assert_called_once_with("cache")
+    mock_rows.labels.return_value.set.assert_called_once_with(10)
+
+    mock_rows.labels.return_value.set.side_effect = ValueError("bad")
+    recording.record_cache_retention({}, {"cache": 10})
+
+    recording_logger.warning.assert_called_once_with(
+        "Failed to update cache retention metrics", exc_info=True
+    )
+
+
+def test_record_conversation_cache_lookup(
+    mocker: MockerFixture, recording_logger: MockType
+) -> None:
+    """Test that hits and misses of the read-through cache are recorded."""
+    mock_lookups = mocker.patch(
+        "metrics.recording.metrics.conversation_cache_lookups_total"
+    )
+
+    recording.record_conversation_cache_lookup("history", True)
+    recording.record_conversation_cache_lookup("summaries", False)
+
+    mock_lookups.labels.assert_any_call("history", "hit")
+    mock_lookups.labels.assert_any_call("summaries", "miss")
+
+    mock_lookups.labels.return_value.inc.side_effect = ValueError("bad")
+    recording.record_conversation_cache_lookup("history", True)
+
+    recording_logger.warning.assert_called_once_with(
+        "Failed to update conversation cache lookup metric", exc_info=True
+    )
+
+
+def test_record_token_usage_flush_lag(
+    mocker: MockerFixture, recording_logger: MockType
+) -> None:
+    """Test that flush lag of the token history buffer is recorded."""
+    mock_lag = mocker.patch("metrics.recording.metrics.token_usage_flush_lag_seconds")
+
+    recording.record_token_usage_flush_lag(2.5)
+
+    mock_lag.set.assert_called_once_with(2.5)
+
+    mock_lag.set.side_effect = ValueError("bad")
+    recording.record_token_usage_flush_lag(1.0)
+
+    recording_logger.warning.assert_called_once_with(
+        "Failed to update token usage flush lag metric", exc_info=True
+    )
+
+
+def test_record_quota_scheduler_run(
+    mocker: MockerFixture, recording_logger: MockType
+) -> None:
+    """Test that time of the last successful quota scheduler run is recorded."""
+    mock_run = mocker.patch(
+        "metrics.recording.metrics.quota_scheduler_last_success_timestamp_seconds"
+    )
+
+    recording.record_quota_scheduler_run()
+
+    mock_run.set_to_current_time.assert_called_once_with()
+
+    mock_run.set_to_current_time.side_effect = ValueError("bad")
+    recording.record_quota_scheduler_run()
+
+    recording_logger.warning.assert_called_once_with(
+        "Failed to update quota scheduler run metric", exc_info=True
+    )
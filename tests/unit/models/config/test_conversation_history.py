@@ -9,9 +9,12 @@ from pytest_subtests import SubTests
 import constants
 from models.config import (
     ConversationHistoryConfiguration,
+    ConversationRetentionConfiguration,
     InMemoryCacheConfig,
     PostgreSQLDatabaseConfiguration,
+    ReadThroughCacheConfiguration,
     SQLiteDatabaseConfiguration,
+    WriteBehindConfiguration,
 )
 
 
@@ -277,3 +280,85 @@ def test_conversation_type_postgres_wrong_config() -> None:
             type=constants.CACHE_TYPE_POSTGRES,
             postgres=PostgreSQLDatabaseConfiguration(),  # pyright: ignore[reportCallIssue]
         )  # pyright: ignore[reportCallIssue]
+
+
+def test_conversation_cache_write_behind() -> None:
+    """Test the write-behind mode configuration."""
+    c = ConversationHistoryConfiguration(
+        type=constants.CACHE_TYPE_SQLITE,
+        sqlite=SQLiteDatabaseConfiguration(db_path="ss"),
+        write_behind=WriteBehindConfiguration(),
+    )  # pyright: ignore[reportCallIssue]
+    assert c.write_behind is not None
+    assert (
+        c.write_behind.flush_interval == constants.WRITE_BEHIND_DEFAULT_FLUSH_INTERVAL
+    )
+    assert c.write_behind.batch_size == constants.WRITE_BEHIND_DEFAULT_BATCH_SIZE
+    assert c.write_behind.max_pending == constants.WRITE_BEHIND_DEFAULT_MAX_PENDING
+    assert (
+        c.write_behind.append_timeout == constants.WRITE_BEHIND_DEFAULT_APPEND_TIMEOUT
+    )
+
+    with pytest.raises(ValidationError, match="less than or equal to 1000"):
+        WriteBehindConfiguration(batch_size=constants.WRITE_BEHIND_MAX_BATCH_SIZE + 1)
+
+
+def test_conversation_cache_write_behind_unsupported_type() -> None:
+    """Test that write-behind mode requires a database backed cache."""
+    with pytest.raises(ValidationError, match="Write-behind mode is supported"):
+        ConversationHistoryConfiguration(
+            type=constants.CACHE_TYPE_MEMORY,
+            memory=InMemoryCacheConfig(max_entries=100),
+            write_behind=WriteBehindConfiguration(),
+        )  # pyright: ignore[reportCallIssue]
+
+
+def test_conversation_cache_retention() -> None:
+    """Test the retention policy configuration."""
+    c = ConversationHistoryConfiguration(
+        type=constants.CACHE_TYPE_SQLITE,
+        sqlite=SQLiteDatabaseConfiguration(db_path="ss"),
+        retention=ConversationRetentionConfiguration(max_age=86400),
+    )  # pyright: ignore[reportCallIssue]
+    assert c.retention is not None
+    assert c.retention.max_age == 86400
+    assert c.retention.max_turns_per_conversation is None
+    assert c.retention.max_conversations_per_user is None
+    assert c.retention.period == constants.RETENTION_DEFAULT_PERIOD
+    assert c.retention.batch_size == constants.RETENTION_DEFAULT_BATCH_SIZE
+    assert c.retention.vacuum_pages == constants.RETENTION_DEFAULT_VACUUM_PAGES
+
+    with pytest.raises(ValidationError, match="greater than 0"):
+        ConversationRetentionConfiguration(max_turns_per_conversation=0)
+
+
+def test_conversation_cache_retention_unsupported_type() -> None:
+    """Test that retention policy requires a database backed cache."""
+    with pytest.raises(ValidationError, match="Retention policy is supported"):
+        ConversationHistoryConfiguration(
+            type=constants.CACHE_TYPE_MEMORY,
+            memory=InMemoryCacheConfig(max_entries=100),
+            retention=ConversationRetentionConfiguration(),
+        )  # pyright: ignore[reportCallIssue]
+
+
+def test_conversation_cache_read_through() -> None:
+    """Test the read-through cache configuration."""
+    c = ConversationHistoryConfiguration(
+        type=constants.CACHE_TYPE_SQLITE,
+        sqlite=SQLiteDatabaseConfiguration(db_path="ss"),
+        read_through=ReadThroughCacheConfiguration(),
+    )  # pyright: ignore[reportCallIssue]
+    assert c.read_through is not None
+    assert c.read_through.max_entries == constants.READ_THROUGH_DEFAULT_MAX_ENTRIES
+    assert c.read_through.ttl == constants.READ_THROUGH_DEFAULT_TTL
+
+
+def test_conversation_cache_read_through_unsupported_type() -> None:
+    """Test that read-through cache requires a database backed cache."""
+    with pytest.raises(ValidationError, match="Read-through cache is supported"):
+        ConversationHistoryConfiguration(
+            type=constants.CACHE_TYPE_MEMORY,
+            memory=InMemoryCacheConfig(max_entries=100),
+            read_through=ReadThroughCacheConfiguration(),
+        )  # pyright: ignore[reportCallIssue]
@@ -6,9 +6,11 @@ import pytest
 from pydantic import ValidationError
 from pytest_subtests import SubTests
 
+import constants
 from models.config import (
     DatabaseConfiguration,
     PostgreSQLDatabaseConfiguration,
+    SQLiteConcurrencyConfiguration,
     SQLiteDatabaseConfiguration,
 )
 
@@ -93,3 +95,31 @@ def test_two_databases_configuration() -> None:
         ValidationError, match="Only one database configuration can be provided"
     ):
         DatabaseConfiguration(postgres=d1, sqlite=d2)
+
+
+def test_sqlite_concurrency_configuration_defaults() -> None:
+    """Test that high-concurrency mode is disabled unless configured."""
+    config = SQLiteDatabaseConfiguration(db_path="/tmp/foo/bar/baz")
+    assert config.concurrency is None
+
+    concurrency = SQLiteConcurrencyConfiguration()
+    assert concurrency.synchronous == "NORMAL"
+    assert concurrency.mmap_size == constants.SQLITE_CONCURRENCY_DEFAULT_MMAP_SIZE
+    assert concurrency.cache_size == constants.SQLITE_CONCURRENCY_DEFAULT_CACHE_SIZE
+    assert concurrency.readers == constants.SQLITE_CONCURRENCY_DEFAULT_READERS
+    assert (
+        concurrency.statement_cache_size
+        == constants.SQLITE_CONCURRENCY_DEFAULT_STATEMENT_CACHE_SIZE
+    )
+
+
+def test_sqlite_concurrency_configuration_validation() -> None:
+    """Test that invalid high-concurrency mode settings are rejected."""
+    with pytest.raises(ValidationError):
+        SQLiteConcurrencyConfiguration(synchronous="SOMETIMES")  # type: ignore[arg-type]
+    with pytest.raises(ValidationError):
+        SQLiteConcurrencyConfiguration(readers=0)
+    with pytest.raises(ValidationError):
+        SQLiteConcurrencyConfiguration(mmap_size=-1)
+    # memory-mapped I/O can be disabled
+    assert SQLiteConcurrencyConfiguration(mmap_size=0).mmap_size == 0
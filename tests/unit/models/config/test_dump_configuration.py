@@ -204,6 +204,7 @@ def test_dump_configuration_minimal_cfg(tmp_path: Path) -> None:
             "database": {
                 "sqlite": {
                     "db_path": "/tmp/lightspeed-stack.db",
+                    "concurrency": None,
                 },
                 "postgres": None,
             },
@@ -213,6 +214,9 @@ def test_dump_configuration_minimal_cfg(tmp_path: Path) -> None:
                 "postgres": None,
                 "sqlite": None,
                 "type": None,
+                "write_behind": None,
+                "read_through": None,
+                "retention": None,
             },
             "compaction": {
                 "enabled": False,
@@ -234,8 +238,13 @@ def test_dump_configuration_minimal_cfg(tmp_path: Path) -> None:
                     "period": 1,
                     "database_reconnection_count": 10,
                     "database_reconnection_delay": 1,
+                    "chunk_size": 1000,
                 },
                 "enable_token_history": False,
+                "token_history_buffer": None,
+                "lease": None,
+                "reservation": None,
+                "negative_cache": None,
             },
             "a2a_state": {
                 "sqlite": None,
@@ -270,6 +279,7 @@ def test_dump_configuration_minimal_cfg(tmp_path: Path) -> None:
             "splunk": None,
             "observability": _get_expected_observability_dump(),
             "deployment_environment": "development",
+            "persistence_pipeline": None,
             "saved_prompts": _DEFAULT_SAVED_PROMPTS_DUMP,
             "skills": None,
             "shields": [],
@@ -442,6 +452,17 @@ def test_dump_configuration_valid_values(tmp_path: Path) -> None:
                     "gss_encmode": "disable",
                     "namespace": "public",
                     "ca_cert_path": None,
+                    "heartbeat_interval": None,
+                    "pool": {
+                        "min_size": 1,
+                        "max_size": 10,
+                        "acquire_timeout": 30.0,
+                        "max_lifetime": 3600.0,
+                    },
+                    "replicas": [],
+                    "max_replica_lag": 5.0,
+                    "read_your_writes_window": 10.0,
+                    "shards": [],
                 },
             },
             "authorization": None,
@@ -450,6 +471,9 @@ def test_dump_configuration_valid_values(tmp_path: Path) -> None:
                 "postgres": None,
                 "sqlite": None,
                 "type": None,
+                "write_behind": None,
+                "read_through": None,
+                "retention": None,
             },
             "compaction": {
                 "enabled": False,
@@ -471,8 +495,13 @@ def test_dump_configuration_valid_values(tmp_path: Path) -> None:
                     "period": 1,
                     "database_reconnection_count": 10,
                     "database_reconnection_delay": 1,
+                    "chunk_size": 1000,
                 },
                 "enable_token_history": False,
+                "token_history_buffer": None,
+                "lease": None,
+                "reservation": None,
+                "negative_cache": None,
             },
             "a2a_state": {
                 "sqlite": None,
@@ -510,6 +539,7 @@ def test_dump_configuration_valid_values(tmp_path: Path) -> None:
             "splunk": None,
             "observability": _get_expected_observability_dump(),
             "deployment_environment": "development",
+            "persistence_pipeline": None,
             "saved_prompts": _DEFAULT_SAVED_PROMPTS_DUMP,
             "skills": None,
             "shields": [],
@@ -818,6 +848,17 @@ def test_dump_configuration_with_quota_limiters(tmp_path: Path) -> None:
                     "gss_encmode": "disable",
                     "namespace": "public",
                     "ca_cert_path": None,
+                    "heartbeat_interval": None,
+                    "pool": {
+                        "min_size": 1,
+                        "max_size": 10,
+                        "acquire_timeout": 30.0,
+                        "max_lifetime": 3600.0,
+                    },
+                    "replicas": [],
+                    "max_replica_lag": 5.0,
+                    "read_your_writes_window": 10.0,
+                    "shards": [],
                 },
             },
             "authorization": None,
@@ -826,6 +867,9 @@ def test_dump_configuration_with_quota_limiters(tmp_path: Path) -> None:
                 "postgres": None,
                 "sqlite": None,
                 "type": None,
+                "write_behind": None,
+                "read_through": None,
+                "retention": None,
             },
             "compaction": {
                 "enabled": False,
@@ -848,6 +892,7 @@ def test_dump_configuration_with_quota_limiters(tmp_path: Path) -> None:
                         "name": "user_monthly_limits",
                         "period": "2 seconds",
                         "quota_increase": 10,
+                        "shards": 1,
                         "type": "user_limiter",
                     },
                     {
@@ -855,6 +900,7 @@ def test_dump_configuration_with_quota_limiters(tmp_path: Path) -> None:
                         "name": "cluster_monthly_limits",
                         "period": "1 month",
                         "quota_increase": 20,
+                        "shards": 1,
                         "type": "cluster_limiter",
                     },
                 ],
@@ -862,8 +908,13 @@ def test_dump_configuration_with_quota_limiters(tmp_path: Path) -> None:
                     "period": 10,
                     "database_reconnection_count": 10,
                     "database_reconnection_delay": 1,
+                    "chunk_size": 1000,
                 },
                 "enable_token_history": True,
+                "token_history_buffer": None,
+                "lease": None,
+                "reservation": None,
+                "negative_cache": None,
             },
             "a2a_state": {
                 "sqlite": None,
@@ -901,6 +952,7 @@ def test_dump_configuration_with_quota_limiters(tmp_path: Path) -> None:
             "splunk": None,
             "observability": _get_expected_observability_dump(),
             "deployment_environment": "development",
+            "persistence_pipeline": None,
             "saved_prompts": _DEFAULT_SAVED_PROMPTS_DUMP,
             "skills": None,
             "shields": [],
@@ -1093,6 +1145,17 @@ def test_dump_configuration_with_quota_limiters_different_values(
                     "gss_encmode": "disable",
                     "namespace": "public",
                     "ca_cert_path": None,
+                    "heartbeat_interval": None,
+                    "pool": {
+                        "min_size": 1,
+                        "max_size": 10,
+                        "acquire_timeout": 30.0,
+                        "max_lifetime": 3600.0,
+                    },
+                    "replicas": [],
+                    "max_replica_lag": 5.0,
+                    "read_your_writes_window": 10.0,
+                    "shards": [],
                 },
             },
             "authorization": None,
@@ -1101,6 +1164,9 @@ def test_dump_configuration_with_quota_limiters_different_values(
                 "postgres": None,
                 "sqlite": None,
                 "type": None,
+                "write_behind": None,
+                "read_through": None,
+                "retention": None,
             },
             "compaction": {
                 "enabled": False,
@@ -1123,6 +1189,7 @@ def test_dump_configuration_with_quota_limiters_different_values(
                         "name": "user_monthly_limits",
                         "period": "2 seconds",
                         "quota_increase": 10,
+                        "shards": 1,
                         "type": "user_limiter",
                     },
                     {
@@ -1130,6 +1197,7 @@ def test_dump_configuration_with_quota_limiters_different_values(
                         "name": "cluster_monthly_limits",
                         "period": "1 month",
                         "quota_increase": 20,
+                        "shards": 1,
                         "type": "cluster_limiter",
                     },
                 ],
@@ -1137,8 +1205,13 @@ def test_dump_configuration_with_quota_limiters_different_values(
                     "period": 10,
                     "database_reconnection_count": 123,
                     "database_reconnection_delay": 456,
+                    "chunk_size": 1000,
                 },
                 "enable_token_history": True,
+                "token_history_buffer": None,
+                "lease": None,
+                "reservation": None,
+                "negative_cache": None,
             },
             "a2a_state": {
                 "sqlite": None,
@@ -1176,6 +1249,7 @@ def test_dump_configuration_with_quota_limiters_different_values(
             "splunk": None,
             "observability": _get_expected_observability_dump(),
             "deployment_environment": "development",
+            "persistence_pipeline": None,
             "saved_prompts": _DEFAULT_SAVED_PROMPTS_DUMP,
             "skills": None,
             "shields": [],
@@ -1405,6 +1479,17 @@ def test_dump_configuration_byok(tmp_path: Path) -> None:
                     "gss_encmode": "disable",
                     "namespace": "foo",
                     "ca_cert_path": None,
+                    "heartbeat_interval": None,
+                    "pool": {
+                        "min_size": 1,
+                        "max_size": 10,
+                        "acquire_timeout": 30.0,
+                        "max_lifetime": 3600.0,
+                    },
+                    "replicas": [],
+                    "max_replica_lag": 5.0,
+                    "read_your_writes_window": 10.0,
+                    "shards": [],
                 },
             },
             "authorization": None,
@@ -1413,6 +1498,9 @@ def test_dump_configuration_byok(tmp_path: Path) -> None:
                 "postgres": None,
                 "sqlite": None,
                 "type": None,
+                "write_behind": None,
+                "read_through": None,
+                "retention": None,
             },
             "compaction": {
                 "enabled": False,
@@ -1434,8 +1522,13 @@ def test_dump_configuration_byok(tmp_path: Path) -> None:
                     "period": 1,
                     "database_reconnection_count": 10,
                     "database_reconnection_delay": 1,
+                    "chunk_size": 1000,
                 },
                 "enable_token_history": False,
+                "token_history_buffer": None,
+                "lease": None,
+                "reservation": None,
+                "negative_cache": None,
             },
             "a2a_state": {
                 "sqlite": None,
@@ -1491,6 +1584,7 @@ def test_dump_configuration_byok(tmp_path: Path) -> None:
             "splunk": None,
             "observability": _get_expected_observability_dump(),
             "deployment_environment": "development",
+            "persistence_pipeline": None,
             "saved_prompts": _DEFAULT_SAVED_PROMPTS_DUMP,
             "skills": None,
             "shields": [],
@@ -1657,6 +1751,17 @@ def test_dump_configuration_pg_namespace(tmp_path: Path) -> None:
                     "ssl_mode": "require",
                     "gss_encmode": "disable",
                     "ca_cert_path": None,
+                    "heartbeat_interval": None,
+                    "pool": {
+                        "min_size": 1,
+                        "max_size": 10,
+                        "acquire_timeout": 30.0,
+                        "max_lifetime": 3600.0,
+                    },
+                    "replicas": [],
+                    "max_replica_lag": 5.0,
+                    "read_your_writes_window": 10.0,
+                    "shards": [],
                     "namespace": "foo",
                 },
             },
@@ -1666,6 +1771,9 @@ def test_dump_configuration_pg_namespace(tmp_path: Path) -> None:
                 "postgres": None,
                 "sqlite": None,
                 "type": None,
+                "write_behind": None,
+                "read_through": None,
+                "retention": None,
             },
             "compaction": {
                 "enabled": False,
@@ -1687,8 +1795,13 @@ def test_dump_configuration_pg_namespace(tmp_path: Path) -> None:
                     "period": 1,
                     "database_reconnection_count": 10,
                     "database_reconnection_delay": 1,
+                    "chunk_size": 1000,
                 },
                 "enable_token_history": False,
+                "token_history_buffer": None,
+                "lease": None,
+                "reservation": None,
+                "negative_cache": None,
             },
             "a2a_state": {
                 "sqlite": None,
@@ -1726,6 +1839,7 @@ def test_dump_configuration_pg_namespace(tmp_path: Path) -> None:
             "splunk": None,
             "observability": _get_expected_observability_dump(),
             "deployment_environment": "development",
+            "persistence_pipeline": None,
             "saved_prompts": _DEFAULT_SAVED_PROMPTS_DUMP,
             "skills": None,
             "shields": [],
@@ -2053,6 +2167,17 @@ def test_dump_configuration_allow_degraded_mode(tmp_path: Path) -> None:
                     "gss_encmode": "disable",
                     "namespace": "public",
                     "ca_cert_path": None,
+                    "heartbeat_interval": None,
+                    "pool": {
+                        "min_size": 1,
+                        "max_size": 10,
+                        "acquire_timeout": 30.0,
+                        "max_lifetime": 3600.0,
+                    },
+                    "replicas": [],
+                    "max_replica_lag": 5.0,
+                    "read_your_writes_window": 10.0,
+                    "shards": [],
                 },
             },
             "authorization": None,
@@ -2061,6 +2186,9 @@ def test_dump_configuration_allow_degraded_mode(tmp_path: Path) -> None:
                 "postgres": None,
                 "sqlite": None,
                 "type": None,
+                "write_behind": None,
+                "read_through": None,
+                "retention": None,
             },
             "compaction": {
                 "enabled": False,
@@ -2082,8 +2210,13 @@ def test_dump_configuration_allow_degraded_mode(tmp_path: Path) -> None:
                     "period": 1,
                     "database_reconnection_count": 10,
                     "database_reconnection_delay": 1,
+                    "chunk_size": 1000,
                 },
                 "enable_token_history": False,
+                "token_history_buffer": None,
+                "lease": None,
+                "reservation": None,
+                "negative_cache": None,
             },
             "a2a_state": {
                 "sqlite": None,
@@ -2121,6 +2254,7 @@ def test_dump_configuration_allow_degraded_mode(tmp_path: Path) -> None:
             "splunk": None,
             "observability": _get_expected_observability_dump(),
             "deployment_environment": "development",
+            "persistence_pipeline": None,
             "saved_prompts": _DEFAULT_SAVED_PROMPTS_DUMP,
             "skills": None,
             "shields": [],
@@ -2294,6 +2428,17 @@ def test_dump_configuration_max_retries_settings(tmp_path: Path) -> None:
                     "gss_encmode": "disable",
                     "namespace": "public",
                     "ca_cert_path": None,
+                    "heartbeat_interval": None,
+                    "pool": {
+                        "min_size": 1,
+                        "max_size": 10,
+                        "acquire_timeout": 30.0,
+                        "max_lifetime": 3600.0,
+                    },
+                    "replicas": [],
+                    "max_replica_lag": 5.0,
+                    "read_your_writes_window": 10.0,
+                    "shards": [],
                 },
             },
             "authorization": None,
@@ -2302,6 +2447,9 @@ def test_dump_configuration_max_retries_settings(tmp_path: Path) -> None:
                 "postgres": None,
                 "sqlite": None,
                 "type": None,
+                "write_behind": None,
+                "read_through": None,
+                "retention": None,
             },
             "compaction": {
                 "enabled": False,
@@ -2323,8 +2471,13 @@ def test_dump_configuration_max_retries_settings(tmp_path: Path) -> None:
                     "period": 1,
                     "database_reconnection_count": 10,
                     "database_reconnection_delay": 1,
+                    "chunk_size": 1000,
                 },
                 "enable_token_history": False,
+                "token_history_buffer": None,
+                "lease": None,
+                "reservation": None,
+                "negative_cache": None,
             },
             "a2a_state": {
                 "sqlite": None,
@@ -2362,6 +2515,7 @@ def test_dump_configuration_max_retries_settings(tmp_path: Path) -> None:
             "splunk": None,
             "observability": _get_expected_observability_dump(),
             "deployment_environment": "development",
+            "persistence_pipeline": None,
             "saved_prompts": _DEFAULT_SAVED_PROMPTS_DUMP,
             "skills": None,
             "shields": [],
@@ -2535,6 +2689,17 @@ def test_dump_configuration_retry_count_settings(tmp_path: Path) -> None:
                     "gss_encmode": "disable",
                     "namespace": "public",
                     "ca_cert_path": None,
+                    "heartbeat_interval": None,
+                    "pool": {
+                        "min_size": 1,
+                        "max_size": 10,
+                        "acquire_timeout": 30.0,
+                        "max_lifetime": 3600.0,
+                    },
+                    "replicas": [],
+                    "max_replica_lag": 5.0,
+                    "read_your_writes_window": 10.0,
+                    "shards": [],
                 },
             },
             "authorization": None,
@@ -2543,6 +2708,9 @@ def test_dump_configuration_retry_count_settings(tmp_path: Path) -> None:
                 "postgres": None,
                 "sqlite": None,
                 "type": None,
+                "write_behind": None,
+                "read_through": None,
+                "retention": None,
             },
             "compaction": {
                 "enabled": False,
@@ -2564,8 +2732,13 @@ def test_dump_configuration_retry_count_settings(tmp_path: Path) -> None:
                     "period": 1,
                     "database_reconnection_count": 10,
                     "database_reconnection_delay": 1,
+                    "chunk_size": 1000,
                 },
                 "enable_token_history": False,
+                "token_history_buffer": None,
+                "lease": None,
+                "reservation": None,
+                "negative_cache": None,
             },
             "a2a_state": {
                 "sqlite": None,
@@ -2603,6 +2776,7 @@ def test_dump_configuration_retry_count_settings(tmp_path: Path) -> None:
             "splunk": None,
             "observability": _get_expected_observability_dump(),
             "deployment_environment": "development",
+            "persistence_pipeline": None,
             "saved_prompts": _DEFAULT_SAVED_PROMPTS_DUMP,
             "skills": None,
             "shields": [],
@@ -2783,6 +2957,17 @@ def test_dump_configuration_specific_compaction_values(tmp_path: Path) -> None:
                     "gss_encmode": "disable",
                     "namespace": "public",
                     "ca_cert_path": None,
+                    "heartbeat_interval": None,
+                    "pool": {
+                        "min_size": 1,
+                        "max_size": 10,
+                        "acquire_timeout": 30.0,
+                        "max_lifetime": 3600.0,
+                    },
+                    "replicas": [],
+                    "max_replica_lag": 5.0,
+                    "read_your_writes_window": 10.0,
+                    "shards": [],
                 },
             },
             "authorization": None,
@@ -2791,6 +2976,9 @@ def test_dump_configuration_specific_compaction_values(tmp_path: Path) -> None:
                 "postgres": None,
                 "sqlite": None,
                 "type": None,
+                "write_behind": None,
+                "read_through": None,
+                "retention": None,
             },
             "compaction": {
                 "enabled": True,
@@ -2812,8 +3000,13 @@ def test_dump_configuration_specific_compaction_values(tmp_path: Path) -> None:
                     "period": 1,
                     "database_reconnection_count": 10,
                     "database_reconnection_delay": 1,
+                    "chunk_size": 1000,
                 },
                 "enable_token_history": False,
+                "token_history_buffer": None,
+                "lease": None,
+                "reservation": None,
+                "negative_cache": None,
             },
             "a2a_state": {
                 "sqlite": None,
@@ -2848,6 +3041,7 @@ def test_dump_configuration_specific_compaction_values(tmp_path: Path) -> None:
             "splunk": None,
             "observability": _get_expected_observability_dump(),
             "deployment_environment": "development",
+            "persistence_pipeline": None,
             "saved_prompts": _DEFAULT_SAVED_PROMPTS_DUMP,
             "skills": None,
             "shields": [],
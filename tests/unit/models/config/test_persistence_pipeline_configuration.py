@@ -0,0 +1,58 @@
+"""Unit tests for PersistencePipelineConfiguration model."""
+
+from pathlib import Path
+
+import pytest
+from pydantic import ValidationError
+
+import constants
+from models.config import PersistencePipelineConfiguration
+from utils.checks import InvalidConfigurationError
+
+
+def test_default_values(tmp_path: Path) -> None:
+    """Test default PersistencePipelineConfiguration has expected values."""
+    cfg = PersistencePipelineConfiguration(
+        journal_path=str(tmp_path)
+    )  # pyright: ignore[reportCallIssue]
+    assert cfg.journal_path == str(tmp_path)
+    assert cfg.workers == constants.PERSISTENCE_PIPELINE_DEFAULT_WORKERS
+    assert cfg.max_pending == constants.PERSISTENCE_PIPELINE_DEFAULT_MAX_PENDING
+    assert cfg.max_attempts == constants.PERSISTENCE_PIPELINE_DEFAULT_MAX_ATTEMPTS
+    assert cfg.retry_delay == constants.PERSISTENCE_PIPELINE_DEFAULT_RETRY_DELAY
+    assert cfg.drain_timeout == constants.PERSISTENCE_PIPELINE_DEFAULT_DRAIN_TIMEOUT
+
+
+def test_journal_path_is_required() -> None:
+    """Test that journal directory has to be configured."""
+    with pytest.raises(ValidationError, match="journal_path"):
+        PersistencePipelineConfiguration()  # pyright: ignore[reportCallIssue]
+
+
+def test_missing_journal_directory_is_accepted(tmp_path: Path) -> None:
+    """Test that journal directory is created by the pipeline later."""
+    cfg = PersistencePipelineConfiguration(
+        journal_path=str(tmp_path / "journal")
+    )  # pyright: ignore[reportCallIssue]
+    assert cfg.journal_path == str(tmp_path / "journal")
+
+
+def test_journal_path_is_not_directory(tmp_path: Path) -> None:
+    """Test that journal path pointing to a file is rejected."""
+    journal_file = tmp_path / "journal"
+    journal_file.touch()
+    with pytest.raises(InvalidConfigurationError, match="is not a directory"):
+        PersistencePipelineConfiguration(
+            journal_path=str(journal_file)
+        )  # pyright: ignore[reportCallIssue]
+
+
+@pytest.mark.parametrize(
+    "field", ["workers", "max_pending", "max_attempts", "retry_delay", "drain_timeout"]
+)
+def test_non_positive_values_are_rejected(tmp_path: Path, field: str) -> None:
+    """Test that counts and durations have to be positive."""
+    with pytest.raises(ValidationError, match=field):
+        PersistencePipelineConfiguration(
+            journal_path=str(tmp_path), **{field: 0}
+        )  # pyright: ignore[reportCallIssue]
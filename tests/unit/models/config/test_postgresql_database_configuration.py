@@ -9,8 +9,14 @@ from pytest_subtests import SubTests
 from constants import (
     POSTGRES_DEFAULT_GSS_ENCMODE,
     POSTGRES_DEFAULT_SSL_MODE,
+    POSTGRES_POOL_DEFAULT_MAX_SIZE,
+    POSTGRES_POOL_DEFAULT_MIN_SIZE,
+)
+from models.config import (
+    PostgreSQLDatabaseConfiguration,
+    PostgreSQLPoolConfiguration,
+    PostgreSQLShardConfiguration,
 )
-from models.config import PostgreSQLDatabaseConfiguration
 
 
 def test_postgresql_database_configuration() -> None:
@@ -309,3 +315,63 @@ def test_postgresql_database_configuration_improper_gss_encmode(
                     password="password",
                     gss_encmode=gss_encmode,
                 )  # pyright: ignore[reportCallIssue]
+
+
+def test_postgresql_pool_configuration() -> None:
+    """Test the default and custom connection pool configuration."""
+    # pylint: disable=no-member
+    c = PostgreSQLDatabaseConfiguration(
+        db="db",
+        user="user",
+        password="password",
+    )  # pyright: ignore[reportCallIssue]
+    assert c.pool.min_size == POSTGRES_POOL_DEFAULT_MIN_SIZE
+    assert c.pool.max_size == POSTGRES_POOL_DEFAULT_MAX_SIZE
+
+    pool = PostgreSQLPoolConfiguration(
+        min_size=0, max_size=2, acquire_timeout=0.5, max_lifetime=60
+    )
+    assert pool.min_size == 0
+    assert pool.max_size == 2
+    assert pool.acquire_timeout == 0.5
+    assert pool.max_lifetime == 60
+
+
+def test_postgresql_pool_configuration_improper_sizes() -> None:
+    """Test that minimal pool size can not exceed the maximal one."""
+    with pytest.raises(ValidationError, match="min_size should not be greater"):
+        PostgreSQLPoolConfiguration(min_size=3, max_size=2)
+
+    with pytest.raises(ValidationError, match="greater than 0"):
+        PostgreSQLPoolConfiguration(max_size=0)
+
+
+def test_postgresql_shard_configuration() -> None:
+    """Test shards of the database and uniqueness of their names."""
+    c = PostgreSQLDatabaseConfiguration(
+        db="db",
+        user="user",
+        password="password",
+        shards=[
+            PostgreSQLShardConfiguration(name="a", db="db_a"),
+            PostgreSQLShardConfiguration(name="b", host="b", port=5433, db="db_b"),
+        ],
+    )  # pyright: ignore[reportCallIssue]
+    assert [(s.name, s.host, s.port, s.db) for s in c.shards] == [
+        ("a", "localhost", 5432, "db_a"),
+        ("b", "b", 5433, "db_b"),
+    ]
+
+    with pytest.raises(ValidationError, match="Shard names should be unique"):
+        PostgreSQLDatabaseConfiguration(
+            db="db",
+            user="user",
+            password="password",
+            shards=[
+                PostgreSQLShardConfiguration(name="a", db="db_a"),
+                PostgreSQLShardConfiguration(name="a", db="db_b"),
+            ],
+        )  # pyright: ignore[reportCallIssue]
+
+    with pytest.raises(ValidationError, match="Port value should be less than 65536"):
+        PostgreSQLShardConfiguration(name="a", port=70000, db="db_a")
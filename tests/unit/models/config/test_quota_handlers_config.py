@@ -7,7 +7,15 @@ import pytest
 from pydantic import ValidationError
 from pytest_subtests import SubTests
 
-from models.config import QuotaHandlersConfiguration, QuotaSchedulerConfiguration
+from models.config import (
+    QuotaHandlersConfiguration,
+    QuotaLeaseConfiguration,
+    QuotaLimiterConfiguration,
+    QuotaNegativeCacheConfiguration,
+    QuotaReservationConfiguration,
+    QuotaSchedulerConfiguration,
+    TokenHistoryBufferConfiguration,
+)
 
 
 def test_quota_handlers_configuration(subtests: SubTests) -> None:
@@ -748,3 +756,108 @@ def test_quota_handlers_from_dict_negative_cases(config_dict: dict[str, Any]) ->
         # try to initialize the app config and load configuration from a Python
         # dictionary
         QuotaHandlersConfiguration(**config_dict)
+
+
+def test_quota_lease_configuration() -> None:
+    """Test the quota lease configuration."""
+    cfg = QuotaHandlersConfiguration(
+        lease=QuotaLeaseConfiguration()
+    )  # pyright: ignore[reportCallIssue]
+    assert cfg.lease is not None
+    assert cfg.lease.fraction == 0.1
+    assert cfg.lease.sync_period == 5
+
+    assert (
+        QuotaHandlersConfiguration().lease is None
+    )  # pyright: ignore[reportCallIssue]
+
+    with pytest.raises(ValidationError, match="less than or equal to 1"):
+        QuotaLeaseConfiguration(fraction=1.5)  # pyright: ignore[reportCallIssue]
+    with pytest.raises(ValidationError, match="greater than 0"):
+        QuotaLeaseConfiguration(fraction=0)  # pyright: ignore[reportCallIssue]
+    with pytest.raises(ValidationError, match="greater than 0"):
+        QuotaLeaseConfiguration(sync_period=0)  # pyright: ignore[reportCallIssue]
+
+
+def test_quota_lease_with_sharded_quota() -> None:
+    """Test that leased quota can not be split into shards."""
+    limiter = QuotaLimiterConfiguration(
+        type="cluster_limiter",
+        name="cluster_monthly_limits",
+        initial_quota=100,
+        quota_increase=10,
+        period="1 month",
+        shards=8,
+    )
+    cfg = QuotaHandlersConfiguration(
+        limiters=[limiter]
+    )  # pyright: ignore[reportCallIssue]
+    assert cfg.limiters[0].shards == 8
+
+    with pytest.raises(ValidationError, match="can not be used with sharded quota"):
+        QuotaHandlersConfiguration(
+            limiters=[limiter], lease=QuotaLeaseConfiguration()
+        )  # pyright: ignore[reportCallIssue]
+
+
+def test_quota_reservation_configuration() -> None:
+    """Test the quota reservation configuration."""
+    cfg = QuotaHandlersConfiguration(
+        reservation=QuotaReservationConfiguration()
+    )  # pyright: ignore[reportCallIssue]
+    assert cfg.reservation is not None
+    assert cfg.reservation.output_tokens == 1000
+    assert cfg.reservation.timeout == 600
+
+    assert (
+        QuotaHandlersConfiguration().reservation is None
+    )  # pyright: ignore[reportCallIssue]
+
+    with pytest.raises(ValidationError, match="greater than or equal to 0"):
+        QuotaReservationConfiguration(
+            output_tokens=-1
+        )  # pyright: ignore[reportCallIssue]
+    with pytest.raises(ValidationError, match="greater than 0"):
+        QuotaReservationConfiguration(timeout=0)  # pyright: ignore[reportCallIssue]
+
+
+def test_quota_negative_cache_configuration() -> None:
+    """Test the configuration of the cache of exhausted subjects."""
+    cfg = QuotaHandlersConfiguration(
+        negative_cache=QuotaNegativeCacheConfiguration()
+    )  # pyright: ignore[reportCallIssue]
+    assert cfg.negative_cache is not None
+    assert cfg.negative_cache.ttl == 5
+    assert cfg.negative_cache.max_entries == 10000
+
+    assert (
+        QuotaHandlersConfiguration().negative_cache is None
+    )  # pyright: ignore[reportCallIssue]
+
+    with pytest.raises(ValidationError, match="greater than 0"):
+        QuotaNegativeCacheConfiguration(ttl=0)  # pyright: ignore[reportCallIssue]
+    with pytest.raises(ValidationError, match="greater than 0"):
+        QuotaNegativeCacheConfiguration(
+            max_entries=0
+        )  # pyright: ignore[reportCallIssue]
+
+
+def test_token_history_buffer_configuration() -> None:
+    """Test the token history buffer configuration."""
+    cfg = QuotaHandlersConfiguration(
+        token_history_buffer=TokenHistoryBufferConfiguration()
+    )  # pyright: ignore[reportCallIssue]
+    assert cfg.token_history_buffer is not None
+    assert cfg.token_history_buffer.flush_period == 10
+    assert cfg.token_history_buffer.max_keys == 1000
+
+    assert (
+        QuotaHandlersConfiguration().token_history_buffer is None
+    )  # pyright: ignore[reportCallIssue]
+
+    with pytest.raises(ValidationError, match="greater than 0"):
+        TokenHistoryBufferConfiguration(
+            flush_period=0
+        )  # pyright: ignore[reportCallIssue]
+    with pytest.raises(ValidationError, match="greater than 0"):
+        TokenHistoryBufferConfiguration(max_keys=0)  # pyright: ignore[reportCallIssue]
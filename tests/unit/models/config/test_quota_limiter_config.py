@@ -406,3 +406,35 @@ def test_configure_quota_handlers_from_dict_negative_cases(
         # try to initialize the app config and load configuration from a Python
         # dictionary
         QuotaLimiterConfiguration(**config_dict)
+
+
+def test_quota_limiter_shards() -> None:
+    """Test that only the cluster quota can be split into shards."""
+    cfg = QuotaLimiterConfiguration(
+        type="cluster_limiter",
+        name="cluster_monthly_limits",
+        initial_quota=100,
+        quota_increase=10,
+        period="1 month",
+        shards=8,
+    )
+    assert cfg.shards == 8
+
+    with pytest.raises(ValueError, match="Only cluster_limiter quota can be split"):
+        QuotaLimiterConfiguration(
+            type="user_limiter",
+            name="user_monthly_limits",
+            initial_quota=100,
+            quota_increase=10,
+            period="1 month",
+            shards=8,
+        )
+    with pytest.raises(ValueError, match="greater than 0"):
+        QuotaLimiterConfiguration(
+            type="cluster_limiter",
+            name="cluster_monthly_limits",
+            initial_quota=100,
+            quota_increase=10,
+            period="1 month",
+            shards=0,
+        )
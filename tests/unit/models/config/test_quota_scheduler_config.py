@@ -16,6 +16,7 @@ def test_quota_scheduler_default_configuration() -> None:
     assert cfg.period == 1
     assert cfg.database_reconnection_count == 10
     assert cfg.database_reconnection_delay == 1
+    assert cfg.chunk_size == 1000
 
 
 def test_quota_scheduler_custom_configuration() -> None:
@@ -30,11 +31,13 @@ def test_quota_scheduler_custom_configuration() -> None:
         period=10,
         database_reconnection_count=2,
         database_reconnection_delay=3,
+        chunk_size=100,
     )
     assert cfg is not None
     assert cfg.period == 10
     assert cfg.database_reconnection_count == 2
     assert cfg.database_reconnection_delay == 3
+    assert cfg.chunk_size == 100
 
 
 def test_quota_scheduler_custom_configuration_zero_period() -> None:
@@ -49,6 +52,12 @@ def test_quota_scheduler_custom_configuration_negative_period() -> None:
         QuotaSchedulerConfiguration(period=-10)  # pyright: ignore[reportCallIssue]
 
 
+def test_quota_scheduler_custom_configuration_zero_chunk_size() -> None:
+    """Test that zero chunk size value raises ValidationError."""
+    with pytest.raises(ValidationError, match="Input should be greater than 0"):
+        QuotaSchedulerConfiguration(chunk_size=0)  # pyright: ignore[reportCallIssue]
+
+
 def test_quota_scheduler_custom_configuration_zero_reconnection_count() -> None:
     """Test that zero database reconnection count value raises ValidationError."""
     with pytest.raises(ValidationError, match="Input should be greater than 0"):
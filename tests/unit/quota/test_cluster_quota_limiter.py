@@ -1,14 +1,26 @@
 """Unit tests for ClusterQuotaLimiter class."""
 
+from pathlib import Path
+from typing import Optional
+
 import pytest
+from pytest_mock import MockerFixture
 
 from models.config import (
     QuotaHandlersConfiguration,
     QuotaLimiterConfiguration,
+    QuotaReservationConfiguration,
     SQLiteDatabaseConfiguration,
 )
 from quota.cluster_quota_limiter import ClusterQuotaLimiter
 from quota.quota_exceed_error import QuotaExceedError
+from quota.quota_limiter import QuotaLimiter
+from quota.user_quota_limiter import UserQuotaLimiter
+from runners.quota_scheduler import (
+    get_increase_quota_statement,
+    get_reset_quota_statement,
+    quota_revocation,
+)
 
 # pylint: disable=protected-access
 
@@ -193,3 +205,178 @@ def test_revoke_quota() -> None:
     quota_limiter.revoke_quota("foo")
     available_quota = quota_limiter.available_quota("foo")
     assert available_quota == initial_quota
+
+
+def create_sharded_quota_limiter(
+    initial_quota: int,
+    reservation: Optional[QuotaReservationConfiguration] = None,
+    db_path: str = ":memory:",
+) -> ClusterQuotaLimiter:
+    """Create new quota limiter instance with the quota split into 3 shards."""
+    configuration = QuotaHandlersConfiguration(
+        sqlite=SQLiteDatabaseConfiguration(db_path=db_path),
+        reservation=reservation,
+    )  # pyright: ignore[reportCallIssue]
+    return ClusterQuotaLimiter(configuration, initial_quota, 10, shards=3)
+
+
+def shard_quotas(quota_limiter: ClusterQuotaLimiter) -> dict[str, int]:
+    """Read quota stored in the shards."""
+    quotas = quota_limiter._read_quotas(quota_limiter.quota_keys())
+    return {quota_id: available for (quota_id, _), available in quotas.items()}
+
+
+def test_sharded_quota_initialized() -> None:
+    """Test that the initial quota is split among the shards."""
+    quota_limiter = create_sharded_quota_limiter(1000)
+
+    assert quota_limiter.available_quota() == 1000
+    assert shard_quotas(quota_limiter) == {"": 334, "1": 333, "2": 333}
+
+
+def test_sharded_quota_consumed_from_one_shard(mocker: MockerFixture) -> None:
+    """Test that tokens are consumed from the chosen shard or its siblings."""
+    quota_limiter = create_sharded_quota_limiter(30)
+    quota_limiter.ensure_available_quota()
+    mocker.patch(
+        "quota.revokable_quota_limiter.shard_order", return_value=["1", "2", ""]
+    )
+
+    quota_limiter.consume_tokens(3, 5)
+    assert shard_quotas(quota_limiter) == {"": 10, "1": 2, "2": 10}
+
+    # the chosen shard does not have enough quota left
+    quota_limiter.consume_tokens(4, 1)
+    assert shard_quotas(quota_limiter) == {"": 10, "1": 2, "2": 5}
+
+    # no shard has enough quota left, the chosen one is overdrawn
+    quota_limiter.consume_tokens(11, 0)
+    assert shard_quotas(quota_limiter) == {"": 10, "1": -9, "2": 5}
+    assert quota_limiter.available_quota() == 6
+
+    quota_limiter.consume_tokens(6, 0)
+    with pytest.raises(QuotaExceedError, match="Cluster has no available tokens"):
+        quota_limiter.ensure_available_quota()
+
+
+def test_sharded_quota_revoked_and_increased() -> None:
+    """Test that quota of all shards is revoked and increased."""
+    quota_limiter = create_sharded_quota_limiter(1000)
+    quota_limiter.ensure_available_quota()
+    quota_limiter.consume_tokens(100, 200)
+    assert quota_limiter.available_quota() == 700
+
+    quota_limiter.revoke_quota()
+    assert shard_quotas(quota_limiter) == {"": 334, "1": 333, "2": 333}
+
+    quota_limiter.increase_quota()
+    assert shard_quotas(quota_limiter) == {"": 338, "1": 336, "2": 336}
+    assert quota_limiter.available_quota() == 1010
+
+
+def test_unsharded_quota_split_into_shards(tmp_path: Path) -> None:
+    """Test that splitting stored quota into shards does not increase it."""
+    db_path = str(tmp_path / "quota.db")
+    configuration = QuotaHandlersConfiguration(
+        sqlite=SQLiteDatabaseConfiguration(db_path=db_path),
+    )  # pyright: ignore[reportCallIssue]
+    unsharded = ClusterQuotaLimiter(configuration, 1000, 10)
+    unsharded.ensure_available_quota()
+    unsharded.consume_tokens(100, 0)
+    assert unsharded.available_quota() == 900
+
+    quota_limiter = create_sharded_quota_limiter(1000, db_path=db_path)
+    assert quota_limiter.available_quota() == 900
+    assert shard_quotas(quota_limiter) == {"": 900, "1": 0, "2": 0}
+
+
+def test_sharded_quota_read_with_other_limiters(tmp_path: Path) -> None:
+    """Test that shards are summed up when quota of limiters is read together."""
+    db_path = str(tmp_path / "quota.db")
+    configuration = QuotaHandlersConfiguration(
+        sqlite=SQLiteDatabaseConfiguration(db_path=db_path),
+    )  # pyright: ignore[reportCallIssue]
+    quota_limiters: list[QuotaLimiter] = [
+        UserQuotaLimiter(configuration, 100, 1),
+        create_sharded_quota_limiter(1000, db_path=db_path),
+    ]
+    # quota of shards not stored yet is left to the limiter to initialize it
+    assert QuotaLimiter.available_quotas(quota_limiters, "foo") == [None, None]
+
+    for quota_limiter in quota_limiters:
+        quota_limiter.ensure_available_quota("foo")
+    quota_limiters[0].consume_tokens(1, 2, "foo")
+    quota_limiters[1].consume_tokens(10, 20, "foo")
+    assert QuotaLimiter.available_quotas(quota_limiters, "foo") == [97, 970]
+
+
+def test_sharded_quota_reserved_from_one_shard(mocker: MockerFixture) -> None:
+    """Test that reservations are settled in the shard they were made from."""
+    quota_limiter = create_sharded_quota_limiter(
+        30, QuotaReservationConfiguration(output_tokens=100, timeout=60)
+    )
+    mocker.patch(
+        "quota.revokable_quota_limiter.shard_order", return_value=["2", "", "1"]
+    )
+
+    reservation = quota_limiter.reserve_tokens(8)
+    assert reservation is not None
+    assert reservation.subject_id == ""
+    assert shard_quotas(quota_limiter) == {"": 10, "1": 10, "2": 2}
+
+    # the chosen shard does not have enough quota left
+    other = quota_limiter.reserve_tokens(5)
+    assert other is not None
+    assert shard_quotas(quota_limiter) == {"": 5, "1": 10, "2": 2}
+
+    quota_limiter.settle_tokens(reservation, input_tokens=1, output_tokens=2)
+    assert shard_quotas(quota_limiter) == {"": 5, "1": 10, "2": 7}
+
+    # no shard has enough quota left
+    with pytest.raises(QuotaExceedError, match="Cluster has 22 tokens, but 11"):
+        quota_limiter.reserve_tokens(11)
+
+
+@pytest.mark.parametrize(
+    ("initial_quota", "quota_increase", "expected"),
+    [
+        (1000, 0, {"": 334, "1": 333, "2": 333}),
+        (0, 10, {"": 4, "1": 3, "2": 3}),
+    ],
+)
+def test_sharded_quota_revoked_by_scheduler(
+    initial_quota: int, quota_increase: int, expected: dict[str, int]
+) -> None:
+    """Test that the scheduler revokes quota of all shards together."""
+    quota_limiter = create_sharded_quota_limiter(initial_quota)
+    quota_limiter.available_quota()
+    configuration = QuotaHandlersConfiguration(
+        sqlite=SQLiteDatabaseConfiguration(db_path=":memory:")
+    )  # pyright: ignore[reportCallIssue]
+    limiter = QuotaLimiterConfiguration(
+        type="cluster_limiter",
+        name="cluster_limits",
+        initial_quota=initial_quota,
+        quota_increase=quota_increase,
+        period="-1 day",
+        shards=3,
+    )
+    quota_limiter.consume_tokens(10, 0)
+    before = shard_quotas(quota_limiter)
+
+    def revoke(period: str) -> None:
+        quota_revocation(
+            quota_limiter.connection,
+            limiter.model_copy(update={"period": period}),
+            get_increase_quota_statement(configuration, limiter.shards),
+            get_reset_quota_statement(configuration, limiter.shards),
+        )
+
+    # the period has not been reached yet
+    revoke("-1 day")
+    assert shard_quotas(quota_limiter) == before
+
+    revoke("+1 day")
+    if quota_increase:
+        expected = {key: before[key] + value for key, value in expected.items()}
+    assert shard_quotas(quota_limiter) == expected
@@ -0,0 +1,63 @@
+"""Unit tests for the cache of subjects with exhausted quota."""
+
+from pytest_mock import MockerFixture
+
+from models.config import QuotaNegativeCacheConfiguration
+from quota.exhausted_subjects import ExhaustedSubjects, quota_revoked
+
+
+def test_exhausted_subject_cached() -> None:
+    """Test that exhausted subjects are cached with their available quota."""
+    cache = ExhaustedSubjects("u", QuotaNegativeCacheConfiguration())
+
+    assert cache.get("foo") is None
+    cache.add("foo", -10)
+    assert cache.get("foo") == -10
+    assert cache.get("bar") is None
+
+    cache.invalidate("foo")
+    assert cache.get("foo") is None
+    assert len(cache) == 0
+
+
+def test_exhausted_subject_expired(mocker: MockerFixture) -> None:
+    """Test that cached subjects expire."""
+    monotonic = mocker.patch("quota.exhausted_subjects.monotonic", return_value=100.0)
+    cache = ExhaustedSubjects("u", QuotaNegativeCacheConfiguration(ttl=5))
+    cache.add("foo", 0)
+
+    monotonic.return_value = 104.0
+    assert cache.get("foo") == 0
+    monotonic.return_value = 105.0
+    assert cache.get("foo") is None
+    assert len(cache) == 0
+
+
+def test_exhausted_subjects_invalidated_by_revocation() -> None:
+    """Test that revocation of quota invalidates subjects of its type only."""
+    users = ExhaustedSubjects("u", QuotaNegativeCacheConfiguration())
+    cluster = ExhaustedSubjects("c", QuotaNegativeCacheConfiguration())
+    users.add("foo", 0)
+    cluster.add("", 0)
+
+    quota_revoked("u")
+
+    assert users.get("foo") is None
+    assert cluster.get("") == 0
+    # subjects found exhausted after the revocation are cached again
+    users.add("foo", 0)
+    assert users.get("foo") == 0
+
+
+def test_exhausted_subjects_evicted() -> None:
+    """Test that the least recently refused subjects are evicted first."""
+    cache = ExhaustedSubjects("u", QuotaNegativeCacheConfiguration(max_entries=2))
+    cache.add("foo", 0)
+    cache.add("bar", 0)
+    cache.add("foo", -1)
+    cache.add("baz", 0)
+
+    assert len(cache) == 2
+    assert cache.get("bar") is None
+    assert cache.get("foo") == -1
+    assert cache.get("baz") == 0
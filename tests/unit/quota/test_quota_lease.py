@@ -0,0 +1,25 @@
+"""Unit tests for quota leased by workers."""
+
+from quota.quota_lease import QuotaLease, lease_size, new_lease
+
+
+def test_lease_size() -> None:
+    """Test that a part of the quota limit is leased at once."""
+    assert lease_size(1000, 0.1) == 100
+    assert lease_size(1001, 0.1) == 101
+    assert lease_size(0, 0.1) == 1
+
+
+def test_new_lease() -> None:
+    """Test that at most the available quota is leased."""
+    assert new_lease(1000, "now", 100) == QuotaLease(1000, "now", 100, used=False)
+    assert new_lease(50, "now", 100).granted == 50
+    assert new_lease(-10, "now", 100).granted == 0
+
+
+def test_lease_consumption() -> None:
+    """Test quota remaining in the lease."""
+    lease = QuotaLease(stored=1000, reset_at=None, granted=100, consumed=30)
+
+    assert lease.available == 970
+    assert lease.remaining == 70
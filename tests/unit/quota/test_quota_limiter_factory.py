@@ -213,6 +213,27 @@ def test_quota_limiters_cluster_quota_limiter_sqlite_storage() -> None:
     assert isinstance(limiters[0], ClusterQuotaLimiter)
 
 
+def test_quota_limiters_sharded_cluster_quota_limiter() -> None:
+    """Test the quota limiters creating when the cluster quota is split into shards."""
+    configuration = QuotaHandlersConfiguration(
+        sqlite=SQLiteDatabaseConfiguration(db_path=":memory:"),
+        limiters=[
+            QuotaLimiterConfiguration(
+                type="cluster_limiter",
+                name="foo",
+                initial_quota=100,
+                quota_increase=1,
+                period="5 days",
+                shards=4,
+            ),
+        ],
+    )  # pyright: ignore[reportCallIssue]
+    limiters = QuotaLimiterFactory.quota_limiters(configuration)
+    assert len(limiters) == 1
+    assert isinstance(limiters[0], ClusterQuotaLimiter)
+    assert limiters[0].shards == 4
+
+
 def test_quota_limiters_two_limiters(mocker: MockerFixture) -> None:
     """Test the quota limiters creating when two limiters are specified."""
     configuration = QuotaHandlersConfiguration()  # pyright: ignore[reportCallIssue]
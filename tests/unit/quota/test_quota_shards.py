@@ -0,0 +1,30 @@
+"""Unit tests for cluster quota split into shards."""
+
+import json
+
+from pytest_mock import MockerFixture
+
+from quota.quota_shards import shard_ids, shard_order, shard_parameters
+
+
+def test_shard_ids() -> None:
+    """Test that the first shard is stored in the row of the unsharded quota."""
+    assert shard_ids(1) == [""]
+    assert shard_ids(3) == ["", "1", "2"]
+
+
+def test_shard_order(mocker: MockerFixture) -> None:
+    """Test that shards are ordered starting by a randomly chosen one."""
+    mocker.patch("quota.quota_shards.randrange", return_value=2)
+    assert shard_order(4) == ["2", "3", "", "1"]
+
+    assert sorted(shard_order(4)) == ["", "1", "2", "3"]
+
+
+def test_shard_parameters() -> None:
+    """Test that the first shard gets the remainder of the split."""
+    parameters = shard_parameters(1001, 3)
+
+    assert (parameters["first"], parameters["share"]) == (335, 333)
+    assert json.loads(parameters["ids"]) == ["", "1", "2"]
+    assert shard_parameters(2, 3)["first"] == 2
@@ -0,0 +1,51 @@
+"""Unit tests for creation of the quota table."""
+
+import sqlite3
+
+from pytest_mock import MockerFixture
+
+from quota.quota_tables import create_quota_table
+from quota.sql import ADD_QUOTA_RESET_COLUMN_PG, CREATE_QUOTA_TABLE_PG
+
+OLD_QUOTA_TABLE = """
+    CREATE TABLE quota_limits (
+        id              text NOT NULL,
+        subject         char(1) NOT NULL,
+        quota_limit     int NOT NULL,
+        available       int,
+        updated_at      timestamp with time zone,
+        revoked_at      timestamp with time zone,
+        PRIMARY KEY(id, subject)
+    );
+    """
+
+
+def columns(connection: sqlite3.Connection) -> list[str]:
+    """Return names of the columns of the quota table."""
+    return [row[1] for row in connection.execute("PRAGMA table_info(quota_limits)")]
+
+
+def test_reset_column_added_to_old_sqlite_table() -> None:
+    """Test that quota table created by older version gets the reset column."""
+    connection = sqlite3.connect(":memory:")
+    connection.execute(OLD_QUOTA_TABLE)
+
+    create_quota_table(connection.cursor(), sqlite=True)
+    assert columns(connection)[-1] == "reset_at"
+
+    # the column is not added again
+    create_quota_table(connection.cursor(), sqlite=True)
+    assert columns(connection).count("reset_at") == 1
+    connection.close()
+
+
+def test_reset_column_added_to_postgres_table(mocker: MockerFixture) -> None:
+    """Test that PostgreSQL table gets the reset column if it does not exist."""
+    cursor = mocker.Mock()
+
+    create_quota_table(cursor, sqlite=False)
+
+    assert cursor.execute.call_args_list == [
+        mocker.call(CREATE_QUOTA_TABLE_PG),
+        mocker.call(ADD_QUOTA_RESET_COLUMN_PG),
+    ]
@@ -0,0 +1,187 @@
+"""Unit tests for TokenUsageHistory class."""
+
+import sqlite3
+from pathlib import Path
+from time import monotonic, sleep
+from typing import Optional
+
+import pytest
+from pydantic import SecretStr
+from pytest_mock import MockerFixture
+
+from models.config import (
+    PostgreSQLDatabaseConfiguration,
+    QuotaHandlersConfiguration,
+    SQLiteDatabaseConfiguration,
+    TokenHistoryBufferConfiguration,
+)
+from quota.sql import CONSUME_TOKENS_BATCH_PG
+from quota.token_usage_history import TokenUsageHistory
+from utils.postgres_pool import close_postgres_pools
+
+
+def create_token_usage_history(
+    buffer: Optional[TokenHistoryBufferConfiguration],
+) -> TokenUsageHistory:
+    """Create token usage history stored in in-memory SQLite database."""
+    configuration = QuotaHandlersConfiguration(
+        sqlite=SQLiteDatabaseConfiguration(db_path=":memory:"),
+        token_history_buffer=buffer,
+    )  # pyright: ignore[reportCallIssue]
+    return TokenUsageHistory(configuration)
+
+
+def stored_usage(history: TokenUsageHistory) -> list[tuple[str, str, str, int, int]]:
+    """Return token usage stored in the database."""
+    assert history.connection is not None
+    cursor = history.connection.cursor()
+    cursor.execute(
+        "SELECT user_id, provider, model, input_tokens, output_tokens "
+        "FROM token_usage ORDER BY user_id, model"
+    )
+    rows = cursor.fetchall()
+    cursor.close()
+    return rows
+
+
+def test_usage_written_by_request() -> None:
+    """Test that usage is written immediately without the buffer."""
+    history = create_token_usage_history(None)
+
+    history.consume_tokens("u1", "p1", "m1", 10, 20)
+    history.consume_tokens("u1", "p1", "m1", 1, 2)
+
+    assert stored_usage(history) == [("u1", "p1", "m1", 11, 22)]
+    assert history.buffer_flush is None
+
+
+def test_buffered_usage_written_by_flush(mocker: MockerFixture) -> None:
+    """Test that buffered usage is aggregated and written by one flush."""
+    record_lag = mocker.patch("quota.token_usage_history.record_token_usage_flush_lag")
+    history = create_token_usage_history(
+        TokenHistoryBufferConfiguration(flush_period=3600)
+    )
+    history.consume_tokens("u1", "p1", "m1", 10, 20)
+    history.consume_tokens("u1", "p1", "m1", 1, 2)
+    history.consume_tokens("u2", "p1", "m2", 5, 5)
+
+    assert not stored_usage(history)
+
+    history.flush()
+    history.consume_tokens("u1", "p1", "m1", 100, 0)
+    history.flush()
+
+    assert stored_usage(history) == [
+        ("u1", "p1", "m1", 111, 22),
+        ("u2", "p1", "m2", 5, 5),
+    ]
+    assert record_lag.call_count == 2
+    assert not history.buffer
+    history.close()
+
+
+def test_usage_kept_when_flush_fails(mocker: MockerFixture) -> None:
+    """Test that usage not written is kept in the buffer for the next flush."""
+    history = create_token_usage_history(
+        TokenHistoryBufferConfiguration(flush_period=3600)
+    )
+    history.consume_tokens("u1", "p1", "m1", 10, 20)
+    write = mocker.patch.object(
+        history,
+        "_write_buffer",
+        side_effect=[sqlite3.OperationalError("locked"), None],
+    )
+
+    with pytest.raises(sqlite3.OperationalError):
+        history.flush()
+    history.consume_tokens("u1", "p1", "m1", 1, 2)
+    history.flush()
+
+    assert write.call_args.args[0] == {("u1", "p1", "m1"): [11, 22]}
+    history.close()
+
+
+def test_full_buffer_triggers_flush(mocker: MockerFixture) -> None:
+    """Test that the buffer is flushed when the number of keys reaches the limit."""
+    history = create_token_usage_history(
+        TokenHistoryBufferConfiguration(flush_period=3600, max_keys=2)
+    )
+    assert history.buffer_flush is not None
+    trigger = mocker.patch.object(history.buffer_flush, "trigger")
+
+    history.consume_tokens("u1", "p1", "m1", 1, 1)
+    history.consume_tokens("u1", "p1", "m1", 1, 1)
+    trigger.assert_not_called()
+    history.consume_tokens("u2", "p1", "m1", 1, 1)
+    trigger.assert_called_once()
+    history.close()
+
+
+def test_buffer_written_by_flushing_thread(tmp_path: Path) -> None:
+    """Test that the flushing thread writes buffered usage to SQLite."""
+    db_path = str(tmp_path / "history.db")
+    configuration = QuotaHandlersConfiguration(
+        sqlite=SQLiteDatabaseConfiguration(db_path=db_path),
+        token_history_buffer=TokenHistoryBufferConfiguration(flush_period=1),
+    )  # pyright: ignore[reportCallIssue]
+    history = TokenUsageHistory(configuration)
+    history.consume_tokens("u1", "p1", "m1", 10, 20)
+
+    # the usage is read by other worker sharing the database
+    connection = sqlite3.connect(db_path)
+    deadline = monotonic() + 10
+    rows = []
+    while monotonic() < deadline:
+        rows = connection.execute(
+            "SELECT user_id, input_tokens, output_tokens FROM token_usage"
+        ).fetchall()
+        if rows:
+            break
+        sleep(0.1)
+    connection.close()
+
+    assert rows == [("u1", 10, 20)]
+    assert not history.buffer
+    history.close()
+
+
+def test_close_writes_buffer() -> None:
+    """Test that buffered usage is written on close."""
+    history = create_token_usage_history(
+        TokenHistoryBufferConfiguration(flush_period=3600)
+    )
+    history.consume_tokens("u1", "p1", "m1", 10, 20)
+
+    history.close()
+
+    assert history.buffer_flush is None
+    assert stored_usage(history) == [("u1", "p1", "m1", 10, 20)]
+
+
+def test_buffer_written_to_postgres_by_one_statement(mocker: MockerFixture) -> None:
+    """Test that buffered usage is written to PostgreSQL by one upsert."""
+    mocker.patch("psycopg2.connect")
+    execute_values = mocker.patch("quota.token_usage_history.execute_values")
+    configuration = QuotaHandlersConfiguration(
+        postgres=PostgreSQLDatabaseConfiguration(
+            db="db", user="user", password=SecretStr("password")
+        ),
+        token_history_buffer=TokenHistoryBufferConfiguration(flush_period=3600),
+    )  # pyright: ignore[reportCallIssue]
+    try:
+        history = TokenUsageHistory(configuration)
+        history.consume_tokens("u1", "p1", "m1", 10, 20)
+        history.consume_tokens("u2", "p1", "m1", 1, 2)
+
+        history.close()
+
+        execute_values.assert_called_once()
+        _, statement, rows = execute_values.call_args.args
+        assert statement == CONSUME_TOKENS_BATCH_PG
+        assert [row[:5] for row in rows] == [
+            ("u1", "p1", "m1", 10, 20),
+            ("u2", "p1", "m1", 1, 2),
+        ]
+        assert execute_values.call_args.kwargs["page_size"] == 2
+    finally:
+        close_postgres_pools()
@@ -1,14 +1,38 @@
 """Unit tests for UserQuotaLimiter class."""
 
+import sqlite3
+from pathlib import Path
+from time import monotonic, sleep
+from typing import Any
+
 import pytest
+from pydantic import SecretStr
+from pytest_mock import MockerFixture
 
 from models.config import (
+    PostgreSQLDatabaseConfiguration,
+    PostgreSQLReplicaConfiguration,
     QuotaHandlersConfiguration,
+    QuotaLeaseConfiguration,
     QuotaLimiterConfiguration,
+    QuotaNegativeCacheConfiguration,
+    QuotaReservationConfiguration,
     SQLiteDatabaseConfiguration,
 )
+from quota.cluster_quota_limiter import ClusterQuotaLimiter
+from quota.exhausted_subjects import quota_revoked
 from quota.quota_exceed_error import QuotaExceedError
+from quota.quota_limiter import QuotaLimiter, heartbeat_interval
+from quota.sql import (
+    INCREASE_QUOTA_STATEMENT_SQLITE,
+    RESET_QUOTA_STATEMENT_SQLITE,
+    SELECT_QUOTAS_PG,
+    UPDATE_AVAILABLE_QUOTA_SQLITE,
+)
 from quota.user_quota_limiter import UserQuotaLimiter
+from runners.quota_scheduler import increase_quota, reclaim_reservations, reset_quota
+from utils.postgres_pool import close_postgres_pools
+from utils.read_replicas import clear_user_writes
 
 # pylint: disable=protected-access
 
@@ -44,6 +68,28 @@ def test_connected() -> None:
     assert quota_limiter.connected()
 
 
+def test_ping() -> None:
+    """Test the ping method."""
+    quota_limiter = create_quota_limiter("foo", 1000, 100)
+    quota_limiter.ping()
+    # heartbeat is never used for SQLite storage
+    assert quota_limiter.heartbeat is None
+
+
+def test_heartbeat_interval() -> None:
+    """Test that heartbeat is used for PostgreSQL storage only."""
+    configuration = QuotaHandlersConfiguration()  # pyright: ignore[reportCallIssue]
+    assert heartbeat_interval(configuration) is None
+
+    configuration.postgres = PostgreSQLDatabaseConfiguration(
+        db="db", user="user", password=SecretStr("password"), heartbeat_interval=30
+    )  # pyright: ignore[reportCallIssue]
+    assert heartbeat_interval(configuration) == 30
+
+    configuration.sqlite = SQLiteDatabaseConfiguration(db_path=":memory:")
+    assert heartbeat_interval(configuration) is None
+
+
 def test_init_quota() -> None:
     """Test the init quota operation."""
     initial_quota = 1000
@@ -178,3 +224,406 @@ def test_revoke_quota() -> None:
     quota_limiter.revoke_quota("foo")
     available_quota = quota_limiter.available_quota("foo")
     assert available_quota == initial_quota
+
+
+def test_available_quota_from_read_replica(mocker: MockerFixture) -> None:
+    """Test that quota is read from replica unless the user changed it recently."""
+    clear_user_writes()
+
+    def connect(**kwargs: Any) -> Any:
+        connection = mocker.MagicMock()
+        if kwargs["host"] == "replica":
+            cursor = connection.cursor.return_value.__enter__.return_value
+            # replication lag check, quota of the user, missing quota
+            cursor.fetchone.side_effect = [(0.0,), (42,), None]
+        else:
+            connection.cursor.return_value.fetchone.return_value = (7,)
+        return connection
+
+    mocker.patch("psycopg2.connect", side_effect=connect)
+    configuration = QuotaHandlersConfiguration()  # pyright: ignore[reportCallIssue]
+    configuration.postgres = PostgreSQLDatabaseConfiguration(
+        db="db",
+        user="user",
+        password=SecretStr("password"),
+        replicas=[PostgreSQLReplicaConfiguration(host="replica")],
+    )  # pyright: ignore[reportCallIssue]
+    try:
+        quota_limiter = UserQuotaLimiter(configuration, 1000, 1)
+        assert quota_limiter.available_quota("foo") == 42
+
+        # reads following a write of the user are served by the primary
+        quota_limiter.consume_tokens(1, 1, "foo")
+        assert quota_limiter.available_quota("foo") == 7
+
+        # quota of a new user is initialized in the primary database
+        assert quota_limiter.available_quota("bar") == 7
+    finally:
+        clear_user_writes()
+        close_postgres_pools()
+
+
+def test_available_quotas_read_from_postgres(mocker: MockerFixture) -> None:
+    """Test that quota of limiters sharing PostgreSQL is read by one query."""
+    connection = mocker.MagicMock()
+    cursor = connection.cursor.return_value.__enter__.return_value
+    cursor.fetchall.return_value = [("foo", "u", 42), ("", "c", 7)]
+    mocker.patch("psycopg2.connect", return_value=connection)
+    configuration = QuotaHandlersConfiguration(
+        postgres=PostgreSQLDatabaseConfiguration(
+            db="db", user="user", password=SecretStr("password")
+        )
+    )  # pyright: ignore[reportCallIssue]
+    try:
+        quota_limiters: list[QuotaLimiter] = [
+            UserQuotaLimiter(configuration, 1000, 1),
+            ClusterQuotaLimiter(configuration, 1000, 1),
+        ]
+        assert quota_limiters[0].shared_storage() is quota_limiters[1].shared_storage()
+
+        assert QuotaLimiter.available_quotas(quota_limiters, "foo") == [42, 7]
+        cursor.execute.assert_called_with(
+            SELECT_QUOTAS_PG, ((("foo", "u"), ("", "c")),)
+        )
+
+        # quota not stored yet is left to the limiters to initialize it
+        cursor.fetchall.return_value = [("", "c", 7)]
+        assert QuotaLimiter.available_quotas(quota_limiters, "bar") == [None, 7]
+    finally:
+        close_postgres_pools()
+
+
+def create_leasing_quota_limiter(initial_quota: int) -> UserQuotaLimiter:
+    """Create new quota limiter instance leasing 10% of the quota."""
+    configuration = QuotaHandlersConfiguration(
+        sqlite=SQLiteDatabaseConfiguration(db_path=":memory:"),
+        lease=QuotaLeaseConfiguration(fraction=0.1, sync_period=3600),
+    )  # pyright: ignore[reportCallIssue]
+    return UserQuotaLimiter(configuration, initial_quota, 1)
+
+
+def test_leased_quota_consumed_locally() -> None:
+    """Test that tokens consumed from the lease are written on synchronization."""
+    quota_limiter = create_leasing_quota_limiter(1000)
+
+    quota_limiter.ensure_available_quota("foo")
+    quota_limiter.consume_tokens(10, 20, "foo")
+
+    assert quota_limiter.available_quota("foo") == 970
+    assert quota_limiter._available_quota("foo") == 1000
+    assert quota_limiter.leases["foo"].remaining == 70
+
+    quota_limiter.sync_leases()
+
+    assert quota_limiter._available_quota("foo") == 970
+    assert quota_limiter.leases["foo"].remaining == 100
+    quota_limiter.close()
+
+
+def test_leases_synchronized_by_background_thread(tmp_path: Path) -> None:
+    """Test that the synchronization thread writes consumed tokens to SQLite."""
+    db_path = str(tmp_path / "quota.db")
+    configuration = QuotaHandlersConfiguration(
+        sqlite=SQLiteDatabaseConfiguration(db_path=db_path),
+        lease=QuotaLeaseConfiguration(fraction=0.1, sync_period=1),
+    )  # pyright: ignore[reportCallIssue]
+    quota_limiter = UserQuotaLimiter(configuration, 1000, 1)
+    quota_limiter.ensure_available_quota("foo")
+    quota_limiter.consume_tokens(10, 20, "foo")
+
+    # the quota is read by other worker sharing the database
+    connection = sqlite3.connect(db_path)
+    deadline = monotonic() + 10
+    available = None
+    while monotonic() < deadline:
+        available = connection.execute(
+            "SELECT available FROM quota_limits WHERE id='foo'"
+        ).fetchone()[0]
+        if available == 970:
+            break
+        sleep(0.1)
+    connection.close()
+
+    assert available == 970
+    quota_limiter.close()
+
+
+def test_exhausted_lease_renewed() -> None:
+    """Test that exhausted lease is renewed by the quota check."""
+    quota_limiter = create_leasing_quota_limiter(1000)
+
+    quota_limiter.ensure_available_quota("foo")
+    quota_limiter.consume_tokens(60, 60, "foo")
+    # quota consumed by other worker
+    quota_limiter._consume_tokens(UPDATE_AVAILABLE_QUOTA_SQLITE, 0, 800, "foo")
+
+    quota_limiter.ensure_available_quota("foo")
+
+    assert quota_limiter._available_quota("foo") == 80
+    assert quota_limiter.leases["foo"].remaining == 80
+
+    quota_limiter.consume_tokens(0, 100, "foo")
+    with pytest.raises(QuotaExceedError):
+        quota_limiter.ensure_available_quota("foo")
+    assert quota_limiter._available_quota("foo") == -20
+    quota_limiter.close()
+
+
+def test_lease_without_quota() -> None:
+    """Test that nothing is leased when no quota is available."""
+    quota_limiter = create_leasing_quota_limiter(0)
+
+    with pytest.raises(QuotaExceedError, match="User foo has no available tokens"):
+        quota_limiter.ensure_available_quota("foo")
+    quota_limiter.close()
+
+
+def test_tokens_consumed_before_revocation_not_charged() -> None:
+    """Test that revoked quota is not charged by tokens consumed before."""
+    quota_limiter = create_leasing_quota_limiter(1000)
+    quota_limiter.consume_tokens(0, 50, "foo")
+
+    quota_limiter.revoke_quota("foo")
+    quota_limiter.sync_leases()
+
+    assert quota_limiter._available_quota("foo") == 1000
+    assert quota_limiter.available_quota("foo") == 1000
+    quota_limiter.close()
+
+
+def test_tokens_consumed_before_increase_charged() -> None:
+    """Test that tokens consumed from lease are charged after quota increase."""
+    quota_limiter = create_leasing_quota_limiter(1000)
+    quota_limiter.consume_tokens(0, 50, "foo")
+
+    # the period of the quota scheduler has been reached
+    increase_quota(
+        quota_limiter.connection, INCREASE_QUOTA_STATEMENT_SQLITE, "u", 100, "+1 day"
+    )
+    quota_limiter.sync_leases()
+
+    assert quota_limiter._available_quota("foo") == 1050
+    quota_limiter.close()
+
+
+def test_tokens_consumed_before_scheduled_reset_not_charged() -> None:
+    """Test that quota reset by the scheduler is not charged by leased tokens."""
+    quota_limiter = create_leasing_quota_limiter(1000)
+    quota_limiter.consume_tokens(0, 50, "foo")
+
+    reset_quota(
+        quota_limiter.connection, RESET_QUOTA_STATEMENT_SQLITE, "u", 2000, "+1 day"
+    )
+    quota_limiter.sync_leases()
+
+    assert quota_limiter._available_quota("foo") == 2000
+    quota_limiter.close()
+
+
+def test_unused_leases_dropped() -> None:
+    """Test that leases not used since the last synchronization are dropped."""
+    quota_limiter = create_leasing_quota_limiter(1000)
+    quota_limiter.ensure_available_quota("foo")
+    quota_limiter.ensure_available_quota("bar")
+
+    quota_limiter.sync_leases()
+    quota_limiter.ensure_available_quota("foo")
+    quota_limiter.sync_leases()
+
+    assert list(quota_limiter.leases) == ["foo"]
+    quota_limiter.close()
+
+
+def test_close_writes_consumed_tokens() -> None:
+    """Test that tokens consumed from leases are written on close."""
+    quota_limiter = create_leasing_quota_limiter(1000)
+    assert quota_limiter.lease_sync is not None
+    quota_limiter.consume_tokens(1, 2, "foo")
+
+    quota_limiter.close()
+
+    assert quota_limiter.lease_sync is None
+    assert quota_limiter._available_quota("foo") == 997
+
+
+def create_reserving_quota_limiter(initial_quota: int) -> UserQuotaLimiter:
+    """Create new quota limiter instance reserving tokens for requests."""
+    configuration = QuotaHandlersConfiguration(
+        sqlite=SQLiteDatabaseConfiguration(db_path=":memory:"),
+        reservation=QuotaReservationConfiguration(output_tokens=100, timeout=60),
+    )  # pyright: ignore[reportCallIssue]
+    return UserQuotaLimiter(configuration, initial_quota, 1)
+
+
+def test_reserve_and_settle_tokens() -> None:
+    """Test that reserved tokens are replaced by the consumed ones."""
+    quota_limiter = create_reserving_quota_limiter(1000)
+
+    reservation = quota_limiter.reserve_tokens(200, "foo")
+
+    assert reservation is not None
+    assert (reservation.subject_id, reservation.tokens) == ("foo", 200)
+    assert quota_limiter.available_quota("foo") == 800
+
+    quota_limiter.settle_tokens(reservation, input_tokens=10, output_tokens=20)
+
+    assert quota_limiter.available_quota("foo") == 970
+    # settling the reservation again does nothing
+    quota_limiter.settle_tokens(reservation, input_tokens=10, output_tokens=20)
+    quota_limiter.settle_tokens(reservation, input_tokens=0, output_tokens=0)
+    assert quota_limiter.available_quota("foo") == 970
+
+
+def test_reserve_tokens_quota_exceeded(mocker: MockerFixture) -> None:
+    """Test that tokens are not reserved when the quota is not sufficient."""
+    quota_limiter = create_reserving_quota_limiter(150)
+    trace = mocker.patch("quota.revokable_quota_limiter.exceeded_trace")
+
+    assert quota_limiter.reserve_tokens(100, "foo") is not None
+    with pytest.raises(
+        QuotaExceedError, match="User foo has 50 tokens, but 100"
+    ) as exc_info:
+        quota_limiter.reserve_tokens(100, "foo")
+    # the stack trace of repeated refusals is rate limited
+    trace.error.assert_called_once_with(
+        exc_info.value, "Quota exceed: %s", exc_info.value
+    )
+
+    assert quota_limiter.available_quota("foo") == 50
+
+
+def test_reservation_not_refunded_after_revocation() -> None:
+    """Test that tokens reserved before revocation are not returned."""
+    quota_limiter = create_reserving_quota_limiter(1000)
+    reservation = quota_limiter.reserve_tokens(200, "foo")
+    assert reservation is not None
+
+    # timestamps are compared with millisecond precision in SQLite
+    sleep(0.01)
+    quota_limiter.revoke_quota("foo")
+    quota_limiter.settle_tokens(reservation, input_tokens=10, output_tokens=20)
+
+    assert quota_limiter.available_quota("foo") == 970
+
+
+def test_reservation_refunded_after_increase() -> None:
+    """Test that tokens reserved before quota increase are returned."""
+    quota_limiter = create_reserving_quota_limiter(1000)
+    reservation = quota_limiter.reserve_tokens(200, "foo")
+    assert reservation is not None
+    assert quota_limiter.reserve_tokens(300, "foo") is not None
+
+    # timestamps are compared with millisecond precision in SQLite
+    sleep(0.01)
+    increase_quota(
+        quota_limiter.connection, INCREASE_QUOTA_STATEMENT_SQLITE, "u", 100, "+1 day"
+    )
+    quota_limiter.settle_tokens(reservation, input_tokens=10, output_tokens=20)
+    assert quota_limiter.available_quota("foo") == 770
+
+    # the other reservation is reclaimed by the scheduler
+    configuration = QuotaHandlersConfiguration(
+        sqlite=SQLiteDatabaseConfiguration(db_path=":memory:")
+    )  # pyright: ignore[reportCallIssue]
+    reclaim_reservations(configuration, quota_limiter.connection, -1)
+    assert quota_limiter.available_quota("foo") == 1070
+
+
+def test_expired_reservations_reclaimed() -> None:
+    """Test that the scheduler returns tokens of reservations not settled."""
+    quota_limiter = create_reserving_quota_limiter(1000)
+    reservation = quota_limiter.reserve_tokens(200, "foo")
+    assert reservation is not None
+    assert quota_limiter.reserve_tokens(300, "bar") is not None
+    # only the storage backend is read by the scheduler
+    configuration = QuotaHandlersConfiguration(
+        sqlite=SQLiteDatabaseConfiguration(db_path=":memory:")
+    )  # pyright: ignore[reportCallIssue]
+
+    # reservations are not reclaimed before their timeout
+    reclaim_reservations(configuration, quota_limiter.connection, 60)
+    assert quota_limiter.available_quota("foo") == 800
+
+    reclaim_reservations(configuration, quota_limiter.connection, -1)
+    assert quota_limiter.available_quota("foo") == 1000
+    assert quota_limiter.available_quota("bar") == 1000
+
+    # tokens of the reclaimed reservation are consumed only
+    quota_limiter.settle_tokens(reservation, input_tokens=10, output_tokens=20)
+    assert quota_limiter.available_quota("foo") == 970
+
+
+def test_settled_reservations_not_reclaimed() -> None:
+    """Test that the scheduler keeps settled reservations to ignore resettling."""
+    quota_limiter = create_reserving_quota_limiter(1000)
+    reservation = quota_limiter.reserve_tokens(200, "foo")
+    assert reservation is not None
+    quota_limiter.settle_tokens(reservation, input_tokens=10, output_tokens=20)
+    configuration = QuotaHandlersConfiguration(
+        sqlite=SQLiteDatabaseConfiguration(db_path=":memory:")
+    )  # pyright: ignore[reportCallIssue]
+
+    reclaim_reservations(configuration, quota_limiter.connection, -1)
+    assert quota_limiter.available_quota("foo") == 970
+
+    quota_limiter.settle_tokens(reservation, input_tokens=10, output_tokens=20)
+    assert quota_limiter.available_quota("foo") == 970
+
+
+def test_reservations_not_used_with_lease() -> None:
+    """Test that leased quota is checked without reserving tokens."""
+    configuration = QuotaHandlersConfiguration(
+        sqlite=SQLiteDatabaseConfiguration(db_path=":memory:"),
+        lease=QuotaLeaseConfiguration(fraction=0.1, sync_period=3600),
+        reservation=QuotaReservationConfiguration(),
+    )  # pyright: ignore[reportCallIssue]
+    quota_limiter = UserQuotaLimiter(configuration, 1000, 1)
+
+    assert quota_limiter.reserve_tokens(200, "foo") is None
+    quota_limiter.close()
+
+
+def create_caching_quota_limiter(initial_quota: int) -> UserQuotaLimiter:
+    """Create new quota limiter instance caching users with exhausted quota."""
+    configuration = QuotaHandlersConfiguration(
+        sqlite=SQLiteDatabaseConfiguration(db_path=":memory:"),
+        negative_cache=QuotaNegativeCacheConfiguration(ttl=60),
+    )  # pyright: ignore[reportCallIssue]
+    return UserQuotaLimiter(configuration, initial_quota, 1)
+
+
+def test_exhausted_quota_refused_from_cache(mocker: MockerFixture) -> None:
+    """Test that user with exhausted quota is refused without database access."""
+    quota_limiter = create_caching_quota_limiter(100)
+    quota_limiter.ensure_not_exhausted("foo")
+    quota_limiter.ensure_available_quota("foo")
+    quota_limiter.consume_tokens(60, 40, "foo")
+    with pytest.raises(QuotaExceedError):
+        quota_limiter.ensure_available_quota("foo")
+    read = mocker.spy(quota_limiter, "_available_quota")
+
+    with pytest.raises(QuotaExceedError, match="User foo has no available tokens"):
+        quota_limiter.ensure_not_exhausted("foo")
+
+    assert read.call_count == 0
+    # other users are not refused
+    quota_limiter.ensure_not_exhausted("bar")
+
+
+def test_cached_user_invalidated_by_quota_change() -> None:
+    """Test that user is not refused from cache once the quota is changed."""
+    quota_limiter = create_caching_quota_limiter(100)
+    for subject_id in ("foo", "bar"):
+        quota_limiter.ensure_available_quota(subject_id)
+        quota_limiter.consume_tokens(60, 40, subject_id)
+        with pytest.raises(QuotaExceedError):
+            quota_limiter.ensure_available_quota(subject_id)
+
+    quota_limiter.revoke_quota("foo")
+    quota_limiter.ensure_not_exhausted("foo")
+    with pytest.raises(QuotaExceedError):
+        quota_limiter.ensure_not_exhausted("bar")
+
+    # quota changed by the quota scheduler
+    quota_revoked("u")
+    quota_limiter.ensure_not_exhausted("bar")
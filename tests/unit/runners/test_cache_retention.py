@@ -0,0 +1,215 @@
+"""Unit tests for the cache retention sweeper runner."""
+
+from pathlib import Path
+
+import pytest
+from pydantic import SecretStr
+from pytest_mock import MockerFixture
+
+import constants
+from models.config import (
+    ConversationHistoryConfiguration,
+    ConversationRetentionConfiguration,
+    PostgreSQLDatabaseConfiguration,
+    PostgreSQLShardConfiguration,
+    SQLiteDatabaseConfiguration,
+)
+from quota.sql import TRY_QUOTA_SCHEDULER_LOCK_PG
+from runners.cache_retention import (
+    _shard_cache_configurations,
+    cache_retention_sweeper,
+    elect_sweeper,
+    start_cache_retention_sweeper,
+    sweep,
+)
+
+
+def _config(
+    tmp_path: Path, retention: ConversationRetentionConfiguration | None
+) -> ConversationHistoryConfiguration:
+    """Return SQLite cache configuration with the given retention policy."""
+    return ConversationHistoryConfiguration(
+        type=constants.CACHE_TYPE_SQLITE,
+        sqlite=SQLiteDatabaseConfiguration(db_path=str(tmp_path / "cache.db")),
+        retention=retention,
+    )  # pyright: ignore[reportCallIssue]
+
+
+def test_sweeper_not_configured(tmp_path: Path) -> None:
+    """Test that the sweeper does not start without retention policy."""
+    assert cache_retention_sweeper(_config(tmp_path, None)) is False
+
+
+def test_sweeper_cache_can_not_be_created(
+    tmp_path: Path, mocker: MockerFixture
+) -> None:
+    """Test that the sweeper does not start when the cache can not be created."""
+    mocker.patch(
+        "runners.cache_retention.CacheFactory.conversation_cache",
+        side_effect=ValueError("error"),
+    )
+    config = _config(tmp_path, ConversationRetentionConfiguration(max_age=10))
+    assert cache_retention_sweeper(config) is False
+
+
+def test_only_elected_sweeper_deletes_rows(
+    tmp_path: Path, mocker: MockerFixture
+) -> None:
+    """Test that read-through caches are invalidated after every period."""
+    mocker.patch(
+        "runners.cache_retention.elect_sweeper",
+        side_effect=[(None, False), (None, True)],
+    )
+    swept = mocker.patch("runners.cache_retention.sweep")
+    invalidate = mocker.patch("runners.cache_retention.invalidate_read_through_caches")
+    # the third period is not started
+    mocker.patch("runners.cache_retention.sleep", side_effect=[None, InterruptedError])
+    config = _config(tmp_path, ConversationRetentionConfiguration(max_age=10))
+
+    with pytest.raises(InterruptedError):
+        cache_retention_sweeper(config)
+
+    swept.assert_called_once()
+    assert invalidate.call_count == 2
+
+
+def test_sqlite_sweeper_elected_by_lease(tmp_path: Path) -> None:
+    """Test that one sweeper sharing SQLite database holds the lease."""
+    config = _config(tmp_path, ConversationRetentionConfiguration(max_age=10))
+
+    first, elected = elect_sweeper(config, None, "first", False)
+    assert elected
+    second, elected = elect_sweeper(config, None, "second", False)
+    assert not elected
+    assert elect_sweeper(config, first, "first", True) == (first, True)
+
+    # the lease is not shared with the quota scheduler
+    rows = first.execute("SELECT name, holder FROM quota_scheduler_lease").fetchall()
+    assert rows == [(constants.CACHE_RETENTION_LEASE_NAME, "first")]
+    first.close()
+    second.close()
+
+
+def test_postgres_sweeper_elected_by_advisory_lock(mocker: MockerFixture) -> None:
+    """Test that PostgreSQL sweeper tries its own advisory lock."""
+    connection = mocker.Mock()
+    connection.cursor.return_value.fetchone.return_value = (True,)
+    connect_pg = mocker.patch(
+        "runners.cache_retention.connect_pg", return_value=connection
+    )
+    config = ConversationHistoryConfiguration(
+        type=constants.CACHE_TYPE_POSTGRES,
+        postgres=PostgreSQLDatabaseConfiguration(
+            db="cache", user="user", password=SecretStr("password")
+        ),
+        retention=ConversationRetentionConfiguration(max_age=10),
+    )  # pyright: ignore[reportCallIssue]
+
+    assert elect_sweeper(config, None, "holder", False) == (connection, True)
+
+    connect_pg.assert_called_once_with(config.postgres)
+    connection.cursor.return_value.execute.assert_called_with(
+        TRY_QUOTA_SCHEDULER_LOCK_PG, (constants.CACHE_RETENTION_ADVISORY_LOCK_ID,)
+    )
+
+
+def test_election_error_skips_sweep(tmp_path: Path, mocker: MockerFixture) -> None:
+    """Test that the sweeper is not elected when the database is unavailable."""
+    mocker.patch("runners.cache_retention.connect_sqlite", side_effect=OSError("error"))
+    config = _config(tmp_path, ConversationRetentionConfiguration(max_age=10))
+
+    assert elect_sweeper(config, None, "holder", True) == (None, False)
+
+
+def test_sweep_records_metrics(mocker: MockerFixture) -> None:
+    """Test that one sweep deletes rows and publishes metrics."""
+    cache = mocker.Mock()
+    cache.apply_retention.return_value = {"cache": 3}
+    cache.table_sizes.return_value = {"cache": 7}
+    record = mocker.patch("runners.cache_retention.record_cache_retention")
+    retention = ConversationRetentionConfiguration(max_age=10)
+
+    sweep([cache], retention)
+
+    cache.apply_retention.assert_called_once_with(retention)
+    record.assert_called_once_with({"cache": 3}, {"cache": 7})
+
+
+def test_sweep_error_is_logged(mocker: MockerFixture) -> None:
+    """Test that sweep errors do not stop the sweeper."""
+    cache = mocker.Mock()
+    cache.apply_retention.side_effect = RuntimeError("error")
+    record = mocker.patch("runners.cache_retention.record_cache_retention")
+
+    sweep([cache], ConversationRetentionConfiguration(max_age=10))
+
+    record.assert_not_called()
+
+
+def test_sweep_shards(mocker: MockerFixture) -> None:
+    """Test that metrics of all shards are summed up."""
+    first, second, broken = mocker.Mock(), mocker.Mock(), mocker.Mock()
+    first.apply_retention.return_value = {"cache": 3}
+    first.table_sizes.return_value = {"cache": 7, "conversations": 1}
+    second.apply_retention.return_value = {"cache": 1}
+    second.table_sizes.return_value = {"cache": 2, "conversations": 1}
+    broken.apply_retention.side_effect = RuntimeError("error")
+    record = mocker.patch("runners.cache_retention.record_cache_retention")
+    retention = ConversationRetentionConfiguration(max_age=10)
+
+    sweep([first, second], retention)
+    record.assert_called_once_with({"cache": 4}, {"cache": 9, "conversations": 2})
+
+    # sizes of the cache are not known when a shard fails
+    record.reset_mock()
+    sweep([first, broken], retention)
+    record.assert_called_once_with({"cache": 3}, {})
+
+
+def test_shard_cache_configurations() -> None:
+    """Test that every shard of PostgreSQL cache is swept."""
+    postgres = PostgreSQLDatabaseConfiguration(
+        db="cache",
+        user="user",
+        password=SecretStr("password"),
+        shards=[
+            PostgreSQLShardConfiguration(name="a", host="a", db="cache_a"),
+            PostgreSQLShardConfiguration(name="b", host="b", db="cache_b"),
+        ],
+    )  # pyright: ignore[reportCallIssue]
+    config = ConversationHistoryConfiguration(
+        type=constants.CACHE_TYPE_POSTGRES, postgres=postgres
+    )  # pyright: ignore[reportCallIssue]
+
+    shards = _shard_cache_configurations(config)
+
+    assert [(c.postgres.host, c.postgres.db) for c in shards if c.postgres] == [
+        ("a", "cache_a"),
+        ("b", "cache_b"),
+    ]
+    assert all(c.type == constants.CACHE_TYPE_POSTGRES for c in shards)
+    unsharded = config.model_copy(
+        update={"postgres": postgres.model_copy(update={"shards": []})}
+    )
+    assert _shard_cache_configurations(unsharded) == [unsharded]
+
+
+def test_start_cache_retention_sweeper(tmp_path: Path, mocker: MockerFixture) -> None:
+    """Test that the sweeper thread is started only when configured."""
+    thread = mocker.patch("runners.cache_retention.Thread")
+    configuration = mocker.Mock()
+
+    configuration.conversation_cache = _config(tmp_path, None)
+    start_cache_retention_sweeper(configuration)
+    thread.assert_not_called()
+
+    configuration.conversation_cache = _config(
+        tmp_path, ConversationRetentionConfiguration(max_age=10)
+    )
+    start_cache_retention_sweeper(configuration)
+    thread.assert_called_once_with(
+        target=cache_retention_sweeper,
+        daemon=True,
+        args=(configuration.conversation_cache,),
+    )
+    thread.return_value.start.assert_called_once()
@@ -0,0 +1,156 @@
+"""Unit tests for the quota scheduler runner."""
+
+from pathlib import Path
+from typing import Any
+
+from pydantic import SecretStr
+from pytest_mock import MockerFixture
+
+import constants
+from models.config import (
+    PostgreSQLDatabaseConfiguration,
+    QuotaHandlersConfiguration,
+    QuotaLimiterConfiguration,
+    QuotaSchedulerConfiguration,
+    SQLiteDatabaseConfiguration,
+)
+from quota.sql import SELECT_QUOTA_CHUNK_END_SQLITE, TRY_QUOTA_SCHEDULER_LOCK_PG
+from runners.quota_scheduler import (
+    connect,
+    elect_scheduler,
+    get_increase_quota_statement,
+    get_quota_chunk_statement,
+    get_reset_quota_statement,
+    init_quota_tables,
+    lease_duration,
+    quota_revocation,
+    quota_sync,
+)
+
+
+def _config(tmp_path: Path) -> QuotaHandlersConfiguration:
+    """Return configuration of user quota stored in SQLite database."""
+    return QuotaHandlersConfiguration(
+        sqlite=SQLiteDatabaseConfiguration(db_path=str(tmp_path / "quota.db")),
+        limiters=[
+            QuotaLimiterConfiguration(
+                type="user_limiter",
+                name="user_monthly_limits",
+                initial_quota=100,
+                quota_increase=0,
+                period="+1 day",
+            ),
+        ],
+        scheduler=QuotaSchedulerConfiguration(chunk_size=2),
+    )  # pyright: ignore[reportCallIssue]
+
+
+def _connect(config: QuotaHandlersConfiguration) -> Any:
+    """Connect to the quota database and create the tables."""
+    connection = connect(config)
+    init_quota_tables(config, connection)
+    return connection
+
+
+def test_quota_reset_by_chunks(tmp_path: Path) -> None:
+    """Test that quota of all users is reset by statements updating chunks."""
+    config = _config(tmp_path)
+    connection = _connect(config)
+    connection.executemany(
+        "INSERT INTO quota_limits (id, subject, quota_limit, available, revoked_at) "
+        "VALUES (?, 'u', 100, 0, datetime('now', '-2 days'))",
+        [(f"user{index}",) for index in range(5)],
+    )
+    statements: list[str] = []
+    connection.set_trace_callback(statements.append)
+
+    quota_revocation(
+        connection,
+        config.limiters[0],
+        get_increase_quota_statement(config),
+        get_reset_quota_statement(config),
+        get_quota_chunk_statement(config),
+        config.scheduler.chunk_size,
+    )
+
+    # five users are increased (by zero) and reset by chunks of two users
+    updates = [s for s in statements if s.lstrip().startswith("UPDATE")]
+    assert len(updates) == 6
+    rows = connection.execute("SELECT id, available FROM quota_limits").fetchall()
+    assert sorted(rows) == [(f"user{index}", 100) for index in range(5)]
+    connection.close()
+
+
+def test_chunk_end_selected() -> None:
+    """Test that the chunk statement is selected by the storage backend."""
+    config = QuotaHandlersConfiguration(
+        sqlite=SQLiteDatabaseConfiguration(db_path=":memory:")
+    )  # pyright: ignore[reportCallIssue]
+    assert get_quota_chunk_statement(config) == SELECT_QUOTA_CHUNK_END_SQLITE
+
+
+def test_sqlite_scheduler_elected_by_lease(tmp_path: Path) -> None:
+    """Test that one scheduler sharing SQLite database holds the lease."""
+    config = _config(tmp_path)
+    first = _connect(config)
+    second = _connect(config)
+
+    assert elect_scheduler(config, first, "first", False)
+    assert not elect_scheduler(config, second, "second", False)
+    # the lease is renewed by its holder
+    assert elect_scheduler(config, first, "first", True)
+
+    # the expired lease is taken over
+    first.execute(
+        "UPDATE quota_scheduler_lease SET expires_at=datetime('now', '-1 seconds')"
+    )
+    assert elect_scheduler(config, second, "second", False)
+    assert not elect_scheduler(config, first, "first", True)
+    first.close()
+    second.close()
+
+
+def test_lease_duration() -> None:
+    """Test that the lease outlives two scheduler periods."""
+    assert lease_duration(1) == constants.QUOTA_SCHEDULER_MIN_LEASE_DURATION
+    assert lease_duration(3600) == 7200
+
+
+def test_postgres_scheduler_elected_by_advisory_lock(mocker: MockerFixture) -> None:
+    """Test that PostgreSQL scheduler tries the advisory lock until elected."""
+    config = QuotaHandlersConfiguration(
+        postgres=PostgreSQLDatabaseConfiguration(
+            db="quota", user="user", password=SecretStr("password")
+        )
+    )  # pyright: ignore[reportCallIssue]
+    connection = mocker.Mock()
+    cursor = connection.cursor.return_value
+    cursor.fetchone.return_value = (False,)
+
+    assert not elect_scheduler(config, connection, "holder", False)
+    cursor.fetchone.return_value = (True,)
+    assert elect_scheduler(config, connection, "holder", False)
+    # the lock is held by the session, it is not acquired again
+    assert elect_scheduler(config, connection, "holder", True)
+
+    cursor.execute.assert_called_with(
+        TRY_QUOTA_SCHEDULER_LOCK_PG, (constants.QUOTA_SCHEDULER_ADVISORY_LOCK_ID,)
+    )
+    assert cursor.execute.call_count == 2
+
+
+def test_successful_sync_recorded(tmp_path: Path, mocker: MockerFixture) -> None:
+    """Test that only the run applying all limiters is recorded in metrics."""
+    config = _config(tmp_path)
+    connection = _connect(config)
+    record = mocker.patch("runners.quota_scheduler.record_quota_scheduler_run")
+
+    quota_sync(config, connection)
+    record.assert_called_once_with()
+
+    mocker.patch(
+        "runners.quota_scheduler.quota_revocation", side_effect=ValueError("error")
+    )
+    quota_sync(config, connection)
+    record.assert_called_once_with()
+    connection.close()
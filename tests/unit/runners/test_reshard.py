@@ -0,0 +1,155 @@
+"""Unit tests for the offline resharding tool."""
+
+from typing import Any
+
+import pytest
+from pydantic import SecretStr
+from pytest_mock import MockerFixture, MockType
+
+import constants
+from configuration import AppConfig
+from models.config import (
+    PostgreSQLDatabaseConfiguration,
+    PostgreSQLShardConfiguration,
+)
+from runners.reshard import (
+    CACHE_TABLES,
+    DATABASE_TABLES,
+    move_user,
+    reshard,
+    reshard_storages,
+)
+from utils.shards import shard_index
+
+
+def _config(**kwargs: Any) -> PostgreSQLDatabaseConfiguration:
+    """Return PostgreSQL configuration with two shards."""
+    kwargs.setdefault(
+        "shards",
+        [
+            PostgreSQLShardConfiguration(name="a", host="a", db="db_a"),
+            PostgreSQLShardConfiguration(name="b", host="b", db="db_b"),
+        ],
+    )
+    return PostgreSQLDatabaseConfiguration(
+        db="database", user="user", password=SecretStr("password"), **kwargs
+    )  # pyright: ignore[reportCallIssue]
+
+
+def _engine(mocker: MockerFixture, users: list[str]) -> MockType:
+    """Return mocked engine of a database storing conversations of users."""
+    engine = mocker.MagicMock()
+    connection = engine.connect.return_value.__enter__.return_value
+    connection.scalars.return_value.all.return_value = users
+    return engine
+
+
+@pytest.fixture(name="engines")
+def engines_fixture(mocker: MockerFixture) -> dict[str, MockType]:
+    """Return mocked engines of the primary database and both shards."""
+    # u1 and u2 belong to shard a, u3 to shard b
+    engines = {
+        "database": _engine(mocker, ["u1"]),
+        "db_a": _engine(mocker, ["u2", "u3"]),
+        "db_b": _engine(mocker, ["u3"]),
+    }
+    mocker.patch(
+        "runners.reshard._create_postgres_engine",
+        side_effect=lambda config: engines[config.db],
+    )
+    mocker.patch("runners.reshard.inspect")
+    return engines
+
+
+def test_users_are_moved_to_their_shards(
+    mocker: MockerFixture, engines: dict[str, MockType]
+) -> None:
+    """Test that users stored outside of their shards are moved."""
+    assert [shard_index(user, ["a", "b"]) for user in ("u1", "u2", "u3")] == [0, 0, 1]
+    create_schema = mocker.Mock()
+    move = mocker.patch("runners.reshard.move_user")
+
+    assert reshard(_config(), DATABASE_TABLES, create_schema) == 2
+
+    assert create_schema.call_args_list == [
+        mocker.call(engines["db_a"]),
+        mocker.call(engines["db_b"]),
+    ]
+    assert move.call_args_list == [
+        mocker.call("u3", DATABASE_TABLES, engines["db_a"], engines["db_b"]),
+        mocker.call("u1", DATABASE_TABLES, engines["database"], engines["db_a"]),
+    ]
+    for engine in engines.values():
+        engine.dispose.assert_called_once()
+
+
+def test_primary_database_used_as_shard(
+    mocker: MockerFixture, engines: dict[str, MockType]
+) -> None:
+    """Test that primary database is not searched twice when it is a shard."""
+    move = mocker.patch("runners.reshard.move_user")
+    config = _config(
+        shards=[
+            PostgreSQLShardConfiguration(name="a", host="a", db="db_a"),
+            PostgreSQLShardConfiguration(name="b", db="database"),
+        ]
+    )
+
+    assert reshard(config, CACHE_TABLES, mocker.Mock()) == 2
+
+    assert move.call_args_list == [
+        mocker.call("u3", CACHE_TABLES, engines["db_a"], engines["database"]),
+        mocker.call("u1", CACHE_TABLES, engines["database"], engines["db_a"]),
+    ]
+
+
+def test_move_user(mocker: MockerFixture) -> None:
+    """Test that rows are copied to the target and deleted from the source."""
+    source = mocker.MagicMock()
+    target = mocker.MagicMock()
+    read = source.connect.return_value.__enter__.return_value
+    rows = read.execution_options.return_value.execute.return_value.mappings
+    rows.return_value.partitions.return_value = [[{"id": "conv1"}]]
+    write = target.begin.return_value.__enter__.return_value
+    delete = source.begin.return_value.__enter__.return_value
+
+    move_user("u1", DATABASE_TABLES, source, target)
+
+    read.execution_options.assert_called_with(yield_per=constants.RESHARD_BATCH_SIZE)
+    inserts = [call.args for call in write.execute.call_args_list]
+    assert [statement.table.name for statement, _ in inserts] == [
+        "user_conversation",
+        "user_turn",
+    ]
+    assert all(rows == [{"id": "conv1"}] for _, rows in inserts)
+    deletes = [call.args[0] for call in delete.execute.call_args_list]
+    assert [statement.table.name for statement in deletes] == [
+        "user_turn",
+        "user_conversation",
+    ]
+
+
+def test_reshard_storages(mocker: MockerFixture, minimal_config: AppConfig) -> None:
+    """Test that sharded storages are resharded only."""
+    move = mocker.patch("runners.reshard.reshard", return_value=3)
+    unsharded = minimal_config.configuration
+
+    assert reshard_storages(unsharded) == 0
+    move.assert_not_called()
+
+    database = _config()
+    config = unsharded.model_copy(
+        update={
+            "database": unsharded.database.model_copy(
+                update={"sqlite": None, "postgres": database}
+            ),
+            "conversation_cache": unsharded.conversation_cache.model_copy(
+                update={"type": constants.CACHE_TYPE_POSTGRES, "postgres": database}
+            ),
+        }
+    )
+    assert reshard_storages(config) == 6
+    assert [call.args[1] for call in move.call_args_list] == [
+        DATABASE_TABLES,
+        CACHE_TABLES,
+    ]
@@ -8,10 +8,13 @@ from typing import Any
 
 import pytest
 from pydantic import ValidationError
+from pytest_mock import MockerFixture
 
 import constants
+from cache.async_sqlite_cache import AsyncSQLiteCache
 from cache.in_memory_cache import InMemoryCache
 from cache.sqlite_cache import SQLiteCache
+from cache.sync_cache_adapter import SyncCacheAdapter
 from configuration import (
     AppConfig,
     LogicError,
@@ -794,6 +797,7 @@ conversation_cache:
     assert cfg.conversation_cache_configuration.memory is None
     assert cfg.conversation_cache is not None
     assert isinstance(cfg.conversation_cache, SQLiteCache)
+    assert isinstance(cfg.async_conversation_cache, AsyncSQLiteCache)
 
 
 def test_configuration_with_in_memory_conversation_cache(tmpdir: Path) -> None:
@@ -831,6 +835,7 @@ conversation_cache:
     assert cfg.conversation_cache_configuration.memory is not None
     assert cfg.conversation_cache is not None
     assert isinstance(cfg.conversation_cache, InMemoryCache)
+    assert isinstance(cfg.async_conversation_cache, SyncCacheAdapter)
 
 
 def test_configuration_with_quota_handlers_no_storage(tmpdir: Path) -> None:
@@ -988,6 +993,26 @@ quota_handlers:
     assert cfg.quota_handlers_configuration.scheduler.period == 1
 
 
+def test_close_quota_limiters(mocker: MockerFixture) -> None:
+    """Test that created quota limiters and token usage history are closed."""
+    cfg = AppConfig()
+    cfg.close_quota_limiters()
+
+    quota_limiter = mocker.Mock()
+    cfg._quota_limiters = [quota_limiter]
+    cfg.close_quota_limiters()
+
+    quota_limiter.close.assert_called_once()
+    assert not cfg._quota_limiters
+
+    token_usage_history = mocker.Mock()
+    cfg._token_usage_history = token_usage_history
+    cfg.close_quota_limiters()
+
+    token_usage_history.close.assert_called_once()
+    assert cfg._token_usage_history is None
+
+
 def test_load_configuration_with_azure_entra_id(tmpdir: Path) -> None:
     """Return Azure Entra ID configuration when provided in configuration."""
     cfg_filename = tmpdir / "config.yaml"
@@ -128,13 +128,16 @@ def run_main_with_config(
     Writes ``config_yaml`` to a temporary file, points argv at it, replaces
     the module-level configuration singleton with a fresh AppConfig (so the
     shared singleton is not mutated for other tests), and stubs the quota
-    scheduler and uvicorn runners.
+    scheduler, cache retention sweeper and uvicorn runners.
     """
     cfg_file = tmp_path / "lightspeed-stack.yaml"
     cfg_file.write_text(config_yaml, encoding="utf-8")
     monkeypatch.setattr("sys.argv", ["lightspeed-stack", "-c", str(cfg_file)])
     monkeypatch.setattr(lightspeed_stack, "configuration", AppConfig())
     monkeypatch.setattr(lightspeed_stack, "start_quota_scheduler", lambda _: None)
+    monkeypatch.setattr(
+        lightspeed_stack, "start_cache_retention_sweeper", lambda _: None
+    )
     monkeypatch.setattr(lightspeed_stack, "start_uvicorn", lambda _: None)
     main()
 
@@ -195,3 +198,38 @@ llama_stack:
     with caplog.at_level(logging.WARNING):
         run_main_with_config(config_yaml, tmp_path, monkeypatch)
     assert not any(LEGACY_DEPRECATION_MARKER in r.getMessage() for r in caplog.records)
+
+
+def test_main_reshard(tmp_path: Path, monkeypatch: pytest.MonkeyPatch) -> None:
+    """`--reshard` moves conversations to their shards without starting the service."""
+    cfg_file = tmp_path / "lightspeed-stack.yaml"
+    cfg_file.write_text(
+        COMMON_CONFIG_SECTIONS + """
+llama_stack:
+  use_as_library_client: false
+  url: http://localhost:8321
+""",
+        encoding="utf-8",
+    )
+    monkeypatch.setattr(
+        "sys.argv", ["lightspeed-stack", "--reshard", "-c", str(cfg_file)]
+    )
+    monkeypatch.setattr(lightspeed_stack, "configuration", AppConfig())
+    resharded: list[object] = []
+
+    def reshard(config: object) -> int:
+        """Record resharded configuration."""
+        resharded.append(config)
+        return 0
+
+    monkeypatch.setattr(lightspeed_stack, "reshard_storages", reshard)
+
+    def fail(_: object) -> None:
+        """Fail when the service is started."""
+        raise AssertionError("service started")
+
+    monkeypatch.setattr(lightspeed_stack, "start_uvicorn", fail)
+
+    main()
+
+    assert len(resharded) == 1
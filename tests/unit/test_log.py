@@ -3,12 +3,13 @@
 import logging
 
 import pytest
+from pytest_mock import MockerFixture
 
 from constants import (
     DEFAULT_LOGGER_NAME,
     LIGHTSPEED_STACK_LOG_LEVEL_ENV_VAR,
 )
-from log import get_logger, resolve_log_level, setup_logging
+from log import RateLimitedTrace, get_logger, resolve_log_level, setup_logging
 
 
 def test_get_logger() -> None:
@@ -113,3 +114,42 @@ def test_resolve_log_level_default(monkeypatch: pytest.MonkeyPatch) -> None:
     setup_logging()
 
     assert resolve_log_level() == logging.INFO
+
+
+def test_rate_limited_trace(mocker: MockerFixture) -> None:
+    """Test that details of repeated errors are logged once per interval."""
+    logger = mocker.Mock(spec=logging.Logger)
+    trace = RateLimitedTrace(logger, 60)
+    monotonic = mocker.patch("log.monotonic", return_value=100.0)
+    errors = [ValueError(index) for index in range(4)]
+
+    for index, e in enumerate(errors[:3]):
+        trace.error(e, "error %s", index)
+    monotonic.return_value = 160.0
+    trace.error(errors[3], "error %s", 3)
+
+    assert logger.error.call_args_list == [
+        mocker.call("error %s", 0, exc_info=errors[0]),
+        mocker.call("error %s", 1),
+        mocker.call("error %s", 2),
+        mocker.call(
+            "error %s (details of %d similar errors not logged)",
+            3,
+            2,
+            exc_info=errors[3],
+        ),
+    ]
+    logger.exception.assert_not_called()
+
+
+def test_rate_limited_trace_logs_exception(
+    caplog: pytest.LogCaptureFixture,
+) -> None:
+    """Test that the logged details describe the exception, not None."""
+    trace = RateLimitedTrace(get_logger("test_rate_limited_trace"), 60)
+
+    with caplog.at_level(logging.ERROR):
+        trace.error(ValueError("too many tokens"), "error")
+
+    assert "ValueError: too many tokens" in caplog.text
+    assert "NoneType: None" not in caplog.text
@@ -156,6 +156,7 @@ def make_generator_context_fixture(
         context.inline_rag_context = RAGContext()
         context.vector_store_ids = []
         context.rag_id_mapping = {}
+        context.quota_reservations = []
         context.query_request = QueryRequest(
             query=query,
             media_type=media_type,
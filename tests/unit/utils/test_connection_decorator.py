@@ -1,14 +1,58 @@
 """Unit tests for the connection decorator."""
 
+from threading import Event, RLock, Thread
+
 import pytest
+from pytest_mock import MockerFixture
 
-from utils.connection_decorator import connection
+from utils.connection_decorator import (
+    ConnectionHeartbeat,
+    connection,
+    is_disconnect_error,
+    start_heartbeat,
+)
 
 
 class SomeActionException(Exception):
     """Exception type used by unit test."""
 
 
+class LostConnectionException(Exception):
+    """Exception type signalling lost connection used by unit test."""
+
+
+class WrappingException(Exception):
+    """Exception type wrapping driver errors used by unit test."""
+
+
+class ReconnectingConnectable:
+    """Class used to test reconnects performed by connection decorator."""
+
+    disconnect_errors = (LostConnectionException,)
+
+    def __init__(self, failures: list[Exception]):
+        """Initialize class that fails with given errors, one per call."""
+        self.failures = failures
+        self.connects = 0
+        self.calls = 0
+
+    def connected(self) -> bool:
+        """Connection is assumed to be healthy."""
+        return True
+
+    def connect(self) -> None:
+        """Connect."""
+        self.connects += 1
+
+    @connection
+    def some_action(self) -> str:
+        """Perform any action, failing with the configured errors first."""
+        self.calls += 1
+        if self.failures:
+            raise self.failures.pop(0)
+        return "ok"
+
+
 class Connectable:
     """Class used to test connection decorator."""
 
@@ -56,3 +100,132 @@ def test_connection_decorator_on_connection_exception() -> None:
     with pytest.raises(SomeActionException, match="some_action error!"):
         # this method should autoconnect
         c.some_action()
+
+
+def test_is_disconnect_error() -> None:
+    """Test detection of errors meaning lost connection."""
+    c = ReconnectingConnectable([])
+    lost = LostConnectionException("lost")
+    assert is_disconnect_error(c, lost)
+    assert not is_disconnect_error(c, SomeActionException("other"))
+    # wrapped driver errors are detected too
+    wrapped = WrappingException("wrapped")
+    wrapped.__cause__ = lost
+    assert is_disconnect_error(c, wrapped)
+    # objects without disconnect errors never reconnect
+    assert not is_disconnect_error(Connectable(False), lost)
+
+
+def test_connection_decorator_reconnects_and_retries(mocker: MockerFixture) -> None:
+    """Test that lost connection is re-established and the method retried once."""
+    record = mocker.patch("utils.connection_decorator.record_storage_reconnect")
+    c = ReconnectingConnectable([LostConnectionException("lost")])
+
+    assert c.some_action() == "ok"
+
+    assert c.connects == 1
+    assert c.calls == 2
+    record.assert_called_once_with("ReconnectingConnectable", "some_action", True)
+
+
+def test_connection_decorator_retries_only_once() -> None:
+    """Test that the method is retried only once."""
+    c = ReconnectingConnectable(
+        [LostConnectionException("lost"), LostConnectionException("lost again")]
+    )
+
+    with pytest.raises(LostConnectionException, match="lost again"):
+        c.some_action()
+
+    assert c.connects == 1
+    assert c.calls == 2
+
+
+def test_connection_decorator_does_not_retry_other_errors() -> None:
+    """Test that errors not signalling lost connection are propagated."""
+    c = ReconnectingConnectable([SomeActionException("some_action error!")])
+
+    with pytest.raises(SomeActionException, match="some_action error!"):
+        c.some_action()
+
+    assert c.connects == 0
+    assert c.calls == 1
+
+
+def test_connection_decorator_reconnect_failure(mocker: MockerFixture) -> None:
+    """Test that reconnect failure is propagated and recorded."""
+    record = mocker.patch("utils.connection_decorator.record_storage_reconnect")
+    c = ReconnectingConnectable([LostConnectionException("lost")])
+    mocker.patch.object(c, "connect", side_effect=SomeActionException("down"))
+
+    with pytest.raises(SomeActionException, match="down"):
+        c.some_action()
+
+    record.assert_called_once_with("ReconnectingConnectable", "some_action", False)
+
+
+class LockedConnectable(ReconnectingConnectable):
+    """Class sharing its dedicated connection between threads."""
+
+    def __init__(self) -> None:
+        """Initialize class with the lock of its connection."""
+        super().__init__([])
+        self.connection_lock = RLock()
+        self.locked: list[bool] = []
+
+    def lock_held(self) -> bool:
+        """Check if the connection lock is held by other thread."""
+        acquired: list[bool] = []
+
+        def try_acquire() -> None:
+            """Try to acquire the lock without waiting."""
+            # pylint: disable-next=consider-using-with
+            acquired.append(self.connection_lock.acquire(blocking=False))
+            if acquired[0]:
+                self.connection_lock.release()
+
+        thread = Thread(target=try_acquire)
+        thread.start()
+        thread.join()
+        return not acquired[0]
+
+    @connection
+    def locked_action(self) -> None:
+        """Record whether the connection lock is held by the calling thread."""
+        self.locked.append(self.lock_held())
+
+
+def test_connection_decorator_holds_connection_lock() -> None:
+    """Test that methods using dedicated connection are serialized."""
+    connectable = LockedConnectable()
+
+    connectable.locked_action()
+
+    assert connectable.locked == [True]
+    # the lock is released after the method returns
+    assert not connectable.lock_held()
+
+
+def test_start_heartbeat_disabled() -> None:
+    """Test that heartbeat is not started without interval."""
+    assert start_heartbeat("storage", lambda: None, None) is None
+
+
+def test_heartbeat_calls_probe() -> None:
+    """Test that heartbeat periodically calls the probe until stopped."""
+    probed = Event()
+    calls: list[int] = []
+
+    def probe() -> None:
+        """Fail on the first call, signal the following ones."""
+        calls.append(1)
+        if len(calls) == 1:
+            raise SomeActionException("probe error")
+        probed.set()
+
+    heartbeat = start_heartbeat("storage", probe, 0.01)
+    assert isinstance(heartbeat, ConnectionHeartbeat)
+    # a failing probe does not stop the heartbeat
+    assert probed.wait(5)
+    heartbeat.stop()
+    assert len(calls) >= 2
@@ -372,7 +372,7 @@ async def test_cache_summaries_preferred_over_markers(mocker: MockerFixture) ->
     cached = _summary(
         "FRESH cached summary", turn=2, tokens=5, at="2026-05-26T00:00:00Z"
     )
-    cache = mocker.Mock()
+    cache = mocker.AsyncMock()
     cache.get_summaries.return_value = [cached]
 
     result = await cc.apply_compaction_blocking(
@@ -386,7 +386,7 @@ async def test_cache_summaries_preferred_over_markers(mocker: MockerFixture) ->
     )
 
     summarize.assert_not_called()
-    cache.get_summaries.assert_called_once_with("u1", CONV, False)
+    cache.get_summaries.assert_awaited_once_with("u1", CONV, False)
     texts = [m.content for m in result.params.input]
     assert "FRESH cached summary" in texts[0]
     assert "STALE marker text" not in texts[0]
@@ -402,7 +402,7 @@ async def test_store_summary_called_on_compaction(mocker: MockerFixture) -> None
     summary = _summary("condensed", turn=2, tokens=4, at="2026-05-26T00:00:00Z")
     mocker.patch.object(cc, "summarize_chunk", mocker.AsyncMock(return_value=summary))
     mocker.patch.object(cc, "_write_summary_marker", mocker.AsyncMock())
-    cache = mocker.Mock()
+    cache = mocker.AsyncMock()
     cache.get_summaries.return_value = []
 
     await cc.apply_compaction_blocking(
@@ -415,7 +415,7 @@ async def test_store_summary_called_on_compaction(mocker: MockerFixture) -> None
         skip_user_id_check=False,
     )
 
-    cache.store_summary.assert_called_once()
+    cache.store_summary.assert_awaited_once()
     assert cache.store_summary.call_args[0] == ("u1", CONV, summary, False)
 
 
@@ -432,7 +432,7 @@ async def test_fold_when_cached_summaries_exceed_threshold(
     s1 = _summary("sum one", turn=4, tokens=20, at="2026-05-26T00:00:00Z")
     s2 = _summary("sum two", turn=8, tokens=20, at="2026-05-26T00:10:00Z")
     folded = _summary("FOLDED one+two", turn=8, tokens=10, at="2026-05-26T00:20:00Z")
-    cache = mocker.Mock()
+    cache = mocker.AsyncMock()
     cache.get_summaries.return_value = [s1, s2]
     resum = mocker.patch.object(
         cc, "recursively_resummarize", mocker.AsyncMock(return_value=folded)
@@ -450,7 +450,7 @@ async def test_fold_when_cached_summaries_exceed_threshold(
 
     summarize.assert_not_called()  # estimate stays small; only the fold fires
     resum.assert_awaited_once()
-    cache.replace_summaries.assert_called_once()
+    cache.replace_summaries.assert_awaited_once()
     assert cache.replace_summaries.call_args[0][2] is folded
     texts = [m.content for m in result.params.input]
     assert "FOLDED one+two" in texts[0]
@@ -487,7 +487,7 @@ async def test_marker_fallback_when_cache_empty(mocker: MockerFixture) -> None:
         cc, "get_all_conversation_items", mocker.AsyncMock(return_value=items)
     )
     mocker.patch.object(cc, "summarize_chunk", mocker.AsyncMock())
-    cache = mocker.Mock()
+    cache = mocker.AsyncMock()
     cache.get_summaries.return_value = []
 
     result = await cc.apply_compaction_blocking(
@@ -518,7 +518,7 @@ def test_configured_conversation_cache_returns_cache(mocker: MockerFixture) -> N
     mock_config.compaction.enabled = True
     mock_config.conversation_cache_configuration.type = "sqlite"
     sentinel = object()
-    mock_config.conversation_cache = sentinel
+    mock_config.async_conversation_cache = sentinel
     assert cc.configured_conversation_cache() is sentinel
 
 
@@ -529,21 +529,22 @@ def test_configured_conversation_cache_none_when_compaction_disabled(
 
     Regression guard (LCORE-1572): the cache must not be initialized on every
     request when compaction is off — that 500'd e2e requests on configs whose
-    SQLite cache could not be opened. The stub's ``conversation_cache`` raises if
+    SQLite cache could not be opened. The stub's ``async_conversation_cache`` raises if
     read, so the test fails on any eager access, not only on the return value.
     """
 
     class _ConfigStub:  # pylint: disable=too-few-public-methods
-        """Config whose conversation_cache raises if accessed."""
+        """Config whose async_conversation_cache raises if accessed."""
 
         compaction = SimpleNamespace(enabled=False)
         conversation_cache_configuration = SimpleNamespace(type="sqlite")
 
         @property
-        def conversation_cache(self) -> object:
+        def async_conversation_cache(self) -> object:
             """Fail the test if the disabled path reads the cache."""
             raise AssertionError(
-                "conversation_cache must not be accessed when compaction is disabled"
+                "async_conversation_cache must not be accessed when compaction is "
+                "disabled"
             )
 
     mocker.patch.object(cc, "configuration", _ConfigStub())
@@ -0,0 +1,159 @@
+"""Unit tests for the in-process conversation metadata cache."""
+
+from pytest_mock import MockerFixture
+
+from models.database.conversations import UserConversation
+from utils.conversation_metadata_cache import ConversationMetadataCache
+
+
+def make_conversation(
+    conversation_id: str = "conv1", message_count: int = 1
+) -> UserConversation:
+    """Create transient conversation record.
+
+    Parameters:
+    ----------
+        conversation_id: ID of the conversation.
+        message_count: Number of messages in the conversation.
+
+    Returns:
+    -------
+        UserConversation: New conversation record.
+    """
+    return UserConversation(
+        id=conversation_id,
+        user_id="user1",
+        last_used_model="model1",
+        last_used_provider="provider1",
+        last_response_id="resp_1",
+        message_count=message_count,
+        topic_summary="Topic",
+    )
+
+
+class TestConversationMetadataCache:
+    """Unit tests for ConversationMetadataCache class."""
+
+    def test_store_and_get(self) -> None:
+        """Test that stored record is returned as a copy."""
+        cache = ConversationMetadataCache(10, 60)
+        conversation = make_conversation()
+
+        token = cache.start_loading("conv1")
+        cache.store("conv1", token, conversation)
+        cached = cache.get("conv1")
+
+        assert cached is not None
+        assert cached is not conversation
+        assert cached.user_id == "user1"
+        assert cached.last_used_model == "model1"
+        assert cached.last_used_provider == "provider1"
+        assert cached.last_response_id == "resp_1"
+        # modifications of the returned record do not change the cache
+        cached.last_used_model = "model2"
+        cached_again = cache.get("conv1")
+        assert cached_again is not None
+        assert cached_again.last_used_model == "model1"
+
+    def test_get_missing(self) -> None:
+        """Test that None is returned for conversation not cached."""
+        assert ConversationMetadataCache(10, 60).get("conv1") is None
+
+    def test_missing_conversation_not_cached(self) -> None:
+        """Test that conversation not found in database is not cached."""
+        cache = ConversationMetadataCache(10, 60)
+
+        token = cache.start_loading("conv1")
+        cache.store("conv1", token, None)
+
+        assert len(cache) == 0
+
+    def test_store_after_invalidation_ignored(self) -> None:
+        """Test that record read before a change is not cached."""
+        cache = ConversationMetadataCache(10, 60)
+
+        token = cache.start_loading("conv1")
+        cache.invalidate("conv1")
+        cache.store("conv1", token, make_conversation())
+
+        assert cache.get("conv1") is None
+
+    def test_store_after_update_ignored(self) -> None:
+        """Test that record read before a write does not replace written one."""
+        cache = ConversationMetadataCache(10, 60)
+
+        token = cache.start_loading("conv1")
+        cache.update(make_conversation(message_count=2))
+        cache.store("conv1", token, make_conversation(message_count=1))
+
+        cached = cache.get("conv1")
+        assert cached is not None
+        assert cached.message_count == 2
+
+    def test_cancel_loading(self) -> None:
+        """Test that cancelled read does not leave pending token."""
+        cache = ConversationMetadataCache(10, 60)
+
+        token = cache.start_loading("conv1")
+        cache.cancel_loading("conv1", token)
+        cache.store("conv1", token, make_conversation())
+
+        assert cache.get("conv1") is None
+
+    def test_update_keeps_most_recent_record(self) -> None:
+        """Test that record of an older turn does not replace newer one."""
+        cache = ConversationMetadataCache(10, 60)
+
+        cache.update(make_conversation(message_count=3))
+        cache.update(make_conversation(message_count=2))
+
+        cached = cache.get("conv1")
+        assert cached is not None
+        assert cached.message_count == 3
+
+    def test_invalidate(self) -> None:
+        """Test that invalidated record is dropped."""
+        cache = ConversationMetadataCache(10, 60)
+        cache.update(make_conversation())
+
+        cache.invalidate("conv1")
+
+        assert cache.get("conv1") is None
+
+    def test_least_recently_used_evicted(self) -> None:
+        """Test that cache is bounded by number of records."""
+        cache = ConversationMetadataCache(2, 60)
+        cache.update(make_conversation("conv1"))
+        cache.update(make_conversation("conv2"))
+        cache.get("conv1")
+
+        cache.update(make_conversation("conv3"))
+
+        assert len(cache) == 2
+        assert cache.get("conv1") is not None
+        assert cache.get("conv2") is None
+
+    def test_records_expire(self, mocker: MockerFixture) -> None:
+        """Test that records expire after TTL."""
+        monotonic = mocker.patch(
+            "utils.conversation_metadata_cache.monotonic", return_value=100
+        )
+        cache = ConversationMetadataCache(10, 30)
+        cache.update(make_conversation())
+
+        monotonic.return_value = 129
+        assert cache.get("conv1") is not None
+
+        monotonic.return_value = 131
+        assert cache.get("conv1") is None
+        assert len(cache) == 0
+
+    def test_clear(self) -> None:
+        """Test that all records are dropped."""
+        cache = ConversationMetadataCache(10, 60)
+        cache.update(make_conversation("conv1"))
+        cache.start_loading("conv2")
+
+        cache.clear()
+
+        assert len(cache) == 0
@@ -3,13 +3,16 @@
 # pylint: disable=too-many-lines
 
 import os
+from datetime import UTC, datetime
 from pathlib import Path
 
 import pytest
 from fastapi import HTTPException
 from pydantic import AnyUrl
 from pytest_mock import MockerFixture
+from sqlalchemy.dialects import sqlite
 from sqlalchemy.exc import SQLAlchemyError
+from sqlalchemy.ext.asyncio import AsyncSession
 
 from models.common.responses.responses_conversation_context import (
     ResponsesConversationContext,
@@ -17,6 +20,7 @@ from models.common.responses.responses_conversation_context import (
 from models.common.turn_summary import ReferencedDocument
 from models.database.conversations import UserConversation, UserTurn
 from utils import endpoints
+from utils.conversation_metadata_cache import conversation_metadata_cache
 
 
 @pytest.fixture(name="input_file")
@@ -166,10 +170,170 @@ class TestCreateReferencedDocuments:
         assert result[1].doc_title == "doc1"
 
 
+class TestConversationsListStatement:
+    """Test cases for conversations_list_statement function."""
+
+    def test_all_conversations(self) -> None:
+        """Test statement listing conversations of all users."""
+        statement = endpoints.conversations_list_statement(None)
+        sql = str(statement.compile(dialect=sqlite.dialect()))
+        assert "WHERE" not in sql
+        assert "LIMIT" not in sql
+        assert (
+            "ORDER BY user_conversation.last_message_at DESC, "
+            "user_conversation.id DESC" in sql
+        )
+
+    def test_selects_only_listed_columns(self) -> None:
+        """Test statement does not load columns unused by the listing."""
+        statement = endpoints.conversations_list_statement("user_id")
+        assert [column.name for column in statement.selected_columns] == [
+            "id",
+            "created_at",
+            "last_message_at",
+            "message_count",
+            "last_used_model",
+            "last_used_provider",
+            "topic_summary",
+        ]
+
+    def test_page_after_cursor(self) -> None:
+        """Test statement selecting page of user conversations after cursor."""
+        last_message_at = datetime(2024, 1, 1, tzinfo=UTC)
+        statement = endpoints.conversations_list_statement(
+            "user_id", (last_message_at, "conversation-1"), 10
+        )
+        compiled = statement.compile(dialect=sqlite.dialect())
+        assert "user_conversation.user_id = ?" in str(compiled)
+        assert (
+            "(user_conversation.last_message_at, user_conversation.id) < (?, ?)"
+            in str(compiled)
+        )
+        # SQLite renders the limit as LIMIT ? OFFSET ?
+        assert list(compiled.params.values()) == [
+            "user_id",
+            last_message_at,
+            "conversation-1",
+            10,
+            0,
+        ]
+
+
+class TestRetrieveConversation:
+    """Tests for retrieve_conversation function."""
+
+    @pytest.mark.asyncio
+    async def test_conversation_read_once(self, mocker: MockerFixture) -> None:
+        """Test that conversation is read from database only once."""
+        mock_session = mocker.AsyncMock(spec=AsyncSession)
+        mock_session.__aenter__.return_value = mock_session
+        mock_session.get.return_value = UserConversation(
+            id="conv1", user_id="user1", last_used_model="model1"
+        )
+        mocker.patch("utils.endpoints.get_async_sessions", return_value=[mock_session])
+
+        first = await endpoints.retrieve_conversation("conv1")
+        second = await endpoints.retrieve_conversation("conv1")
+
+        mock_session.get.assert_awaited_once_with(UserConversation, "conv1")
+        assert first is not None and second is not None
+        assert second.user_id == "user1"
+        assert second.last_used_model == "model1"
+        # ownership check is served by the cached record
+        assert await endpoints.can_access_conversation("conv1", "user1", False)
+        assert not await endpoints.can_access_conversation("conv1", "user2", False)
+        mock_session.get.assert_awaited_once()
+
+    @pytest.mark.asyncio
+    async def test_missing_conversation_not_cached(self, mocker: MockerFixture) -> None:
+        """Test that conversation not found is looked up again."""
+        mock_session = mocker.AsyncMock(spec=AsyncSession)
+        mock_session.__aenter__.return_value = mock_session
+        mock_session.get.return_value = None
+        mocker.patch("utils.endpoints.get_async_sessions", return_value=[mock_session])
+
+        assert await endpoints.retrieve_conversation("conv1") is None
+        assert await endpoints.retrieve_conversation("conv1") is None
+
+        assert mock_session.get.await_count == 2
+
+    @pytest.mark.asyncio
+    async def test_deleted_conversation_invalidated(
+        self, mocker: MockerFixture
+    ) -> None:
+        """Test that deleted conversation is no longer served from cache."""
+        conversation_metadata_cache.update(
+            UserConversation(id="conv1", user_id="user1", message_count=1)
+        )
+        mock_session = mocker.AsyncMock(spec=AsyncSession)
+        mock_session.__aenter__.return_value = mock_session
+        mocker.patch("utils.endpoints.get_async_sessions", return_value=[mock_session])
+
+        assert await endpoints.delete_conversation("conv1")
+
+        assert conversation_metadata_cache.get("conv1") is None
+
+    @pytest.mark.asyncio
+    async def test_conversation_deleted_from_other_shard(
+        self, mocker: MockerFixture
+    ) -> None:
+        """Test that conversation is deleted from the shard storing it."""
+        sessions = []
+        for conversation in (None, UserConversation(id="conv1", user_id="user2")):
+            mock_session = mocker.AsyncMock(spec=AsyncSession)
+            mock_session.__aenter__.return_value = mock_session
+            mock_session.get.return_value = conversation
+            sessions.append(mock_session)
+        mocker.patch("utils.endpoints.get_async_sessions", return_value=sessions)
+
+        assert await endpoints.delete_conversation("conv1")
+
+        sessions[0].delete.assert_not_awaited()
+        sessions[1].delete.assert_awaited_once()
+
+    @pytest.mark.asyncio
+    async def test_queued_turns_persisted_first(self, mocker: MockerFixture) -> None:
+        """Test that turns queued in persistence pipeline are waited for."""
+        mock_pipeline = mocker.Mock()
+        mock_pipeline.wait_for_conversation = mocker.AsyncMock()
+        mocker.patch(
+            "utils.endpoints.get_persistence_pipeline", return_value=mock_pipeline
+        )
+        conversation_metadata_cache.update(
+            UserConversation(id="conv1", user_id="user1", message_count=1)
+        )
+
+        assert await endpoints.retrieve_conversation("conv1") is not None
+
+        mock_pipeline.wait_for_conversation.assert_awaited_once_with("conv1")
+
+    @pytest.mark.asyncio
+    async def test_conversation_found_in_other_shard(
+        self, mocker: MockerFixture
+    ) -> None:
+        """Test that shards are searched until the conversation is found."""
+        own_shard = mocker.AsyncMock(spec=AsyncSession)
+        own_shard.__aenter__.return_value = own_shard
+        own_shard.get.return_value = None
+        other_shard = mocker.AsyncMock(spec=AsyncSession)
+        other_shard.__aenter__.return_value = other_shard
+        other_shard.get.return_value = UserConversation(id="conv1", user_id="user2")
+        get_sessions = mocker.patch(
+            "utils.endpoints.get_async_sessions", return_value=[own_shard, other_shard]
+        )
+
+        conversation = await endpoints.retrieve_conversation("conv1", "user1")
+
+        assert conversation is not None and conversation.user_id == "user2"
+        get_sessions.assert_called_once_with("user1", False)
+        own_shard.get.assert_awaited_once_with(UserConversation, "conv1")
+
+
 class TestValidateAndRetrieveConversation:
     """Tests for validate_and_retrieve_conversation function."""
 
-    def test_successful_retrieval(self, mocker: MockerFixture) -> None:
+    @pytest.mark.asyncio
+    async def test_successful_retrieval(self, mocker: MockerFixture) -> None:
         """Test successful conversation retrieval when user has access."""
         normalized_conv_id = "123e4567-e89b-12d3-a456-426614174000"
         user_id = "user-123"
@@ -178,12 +342,11 @@ class TestValidateAndRetrieveConversation:
         mock_conversation.id = normalized_conv_id
         mock_conversation.user_id = user_id
 
-        mocker.patch("utils.endpoints.can_access_conversation", return_value=True)
         mocker.patch(
             "utils.endpoints.retrieve_conversation", return_value=mock_conversation
         )
 
-        result = endpoints.validate_and_retrieve_conversation(
+        result = await endpoints.validate_and_retrieve_conversation(
             normalized_conv_id=normalized_conv_id,
             user_id=user_id,
             others_allowed=False,
@@ -191,16 +354,23 @@ class TestValidateAndRetrieveConversation:
 
         assert result == mock_conversation
 
-    def test_forbidden_access(self, mocker: MockerFixture) -> None:
+    @pytest.mark.asyncio
+    async def test_forbidden_access(self, mocker: MockerFixture) -> None:
         """Test that 403 Forbidden is raised when user doesn't have access."""
         normalized_conv_id = "123e4567-e89b-12d3-a456-426614174000"
         user_id = "user-123"
 
-        mocker.patch("utils.endpoints.can_access_conversation", return_value=False)
+        mock_conversation = mocker.Mock(spec=UserConversation)
+        mock_conversation.id = normalized_conv_id
+        mock_conversation.user_id = "other-user"
+
+        mocker.patch(
+            "utils.endpoints.retrieve_conversation", return_value=mock_conversation
+        )
         mocker.patch("utils.endpoints.logger")
 
         with pytest.raises(HTTPException) as exc_info:
-            endpoints.validate_and_retrieve_conversation(
+            await endpoints.validate_and_retrieve_conversation(
                 normalized_conv_id=normalized_conv_id,
                 user_id=user_id,
                 others_allowed=False,
@@ -212,17 +382,17 @@ class TestValidateAndRetrieveConversation:
         assert "response" in exc_info.value.detail
         assert "cause" in exc_info.value.detail
 
-    def test_conversation_not_found(self, mocker: MockerFixture) -> None:
+    @pytest.mark.asyncio
+    async def test_conversation_not_found(self, mocker: MockerFixture) -> None:
         """Test that 404 Not Found is raised when conversation doesn't exist."""
         normalized_conv_id = "123e4567-e89b-12d3-a456-426614174000"
         user_id = "user-123"
 
-        mocker.patch("utils.endpoints.can_access_conversation", return_value=True)
         mocker.patch("utils.endpoints.retrieve_conversation", return_value=None)
         mocker.patch("utils.endpoints.logger")
 
         with pytest.raises(HTTPException) as exc_info:
-            endpoints.validate_and_retrieve_conversation(
+            await endpoints.validate_and_retrieve_conversation(
                 normalized_conv_id=normalized_conv_id,
                 user_id=user_id,
                 others_allowed=False,
@@ -234,12 +404,12 @@ class TestValidateAndRetrieveConversation:
         assert "response" in exc_info.value.detail
         assert "cause" in exc_info.value.detail
 
-    def test_database_error(self, mocker: MockerFixture) -> None:
+    @pytest.mark.asyncio
+    async def test_database_error(self, mocker: MockerFixture) -> None:
         """Test that 500 Internal Server Error is raised on database error."""
         normalized_conv_id = "123e4567-e89b-12d3-a456-426614174000"
         user_id = "user-123"
 
-        mocker.patch("utils.endpoints.can_access_conversation", return_value=True)
         mocker.patch(
             "utils.endpoints.retrieve_conversation",
             side_effect=SQLAlchemyError("Database connection error", None, None),
@@ -247,7 +417,7 @@ class TestValidateAndRetrieveConversation:
         mocker.patch("utils.endpoints.logger")
 
         with pytest.raises(HTTPException) as exc_info:
-            endpoints.validate_and_retrieve_conversation(
+            await endpoints.validate_and_retrieve_conversation(
                 normalized_conv_id=normalized_conv_id,
                 user_id=user_id,
                 others_allowed=False,
@@ -259,7 +429,8 @@ class TestValidateAndRetrieveConversation:
         assert "response" in exc_info.value.detail
         assert "cause" in exc_info.value.detail
 
-    def test_successful_retrieval_with_others_allowed(
+    @pytest.mark.asyncio
+    async def test_successful_retrieval_with_others_allowed(
         self, mocker: MockerFixture
     ) -> None:
         """Test successful retrieval when others_allowed is True."""
@@ -270,12 +441,11 @@ class TestValidateAndRetrieveConversation:
         mock_conversation.id = normalized_conv_id
         mock_conversation.user_id = "other-user"  # Different user
 
-        mocker.patch("utils.endpoints.can_access_conversation", return_value=True)
         mocker.patch(
             "utils.endpoints.retrieve_conversation", return_value=mock_conversation
         )
 
-        result = endpoints.validate_and_retrieve_conversation(
+        result = await endpoints.validate_and_retrieve_conversation(
             normalized_conv_id=normalized_conv_id,
             user_id=user_id,
             others_allowed=True,  # Allow access to others' conversations
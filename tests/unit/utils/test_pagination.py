@@ -0,0 +1,92 @@
+"""Unit tests for functions defined in utils.pagination module."""
+
+import base64
+from datetime import UTC, datetime
+
+import pytest
+
+from utils.pagination import (
+    decode_cache_cursor,
+    decode_conversation_cursor,
+    encode_cache_cursor,
+    encode_conversation_cursor,
+)
+
+
+class TestConversationCursor:
+    """Unit tests for conversation cursor encoding."""
+
+    def test_round_trip(self) -> None:
+        """Test that decoded cursor matches the encoded position."""
+        last_message_at = datetime(2024, 1, 1, 0, 5, 0, 123456, tzinfo=UTC)
+        cursor = encode_conversation_cursor(last_message_at, "conversation-1")
+        assert decode_conversation_cursor(cursor) == (
+            last_message_at,
+            "conversation-1",
+        )
+
+    def test_round_trip_naive_timestamp(self) -> None:
+        """Test that naive timestamps (as read from SQLite) stay naive."""
+        last_message_at = datetime(2024, 1, 1, 0, 5)
+        cursor = encode_conversation_cursor(last_message_at, "conversation-1")
+        assert decode_conversation_cursor(cursor)[0] == last_message_at
+
+    def test_cursor_is_url_safe(self) -> None:
+        """Test that cursor can be passed as query parameter without escaping."""
+        cursor = encode_conversation_cursor(
+            datetime(2024, 1, 1, tzinfo=UTC), "conv_???>>>"
+        )
+        assert all(c.isalnum() or c in "-_=" for c in cursor)
+
+    @pytest.mark.parametrize(
+        "cursor",
+        [
+            "not base64!",
+            "é",
+            base64.urlsafe_b64encode(b"not json").decode(),
+            base64.urlsafe_b64encode(b'{"a": 1}').decode(),
+            base64.urlsafe_b64encode(b'["2024-01-01T00:00:00"]').decode(),
+            base64.urlsafe_b64encode(b'["2024-01-01T00:00:00", 1]').decode(),
+            base64.urlsafe_b64encode(b'["yesterday", "conversation-1"]').decode(),
+        ],
+    )
+    def test_malformed_cursor(self, cursor: str) -> None:
+        """Test that malformed cursor is rejected."""
+        with pytest.raises(ValueError, match="(Malformed cursor|Invalid isoformat)"):
+            decode_conversation_cursor(cursor)
+
+
+class TestCacheCursor:
+    """Unit tests for conversation cache cursor encoding."""
+
+    @pytest.mark.parametrize(
+        "last_message_timestamp",
+        [
+            1704067200.1234567,
+            datetime(2024, 1, 1, 0, 0, 0, 123457),
+        ],
+    )
+    def test_round_trip_is_exact(
+        self, last_message_timestamp: float | datetime
+    ) -> None:
+        """Test that stored timestamps survive the cursor without rounding."""
+        cursor = encode_cache_cursor(last_message_timestamp, "conversation-1")
+        assert decode_cache_cursor(cursor) == (
+            last_message_timestamp,
+            "conversation-1",
+        )
+
+    @pytest.mark.parametrize(
+        "cursor",
+        [
+            "not base64!",
+            base64.urlsafe_b64encode(b"1704067200.0").decode(),
+            base64.urlsafe_b64encode(b"[1704067200.0]").decode(),
+            base64.urlsafe_b64encode(b'[true, "conversation-1"]').decode(),
+            base64.urlsafe_b64encode(b"[1704067200.0, 1]").decode(),
+        ],
+    )
+    def test_malformed_cursor(self, cursor: str) -> None:
+        """Test that malformed cursor is rejected."""
+        with pytest.raises(ValueError, match="Malformed cursor"):
+            decode_cache_cursor(cursor)
@@ -0,0 +1,41 @@
+"""Unit tests for the periodic synchronization thread."""
+
+from threading import Event
+
+from pytest_mock import MockerFixture
+
+from utils.periodic_sync import PeriodicSync
+
+
+def test_periodic_sync(mocker: MockerFixture) -> None:
+    """Test that state is synchronized until the thread is stopped."""
+    synchronized = Event()
+
+    def sync_side_effect() -> None:
+        """Fail on the first call, the next call is made anyway."""
+        if sync.call_count == 1:
+            raise RuntimeError("error")
+        synchronized.set()
+
+    sync = mocker.Mock(side_effect=sync_side_effect)
+    periodic_sync = PeriodicSync("leases", sync, 0.01)
+
+    periodic_sync.start()
+    assert synchronized.wait(5)
+    periodic_sync.stop()
+
+    assert sync.call_count >= 2
+
+
+def test_triggered_sync(mocker: MockerFixture) -> None:
+    """Test that triggered synchronization does not wait for the period."""
+    synchronized = Event()
+    sync = mocker.Mock(side_effect=synchronized.set)
+    periodic_sync = PeriodicSync("buffer", sync, 3600)
+
+    periodic_sync.start()
+    periodic_sync.trigger()
+    assert synchronized.wait(5)
+    periodic_sync.stop()
+
+    sync.assert_called_once()
@@ -0,0 +1,331 @@
+"""Unit tests for the persistence pipeline of query turns."""
+
+import asyncio
+import json
+from collections.abc import AsyncIterator
+from pathlib import Path
+from typing import Any
+
+import pytest
+from fastapi import HTTPException
+from pytest_mock import MockerFixture
+
+from models.common.turn_summary import TurnSummary
+from models.config import PersistencePipelineConfiguration
+from utils.persistence_pipeline import (
+    FAILED_DIRECTORY,
+    PersistencePipeline,
+    TurnRecord,
+    get_persistence_pipeline,
+    start_persistence_pipeline,
+    stop_persistence_pipeline,
+)
+from utils.suid import get_suid
+from utils.token_counter import TokenCounter
+
+CONVERSATION_ID = get_suid()
+
+
+def _turn_record(
+    conversation_id: str = CONVERSATION_ID, generate_topic_summary: bool = False
+) -> TurnRecord:
+    """Return turn record with the given conversation ID."""
+    return TurnRecord(
+        user_id="user",
+        conversation_id=conversation_id,
+        model="provider/model",
+        started_at="2025-10-03T09:31:25Z",
+        completed_at="2025-10-03T09:31:29Z",
+        summary=TurnSummary(
+            id="resp_1",
+            llm_response="answer",
+            token_usage=TokenCounter(input_tokens=10, output_tokens=20),
+        ),
+        query="question",
+        skip_userid_check=False,
+        generate_topic_summary=generate_topic_summary,
+    )
+
+
+def _config(journal_path: Path, **kwargs: Any) -> PersistencePipelineConfiguration:
+    """Return pipeline configuration journaling into the given directory."""
+    return PersistencePipelineConfiguration(
+        journal_path=str(journal_path), retry_delay=1, **kwargs
+    )
+
+
+def _journaled_files(journal_path: Path) -> list[Path]:
+    """Return journal files of all processes."""
+    return [
+        path
+        for path in journal_path.glob("*/*.json")
+        if path.parent.name != FAILED_DIRECTORY
+    ]
+
+
+@pytest.fixture(name="steps")
+def steps_fixture(mocker: MockerFixture) -> list[str]:
+    """Replace persistence steps by mocks recording the order of calls."""
+    calls: list[str] = []
+
+    def record(name: str, result: Any = None) -> Any:
+        def side_effect(*_args: Any, **_kwargs: Any) -> Any:
+            calls.append(name)
+            return result
+
+        return side_effect
+
+    mocker.patch("utils.persistence_pipeline.AsyncOgxClientHolder")
+    mocker.patch(
+        "utils.persistence_pipeline.get_topic_summary",
+        new=mocker.AsyncMock(side_effect=record("topic_summary", "Topic")),
+    )
+    mocker.patch(
+        "utils.persistence_pipeline.consume_query_tokens",
+        side_effect=record("quota"),
+    )
+    mocker.patch(
+        "utils.persistence_pipeline.store_query_transcript",
+        side_effect=record("transcript"),
+    )
+    mocker.patch(
+        "utils.persistence_pipeline.store_query_conversation_details",
+        new=mocker.AsyncMock(side_effect=record("conversation")),
+    )
+    mocker.patch(
+        "utils.persistence_pipeline.store_query_cache_entry",
+        new=mocker.AsyncMock(side_effect=record("cache")),
+    )
+    return calls
+
+
+@pytest.fixture(name="pipeline")
+async def pipeline_fixture(tmp_path: Path) -> AsyncIterator[PersistencePipeline]:
+    """Return started pipeline journaling into temporary directory."""
+    pipeline = PersistencePipeline(_config(tmp_path, max_attempts=3))
+    await pipeline.start()
+    yield pipeline
+    await pipeline.stop()
+
+
+async def _wait_until_persisted(pipeline: PersistencePipeline) -> None:
+    """Wait for the workers to persist all queued turns."""
+    async with asyncio.timeout(5):
+        while pipeline.pending:
+            await asyncio.sleep(0.001)
+
+
+async def test_turn_is_persisted(
+    pipeline: PersistencePipeline, steps: list[str], tmp_path: Path
+) -> None:
+    """Test that all steps are performed in order and the journal is cleaned."""
+    await pipeline.enqueue(_turn_record())
+    await _wait_until_persisted(pipeline)
+
+    assert steps == ["quota", "transcript", "conversation", "cache"]
+    assert not _journaled_files(tmp_path)
+
+
+async def test_topic_summary_is_generated(
+    pipeline: PersistencePipeline, steps: list[str], mocker: MockerFixture
+) -> None:
+    """Test that generated topic summary is stored with the conversation."""
+    store_conversation = mocker.patch(
+        "utils.persistence_pipeline.store_query_conversation_details",
+        new=mocker.AsyncMock(),
+    )
+    store_cache = mocker.patch(
+        "utils.persistence_pipeline.store_query_cache_entry", new=mocker.AsyncMock()
+    )
+    await pipeline.enqueue(_turn_record(generate_topic_summary=True))
+    await _wait_until_persisted(pipeline)
+
+    assert steps == ["topic_summary", "quota", "transcript"]
+    assert store_conversation.call_args.kwargs["topic_summary"] == "Topic"
+    assert store_cache.call_args.kwargs["topic_summary"] == "Topic"
+
+
+async def test_failed_step_is_retried(
+    pipeline: PersistencePipeline, steps: list[str], mocker: MockerFixture
+) -> None:
+    """Test that only the failed and following steps are retried."""
+    store_conversation = mocker.patch(
+        "utils.persistence_pipeline.store_query_conversation_details",
+        new=mocker.AsyncMock(
+            side_effect=[HTTPException(status_code=500), None],
+        ),
+    )
+    await pipeline.enqueue(_turn_record())
+    await _wait_until_persisted(pipeline)
+
+    assert steps == ["quota", "transcript", "cache"]
+    assert store_conversation.await_count == 2
+
+
+async def test_turn_is_moved_aside_after_last_attempt(
+    pipeline: PersistencePipeline,
+    steps: list[str],
+    mocker: MockerFixture,
+    tmp_path: Path,
+) -> None:
+    """Test that turn failing in all attempts is kept in failed directory."""
+    mocker.patch(
+        "utils.persistence_pipeline.store_query_cache_entry",
+        new=mocker.AsyncMock(side_effect=HTTPException(status_code=500)),
+    )
+    await pipeline.enqueue(_turn_record())
+    await _wait_until_persisted(pipeline)
+
+    assert steps == ["quota", "transcript", "conversation"]
+    assert not _journaled_files(tmp_path)
+    (failed,) = (tmp_path / FAILED_DIRECTORY).iterdir()
+    record = TurnRecord.model_validate_json(failed.read_text("utf-8"))
+    assert record.attempts == 3
+    assert record.completed_steps == [
+        "topic_summary",
+        "quota",
+        "transcript",
+        "conversation",
+    ]
+
+
+async def test_wait_for_conversation(
+    pipeline: PersistencePipeline, steps: list[str], mocker: MockerFixture
+) -> None:
+    """Test that readers of the conversation wait until its turns are persisted."""
+    stored = asyncio.Event()
+    release = asyncio.Event()
+
+    async def slow_store(*_args: Any, **_kwargs: Any) -> None:
+        stored.set()
+        await release.wait()
+
+    mocker.patch(
+        "utils.persistence_pipeline.store_query_cache_entry",
+        new=mocker.AsyncMock(side_effect=slow_store),
+    )
+    await pipeline.enqueue(_turn_record())
+    await stored.wait()
+
+    # turns of other conversations are not waited for
+    await pipeline.wait_for_conversation(get_suid())
+    waiting = asyncio.create_task(pipeline.wait_for_conversation(CONVERSATION_ID))
+    await asyncio.sleep(0.01)
+    assert not waiting.done()
+
+    release.set()
+    async with asyncio.timeout(5):
+        await waiting
+    assert steps == ["quota", "transcript", "conversation"]
+
+
+async def test_wait_for_conversation_times_out(
+    steps: list[str], tmp_path: Path, mocker: MockerFixture
+) -> None:
+    """Test that readers stop waiting for turns not persisted in time."""
+    release = asyncio.Event()
+
+    async def blocked_store(*_args: Any, **_kwargs: Any) -> None:
+        await release.wait()
+
+    mocker.patch(
+        "utils.persistence_pipeline.store_query_cache_entry",
+        new=mocker.AsyncMock(side_effect=blocked_store),
+    )
+    pipeline = PersistencePipeline(_config(tmp_path, wait_timeout=1))
+    await pipeline.start()
+    await pipeline.enqueue(_turn_record())
+
+    async with asyncio.timeout(5):
+        await pipeline.wait_for_conversation(CONVERSATION_ID)
+    assert pipeline.pending == 1
+
+    release.set()
+    await pipeline.stop()
+    assert steps == ["quota", "transcript", "conversation"]
+
+
+async def test_orphaned_turns_are_taken_over(steps: list[str], tmp_path: Path) -> None:
+    """Test that turns journaled by a stopped process are persisted on start."""
+    orphaned_directory = tmp_path / get_suid()
+    orphaned_directory.mkdir()
+    (orphaned_directory / "lock").touch()
+    record = _turn_record()
+    record.completed_steps = ["topic_summary", "quota"]
+    (orphaned_directory / f"1-{get_suid()}.json").write_text(
+        record.model_dump_json(), "utf-8"
+    )
+    (orphaned_directory / f"2-{get_suid()}.json").write_text("{", "utf-8")
+
+    pipeline = PersistencePipeline(_config(tmp_path))
+    await pipeline.start()
+    await _wait_until_persisted(pipeline)
+    await pipeline.stop()
+
+    assert steps == ["transcript", "conversation", "cache"]
+    assert not orphaned_directory.exists()
+    assert not _journaled_files(tmp_path)
+    # malformed journal file is moved aside
+    assert len(list((tmp_path / FAILED_DIRECTORY).iterdir())) == 1
+
+
+async def test_running_process_turns_are_not_taken_over(
+    pipeline: PersistencePipeline, steps: list[str], mocker: MockerFixture
+) -> None:
+    """Test that second pipeline leaves turns of a running pipeline alone."""
+    release = asyncio.Event()
+
+    async def blocked_store(*_args: Any, **_kwargs: Any) -> None:
+        await release.wait()
+
+    mocker.patch(
+        "utils.persistence_pipeline.store_query_cache_entry",
+        new=mocker.AsyncMock(side_effect=blocked_store),
+    )
+    await pipeline.enqueue(_turn_record())
+
+    other = PersistencePipeline(_config(pipeline.journal_path))
+    await other.start()
+    assert other.pending == 0
+    await other.stop()
+
+    release.set()
+    await _wait_until_persisted(pipeline)
+    assert steps == ["quota", "transcript", "conversation"]
+
+
+async def test_journal_contents(
+    pipeline: PersistencePipeline, steps: list[str], mocker: MockerFixture
+) -> None:
+    """Test that queued turn is journaled before it is persisted."""
+    release = asyncio.Event()
+
+    async def blocked_generate(*_args: Any, **_kwargs: Any) -> str:
+        await release.wait()
+        return "Topic"
+
+    mocker.patch(
+        "utils.persistence_pipeline.get_topic_summary",
+        new=mocker.AsyncMock(side_effect=blocked_generate),
+    )
+    await pipeline.enqueue(_turn_record(generate_topic_summary=True))
+
+    (journaled,) = _journaled_files(pipeline.journal_path)
+    assert json.loads(journaled.read_text("utf-8"))["query"] == "question"
+    release.set()
+    await _wait_until_persisted(pipeline)
+    assert steps == ["quota", "transcript", "conversation", "cache"]
+
+
+async def test_module_pipeline_lifecycle(tmp_path: Path) -> None:
+    """Test that the pipeline runs only when configured."""
+    await start_persistence_pipeline(None)
+    assert get_persistence_pipeline() is None
+
+    await start_persistence_pipeline(_config(tmp_path))
+    assert get_persistence_pipeline() is not None
+
+    await stop_persistence_pipeline()
+    assert get_persistence_pipeline() is None
+    # journal directory of stopped process is removed when it is empty
+    assert not list(tmp_path.iterdir())
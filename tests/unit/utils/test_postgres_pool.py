@@ -0,0 +1,266 @@
+"""Unit tests for the shared PostgreSQL connection pool."""
+
+from threading import Thread
+from typing import Any
+
+import psycopg2
+import pytest
+from psycopg2.pool import PoolError
+from pydantic import SecretStr
+from pytest_mock import MockerFixture, MockType
+
+from models.config import PostgreSQLDatabaseConfiguration, PostgreSQLPoolConfiguration
+from utils.connection_decorator import connection
+from utils.postgres_pool import (
+    PostgresConnectionPool,
+    close_postgres_pools,
+    get_postgres_pool,
+    pool_name,
+)
+
+
+def _config(**pool_settings: Any) -> PostgreSQLDatabaseConfiguration:
+    """Return PostgreSQL configuration with given pool settings."""
+    return PostgreSQLDatabaseConfiguration(
+        db="database",
+        user="user",
+        password=SecretStr("password"),
+        pool=PostgreSQLPoolConfiguration(**pool_settings),
+    )  # pyright: ignore[reportCallIssue]
+
+
+@pytest.fixture(name="mock_connect")
+def mock_connect_fixture(mocker: MockerFixture) -> MockType:
+    """Prevent real connections, each connect returns a new mock connection."""
+    return mocker.patch("psycopg2.connect", side_effect=lambda **_: mocker.MagicMock())
+
+
+def test_pool_opens_minimal_number_of_connections(mock_connect: MockType) -> None:
+    """Test that min_size connections are opened in autocommit mode."""
+    pool = PostgresConnectionPool(_config(min_size=2, max_size=3))
+
+    assert mock_connect.call_count == 2
+    assert mock_connect.call_args.kwargs["options"] == "-c search_path=public"
+    pooled = pool.acquire()
+    assert pooled.connection.autocommit is True
+    assert pool.name == pool_name(pool.config) == "localhost:5432/database/public"
+
+
+def test_pool_reuses_released_connection(mock_connect: MockType) -> None:
+    """Test that a released connection is handed out again."""
+    pool = PostgresConnectionPool(_config(min_size=0, max_size=2))
+
+    pooled = pool.acquire()
+    pool.release(pooled)
+
+    assert pool.acquire() is pooled
+    mock_connect.assert_called_once()
+
+
+def test_pool_acquire_timeout(mock_connect: MockType) -> None:
+    """Test that acquire fails when all connections stay leased."""
+    pool = PostgresConnectionPool(_config(min_size=0, max_size=1, acquire_timeout=0.01))
+    pool.acquire()
+
+    with pytest.raises(PoolError, match="Timeout waiting for connection"):
+        pool.acquire()
+    mock_connect.assert_called_once()
+
+
+def test_pool_acquire_waits_for_released_connection(mock_connect: MockType) -> None:
+    """Test that a waiting caller gets a connection released by another thread."""
+    pool = PostgresConnectionPool(_config(min_size=0, max_size=1, acquire_timeout=5))
+    pooled = pool.acquire()
+    acquired = []
+
+    waiter = Thread(target=lambda: acquired.append(pool.acquire()))
+    waiter.start()
+    pool.release(pooled)
+    waiter.join()
+
+    assert acquired == [pooled]
+    mock_connect.assert_called_once()
+
+
+def test_pool_replaces_expired_connection(mock_connect: MockType) -> None:
+    """Test that connections older than max_lifetime are closed, not reused."""
+    pool = PostgresConnectionPool(_config(min_size=1, max_size=1, max_lifetime=1))
+    expired = pool.acquire()
+    expired.created_at -= 10
+    pool.release(expired)
+
+    pooled = pool.acquire()
+
+    assert pooled is not expired
+    expired.connection.close.assert_called_once()
+    assert mock_connect.call_count == 2
+
+
+def test_pool_open_failure_frees_slot(mock_connect: MockType) -> None:
+    """Test that failing connect does not leak a pool slot."""
+    pool = PostgresConnectionPool(_config(min_size=0, max_size=1))
+    mock_connect.side_effect = psycopg2.OperationalError("can not connect")
+
+    with pytest.raises(psycopg2.OperationalError):
+        pool.acquire()
+
+    mock_connect.side_effect = None
+    assert pool.acquire() is not None
+
+
+def test_lease_is_reentrant(mock_connect: MockType) -> None:
+    """Test that nested leases in one thread share one connection."""
+    pool = PostgresConnectionPool(_config(min_size=0, max_size=1, acquire_timeout=0.01))
+
+    with pool.lease() as outer:
+        with pool.lease() as inner:
+            assert inner is outer
+            pool.cursor()
+            pool.commit()
+            pool.rollback()
+        assert pool.leased()
+    assert not pool.leased()
+
+    outer.cursor.assert_called_once()
+    outer.commit.assert_called_once()
+    outer.rollback.assert_called_once()
+    mock_connect.assert_called_once()
+
+
+def test_connection_used_without_lease(mock_connect: MockType) -> None:
+    """Test that the pool can not be used as a connection outside of a lease."""
+    pool = PostgresConnectionPool(_config())
+
+    with pytest.raises(PoolError, match="is leased by current thread"):
+        pool.cursor()
+    mock_connect.assert_called_once()
+
+
+def test_lease_discards_lost_connection(mock_connect: MockType) -> None:
+    """Test that a connection failing with disconnect error is not reused."""
+    pool = PostgresConnectionPool(_config(min_size=2, max_size=2))
+
+    with pytest.raises(psycopg2.OperationalError):
+        with pool.lease() as lost:
+            raise psycopg2.OperationalError("server closed the connection")
+
+    lost.close.assert_called_once()
+    # idle connections are closed too, server has most probably dropped them
+    assert mock_connect.call_count == 2
+    assert pool.acquire().connection is not lost
+    assert mock_connect.call_count == 3
+
+
+def test_lease_keeps_connection_on_other_errors(mock_connect: MockType) -> None:
+    """Test that a connection is returned to the pool on non-disconnect errors."""
+    pool = PostgresConnectionPool(_config(min_size=0, max_size=1))
+
+    with pytest.raises(ValueError):
+        with pool.lease() as leased:
+            raise ValueError("bad value")
+
+    leased.close.assert_not_called()
+    assert pool.acquire().connection is leased
+    mock_connect.assert_called_once()
+
+
+def test_pool_close(mock_connect: MockType) -> None:
+    """Test that closing the pool closes idle connections."""
+    pool = PostgresConnectionPool(_config(min_size=1, max_size=2))
+    leased = pool.acquire()
+
+    pool.close()
+
+    with pytest.raises(PoolError, match="is closed"):
+        pool.acquire()
+    leased.connection.close.assert_not_called()
+    pool.release(leased)
+    leased.connection.close.assert_called_once()
+    mock_connect.assert_called_once()
+
+
+def test_pool_reports_metrics(mocker: MockerFixture, mock_connect: MockType) -> None:
+    """Test that wait time and pool usage are recorded."""
+    mock_wait = mocker.patch("utils.postgres_pool.record_postgres_pool_wait")
+    mock_usage = mocker.patch("utils.postgres_pool.record_postgres_pool_usage")
+    pool = PostgresConnectionPool(_config(min_size=1, max_size=4))
+
+    with pool.lease():
+        mock_usage.assert_called_with(pool.name, 1, 0, 4)
+    mock_usage.assert_called_with(pool.name, 0, 1, 4)
+    mock_wait.assert_called_once()
+    mock_connect.assert_called_once()
+
+
+def test_get_postgres_pool_shares_pool_per_database(mock_connect: MockType) -> None:
+    """Test that storages using the same database share one pool."""
+    pool = get_postgres_pool(_config())
+
+    assert get_postgres_pool(_config(max_size=3)) is pool
+    other = get_postgres_pool(_config().model_copy(update={"db": "other"}))
+    assert other is not pool
+
+    close_postgres_pools()
+    assert pool.closed
+    assert get_postgres_pool(_config()) is not pool
+    assert mock_connect.call_count == 3
+
+
+class PooledStorage:
+    """Storage leasing connections from the pool, used by unit test."""
+
+    disconnect_errors = (psycopg2.OperationalError,)
+
+    def __init__(self, pool: PostgresConnectionPool) -> None:
+        """Initialize storage using given pool."""
+        self.connection = pool
+        self.connects = 0
+
+    def connected(self) -> bool:
+        """Connection is assumed to be healthy."""
+        return True
+
+    def connect(self) -> None:
+        """Reconnect; pooled connections are replaced by the pool itself."""
+        self.connects += 1
+
+    @connection
+    def outer(self) -> Any:
+        """Perform operation calling another operation."""
+        return self.inner()
+
+    @connection
+    def inner(self) -> Any:
+        """Perform operation on the leased connection."""
+        return self.connection.cursor()
+
+
+def test_connection_decorator_leases_pooled_connection(
+    mock_connect: MockType,
+) -> None:
+    """Test that decorated methods run with a leased pooled connection."""
+    pool = PostgresConnectionPool(_config(min_size=1, max_size=1, acquire_timeout=0.01))
+    storage = PooledStorage(pool)
+
+    cursor = storage.outer()
+
+    assert not pool.leased()
+    assert cursor is pool.acquire().connection.cursor.return_value
+    mock_connect.assert_called_once()
+
+
+def test_connection_decorator_retries_on_new_pooled_connection(
+    mock_connect: MockType,
+) -> None:
+    """Test that the outermost operation is retried on a new connection."""
+    pool = PostgresConnectionPool(_config(min_size=1, max_size=1))
+    lost = pool.acquire()
+    lost.connection.cursor.side_effect = psycopg2.OperationalError("lost")
+    pool.release(lost)
+    storage = PooledStorage(pool)
+
+    storage.outer()
+
+    assert storage.connects == 1
+    lost.connection.close.assert_called_once()
+    assert mock_connect.call_count == 2
@@ -0,0 +1,54 @@
+"""Unit tests for SSL settings of asyncpg connections to PostgreSQL."""
+
+from pathlib import Path
+
+import pytest
+from pydantic import SecretStr
+from pytest_mock import MockerFixture
+
+from models.config import PostgreSQLDatabaseConfiguration
+from utils.postgres_ssl import ssl_argument
+
+
+def _config(
+    ssl_mode: str, ca_cert_path: Path | None = None
+) -> PostgreSQLDatabaseConfiguration:
+    """Return PostgreSQL configuration with given SSL settings."""
+    return PostgreSQLDatabaseConfiguration(
+        db="database",
+        user="user",
+        password=SecretStr("password"),
+        ssl_mode=ssl_mode,
+        ca_cert_path=ca_cert_path,
+    )  # pyright: ignore[reportCallIssue]
+
+
+@pytest.mark.parametrize("ssl_mode", ["disable", "prefer", "require", "verify-full"])
+def test_ssl_mode_passed_without_ca_certificate(ssl_mode: str) -> None:
+    """Test that SSL mode is passed as is when no CA certificate is configured."""
+    assert ssl_argument(_config(ssl_mode)) == ssl_mode
+
+
+def test_ca_certificate_ignored_without_verification(tmp_path: Path) -> None:
+    """Test that CA certificate is not used when server is not verified."""
+    ca_cert = tmp_path / "ca.crt"
+    ca_cert.write_text("certificate")
+    assert ssl_argument(_config("require", ca_cert)) == "require"
+
+
+@pytest.mark.parametrize(
+    ("ssl_mode", "check_hostname"), [("verify-ca", False), ("verify-full", True)]
+)
+def test_ssl_context_verifies_server(
+    tmp_path: Path, mocker: MockerFixture, ssl_mode: str, check_hostname: bool
+) -> None:
+    """Test that SSL context trusting the CA certificate is created."""
+    ca_cert = tmp_path / "ca.crt"
+    ca_cert.write_text("certificate")
+    create_context = mocker.patch("utils.postgres_ssl.ssl.create_default_context")
+
+    context = ssl_argument(_config(ssl_mode, ca_cert))
+
+    create_context.assert_called_once_with(cafile=str(ca_cert))
+    assert context is create_context.return_value
+    assert context.check_hostname is check_hostname
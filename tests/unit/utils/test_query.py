@@ -13,7 +13,9 @@ from ogx_client.types import ListModelsResponse, ModelListResponse
 from ogx_client.types.model import Model
 from pydantic_ai.messages import ImageUrl
 from pytest_mock import MockerFixture
+from sqlalchemy.dialects import postgresql, sqlite
 from sqlalchemy.exc import SQLAlchemyError
+from sqlalchemy.ext.asyncio import AsyncSession
 
 from cache.cache_entry import CacheEntry
 from cache.cache_error import CacheError
@@ -26,9 +28,10 @@ from models.api.responses.error import (
 )
 from models.common.query import Attachment
 from models.common.turn_summary import TurnSummary
-from models.config import Action
+from models.config import Action, QuotaReservationConfiguration
 from models.database.conversations import UserConversation, UserTurn
 from tests.unit import config_dict
+from utils.conversation_metadata_cache import conversation_metadata_cache
 from utils.query import (
     build_multimodal_input,
     consume_query_tokens,
@@ -37,8 +40,11 @@ from utils.query import (
     is_transcripts_enabled,
     persist_user_conversation_details,
     prepare_input,
+    release_query_tokens,
+    reserve_query_tokens,
     store_conversation_into_cache,
     store_query_results,
+    update_conversation_topic_summary,
     validate_attachments_metadata,
     validate_model_provider_override,
 )
@@ -79,11 +85,12 @@ def mock_models_fixture() -> ModelListResponse:
 class TestStoreConversationIntoCache:
     """Tests for store_conversation_into_cache function."""
 
-    def test_store_with_cache_configured(self, mocker: MockerFixture) -> None:
+    @pytest.mark.asyncio
+    async def test_store_with_cache_configured(self, mocker: MockerFixture) -> None:
         """Test storing conversation when cache is configured."""
         mock_config = mocker.Mock(spec=AppConfig)
-        mock_cache = mocker.Mock()
-        mock_config.conversation_cache = mock_cache
+        mock_cache = mocker.AsyncMock()
+        mock_config.async_conversation_cache = mock_cache
         mock_config.conversation_cache_configuration = mocker.Mock()
         mock_config.conversation_cache_configuration.type = "sqlite"
         mocker.patch("utils.query.configuration", mock_config)
@@ -97,7 +104,7 @@ class TestStoreConversationIntoCache:
             completed_at="2024-01-01T00:00:05Z",
         )
 
-        store_conversation_into_cache(
+        await store_conversation_into_cache(
             user_id="test_user",
             conversation_id="test_conv",
             cache_entry=cache_entry,
@@ -105,18 +112,19 @@ class TestStoreConversationIntoCache:
             topic_summary="Test topic",
         )
 
-        mock_cache.insert_or_append.assert_called_once_with(
+        mock_cache.insert_or_append.assert_awaited_once_with(
             "test_user", "test_conv", cache_entry, False
         )
-        mock_cache.set_topic_summary.assert_called_once_with(
+        mock_cache.set_topic_summary.assert_awaited_once_with(
             "test_user", "test_conv", "Test topic", False
         )
 
-    def test_store_without_topic_summary(self, mocker: MockerFixture) -> None:
+    @pytest.mark.asyncio
+    async def test_store_without_topic_summary(self, mocker: MockerFixture) -> None:
         """Test storing conversation without topic summary."""
         mock_config = mocker.Mock(spec=AppConfig)
-        mock_cache = mocker.Mock()
-        mock_config.conversation_cache = mock_cache
+        mock_cache = mocker.AsyncMock()
+        mock_config.async_conversation_cache = mock_cache
         mock_config.conversation_cache_configuration = mocker.Mock()
         mock_config.conversation_cache_configuration.type = "sqlite"
 
@@ -130,7 +138,7 @@ class TestStoreConversationIntoCache:
         )
 
         mocker.patch("utils.query.configuration", mock_config)
-        store_conversation_into_cache(
+        await store_conversation_into_cache(
             user_id="test_user",
             conversation_id="test_conv",
             cache_entry=cache_entry,
@@ -138,13 +146,16 @@ class TestStoreConversationIntoCache:
             topic_summary=None,
         )
 
-        mock_cache.insert_or_append.assert_called_once()
-        mock_cache.set_topic_summary.assert_not_called()
+        mock_cache.insert_or_append.assert_awaited_once()
+        mock_cache.set_topic_summary.assert_not_awaited()
 
-    def test_store_with_cache_not_initialized(self, mocker: MockerFixture) -> None:
+    @pytest.mark.asyncio
+    async def test_store_with_cache_not_initialized(
+        self, mocker: MockerFixture
+    ) -> None:
         """Test storing when cache is configured but not initialized."""
         mock_config = mocker.Mock(spec=AppConfig)
-        mock_config.conversation_cache = None
+        mock_config.async_conversation_cache = None
         mock_config.conversation_cache_configuration = mocker.Mock()
         mock_config.conversation_cache_configuration.type = "sqlite"
 
@@ -159,7 +170,7 @@ class TestStoreConversationIntoCache:
 
         # Should not raise an exception, just log a warning
         mocker.patch("utils.query.configuration", mock_config)
-        store_conversation_into_cache(
+        await store_conversation_into_cache(
             user_id="test_user",
             conversation_id="test_conv",
             cache_entry=cache_entry,
@@ -463,35 +474,72 @@ class TestIsTranscriptsEnabled:
         assert is_transcripts_enabled() is False
 
 
+def _mock_async_session(
+    mocker: MockerFixture, message_count: int, dialect_name: str = "sqlite"
+) -> Any:
+    """Create AsyncSession mock used by persist_user_conversation_details.
+
+    Parameters:
+        mocker: pytest-mock fixture.
+        message_count: Conversation message count returned by the upsert.
+        dialect_name: Name of the database dialect used by the session.
+
+    Returns:
+        Mock of AsyncSession usable as an async context manager.
+    """
+    mock_session = mocker.AsyncMock(spec=AsyncSession)
+    mock_session.__aenter__.return_value = mock_session
+    mock_session.get_bind.return_value.dialect.name = dialect_name
+    mock_session.scalars.return_value = mocker.Mock()
+    mock_session.scalars.return_value.one.return_value = UserConversation(
+        id="conv1",
+        user_id="user1",
+        last_used_model="model1",
+        last_used_provider="provider1",
+        message_count=message_count,
+    )
+    mocker.patch("utils.query.get_async_session", return_value=mock_session)
+    return mock_session
+
+
+def _upsert_sql(mock_session: Any, dialect: Any) -> str:
+    """Compile the conversation upsert executed through the session mock.
+
+    Parameters:
+        mock_session: Session mock passed to persist_user_conversation_details.
+        dialect: SQLAlchemy dialect used to compile the statement.
+
+    Returns:
+        SQL text of the upsert statement.
+    """
+    statement = mock_session.scalars.await_args.args[0]
+    return str(statement.compile(dialect=dialect))
+
+
+def _added_turn(mock_session: Any) -> UserTurn:
+    """Return the only turn added to the session mock.
+
+    Parameters:
+        mock_session: Session mock passed to persist_user_conversation_details.
+
+    Returns:
+        The UserTurn added to the session.
+    """
+    mock_session.add.assert_called_once()
+    turn = mock_session.add.call_args.args[0]
+    assert isinstance(turn, UserTurn)
+    return turn
+
+
 class TestPersistUserConversationDetails:
     """Tests for persist_user_conversation_details function."""
 
-    def test_create_new_conversation(self, mocker: MockerFixture) -> None:
+    @pytest.mark.asyncio
+    async def test_create_new_conversation(self, mocker: MockerFixture) -> None:
         """Test creating a new conversation."""
-        mock_session = mocker.Mock()
-
-        # Mock the UserConversation query
-        mock_conv_query = mocker.Mock()
-        mock_conv_query.filter_by.return_value.first.return_value = None
-
-        # Mock the max turn number query
-        mock_filtered_query = mocker.Mock()
-        mock_filtered_query.scalar.return_value = None
-        mock_max_query = mocker.Mock()
-        mock_max_query.filter_by.return_value = mock_filtered_query
-
-        def query_side_effect(*args: Any) -> Any:
-            """Route queries based on the argument type."""
-            if args and args[0] is UserConversation:
-                return mock_conv_query
-            return mock_max_query
-
-        mock_session.query.side_effect = query_side_effect
-        mock_session.__enter__ = mocker.Mock(return_value=mock_session)
-        mock_session.__exit__ = mocker.Mock(return_value=None)
-        mocker.patch("utils.query.get_session", return_value=mock_session)
-
-        persist_user_conversation_details(
+        mock_session = _mock_async_session(mocker, 1)
+
+        await persist_user_conversation_details(
             user_id="user1",
             conversation_id="conv1",
             started_at="2024-01-01T00:00:00Z",
@@ -502,44 +550,22 @@ class TestPersistUserConversationDetails:
             response_id="resp_1",
         )
 
-        mock_session.add.assert_called()
-        mock_session.commit.assert_called_once()
-
-    def test_update_existing_conversation(self, mocker: MockerFixture) -> None:
-        """Test updating an existing conversation."""
-        existing_conv = UserConversation(
-            id="conv1",
-            user_id="user1",
-            last_used_model="old_model",
-            last_used_provider="old_provider",
-            message_count=5,
-        )
-        mock_session = mocker.Mock()
-
-        # Mock the UserConversation query
-        mock_conv_query = mocker.Mock()
-        mock_conv_query.filter_by.return_value.first.return_value = existing_conv
-
-        # Mock the max turn number query
-        # The query chain is: session.query(func.max(...)).filter_by(...).scalar()
-        mock_filtered_query = mocker.Mock()
-        mock_filtered_query.scalar.return_value = None
-        mock_max_query = mocker.Mock()
-        mock_max_query.filter_by.return_value = mock_filtered_query
-
-        def query_side_effect(*args: Any) -> Any:
-            """Route queries based on the argument type."""
-            if args and args[0] is UserConversation:
-                return mock_conv_query
-            # func.max(UserTurn.turn_number) doesn't match UserTurn type, falls through
-            return mock_max_query
-
-        mock_session.query.side_effect = query_side_effect
-        mock_session.__enter__ = mocker.Mock(return_value=mock_session)
-        mock_session.__exit__ = mocker.Mock(return_value=None)
-        mocker.patch("utils.query.get_session", return_value=mock_session)
-
-        persist_user_conversation_details(
+        statement = mock_session.scalars.await_args.args[0]
+        parameters = statement.compile().params
+        assert parameters["id"] == "conv1"
+        assert parameters["user_id"] == "user1"
+        assert parameters["topic_summary"] == "Topic"
+        assert parameters["message_count"] == 1
+        assert parameters["last_response_id"] == "resp_1"
+        assert _added_turn(mock_session).turn_number == 1
+        mock_session.commit.assert_awaited_once()
+
+    @pytest.mark.asyncio
+    async def test_update_existing_conversation(self, mocker: MockerFixture) -> None:
+        """Test updating an existing conversation in a single upsert."""
+        mock_session = _mock_async_session(mocker, 6)
+
+        await persist_user_conversation_details(
             user_id="user1",
             conversation_id="conv1",
             started_at="2024-01-01T00:00:00Z",
@@ -550,40 +576,53 @@ class TestPersistUserConversationDetails:
             response_id="resp_1",
         )
 
-        assert existing_conv.last_used_model == "new_model"
-        assert existing_conv.last_used_provider == "new_provider"
-        assert existing_conv.message_count == 6
-        mock_session.commit.assert_called_once()
+        sql = _upsert_sql(mock_session, sqlite.dialect())
+        assert "ON CONFLICT (id) DO UPDATE SET" in sql
+        assert "last_used_model = excluded.last_used_model" in sql
+        assert "last_used_provider = excluded.last_used_provider" in sql
+        assert "last_response_id = excluded.last_response_id" in sql
+        assert "message_count = (user_conversation.message_count + ?)" in sql
+        # the whole updated record is returned
+        assert "RETURNING id, user_id," in sql
+        mock_session.commit.assert_awaited_once()
+
+    @pytest.mark.asyncio
+    async def test_turn_number_taken_from_message_count(
+        self, mocker: MockerFixture
+    ) -> None:
+        """Test the turn number is derived from the conversation counter."""
+        mock_session = _mock_async_session(mocker, 6)
+
+        await persist_user_conversation_details(
+            user_id="user1",
+            conversation_id="conv1",
+            started_at="2024-01-01T00:00:00Z",
+            completed_at="2024-01-01T00:00:05Z",
+            model_id="model1",
+            provider_id="provider1",
+            topic_summary="Topic",
+            response_id="resp_1",
+        )
 
-    def test_create_new_conversation_with_existing_turns(
+        # only the upsert is executed, turns are not scanned
+        mock_session.scalars.assert_awaited_once()
+        mock_session.execute.assert_not_awaited()
+        turn = _added_turn(mock_session)
+        assert turn.turn_number == 6
+        assert turn.response_id == "resp_1"
+        mock_session.commit.assert_awaited_once()
+
+    @pytest.mark.asyncio
+    async def test_conversation_metadata_cache_updated(
         self, mocker: MockerFixture
     ) -> None:
-        """Test creating a new conversation when there are existing turns."""
-        mock_session = mocker.Mock()
-
-        # Mock the UserConversation query
-        mock_conv_query = mocker.Mock()
-        mock_conv_query.filter_by.return_value.first.return_value = None
-
-        # Mock the max turn number query - return existing turn number
-        mock_filtered_query = mocker.Mock()
-        mock_filtered_query.scalar.return_value = 5  # Existing max turn number
-        mock_max_query = mocker.Mock()
-        mock_max_query.filter_by.return_value = mock_filtered_query
-
-        def query_side_effect(*args: Any) -> Any:
-            """Route queries based on the argument type."""
-            if args and args[0] is UserConversation:
-                return mock_conv_query
-            # func.max(UserTurn.turn_number) doesn't match UserTurn type, falls through
-            return mock_max_query
-
-        mock_session.query.side_effect = query_side_effect
-        mock_session.__enter__ = mocker.Mock(return_value=mock_session)
-        mock_session.__exit__ = mocker.Mock(return_value=None)
-        mocker.patch("utils.query.get_session", return_value=mock_session)
-
-        persist_user_conversation_details(
+        """Test the cached conversation record is replaced by the written one."""
+        conversation_metadata_cache.update(
+            UserConversation(id="conv1", user_id="user1", message_count=5)
+        )
+        _mock_async_session(mocker, 6)
+
+        await persist_user_conversation_details(
             user_id="user1",
             conversation_id="conv1",
             started_at="2024-01-01T00:00:00Z",
@@ -594,23 +633,120 @@ class TestPersistUserConversationDetails:
             response_id="resp_1",
         )
 
-        # Verify that the turn number is incremented correctly
-        add_calls = mock_session.add.call_args_list
-        assert len(add_calls) == 2  # Conversation and UserTurn
+        cached = conversation_metadata_cache.get("conv1")
+        assert cached is not None
+        assert cached.message_count == 6
+        assert cached.last_used_model == "model1"
 
-        # Find the UserTurn object in the add calls
-        turn_added = None
-        for call in add_calls:
-            obj = call[0][0]
-            if isinstance(obj, UserTurn):
-                turn_added = obj
-                break
+    @pytest.mark.asyncio
+    async def test_conversation_of_other_user_stays_in_owner_shard(
+        self, mocker: MockerFixture
+    ) -> None:
+        """Test the turn is stored in the shard of the conversation owner."""
+        conversation_metadata_cache.update(
+            UserConversation(id="conv1", user_id="owner", message_count=5)
+        )
+        get_session = mocker.patch(
+            "utils.query.get_async_session",
+            return_value=_mock_async_session(mocker, 6),
+        )
 
-        assert turn_added is not None, "UserTurn should have been added"
-        assert (
-            turn_added.turn_number == 6
-        ), "Turn number should be incremented from 5 to 6"
-        mock_session.commit.assert_called_once()
+        await persist_user_conversation_details(
+            user_id="admin",
+            conversation_id="conv1",
+            started_at="2024-01-01T00:00:00Z",
+            completed_at="2024-01-01T00:00:05Z",
+            model_id="model1",
+            provider_id="provider1",
+            topic_summary=None,
+            response_id="resp_1",
+        )
+
+        get_session.assert_called_once_with("owner")
+
+    @pytest.mark.asyncio
+    async def test_moderation_response_keeps_last_response_id(
+        self, mocker: MockerFixture
+    ) -> None:
+        """Test moderation-blocked turn does not replace last response ID."""
+        mock_session = _mock_async_session(mocker, 2)
+
+        await persist_user_conversation_details(
+            user_id="user1",
+            conversation_id="conv1",
+            started_at="2024-01-01T00:00:00Z",
+            completed_at="2024-01-01T00:00:05Z",
+            model_id="model1",
+            provider_id="provider1",
+            topic_summary=None,
+            response_id="modr_1",
+        )
+
+        statement = mock_session.scalars.await_args.args[0]
+        assert statement.compile().params["last_response_id"] is None
+        assert "last_response_id = excluded" not in _upsert_sql(
+            mock_session, sqlite.dialect()
+        )
+        assert _added_turn(mock_session).response_id == "modr_1"
+
+    @pytest.mark.asyncio
+    async def test_postgres_upsert(self, mocker: MockerFixture) -> None:
+        """Test PostgreSQL dialect upsert is used for PostgreSQL database."""
+        mock_session = _mock_async_session(mocker, 3, dialect_name="postgresql")
+
+        await persist_user_conversation_details(
+            user_id="user1",
+            conversation_id="conv1",
+            started_at="2024-01-01T00:00:00Z",
+            completed_at="2024-01-01T00:00:05Z",
+            model_id="model1",
+            provider_id="provider1",
+            topic_summary=None,
+            response_id="resp_1",
+        )
+
+        statement = mock_session.scalars.await_args.args[0]
+        assert isinstance(statement, postgresql.Insert)
+        dialect = postgresql.dialect()  # type: ignore[no-untyped-call]
+        sql = _upsert_sql(mock_session, dialect)
+        assert "ON CONFLICT (id) DO UPDATE SET" in sql
+        assert "RETURNING user_conversation.id, user_conversation.user_id," in sql
+        assert _added_turn(mock_session).turn_number == 3
+
+
+class TestUpdateConversationTopicSummary:
+    """Tests for update_conversation_topic_summary function."""
+
+    @pytest.mark.asyncio
+    async def test_conversation_metadata_cache_invalidated(
+        self, mocker: MockerFixture
+    ) -> None:
+        """Test the cached conversation record is dropped after update."""
+        conversation_metadata_cache.update(
+            UserConversation(id="conv1", user_id="user1", message_count=1)
+        )
+        mock_session = mocker.AsyncMock(spec=AsyncSession)
+        mock_session.__aenter__.return_value = mock_session
+        mock_session.get.return_value = UserConversation(id="conv1")
+        mocker.patch("utils.query.get_async_sessions", return_value=[mock_session])
+
+        await update_conversation_topic_summary("conv1", "New topic")
+
+        assert mock_session.get.return_value.topic_summary == "New topic"
+        mock_session.commit.assert_awaited_once()
+        assert conversation_metadata_cache.get("conv1") is None
+
+    @pytest.mark.asyncio
+    async def test_missing_conversation(self, mocker: MockerFixture) -> None:
+        """Test nothing is written when the conversation does not exist."""
+        mock_session = mocker.AsyncMock(spec=AsyncSession)
+        mock_session.__aenter__.return_value = mock_session
+        mock_session.get.return_value = None
+        mocker.patch("utils.query.get_async_sessions", return_value=[mock_session])
+
+        await update_conversation_topic_summary("conv1", "New topic")
+
+        mock_session.commit.assert_not_awaited()
 
 
 class TestConsumeQueryTokens:
@@ -629,6 +765,7 @@ class TestConsumeQueryTokens:
 
         # Verify consume_tokens was called
         mock_consume.assert_called_once()
+        assert mock_consume.call_args.kwargs["reservations"] is None
 
     def test_consume_tokens_database_error(self, mocker: MockerFixture) -> None:
         """Test token consumption raises HTTPException on database error."""
@@ -646,10 +783,65 @@ class TestConsumeQueryTokens:
         assert exc_info.value.status_code == 500
 
 
+class TestReserveQueryTokens:
+    """Tests for reserve_query_tokens function."""
+
+    def test_quota_checked_without_reservations(self, mocker: MockerFixture) -> None:
+        """Test that available quota is checked when reservations are off."""
+        mock_config = mocker.Mock()
+        mock_config.quota_handlers_configuration.reservation = None
+        mocker.patch("utils.query.configuration", mock_config)
+        mock_check = mocker.patch("utils.query.check_tokens_available")
+        mock_reserve = mocker.patch("utils.query.reserve_tokens")
+
+        assert not reserve_query_tokens("user1", "What is OpenShift?")
+
+        mock_check.assert_called_once_with(mock_config.quota_limiters, "user1")
+        mock_reserve.assert_not_called()
+
+    def test_estimated_tokens_reserved(self, mocker: MockerFixture) -> None:
+        """Test that estimated input and configured output tokens are reserved."""
+        mock_config = mocker.Mock()
+        mock_config.quota_handlers_configuration.reservation = (
+            QuotaReservationConfiguration(output_tokens=500)
+        )
+        mocker.patch("utils.query.configuration", mock_config)
+        mocker.patch("utils.query.estimate_tokens", return_value=20)
+        mock_reserve = mocker.patch("utils.query.reserve_tokens", return_value=[None])
+
+        assert reserve_query_tokens("user1", "What is OpenShift?") == [None]
+
+        mock_reserve.assert_called_once_with(mock_config.quota_limiters, "user1", 520)
+
+
+class TestReleaseQueryTokens:
+    """Tests for release_query_tokens function."""
+
+    def test_reserved_tokens_released(self, mocker: MockerFixture) -> None:
+        """Test that reserved tokens are returned to the quota limiters."""
+        mock_config = mocker.Mock()
+        mocker.patch("utils.query.configuration", mock_config)
+        mock_release = mocker.patch("utils.query.release_reservations")
+        reservations = [mocker.Mock(), None]
+
+        release_query_tokens(reservations)
+
+        mock_release.assert_called_once_with(mock_config.quota_limiters, reservations)
+
+    def test_nothing_released_without_reservations(self, mocker: MockerFixture) -> None:
+        """Test that settled or missing reservations release nothing."""
+        mock_release = mocker.patch("utils.query.release_reservations")
+
+        release_query_tokens([])
+
+        mock_release.assert_not_called()
+
+
 class TestStoreQueryResults:
     """Tests for store_query_results function."""
 
-    def test_store_query_results_success(self, mocker: MockerFixture) -> None:
+    @pytest.mark.asyncio
+    async def test_store_query_results_success(self, mocker: MockerFixture) -> None:
         """Test successful storage of query results."""
         mocker.patch("utils.query.is_transcripts_enabled", return_value=False)
         mock_persist = mocker.patch("utils.query.persist_user_conversation_details")
@@ -661,7 +853,7 @@ class TestStoreQueryResults:
 
         query_request = QueryRequest(query="test")  # pyright: ignore[reportCallIssue]
 
-        store_query_results(
+        await store_query_results(
             user_id="user1",
             conversation_id="conv1",
             model="provider1/model1",
@@ -675,9 +867,12 @@ class TestStoreQueryResults:
 
         # Verify functions were called
         mock_persist.assert_called_once()
-        mock_store_cache.assert_called_once()
+        mock_store_cache.assert_awaited_once()
 
-    def test_store_query_results_transcript_error(self, mocker: MockerFixture) -> None:
+    @pytest.mark.asyncio
+    async def test_store_query_results_transcript_error(
+        self, mocker: MockerFixture
+    ) -> None:
         """Test storage raises HTTPException on transcript error."""
         mocker.patch("utils.query.is_transcripts_enabled", return_value=True)
         error_response = InternalServerErrorResponse.generic()
@@ -693,7 +888,7 @@ class TestStoreQueryResults:
         query_request = QueryRequest(query="test")  # pyright: ignore[reportCallIssue]
 
         with pytest.raises(HTTPException) as exc_info:
-            store_query_results(
+            await store_query_results(
                 user_id="user1",
                 conversation_id="conv1",
                 model="provider1/model1",
@@ -706,7 +901,10 @@ class TestStoreQueryResults:
             )
         assert exc_info.value.status_code == 500
 
-    def test_store_query_results_sqlalchemy_error(self, mocker: MockerFixture) -> None:
+    @pytest.mark.asyncio
+    async def test_store_query_results_sqlalchemy_error(
+        self, mocker: MockerFixture
+    ) -> None:
         """Test storage raises HTTPException on SQLAlchemy error."""
         mocker.patch("utils.query.is_transcripts_enabled", return_value=False)
         mocker.patch(
@@ -721,7 +919,7 @@ class TestStoreQueryResults:
         query_request = QueryRequest(query="test")  # pyright: ignore[reportCallIssue]
 
         with pytest.raises(HTTPException) as exc_info:
-            store_query_results(
+            await store_query_results(
                 user_id="user1",
                 conversation_id="conv1",
                 model="provider1/model1",
@@ -734,7 +932,8 @@ class TestStoreQueryResults:
             )
         assert exc_info.value.status_code == 500
 
-    def test_store_query_results_cache_error(self, mocker: MockerFixture) -> None:
+    @pytest.mark.asyncio
+    async def test_store_query_results_cache_error(self, mocker: MockerFixture) -> None:
         """Test storage raises HTTPException on cache error."""
         mocker.patch("utils.query.is_transcripts_enabled", return_value=False)
         mocker.patch("utils.query.persist_user_conversation_details")
@@ -750,7 +949,7 @@ class TestStoreQueryResults:
         query_request = QueryRequest(query="test")  # pyright: ignore[reportCallIssue]
 
         with pytest.raises(HTTPException) as exc_info:
-            store_query_results(
+            await store_query_results(
                 user_id="user1",
                 conversation_id="conv1",
                 model="provider1/model1",
@@ -763,7 +962,8 @@ class TestStoreQueryResults:
             )
         assert exc_info.value.status_code == 500
 
-    def test_store_query_results_value_error(self, mocker: MockerFixture) -> None:
+    @pytest.mark.asyncio
+    async def test_store_query_results_value_error(self, mocker: MockerFixture) -> None:
         """Test storage raises HTTPException on ValueError."""
         mocker.patch("utils.query.is_transcripts_enabled", return_value=False)
         mocker.patch("utils.query.persist_user_conversation_details")
@@ -779,7 +979,7 @@ class TestStoreQueryResults:
         query_request = QueryRequest(query="test")  # pyright: ignore[reportCallIssue]
 
         with pytest.raises(HTTPException) as exc_info:
-            store_query_results(
+            await store_query_results(
                 user_id="user1",
                 conversation_id="conv1",
                 model="provider1/model1",
@@ -792,7 +992,10 @@ class TestStoreQueryResults:
             )
         assert exc_info.value.status_code == 500
 
-    def test_store_query_results_psycopg2_error(self, mocker: MockerFixture) -> None:
+    @pytest.mark.asyncio
+    async def test_store_query_results_psycopg2_error(
+        self, mocker: MockerFixture
+    ) -> None:
         """Test storage raises HTTPException on psycopg2 error."""
         mocker.patch("utils.query.is_transcripts_enabled", return_value=False)
         mocker.patch("utils.query.persist_user_conversation_details")
@@ -808,7 +1011,7 @@ class TestStoreQueryResults:
         query_request = QueryRequest(query="test")  # pyright: ignore[reportCallIssue]
 
         with pytest.raises(HTTPException) as exc_info:
-            store_query_results(
+            await store_query_results(
                 user_id="user1",
                 conversation_id="conv1",
                 model="provider1/model1",
@@ -821,7 +1024,10 @@ class TestStoreQueryResults:
             )
         assert exc_info.value.status_code == 500
 
-    def test_store_query_results_sqlite_error(self, mocker: MockerFixture) -> None:
+    @pytest.mark.asyncio
+    async def test_store_query_results_sqlite_error(
+        self, mocker: MockerFixture
+    ) -> None:
         """Test storage raises HTTPException on sqlite3 error."""
         mocker.patch("utils.query.is_transcripts_enabled", return_value=False)
         mocker.patch("utils.query.persist_user_conversation_details")
@@ -837,7 +1043,7 @@ class TestStoreQueryResults:
         query_request = QueryRequest(query="test")  # pyright: ignore[reportCallIssue]
 
         with pytest.raises(HTTPException) as exc_info:
-            store_query_results(
+            await store_query_results(
                 user_id="user1",
                 conversation_id="conv1",
                 model="provider1/model1",
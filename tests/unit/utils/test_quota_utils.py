@@ -0,0 +1,166 @@
+"""Unit tests for functions defined in utils/quota_utils module."""
+
+from pathlib import Path
+
+import pytest
+from fastapi import HTTPException
+from pytest_mock import MockerFixture
+
+from models.config import (
+    QuotaHandlersConfiguration,
+    QuotaNegativeCacheConfiguration,
+    QuotaReservationConfiguration,
+    SQLiteDatabaseConfiguration,
+)
+from quota.cluster_quota_limiter import ClusterQuotaLimiter
+from quota.quota_limiter import QuotaLimiter
+from quota.user_quota_limiter import UserQuotaLimiter
+from utils.quota_utils import (
+    check_tokens_available,
+    consume_tokens,
+    get_available_quotas,
+    reserve_tokens,
+)
+
+
+def create_quota_limiters(user_quota: int, cluster_quota: int) -> list[QuotaLimiter]:
+    """Create user and cluster quota limiters reserving tokens."""
+    configuration = QuotaHandlersConfiguration(
+        sqlite=SQLiteDatabaseConfiguration(db_path=":memory:"),
+        reservation=QuotaReservationConfiguration(),
+    )  # pyright: ignore[reportCallIssue]
+    return [
+        UserQuotaLimiter(configuration, user_quota, 1),
+        ClusterQuotaLimiter(configuration, cluster_quota, 1),
+    ]
+
+
+def test_reserve_and_consume_tokens() -> None:
+    """Test that reserved tokens are settled in all quota limiters."""
+    quota_limiters = create_quota_limiters(1000, 5000)
+
+    reservations = reserve_tokens(quota_limiters, "user1", 300)
+
+    assert [r.tokens if r else None for r in reservations] == [300, 300]
+    assert quota_limiters[0].available_quota("user1") == 700
+    assert quota_limiters[1].available_quota() == 4700
+
+    consume_tokens(
+        quota_limiters,
+        None,
+        "user1",
+        input_tokens=10,
+        output_tokens=40,
+        model_id="model1",
+        provider_id="provider1",
+        reservations=reservations,
+    )
+
+    assert quota_limiters[0].available_quota("user1") == 950
+    assert quota_limiters[1].available_quota() == 4950
+
+
+def test_reservations_released_when_quota_exceeded() -> None:
+    """Test that tokens reserved in other limiters are returned on 429."""
+    quota_limiters = create_quota_limiters(1000, 100)
+
+    with pytest.raises(HTTPException) as exc_info:
+        reserve_tokens(quota_limiters, "user1", 300)
+
+    assert exc_info.value.status_code == 429
+    assert quota_limiters[0].available_quota("user1") == 1000
+    assert quota_limiters[1].available_quota() == 100
+
+
+def create_shared_quota_limiters(
+    db_path: Path, user_quota: int, cluster_quota: int
+) -> list[QuotaLimiter]:
+    """Create user and cluster quota limiters storing quota in one database."""
+    configuration = QuotaHandlersConfiguration(
+        sqlite=SQLiteDatabaseConfiguration(db_path=str(db_path)),
+    )  # pyright: ignore[reportCallIssue]
+    return [
+        UserQuotaLimiter(configuration, user_quota, 1),
+        ClusterQuotaLimiter(configuration, cluster_quota, 1),
+    ]
+
+
+def test_available_quotas_read_by_one_query(
+    mocker: MockerFixture, tmp_path: Path
+) -> None:
+    """Test that quota of limiters sharing the database is read together."""
+    quota_limiters = create_shared_quota_limiters(tmp_path / "quota.db", 100, 500)
+    # quota of new subjects is initialized by the limiters
+    assert get_available_quotas(quota_limiters, "user1") == {
+        "UserQuotaLimiter": 100,
+        "ClusterQuotaLimiter": 500,
+    }
+    quota_limiters[1].consume_tokens(100, 0)
+    read = mocker.spy(quota_limiters[0], "_read_quotas")
+    single = [
+        mocker.spy(quota_limiter, "_available_quota")
+        for quota_limiter in quota_limiters
+    ]
+
+    assert get_available_quotas(quota_limiters, "user1") == {
+        "UserQuotaLimiter": 100,
+        "ClusterQuotaLimiter": 400,
+    }
+    check_tokens_available(quota_limiters, "user1")
+
+    assert read.call_count == 2
+    assert all(spy.call_count == 0 for spy in single)
+
+
+def test_batched_quota_check_exceeded(tmp_path: Path) -> None:
+    """Test that exhausted quota read together with other quota is refused."""
+    quota_limiters = create_shared_quota_limiters(tmp_path / "quota.db", 100, 500)
+    check_tokens_available(quota_limiters, "user1")
+    quota_limiters[0].consume_tokens(60, 40, "user1")
+
+    with pytest.raises(HTTPException) as exc_info:
+        check_tokens_available(quota_limiters, "user1")
+
+    assert exc_info.value.status_code == 429
+
+
+def test_in_memory_quota_read_by_limiters() -> None:
+    """Test that quota in separate in-memory databases is not read together."""
+    quota_limiters = create_quota_limiters(100, 500)
+
+    assert all(
+        quota_limiter.shared_storage() is None for quota_limiter in quota_limiters
+    )
+    assert QuotaLimiter.available_quotas(quota_limiters, "user1") == [None, None]
+    assert get_available_quotas(quota_limiters, "user1") == {
+        "UserQuotaLimiter": 100,
+        "ClusterQuotaLimiter": 500,
+    }
+
+
+def test_exhausted_quota_refused_before_reading_quota(
+    mocker: MockerFixture, tmp_path: Path
+) -> None:
+    """Test that user cached with exhausted quota is refused without a query."""
+    configuration = QuotaHandlersConfiguration(
+        sqlite=SQLiteDatabaseConfiguration(db_path=str(tmp_path / "quota.db")),
+        negative_cache=QuotaNegativeCacheConfiguration(ttl=60),
+    )  # pyright: ignore[reportCallIssue]
+    quota_limiters: list[QuotaLimiter] = [
+        UserQuotaLimiter(configuration, 100, 1),
+        ClusterQuotaLimiter(configuration, 500, 1),
+    ]
+    check_tokens_available(quota_limiters, "user1")
+    quota_limiters[0].consume_tokens(60, 40, "user1")
+    with pytest.raises(HTTPException):
+        check_tokens_available(quota_limiters, "user1")
+    read = mocker.spy(quota_limiters[0], "_read_quotas")
+
+    with pytest.raises(HTTPException) as exc_info:
+        check_tokens_available(quota_limiters, "user1")
+
+    assert exc_info.value.status_code == 429
+    assert read.call_count == 0
+    # quota of other users is read
+    check_tokens_available(quota_limiters, "user2")
+    assert read.call_count == 1
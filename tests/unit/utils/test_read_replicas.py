@@ -0,0 +1,204 @@
+"""Unit tests for routing of reads to PostgreSQL read replicas."""
+
+import asyncio
+from collections.abc import Iterator
+from typing import Any
+
+import psycopg2
+import pytest
+from pydantic import SecretStr
+from pytest_mock import MockerFixture, MockType
+
+from models.config import (
+    PostgreSQLDatabaseConfiguration,
+    PostgreSQLReplicaConfiguration,
+)
+from utils.postgres_pool import close_postgres_pools
+from utils.read_replicas import (
+    ReplicaRouter,
+    clear_user_writes,
+    record_user_write,
+    replica_configurations,
+    replica_router,
+    route_async_read,
+    route_pooled_read,
+    wrote_recently,
+)
+
+
+def _config(**kwargs: Any) -> PostgreSQLDatabaseConfiguration:
+    """Return PostgreSQL configuration with two read replicas by default."""
+    kwargs.setdefault(
+        "replicas",
+        [
+            PostgreSQLReplicaConfiguration(host="replica1"),
+            PostgreSQLReplicaConfiguration(host="replica2", port=5433),
+        ],
+    )
+    return PostgreSQLDatabaseConfiguration(
+        db="database", user="user", password=SecretStr("password"), **kwargs
+    )  # pyright: ignore[reportCallIssue]
+
+
+@pytest.fixture(autouse=True)
+def forget_writes() -> Iterator[None]:
+    """Start every test without remembered writes and pools."""
+    clear_user_writes()
+    yield
+    clear_user_writes()
+    close_postgres_pools()
+
+
+def _healthy_router(replicas: list[str]) -> ReplicaRouter[str]:
+    """Return router whose replicas have all been measured healthy."""
+    router = ReplicaRouter(replicas, max_lag=5, read_your_writes_window=10)
+    for index in router.claim_lag_checks():
+        router.report_lag(index, 0)
+    return router
+
+
+def test_replica_configurations() -> None:
+    """Test that replicas inherit all settings but host and port."""
+    first, second = replica_configurations(_config(namespace="lcs"))
+
+    assert (first.host, first.port) == ("replica1", 5432)
+    assert (second.host, second.port) == ("replica2", 5433)
+    assert second.db == "database"
+    assert second.namespace == "lcs"
+    assert not second.replicas
+
+
+def test_replica_router_is_created_for_replicas_only() -> None:
+    """Test that no router is used without replicas."""
+    assert replica_router(None, []) is None
+    assert replica_router(_config(), []) is None
+
+    router = replica_router(_config(max_replica_lag=1), ["a", "b"])
+    assert router is not None
+    assert router.max_lag == 1
+    assert router.read_your_writes_window == 10
+
+
+def test_reads_are_spread_across_replicas() -> None:
+    """Test round-robin over healthy replicas."""
+    router = _healthy_router(["a", "b", "c"])
+
+    assert [router.choose("user") for _ in range(6)] == ["a", "b", "c"] * 2
+
+
+def test_replicas_are_used_after_lag_check() -> None:
+    """Test that unmeasured, lagging and unreachable replicas are skipped."""
+    router = ReplicaRouter(["a", "b"], max_lag=5, read_your_writes_window=10)
+    assert router.choose("user") is None
+
+    assert router.claim_lag_checks() == [0, 1]
+    # checks are not handed out again until the interval passes
+    assert not router.claim_lag_checks()
+    router.report_lag(0, 6)
+    router.report_lag(1, 0.5)
+    assert [router.choose("user") for _ in range(3)] == ["b", "b", "b"]
+
+    router.report_lag(1, None)
+    assert router.choose("user") is None
+
+
+def test_lag_is_checked_periodically(mocker: MockerFixture) -> None:
+    """Test that lag measurements are due again after the check interval."""
+    monotonic = mocker.patch("utils.read_replicas.monotonic", return_value=100.0)
+    router = ReplicaRouter(
+        ["a"], max_lag=5, read_your_writes_window=10, check_interval=3
+    )
+
+    assert router.claim_lag_checks() == [0]
+    monotonic.return_value = 102.0
+    assert not router.claim_lag_checks()
+    monotonic.return_value = 103.0
+    assert router.claim_lag_checks() == [0]
+
+
+def test_reads_after_write_go_to_primary(mocker: MockerFixture) -> None:
+    """Test read-your-writes pinning of the user to the primary database."""
+    monotonic = mocker.patch("utils.read_replicas.monotonic", return_value=100.0)
+    router = _healthy_router(["a"])
+
+    record_user_write("user")
+    record_user_write("")
+    assert router.choose("user") is None
+    assert router.choose("other") == "a"
+    assert router.choose(None) == "a"
+
+    monotonic.return_value = 111.0
+    assert router.choose("user") == "a"
+
+
+def test_remembered_writes_are_bounded(mocker: MockerFixture) -> None:
+    """Test that writes of the least recently writing users are forgotten."""
+    mocker.patch("constants.POSTGRES_READ_YOUR_WRITES_MAX_USERS", 2)
+
+    for user_id in ("u1", "u2", "u1", "u3"):
+        record_user_write(user_id)
+
+    assert wrote_recently("u1", 10)
+    assert not wrote_recently("u2", 10)
+    assert wrote_recently("u3", 10)
+
+
+@pytest.fixture(name="mock_connect")
+def mock_connect_fixture(mocker: MockerFixture) -> MockType:
+    """Return mocked connect whose replica connections report given lag."""
+    lags = {"replica1": 0.5, "replica2": 60.0}
+
+    def connect(**kwargs: Any) -> MockType:
+        connection = mocker.MagicMock()
+        if kwargs["host"] == "broken":
+            raise psycopg2.OperationalError("connection refused")
+        cursor = connection.cursor.return_value.__enter__.return_value
+        cursor.fetchone.return_value = (lags[kwargs["host"]],)
+        return connection
+
+    return mocker.patch("psycopg2.connect", side_effect=connect)
+
+
+def test_route_pooled_read(mock_connect: MockType) -> None:
+    """Test that lagging replica is skipped by pooled reads."""
+    config = _config()
+    router = replica_router(config, replica_configurations(config))
+
+    for _ in range(3):
+        pool = route_pooled_read(router, "user")
+        assert pool is not None
+        assert pool.config.host == "replica1"
+    # lag of every replica is measured once per interval
+    assert mock_connect.call_count == 2
+
+    assert route_pooled_read(None, "user") is None
+
+
+def test_route_pooled_read_unreachable_replica(mock_connect: MockType) -> None:
+    """Test that unreachable replica is not used."""
+    config = _config(replicas=[PostgreSQLReplicaConfiguration(host="broken")])
+    router = replica_router(config, replica_configurations(config))
+
+    assert route_pooled_read(router, "user") is None
+    assert mock_connect.call_count == 1
+
+
+async def test_route_async_read(mocker: MockerFixture) -> None:
+    """Test that async engines are measured in background tasks."""
+    engine = mocker.MagicMock()
+    conn = engine.connect.return_value.__aenter__.return_value
+    result = mocker.MagicMock()
+    result.scalar_one.return_value = 0.1
+    conn.execute = mocker.AsyncMock(return_value=result)
+    router = ReplicaRouter([engine], max_lag=5, read_your_writes_window=10)
+
+    # the first read goes to the primary while the lag is measured
+    assert route_async_read(router, "user") is None
+    for _ in range(10):
+        if router.choose("user") is not None:
+            break
+        await asyncio.sleep(0)
+    assert route_async_read(router, "user") is engine
+    conn.execute.assert_awaited_once()
+
+    assert route_async_read(None, "user") is None
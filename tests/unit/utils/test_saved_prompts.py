@@ -1,14 +1,20 @@
 """Unit tests for saved prompt validation helpers and data access."""
 
-from collections.abc import Generator
+from collections.abc import AsyncGenerator, Generator
 from datetime import timedelta
+from pathlib import Path
 
 import pytest
 from pytest_mock import MockerFixture
 from sqlalchemy import create_engine
 from sqlalchemy.engine import Engine
-from sqlalchemy.orm import Session, sessionmaker
-from sqlalchemy.pool import StaticPool
+from sqlalchemy.ext.asyncio import (
+    AsyncEngine,
+    AsyncSession,
+    async_sessionmaker,
+    create_async_engine,
+)
+from sqlalchemy.orm import sessionmaker
 
 from models.database.base import Base
 from models.database.saved_prompts import SavedPrompt
@@ -29,46 +35,65 @@ from utils.suid import get_suid
 
 
 @pytest.fixture(name="sqlite_engine")
-def sqlite_engine_fixture() -> Generator[Engine, None, None]:
-    """Provide a function-scoped in-memory SQLite engine with tables created.
+def sqlite_engine_fixture(tmp_path: Path) -> Generator[Engine, None, None]:
+    """Provide a function-scoped SQLite engine with tables created.
+
+    Parameters:
+        tmp_path: pytest-provided temporary directory for the database file.
 
     Yields:
-        Engine: SQLAlchemy engine bound to an in-memory SQLite database.
+        Engine: SQLAlchemy engine bound to a temporary SQLite database.
     """
-    engine = create_engine(
-        "sqlite:///:memory:",
-        echo=False,
-        connect_args={"check_same_thread": False},
-        poolclass=StaticPool,
-    )
+    engine = create_engine(f"sqlite:///{tmp_path / 'saved_prompts.db'}", echo=False)
     Base.metadata.create_all(engine)
     yield engine
     engine.dispose()
 
 
-@pytest.fixture(name="patch_saved_prompts_get_session")
-def patch_saved_prompts_get_session_fixture(
-    mocker: MockerFixture, sqlite_engine: Engine
+@pytest.fixture(name="async_sqlite_engine")
+async def async_sqlite_engine_fixture(
+    sqlite_engine: Engine,
+) -> AsyncGenerator[AsyncEngine, None]:
+    """Provide an asynchronous engine for the database of ``sqlite_engine``.
+
+    Parameters:
+        sqlite_engine: Function-scoped engine that created the tables.
+
+    Yields:
+        AsyncEngine: SQLAlchemy async engine bound to the same database.
+    """
+    engine = create_async_engine(
+        sqlite_engine.url.set(drivername="sqlite+aiosqlite"), echo=False
+    )
+    yield engine
+    await engine.dispose()
+
+
+@pytest.fixture(name="patch_saved_prompts_get_async_session")
+def patch_saved_prompts_get_async_session_fixture(
+    mocker: MockerFixture, async_sqlite_engine: AsyncEngine
 ) -> None:
-    """Patch utils.saved_prompts.get_session to use the in-memory engine.
+    """Patch utils.saved_prompts.get_async_session to use the test engine.
 
     Parameters:
         mocker: pytest-mock fixture.
-        sqlite_engine: Function-scoped in-memory engine.
+        async_sqlite_engine: Function-scoped async engine.
     """
-    session_factory = sessionmaker(
-        autocommit=False, autoflush=False, bind=sqlite_engine
+    session_factory = async_sessionmaker(
+        async_sqlite_engine, autoflush=False, expire_on_commit=False
     )
 
-    def _get_session() -> Session:
-        """Create a Session bound to the in-memory test engine.
+    def _get_async_session() -> AsyncSession:
+        """Create an AsyncSession bound to the test engine.
 
         Returns:
-            Session: A new SQLAlchemy session for patched DAL calls.
+            AsyncSession: A new SQLAlchemy session for patched DAL calls.
         """
         return session_factory()
 
-    mocker.patch("utils.saved_prompts.get_session", side_effect=_get_session)
+    mocker.patch(
+        "utils.saved_prompts.get_async_session", side_effect=_get_async_session
+    )
 
 
 class TestValidateSavedPromptQuota:
@@ -239,13 +264,15 @@ class TestValidateSavedPromptContent:
             validate_saved_prompt_content("a", max_content_length=0)
 
 
-@pytest.mark.usefixtures("patch_saved_prompts_get_session")
+@pytest.mark.usefixtures("patch_saved_prompts_get_async_session")
 class TestCreateSavedPrompt:
     """Test cases for create_saved_prompt."""
 
-    def test_create_persists_and_returns_entity(self, sqlite_engine: Engine) -> None:
+    async def test_create_persists_and_returns_entity(
+        self, sqlite_engine: Engine
+    ) -> None:
         """Test create returns a persisted SavedPrompt with id and fields."""
-        created = create_saved_prompt(
+        created = await create_saved_prompt(
             user_id="user-1",
             name="My Prompt",
             content="Hello",
@@ -266,11 +293,11 @@ class TestCreateSavedPrompt:
             assert stored.name == "My Prompt"
             assert stored.content == "Hello"
 
-    def test_create_return_value_has_usable_timestamps_after_session_close(
+    async def test_create_return_value_has_usable_timestamps_after_session_close(
         self,
     ) -> None:
         """Test timestamps are readable on the returned object after DAL returns."""
-        created = create_saved_prompt(
+        created = await create_saved_prompt(
             user_id="user-1",
             name="Timed",
             content="Body",
@@ -280,44 +307,54 @@ class TestCreateSavedPrompt:
         assert created.created_at is not None
         assert created.updated_at is not None
 
-    def test_create_at_limit_raises(self) -> None:
+    async def test_create_at_limit_raises(self) -> None:
         """Test create raises when the user already has max_prompts_per_user prompts."""
-        create_saved_prompt("user-1", "one", "c1", max_prompts_per_user=1)
+        await create_saved_prompt("user-1", "one", "c1", max_prompts_per_user=1)
 
         with pytest.raises(SavedPromptLimitExceededError):
-            create_saved_prompt("user-1", "two", "c2", max_prompts_per_user=1)
+            await create_saved_prompt("user-1", "two", "c2", max_prompts_per_user=1)
 
-    def test_create_duplicate_name_raises_conflict(self) -> None:
+    async def test_create_duplicate_name_raises_conflict(self) -> None:
         """Test duplicate (user_id, name) raises SavedPromptConflictError."""
-        create_saved_prompt("user-1", "same", "first", max_prompts_per_user=50)
+        await create_saved_prompt("user-1", "same", "first", max_prompts_per_user=50)
 
         with pytest.raises(SavedPromptConflictError) as exc_info:
-            create_saved_prompt("user-1", "same", "second", max_prompts_per_user=50)
+            await create_saved_prompt(
+                "user-1", "same", "second", max_prompts_per_user=50
+            )
 
         assert str(exc_info.value) == "Saved prompt name already exists"
 
-    def test_create_allows_same_name_for_different_users(self) -> None:
+    async def test_create_allows_same_name_for_different_users(self) -> None:
         """Test the same name may exist for different users."""
-        first = create_saved_prompt("user-a", "shared", "a", max_prompts_per_user=50)
-        second = create_saved_prompt("user-b", "shared", "b", max_prompts_per_user=50)
+        first = await create_saved_prompt(
+            "user-a", "shared", "a", max_prompts_per_user=50
+        )
+        second = await create_saved_prompt(
+            "user-b", "shared", "b", max_prompts_per_user=50
+        )
         assert first.id != second.id
 
 
-@pytest.mark.usefixtures("patch_saved_prompts_get_session")
+@pytest.mark.usefixtures("patch_saved_prompts_get_async_session")
 class TestListSavedPromptsByUser:
     """Test cases for list_saved_prompts_by_user."""
 
-    def test_list_empty_returns_empty_list(self) -> None:
+    async def test_list_empty_returns_empty_list(self) -> None:
         """Test listing for a user with no prompts returns []."""
-        assert list_saved_prompts_by_user("nobody") == []
+        assert await list_saved_prompts_by_user("nobody") == []
 
-    def test_list_returns_only_that_users_prompts_ordered_by_created_at_desc(
+    async def test_list_returns_only_that_users_prompts_ordered_by_created_at_desc(
         self, sqlite_engine: Engine
     ) -> None:
         """Test list is user-scoped and ordered by created_at descending."""
-        older = create_saved_prompt("user-1", "first", "c1", max_prompts_per_user=50)
-        newer = create_saved_prompt("user-1", "second", "c2", max_prompts_per_user=50)
-        create_saved_prompt("user-11", "other", "c3", max_prompts_per_user=50)
+        older = await create_saved_prompt(
+            "user-1", "first", "c1", max_prompts_per_user=50
+        )
+        newer = await create_saved_prompt(
+            "user-1", "second", "c2", max_prompts_per_user=50
+        )
+        await create_saved_prompt("user-11", "other", "c3", max_prompts_per_user=50)
 
         # Concurrent inserts can share the same created_at; force a clear order.
         session_factory = sessionmaker(
@@ -331,31 +368,31 @@ class TestListSavedPromptsByUser:
             older_row.created_at = newer_row.created_at - timedelta(seconds=1)
             session.commit()
 
-        results = list_saved_prompts_by_user("user-1")
+        results = await list_saved_prompts_by_user("user-1")
 
         assert [p.id for p in results] == [newer.id, older.id]
         assert all(p.user_id == "user-1" for p in results)
 
-    def test_list_excludes_near_collision_user_ids(self) -> None:
+    async def test_list_excludes_near_collision_user_ids(self) -> None:
         """Test list does not match nearby user_id strings (prefix/substring)."""
-        owned = create_saved_prompt(
+        owned = await create_saved_prompt(
             "user-1", "deploy", "owned-body", max_prompts_per_user=50
         )
-        create_saved_prompt(
+        await create_saved_prompt(
             "user-11", "deploy-1", "other-11-body", max_prompts_per_user=50
         )
-        create_saved_prompt(
+        await create_saved_prompt(
             "user-1a", "deploy", "other-1a-body", max_prompts_per_user=50
         )
 
-        results = list_saved_prompts_by_user("user-1")
+        results = await list_saved_prompts_by_user("user-1")
 
         assert len(results) == 1
         assert results[0].id == owned.id
         assert results[0].user_id == "user-1"
         assert results[0].content == "owned-body"
 
-    def test_list_caps_at_configured_upper_bound(
+    async def test_list_caps_at_configured_upper_bound(
         self, mocker: MockerFixture, sqlite_engine: Engine
     ) -> None:
         """Test list applies SAVED_PROMPTS_MAX_PER_USER_UPPER_BOUND as a hard cap."""
@@ -378,21 +415,21 @@ class TestListSavedPromptsByUser:
                 )
             session.commit()
 
-        results = list_saved_prompts_by_user("user-1")
+        results = await list_saved_prompts_by_user("user-1")
         assert len(results) == 2
 
 
-@pytest.mark.usefixtures("patch_saved_prompts_get_session")
+@pytest.mark.usefixtures("patch_saved_prompts_get_async_session")
 class TestDeleteSavedPromptByIdAndUser:
     """Test cases for delete_saved_prompt_by_id_and_user."""
 
-    def test_delete_owned_prompt(self, sqlite_engine: Engine) -> None:
+    async def test_delete_owned_prompt(self, sqlite_engine: Engine) -> None:
         """Test deleting an owned prompt removes the row."""
-        created = create_saved_prompt(
+        created = await create_saved_prompt(
             "user-1", "to-delete", "body", max_prompts_per_user=50
         )
 
-        delete_saved_prompt_by_id_and_user(created.id, "user-1")
+        await delete_saved_prompt_by_id_and_user(created.id, "user-1")
 
         session_factory = sessionmaker(
             autocommit=False, autoflush=False, bind=sqlite_engine
@@ -400,23 +437,23 @@ class TestDeleteSavedPromptByIdAndUser:
         with session_factory() as session:
             assert session.get(SavedPrompt, created.id) is None
 
-    def test_delete_missing_raises_not_found(self) -> None:
+    async def test_delete_missing_raises_not_found(self) -> None:
         """Test deleting an unknown id raises SavedPromptNotFoundError."""
         with pytest.raises(SavedPromptNotFoundError) as exc_info:
-            delete_saved_prompt_by_id_and_user("missing-id", "user-1")
+            await delete_saved_prompt_by_id_and_user("missing-id", "user-1")
 
         assert str(exc_info.value) == "Saved prompt not found"
 
-    def test_delete_other_users_prompt_raises_access_denied(
+    async def test_delete_other_users_prompt_raises_access_denied(
         self, sqlite_engine: Engine
     ) -> None:
         """Test delete by non-owner raises access denied and leaves the row."""
-        created = create_saved_prompt(
+        created = await create_saved_prompt(
             "owner", "private", "body", max_prompts_per_user=50
         )
 
         with pytest.raises(SavedPromptAccessDeniedError) as exc_info:
-            delete_saved_prompt_by_id_and_user(created.id, "intruder")
+            await delete_saved_prompt_by_id_and_user(created.id, "intruder")
 
         assert str(exc_info.value) == "Saved prompt access denied"
 
@@ -0,0 +1,100 @@
+"""Unit tests for assignment of users to PostgreSQL shards."""
+
+from collections import Counter
+
+import pytest
+from pydantic import SecretStr
+
+from models.config import (
+    PostgreSQLDatabaseConfiguration,
+    PostgreSQLReplicaConfiguration,
+    PostgreSQLShardConfiguration,
+)
+from utils.shards import Shards, shard_configurations, shard_index, shards_of
+
+
+def _config(shard_names: list[str]) -> PostgreSQLDatabaseConfiguration:
+    """Return PostgreSQL configuration with shards of given names."""
+    return PostgreSQLDatabaseConfiguration(
+        db="database",
+        user="user",
+        password=SecretStr("password"),
+        namespace="lcs",
+        replicas=[PostgreSQLReplicaConfiguration(host="replica")],
+        shards=[
+            PostgreSQLShardConfiguration(name=name, host=name, db=f"db_{name}")
+            for name in shard_names
+        ],
+    )  # pyright: ignore[reportCallIssue]
+
+
+def test_shard_configurations() -> None:
+    """Test that shards inherit all settings but host, port and database."""
+    first, second = shard_configurations(_config(["a", "b"]))
+
+    assert (first.host, first.port, first.db) == ("a", 5432, "db_a")
+    assert (second.host, second.db) == ("b", "db_b")
+    assert second.user == "user"
+    assert second.namespace == "lcs"
+    assert not second.replicas
+    assert not second.shards
+
+
+def test_shard_index_is_stable() -> None:
+    """Test that the shard of a user does not depend on order of shards."""
+    users = [f"user{i}" for i in range(100)]
+    names = ["a", "b", "c"]
+
+    indexes = [shard_index(user, names) for user in users]
+    reversed_indexes = [shard_index(user, names[::-1]) for user in users]
+
+    assert [names[i] for i in indexes] == [names[::-1][i] for i in reversed_indexes]
+    # every shard gets some users
+    assert set(Counter(indexes)) == {0, 1, 2}
+
+    with pytest.raises(ValueError):
+        shard_index("user", [])
+
+
+def test_added_shard_takes_users_from_others_only() -> None:
+    """Test that adding a shard moves only users assigned to the new shard."""
+    users = [f"user{i}" for i in range(200)]
+    before = {user: ["a", "b"][shard_index(user, ["a", "b"])] for user in users}
+    after = {
+        user: ["a", "b", "c"][shard_index(user, ["a", "b", "c"])] for user in users
+    }
+
+    moved = [user for user in users if before[user] != after[user]]
+
+    assert moved
+    assert all(after[user] == "c" for user in moved)
+
+
+def test_shards() -> None:
+    """Test that handles of shards are addressed by user ID."""
+    shards = Shards(["a", "b", "c"], ["engine_a", "engine_b", "engine_c"])
+    own = shards.for_user("user")
+
+    assert len(shards) == 3
+    assert list(shards) == ["engine_a", "engine_b", "engine_c"]
+    assert (
+        own
+        == ["engine_a", "engine_b", "engine_c"][shard_index("user", ["a", "b", "c"])]
+    )
+    user_first = shards.user_first("user")
+    assert user_first[0] == own
+    assert sorted(user_first) == ["engine_a", "engine_b", "engine_c"]
+    assert shards.user_first(None) == ["engine_a", "engine_b", "engine_c"]
+
+    with pytest.raises(ValueError):
+        Shards(["a"], [])
+
+
+def test_shards_of() -> None:
+    """Test that shards are used only when configured."""
+    assert shards_of(None, []) is None
+    assert shards_of(_config([]), []) is None
+
+    shards = shards_of(_config(["a", "b"]), ["engine_a", "engine_b"])
+    assert shards is not None
+    assert shards.names == ["a", "b"]